@@ -13,20 +13,26 @@ import asyncio
 import json
 import logging
 import os
+import uuid
+from collections.abc import Iterator
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
 import httpx
-from fastapi import HTTPException
+from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
 
 from crank.capabilities.schema import CODEX_ZETTEL_REPOSITORY, CapabilityDefinition
+from crank.search import InvertedIndex
+from crank.storage import DurabilityMode, WriteBehindQueue
 from crank.worker_runtime.base import WorkerApplication
 
 logger = logging.getLogger(__name__)
 
+MAX_INGEST_BATCH = 1000
+
 
 @dataclass(slots=True)
 class ZettelRepositoryConfig:
@@ -35,6 +41,7 @@ class ZettelRepositoryConfig:
     base_path: Path = field(default_factory=lambda: Path("zettels_repository"))
     default_category: str = "inbox"
     file_extension: str = ".md"
+    durability: DurabilityMode = DurabilityMode.GROUP
 
 
 @dataclass(slots=True)
@@ -53,24 +60,48 @@ class ZettelRecord:
 
 
 class ZettelRepository:
-    """Primitive filesystem repository for storing zettels."""
+    """
+    Filesystem repository for storing zettels.
+
+    Writes go through a write-behind queue so they are atomic, batched and
+    never block the event loop; ``config.durability`` decides when a store
+    is acknowledged.
+    """
 
-    def __init__(self, config: ZettelRepositoryConfig | None = None) -> None:
+    def __init__(
+        self,
+        config: ZettelRepositoryConfig | None = None,
+        writer: WriteBehindQueue | None = None,
+    ) -> None:
         self.config = config or ZettelRepositoryConfig()
         self.base_path = self.config.base_path.expanduser().resolve()
         self.base_path.mkdir(parents=True, exist_ok=True)
         self.config.base_path = self.base_path
+        self.writer = writer or WriteBehindQueue(self.config.durability)
 
-    def store(self, record: ZettelRecord) -> Path:
+    async def store(self, record: ZettelRecord) -> Path:
         """Persist a zettel as a Markdown file with JSON front matter."""
-        category = self._sanitize_segment(record.category or self.config.default_category)
-        target_dir = self.base_path / category
-        target_dir.mkdir(parents=True, exist_ok=True)
+        target_path = self.path_for(record)
+        await self.writer.write(target_path, self._render_record(record))
+        return target_path
 
+    def path_for(self, record: ZettelRecord) -> Path:
+        """Resolve the on-disk location for a record."""
+        category = self._sanitize_segment(record.category or self.config.default_category)
         file_name = f"{self._sanitize_segment(record.zettel_id)}{self.config.file_extension}"
-        target_path = target_dir / file_name
-        target_path.write_text(self._render_record(record), encoding="utf-8")
-        return target_path
+        return self.base_path / category / file_name
+
+    async def close(self) -> None:
+        """Flush pending writes (call on shutdown)."""
+        await self.writer.close()
+
+    def iter_records(self) -> Iterator[tuple[Path, ZettelRecord]]:
+        """Yield every stored zettel with its path (skips unparseable files)."""
+        for path in sorted(self.base_path.rglob(f"*{self.config.file_extension}")):
+            try:
+                yield path, self._parse_record(path.read_text(encoding="utf-8"))
+            except (ValueError, KeyError) as exc:
+                logger.warning("Skipping unreadable zettel %s: %s", path, exc)
 
     def _render_record(self, record: ZettelRecord) -> str:
         metadata = {
@@ -87,6 +118,27 @@ class ZettelRepository:
         body = record.content.rstrip() + "\n"
         return f"---\n{front_matter}\n---\n\n{body}"
 
+    def _parse_record(self, text: str) -> ZettelRecord:
+        """Inverse of _render_record: split JSON front matter from the body."""
+        if not text.startswith("---\n"):
+            raise ValueError("missing front matter")
+        front_matter, separator, body = text[4:].partition("\n---\n")
+        if not separator:
+            raise ValueError("unterminated front matter")
+
+        metadata = json.loads(front_matter)
+        return ZettelRecord(
+            zettel_id=metadata["zettel_id"],
+            title=metadata.get("title") or "",
+            content=body.strip(),
+            category=metadata.get("category"),
+            tags=metadata.get("tags") or [],
+            source_agent=metadata.get("source_agent"),
+            metadata=metadata.get("metadata") or {},
+            context=metadata.get("context") or {},
+            created_at=datetime.fromisoformat(metadata["created_at"]),
+        )
+
     def _sanitize_segment(self, raw_value: str) -> str:
         slug = "".join(ch if ch.isalnum() or ch in ("-", "_") else "-" for ch in raw_value.strip().lower())
         slug = "-".join(filter(None, slug.split("-")))
@@ -103,15 +155,63 @@ class CodexZettelService:
     the worker entrypoints.
     """
 
-    def __init__(self, repository: ZettelRepository) -> None:
+    def __init__(
+        self,
+        repository: ZettelRepository,
+        search_index: InvertedIndex | None = None,
+    ) -> None:
         self.repository = repository
+        self.search_index = search_index or InvertedIndex()
+        self._catalog: dict[str, dict[str, Any]] = {}
+        self._rebuild_search_index()
+
+    async def ingest(self, payload: dict[str, Any]) -> dict[str, Any]:
+        record = self._prepare_record(payload)
+        stored_path = await self.repository.store(record)
+        return self._ingest_result(record, stored_path)
+
+    async def ingest_batch(self, payloads: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Ingest many zettels in one round trip.
 
-    def ingest(self, payload: dict[str, Any]) -> dict[str, Any]:
+        All valid records are queued together so the repository commits them
+        as a handful of batches. Failures are reported per item and never
+        abort the rest of the batch.
+        """
+        results: list[dict[str, Any]] = [{} for _ in payloads]
+        records: list[tuple[int, ZettelRecord]] = []
+        for position, payload in enumerate(payloads):
+            try:
+                if not isinstance(payload, dict):
+                    raise ValueError("each zettel must be a JSON object")
+                records.append((position, self._prepare_record(payload)))
+            except ValueError as exc:
+                results[position] = {"status": "rejected", "error": str(exc)}
+
+        stored = await asyncio.gather(
+            *(self.repository.store(record) for _, record in records),
+            return_exceptions=True,
+        )
+        for (position, record), outcome in zip(records, stored):
+            if isinstance(outcome, BaseException):
+                logger.error("Batch store failed for %s: %s", record.zettel_id, outcome)
+                results[position] = {
+                    "status": "failed",
+                    "zettel_id": record.zettel_id,
+                    "error": "ZETTEL_STORAGE_FAILED",
+                }
+            else:
+                results[position] = {"status": "stored", **self._ingest_result(record, outcome)}
+        return results
+
+    def _prepare_record(self, payload: dict[str, Any]) -> ZettelRecord:
         record = self._build_record(payload)
         self._ensure_title(record)
         self._ensure_category(record)
+        return record
 
-        stored_path = self.repository.store(record)
+    def _ingest_result(self, record: ZettelRecord, stored_path: Path) -> dict[str, Any]:
+        self._index_record(record, stored_path)
         relative_path = stored_path.relative_to(self.repository.base_path)
 
         return {
@@ -125,6 +225,24 @@ class CodexZettelService:
             "created_at": record.created_at.isoformat(),
         }
 
+    def _rebuild_search_index(self) -> None:
+        """Warm the search index from zettels already on disk."""
+        for path, record in self.repository.iter_records():
+            self._index_record(record, path)
+        if self._catalog:
+            logger.info("Search index rebuilt with %d zettels", len(self._catalog))
+
+    def _index_record(self, record: ZettelRecord, stored_path: Path) -> None:
+        searchable = "\n".join([record.title, " ".join(record.tags), record.content])
+        self.search_index.add(record.zettel_id, searchable)
+        self._catalog[record.zettel_id] = {
+            "zettel_id": record.zettel_id,
+            "title": record.title,
+            "category": record.category,
+            "tags": record.tags,
+            "relative_path": str(stored_path.relative_to(self.repository.base_path)),
+        }
+
     def _build_record(self, payload: dict[str, Any]) -> ZettelRecord:
         content = (payload.get("content") or "").strip()
         if not content:
@@ -158,7 +276,8 @@ class CodexZettelService:
 
     def _generate_zettel_id(self) -> str:
         timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
-        return f"zk{timestamp}"
+        # Suffix keeps IDs unique when a batch lands within the same second
+        return f"zk{timestamp}-{uuid.uuid4().hex[:6]}"
 
     def _generate_title(self, record: ZettelRecord) -> str:
         """
@@ -202,9 +321,37 @@ class CodexZettelService:
         """Placeholder for future publication planning support."""
         raise NotImplementedError("Publication planning is not implemented yet")
 
-    def retrieve_matching(self, _filters: dict[str, Any]) -> list[dict[str, Any]]:
-        """Placeholder for similarity-based retrieval features."""
-        raise NotImplementedError("Retrieval filters are not implemented yet")
+    def retrieve_matching(self, filters: dict[str, Any]) -> list[dict[str, Any]]:
+        """
+        Full-text retrieval over stored zettels (BM25 ranked).
+
+        Supported filters: ``query`` (required), ``limit`` (default 10),
+        ``category`` and ``tags`` (all must match) applied after ranking.
+        """
+        query = (filters.get("query") or "").strip()
+        if not query:
+            raise ValueError("query is required for zettel retrieval")
+
+        limit = filters.get("limit", 10)
+        if not isinstance(limit, int) or limit < 1:
+            raise ValueError("limit must be a positive integer")
+
+        category = (filters.get("category") or "").strip() or None
+        tags = set(self._normalize_tags(filters.get("tags")))
+        # Over-fetch when post-filtering so filters don't starve the result page
+        fetch = limit if category is None and not tags else limit * 10
+
+        results: list[dict[str, Any]] = []
+        for hit in self.search_index.search(query, limit=fetch):
+            entry = self._catalog[hit.doc_key]
+            if category is not None and entry["category"] != category:
+                continue
+            if not tags.issubset(entry["tags"]):
+                continue
+            results.append({**entry, "score": round(hit.score, 4)})
+            if len(results) == limit:
+                break
+        return results
 
 
 class CodexZettelRepositoryWorker(WorkerApplication):
@@ -212,7 +359,10 @@ class CodexZettelRepositoryWorker(WorkerApplication):
 
     def __init__(self) -> None:
         """Initialize codex zettel repository worker."""
-        self.repository_config = ZettelRepositoryConfig(base_path=Path("zettels_repository"))
+        self.repository_config = ZettelRepositoryConfig(
+            base_path=Path("zettels_repository"),
+            durability=DurabilityMode(os.getenv("ZETTEL_DURABILITY", DurabilityMode.GROUP.value)),
+        )
         self.service = CodexZettelService(ZettelRepository(self.repository_config))
         super().__init__(
             service_name="codex-zettel-repository",
@@ -231,7 +381,7 @@ class CodexZettelRepositoryWorker(WorkerApplication):
     def setup_routes(self) -> None:
         async def ingest_zettel(request: dict[str, Any]) -> JSONResponse:
             try:
-                result = self.service.ingest(request)
+                result = await self.service.ingest(request)
                 return JSONResponse(content=result, status_code=201)
             except ValueError as exc:
                 raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -241,6 +391,44 @@ class CodexZettelRepositoryWorker(WorkerApplication):
 
         self.app.post("/zettels")(ingest_zettel)
 
+        async def search_zettels(request: dict[str, Any]) -> JSONResponse:
+            try:
+                results = self.service.retrieve_matching(request)
+                return JSONResponse(content={"results": results, "count": len(results)})
+            except ValueError as exc:
+                raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+        self.app.post("/zettels/search")(search_zettels)
+
+        async def ingest_batch(request: Request) -> JSONResponse:
+            # Parsed by hand so malformed bodies get a 400 like every other batch error
+            try:
+                body = await request.json()
+            except ValueError as exc:
+                raise HTTPException(status_code=400, detail="request body must be JSON") from exc
+            if not isinstance(body, dict):
+                raise HTTPException(status_code=400, detail="request body must be a JSON object")
+
+            zettels = body.get("zettels")
+            if not isinstance(zettels, list) or not zettels:
+                raise HTTPException(status_code=400, detail="zettels must be a non-empty list")
+            if len(zettels) > MAX_INGEST_BATCH:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"batch exceeds {MAX_INGEST_BATCH} zettels",
+                )
+
+            results = await self.service.ingest_batch(zettels)
+            stored = sum(1 for result in results if result["status"] == "stored")
+            # 207 Multi-Status when only part of the batch made it to disk
+            status_code = 201 if stored == len(results) else 207
+            return JSONResponse(
+                content={"results": results, "stored": stored, "count": len(results)},
+                status_code=status_code,
+            )
+
+        self.app.post("/ingest/batch")(ingest_batch)
+
     def get_capabilities(self) -> list[CapabilityDefinition]:
         return [CODEX_ZETTEL_REPOSITORY]
 
@@ -301,6 +489,7 @@ class CodexZettelRepositoryWorker(WorkerApplication):
 
     async def on_shutdown(self) -> None:
         logger.info("Codex zettel repository worker shutting down")
+        await self.service.repository.close()
         await super().on_shutdown()
 
 
@@ -16,20 +16,47 @@ Architecture:
 - Workers register capabilities on startup
 - Controller routes requests to appropriate workers
 - Mesh shares capability state across nodes (future)
+- Requests are traced (W3C traceparent); spans are exported when
+  CRANK_TRACE_EXPORT is set
+- Prometheus metrics on /metrics: the worker runtime series plus SLOs
+- Admin-only /debug/profile (CPU or heap profiles on demand) for clients
+  whose certificate CN is listed in CRANK_ADMIN_IDENTITIES
+- Registry replication between controllers (CONTROLLER_PEERS): versioned
+  delta pulls plus Merkle anti-entropy on /replication/*, served to peers
+  whose certificate CN is listed in CONTROLLER_PEER_IDENTITIES
 """
 
 import logging
 import os
+import ssl
+import time
 from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Any, Optional
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import Depends, FastAPI, Header, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from pydantic import BaseModel, Field
 
+from crank.controller.admission import AdmissionController, AdmissionRejected
 from crank.controller.capability_registry import CapabilityRegistry, CapabilitySchema
-from crank.security import CertificateManager
+from crank.controller.hedging import Hedger
+from crank.controller.idempotency import (
+    CachedResult,
+    IdempotencyCache,
+    IdempotencyError,
+    request_hash,
+)
+from crank.controller.load import LOAD_FIELDS
+from crank.controller.outliers import OutlierDetector
+from crank.controller.replication import HttpPeer, Replicator
+from crank.controller.slo import SLOTracker
+from crank.observability import TracingMiddleware, configure_tracing
+from crank.observability.metrics import CONTENT_TYPE
+from crank.security import CertificateManager, create_mtls_client
+from crank.security.admin import AdminAuthorizer, tls_http_protocol
+from crank.worker_runtime.debug import DebugProfiler
+from crank.worker_runtime.metrics import MetricsMiddleware, RuntimeMetrics
 
 logger = logging.getLogger(__name__)
 
@@ -59,6 +86,10 @@ class HeartbeatRequest(BaseModel):
     """Worker heartbeat request."""
 
     worker_id: str = Field(description="Worker identifier")
+    load: Optional[list[float]] = Field(
+        default=None,
+        description=f"Load vector ({', '.join(LOAD_FIELDS)}) for load-aware routing",
+    )
 
 
 class HeartbeatResponse(BaseModel):
@@ -75,7 +106,10 @@ class RouteRequest(BaseModel):
     capability: str = Field(description="Capability name (e.g., 'email.classify')")
     slo_constraints: Optional[dict[str, Any]] = Field(
         default=None,
-        description="SLO requirements (future: SLO-aware routing)"
+        description=(
+            "SLO requirements, e.g. {'latency_p95_ms': 100}; only workers currently meeting "
+            "them are used. 'fallback' (best_effort | any | reject) applies when none do"
+        ),
     )
     requester_identity: Optional[str] = Field(
         default=None,
@@ -85,6 +119,19 @@ class RouteRequest(BaseModel):
         default=None,
         description="Budget tokens (future: economic routing)"
     )
+    deadline_ms: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="Time budget for the invocation; shed with 429 if it cannot be met",
+    )
+    payload: Optional[dict[str, Any]] = Field(
+        default=None,
+        description="Invocation arguments, hashed with an Idempotency-Key to detect key reuse",
+    )
+    hedge_of: Optional[str] = Field(
+        default=None,
+        description="Lease ID of a slow request to duplicate on another worker (hedging)",
+    )
 
 
 class RouteResponse(BaseModel):
@@ -93,6 +140,53 @@ class RouteResponse(BaseModel):
     worker_id: str = Field(description="Selected worker ID")
     worker_url: str = Field(description="Worker endpoint URL")
     capability: str = Field(description="Matched capability")
+    lease_id: str = Field(description="Concurrency slot to return via POST /release/{lease_id}")
+    queued_ms: float = Field(description="Time spent waiting for a free slot")
+    hedge_after_ms: Optional[float] = Field(
+        default=None,
+        description="Idempotent capabilities: send a hedge (hedge_of) if unanswered by then",
+    )
+
+
+class ReplayResponse(BaseModel):
+    """Stored result for a request already completed under its Idempotency-Key."""
+
+    worker_id: str = Field(description="Worker that ran the original request")
+    capability: str = Field(description="Matched capability")
+    result: dict[str, Any] = Field(description="Result reported for the original request")
+    age_seconds: float = Field(description="Time since the original request completed")
+
+
+class ReleaseRequest(BaseModel):
+    """Outcome of a routed invocation, reported when its lease is returned."""
+
+    success: bool = Field(default=True, description="Whether the invocation succeeded")
+    duration_ms: Optional[float] = Field(
+        default=None,
+        ge=0,
+        description="Invocation latency measured by the caller (default: time the lease was held)",
+    )
+    result: Optional[dict[str, Any]] = Field(
+        default=None,
+        description="Invocation result, replayed to retries with the same Idempotency-Key",
+    )
+    cancelled: bool = Field(
+        default=False,
+        description="Invocation abandoned (e.g. lost a hedge race); its outcome is not recorded",
+    )
+
+
+class DigestsRequest(BaseModel):
+    """Merkle tree nodes a peer controller compares during anti-entropy."""
+
+    level: int = Field(ge=0, description="Tree level (0 is the root)")
+    indices: list[int] = Field(max_length=65536, description="Node indices at that level")
+
+
+class LeavesRequest(BaseModel):
+    """Merkle leaves whose entries a peer controller fetches."""
+
+    leaves: list[int] = Field(max_length=65536, description="Leaf indices")
 
 
 class CapabilitiesResponse(BaseModel):
@@ -128,12 +222,81 @@ class ControllerService:
         self.https_port = https_port
         self.service_name = "crank-controller"
 
+        # Tracing: tail-sampled spans, continued from the caller's traceparent
+        self.tracer = configure_tracing(self.service_name)
+
+        # Metrics: request counts, latency, event-loop lag, GC pauses, and
+        # event-loop stalls logged with the stack that caused them
+        blocking_ms = float(os.getenv("CONTROLLER_BLOCKING_THRESHOLD_MS", "100"))
+        self.metrics = RuntimeMetrics(blocking_threshold=blocking_ms / 1000 or None)
+
+        # On-demand profiling for operators holding an admin client certificate
+        self.admin = AdminAuthorizer.from_env()
+        self.profiler = DebugProfiler(self.service_name)
+
         # Initialize capability registry
         state_file = Path(os.getenv("CONTROLLER_STATE_FILE", "state/controller/registry.jsonl"))
         heartbeat_timeout = int(os.getenv("CONTROLLER_HEARTBEAT_TIMEOUT", "120"))
+        load_half_life = float(os.getenv("CONTROLLER_LOAD_HALF_LIFE", "30"))
+
+        # SLO tracking: latency percentiles and error-budget burn (ADR-0026),
+        # also the live data behind SLO-aware routing
+        self.slo = SLOTracker()
+
+        # Circuit breakers: eject workers that heartbeat but fail or stall
+        self.outliers = OutlierDetector(
+            consecutive_failures=int(os.getenv("CONTROLLER_BREAKER_FAILURES", "5")),
+            base_ejection=float(os.getenv("CONTROLLER_EJECTION_SECONDS", "30")),
+        )
+
         self.registry = CapabilityRegistry(
             state_file=state_file,
             heartbeat_timeout=heartbeat_timeout,
+            load_half_life=load_half_life,
+            slo_tracker=self.slo,
+            outlier_detector=self.outliers,
+            controller_id=os.getenv("CONTROLLER_ID"),
+        )
+
+        # Replication: pull peer controllers' registry changes, serve ours to them
+        peer_urls = [url.strip() for url in os.getenv("CONTROLLER_PEERS", "").split(",")]
+        peer_urls = [url for url in peer_urls if url]
+        self.peer_auth = AdminAuthorizer(
+            os.getenv("CONTROLLER_PEER_IDENTITIES", "").split(","),
+            role="peer controller",
+            audit_level=logging.DEBUG,  # Peers pull every few seconds
+        )
+        self.peer_client = create_mtls_client() if peer_urls else None
+        self.replicator = Replicator(
+            self.registry,
+            [HttpPeer(url, self.peer_client) for url in peer_urls if self.peer_client],
+            interval=float(os.getenv("CONTROLLER_SYNC_INTERVAL", "5")),
+            anti_entropy_interval=float(os.getenv("CONTROLLER_ANTI_ENTROPY_INTERVAL", "60")),
+        )
+
+        # Admission control: per-worker capability concurrency limits
+        self.admission = AdmissionController(
+            self.registry,
+            max_queue=int(os.getenv("CONTROLLER_ADMISSION_QUEUE", "64")),
+            max_wait=float(os.getenv("CONTROLLER_ADMISSION_MAX_WAIT", "5")),
+            lease_ttl=float(os.getenv("CONTROLLER_LEASE_TTL", "300")),
+        )
+
+        # Hedging: duplicate slow idempotent requests within a load budget
+        self.hedger = Hedger(
+            self.admission,
+            self.slo,
+            ratio=float(os.getenv("CONTROLLER_HEDGE_RATIO", "0.05")),
+        )
+
+        # Idempotency: replay completed results to retries (ADR-0026)
+        idempotency_dir = os.getenv("CONTROLLER_IDEMPOTENCY_DIR")
+        self.idempotency = IdempotencyCache(
+            ttl=float(os.getenv("CONTROLLER_IDEMPOTENCY_TTL", "3600")),
+            max_bytes=int(os.getenv("CONTROLLER_IDEMPOTENCY_MAX_MB", "64")) * 1024 * 1024,
+            inflight_timeout=self.admission.lease_ttl,
+            disk_dir=Path(idempotency_dir) if idempotency_dir else None,
+            cleanup_interval=float(os.getenv("CONTROLLER_IDEMPOTENCY_CLEANUP_INTERVAL", "60")),
         )
 
         # Initialize certificate manager for SSL
@@ -146,9 +309,21 @@ class ControllerService:
         async def lifespan(app: FastAPI):
             """Controller lifespan: startup and shutdown hooks."""
             logger.info("🚀 Controller starting on port %d", self.https_port)
+            self.metrics.start()
             # Startup: registry already initialized
+            purged = await self.idempotency.purge_disk()
+            if purged:
+                logger.info("Purged %d expired idempotency records", purged)
+            self.idempotency.start()
+            self.replicator.start()
             yield
             # Shutdown: registry auto-persists on each operation
+            await self.replicator.stop()
+            if self.peer_client is not None:
+                await self.peer_client.aclose()
+            await self.idempotency.close()
+            await self.tracer.close()
+            await self.metrics.stop()
             logger.info("🛑 Controller shutting down")
 
         self.app = FastAPI(
@@ -157,6 +332,8 @@ class ControllerService:
             version="0.1.0",
             lifespan=lifespan,
         )
+        self.app.add_middleware(MetricsMiddleware, metrics=self.metrics.http)
+        self.app.add_middleware(TracingMiddleware, tracer=self.tracer)
 
         # Register routes
         self._register_routes()
@@ -186,12 +363,19 @@ class ControllerService:
                     CapabilitySchema(**cap) for cap in request.capabilities
                 ]
 
+                # Declared SLOs (rejects malformed targets before registering)
+                for capability in capabilities:
+                    self.slo.set_objectives(
+                        f"{capability.verb}:{capability.name}", capability.slo
+                    )
+
                 # Register in capability registry
                 self.registry.register(
                     worker_id=request.worker_id,
                     worker_url=request.worker_url,
                     capabilities=capabilities,
                 )
+                self.admission.dispatch_all()  # New capacity for queued requests
 
                 response = RegisterResponse(
                     status="registered",
@@ -210,6 +394,8 @@ class ControllerService:
                     status_code=200,
                 )
 
+            except ValueError as e:
+                raise HTTPException(status_code=422, detail=str(e)) from e
             except Exception as e:
                 logger.error("Worker registration failed: %s", str(e))
                 raise HTTPException(status_code=500, detail=str(e)) from e
@@ -218,9 +404,11 @@ class ControllerService:
 
         # Worker heartbeat endpoint
         async def heartbeat_worker(request: HeartbeatRequest) -> JSONResponse:
-            """Update worker heartbeat timestamp."""
+            """Update worker heartbeat timestamp and load."""
             try:
-                acknowledged = self.registry.heartbeat(request.worker_id)
+                acknowledged = self.registry.heartbeat(request.worker_id, request.load)
+                if acknowledged:
+                    self.admission.dispatch_all()  # Worker may be healthy again
 
                 response = HeartbeatResponse(
                     status="ok" if acknowledged else "unknown_worker",
@@ -232,6 +420,8 @@ class ControllerService:
                     status_code=200 if acknowledged else 404,
                 )
 
+            except ValueError as e:
+                raise HTTPException(status_code=422, detail=str(e)) from e
             except Exception as e:
                 logger.error("Heartbeat processing failed: %s", str(e))
                 raise HTTPException(status_code=500, detail=str(e)) from e
@@ -243,6 +433,7 @@ class ControllerService:
             """Deregister worker (graceful shutdown)."""
             try:
                 self.registry.deregister(worker_id)
+                self.slo.forget_worker(worker_id)
 
                 logger.info("Worker deregistered: %s", worker_id)
 
@@ -258,27 +449,75 @@ class ControllerService:
         self.app.delete("/deregister/{worker_id}")(deregister_worker)
 
         # Capability routing endpoint
-        async def route_capability(request: RouteRequest) -> JSONResponse:
-            """Route capability request to appropriate worker."""
+        async def route_capability(
+            request: RouteRequest,
+            idempotency_key: Optional[str] = Header(default=None),
+        ) -> JSONResponse:
+            """Route capability request to a worker with a free concurrency slot.
+
+            The caller must return the slot via POST /release/{lease_id}. With
+            an Idempotency-Key, a request already completed is answered with
+            its stored result (X-Idempotent-Replay: true) and duplicates of a
+            running request wait for it instead of being routed again.
+
+            For idempotent capabilities the response carries hedge_after_ms;
+            a request still unanswered by then may be duplicated by routing
+            again with hedge_of set to its lease_id. The first response wins
+            and the loser's lease is released with cancelled=true.
+            """
+            if request.hedge_of:
+                return self._route_hedge(request.hedge_of, request.slo_constraints)
             try:
-                worker = self.registry.route(
-                    verb=request.verb,
-                    capability=request.capability,
-                    slo_constraints=request.slo_constraints,
-                    requester_identity=request.requester_identity,
-                    budget_tokens=request.budget_tokens,
-                )
-
-                if not worker:
+                idempotency = None
+                if idempotency_key:
+                    idempotency = {
+                        "idempotency_key": idempotency_key,
+                        "request_hash": request_hash(
+                            request.verb, request.capability, request.payload
+                        ),
+                    }
+                    cached = await self.idempotency.acquire(
+                        idempotency_key, idempotency["request_hash"]
+                    )
+                    if cached is not None:
+                        return self._replay(cached)
+
+                try:
+                    with self.tracer.span(
+                        "admission.admit",
+                        attributes={"crank.capability": f"{request.verb}:{request.capability}"},
+                    ) as span:
+                        lease = await self.admission.admit(
+                            request.verb,
+                            request.capability,
+                            deadline_ms=request.deadline_ms,
+                            slo_constraints=request.slo_constraints,
+                        )
+                        if lease:
+                            span.set_attribute("crank.worker_id", lease.worker.worker_id)
+                            span.set_attribute("crank.queued_ms", round(lease.queued_ms, 2))
+                except BaseException:
+                    if idempotency_key:
+                        self.idempotency.abandon(idempotency_key)
+                    raise
+
+                if not lease:
+                    if idempotency_key:
+                        self.idempotency.abandon(idempotency_key)
                     raise HTTPException(
                         status_code=404,
                         detail=f"No worker available for {request.verb}:{request.capability}",
                     )
+                if idempotency:
+                    lease.metadata.update(idempotency)
 
                 response = RouteResponse(
-                    worker_id=worker.worker_id,
-                    worker_url=worker.worker_url,
-                    capability=f"{request.verb}:{request.capability}",
+                    worker_id=lease.worker.worker_id,
+                    worker_url=lease.worker.worker_url,
+                    capability=lease.capability_key,
+                    lease_id=lease.lease_id,
+                    queued_ms=round(lease.queued_ms, 2),
+                    hedge_after_ms=self.hedger.on_request(lease),
                 )
 
                 return JSONResponse(
@@ -286,6 +525,16 @@ class ControllerService:
                     status_code=200,
                 )
 
+            except IdempotencyError as e:
+                raise HTTPException(status_code=e.status_code, detail=str(e)) from e
+            except ValueError as e:  # Malformed slo_constraints
+                raise HTTPException(status_code=422, detail=str(e)) from e
+            except AdmissionRejected as e:
+                return JSONResponse(
+                    content={"detail": str(e)},
+                    status_code=e.status_code,
+                    headers={"Retry-After": f"{e.retry_after:.0f}"},
+                )
             except HTTPException:
                 raise
             except Exception as e:
@@ -294,6 +543,41 @@ class ControllerService:
 
         self.app.post("/route")(route_capability)
 
+        async def release_lease(
+            lease_id: str, request: Optional[ReleaseRequest] = None
+        ) -> JSONResponse:
+            """Return a routed request's concurrency slot and report its outcome."""
+            outcome = request or ReleaseRequest()
+            lease = self.admission.release(lease_id, cancelled=outcome.cancelled)
+            if lease is not None and not outcome.cancelled:  # Hedge-race losers report nothing
+                duration_ms = outcome.duration_ms
+                if duration_ms is None:
+                    duration_ms = (time.monotonic() - lease.granted_at) * 1000
+                self.slo.record(
+                    lease.capability_key, lease.worker.worker_id, duration_ms, outcome.success
+                )
+                self.registry.record_outcome(
+                    lease.capability_key, lease.worker.worker_id, duration_ms, outcome.success
+                )
+                if "idempotency_key" in lease.metadata:
+                    key = lease.metadata["idempotency_key"]
+                    if outcome.success and outcome.result is not None:
+                        await self.idempotency.complete(
+                            key,
+                            lease.metadata["request_hash"],
+                            outcome.result,
+                            worker_id=lease.worker.worker_id,
+                            capability=lease.capability_key,
+                        )
+                    else:
+                        self.idempotency.abandon(key)  # A retry runs it again
+            return JSONResponse(
+                content={"released": lease is not None, "lease_id": lease_id},
+                status_code=200 if lease is not None else 404,
+            )
+
+        self.app.post("/release/{lease_id}")(release_lease)
+
         # Introspection endpoints
         async def get_capabilities() -> JSONResponse:
             """Get all registered capabilities."""
@@ -331,6 +615,158 @@ class ControllerService:
 
         self.app.get("/workers")(get_workers)
 
+        async def get_admission() -> JSONResponse:
+            """Per-capability outstanding, queued and shed request counts."""
+            return JSONResponse(content={"capabilities": self.admission.stats()}, status_code=200)
+
+        self.app.get("/admission")(get_admission)
+
+        async def get_idempotency() -> JSONResponse:
+            """Idempotency cache size and hit/miss counts."""
+            return JSONResponse(content=self.idempotency.stats(), status_code=200)
+
+        self.app.get("/idempotency")(get_idempotency)
+
+        async def get_hedging() -> JSONResponse:
+            """Per-capability hedge delay, hedge rate and hedge wins."""
+            return JSONResponse(content={"capabilities": self.hedger.stats()}, status_code=200)
+
+        self.app.get("/hedging")(get_hedging)
+
+        async def get_breakers() -> JSONResponse:
+            """Circuit breaker state and ejection history per worker."""
+            return JSONResponse(content={"workers": self.outliers.report()}, status_code=200)
+
+        self.app.get("/breakers")(get_breakers)
+
+        async def get_slo() -> JSONResponse:
+            """Latency percentiles and error-budget burn rates per capability."""
+            return JSONResponse(content={"capabilities": self.slo.report()}, status_code=200)
+
+        self.app.get("/slo")(get_slo)
+
+        async def get_slo_metrics() -> PlainTextResponse:
+            """SLO series in Prometheus text exposition format."""
+            return PlainTextResponse(
+                self.slo.prometheus(), media_type="text/plain; version=0.0.4"
+            )
+
+        self.app.get("/slo/metrics")(get_slo_metrics)
+
+        async def get_metrics() -> Response:
+            """Prometheus scrape endpoint: runtime series followed by the SLO series."""
+            return Response(
+                self.metrics.render() + self.slo.prometheus(), media_type=CONTENT_TYPE
+            )
+
+        self.app.get("/metrics")(get_metrics)
+
+        # Admin-only profiling (crank.worker_runtime.debug)
+        self.app.get("/debug/profile", dependencies=[Depends(self.admin)])(self.profiler.profile)
+
+        # Replication (crank.controller.replication)
+        async def get_replication() -> JSONResponse:
+            """Replica identity, change-log position and per-peer sync state."""
+            return JSONResponse(
+                content={
+                    "controller_id": self.registry.controller_id,
+                    "epoch": self.registry.replica.epoch,
+                    "seq": self.registry.replica.seq,
+                    "root": f"{self.registry.replica.tree.root:016x}",
+                    **self.replicator.report(),
+                },
+                status_code=200,
+            )
+
+        self.app.get("/replication")(get_replication)
+
+        # Peer-only: the dependency refuses callers without a peer controller certificate
+        peer_only = [Depends(self.peer_auth)]
+
+        async def get_changes(
+            since: int = 0, epoch: Optional[str] = None, origin: Optional[str] = None
+        ) -> JSONResponse:
+            """Registry entries changed since a peer's last pull."""
+            return JSONResponse(
+                content=self.registry.export_changes(epoch, since, origin), status_code=200
+            )
+
+        self.app.get("/replication/changes", dependencies=peer_only)(get_changes)
+
+        async def post_digests(request: DigestsRequest) -> JSONResponse:
+            """Merkle digests of registry tree nodes, for anti-entropy."""
+            try:
+                digests = self.registry.tree_digests(request.level, request.indices)
+            except ValueError as e:
+                raise HTTPException(status_code=422, detail=str(e)) from e
+            return JSONResponse(content={"digests": digests}, status_code=200)
+
+        self.app.post("/replication/digests", dependencies=peer_only)(post_digests)
+
+        async def post_leaves(request: LeavesRequest) -> JSONResponse:
+            """Registry entries under divergent Merkle leaves, for anti-entropy."""
+            return JSONResponse(
+                content=self.registry.export_leaves(request.leaves), status_code=200
+            )
+
+        self.app.post("/replication/leaves", dependencies=peer_only)(post_leaves)
+
+    # --- Hedging ---
+
+    def _route_hedge(
+        self, primary_lease_id: str, slo_constraints: Optional[dict[str, Any]]
+    ) -> JSONResponse:
+        """Lease a second worker for a duplicate of a slow request."""
+        primary = self.admission.lease(primary_lease_id)
+        if primary is None:
+            raise HTTPException(
+                status_code=404, detail=f"Lease {primary_lease_id} is not outstanding"
+            )
+        if not primary.worker.is_idempotent(primary.capability_key):
+            raise HTTPException(
+                status_code=422,
+                detail=f"{primary.capability_key} is not idempotent and cannot be hedged",
+            )
+        try:
+            lease = self.hedger.hedge(primary, slo_constraints)
+        except ValueError as e:  # Malformed slo_constraints
+            raise HTTPException(status_code=422, detail=str(e)) from e
+        if lease is None:
+            return JSONResponse(
+                content={"detail": f"Hedge declined for {primary.capability_key}"},
+                status_code=429,
+            )
+        response = RouteResponse(
+            worker_id=lease.worker.worker_id,
+            worker_url=lease.worker.worker_url,
+            capability=lease.capability_key,
+            lease_id=lease.lease_id,
+            queued_ms=0.0,
+        )
+        return JSONResponse(content=response.model_dump(), status_code=200)
+
+    # --- Idempotency ---
+
+    def _replay(self, cached: CachedResult) -> JSONResponse:
+        """Response for a request already completed under its Idempotency-Key."""
+        logger.info(
+            "Replaying idempotent request %s (%s, %.0fs old)",
+            cached.idempotency_key,
+            cached.capability,
+            cached.age(),
+        )
+        response = ReplayResponse(
+            worker_id=cached.worker_id,
+            capability=cached.capability,
+            result=cached.result,
+            age_seconds=round(cached.age(), 3),
+        )
+        return JSONResponse(
+            content=response.model_dump(),
+            status_code=200,
+            headers={"X-Idempotent-Replay": "true"},
+        )
+
     # --- Run Method ---
 
     def run(self, host: str = "0.0.0.0", log_level: str = "info") -> None:
@@ -361,6 +797,9 @@ class ControllerService:
             ssl_certfile=ssl_config["ssl_certfile"],
             ssl_keyfile=ssl_config["ssl_keyfile"],
             ssl_ca_certs=ssl_config["ssl_ca_certs"],
+            # Verify client certificates when presented; admin endpoints need one
+            ssl_cert_reqs=ssl.CERT_OPTIONAL,
+            http=tls_http_protocol(),
         )
 
 
@@ -8,7 +8,6 @@ Part of the separation-ready plugin architecture.
 
 import asyncio
 import contextlib
-import io
 import logging
 import os
 import sys
@@ -26,15 +25,18 @@ import numpy as np
 import torch
 import uvicorn
 import yaml
-from fastapi import File, FastAPI, Form, HTTPException, UploadFile
+from fastapi import File, FastAPI, Form, HTTPException, Request, UploadFile
+from fastapi.responses import StreamingResponse
 
 # Import our boundary shims for type safety
 from ml_boundary_shims import (
     CLIPResult,
-    safe_clip_analyze,
+    YOLOResult,
+    safe_clip_zero_shot,
     safe_get_gpu_stats,
     safe_sentence_transformer_encode,
     safe_yolo_detect,
+    safe_yolo_detect_batch,
 )
 from PIL import Image
 from pydantic import BaseModel
@@ -43,6 +45,15 @@ from sentence_transformers import SentenceTransformer
 from ultralytics.models.yolo import YOLO
 
 sys.path.append(str(Path(__file__).parent.parent / "src"))
+from crank.imaging import (
+    BatchImage,
+    BatchInputError,
+    DecodedImage,
+    decode_batch,
+    ndjson_response,
+    read_image_batch,
+    stream_batch_results,
+)
 from gpu_manager import UniversalGPUManager
 
 # Suppress warnings for cleaner output
@@ -54,9 +65,27 @@ logger = logging.getLogger(__name__)
 
 # FastAPI dependency defaults - create at module level to avoid evaluation in defaults
 _DEFAULT_FILE_UPLOAD = File(...)
-DEFAULT_FORM_CLASSIFICATION_TYPES = Form(
-    default="yolo_detection,clip_analysis,advanced_scene_classification"
-)
+DEFAULT_CLASSIFICATION_TYPES = "yolo_detection,clip_analysis,advanced_scene_classification"
+DEFAULT_FORM_CLASSIFICATION_TYPES = Form(default=DEFAULT_CLASSIFICATION_TYPES)
+
+# Batch limits for /classify/batch; chunks of IMAGE_BATCH_SIZE share one forward pass
+MAX_BATCH_IMAGES = int(os.getenv("IMAGE_BATCH_MAX_IMAGES", "256"))
+IMAGE_BATCH_SIZE = int(os.getenv("IMAGE_BATCH_SIZE", "32"))
+
+DEFAULT_CLIP_CATEGORIES = [
+    "a photo of a person",
+    "a photo of a car",
+    "a photo of a cat",
+    "a photo of a dog",
+    "a photo of food",
+    "a photo of nature",
+    "a photo of a building",
+    "a photo of technology",
+    "a photo of art",
+]
+
+# Stages that need CLIP image features (computed once per batch and shared)
+_CLIP_STAGES = frozenset({"clip_analysis", "advanced_scene_classification", "image_embeddings"})
 
 
 # Worker registration model
@@ -102,13 +131,25 @@ class GPUClassificationResponse(BaseModel):
 class GPUImageClassifier:
     """GPU-accelerated computer vision classifier with modern deep learning models."""
 
-    def __init__(self) -> None:
+    def __init__(self, device: Optional[str] = None, batch_size: int = IMAGE_BATCH_SIZE) -> None:
+        """
+        Load models on the GPU.
+
+        Args:
+            device: Explicit torch device (e.g. "cpu" for benchmarks); skips GPU detection
+            batch_size: Images per forward pass in ``classify_batch``
+        """
         self.device: torch.device = None  # type: ignore[assignment]
+        self.batch_size = max(1, batch_size)
         self.yolo_model: Optional[YOLO] = None
         self.clip_model: Optional[Any] = None
         self.clip_preprocess: Optional[Any] = None
         self.sentence_transformer: Optional[SentenceTransformer] = None
-        self._check_gpu_availability()
+        self._text_features: dict[tuple[str, ...], torch.Tensor] = {}
+        if device is None:
+            self._check_gpu_availability()
+        else:
+            self.device = torch.device(device)
         self._initialize_models()
 
     def _check_gpu_availability(self) -> None:
@@ -181,34 +222,29 @@ class GPUImageClassifier:
         # Use safe GPU stats wrapper from boundary shims
         return safe_get_gpu_stats()
 
-    def _load_image(
-        self, image_data: bytes
-    ) -> tuple[np.ndarray[Any, np.dtype[Any]], Image.Image, torch.Tensor]:
-        """Load image from bytes into multiple formats for different models."""
-        # Load with PIL
-        pil_image = Image.open(io.BytesIO(image_data)).convert("RGB")
+    def decode(self, image: "bytes | DecodedImage") -> DecodedImage:
+        """Wrap raw bytes in a shared decode context (no-op if already wrapped)."""
+        if isinstance(image, DecodedImage):
+            return image
+        return DecodedImage(image, self._clip_input)
 
-        # Convert to OpenCV format
-        opencv_image = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR)
-
-        # Convert to PyTorch tensor for CLIP
+    def _clip_input(self, pil_image: Image.Image) -> torch.Tensor:
+        """CLIP-preprocessed batch of one on the model device."""
         if self.clip_preprocess is not None:
-            clip_tensor = self.clip_preprocess(pil_image).unsqueeze(0).to(self.device)
-        else:
-            # Fallback if clip preprocessing not available
-            clip_tensor = torch.zeros((1, 3, 224, 224), device=self.device)  # type: ignore[call-overload]
-
-        return opencv_image, pil_image, clip_tensor
+            tensor: torch.Tensor = self.clip_preprocess(pil_image).unsqueeze(0).to(self.device)
+            return tensor
+        # Fallback if clip preprocessing not available
+        return torch.zeros((1, 3, 224, 224), device=self.device)  # type: ignore[call-overload]
 
     @torch.no_grad()  # type: ignore[misc]
     def yolo_object_detection(
-        self, image_data: bytes, confidence: float = 0.5
+        self, image: "bytes | DecodedImage", confidence: float = 0.5
     ) -> tuple[str, float, dict[str, Any]]:
         """Advanced object detection using YOLOv8."""
         if self.yolo_model is None:
             return "model_not_loaded", 0.0, {"error": "YOLO model not initialized"}
 
-        opencv_image, _pil_image, _ = self._load_image(image_data)
+        opencv_image = self.decode(image).use("bgr")
 
         # Use safe YOLO detection wrapper from boundary shims
         result = safe_yolo_detect(self.yolo_model, opencv_image, confidence)
@@ -225,7 +261,7 @@ class GPUImageClassifier:
 
     @torch.no_grad()  # type: ignore[misc]
     def clip_image_analysis(
-        self, image_data: bytes, custom_categories: Optional[list[str]] = None
+        self, image: "bytes | DecodedImage", custom_categories: Optional[list[str]] = None
     ) -> CLIPResult:
         """Analyze image using CLIP zero-shot classification with safe wrapper."""
         try:
@@ -234,27 +270,8 @@ class GPUImageClassifier:
                     prediction="clip_not_loaded", confidence=0.0, scores=[], model="CLIP"
                 )
 
-            _, pil_image, _ = self._load_image(image_data)
-
-            categories = custom_categories or [
-                "a photo of a person",
-                "a photo of a car",
-                "a photo of a cat",
-                "a photo of a dog",
-                "a photo of food",
-                "a photo of nature",
-                "a photo of a building",
-                "a photo of technology",
-                "a photo of art",
-            ]
-
-            return safe_clip_analyze(
-                model=self.clip_model,
-                processor=self.clip_preprocess,
-                image=pil_image,
-                text_categories=categories,
-                device=str(self.device),
-            )
+            features = self.encode_clip_images([self.decode(image)])
+            return self.clip_zero_shot(features, custom_categories)[0]
 
         except Exception as e:
             logger.error(f"CLIP analysis error: {e}")
@@ -263,13 +280,45 @@ class GPUImageClassifier:
             )
 
     @torch.no_grad()  # type: ignore[misc]
-    def advanced_scene_classification(self, image_data: bytes) -> tuple[str, float, dict[str, Any]]:
-        """Advanced scene classification combining multiple signals."""
+    def encode_clip_images(self, images: list[DecodedImage]) -> torch.Tensor:
+        """Encode images in a single CLIP forward pass; rows are L2-normalised."""
+        if self.clip_model is None:
+            raise RuntimeError("CLIP model not initialized")
+        batch = torch.cat([image.use("model_input") for image in images]).to(self.device)
+        features: torch.Tensor = self.clip_model.encode_image(batch)
+        normalised: torch.Tensor = features / features.norm(dim=-1, keepdim=True)
+        return normalised
+
+    @torch.no_grad()  # type: ignore[misc]
+    def clip_zero_shot(
+        self, image_features: torch.Tensor, categories: Optional[list[str]] = None
+    ) -> list[CLIPResult]:
+        """Zero-shot classify encoded images; category text features are cached."""
+        labels = tuple(categories or DEFAULT_CLIP_CATEGORIES)
+        text_features = self._text_features.get(labels)
+        if text_features is None and self.clip_model is not None:
+            tokens = clip.tokenize(list(labels)).to(self.device)
+            encoded = self.clip_model.encode_text(tokens)
+            text_features = encoded / encoded.norm(dim=-1, keepdim=True)
+            self._text_features[labels] = text_features
+        return safe_clip_zero_shot(image_features, text_features, list(labels))
+
+    @torch.no_grad()  # type: ignore[misc]
+    def advanced_scene_classification(
+        self, image: "bytes | DecodedImage", clip_result: Optional[CLIPResult] = None
+    ) -> tuple[str, float, dict[str, Any]]:
+        """Advanced scene classification combining multiple signals.
+
+        Pass ``clip_result`` when CLIP analysis was already run for this image
+        (e.g. batched) to avoid a second forward pass.
+        """
         try:
-            opencv_image, _pil_image, _clip_tensor = self._load_image(image_data)
+            decoded = self.decode(image)
+            opencv_image = decoded.use("bgr")
 
-            # Get CLIP analysis
-            clip_result = self.clip_image_analysis(image_data)
+            # Get CLIP analysis (shares the decoded image)
+            if clip_result is None:
+                clip_result = self.clip_image_analysis(decoded)
             clip_prediction = clip_result["prediction"]
             clip_conf = clip_result["confidence"]
 
@@ -287,8 +336,8 @@ class GPUImageClassifier:
             blue_ratio = blue_pixels / total_pixels
             green_ratio = green_pixels / total_pixels
 
-            # Texture analysis
-            gray = cv2.cvtColor(opencv_image, cv2.COLOR_BGR2GRAY)
+            # Texture analysis (RGB source avoids copying the strided BGR view)
+            gray = cv2.cvtColor(decoded.use("rgb"), cv2.COLOR_RGB2GRAY)
             edges = cv2.Canny(gray, 50, 150)
             edge_density = np.sum(edges > 0) / edges.size
 
@@ -327,27 +376,35 @@ class GPUImageClassifier:
             return enhanced_scene, enhanced_confidence, details
 
     @torch.no_grad()  # type: ignore[misc]
-    def generate_image_embeddings(self, image_data: bytes) -> tuple[str, float, dict[str, Any]]:
-        """Generate image embeddings for similarity search."""
+    def generate_image_embeddings(
+        self,
+        image: "bytes | DecodedImage",
+        clip_features: Optional[torch.Tensor] = None,
+        st_embedding: Optional[np.ndarray[Any, np.dtype[Any]]] = None,
+    ) -> tuple[str, float, dict[str, Any]]:
+        """Generate image embeddings for similarity search.
+
+        ``clip_features`` (one normalised row) and ``st_embedding`` may be
+        supplied when they were already computed for a whole batch.
+        """
         try:
-            _, pil_image, clip_tensor = self._load_image(image_data)
+            decoded = self.decode(image)
 
             # Generate CLIP embeddings
-            with torch.no_grad():
-                if self.clip_model is not None:
-                    image_features = self.clip_model.encode_image(clip_tensor)
-                    normalized_features = image_features / image_features.norm(dim=-1, keepdim=True)
-                    embeddings: list[float] = normalized_features.cpu().numpy()[0].tolist()
-                else:
-                    embeddings = []
+            if clip_features is None and self.clip_model is not None:
+                clip_features = self.encode_clip_images([decoded])[0]
+            embeddings: list[float] = (
+                clip_features.float().cpu().numpy().reshape(-1).tolist()
+                if clip_features is not None
+                else []
+            )
 
             # Also generate sentence transformer embeddings with safe wrapper
-            if self.sentence_transformer is not None:
-                st_embeddings: np.ndarray[Any, np.dtype[Any]] = safe_sentence_transformer_encode(
-                    model=self.sentence_transformer, inputs=[pil_image]
-                )
-            else:
-                st_embeddings = np.array([], dtype=np.float32)
+            if st_embedding is None and self.sentence_transformer is not None:
+                st_embedding = safe_sentence_transformer_encode(
+                    model=self.sentence_transformer, inputs=[decoded.use("pil")]
+                )[0]
+            st_values: list[float] = [] if st_embedding is None else st_embedding.tolist()
 
         except Exception as e:
             logger.exception("Embedding generation error")
@@ -355,16 +412,120 @@ class GPUImageClassifier:
         else:
             details: dict[str, Any] = {
                 "clip_embeddings": embeddings,
-                "sentence_transformer_embeddings": st_embeddings[0].tolist(),
+                "sentence_transformer_embeddings": st_values,
                 "embedding_dimensions": {
                     "clip": len(embeddings),
-                    "sentence_transformer": len(st_embeddings[0]),
+                    "sentence_transformer": len(st_values),
                 },
                 "similarity_ready": True,
             }
 
             return "embeddings_generated", 0.95, details
 
+    def classify_batch(
+        self,
+        images: list[DecodedImage],
+        classification_types: list[str],
+        confidence: float = 0.5,
+    ) -> list[list[GPUImageClassificationResult]]:
+        """
+        Classify many images with one model call per stage per chunk.
+
+        Images are processed in chunks of ``batch_size``: CLIP tensors are
+        stacked into a single forward pass whose features feed zero-shot
+        analysis, scene fusion and embeddings; YOLO and the sentence
+        transformer each receive the whole chunk as a list.
+
+        Returns:
+            Per-image result lists, aligned with ``images``
+        """
+        results: list[list[GPUImageClassificationResult]] = []
+        for start in range(0, len(images), self.batch_size):
+            chunk = images[start : start + self.batch_size]
+            results.extend(self._classify_chunk(chunk, classification_types, confidence))
+        return results
+
+    @torch.no_grad()  # type: ignore[misc]
+    def _classify_chunk(
+        self, chunk: list[DecodedImage], types: list[str], confidence: float
+    ) -> list[list[GPUImageClassificationResult]]:
+        wanted = set(types)
+
+        clip_features: Optional[torch.Tensor] = None
+        clip_results: list[CLIPResult] = []
+        if wanted & _CLIP_STAGES and self.clip_model is not None:
+            try:
+                clip_features = self.encode_clip_images(chunk)
+                clip_results = self.clip_zero_shot(clip_features)
+            except Exception:
+                logger.exception("Batched CLIP encoding failed")
+        if len(clip_results) != len(chunk):
+            failed = CLIPResult(
+                prediction="clip_analysis_failed", confidence=0.0, scores=[], model="CLIP"
+            )
+            clip_results = [failed] * len(chunk)
+
+        yolo_results: list[YOLOResult] = []
+        if "yolo_detection" in wanted and self.yolo_model is not None:
+            yolo_results = safe_yolo_detect_batch(
+                self.yolo_model, [image.use("bgr") for image in chunk], confidence
+            )
+
+        st_embeddings: Optional[np.ndarray[Any, np.dtype[Any]]] = None
+        if "image_embeddings" in wanted and self.sentence_transformer is not None:
+            st_embeddings = safe_sentence_transformer_encode(
+                model=self.sentence_transformer, inputs=[image.use("pil") for image in chunk]
+            )
+            if len(st_embeddings) != len(chunk):
+                st_embeddings = None
+
+        outputs: list[list[GPUImageClassificationResult]] = []
+        for i, image in enumerate(chunk):
+            image_results: list[GPUImageClassificationResult] = []
+            for class_type in types:
+                if class_type == "yolo_detection":
+                    if yolo_results:
+                        yolo = yolo_results[i]
+                        prediction, score = yolo["prediction"], yolo["confidence"]
+                        details: dict[str, Any] = {
+                            "detections": yolo["detections"],
+                            "model": yolo["model"],
+                            "total_objects": yolo["total_objects"],
+                        }
+                    else:
+                        prediction, score = "model_not_loaded", 0.0
+                        details = {"error": "YOLO model not initialized"}
+                    kind = "yolo_object_detection"
+                elif class_type == "clip_analysis":
+                    clip_result = clip_results[i]
+                    prediction, score = clip_result["prediction"], clip_result["confidence"]
+                    details = dict(clip_result)
+                    kind = "clip_image_understanding"
+                elif class_type == "advanced_scene_classification":
+                    prediction, score, details = self.advanced_scene_classification(
+                        image, clip_results[i]
+                    )
+                    kind = "advanced_scene_analysis"
+                elif class_type == "image_embeddings":
+                    prediction, score, details = self.generate_image_embeddings(
+                        image,
+                        clip_features[i] if clip_features is not None else None,
+                        st_embeddings[i] if st_embeddings is not None else None,
+                    )
+                    kind = "image_embeddings"
+                else:
+                    continue
+                image_results.append(
+                    GPUImageClassificationResult(
+                        classification_type=kind,
+                        prediction=prediction,
+                        confidence=score,
+                        details=details,
+                    )
+                )
+            outputs.append(image_results)
+        return outputs
+
 
 class CrankGPUImageClassifier:
     """Crank GPU Image Classifier Service that registers with platform."""
@@ -407,6 +568,10 @@ class CrankGPUImageClassifier:
         self.platform_auth_token = os.getenv("PLATFORM_AUTH_TOKEN", "dev-mesh-key")
         self.heartbeat_task: Optional[asyncio.Task[None]] = None
 
+        # Embeddings are forwarded to the vector index worker (if configured)
+        self.vector_index_url = os.getenv("VECTOR_INDEX_URL")
+        self._background_tasks: set[asyncio.Task[None]] = set()
+
         # Certificate file paths for mTLS - initialize from standard paths
         cert_dir = Path("/etc/certs")
         self.cert_file = cert_dir / "platform.crt" if (cert_dir / "platform.crt").exists() else None
@@ -465,8 +630,9 @@ class CrankGPUImageClassifier:
                 # Validate file type
                 validate_image_file(file)
 
-                # Read image data
+                # Read image data; decoded once and shared by every stage below
                 image_data = await file.read()
+                decoded = self.classifier.decode(image_data)
 
                 # Generate image ID
                 image_id = f"gpu-image-{uuid4().hex[:8]}"
@@ -480,7 +646,7 @@ class CrankGPUImageClassifier:
                 for class_type in types:
                     if class_type == "yolo_detection":
                         prediction, confidence, details = self.classifier.yolo_object_detection(
-                            image_data
+                            decoded
                         )
                         results.append(
                             GPUImageClassificationResult(
@@ -492,7 +658,7 @@ class CrankGPUImageClassifier:
                         )
 
                     elif class_type == "clip_analysis":
-                        clip_result = self.classifier.clip_image_analysis(image_data)
+                        clip_result = self.classifier.clip_image_analysis(decoded)
                         results.append(
                             GPUImageClassificationResult(
                                 classification_type="clip_image_understanding",
@@ -504,7 +670,7 @@ class CrankGPUImageClassifier:
 
                     elif class_type == "advanced_scene_classification":
                         prediction, confidence, details = (
-                            self.classifier.advanced_scene_classification(image_data)
+                            self.classifier.advanced_scene_classification(decoded)
                         )
                         results.append(
                             GPUImageClassificationResult(
@@ -517,8 +683,10 @@ class CrankGPUImageClassifier:
 
                     elif class_type == "image_embeddings":
                         prediction, confidence, details = self.classifier.generate_image_embeddings(
-                            image_data
+                            decoded
                         )
+                        if prediction == "embeddings_generated":
+                            self._schedule_embedding_upload(image_id, details)
                         results.append(
                             GPUImageClassificationResult(
                                 classification_type="image_embeddings",
@@ -540,6 +708,7 @@ class CrankGPUImageClassifier:
                         "image_size": len(image_data),
                         "image_format": file.content_type,
                         "classification_count": len(results),
+                        "image_decode": decoded.stats(),
                         "worker_id": self.worker_id,
                         "gpu_accelerated": True,
                     },
@@ -550,6 +719,35 @@ class CrankGPUImageClassifier:
                 logger.exception("GPU image classification error")
                 raise HTTPException(status_code=500, detail=str(e)) from e
 
+        @self.app.post("/classify/batch", response_model=None)
+        async def classify_image_batch_gpu(  # type: ignore[misc]
+            request: Request,
+            classification_types: str = DEFAULT_CLASSIFICATION_TYPES,
+            confidence: float = 0.5,
+        ) -> StreamingResponse:
+            """
+            Classify many images in batched forward passes.
+
+            Accepts multipart (any number of file parts) or a tar stream
+            (``Content-Type: application/x-tar``, gzip allowed). Options are
+            query parameters. Streams one NDJSON line per image, in input
+            order, as each chunk of ``IMAGE_BATCH_SIZE`` images completes.
+            """
+            try:
+                images = await read_image_batch(request, max_images=MAX_BATCH_IMAGES)
+            except BatchInputError as e:
+                raise HTTPException(status_code=e.status_code, detail=str(e)) from e
+
+            types = [t.strip() for t in classification_types.split(",") if t.strip()]
+            forms = _decode_forms(types)
+
+            def prepare(data: bytes) -> DecodedImage:
+                return self.classifier.decode(data).prepare(forms)
+
+            # Decode (and CLIP-preprocess) every image in the thread pool up front
+            decoded = await decode_batch(images, prepare)
+            return ndjson_response(self._stream_batch_results(images, decoded, types, confidence))
+
         @self.app.get("/plugin")
         async def get_plugin_metadata() -> dict[str, Any]:  # type: ignore[misc]
             """Get plugin metadata for platform integration."""
@@ -681,6 +879,63 @@ class CrankGPUImageClassifier:
         except Exception as e:
             logger.warning("Heartbeat failed: %s", e)
 
+    async def _stream_batch_results(
+        self,
+        images: list[BatchImage],
+        decoded: list["DecodedImage | Exception"],
+        types: list[str],
+        confidence: float,
+    ) -> AsyncGenerator[dict[str, Any], None]:
+        """Run inference chunk by chunk off the event loop, yielding per-image records."""
+
+        def classify(chunk: list[DecodedImage]) -> list[list[dict[str, Any]]]:
+            results = self.classifier.classify_batch(chunk, types, confidence)
+            return [[result.model_dump() for result in image_results] for image_results in results]
+
+        records = stream_batch_results(
+            images,
+            decoded,
+            classify,
+            self.classifier.batch_size,
+            describe=lambda item: {"image_decode": item.stats()},
+            id_prefix="gpu-image",
+        )
+        async for record in records:
+            for result in record.get("results", []):
+                if result["prediction"] == "embeddings_generated" and result["details"]:
+                    self._schedule_embedding_upload(record["image_id"], result["details"])
+            yield record
+
+    def _schedule_embedding_upload(self, image_id: str, details: dict[str, Any]) -> None:
+        """Index embeddings in the background so classification latency is unaffected."""
+        if not self.vector_index_url:
+            return
+        task = asyncio.create_task(self._upload_embeddings(image_id, details))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _upload_embeddings(self, image_id: str, details: dict[str, Any]) -> None:
+        """Send CLIP and sentence-transformer vectors to the vector index worker."""
+        namespaces = {
+            "image.clip": details.get("clip_embeddings"),
+            "image.sentence-transformer": details.get("sentence_transformer_embeddings"),
+        }
+        try:
+            async with self._create_mtls_client() as client:
+                for namespace, vector in namespaces.items():
+                    if not vector:
+                        continue
+                    response = await client.post(
+                        f"{self.vector_index_url}/vectors/upsert",
+                        json={
+                            "namespace": namespace,
+                            "items": [{"key": image_id, "vector": vector}],
+                        },
+                    )
+                    response.raise_for_status()
+        except Exception as e:
+            logger.warning("Failed to index embeddings for %s: %s", image_id, e)
+
     async def _shutdown(self) -> None:
         """Shutdown handler - deregister from platform."""
         if self.worker_id:
@@ -692,6 +947,16 @@ class CrankGPUImageClassifier:
                 logger.warning("Failed to deregister from platform: %s", e)
 
 
+def _decode_forms(classification_types: list[str]) -> tuple[str, ...]:
+    """Image forms the requested stages need, so they can be derived in the thread pool."""
+    forms = ["pil"]
+    if {"yolo_detection", "advanced_scene_classification"} & set(classification_types):
+        forms.extend(["rgb", "bgr"])
+    if _CLIP_STAGES & set(classification_types):
+        forms.append("model_input")
+    return tuple(forms)
+
+
 def create_crank_gpu_image_classifier(platform_url: Optional[str] = None) -> FastAPI:
     """Create Crank GPU Image Classifier application."""
     classifier = CrankGPUImageClassifier(platform_url)
@@ -14,6 +14,7 @@ non-negotiable while providing standardized mesh patterns.
 Now includes MCP (Model Context Protocol) integration for AI agent access.
 """
 
+import asyncio
 import hashlib
 import json
 import time
@@ -24,9 +25,21 @@ from uuid import uuid4
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
+
+from crank.protocols.codecs import (
+    CANONICAL_CODEC,
+    Codec,
+    CodecError,
+    EncodedPayload,
+    encode_envelope,
+    encoded_response,
+    negotiate,
+    openapi_request_body,
+    read_payload,
+)
 
 
 # Security-First Crank Mesh Models
@@ -162,8 +175,16 @@ class CrankMeshReceiptSystem:
         response: CrankMeshResponse,
         start_time: float,
         auth_context: Optional[dict[str, Any]] = None,
+        *,
+        input_payload: Optional[EncodedPayload] = None,
+        output_payload: Optional[EncodedPayload] = None,
     ) -> CrankMeshReceipt:
-        """Generate verifiable receipt for any mesh operation."""
+        """Generate verifiable receipt for any mesh operation.
+
+        ``input_payload``/``output_payload`` carry encodings of
+        ``request.input_data``/``response.result`` that are also sent on the
+        wire, so hashing reuses them instead of serializing again.
+        """
         processing_time_ms = int((time.time() - start_time) * 1000)
 
         # Generate unique receipt ID
@@ -182,8 +203,8 @@ class CrankMeshReceiptSystem:
             service_type=service_type,
             operation=operation,
             timestamp=datetime.now(timezone.utc).isoformat(),
-            input_hash=self._hash_request(request),
-            output_hash=self._hash_response(response),
+            input_hash=self._hash_request(request, input_payload),
+            output_hash=self._hash_response(response, output_payload),
             processing_time_ms=processing_time_ms,
             policy_profile=getattr(request, "policy_profile", "default"),
             mesh_node_id=self.node_id,
@@ -196,19 +217,25 @@ class CrankMeshReceiptSystem:
         receipt.signature = self._sign_receipt(receipt)
         return receipt
 
-    def _hash_request(self, request: CrankMeshRequest) -> str:
-        """Generate hash of request for receipt."""
-        request_dict = request.model_dump()
-        request_json = json.dumps(request_dict, sort_keys=True)
-        return hashlib.sha256(request_json.encode()).hexdigest()[:16]
+    def _hash_request(
+        self, request: CrankMeshRequest, input_payload: Optional[EncodedPayload] = None
+    ) -> str:
+        """Generate hash of request (canonical encoding) for receipt."""
+        input_payload = input_payload or EncodedPayload(request.input_data)
+        request_bytes = encode_envelope(
+            CANONICAL_CODEC,
+            request.model_dump(exclude={"input_data"}),
+            {"input_data": input_payload},
+        )
+        return hashlib.sha256(request_bytes).hexdigest()[:16]
 
-    def _hash_response(self, response: CrankMeshResponse) -> str:
-        """Generate hash of response for receipt."""
+    def _hash_response(
+        self, response: CrankMeshResponse, output_payload: Optional[EncodedPayload] = None
+    ) -> str:
+        """Generate hash of response result (canonical encoding) for receipt."""
         if not response.result:
             return "no-result"
-
-        result_json = json.dumps(response.result, sort_keys=True)
-        return hashlib.sha256(result_json.encode()).hexdigest()[:16]
+        return (output_payload or EncodedPayload(response.result)).digest[:16]
 
     def _sign_receipt(self, receipt: CrankMeshReceipt) -> str:
         """Sign receipt (cryptographic hash)."""
@@ -247,12 +274,35 @@ class CrankMeshInterface(ABC):
     ) -> CrankMeshResponse:
         """Process a mesh request with mandatory security context."""
 
+    async def process_batch(
+        self,
+        requests: list[CrankMeshRequest],
+        auth_context: dict[str, Any],
+    ) -> list[CrankMeshResponse]:
+        """
+        Process several requests for the same operation in one call.
+
+        Protocol gateways that coalesce calls (GraphQL) hand a whole batch to
+        the service. The default runs ``process_request`` for each request
+        concurrently; services with a vectorized path (one model forward pass,
+        one database query) override this. Returns one response per request,
+        in order.
+        """
+        return list(
+            await asyncio.gather(
+                *(self.process_request(request, auth_context) for request in requests)
+            )
+        )
+
     def generate_receipt(
         self,
         request: CrankMeshRequest,
         response: CrankMeshResponse,
         auth_context: dict[str, Any],
         start_time: Optional[float] = None,
+        *,
+        input_payload: Optional[EncodedPayload] = None,
+        output_payload: Optional[EncodedPayload] = None,
     ) -> CrankMeshReceipt:
         """Generate mandatory audit receipt for all operations."""
         start_time = start_time or time.time()
@@ -263,7 +313,14 @@ class CrankMeshInterface(ABC):
         response.operation = response.operation or request.operation
         response.mesh_node_id = response.mesh_node_id or self.node_id
 
-        return self.receipt_system.generate_receipt(request, response, start_time, auth_context)
+        return self.receipt_system.generate_receipt(
+            request,
+            response,
+            start_time,
+            auth_context,
+            input_payload=input_payload,
+            output_payload=output_payload,
+        )
 
     def create_app(self, api_key: str = "dev-mesh-key") -> FastAPI:
         """
@@ -343,50 +400,94 @@ class CrankMeshInterface(ABC):
             return self.get_capabilities()
 
         # Main processing endpoint
-        @app.post("/v1/process", response_model=CrankMeshResponse)
-        async def process_request_endpoint(
-            request: CrankMeshRequest, http_request: Optional[Request] = None
-        ):
-            """Process request through Crank Mesh Interface."""
+        @app.post(
+            "/v1/process",
+            response_model=CrankMeshResponse,
+            openapi_extra=openapi_request_body(CrankMeshRequest.model_json_schema()),
+        )
+        async def process_request_endpoint(http_request: Request) -> Response:
+            """Process request through Crank Mesh Interface.
+
+            The body may be JSON, MessagePack or CBOR (``Content-Type``); the
+            response uses the codec selected by ``Accept``, defaulting to the
+            request's codec.
+            """
             start_time = time.time()
 
+            try:
+                body, request_codec = await read_payload(http_request)
+                codec = negotiate(http_request.headers.get("accept"), default=request_codec)
+            except CodecError as e:
+                return JSONResponse(status_code=e.status_code, content={"error": str(e)})
+            try:
+                request = CrankMeshRequest.model_validate(body)
+            except ValidationError as e:
+                detail = {"detail": e.errors(include_url=False)}
+                return encoded_response(codec.encode(detail), codec, status_code=422)
+
             # Extract auth context from HTTP request
             auth_context = {
                 "user_id": "authenticated_user",  # Would extract from JWT in production
                 "permissions": ["read", "write"],  # Would come from auth system
-                "request_ip": http_request.client.host
-                if http_request and http_request.client
-                else "unknown",
+                "request_ip": http_request.client.host if http_request.client else "unknown",
             }
 
             # Validate request
             violations = CrankMeshValidator.validate_request(request)
             if violations:
-                return CrankMeshResponse(
-                    success=False,
-                    errors=violations,
-                    mesh_node_id=self.node_id,
+                return self._encode_response(
+                    CrankMeshResponse(
+                        success=False,
+                        errors=violations,
+                        mesh_node_id=self.node_id,
+                    ),
+                    codec,
                 )
 
             try:
                 # Process the request
                 response = await self.process_request(request, auth_context)
 
-                # Generate audit receipt
-                receipt = self.generate_receipt(request, response, auth_context, start_time)
+                # Generate audit receipt; the result is encoded once for hash and body
+                output_payload = EncodedPayload(response.result)
+                receipt = self.generate_receipt(
+                    request,
+                    response,
+                    auth_context,
+                    start_time,
+                    input_payload=EncodedPayload(request.input_data),
+                    output_payload=output_payload,
+                )
                 response.receipt_id = receipt.receipt_id
 
-                return response
+                return self._encode_response(response, codec, output_payload)
 
             except Exception as e:
-                return CrankMeshResponse(
-                    success=False,
-                    errors=[f"Processing error: {e!s}"],
-                    mesh_node_id=self.node_id,
+                return self._encode_response(
+                    CrankMeshResponse(
+                        success=False,
+                        errors=[f"Processing error: {e!s}"],
+                        mesh_node_id=self.node_id,
+                    ),
+                    codec,
                 )
 
         return app
 
+    def _encode_response(
+        self,
+        response: CrankMeshResponse,
+        codec: Codec,
+        output_payload: Optional[EncodedPayload] = None,
+    ) -> Response:
+        """Encode a mesh response, reusing an already-encoded result."""
+        body = encode_envelope(
+            codec,
+            response.model_dump(mode="json", exclude={"result"}),
+            {"result": output_payload or EncodedPayload(response.result)},
+        )
+        return encoded_response(body, codec)
+
     async def _extract_auth_context(self, request: Request) -> dict[str, Any]:
         """Extract authentication context from request."""
         # Simple implementation - can be enhanced with JWT, etc.
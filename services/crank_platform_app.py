@@ -21,6 +21,7 @@ from crank_platform_service import PlatformService, User, WorkerInfo
 from dependencies import get_platform_service, get_protocol_service
 from fastapi import Depends, FastAPI, Form, Header, HTTPException, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 
 # Import existing diagnostic service
 from mesh_diagnostics_v2 import DiagnosticMeshService
@@ -504,17 +505,25 @@ class CrankPlatformApp:
 
         @self.app.post("/mcp")
         async def mcp_endpoint(
-            request: dict[str, Any],
+            request: dict[str, Any] | list[Any],
             user: Annotated[User, Depends(get_current_user)],
             protocol: Annotated[UniversalProtocolService, Depends(get_protocol_service)],
         ):
-            """MCP (Model Context Protocol) endpoint for AI agents."""
+            """MCP (Model Context Protocol) endpoint for AI agents.
+
+            Accepts a single request or a JSON-RPC batch (array); independent
+            ``tools/call`` requests in a batch run concurrently. Requests that
+            are all notifications get an empty 202.
+            """
             try:
-                return await protocol.handle_protocol_request(
+                result = await protocol.handle_protocol_request(
                     "MCP",
                     request,
                     user,
                 )
+                if result is None:  # Only notifications
+                    return Response(status_code=202)
+                return result
             except Exception as e:
                 return {
                     "error": {
@@ -527,11 +536,14 @@ class CrankPlatformApp:
         async def mcp_list_tools(
             user: Annotated[User, Depends(get_current_user)],
             protocol: Annotated[UniversalProtocolService, Depends(get_protocol_service)],
-        ):
-            """MCP tools discovery endpoint."""
-            # Use the MCP adapter's handle_request method instead of private _list_tools
-            mcp_request = {"method": "tools/list", "params": {}}
-            return await protocol.handle_protocol_request("MCP", mcp_request, user)
+            if_none_match: Annotated[Optional[str], Header()] = None,
+        ) -> Response:
+            """MCP tools discovery endpoint.
+
+            Serves the adapter's cached catalog bytes with an ETag; clients
+            revalidating with ``If-None-Match`` get 304 while it is unchanged.
+            """
+            return protocol.adapters["MCP"].catalog.http_response(if_none_match)
 
         # Future protocol endpoints can be added here:
         # @self.app.post("/grpc") - for gRPC protocol
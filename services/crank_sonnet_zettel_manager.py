@@ -30,6 +30,8 @@ from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 
 from crank.capabilities.schema import CapabilityDefinition, CapabilityVersion, IOContract
+from crank.search import InvertedIndex
+from crank.storage import DurabilityMode, WriteBehindQueue
 from crank.worker_runtime.base import WorkerApplication
 
 logger = logging.getLogger(__name__)
@@ -89,6 +91,13 @@ class ListZettelsRequest(BaseModel):
     offset: int = Field(default=0, ge=0, description="Number of zettels to skip")
 
 
+class SearchZettelsRequest(BaseModel):
+    """Request to search zettels by content."""
+
+    query: str = Field(description="Free-text query matched against title, tags and content")
+    limit: int = Field(default=10, ge=1, le=1000, description="Maximum number of zettels to return")
+
+
 class ZettelOperationResponse(BaseModel):
     """Response from zettel operations."""
 
@@ -136,6 +145,14 @@ SONNET_ZETTEL_MANAGEMENT = CapabilityDefinition(
                         "offset": {"type": "integer"}
                     },
                     "required": ["operation"]
+                },
+                {
+                    "properties": {
+                        "operation": {"type": "string", "enum": ["search"]},
+                        "query": {"type": "string"},
+                        "limit": {"type": "integer"}
+                    },
+                    "required": ["operation", "query"]
                 }
             ]
         },
@@ -161,23 +178,32 @@ SONNET_ZETTEL_MANAGEMENT = CapabilityDefinition(
 class SonnetZettelEngine:
     """Core zettel management logic - no FastAPI dependencies."""
 
-    def __init__(self, storage_path: Path | None = None) -> None:
+    def __init__(
+        self,
+        storage_path: Path | None = None,
+        durability: DurabilityMode = DurabilityMode.GROUP,
+    ) -> None:
         """
         Initialize the zettel management engine.
 
         Args:
             storage_path: Directory for storing zettels (defaults to docs/knowledge/zettels)
+            durability: When zettel writes are acknowledged (see crank.storage)
         """
         self.storage_path = storage_path or Path("docs/knowledge/zettels")
         self.storage_path.mkdir(parents=True, exist_ok=True)
+        # Atomic, batched writes off the event loop
+        self._writer = WriteBehindQueue(durability)
 
         # Simple in-memory index for fast retrieval (would be replaced by proper DB)
         self._zettel_index: dict[str, ZettelContent] = {}
+        # Full-text index shared with the Codex repository (crank.search)
+        self._search_index = InvertedIndex()
         self._load_existing_zettels()
 
         logger.info("Sonnet Zettel Engine initialized with storage at %s", self.storage_path)
 
-    def store_zettel(self, request: StoreZettelRequest) -> ZettelOperationResponse:
+    async def store_zettel(self, request: StoreZettelRequest) -> ZettelOperationResponse:
         """
         Store a new zettel with generated metadata.
 
@@ -215,8 +241,9 @@ class SonnetZettelEngine:
         )
 
         # Store to filesystem and index
-        self._persist_zettel(zettel)
+        await self._persist_zettel(zettel)
         self._zettel_index[zettel_id] = zettel
+        self._search_index.add(zettel_id, self._searchable_text(zettel))
 
         return ZettelOperationResponse(
             success=True,
@@ -280,13 +307,51 @@ class SonnetZettelEngine:
             data=paginated_zettels
         )
 
+    def search_zettels(self, request: SearchZettelsRequest) -> ZettelOperationResponse:
+        """
+        Full-text search over zettel titles, tags and content.
+
+        Args:
+            request: Search request with query text and result limit
+
+        Returns:
+            Operation response with zettels ordered by BM25 relevance
+
+        Raises:
+            ValueError: If the query is empty
+        """
+        if not request.query.strip():
+            raise ValueError("Search query cannot be empty")
+
+        hits = self._search_index.search(request.query, limit=request.limit)
+        matches = [self._zettel_index[hit.doc_key] for hit in hits]
+
+        return ZettelOperationResponse(
+            success=True,
+            zettel_id=None,
+            message=f"Found {len(matches)} zettels matching query",
+            data=matches
+        )
+
+    def _searchable_text(self, zettel: ZettelContent) -> str:
+        """Text fed to the search index (title and tags boost recall)."""
+        return "\n".join([
+            zettel.metadata.title or "",
+            " ".join(zettel.metadata.tags),
+            zettel.content,
+        ])
+
     def _generate_zettel_id(self) -> str:
         """Generate a unique zettel identifier."""
         timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
         unique_suffix = str(uuid.uuid4())[:8]
         return f"sonnet-{timestamp}-{unique_suffix}"
 
-    def _persist_zettel(self, zettel: ZettelContent) -> None:
+    async def close(self) -> None:
+        """Flush pending zettel writes (call on shutdown)."""
+        await self._writer.close()
+
+    async def _persist_zettel(self, zettel: ZettelContent) -> None:
         """Save zettel to filesystem."""
         # Extension point: Could save to different directories based on category
         filename = f"{zettel.metadata.id}.md"
@@ -315,7 +380,7 @@ class SonnetZettelEngine:
             zettel.content
         ])
 
-        filepath.write_text("\n".join(content_lines), encoding="utf-8")
+        await self._writer.write(filepath, "\n".join(content_lines))
 
     def _load_existing_zettels(self) -> None:
         """Load existing zettels from storage into index."""
@@ -352,7 +417,9 @@ class SonnetZettelManagerWorker(WorkerApplication):
             service_name="sonnet-zettel-manager",
             https_port=int(os.getenv("SONNET_ZETTEL_MANAGER_HTTPS_PORT", "8700")),
         )
-        self.engine = SonnetZettelEngine()
+        self.engine = SonnetZettelEngine(
+            durability=DurabilityMode(os.getenv("ZETTEL_DURABILITY", DurabilityMode.GROUP.value)),
+        )
 
         # Controller registration
         self.controller_url = os.getenv("CONTROLLER_URL")
@@ -371,6 +438,11 @@ class SonnetZettelManagerWorker(WorkerApplication):
         if self.controller_url:
             await self._register_with_controller()
 
+    async def on_shutdown(self) -> None:
+        """Flush queued zettel writes before the worker exits."""
+        await self.engine.close()
+        await super().on_shutdown()
+
     async def _register_with_controller(self) -> None:
         """Send registration request to controller."""
         try:
@@ -427,7 +499,7 @@ class SonnetZettelManagerWorker(WorkerApplication):
         async def store_zettel_endpoint(request: StoreZettelRequest) -> JSONResponse:  # pyright: ignore[reportUnusedFunction]
             """Store a new zettel note."""
             try:
-                result = self.engine.store_zettel(request)
+                result = await self.engine.store_zettel(request)
                 return JSONResponse(content=result.model_dump())
 
             except ValueError as e:
@@ -462,10 +534,25 @@ class SonnetZettelManagerWorker(WorkerApplication):
                 logger.exception("Zettel listing failed")
                 raise HTTPException(status_code=500, detail="LISTING_FAILED") from e
 
+        # Search zettels endpoint
+        async def search_zettels_endpoint(request: SearchZettelsRequest) -> JSONResponse:  # pyright: ignore[reportUnusedFunction]
+            """Full-text search across zettels."""
+            try:
+                result = self.engine.search_zettels(request)
+                return JSONResponse(content=result.model_dump(mode="json"))
+
+            except ValueError as e:
+                logger.warning("Invalid zettel search request: %s", e)
+                raise HTTPException(status_code=400, detail=str(e)) from e
+            except Exception as e:
+                logger.exception("Zettel search failed")
+                raise HTTPException(status_code=500, detail="SEARCH_FAILED") from e
+
         # Register routes with explicit binding (avoids Pylance warnings)
         self.app.post("/store")(store_zettel_endpoint)
         self.app.post("/retrieve")(retrieve_zettel_endpoint)
         self.app.post("/list")(list_zettels_endpoint)
+        self.app.post("/search")(search_zettels_endpoint)
 
 
 # Phase D: End-to-End Integration & Main Entry
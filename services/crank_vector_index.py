@@ -0,0 +1,417 @@
+"""
+Vector Index Worker
+
+Nearest-neighbour search over embeddings produced elsewhere in the platform:
+CLIP vectors from the GPU image classifier and text embeddings of zettels.
+
+Features:
+- Namespaced indexes (one embedding space each, e.g. image.clip, zettel.text)
+- Exact float32 top-k via batched matmul, or IVF for very large namespaces
+  (k-means training runs in a worker thread while the namespace keeps
+  serving exact results)
+- Memory-mapped persistence: indexes reopen instantly after a restart
+- Optional text embedding (sentence-transformers) so zettel text can be
+  indexed and queried without a separate embedding service
+
+Extension Points (for future implementation):
+- HNSW graphs for sub-millisecond approximate search
+- Hybrid ranking combined with the BM25 zettel index
+"""
+
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Literal, Optional
+
+import numpy as np
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field, model_validator
+
+from crank.capabilities.schema import VECTOR_SIMILARITY_SEARCH, CapabilityDefinition
+from crank.search import IVFVectorIndex, VectorIndex
+from crank.worker_runtime.base import WorkerApplication
+
+try:
+    from sentence_transformers import SentenceTransformer
+
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Namespaces double as directory names on disk
+_NAMESPACE_PATTERN = re.compile(r"^[a-z0-9][a-z0-9._-]{0,63}$")
+
+# IVF namespaces train once they hold this many vectors per list (FAISS guidance)
+_IVF_POINTS_PER_LIST = 39
+
+
+# Phase A: Schema Definition (Type-Safe Foundation)
+# ================================================
+
+class VectorItem(BaseModel):
+    """Single embedding to index (vector, or text to embed)."""
+
+    key: str = Field(min_length=1, description="Caller identifier (image ID, zettel ID)")
+    vector: Optional[list[float]] = Field(default=None, description="Precomputed embedding")
+    text: Optional[str] = Field(default=None, description="Text to embed when no vector given")
+
+    @model_validator(mode="after")
+    def _require_vector_or_text(self) -> "VectorItem":
+        if self.vector is None and not (self.text and self.text.strip()):
+            raise ValueError("each item needs a vector or non-empty text")
+        return self
+
+
+class UpsertVectorsRequest(BaseModel):
+    """Request model for inserting or replacing embeddings."""
+
+    namespace: str = Field(description="Embedding space (e.g. image.clip)")
+    items: list[VectorItem] = Field(min_length=1, max_length=10000)
+    metric: Literal["cosine", "dot"] = Field(
+        default="cosine", description="Similarity metric (used when the namespace is created)"
+    )
+    index_type: Literal["flat", "ivf"] = Field(
+        default="flat", description="Index kind (used when the namespace is created)"
+    )
+
+
+class QueryVectorsRequest(BaseModel):
+    """Request model for top-k similarity search."""
+
+    namespace: str
+    vector: Optional[list[float]] = None
+    text: Optional[str] = None
+    k: int = Field(default=10, ge=1, le=1000)
+
+    @model_validator(mode="after")
+    def _require_vector_or_text(self) -> "QueryVectorsRequest":
+        if self.vector is None and not (self.text and self.text.strip()):
+            raise ValueError("query needs a vector or non-empty text")
+        return self
+
+
+class DeleteVectorsRequest(BaseModel):
+    """Request model for removing embeddings."""
+
+    namespace: str
+    keys: list[str] = Field(min_length=1)
+
+
+class VectorMatch(BaseModel):
+    """Single similarity result."""
+
+    key: str
+    score: float
+
+
+class QueryVectorsResponse(BaseModel):
+    """Response model matching the vector.similarity_search output schema."""
+
+    namespace: str
+    results: list[VectorMatch]
+    processing_time_ms: float = Field(ge=0.0)
+
+
+# Phase B: Business Logic (Isolated Testing)
+# ===========================================
+
+class VectorIndexEngine:
+    """Namespaced vector indexes with disk persistence - no FastAPI dependencies."""
+
+    def __init__(
+        self,
+        storage_path: Path | None = None,
+        text_model: str = "all-MiniLM-L6-v2",
+        ivf_nlist: int = 1024,
+    ) -> None:
+        """
+        Initialize the engine and reopen any persisted namespaces.
+
+        Args:
+            storage_path: Directory holding one sub-directory per namespace
+            text_model: sentence-transformers model used for text items/queries
+            ivf_nlist: Cluster count for namespaces created with index_type="ivf"
+        """
+        self.storage_path = storage_path or Path("vector_indexes")
+        self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.text_model = text_model
+        self.ivf_nlist = ivf_nlist
+
+        self._indexes: dict[str, VectorIndex] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._dirty: set[str] = set()
+        self._training: dict[str, asyncio.Task[None]] = {}
+        self._embedder: Any = None
+        self._embedder_lock = threading.Lock()
+        self._load_namespaces()
+
+    @property
+    def namespaces(self) -> dict[str, dict[str, Any]]:
+        """Stats for every namespace."""
+        return {name: index.stats() for name, index in sorted(self._indexes.items())}
+
+    async def upsert(self, request: UpsertVectorsRequest) -> dict[str, Any]:
+        """
+        Insert or replace embeddings in a namespace (created on first use).
+
+        Raises:
+            ValueError: On invalid namespace, mixed dimensions or missing embedder
+        """
+        self._validate_namespace(request.namespace)
+        keys = [item.key for item in request.items]
+        vectors = await self._resolve_vectors(
+            [item.vector for item in request.items],
+            [item.text for item in request.items],
+        )
+
+        async with self._lock(request.namespace):
+            index = self._indexes.get(request.namespace)
+            if index is None:
+                index = self._create_index(request, len(vectors[0]))
+            index.add(keys, vectors)
+            self._maybe_train(request.namespace, index)
+            self._dirty.add(request.namespace)
+
+        return {"namespace": request.namespace, "upserted": len(keys), "size": len(index)}
+
+    async def query(self, request: QueryVectorsRequest) -> QueryVectorsResponse:
+        """
+        Return the k nearest keys.
+
+        Embedding a text query and the matmul run in worker threads so
+        neither stalls the event loop; the namespace lock keeps upserts out
+        of the search meanwhile.
+
+        Raises:
+            KeyError: If the namespace does not exist
+            ValueError: On dimension mismatch or missing embedder
+        """
+        start_time = time.perf_counter()
+        index = self._indexes.get(request.namespace)
+        if index is None:
+            raise KeyError(request.namespace)
+
+        query_vector = (await self._resolve_vectors([request.vector], [request.text]))[0]
+        async with self._lock(request.namespace):
+            hits = (await asyncio.to_thread(index.search, query_vector, request.k))[0]
+
+        return QueryVectorsResponse(
+            namespace=request.namespace,
+            results=[VectorMatch(key=hit.key, score=hit.score) for hit in hits],
+            processing_time_ms=(time.perf_counter() - start_time) * 1000,
+        )
+
+    async def delete(self, request: DeleteVectorsRequest) -> dict[str, Any]:
+        """Remove keys from a namespace; unknown keys are ignored."""
+        index = self._indexes.get(request.namespace)
+        if index is None:
+            raise KeyError(request.namespace)
+
+        async with self._lock(request.namespace):
+            removed = sum(1 for key in request.keys if index.remove(key))
+            if removed:
+                self._dirty.add(request.namespace)
+        return {"namespace": request.namespace, "removed": removed, "size": len(index)}
+
+    async def save(self) -> list[str]:
+        """Persist every namespace changed since the last save."""
+        saved: list[str] = []
+        for namespace in sorted(self._dirty):
+            async with self._lock(namespace):
+                index = self._indexes[namespace]
+                await asyncio.to_thread(index.save, self.storage_path / namespace)
+            saved.append(namespace)
+        self._dirty.difference_update(saved)
+        if saved:
+            logger.info("Saved vector namespaces: %s", ", ".join(saved))
+        return saved
+
+    def _create_index(self, request: UpsertVectorsRequest, dimension: int) -> VectorIndex:
+        index: VectorIndex
+        if request.index_type == "ivf":
+            index = IVFVectorIndex(dimension, metric=request.metric, nlist=self.ivf_nlist)
+        else:
+            index = VectorIndex(dimension, metric=request.metric)
+        self._indexes[request.namespace] = index
+        logger.info(
+            "Created %s vector namespace %s (dimension %d)",
+            request.index_type, request.namespace, dimension,
+        )
+        return index
+
+    def _maybe_train(self, namespace: str, index: VectorIndex) -> None:
+        if (
+            isinstance(index, IVFVectorIndex)
+            and not index.is_trained
+            and namespace not in self._training
+            and len(index) >= index.nlist * _IVF_POINTS_PER_LIST
+        ):
+            self._training[namespace] = asyncio.create_task(self._train(namespace, index))
+
+    async def _train(self, namespace: str, index: IVFVectorIndex) -> None:
+        """
+        Train an IVF namespace off the event loop.
+
+        k-means runs on a snapshot without holding the namespace lock, so
+        queries (still exact) and upserts go on meanwhile. The lock is only
+        taken to copy the snapshot and to assign every vector, including
+        those upserted during training, before IVF search switches on.
+        """
+        start_time = time.perf_counter()
+        try:
+            async with self._lock(namespace):
+                sample = await asyncio.to_thread(np.array, index.vectors)
+            centroids = await asyncio.to_thread(index.fit_centroids, sample)
+            async with self._lock(namespace):
+                await asyncio.to_thread(index.set_centroids, centroids)
+                self._dirty.add(namespace)
+            logger.info(
+                "Trained IVF namespace %s (%d vectors) in %.1fs",
+                namespace, len(index), time.perf_counter() - start_time,
+            )
+        except Exception:
+            logger.exception("IVF training failed for namespace %s", namespace)
+        finally:
+            del self._training[namespace]
+
+    async def wait_for_training(self) -> None:
+        """Wait for in-flight IVF training (e.g. before a final save)."""
+        await asyncio.gather(*self._training.values())
+
+    async def _resolve_vectors(
+        self, vectors: list[Optional[list[float]]], texts: list[Optional[str]]
+    ) -> list[list[float]]:
+        """Fill in missing vectors by embedding their text (batched, in a worker thread)."""
+        missing = [position for position, vector in enumerate(vectors) if vector is None]
+        resolved: list[list[float]] = [vector or [] for vector in vectors]
+        if missing:
+            embedded = await asyncio.to_thread(
+                self._embed_texts, [texts[position] or "" for position in missing]
+            )
+            for position, vector in zip(missing, embedded):
+                resolved[position] = vector
+
+        if len({len(vector) for vector in resolved}) != 1:
+            raise ValueError("all vectors in a request must have the same dimension")
+        return resolved
+
+    def _embed_texts(self, texts: list[str]) -> list[list[float]]:
+        if not SENTENCE_TRANSFORMERS_AVAILABLE:
+            raise ValueError("EMBEDDER_UNAVAILABLE: install sentence-transformers or send vectors")
+        with self._embedder_lock:  # Concurrent first requests load the model once
+            if self._embedder is None:
+                logger.info("Loading text embedding model %s", self.text_model)
+                self._embedder = SentenceTransformer(self.text_model)
+        embeddings = self._embedder.encode(texts, normalize_embeddings=True)
+        return [list(map(float, row)) for row in embeddings]
+
+    def _validate_namespace(self, namespace: str) -> None:
+        if not _NAMESPACE_PATTERN.match(namespace):
+            raise ValueError(
+                "namespace must be 1-64 lowercase letters, digits, '.', '_' or '-'"
+            )
+
+    def _lock(self, namespace: str) -> asyncio.Lock:
+        return self._locks.setdefault(namespace, asyncio.Lock())
+
+    def _load_namespaces(self) -> None:
+        """Reopen persisted namespaces (memory-mapped)."""
+        for directory in sorted(self.storage_path.iterdir()):
+            if not (directory / "index.json").exists():
+                continue
+            try:
+                self._indexes[directory.name] = VectorIndex.load(directory, mmap=True)
+            except (OSError, ValueError) as e:
+                logger.error("Skipping unreadable vector namespace %s: %s", directory.name, e)
+
+
+# Phase C: Worker Runtime Integration
+# ===================================
+
+class VectorIndexWorker(WorkerApplication):
+    """Worker providing vector similarity search capabilities."""
+
+    def __init__(self) -> None:
+        """Initialize vector index worker."""
+        super().__init__(
+            service_name="vector-index",
+            https_port=int(os.getenv("VECTOR_INDEX_HTTPS_PORT", "8850")),
+        )
+        self.engine = VectorIndexEngine(
+            storage_path=Path(os.getenv("VECTOR_INDEX_PATH", "vector_indexes")),
+            text_model=os.getenv("VECTOR_TEXT_MODEL", "all-MiniLM-L6-v2"),
+        )
+        logger.info("Vector index worker initialized with ID: %s", self.worker_id)
+
+    def get_capabilities(self) -> list[CapabilityDefinition]:
+        """Return capabilities this worker provides."""
+        return [VECTOR_SIMILARITY_SEARCH]
+
+    def setup_routes(self) -> None:
+        """Register FastAPI routes for vector indexing and search."""
+
+        async def upsert_endpoint(request: UpsertVectorsRequest) -> JSONResponse:
+            """Insert or replace embeddings."""
+            try:
+                return JSONResponse(content=await self.engine.upsert(request))
+            except ValueError as e:
+                logger.warning("Invalid vector upsert: %s", e)
+                raise HTTPException(status_code=400, detail=str(e)) from e
+
+        async def query_endpoint(request: QueryVectorsRequest) -> JSONResponse:
+            """Top-k similarity search matching the capability contract."""
+            try:
+                result = await self.engine.query(request)
+                return JSONResponse(content=result.model_dump())
+            except KeyError as e:
+                raise HTTPException(status_code=404, detail="UNKNOWN_NAMESPACE") from e
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e)) from e
+
+        async def delete_endpoint(request: DeleteVectorsRequest) -> JSONResponse:
+            """Remove embeddings by key."""
+            try:
+                return JSONResponse(content=await self.engine.delete(request))
+            except KeyError as e:
+                raise HTTPException(status_code=404, detail="UNKNOWN_NAMESPACE") from e
+
+        async def namespaces_endpoint() -> JSONResponse:
+            """List namespaces with size and storage stats."""
+            return JSONResponse(content={"namespaces": self.engine.namespaces})
+
+        async def snapshot_endpoint() -> JSONResponse:
+            """Persist changed namespaces now."""
+            return JSONResponse(content={"saved": await self.engine.save()})
+
+        # Register routes with explicit binding (avoids Pylance warnings)
+        self.app.post("/vectors/upsert")(upsert_endpoint)
+        self.app.post("/vectors/query")(query_endpoint)
+        self.app.post("/vectors/delete")(delete_endpoint)
+        self.app.get("/vectors/namespaces")(namespaces_endpoint)
+        self.app.post("/vectors/snapshot")(snapshot_endpoint)
+
+    async def on_shutdown(self) -> None:
+        """Persist indexes before the worker exits."""
+        await self.engine.wait_for_training()
+        await self.engine.save()
+        await super().on_shutdown()
+
+
+# Phase D: End-to-End Integration & Main Entry
+# =============================================
+
+def main() -> None:
+    """Main entry point - creates and runs vector index worker."""
+    worker = VectorIndexWorker()
+    worker.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,13 +9,29 @@ MCP enables agents to:
 - Invoke mesh operations with proper authentication
 - Receive structured responses for further processing
 - Handle errors and security constraints gracefully
+
+The tool catalog is built once per registry state and served from cached
+bytes (with an ETag); JSON-RPC batches run their ``tools/call`` requests
+concurrently. Over the streaming transports (``mcp_server.py``), tool calls
+that carry a progress token receive progress and result-chunk notifications.
 """
 
 import json
 from datetime import datetime
 from typing import Any, Callable, Optional
 
-from mesh_interface import MeshCapability, MeshInterface, MeshRequest
+from mesh_interface_v2 import MeshCapability, MeshInterface, MeshRequest
+
+from crank.protocols import (
+    INVALID_PARAMS,
+    METHOD_NOT_FOUND,
+    ToolCatalog,
+    ToolStream,
+    dispatch_jsonrpc,
+    jsonrpc_error,
+)
+from crank.protocols.jsonrpc import DEFAULT_MAX_CONCURRENCY, JSONRPCResponse
+from crank.protocols.mcp_stream import Send
 
 
 class MCPTool:
@@ -61,6 +77,7 @@ class MCPMeshServer:
         self.version = "1.0.0"
         self.tools: dict[str, MCPTool] = {}
         self.mesh_services: dict[str, MeshInterface] = {}
+        self.catalog = ToolCatalog(self._build_tool_list)
 
     def register_mesh_service(self, service: MeshInterface):
         """Register a mesh service and expose its capabilities as MCP tools."""
@@ -72,6 +89,15 @@ class MCPMeshServer:
             handler = self._create_capability_handler(service, capability)
             tool = MCPTool(service_type, capability, handler)
             self.tools[tool.name] = tool
+        self.catalog.invalidate()
+
+    def unregister_mesh_service(self, service_type: str) -> None:
+        """Remove a mesh service and its tools."""
+        self.mesh_services.pop(service_type, None)
+        prefix = f"{service_type}_"
+        for name in [name for name in self.tools if name.startswith(prefix)]:
+            del self.tools[name]
+        self.catalog.invalidate()
 
     def _create_capability_handler(
         self,
@@ -80,7 +106,9 @@ class MCPMeshServer:
     ) -> Callable:
         """Create a handler function for a specific capability."""
 
-        async def handle_request(arguments: dict[str, Any]) -> dict[str, Any]:
+        async def handle_request(
+            arguments: dict[str, Any], stream: Optional[ToolStream] = None
+        ) -> dict[str, Any]:
             try:
                 # Extract authentication
                 auth_token = arguments.pop("auth_token", None)
@@ -108,7 +136,10 @@ class MCPMeshServer:
                 )
 
                 # Process through mesh interface
-                response = await service.process_request(mesh_request, auth_context)
+                if stream is None:
+                    response = await service.process_request(mesh_request, auth_context)
+                else:
+                    response = await service.stream_request(mesh_request, auth_context, stream)
 
                 if response.success:
                     return {
@@ -147,11 +178,20 @@ class MCPMeshServer:
         }
 
     def list_tools(self) -> list[dict[str, Any]]:
-        """List all available tools for MCP clients."""
+        """List all available tools for MCP clients (cached; treat as read-only)."""
+        return self.catalog.tools
+
+    def _build_tool_list(self) -> list[dict[str, Any]]:
         return [tool.to_mcp_tool() for tool in self.tools.values()]
 
-    async def call_tool(self, name: str, arguments: dict[str, Any]) -> dict[str, Any]:
-        """Execute a tool call from an MCP client."""
+    async def call_tool(
+        self, name: str, arguments: dict[str, Any], stream: Optional[ToolStream] = None
+    ) -> dict[str, Any]:
+        """Execute a tool call from an MCP client.
+
+        With a ``stream``, the mesh service may report progress and partial
+        results through it while the call runs.
+        """
         if name not in self.tools:
             return {
                 "error": f"Tool '{name}' not found",
@@ -169,7 +209,7 @@ class MCPMeshServer:
                 pass
 
         try:
-            result = await tool.handler(arguments)
+            result = await tool.handler(arguments, stream)
 
             # Add MCP metadata
             result["tool_name"] = name
@@ -209,8 +249,35 @@ class MCPMeshAdapter:
     mesh interface underneath.
     """
 
-    def __init__(self):
+    def __init__(self, max_concurrent_calls: int = DEFAULT_MAX_CONCURRENCY):
         self.server = MCPMeshServer()
+        self.max_concurrent_calls = max_concurrent_calls
+
+    async def handle_mcp_payload(self, payload: Any) -> JSONRPCResponse:
+        """Handle a JSON-RPC message or batch.
+
+        Independent ``tools/call`` requests in a batch run concurrently (up
+        to ``max_concurrent_calls``); responses keep request order and
+        notifications get none.
+        """
+        return await dispatch_jsonrpc(
+            payload,
+            self.handle_mcp_message,
+            concurrent_methods={"tools/call"},
+            max_concurrency=self.max_concurrent_calls,
+        )
+
+    async def handle_streaming_message(self, message: dict[str, Any], send: Send) -> dict[str, Any]:
+        """Handle a message arriving on a streaming transport (stdio or SSE).
+
+        ``tools/call`` requests with a ``_meta.progressToken`` get progress
+        and result-chunk notifications through ``send`` before the response.
+        """
+        if message.get("method") != "tools/call":
+            return await self.handle_mcp_message(message)
+        params = message.get("params") or {}
+        stream = ToolStream(send, (params.get("_meta") or {}).get("progressToken"))
+        return await self._handle_call_tool(message.get("id"), params, stream)
 
     async def handle_mcp_message(self, message: dict[str, Any]) -> dict[str, Any]:
         """Handle incoming MCP protocol messages."""
@@ -227,7 +294,7 @@ class MCPMeshAdapter:
                 return await self._handle_call_tool(request_id, params)
             if method == "tools/schema":
                 return await self._handle_tool_schema(request_id, params)
-            return self._error_response(request_id, f"Unknown method: {method}")
+            return self._error_response(request_id, f"Unknown method: {method}", METHOD_NOT_FOUND)
 
         except Exception as e:
             return self._error_response(request_id, f"Error handling {method}: {e!s}")
@@ -256,12 +323,16 @@ class MCPMeshAdapter:
             },
         }
 
-    async def _handle_call_tool(self, request_id: str, params: dict[str, Any]) -> dict[str, Any]:
+    async def _handle_call_tool(
+        self, request_id: str, params: dict[str, Any], stream: Optional[ToolStream] = None
+    ) -> dict[str, Any]:
         """Handle tools/call request."""
         tool_name = params.get("name")
         arguments = params.get("arguments", {})
 
-        result = await self.server.call_tool(tool_name, arguments)
+        result = await self.server.call_tool(tool_name, arguments, stream)
+        if stream is not None and stream.chunks_sent:
+            result["chunks_sent"] = stream.chunks_sent
 
         return {
             "jsonrpc": "2.0",
@@ -287,18 +358,13 @@ class MCPMeshAdapter:
                 "id": request_id,
                 "result": schema,
             }
-        return self._error_response(request_id, f"Tool '{tool_name}' not found")
+        return self._error_response(request_id, f"Tool '{tool_name}' not found", INVALID_PARAMS)
 
-    def _error_response(self, request_id: str, error_message: str) -> dict[str, Any]:
+    def _error_response(
+        self, request_id: str, error_message: str, code: int = -1
+    ) -> dict[str, Any]:
         """Create an MCP error response."""
-        return {
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "error": {
-                "code": -1,
-                "message": error_message,
-            },
-        }
+        return jsonrpc_error(request_id, code, error_message)
 
 
 # Factory functions for easy setup
@@ -5,129 +5,142 @@ This script creates and runs an MCP server that exposes all mesh services
 as tools for AI agents. Agents can discover capabilities and invoke operations
 while maintaining the security-first approach.
 
+Two streaming transports are available (``MCP_TRANSPORT``):
+- ``stdio`` (default): newline-delimited JSON-RPC on stdin/stdout, for agents
+  that launch the server as a subprocess
+- ``http``: ``POST /mcp`` answering with JSON, or with Server-Sent Events
+  when the client accepts ``text/event-stream``
+
+On both, a ``tools/call`` carrying ``_meta.progressToken`` receives progress
+and result-chunk notifications before its response. Outgoing messages are
+buffered up to ``MCP_SEND_BUFFER`` per connection; a slow agent makes tools
+wait rather than pile up output, and a cancelled or disconnected request
+stops its tool.
+
 Run this server to enable agent access to Crank services.
 """
 
 import asyncio
+import os
 import sys
 from pathlib import Path
+from typing import Annotated, Any, Optional
 
 # Add the services directory to the path
 sys.path.append(str(Path(__file__).parent))
 
+from fastapi import FastAPI, Header, Request
+from fastapi.responses import JSONResponse, Response
 from mcp_interface import MCPMeshAdapter
+from mesh_diagnostics_v2 import DiagnosticMeshService
+
+from crank.protocols import PARSE_ERROR, jsonrpc_error, open_stdio, serve_stdio, sse_response
+from crank.protocols.mcp_stream import DEFAULT_BUFFER_MESSAGES
+
+
+def log(message: str) -> None:
+    """Status output; stdout belongs to the protocol when serving stdio."""
+    print(message, file=sys.stderr)
 
 
 class CrankMCPServer:
     """Complete MCP server for Crank mesh services."""
 
-    def __init__(self):
+    def __init__(self, transport: str = "stdio", buffer_size: int = DEFAULT_BUFFER_MESSAGES):
         self.adapter = MCPMeshAdapter()
+        self.transport = transport
+        self.buffer_size = buffer_size
         self.running = False
 
-    async def start(self):
+    async def start(self, host: str = "127.0.0.1", port: int = 8765):
         """Start the MCP server."""
-        print("🚀 Starting Crank MCP Server...")
-        print("   Agents can now discover and use Crank services!")
+        log("🚀 Starting Crank MCP Server...")
+        log("   Agents can now discover and use Crank services!")
 
         # Register available mesh services
         await self._register_services()
 
         # Print available tools
         tools = self.adapter.server.list_tools()
-        print(f"\n📋 Available Tools: {len(tools)}")
+        log(f"\n📋 Available Tools: {len(tools)}")
         for tool in tools:
-            print(f"   • {tool['name']}: {tool['description']}")
+            log(f"   • {tool['name']}: {tool['description']}")
 
         self.running = True
-        print("\n✅ MCP Server ready for agent connections")
-        print("   Protocol: Model Context Protocol (MCP)")
-        print("   Security: Authentication required for all operations")
-        print("   Services: All mesh services exposed as discoverable tools")
+        log("\n✅ MCP Server ready for agent connections")
+        log("   Protocol: Model Context Protocol (MCP)")
+        log(f"   Transport: {self.transport}")
+        log("   Security: Authentication required for all operations")
 
-        # Run the server loop
-        await self._run_server()
+        if self.transport == "http":
+            await self._serve_http(host, port)
+        else:
+            await self._serve_stdio()
 
     async def _register_services(self):
         """Register all available mesh services."""
         # In a real deployment, this would dynamically discover services
-        # For now, we'll create mock registrations to show the structure
-
-        print("\n🔧 Registering mesh services...")
-
-        # These would be actual service instances in production
-        service_configs = [
-            {
-                "type": "document",
-                "name": "CrankDoc Document Processing",
-                "capabilities": ["convert", "validate", "analyze"],
-            },
-            {
-                "type": "email",
-                "name": "CrankEmail Processing",
-                "capabilities": ["parse", "classify", "extract", "analyze"],
-            },
-            {
-                "type": "parsing",
-                "name": "Parse Email Archive",
-                "capabilities": [
-                    "parse_mbox",
-                    "classify_ai",
-                    "extract_receipts",
-                    "analyze_patterns",
-                ],
-            },
-        ]
-
-        for config in service_configs:
-            print(f"   ✓ {config['name']} ({config['type']})")
-            print(f"     Capabilities: {', '.join(config['capabilities'])}")
-
-    async def _run_server(self):
-        """Run the main server loop."""
+        log("\n🔧 Registering mesh services...")
+
+        for service in [DiagnosticMeshService()]:
+            self.adapter.server.register_mesh_service(service)
+            operations = [capability.operation for capability in service.get_capabilities()]
+            log(f"   ✓ {service.service_type}: {', '.join(operations)}")
+
+    async def _serve_stdio(self):
+        """Serve MCP on stdin/stdout until stdin closes."""
+        reader, writer = await open_stdio()
         try:
-            while self.running:
-                # In a real MCP server, this would handle actual MCP protocol messages
-                # For demonstration, we'll simulate some agent interactions
-                await self._simulate_agent_interaction()
-                await asyncio.sleep(5)
-
-        except KeyboardInterrupt:
-            print("\n⏹️  Shutting down MCP server...")
+            await serve_stdio(
+                self.adapter.handle_streaming_message,
+                reader,
+                writer,
+                buffer_size=self.buffer_size,
+                max_concurrency=self.adapter.max_concurrent_calls,
+            )
+        finally:
             self.running = False
 
-    async def _simulate_agent_interaction(self):
-        """Simulate agent discovering and using tools."""
-        # Simulate an MCP initialize request
-        init_message = {
-            "jsonrpc": "2.0",
-            "id": "1",
-            "method": "initialize",
-            "params": {
-                "protocolVersion": "2024-11-05",
-                "clientInfo": {
-                    "name": "demo-agent",
-                    "version": "1.0.0",
-                },
-            },
-        }
-
-        # Handle the request
-        await self.adapter.handle_mcp_message(init_message)
-
-        # Simulate tools/list request
-        list_message = {
-            "jsonrpc": "2.0",
-            "id": "2",
-            "method": "tools/list",
-        }
-
-        await self.adapter.handle_mcp_message(list_message)
-
-        if not hasattr(self, "_demo_shown"):
-            print(f"\n🤖 Demo: Agent discovered {len(self.adapter.server.tools)} tools")
-            print("   Agent can now invoke any tool with proper authentication")
-            self._demo_shown = True
+    async def _serve_http(self, host: str, port: int):
+        """Serve MCP over HTTP with SSE streaming."""
+        import uvicorn
+
+        config = uvicorn.Config(self.create_http_app(), host=host, port=port, log_level="info")
+        await uvicorn.Server(config).serve()
+
+    def create_http_app(self) -> FastAPI:
+        """HTTP transport: JSON responses, or SSE when the client accepts it."""
+        app = FastAPI(title="Crank MCP Server")
+
+        @app.post("/mcp")
+        async def mcp_endpoint(
+            request: Request,
+            accept: Annotated[Optional[str], Header()] = None,
+        ) -> Response:
+            try:
+                payload: Any = await request.json()
+            except ValueError:
+                return JSONResponse(jsonrpc_error(None, PARSE_ERROR, "Parse error"))
+
+            if accept and "text/event-stream" in accept:
+                return sse_response(
+                    self.adapter.handle_streaming_message,
+                    payload,
+                    buffer_size=self.buffer_size,
+                    max_concurrency=self.adapter.max_concurrent_calls,
+                )
+            result = await self.adapter.handle_mcp_payload(payload)
+            if result is None:  # Only notifications
+                return Response(status_code=202)
+            return JSONResponse(result)
+
+        @app.get("/mcp/tools")
+        async def mcp_tools(
+            if_none_match: Annotated[Optional[str], Header()] = None,
+        ) -> Response:
+            return self.adapter.server.catalog.http_response(if_none_match)
+
+        return app
 
     def stop(self):
         """Stop the MCP server."""
@@ -136,26 +149,32 @@ class CrankMCPServer:
 
 async def main():
     """Main entry point."""
-    print("=" * 60)
-    print("🔗 CRANK MCP SERVER - Agent Integration Ready")
-    print("=" * 60)
-    print()
-    print("This server exposes Crank mesh services via Model Context Protocol")
-    print("Agents can discover capabilities and invoke operations securely")
-    print()
-
-    server = CrankMCPServer()
+    log("=" * 60)
+    log("🔗 CRANK MCP SERVER - Agent Integration Ready")
+    log("=" * 60)
+    log("")
+    log("This server exposes Crank mesh services via Model Context Protocol")
+    log("Agents can discover capabilities and invoke operations securely")
+    log("")
+
+    server = CrankMCPServer(
+        transport=os.getenv("MCP_TRANSPORT", "stdio"),
+        buffer_size=int(os.getenv("MCP_SEND_BUFFER", str(DEFAULT_BUFFER_MESSAGES))),
+    )
 
     try:
-        await server.start()
+        await server.start(
+            host=os.getenv("MCP_HTTP_HOST", "127.0.0.1"),
+            port=int(os.getenv("MCP_HTTP_PORT", "8765")),
+        )
     except KeyboardInterrupt:
-        print("\nGraceful shutdown requested")
+        log("\nGraceful shutdown requested")
     finally:
         server.stop()
-        print("MCP server stopped")
+        log("MCP server stopped")
 
 
 if __name__ == "__main__":
     # Check if we're being run directly
-    print("Starting Crank MCP Server...")
+    log("Starting Crank MCP Server...")
     asyncio.run(main())
@@ -18,6 +18,11 @@ from typing import Any, Optional
 from fastapi import FastAPI
 from mesh_interface_v2 import MeshCapability, MeshInterface, MeshRequest, MeshResponse
 
+from crank.protocols import ToolStream
+
+LOAD_TEST_STEPS = 10  # Progress notifications per streamed load test
+RESPONSE_CHUNK_CHARS = 4096  # Streamed load test response data per chunk
+
 
 class DiagnosticMeshService(MeshInterface):
     """Diagnostic mesh service for infrastructure testing."""
@@ -200,6 +205,23 @@ class DiagnosticMeshService(MeshInterface):
         auth_context: dict[str, Any],
     ) -> MeshResponse:
         """Process diagnostic requests."""
+        return await self._process(request, auth_context, ToolStream())
+
+    async def stream_request(
+        self,
+        request: MeshRequest,
+        auth_context: dict[str, Any],
+        stream: ToolStream,
+    ) -> MeshResponse:
+        """Process diagnostic requests; load tests report progress and stream their data."""
+        return await self._process(request, auth_context, stream)
+
+    async def _process(
+        self,
+        request: MeshRequest,
+        auth_context: dict[str, Any],
+        stream: ToolStream,
+    ) -> MeshResponse:
         operation = request.operation
 
         try:
@@ -209,7 +231,7 @@ class DiagnosticMeshService(MeshInterface):
                 # File operations would need special handling in FastAPI
                 result = {"error": "echo_file requires file upload endpoint"}
             elif operation == "load_test":
-                result = await self._handle_load_test(request, auth_context)
+                result = await self._handle_load_test(request, auth_context, stream)
             elif operation == "error_test":
                 result = await self._handle_error_test(request, auth_context)
             else:
@@ -278,8 +300,13 @@ class DiagnosticMeshService(MeshInterface):
         self,
         request: MeshRequest,
         auth_context: dict[str, Any],
+        stream: ToolStream,
     ) -> dict[str, Any]:
-        """Handle load test operation."""
+        """Handle load test operation.
+
+        When streaming, the simulated work reports progress in steps and the
+        full response data is sent as chunks instead of being truncated.
+        """
         start_time = time.time()
 
         cpu_work_ms = request.input_data.get("cpu_work_ms", 100)
@@ -295,7 +322,11 @@ class DiagnosticMeshService(MeshInterface):
             raise ValueError("Response size too large (max 100KB)")
 
         # Simulate CPU work
-        if cpu_work_ms > 0:
+        if cpu_work_ms > 0 and stream.streaming:
+            for step in range(1, LOAD_TEST_STEPS + 1):
+                await asyncio.sleep(cpu_work_ms / 1000 / LOAD_TEST_STEPS)
+                await stream.progress(step, LOAD_TEST_STEPS, "Simulating CPU work")
+        elif cpu_work_ms > 0:
             await asyncio.sleep(cpu_work_ms / 1000)
 
         # Simulate memory allocation (create some data)
@@ -303,6 +334,9 @@ class DiagnosticMeshService(MeshInterface):
 
         # Create response data of specified size
         response_data = "data" * (response_size_kb * 256)  # Approximate KB
+        if stream.streaming:
+            for start in range(0, len(response_data), RESPONSE_CHUNK_CHARS):
+                await stream.chunk(response_data[start : start + RESPONSE_CHUNK_CHARS])
 
         processing_time_ms = int((time.time() - start_time) * 1000)
 
@@ -14,17 +14,37 @@ REFACTORED VERSION: Fixes architectural issues from the initial implementation:
 
 import hashlib
 import json
+import logging
+import os
 import time
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
+from pathlib import Path
 from typing import Annotated, Any, Optional
 from uuid import uuid4
 
 from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
+
+from crank.protocols.codecs import (
+    Codec,
+    CodecError,
+    EncodedPayload,
+    encode_envelope,
+    encoded_response,
+    negotiate,
+    openapi_request_body,
+    read_payload,
+)
+from crank.protocols.mcp_stream import ToolStream
+from crank.storage import ReceiptLog, ReceiptPipeline, digest_signer, hmac_signer
+
+logger = logging.getLogger(__name__)
 
 
 class MeshRequest(BaseModel):
@@ -111,10 +131,16 @@ class MeshAuthMiddleware(BaseHTTPMiddleware):
 
 
 class MeshReceiptGenerator:
-    """Unified receipt generation for all mesh operations."""
+    """Unified receipt generation for all mesh operations.
+
+    With a ``ReceiptPipeline``, receipts are emitted off the request path:
+    payload hashing, storage and signing (one signature per sealed segment
+    of the receipt log) happen in the background.
+    """
 
-    def __init__(self, node_id: Optional[str] = None):
+    def __init__(self, node_id: Optional[str] = None, pipeline: Optional[ReceiptPipeline] = None):
         self.node_id = node_id or f"mesh-{uuid4().hex[:8]}"
+        self.pipeline = pipeline
 
     def generate_receipt(
         self,
@@ -122,13 +148,89 @@ class MeshReceiptGenerator:
         response: MeshResponse,
         auth_context: dict[str, Any],
         start_time: float,
+        *,
+        input_payload: Optional[EncodedPayload] = None,
+        output_payload: Optional[EncodedPayload] = None,
+    ) -> MeshReceipt:
+        """Generate a verifiable audit receipt.
+
+        ``input_payload``/``output_payload`` carry encodings of
+        ``request.input_data``/``response.result`` that are also sent on the
+        wire, so hashing reuses them instead of serializing again.
+        """
+        receipt = self._build_receipt(
+            request,
+            response,
+            auth_context,
+            start_time,
+            input_hash=self._hash_data(input_payload or EncodedPayload(request.input_data)),
+            output_hash=(
+                self._hash_data(output_payload or EncodedPayload(response.result))
+                if response.result
+                else None
+            ),
+        )
+        receipt.signature = self._sign_receipt(receipt)
+        return receipt
+
+    def emit_receipt(
+        self,
+        request: MeshRequest,
+        response: MeshResponse,
+        auth_context: dict[str, Any],
+        start_time: float,
+        *,
+        input_payload: Optional[EncodedPayload] = None,
+        output_payload: Optional[EncodedPayload] = None,
+    ) -> dict[str, Any]:
+        """Record a receipt, through the pipeline when one is configured.
+
+        Returns the receipt fields (JSON form). Without a pipeline this is the
+        full signed receipt; with one, the hashes are filled in and the
+        receipt stored in the background, and the signature comes from its
+        segment seal (see ``/v1/receipts/{receipt_id}``).
+        """
+        if self.pipeline is None:
+            receipt = self.generate_receipt(
+                request,
+                response,
+                auth_context,
+                start_time,
+                input_payload=input_payload,
+                output_payload=output_payload,
+            )
+            return receipt.model_dump(mode="json")
+
+        receipt = self._build_receipt(
+            request, response, auth_context, start_time, input_hash="", output_hash=None
+        )
+        fields = receipt.model_dump(mode="json", exclude={"input_hash", "output_hash"})
+        self.pipeline.submit(
+            fields,
+            {
+                "input_hash": input_payload or EncodedPayload(request.input_data),
+                "output_hash": (
+                    (output_payload or EncodedPayload(response.result)) if response.result else None
+                ),
+            },
+        )
+        return fields
+
+    def _build_receipt(
+        self,
+        request: MeshRequest,
+        response: MeshResponse,
+        auth_context: dict[str, Any],
+        start_time: float,
+        *,
+        input_hash: str,
+        output_hash: Optional[str],
     ) -> MeshReceipt:
-        """Generate a verifiable audit receipt."""
         processing_time_ms = int((time.time() - start_time) * 1000)
         receipt_id = (
             f"receipt_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}_{uuid4().hex[:8]}"
         )
-        receipt = MeshReceipt(
+        return MeshReceipt(
             receipt_id=receipt_id,
             job_id=request.job_id,
             service_type=request.service_type,
@@ -136,22 +238,20 @@ class MeshReceiptGenerator:
             timestamp=datetime.now(timezone.utc),
             user_id=auth_context.get("user_id", "unknown"),
             success=response.success,
-            input_hash=self._hash_data(request.input_data),
-            output_hash=self._hash_data(response.result) if response.result else None,
+            input_hash=input_hash,
+            output_hash=output_hash,
             processing_time_ms=processing_time_ms,
             mesh_node_id=self.node_id,
             policy_profile=",".join(request.policies) if request.policies else "none",
             errors=response.errors,
         )
-        receipt.signature = self._sign_receipt(receipt)
-        return receipt
 
     def _hash_data(self, data: Any) -> str:
-        """Generate consistent hash for any data."""
-        if data is None:
+        """Generate consistent hash (of the canonical encoding) for any data."""
+        payload = data if isinstance(data, EncodedPayload) else EncodedPayload(data)
+        if payload.value is None:
             return "null"
-        json_str = json.dumps(data, sort_keys=True, ensure_ascii=True)
-        return hashlib.sha256(json_str.encode("utf-8")).hexdigest()[:16]
+        return payload.digest[:16]
 
     def _sign_receipt(self, receipt: MeshReceipt) -> str:
         """Generate cryptographic signature for receipt verification."""
@@ -160,6 +260,22 @@ class MeshReceiptGenerator:
         return hashlib.sha256(receipt_json.encode("utf-8")).hexdigest()
 
 
+def receipt_pipeline_from_env() -> Optional[ReceiptPipeline]:
+    """Receipt pipeline configured by ``MESH_RECEIPT_DIR`` (None when unset).
+
+    ``MESH_RECEIPT_SIGNING_KEY`` switches segment signatures from a plain
+    SHA-256 to HMAC-SHA256 with that key.
+    """
+    directory = os.getenv("MESH_RECEIPT_DIR")
+    if not directory:
+        return None
+    key = os.getenv("MESH_RECEIPT_SIGNING_KEY")
+    signer = hmac_signer(key.encode("utf-8")) if key else digest_signer
+    log = ReceiptLog(Path(directory), signer=signer)
+    logger.info("Receipt log at %s (%d receipts)", directory, len(log))
+    return ReceiptPipeline(log, digest_chars=16)  # Same hash length as signed receipts
+
+
 class MeshInterface(ABC):
     """
     Security-first universal interface that every Crank service implements.
@@ -172,10 +288,17 @@ class MeshInterface(ABC):
     - Capability advertisement
     """
 
-    def __init__(self, service_type: str, node_id: Optional[str] = None):
+    def __init__(
+        self,
+        service_type: str,
+        node_id: Optional[str] = None,
+        receipt_pipeline: Optional[ReceiptPipeline] = None,
+    ):
         self.service_type = service_type
         self.node_id = node_id or f"{service_type}-{uuid4().hex[:8]}"
-        self.receipt_generator = MeshReceiptGenerator(self.node_id)
+        self.receipt_generator = MeshReceiptGenerator(
+            self.node_id, receipt_pipeline or receipt_pipeline_from_env()
+        )
 
     @abstractmethod
     async def process_request(
@@ -183,6 +306,18 @@ class MeshInterface(ABC):
     ) -> MeshResponse:
         """Process a mesh request and return response."""
 
+    async def stream_request(
+        self, request: MeshRequest, auth_context: dict[str, Any], stream: ToolStream
+    ) -> MeshResponse:
+        """
+        Process a mesh request, reporting progress and partial results.
+
+        Used by streaming transports (MCP over stdio/SSE). Services with
+        long-running or large operations override this; by default the
+        request is processed normally and nothing is streamed.
+        """
+        return await self.process_request(request, auth_context)
+
     @abstractmethod
     def get_capabilities(self) -> list[MeshCapability]:
         """Return list of service capabilities."""
@@ -204,12 +339,31 @@ class MeshInterface(ABC):
             }
         )
 
+    def _encode_response(
+        self, response: MeshResponse, codec: Codec, output_payload: EncodedPayload
+    ) -> Response:
+        """Encode a mesh response, reusing the already-encoded result."""
+        body = encode_envelope(
+            codec,
+            response.model_dump(mode="json", exclude={"result"}),
+            {"result": output_payload},
+        )
+        return encoded_response(body, codec)
+
     def create_app(self, api_key: str = "dev-mesh-key") -> FastAPI:
         """Create FastAPI app with security-first configuration."""
+
+        @asynccontextmanager
+        async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+            yield
+            if self.receipt_generator.pipeline is not None:
+                await self.receipt_generator.pipeline.close()
+
         app = FastAPI(
             title=f"Crank {self.service_type.title()} Mesh",
             description=f"Security-hardened {self.service_type} service",
             version="1.0.0",
+            lifespan=lifespan,
         )
         app.add_middleware(
             CORSMiddleware,
@@ -230,24 +384,38 @@ class MeshInterface(ABC):
             """Get service capabilities (secured)."""
             return self.get_capabilities()
 
-        @app.post("/v1/process")
+        @app.post(
+            "/v1/process",
+            response_model=MeshResponse,
+            openapi_extra=openapi_request_body(MeshRequest.model_json_schema()),
+        )
         async def process_mesh_request(
-            request: MeshRequest, auth_context: Annotated[dict, Depends(self._get_auth_context)]
-        ) -> MeshResponse:
-            """Process mesh request (secured)."""
+            http_request: Request, auth_context: Annotated[dict, Depends(self._get_auth_context)]
+        ) -> Response:
+            """Process mesh request (secured).
+
+            The body may be JSON, MessagePack or CBOR (``Content-Type``); the
+            response uses the codec selected by ``Accept``, defaulting to the
+            request's codec.
+            """
             start_time = time.time()
+            try:
+                body, request_codec = await read_payload(http_request)
+                codec = negotiate(http_request.headers.get("accept"), default=request_codec)
+            except CodecError as e:
+                return JSONResponse(status_code=e.status_code, content={"error": str(e)})
+            try:
+                request = MeshRequest.model_validate(body)
+            except ValidationError as e:
+                detail = {"detail": e.errors(include_url=False)}
+                return encoded_response(codec.encode(detail), codec, status_code=422)
+
+            input_payload = EncodedPayload(request.input_data)
             try:
                 self._enrich_request_metadata(request, auth_context)
                 response = await self.process_request(request, auth_context)
-                receipt = self.receipt_generator.generate_receipt(
-                    request, response, auth_context, start_time
-                )
-                response.receipt_id = receipt.receipt_id
-                response.processing_time_ms = receipt.processing_time_ms
-                response.mesh_node_id = self.node_id
-                return response
             except Exception as e:
-                error_response = MeshResponse(
+                response = MeshResponse(
                     success=False,
                     result=None,
                     receipt_id="",
@@ -256,23 +424,49 @@ class MeshInterface(ABC):
                     processing_time_ms=0,
                     mesh_node_id=self.node_id,
                 )
-                receipt = self.receipt_generator.generate_receipt(
-                    request, error_response, auth_context, start_time
-                )
-                error_response.receipt_id = receipt.receipt_id
-                error_response.processing_time_ms = receipt.processing_time_ms
-                return error_response
+            # The result is encoded once, for the receipt hash and the body
+            output_payload = EncodedPayload(response.result)
+            receipt = self.receipt_generator.emit_receipt(
+                request,
+                response,
+                auth_context,
+                start_time,
+                input_payload=input_payload,
+                output_payload=output_payload,
+            )
+            response.receipt_id = receipt["receipt_id"]
+            response.processing_time_ms = receipt["processing_time_ms"]
+            response.mesh_node_id = self.node_id
+            return self._encode_response(response, codec, output_payload)
 
         @app.get("/v1/receipts/{receipt_id}")
         async def get_receipt(
             receipt_id: str, auth_context: Annotated[dict, Depends(self._get_auth_context)]
         ):
-            """Get audit receipt (secured)."""
+            """Get audit receipt with its Merkle inclusion proof (secured).
+
+            ``status`` is ``pending`` (202) while the receipt is still being
+            hashed and stored, ``recorded`` once stored, and ``sealed`` once
+            its segment root is signed and ``proof`` is available.
+            """
+            pipeline = self.receipt_generator.pipeline
+            if pipeline is None:
+                return JSONResponse(
+                    status_code=404, content={"error": "Receipt log is not enabled on this node"}
+                )
+            if pipeline.is_pending(receipt_id):
+                return JSONResponse(
+                    status_code=202, content={"receipt_id": receipt_id, "status": "pending"}
+                )
+            proof = await pipeline.lookup(receipt_id)
+            if proof is None:
+                return JSONResponse(
+                    status_code=404, content={"error": f"Receipt {receipt_id!r} not found"}
+                )
             return {
                 "receipt_id": receipt_id,
-                "status": "found",
-                "user_id": auth_context.get("user_id", "unknown"),
-                "note": "Receipt retrieval not yet implemented",
+                "status": "sealed" if proof.sealed else "recorded",
+                **proof.to_dict(),
             }
 
         @app.get("/health/live")
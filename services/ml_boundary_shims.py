@@ -119,6 +119,33 @@ def safe_yolo_detect(
     """Safely perform YOLO detection with type isolation."""
     try:
         results = model(image, conf=confidence, verbose=False)
+        return _yolo_result(model, results)
+    except Exception:
+        return _failed_yolo_result()
+
+
+def safe_yolo_detect_batch(
+    model: Any,
+    images: list[Any],
+    confidence: float = 0.5,
+) -> list[YOLOResult]:
+    """
+    Safely run YOLO on a list of images in one batched call.
+
+    Ultralytics returns one result per input image; each is converted
+    exactly like ``safe_yolo_detect``. A failure of the batched call fails
+    every image (no partial results).
+    """
+    try:
+        results = model(images, conf=confidence, verbose=False)
+        return [_yolo_result(model, [result]) for result in results]
+    except Exception:
+        return [_failed_yolo_result() for _ in images]
+
+
+def _yolo_result(model: Any, results: Any) -> YOLOResult:
+    """Convert raw Ultralytics results for one image into a YOLOResult."""
+    try:
         detections: list[YOLOBox] = []
         total_confidence = 0.0
 
@@ -156,13 +183,17 @@ def safe_yolo_detect(
         )
 
     except Exception:
-        return YOLOResult(
-            prediction="detection_failed",
-            confidence=0.0,
-            detections=[],
-            model="YOLOv8n",
-            total_objects=0,
-        )
+        return _failed_yolo_result()
+
+
+def _failed_yolo_result() -> YOLOResult:
+    return YOLOResult(
+        prediction="detection_failed",
+        confidence=0.0,
+        detections=[],
+        model="YOLOv8n",
+        total_objects=0,
+    )
 
 
 # CLIP safe wrapper functions
@@ -209,6 +240,50 @@ def safe_clip_analyze(
         return CLIPResult(prediction="analysis_failed", confidence=0.0, scores=[], model="CLIP")
 
 
+def safe_clip_zero_shot(
+    image_features: Any,
+    text_features: Any,
+    text_categories: list[str],
+) -> list[CLIPResult]:
+    """
+    Safely score a batch of CLIP image features against category prompts.
+
+    Both feature matrices must already be L2-normalised (rows). Scores use
+    CLIP's standard logit scale of 100 followed by a softmax per image.
+    """
+    try:
+        count = int(image_features.shape[0])
+    except Exception:
+        return []
+
+    try:
+        with torch.no_grad():
+            probs = (100.0 * image_features @ text_features.T).softmax(dim=-1).float().cpu().numpy()
+
+        results: list[CLIPResult] = []
+        for row in probs:
+            scores: list[dict[str, Any]] = [
+                {"category": str(category), "confidence": float(prob)}
+                for category, prob in zip(text_categories, row)
+            ]
+            scores.sort(key=lambda x: float(x["confidence"]), reverse=True)
+            results.append(
+                CLIPResult(
+                    prediction=scores[0]["category"],
+                    confidence=scores[0]["confidence"],
+                    scores=scores,
+                    model="CLIP",
+                )
+            )
+        return results
+
+    except Exception:
+        return [
+            CLIPResult(prediction="analysis_failed", confidence=0.0, scores=[], model="CLIP")
+            for _ in range(count)
+        ]
+
+
 def safe_sentence_transformer_encode(
     model: Any, inputs: Union[str, list[str], Image.Image, list[Image.Image]], **kwargs: Any
 ) -> np.ndarray[Any, np.dtype[np.float32]]:
@@ -11,19 +11,29 @@ import asyncio
 import io
 import logging
 import os
-from collections.abc import Iterable
+from collections.abc import AsyncIterator
 from datetime import datetime, timezone
-from typing import TYPE_CHECKING, Any, cast
+from typing import TYPE_CHECKING, Any
 from uuid import uuid4
 
-import cv2
 import httpx
 import numpy as np
-from fastapi import FastAPI, Form, HTTPException, UploadFile
+from fastapi import FastAPI, Form, HTTPException, Request, UploadFile
+from fastapi.responses import StreamingResponse
 from numpy.typing import NDArray
 from PIL import Image
 from pydantic import BaseModel
 
+from crank.imaging import (
+    BatchImage,
+    BatchInputError,
+    ImageFeatures,
+    decode_batch,
+    extract_features,
+    ndjson_response,
+    read_image_batch,
+)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
@@ -32,6 +42,7 @@ BRIGHT_THRESHOLD = 200
 DARK_THRESHOLD = 50
 MIN_RUNNING_CONTAINERS = 4
 HTTP_STATUS_SERVER_ERROR = 500
+MAX_BATCH_IMAGES = int(os.getenv("IMAGE_BATCH_MAX_IMAGES", "256"))
 logger = logging.getLogger(__name__)
 
 # Import for GPU checks
@@ -162,6 +173,12 @@ class CrankImageClassifier:
         self.app.add_api_route("/health", self.health_check, methods=["GET"])
         self.app.add_api_route("/", self.root, methods=["GET"])
         self.app.add_api_route("/classify", self.classify_image_endpoint, methods=["POST"])
+        self.app.add_api_route(
+            "/classify/batch",
+            self.classify_batch_endpoint,
+            methods=["POST"],
+            response_model=None,
+        )
         self.app.add_api_route("/capabilities", self.get_capabilities, methods=["GET"])
 
     async def health_check(self) -> dict[str, Any]:
@@ -259,6 +276,56 @@ class CrankImageClassifier:
             logger.exception("Classification failed")
             raise HTTPException(status_code=HTTP_STATUS_SERVER_ERROR, detail=str(e)) from e
 
+    async def classify_batch_endpoint(
+        self,
+        request: Request,
+        classification_types: str = "object_detection,scene_classification",
+        confidence_threshold: float = 0.5,
+    ) -> StreamingResponse:
+        """
+        Classify many images from a multipart upload or tar stream.
+
+        Options are query parameters. Images are decoded concurrently in the
+        thread pool, then results stream back as one NDJSON line per image.
+        """
+        try:
+            images = await read_image_batch(request, max_images=MAX_BATCH_IMAGES)
+        except BatchInputError as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e)) from e
+
+        types = [t.strip() for t in classification_types.split(",")]
+        logger.info("Classifying batch of %d images with types: %s", len(images), types)
+
+        decoded = await decode_batch(images, _decode_image)
+        return ndjson_response(self._batch_records(images, decoded, types, confidence_threshold))
+
+    async def _batch_records(
+        self,
+        images: list[BatchImage],
+        decoded: list[tuple[Image.Image, NDArray[np.uint8]] | Exception],
+        classification_types: list[str],
+        confidence_threshold: float,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield one result record per image, in request order."""
+        for image, item in zip(images, decoded):
+            start_time = datetime.now(timezone.utc)
+            if isinstance(item, Exception):
+                results: dict[str, Any] = {"error": f"Image decode failed: {item}"}
+            else:
+                results = await self.classify_decoded(
+                    *item, classification_types, confidence_threshold
+                )
+            processing_time = (datetime.now(timezone.utc) - start_time).total_seconds()
+
+            yield {
+                "index": image.index,
+                "name": image.name,
+                "classification_id": str(uuid4()),
+                "status": "failed" if "error" in results else "completed",
+                "results": results,
+                "processing_time": processing_time,
+            }
+
     async def get_capabilities(self) -> dict[str, Any]:
         """Get classification capabilities."""
         return {
@@ -286,13 +353,26 @@ class CrankImageClassifier:
         confidence_threshold: float,
     ) -> dict[str, Any]:
         """Classify image using available models."""
+        try:
+            image, image_array = await asyncio.to_thread(_decode_image, image_content)
+        except Exception as e:
+            logger.exception("Image classification error")
+            return {"error": str(e)}
+        return await self.classify_decoded(
+            image, image_array, classification_types, confidence_threshold
+        )
+
+    async def classify_decoded(
+        self,
+        image: Image.Image,
+        image_array: NDArray[np.uint8],
+        classification_types: list[str],
+        confidence_threshold: float,
+    ) -> dict[str, Any]:
+        """Classify an already-decoded image (see ``_decode_image``)."""
         results = {}
 
         try:
-            # Convert bytes to PIL Image
-            image = Image.open(io.BytesIO(image_content))
-            image_array = np.array(image)
-
             # Basic image properties
             results["image_info"] = {
                 "format": image.format,
@@ -300,24 +380,24 @@ class CrankImageClassifier:
                 "mode": image.mode,
             }
 
+            # One shared, downsampled feature pass feeds every stage (off the event loop)
+            features = await asyncio.to_thread(extract_features, image_array)
+
             # Object detection (simplified)
             if "object_detection" in classification_types:
-                results["object_detection"] = await self._detect_objects(
-                    image_array,
-                    confidence_threshold,
-                )
+                results["object_detection"] = self._detect_objects(features, confidence_threshold)
 
             # Scene classification (basic)
             if "scene_classification" in classification_types:
-                results["scene_classification"] = await self._classify_scene(image_array)
+                results["scene_classification"] = self._classify_scene(features)
 
             # Color analysis
             if "color_analysis" in classification_types:
-                results["color_analysis"] = await self._analyze_colors(image)
+                results["color_analysis"] = self._analyze_colors(features)
 
             # Basic content analysis
             if "basic_content_analysis" in classification_types:
-                results["content_analysis"] = await self._analyze_content(image_array)
+                results["content_analysis"] = self._analyze_content(features)
 
         except Exception as e:
             logger.exception("Image classification error")
@@ -325,75 +405,61 @@ class CrankImageClassifier:
         else:
             return results
 
-    async def _detect_objects(
+    def _detect_objects(
         self,
-        image_array: NDArray[np.uint8],
+        features: ImageFeatures,
         confidence_threshold: float,
     ) -> dict[str, Any]:
         """Basic object detection."""
-        # Simplified object detection using OpenCV
-        gray = cv2.cvtColor(image_array, cv2.COLOR_RGB2GRAY)
-
-        # Basic feature detection - simplified approach
-        # Note: SIFT may require opencv-contrib-python
-        edges = cv2.Canny(gray, 100, 200)
-        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-
+        # Simplified object detection: external contours of the Canny edge map
         return {
             "method": "Edge detection",
-            "contours_detected": len(contours),
+            "contours_detected": features.contour_count,
+            "edge_density": round(features.edge_density, 4),
             "confidence": confidence_threshold,
             "gpu_accelerated": self.gpu_available,
         }
 
-    async def _classify_scene(self, image_array: NDArray[np.uint8]) -> dict[str, Any]:
+    def _classify_scene(self, features: ImageFeatures) -> dict[str, Any]:
         """Basic scene classification."""
-        # Simplified scene classification based on basic features
-        gray = cv2.cvtColor(image_array, cv2.COLOR_RGB2GRAY)
-
-        # Calculate basic statistics
-        mean_brightness = np.mean(gray)
-        contrast = np.std(gray)
-
         # Simple scene classification based on brightness and contrast
-        if mean_brightness > BRIGHT_THRESHOLD:
+        if features.brightness > BRIGHT_THRESHOLD:
             scene_type = "bright/outdoor"
-        elif mean_brightness < DARK_THRESHOLD:
+        elif features.brightness < DARK_THRESHOLD:
             scene_type = "dark/indoor"
         else:
             scene_type = "mixed_lighting"
 
         return {
             "scene_type": scene_type,
-            "brightness": float(mean_brightness),
-            "contrast": float(contrast),
+            "brightness": features.brightness,
+            "contrast": features.contrast,
+            "edge_density": round(features.edge_density, 4),
             "method": "statistical_analysis",
         }
 
-    async def _analyze_colors(self, image: Image.Image) -> dict[str, Any]:
+    def _analyze_colors(self, features: ImageFeatures) -> dict[str, Any]:
         """Color analysis of the image."""
-        # Get dominant colors
-        image_rgb = image.convert("RGB")
-        pixel_data = cast(Iterable[tuple[int, int, int]], image_rgb.getdata())
-        pixels = list(pixel_data)
-
-        # Calculate average color
-        avg_color = tuple(sum(c) // len(pixels) for c in zip(*pixels))
+        avg_color = tuple(int(channel) for channel in features.mean_rgb)
 
         return {
             "average_color": {
                 "rgb": avg_color,
                 "hex": f"#{avg_color[0]:02x}{avg_color[1]:02x}{avg_color[2]:02x}",
             },
-            "total_pixels": len(pixels),
+            "dominant_colors": [
+                {"rgb": color.rgb, "hex": color.hex, "fraction": round(color.fraction, 4)}
+                for color in features.dominant_colors
+            ],
+            "total_pixels": features.total_pixels,
         }
 
-    async def _analyze_content(self, image_array: NDArray[np.uint8]) -> dict[str, Any]:
+    def _analyze_content(self, features: ImageFeatures) -> dict[str, Any]:
         """Basic content analysis."""
-        height, width = image_array.shape[:2]
+        width, height = features.width, features.height
 
         # Calculate some basic metrics
-        total_pixels = height * width
+        total_pixels = features.total_pixels
         aspect_ratio = width / height
 
         return {
@@ -553,6 +619,14 @@ class CrankImageClassifier:
                 logger.warning("Failed to deregister from platform: %s", e)
 
 
+def _decode_image(image_content: bytes) -> tuple[Image.Image, NDArray[np.uint8]]:
+    """Decode bytes to a PIL image plus its RGB pixel array (safe to run in a thread)."""
+    image = Image.open(io.BytesIO(image_content))
+    image.load()
+    rgb = image if image.mode == "RGB" else image.convert("RGB")
+    return image, np.asarray(rgb)
+
+
 def create_crank_image_classifier(platform_url: str | None = None, cert_store: Any = None) -> FastAPI:
     """Create Crank Image Classifier application."""
     classifier = CrankImageClassifier(platform_url, cert_store)
@@ -15,6 +15,15 @@ from typing import Any
 from crank_platform_service import User
 from mesh_interface_v2 import MeshRequest
 
+from crank.protocols import (
+    INVALID_PARAMS,
+    METHOD_NOT_FOUND,
+    ToolCatalog,
+    dispatch_jsonrpc,
+    jsonrpc_error,
+)
+from crank.protocols.jsonrpc import JSONRPCResponse
+
 
 class ProtocolAdapter(ABC):
     """Abstract base for any protocol adapter - the core innovation."""
@@ -62,30 +71,64 @@ class RESTAdapter(ProtocolAdapter):
 
 
 class MCPAdapter(ProtocolAdapter):
-    """MCP (Model Context Protocol) adapter for AI agents."""
+    """MCP (Model Context Protocol) adapter for AI agents.
+
+    The tool list is built once into a cached ``ToolCatalog`` (call
+    ``catalog.invalidate()`` if the exposed capabilities change), and one
+    diagnostic service instance serves both discovery and calls.
+    """
 
     def __init__(self, platform_service):
         super().__init__(platform_service)
         self.protocol_name = "MCP"
-
-    async def handle_request(self, mcp_request: dict[str, Any], user: User) -> dict[str, Any]:
-        """Handle MCP request from AI agent."""
-        method = mcp_request.get("method")
-        params = mcp_request.get("params", {})
-
-        if method == "tools/list":
-            return await self._list_tools(user)
-        if method == "tools/call":
-            return await self._call_tool(params, user)
-        raise ValueError(f"Unknown MCP method: {method}")
+        self.catalog = ToolCatalog(self._build_tools)
+        self._diagnostic = None
+
+    @property
+    def diagnostic(self):
+        """Diagnostic mesh service, created on first use."""
+        if self._diagnostic is None:
+            from mesh_diagnostics_v2 import DiagnosticMeshService
+
+            self._diagnostic = DiagnosticMeshService()
+        return self._diagnostic
+
+    async def handle_request(self, mcp_request: Any, user: User) -> JSONRPCResponse:
+        """Handle MCP request from AI agent.
+
+        Single requests and JSON-RPC batches (lists) both go through
+        ``dispatch_jsonrpc`` and get JSON-RPC responses; a batch runs its
+        ``tools/call`` requests concurrently. Returns None when nothing needs
+        a response (only notifications).
+        """
+
+        async def handle_message(message: dict[str, Any]) -> dict[str, Any]:
+            request_id = message.get("id")
+            method = message["method"]
+            params = message.get("params") or {}
+            try:
+                if method == "tools/list":
+                    result = await self._list_tools(user)
+                elif method == "tools/call":
+                    result = await self._call_tool(params, user)
+                else:
+                    return jsonrpc_error(
+                        request_id, METHOD_NOT_FOUND, f"Unknown MCP method: {method}"
+                    )
+            except (KeyError, ValueError) as e:
+                return jsonrpc_error(request_id, INVALID_PARAMS, str(e))
+            return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+        return await dispatch_jsonrpc(
+            mcp_request, handle_message, concurrent_methods={"tools/call"}
+        )
 
     async def _list_tools(self, user: User) -> dict[str, Any]:
         """List available tools (platform capabilities)."""
-        # Get capabilities from diagnostic service
-        from mesh_diagnostics_v2 import DiagnosticMeshService
+        return {"tools": self.catalog.tools}
 
-        diagnostic = DiagnosticMeshService()
-        capabilities = diagnostic.get_capabilities()
+    def _build_tools(self) -> list[dict[str, Any]]:
+        capabilities = self.diagnostic.get_capabilities()
 
         tools = []
         for cap in capabilities:
@@ -119,9 +162,7 @@ class MCPAdapter(ProtocolAdapter):
             },
         ]
 
-        return {
-            "tools": tools + platform_tools,
-        }
+        return tools + platform_tools
 
     async def _call_tool(self, params: dict[str, Any], user: User) -> dict[str, Any]:
         """Execute a tool call."""
@@ -148,10 +189,7 @@ class MCPAdapter(ProtocolAdapter):
                 }
 
                 # Call diagnostic service
-                from mesh_diagnostics_v2 import DiagnosticMeshService
-
-                diagnostic = DiagnosticMeshService()
-                response = await diagnostic.process_request(mesh_request, auth_context)
+                response = await self.diagnostic.process_request(mesh_request, auth_context)
 
                 return {
                     "content": [
@@ -11,10 +11,59 @@ The secret: Your MeshInterface is a perfect abstraction layer!
 import asyncio
 import json
 import struct
+import sys
 from abc import ABC, abstractmethod
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Optional
 
 # Your existing mesh interface
-from mesh_interface import MeshInterface, MeshRequest, MeshResponse
+from crank_mesh_interface import CrankMeshInterface as MeshInterface
+from crank_mesh_interface import CrankMeshRequest as MeshRequest
+from crank_mesh_interface import CrankMeshResponse as MeshResponse
+
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+from crank.capabilities import CAPABILITY_CATALOG, CapabilityDefinition
+from crank.observability import Span, extract, get_tracer, inject
+from crank.observability.tracing import SPAN_KIND_SERVER
+from crank.protocols import (
+    AcceptStatus,
+    AuthFlavor,
+    Invocation,
+    InvocationResult,
+    RPCCall,
+    RPCReplyError,
+    XDRDecoder,
+    XDREncoder,
+    XDRError,
+    decode_call,
+    decode_reply,
+    encode_accepted_reply,
+    encode_auth_sys,
+    encode_call,
+    frame_record,
+    handle_call_record,
+    start_onc_rpc_server,
+)
+
+try:
+    from crank.protocols.grpc_gateway import (
+        MeshGateway,
+        MeshGatewayClient,
+        start_grpc_gateway,
+    )
+
+    GRPC_AVAILABLE = True
+except ImportError:  # grpcio/protobuf are the optional "grpc" extra
+    GRPC_AVAILABLE = False
+
+try:
+    from crank.protocols.graphql_gateway import MeshGraphQL, query_hash
+
+    GRAPHQL_AVAILABLE = True
+except ImportError:  # graphql-core is the optional "graphql" extra
+    GRAPHQL_AVAILABLE = False
 
 
 class ProtocolAdapter(ABC):
@@ -37,46 +86,104 @@ class ProtocolAdapter(ABC):
         """Convert protocol request to mesh format."""
 
 
-class GRPCAdapter(ProtocolAdapter):
-    """gRPC protocol adapter - modern, efficient."""
+@contextmanager
+def _server_span(
+    protocol: str, operation: str, metadata: Optional[dict[str, str]] = None
+) -> Iterator[Span]:
+    """Span for one adapter call, continuing the caller's ``traceparent`` if it sent one."""
+    with get_tracer().span(
+        f"{protocol} {operation}",
+        kind=SPAN_KIND_SERVER,
+        parent=extract(metadata or {}),
+        attributes={"rpc.system": protocol, "rpc.method": operation},
+    ) as span:
+        yield span
+
+
+def _record_outcome(span: Span, mesh_responses: Sequence[MeshResponse]) -> None:
+    """Mark the span failed if any mesh response failed."""
+    failed = [response for response in mesh_responses if not response.success]
+    if failed:
+        span.set_error("; ".join(failed[0].errors or ["mesh request failed"]))
+        span.set_attribute("crank.failed_requests", len(failed))
+
+
+def _invocation_result(mesh_response: MeshResponse) -> InvocationResult:
+    """Mesh response -> transport-neutral invocation result."""
+    return InvocationResult(
+        success=mesh_response.success,
+        result=mesh_response.result,
+        receipt_id=mesh_response.receipt_id,
+        processing_time_ms=mesh_response.processing_time_ms or 0,
+        node_id=mesh_response.mesh_node_id,
+        errors=mesh_response.errors or [],
+    )
 
-    def __init__(self, mesh_service: MeshInterface):
+
+class GRPCAdapter(ProtocolAdapter):
+    """gRPC protocol adapter - binary protobuf over HTTP/2.
+
+    The protobuf contract (``crank.mesh.v1``) is generated from the capability
+    catalog; each ``InvokeRequest`` selects one capability, whose operation is
+    dispatched to the wrapped mesh service.
+    """
+
+    def __init__(
+        self,
+        mesh_service: MeshInterface,
+        capabilities: Sequence[CapabilityDefinition] = CAPABILITY_CATALOG,
+    ):
         super().__init__(mesh_service)
         self.protocol_name = "gRPC"
+        self.gateway = MeshGateway(self.invoke, capabilities)
+        self.contract = self.gateway.contract
 
-    async def handle_request(self, raw_request: bytes) -> bytes:
-        """Handle gRPC request."""
-        # In real implementation, would use protobuf
-        grpc_request = self._parse_grpc_request(raw_request)
+    async def serve(self, address: str = "[::]:50051", **kwargs: Any) -> tuple[Any, int]:
+        """Start the HTTP/2 gRPC server; returns (server, bound port)."""
+        return await start_grpc_gateway(
+            self.invoke, address, capabilities=self.contract.capabilities, **kwargs
+        )
 
-        # Convert to mesh request
-        mesh_request = MeshRequest(
+    async def handle_request(self, raw_request: bytes) -> bytes:
+        """Handle one serialized InvokeRequest (without the HTTP/2 transport)."""
+        request = self.contract.InvokeRequest.FromString(raw_request)
+        invocation = self.contract.parse_request(request)
+        result = await self.invoke(invocation)
+        response = self.contract.build_response(
+            result, invocation.capability, invocation.request_id
+        )
+        return bytes(response.SerializeToString())
+
+    async def invoke(self, invocation: Invocation) -> InvocationResult:
+        """Dispatch one capability invocation through the mesh."""
+        with _server_span("grpc", invocation.capability.id, invocation.metadata) as span:
+            mesh_request = self._to_mesh_request(invocation)
+            inject(mesh_request.metadata, span)
+
+            # Process through mesh (same security, validation, audit)
+            auth_context = self._extract_grpc_auth(invocation.metadata)
+            mesh_response = await self.mesh_service.process_request(mesh_request, auth_context)
+            _record_outcome(span, [mesh_response])
+        return _invocation_result(mesh_response)
+
+    def _to_mesh_request(self, invocation: Invocation) -> MeshRequest:
+        capability = invocation.capability
+        return MeshRequest(
             service_type=self.mesh_service.service_type,
-            operation=grpc_request["method"],
-            input_data=grpc_request["params"],
-            policies=grpc_request.get("policies", []),
-            metadata={"protocol": "grpc", "version": grpc_request.get("version", "1.0")},
+            operation=capability.id.rsplit(".", 1)[-1],
+            input_data=invocation.params,
+            metadata={
+                "protocol": "grpc",
+                "capability": capability.id,
+                "version": str(capability.version),
+            },
+            job_id=invocation.request_id or None,
         )
 
-        # Process through mesh (same security, validation, audit)
-        auth_context = self._extract_grpc_auth(grpc_request)
-        mesh_response = await self.mesh_service.process_request(mesh_request, auth_context)
-
-        # Convert back to gRPC format
-        return self._serialize_grpc_response(mesh_response)
-
-    def _parse_grpc_request(self, raw_request: bytes) -> dict:
-        """Parse gRPC protobuf request (simplified)."""
-        # In real implementation: protobuf.parse(raw_request)
-        return {
-            "method": "convert",
-            "params": {"file_path": "/data/test.docx", "format": "pdf"},
-            "metadata": {"auth_token": "grpc-token-123"},
-        }
-
-    def _extract_grpc_auth(self, grpc_request: dict) -> dict:
-        """Extract auth from gRPC metadata."""
-        token = grpc_request.get("metadata", {}).get("auth_token", "")
+    def _extract_grpc_auth(self, metadata: dict[str, str]) -> dict:
+        """Extract auth from gRPC metadata (``authorization: Bearer`` or ``x-api-key``)."""
+        token = metadata.get("authorization", "").removeprefix("Bearer ").strip()
+        token = token or metadata.get("x-api-key", "")
         return {
             "authenticated": bool(token),
             "api_key": token,
@@ -85,28 +192,14 @@ class GRPCAdapter(ProtocolAdapter):
         }
 
     def _serialize_grpc_response(self, mesh_response: MeshResponse) -> bytes:
-        """Convert mesh response to gRPC protobuf."""
-        # In real implementation: protobuf.serialize(response_proto)
-        grpc_response = {
-            "success": mesh_response.success,
-            "result": mesh_response.result,
-            "metadata": {
-                "receipt_id": mesh_response.receipt_id,
-                "processing_time": mesh_response.processing_time_ms,
-                "node_id": mesh_response.mesh_node_id,
-            },
-            "errors": mesh_response.errors,
-        }
-        return json.dumps(grpc_response).encode("utf-8")
+        """Convert mesh response to an InvokeResponse (untyped result)."""
+        result = _invocation_result(mesh_response)
+        return bytes(self.contract.build_response(result, None).SerializeToString())
 
     def deserialize_request(self, raw_request: bytes) -> MeshRequest:
         """Required by abstract base."""
-        grpc_req = self._parse_grpc_request(raw_request)
-        return MeshRequest(
-            service_type=self.mesh_service.service_type,
-            operation=grpc_req["method"],
-            input_data=grpc_req["params"],
-        )
+        request = self.contract.InvokeRequest.FromString(raw_request)
+        return self._to_mesh_request(self.contract.parse_request(request))
 
     def serialize_response(self, mesh_response: MeshResponse) -> bytes:
         """Required by abstract base."""
@@ -114,7 +207,19 @@ class GRPCAdapter(ProtocolAdapter):
 
 
 class ONCRPCAdapter(ProtocolAdapter):
-    """ONC RPC adapter - because sometimes legacy systems happen! 😅"""
+    """ONC RPC adapter - because sometimes legacy systems happen! 😅
+
+    Wire contract (program 100001, version 1):
+    - Arguments: one XDR ``value`` union holding a map of mesh parameters
+    - Result: ``struct { bool success; string receipt_id<>; hyper
+      processing_time_ms; value result; string errors<>; }``
+
+    ``serve()`` starts a pipelined TCP listener (see ``crank.protocols``);
+    ``handle_request()`` handles a single record for in-process callers.
+    """
+
+    # Procedure 0 is the RPC NULL procedure: answered directly, never dispatched
+    NULL_PROCEDURE = 0
 
     def __init__(self, mesh_service: MeshInterface):
         super().__init__(mesh_service)
@@ -123,14 +228,37 @@ class ONCRPCAdapter(ProtocolAdapter):
         self.program_number = 100001
         self.version_number = 1
 
+    async def serve(self, host: str = "0.0.0.0", port: int = 1111, **kwargs: Any) -> asyncio.Server:
+        """Listen for legacy clients over TCP (record marking, pipelined by xid)."""
+        return await start_onc_rpc_server(self.handle_call, host, port, **kwargs)
+
     async def handle_request(self, raw_request: bytes) -> bytes:
-        """Handle ONC RPC request (XDR encoded)."""
-        rpc_request = self._parse_onc_rpc(raw_request)
+        """Handle one ONC RPC call record (no record mark) and return the reply message."""
+        reply = await handle_call_record(self.handle_call, raw_request)
+        if reply is None:
+            raise ValueError("Invalid ONC RPC request")
+        return reply
+
+    async def handle_call(self, call: RPCCall) -> bytes:
+        """Dispatch a decoded call to the mesh and return the XDR result body."""
+        if call.procedure == self.NULL_PROCEDURE and call.program == self.program_number:
+            return b""
+
+        rpc_request = self._parse_onc_rpc(call)
+        operation = self._map_rpc_procedure(rpc_request["procedure"])
 
+        # ONC RPC carries no trace context: each call starts a trace
+        with _server_span("onc-rpc", operation) as span:
+            return await self._dispatch_call(rpc_request, operation, span)
+
+    async def _dispatch_call(
+        self, rpc_request: dict[str, Any], operation: str, span: Span
+    ) -> bytes:
+        """Process a parsed call through the mesh within its span."""
         # Convert to mesh request
         mesh_request = MeshRequest(
             service_type=self.mesh_service.service_type,
-            operation=self._map_rpc_procedure(rpc_request["procedure"]),
+            operation=operation,
             input_data=rpc_request["params"],
             policies=["legacy_system_validation"],  # Special policies for legacy
             metadata={
@@ -141,40 +269,51 @@ class ONCRPCAdapter(ProtocolAdapter):
                 "xid": rpc_request["xid"],  # Transaction ID
             },
         )
+        inject(mesh_request.metadata, span)
 
         # Process through mesh (same security!)
         auth_context = self._extract_rpc_auth(rpc_request)
         mesh_response = await self.mesh_service.process_request(mesh_request, auth_context)
+        _record_outcome(span, [mesh_response])
 
         # Convert back to ONC RPC XDR format
-        return self._serialize_onc_rpc_response(mesh_response, rpc_request["xid"])
-
-    def _parse_onc_rpc(self, raw_request: bytes) -> dict:
-        """Parse ONC RPC XDR request (simplified)."""
-        # Real implementation would use XDR parsing
-        # For demo, simulate parsing XDR-encoded request
-
-        if len(raw_request) < 16:
-            raise ValueError("Invalid ONC RPC request")
+        return self._encode_mesh_result(mesh_response)
+
+    def _parse_onc_rpc(self, call: RPCCall) -> dict[str, Any]:
+        """Validate program/version/procedure and decode XDR arguments.
+
+        Raises:
+            RPCReplyError: PROG_UNAVAIL, PROG_MISMATCH, PROC_UNAVAIL or AUTH_ERROR
+            XDRError: If the arguments are not a single XDR value map (GARBAGE_ARGS)
+        """
+        if call.program != self.program_number:
+            raise RPCReplyError(AcceptStatus.PROG_UNAVAIL)
+        if call.version != self.version_number:
+            raise RPCReplyError(
+                AcceptStatus.PROG_MISMATCH, mismatch=(self.version_number, self.version_number)
+            )
+        if self._map_rpc_procedure(call.procedure) == "unknown":
+            raise RPCReplyError(AcceptStatus.PROC_UNAVAIL)
 
-        # Simulate XDR parsing (big-endian format)
-        xid = struct.unpack(">I", raw_request[0:4])[0]
-        msg_type = struct.unpack(">I", raw_request[4:8])[0]  # 0 = CALL
-        rpc_version = struct.unpack(">I", raw_request[8:12])[0]  # Should be 2
-        program = struct.unpack(">I", raw_request[12:16])[0]
+        decoder = XDRDecoder(call.args)
+        params = decoder.unpack_value() if decoder.remaining else {}
+        decoder.done()
+        if not isinstance(params, dict):
+            raise XDRError("ONC RPC arguments must be an XDR value map")
 
+        auth_sys = call.auth_sys()
         return {
-            "xid": xid,
-            "msg_type": msg_type,
-            "rpc_version": rpc_version,
-            "program": program,
-            "version": 1,
-            "procedure": 1,  # CONVERT_DOCUMENT procedure
-            "params": {
-                "file_path": "/legacy/systems/document.txt",
-                "target_format": "pdf",
+            "xid": call.xid,
+            "program": call.program,
+            "version": call.version,
+            "procedure": call.procedure,
+            "params": params,
+            "credentials": {
+                "auth_type": _auth_type_name(call.credential.flavor),
+                "uid": auth_sys.uid if auth_sys else 0,
+                "gid": auth_sys.gid if auth_sys else 0,
+                "machine_name": auth_sys.machine_name if auth_sys else "",
             },
-            "credentials": {"auth_type": "AUTH_SYS", "uid": 1000},
         }
 
     def _map_rpc_procedure(self, procedure_num: int) -> str:
@@ -202,41 +341,25 @@ class ONCRPCAdapter(ProtocolAdapter):
             "auth_type": creds.get("auth_type", "AUTH_NONE"),
         }
 
-    def _serialize_onc_rpc_response(self, mesh_response: MeshResponse, xid: int) -> bytes:
-        """Convert mesh response to ONC RPC XDR format."""
-        # Real implementation would use XDR encoding
-
-        # ONC RPC response header (simplified)
-        response_header = struct.pack(">I", xid)  # Transaction ID
-        response_header += struct.pack(">I", 1)  # REPLY message type
-        response_header += struct.pack(">I", 0 if mesh_response.success else 1)  # Accept status
-
-        # Encode result data (simplified - real XDR would be more complex)
-        if mesh_response.success:
-            result_data = json.dumps(
-                {
-                    "success": True,
-                    "result": mesh_response.result,
-                    "receipt_id": mesh_response.receipt_id,
-                    "processing_time": mesh_response.processing_time_ms,
-                },
-            ).encode("utf-8")
-        else:
-            result_data = json.dumps(
-                {
-                    "success": False,
-                    "errors": mesh_response.errors,
-                },
-            ).encode("utf-8")
-
-        # Length prefix for data
-        length_prefix = struct.pack(">I", len(result_data))
+    def _encode_mesh_result(self, mesh_response: MeshResponse) -> bytes:
+        """Encode a mesh response as the XDR result struct."""
+        encoder = XDREncoder()
+        encoder.pack_bool(mesh_response.success)
+        encoder.pack_string(mesh_response.receipt_id or "")
+        encoder.pack_hyper(mesh_response.processing_time_ms or 0)
+        encoder.pack_value(mesh_response.result if mesh_response.success else None)
+        encoder.pack_array(mesh_response.errors or [], encoder.pack_string)
+        return encoder.getvalue()
 
-        return response_header + length_prefix + result_data
+    def _serialize_onc_rpc_response(self, mesh_response: MeshResponse, xid: int) -> bytes:
+        """Convert mesh response to an ONC RPC accepted reply (XDR)."""
+        return encode_accepted_reply(
+            xid, AcceptStatus.SUCCESS, self._encode_mesh_result(mesh_response)
+        )
 
     def deserialize_request(self, raw_request: bytes) -> MeshRequest:
         """Required by abstract base."""
-        rpc_req = self._parse_onc_rpc(raw_request)
+        rpc_req = self._parse_onc_rpc(decode_call(raw_request))
         return MeshRequest(
             service_type=self.mesh_service.service_type,
             operation=self._map_rpc_procedure(rpc_req["procedure"]),
@@ -248,63 +371,105 @@ class ONCRPCAdapter(ProtocolAdapter):
         return self._serialize_onc_rpc_response(mesh_response, 12345)
 
 
-class GraphQLAdapter(ProtocolAdapter):
-    """GraphQL adapter - for when you need flexible queries."""
+def _auth_type_name(flavor: int) -> str:
+    try:
+        return f"AUTH_{AuthFlavor(flavor).name}"
+    except ValueError:
+        return "AUTH_UNKNOWN"
 
-    def __init__(self, mesh_service: MeshInterface):
-        super().__init__(mesh_service)
-        self.protocol_name = "GraphQL"
 
-    async def handle_request(self, raw_request: bytes) -> bytes:
-        """Handle GraphQL query/mutation."""
-        graphql_request = json.loads(raw_request.decode("utf-8"))
+def decode_mesh_result(body: bytes | memoryview) -> dict[str, Any]:
+    """Decode the ONC RPC result struct (client side; inverse of the adapter's encoding)."""
+    decoder = XDRDecoder(body)
+    result = {
+        "success": decoder.unpack_bool(),
+        "receipt_id": decoder.unpack_string(),
+        "processing_time_ms": decoder.unpack_hyper(),
+        "result": decoder.unpack_value(),
+        "errors": decoder.unpack_array(decoder.unpack_string),
+    }
+    decoder.done()
+    return result
 
-        # Parse GraphQL query to determine operation
-        query = graphql_request.get("query", "")
-        variables = graphql_request.get("variables", {})
 
-        operation = self._parse_graphql_operation(query)
+class GraphQLAdapter(ProtocolAdapter):
+    """GraphQL adapter - for when you need flexible queries.
+
+    The schema is generated from the capability catalog (one root field per
+    capability). Query documents are parsed and validated once and cached by
+    hash, which also serves persisted queries; sibling fields calling the same
+    capability reach the mesh service as one ``process_batch`` call.
+    """
+
+    def __init__(
+        self,
+        mesh_service: MeshInterface,
+        capabilities: Sequence[CapabilityDefinition] = CAPABILITY_CATALOG,
+    ):
+        super().__init__(mesh_service)
+        self.protocol_name = "GraphQL"
+        self.graphql = MeshGraphQL(self.invoke_batch, capabilities)
 
-        # Convert to mesh request
-        mesh_request = MeshRequest(
+    async def handle_request(
+        self, raw_request: bytes, headers: dict[str, str] | None = None
+    ) -> bytes:
+        """Handle a GraphQL-over-HTTP JSON body (query or persisted query hash)."""
+        try:
+            graphql_request = json.loads(raw_request.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            graphql_request = None
+            error = f"Invalid JSON body: {e}"
+        else:
+            error = "Request body must be a JSON object"
+        if not isinstance(graphql_request, dict):
+            response: dict[str, Any] = {
+                "errors": [{"message": error, "extensions": {"code": "BAD_REQUEST"}}]
+            }
+        else:
+            response = await self.graphql.execute(graphql_request, headers)
+        return json.dumps(response).encode("utf-8")
+
+    async def invoke_batch(self, invocations: list[Invocation]) -> list[InvocationResult]:
+        """Dispatch invocations of one capability through the mesh as one batch."""
+        headers = invocations[0].metadata
+        with _server_span("graphql", invocations[0].capability.id, headers) as span:
+            span.set_attribute("crank.batch_size", len(invocations))
+            mesh_requests = [self._to_mesh_request(invocation) for invocation in invocations]
+            for mesh_request in mesh_requests:
+                inject(mesh_request.metadata, span)
+
+            # Process through mesh (same security, validation, audit)
+            auth_context = self._extract_graphql_auth(headers)
+            if len(mesh_requests) == 1:
+                responses = [
+                    await self.mesh_service.process_request(mesh_requests[0], auth_context)
+                ]
+            else:
+                responses = await self.mesh_service.process_batch(mesh_requests, auth_context)
+            _record_outcome(span, responses)
+        return [_invocation_result(response) for response in responses]
+
+    def _to_mesh_request(self, invocation: Invocation) -> MeshRequest:
+        capability = invocation.capability
+        return MeshRequest(
             service_type=self.mesh_service.service_type,
-            operation=operation["name"],
-            input_data={**operation["args"], **variables},
-            policies=operation.get("policies", []),
-            metadata={"protocol": "graphql", "query": query},
+            operation=capability.id.rsplit(".", 1)[-1],
+            input_data=invocation.params,
+            metadata={
+                "protocol": "graphql",
+                "capability": capability.id,
+                "version": str(capability.version),
+            },
         )
 
-        # Process through mesh
-        auth_context = self._extract_graphql_auth(graphql_request)
-        mesh_response = await self.mesh_service.process_request(mesh_request, auth_context)
-
-        # Convert to GraphQL response
-        return self._serialize_graphql_response(mesh_response)
-
-    def _parse_graphql_operation(self, query: str) -> dict:
-        """Parse GraphQL query (simplified)."""
-        # Real implementation would use graphql-core parser
-        if "mutation" in query.lower() and "convert" in query.lower():
-            return {
-                "name": "convert",
-                "args": {"file_path": "/data/test.docx", "format": "pdf"},
-                "type": "mutation",
-            }
-        if "query" in query.lower():
-            return {
-                "name": "capabilities",
-                "args": {},
-                "type": "query",
-            }
-        return {"name": "unknown", "args": {}, "type": "query"}
-
-    def _extract_graphql_auth(self, graphql_request: dict) -> dict:
-        """Extract auth from GraphQL context."""
-        # Would typically come from HTTP headers
+    def _extract_graphql_auth(self, headers: dict[str, str]) -> dict:
+        """Extract auth from HTTP headers (``authorization: Bearer`` or ``x-api-key``)."""
+        token = headers.get("authorization", "").removeprefix("Bearer ").strip()
+        token = token or headers.get("x-api-key", "")
         return {
-            "authenticated": True,
-            "api_key": "graphql-token-456",
-            "user_id": "graphql_user_789",
+            "authenticated": bool(token),
+            "api_key": token,
+            "user_id": f"graphql_user_{hash(token) % 10000}",
             "access_method": "graphql",
         }
 
@@ -336,13 +501,8 @@ class GraphQLAdapter(ProtocolAdapter):
 
     def deserialize_request(self, raw_request: bytes) -> MeshRequest:
         """Required by abstract base."""
-        gql_req = json.loads(raw_request.decode("utf-8"))
-        operation = self._parse_graphql_operation(gql_req.get("query", ""))
-        return MeshRequest(
-            service_type=self.mesh_service.service_type,
-            operation=operation["name"],
-            input_data=operation["args"],
-        )
+        # One document can select many capability fields; see handle_request
+        raise ValueError("GraphQL requests may hold several invocations; use handle_request")
 
     def serialize_response(self, mesh_response: MeshResponse) -> bytes:
         """Required by abstract base."""
@@ -357,9 +517,11 @@ class UniversalProtocolServer:
         self.adapters: dict[str, ProtocolAdapter] = {}
 
         # Register protocol adapters
-        self.register_adapter("grpc", GRPCAdapter(mesh_service))
+        if GRPC_AVAILABLE:
+            self.register_adapter("grpc", GRPCAdapter(mesh_service))
         self.register_adapter("onc-rpc", ONCRPCAdapter(mesh_service))
-        self.register_adapter("graphql", GraphQLAdapter(mesh_service))
+        if GRAPHQL_AVAILABLE:
+            self.register_adapter("graphql", GraphQLAdapter(mesh_service))
 
     def register_adapter(self, protocol_name: str, adapter: ProtocolAdapter):
         """Register a new protocol adapter."""
@@ -411,11 +573,33 @@ async def demonstrate_universal_protocols():
     print()
 
     # Test each protocol
-    protocols_to_test = [
-        ("grpc", b"mock_grpc_request_data"),
-        ("onc-rpc", struct.pack(">IIII", 12345, 0, 2, 100001) + b"padding_data"),
-        ("graphql", b'{"query": "mutation { convert(file: \\"test.docx\\", format: \\"pdf\\") }"}'),
+    onc_args = XDREncoder()
+    onc_args.pack_value({"file_path": "/legacy/systems/document.txt", "target_format": "pdf"})
+    convert_params = {"document_data": "ZG9j", "source_format": "docx", "target_format": "pdf"}
+    protocols_to_test = []
+    if GRPC_AVAILABLE:
+        grpc_adapter = server.adapters["grpc"]
+        assert isinstance(grpc_adapter, GRPCAdapter)
+        grpc_request = grpc_adapter.contract.make_request("document.convert", convert_params)
+        protocols_to_test.append(("grpc", grpc_request.SerializeToString()))
+    protocols_to_test += [
+        (
+            "onc-rpc",
+            encode_call(
+                12345, 100001, 1, 1, onc_args.getvalue(), encode_auth_sys(1000, 1000, "legacy-host")
+            ),
+        ),
     ]
+    if GRAPHQL_AVAILABLE:
+        # Two aliased fields on one capability -> one process_batch call
+        graphql_query = (
+            "query Convert($a: DocumentConvertInput!, $b: DocumentConvertInput!) {"
+            " a: documentConvert(input: $a) { success receiptId }"
+            " b: documentConvert(input: $b) { success receiptId } }"
+        )
+        graphql_variables = {"a": convert_params, "b": {**convert_params, "target_format": "txt"}}
+        graphql_body = {"query": graphql_query, "variables": graphql_variables}
+        protocols_to_test.append(("graphql", json.dumps(graphql_body).encode("utf-8")))
 
     for protocol, test_data in protocols_to_test:
         print(f"🔄 Testing {protocol.upper()} Protocol:")
@@ -427,6 +611,15 @@ async def demonstrate_universal_protocols():
             if protocol == "graphql":
                 response_data = json.loads(response.decode("utf-8"))
                 print(f"   📄 Response: {json.dumps(response_data, indent=2)[:200]}...")
+            elif protocol == "onc-rpc":
+                xid, _, status, body = decode_reply(response)
+                print(f"   📄 Reply xid={xid} status={AcceptStatus(status).name}")
+                print(f"   📄 Result: {decode_mesh_result(body)}")
+            elif protocol == "grpc":
+                grpc_result = grpc_adapter.contract.read_response(
+                    grpc_adapter.contract.InvokeResponse.FromString(response)
+                )
+                print(f"   📄 Result: {grpc_result}")
             else:
                 print(f"   📄 Response starts with: {response[:50]}...")
 
@@ -434,6 +627,68 @@ async def demonstrate_universal_protocols():
             print(f"   ❌ Error: {e}")
         print()
 
+    # Legacy clients over real TCP: many pipelined calls on one connection
+    print("🔄 Testing ONC-RPC over TCP (pipelined):")
+    adapter = server.adapters["onc-rpc"]
+    assert isinstance(adapter, ONCRPCAdapter)
+    tcp_server = await adapter.serve("127.0.0.1", 0)
+    port = tcp_server.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    calls = 1000
+    started = asyncio.get_running_loop().time()
+    writer.write(
+        b"".join(
+            frame_record(encode_call(xid, 100001, 1, 1, onc_args.getvalue()))
+            for xid in range(calls)
+        )
+    )
+    for _ in range(calls):
+        (mark,) = struct.unpack(">I", await reader.readexactly(4))
+        await reader.readexactly(mark & 0x7FFFFFFF)
+    elapsed = asyncio.get_running_loop().time() - started
+    print(f"   ✅ {calls} calls on one connection in {elapsed * 1000:.0f} ms")
+    writer.close()
+    tcp_server.close()
+    await tcp_server.wait_closed()
+    print()
+
+    if GRAPHQL_AVAILABLE:
+        # Repeat callers send only the query hash; the parsed document is reused
+        print("🔄 Testing GraphQL persisted query:")
+        persisted_body = {
+            "variables": graphql_variables,
+            "extensions": {
+                "persistedQuery": {"version": 1, "sha256Hash": query_hash(graphql_query)}
+            },
+        }
+        response = await server.handle_request(
+            "graphql", json.dumps(persisted_body).encode("utf-8")
+        )
+        graphql_adapter = server.adapters["graphql"]
+        assert isinstance(graphql_adapter, GraphQLAdapter)
+        documents = graphql_adapter.graphql.documents
+        print(f"   ✅ {json.loads(response)['data']}")
+        print(f"   📄 Document cache: {documents.hits} hits, {documents.misses} parse/validate")
+        print()
+
+    if GRPC_AVAILABLE:
+        # Internal callers: one HTTP/2 channel multiplexes every concurrent call
+        print("🔄 Testing gRPC over HTTP/2 (InvokeStream):")
+        grpc_server, grpc_port = await grpc_adapter.serve("127.0.0.1:0")
+        client = MeshGatewayClient(f"127.0.0.1:{grpc_port}", grpc_adapter.contract)
+        started = asyncio.get_running_loop().time()
+        results = [
+            result
+            async for _, result in client.invoke_many(
+                ("document.convert", convert_params) for _ in range(calls)
+            )
+        ]
+        elapsed = asyncio.get_running_loop().time() - started
+        print(f"   ✅ {len(results)} calls on one channel in {elapsed * 1000:.0f} ms")
+        await client.close()
+        await grpc_server.stop(None)
+        print()
+
     print("🎉 KEY INSIGHT:")
     print("=" * 15)
     print("Your mesh architecture can support ANY protocol:")
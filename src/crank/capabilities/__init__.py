@@ -11,6 +11,7 @@ Design Principles:
 """
 
 from .schema import (
+    CAPABILITY_CATALOG,
     CSR_SIGNING,
     DOCUMENT_CONVERSION,
     EMAIL_CLASSIFICATION,
@@ -24,6 +25,7 @@ from .schema import (
 )
 
 __all__ = [
+    "CAPABILITY_CATALOG",
     "CSR_SIGNING",
     "DOCUMENT_CONVERSION",
     "EMAIL_CLASSIFICATION",
@@ -644,3 +644,74 @@ CODEX_ZETTEL_REPOSITORY = CapabilityDefinition(
     tags=["zettelkasten", "knowledge", "codex", "content"],
     estimated_duration_ms=150,
 )
+
+VECTOR_SIMILARITY_SEARCH = CapabilityDefinition(
+    id="vector.similarity_search",
+    version=CapabilityVersion(major=1, minor=0, patch=0),
+    name="Vector Similarity Search",
+    description="Top-k nearest-neighbour search over image and zettel embeddings",
+    contract=IOContract(
+        input_schema={
+            "type": "object",
+            "properties": {
+                "namespace": {
+                    "type": "string",
+                    "description": "Embedding space to search (e.g. image.clip, zettel.text)",
+                },
+                "vector": {
+                    "type": "array",
+                    "items": {"type": "number"},
+                    "description": "Query embedding (dimension must match the namespace)",
+                },
+                "text": {
+                    "type": "string",
+                    "description": "Query text, embedded by the worker when no vector is given",
+                },
+                "k": {"type": "integer", "default": 10, "minimum": 1, "maximum": 1000},
+            },
+            "required": ["namespace"],
+        },
+        output_schema={
+            "type": "object",
+            "properties": {
+                "namespace": {"type": "string"},
+                "results": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "key": {"type": "string"},
+                            "score": {"type": "number"},
+                        },
+                        "required": ["key", "score"],
+                    },
+                },
+                "processing_time_ms": {"type": "number"},
+            },
+            "required": ["namespace", "results"],
+        },
+        error_codes=[
+            ErrorCode(code="UNKNOWN_NAMESPACE", description="No vectors indexed under namespace", retryable=False),
+            ErrorCode(code="DIMENSION_MISMATCH", description="Query vector has the wrong dimension", retryable=False),
+            ErrorCode(code="EMBEDDER_UNAVAILABLE", description="Text query given but no text embedding model installed", retryable=False),
+        ],
+    ),
+    tags=["vector", "embeddings", "similarity", "search"],
+    requires_gpu=False,  # Brute-force matmul on CPU; IVF for very large namespaces
+    estimated_duration_ms=50,
+)
+
+# Every catalog entry, in registration order. The order is part of the gRPC
+# contract (it assigns protobuf field numbers), so new capabilities are
+# appended, never inserted.
+CAPABILITY_CATALOG: tuple[CapabilityDefinition, ...] = (
+    DOCUMENT_CONVERSION,
+    EMAIL_CLASSIFICATION,
+    EMAIL_PARSING,
+    IMAGE_CLASSIFICATION,
+    STREAMING_CLASSIFICATION,
+    CSR_SIGNING,
+    PHILOSOPHICAL_ANALYSIS,
+    CODEX_ZETTEL_REPOSITORY,
+    VECTOR_SIMILARITY_SEARCH,
+)
@@ -1,5 +1,32 @@
 """Controller package - privileged routing and registry logic."""
 
+from .admission import AdmissionController, AdmissionRejected, Lease
 from .capability_registry import CapabilityRegistry, WorkerEndpoint
+from .hedging import HedgeBudget, Hedger
+from .idempotency import CachedResult, IdempotencyCache, IdempotencyError
+from .load import LOAD_FIELDS, LoadReport
+from .outliers import OutlierDetector
+from .replication import HttpPeer, HybridLogicalClock, Replicator, Version
+from .slo import SLOObjectives, SLOTracker
 
-__all__ = ["CapabilityRegistry", "WorkerEndpoint"]
+__all__ = [
+    "LOAD_FIELDS",
+    "AdmissionController",
+    "AdmissionRejected",
+    "CachedResult",
+    "CapabilityRegistry",
+    "HedgeBudget",
+    "Hedger",
+    "HttpPeer",
+    "HybridLogicalClock",
+    "IdempotencyCache",
+    "IdempotencyError",
+    "Lease",
+    "LoadReport",
+    "OutlierDetector",
+    "Replicator",
+    "SLOObjectives",
+    "SLOTracker",
+    "Version",
+    "WorkerEndpoint",
+]
@@ -0,0 +1,374 @@
+"""Admission control - enforce per-worker capability concurrency at the controller.
+
+The controller routes but does not proxy, so outstanding invocations are
+tracked as leases: a successful ``admit()`` takes one slot on the chosen
+worker for that capability and the caller returns it with ``release()``
+when the invocation finishes (leases not returned within ``lease_ttl`` are
+reclaimed). ``CapabilitySchema.max_concurrency`` is the slot count.
+
+When every healthy worker is full, the request waits in a bounded FIFO per
+capability and is handed the next freed slot. Overload sheds fast instead
+of queueing into timeouts (``AdmissionRejected``, HTTP 429):
+- the wait queue is full
+- the request's deadline cannot be met: the expected queue wait plus the
+  capability's typical service time (an EWMA of lease durations) already
+  exceeds the time left, checked on arrival and again before a queued
+  request is granted a slot
+- it waited ``max_wait`` seconds (requests without a deadline) or until
+  its deadline less the expected service time
+
+Requests with SLO constraints only take slots on workers the registry's
+``slo_filter()`` accepts; under the "reject" fallback a request no worker
+can serve within its SLO is turned away with HTTP 503.
+"""
+
+import asyncio
+import logging
+import math
+import time
+import uuid
+from collections import defaultdict, deque
+from collections.abc import Collection
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from .capability_registry import CapabilityRegistry, WorkerEndpoint
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_QUEUE = 64  # Waiting requests per capability
+DEFAULT_MAX_WAIT = 5.0  # Seconds a request without a deadline may wait
+DEFAULT_LEASE_TTL = 300.0  # Seconds before an unreleased lease is reclaimed
+SERVICE_TIME_ALPHA = 0.2  # EWMA weight of the newest lease duration
+
+
+class AdmissionRejected(Exception):
+    """Request shed instead of admitted.
+
+    ``status_code`` is the HTTP status to return (429) and ``retry_after``
+    the suggested back-off in seconds.
+    """
+
+    def __init__(self, message: str, retry_after: float, status_code: int = 429) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+
+@dataclass(slots=True)
+class Lease:
+    """One admitted invocation holding a slot on a worker."""
+
+    lease_id: str
+    worker: WorkerEndpoint
+    capability_key: str
+    granted_at: float  # time.monotonic()
+    queued_ms: float = 0.0
+    metadata: dict[str, Any] = field(default_factory=dict)  # Caller's per-invocation state
+
+
+@dataclass(slots=True)
+class _Waiter:
+    future: "asyncio.Future[Lease]"
+    deadline: Optional[float]  # time.monotonic(); None waits up to max_wait
+    enqueued_at: float
+    slo_constraints: Optional[dict[str, Any]] = None
+
+
+class AdmissionController:
+    """Tracks outstanding invocations and admits, queues or sheds requests.
+
+    Args:
+        registry: Source of healthy workers and load-aware worker selection
+        max_queue: Requests allowed to wait per capability
+        max_wait: Longest wait for a request without a deadline (seconds)
+        lease_ttl: Seconds after which an unreleased lease is reclaimed
+    """
+
+    def __init__(
+        self,
+        registry: CapabilityRegistry,
+        *,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        max_wait: float = DEFAULT_MAX_WAIT,
+        lease_ttl: float = DEFAULT_LEASE_TTL,
+    ) -> None:
+        self.registry = registry
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.lease_ttl = lease_ttl
+        self._outstanding: dict[tuple[str, str], int] = defaultdict(int)  # (worker, cap)
+        self._leases: dict[str, Lease] = {}  # Grant order = expiry order
+        self._queues: dict[str, deque[_Waiter]] = defaultdict(deque)
+        self._service_ms: dict[str, float] = {}  # EWMA lease duration per capability
+        self._counts: dict[str, dict[str, int]] = defaultdict(
+            lambda: {"admitted": 0, "queued": 0, "shed": 0, "expired": 0}
+        )
+
+    # --- Admission ---
+
+    async def admit(
+        self,
+        verb: str,
+        capability: str,
+        *,
+        deadline_ms: Optional[float] = None,
+        slo_constraints: Optional[dict[str, Any]] = None,
+    ) -> Optional[Lease]:
+        """Take a slot on the least-loaded worker with one free.
+
+        Args:
+            verb: Capability verb
+            capability: Capability name
+            deadline_ms: Time budget for the whole invocation; requests that
+                cannot start and finish within it are shed
+            slo_constraints: Only use workers currently meeting these (see
+                ``CapabilityRegistry.slo_filter``)
+
+        Returns:
+            The lease, or None if no healthy worker serves the capability
+
+        Raises:
+            AdmissionRejected: The request was shed (queue full, deadline
+                unattainable, or waited too long), or no worker meets its SLO
+                constraints under the "reject" fallback (503)
+            ValueError: Malformed slo_constraints
+        """
+        capability_key = f"{verb}:{capability}"
+        self._expire_leases()
+        healthy = self.registry.healthy_workers(capability_key)
+        if not healthy:
+            return None
+        candidates = self.registry.slo_filter(healthy, capability_key, slo_constraints)
+        if not candidates:
+            raise self._unmet_slo(capability_key)
+
+        now = time.monotonic()
+        counts = self._counts[capability_key]
+        queue = self._queues[capability_key]
+        if not queue:
+            lease = self._grant(candidates, capability_key, now, slo_constraints)
+            if lease is not None:
+                return lease
+
+        deadline = None if deadline_ms is None else now + deadline_ms / 1000
+        capacity = sum(worker.max_concurrency(capability_key) for worker in candidates)
+        wait = self._expected_wait(capability_key, len(queue), capacity)
+        service = self._service_ms.get(capability_key, 0.0) / 1000
+        if len(queue) >= self.max_queue:
+            raise self._shed(capability_key, "wait queue full", wait)
+        if deadline is not None and now + wait + service > deadline:
+            raise self._shed(capability_key, "deadline unattainable", wait)
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = _Waiter(future, deadline, now, slo_constraints)
+        queue.append(waiter)
+        counts["queued"] += 1
+        timeout = self.max_wait if deadline is None else max(deadline - now - service, 0.0)
+        try:
+            await asyncio.wait({waiter.future}, timeout=timeout)
+        except BaseException:  # Caller went away: give back a slot granted meanwhile
+            self._abandon(waiter, capability_key)
+            raise
+        if waiter.future.done():
+            return waiter.future.result()  # Granted, or raises the shed decision
+        self._abandon(waiter, capability_key)
+        raise self._shed(capability_key, "timed out waiting for capacity", wait)
+
+    def try_admit(
+        self,
+        capability_key: str,
+        *,
+        exclude: Collection[str] = (),
+        slo_constraints: Optional[dict[str, Any]] = None,
+    ) -> Optional[Lease]:
+        """Take an idle slot without queueing, e.g. for a hedged duplicate.
+
+        Never takes capacity a queued request is waiting for.
+
+        Args:
+            capability_key: Capability (verb:name)
+            exclude: Worker IDs not to use (the primary's worker)
+            slo_constraints: Only use workers currently meeting these
+
+        Returns:
+            The lease, or None if no eligible worker has a free slot
+        """
+        self._expire_leases()
+        if self._queues.get(capability_key):
+            return None
+        healthy = [
+            worker
+            for worker in self.registry.healthy_workers(capability_key)
+            if worker.worker_id not in exclude
+        ]
+        candidates = self.registry.slo_filter(healthy, capability_key, slo_constraints)
+        return self._grant(candidates, capability_key, time.monotonic(), slo_constraints)
+
+    def release(self, lease_id: str, *, cancelled: bool = False) -> Optional[Lease]:
+        """Return a lease's slot and hand it to the next waiter.
+
+        Args:
+            lease_id: Lease to return
+            cancelled: The invocation was abandoned (e.g. lost a hedge race);
+                its truncated duration is kept out of the service-time estimate
+
+        Returns:
+            The released lease, or None if it is unknown (already released
+            or reclaimed)
+        """
+        lease = self._leases.pop(lease_id, None)
+        if lease is None:
+            return None
+        self._free(lease)
+        if not cancelled:
+            duration_ms = (time.monotonic() - lease.granted_at) * 1000
+            previous = self._service_ms.get(lease.capability_key)
+            self._service_ms[lease.capability_key] = (
+                duration_ms
+                if previous is None
+                else previous + SERVICE_TIME_ALPHA * (duration_ms - previous)
+            )
+        self._dispatch(lease.capability_key)
+        return lease
+
+    def dispatch_all(self) -> None:
+        """Grant queued requests any newly available capacity (e.g. a new worker)."""
+        for capability_key in list(self._queues):
+            self._dispatch(capability_key)
+
+    # --- Introspection ---
+
+    def lease(self, lease_id: str) -> Optional[Lease]:
+        """An outstanding lease, or None if released or reclaimed."""
+        return self._leases.get(lease_id)
+
+    def outstanding(self, worker_id: str, capability_key: str) -> int:
+        """Leases held on a worker for a capability."""
+        return self._outstanding.get((worker_id, capability_key), 0)
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Per-capability outstanding, queued and shed counts."""
+        keys = set(self._counts) | {cap for _, cap in self._outstanding}
+        return {
+            key: {
+                **self._counts[key],
+                "outstanding": sum(n for (_, cap), n in self._outstanding.items() if cap == key),
+                "waiting": len(self._queues.get(key, ())),
+                "service_ms": round(self._service_ms.get(key, 0.0), 2),
+            }
+            for key in sorted(keys)
+        }
+
+    # --- Internal Helpers ---
+
+    def _grant(
+        self,
+        candidates: list[WorkerEndpoint],
+        capability_key: str,
+        now: float,
+        slo_constraints: Optional[dict[str, Any]] = None,
+    ) -> Optional[Lease]:
+        available = [
+            worker
+            for worker in candidates
+            if self.outstanding(worker.worker_id, capability_key)
+            < worker.max_concurrency(capability_key)
+        ]
+        if not available:
+            return None
+        worker = self.registry.select(available, capability_key, slo_constraints)
+        lease = Lease(uuid.uuid4().hex, worker, capability_key, now)
+        self._leases[lease.lease_id] = lease
+        self._outstanding[(worker.worker_id, capability_key)] += 1
+        self._counts[capability_key]["admitted"] += 1
+        return lease
+
+    def _dispatch(self, capability_key: str) -> None:
+        queue = self._queues.get(capability_key)
+        if not queue:
+            return
+        healthy = self.registry.healthy_workers(capability_key)
+        now = time.monotonic()
+        service = self._service_ms.get(capability_key, 0.0) / 1000
+        while queue:
+            waiter = queue[0]
+            if waiter.future.done():  # Abandoned
+                queue.popleft()
+                continue
+            if waiter.deadline is not None and now + service > waiter.deadline:
+                queue.popleft()
+                waiter.future.set_exception(
+                    self._shed(capability_key, "deadline unattainable", service)
+                )
+                continue
+            candidates = self.registry.slo_filter(healthy, capability_key, waiter.slo_constraints)
+            if not candidates:
+                if not healthy:
+                    return  # No workers at all: wait for one to (re)register
+                queue.popleft()
+                waiter.future.set_exception(self._unmet_slo(capability_key))
+                continue
+            lease = self._grant(candidates, capability_key, now, waiter.slo_constraints)
+            if lease is None:
+                return
+            queue.popleft()
+            lease.queued_ms = (now - waiter.enqueued_at) * 1000
+            waiter.future.set_result(lease)
+
+    def _abandon(self, waiter: _Waiter, capability_key: str) -> None:
+        future = waiter.future
+        if future.done() and not future.cancelled() and future.exception() is None:
+            self.release(future.result().lease_id)
+        future.cancel()
+        queue = self._queues[capability_key]
+        if waiter in queue:
+            queue.remove(waiter)
+
+    def _free(self, lease: Lease) -> None:
+        key = (lease.worker.worker_id, lease.capability_key)
+        self._outstanding[key] -= 1
+        if self._outstanding[key] <= 0:
+            del self._outstanding[key]
+
+    def _expire_leases(self) -> None:
+        cutoff = time.monotonic() - self.lease_ttl
+        while self._leases:
+            lease = next(iter(self._leases.values()))
+            if lease.granted_at > cutoff:
+                return
+            logger.warning(
+                "Lease %s on %s for %s not released within %.0fs, reclaiming",
+                lease.lease_id,
+                lease.worker.worker_id,
+                lease.capability_key,
+                self.lease_ttl,
+            )
+            del self._leases[lease.lease_id]
+            self._free(lease)
+            self._counts[lease.capability_key]["expired"] += 1
+            self._dispatch(lease.capability_key)
+
+    def _expected_wait(self, capability_key: str, position: int, capacity: int) -> float:
+        """Seconds until a request behind ``position`` waiters gets a slot."""
+        service_ms = self._service_ms.get(capability_key)
+        if service_ms is None or capacity <= 0:
+            return 0.0  # Unknown service time: no basis for shedding early
+        return (position + 1) / capacity * service_ms / 1000
+
+    def _unmet_slo(self, capability_key: str) -> AdmissionRejected:
+        self._counts[capability_key]["shed"] += 1
+        logger.info("Rejecting request for %s: no worker meets its SLO", capability_key)
+        return AdmissionRejected(
+            f"No worker currently meets the SLO constraints for {capability_key}",
+            retry_after=1.0,
+            status_code=503,
+        )
+
+    def _shed(self, capability_key: str, reason: str, retry_after: float) -> AdmissionRejected:
+        self._counts[capability_key]["shed"] += 1
+        logger.info("Shedding request for %s: %s", capability_key, reason)
+        return AdmissionRejected(
+            f"Overloaded: {reason} for {capability_key}",
+            retry_after=max(1.0, math.ceil(retry_after)),
+        )
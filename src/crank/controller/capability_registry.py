@@ -1,10 +1,44 @@
 """Capability Registry - tracks worker capabilities and enables routing.
 
 Implementation of ADR-0023: Capability Publishing Protocol.
+
+Routing is load-aware: heartbeats carry a load vector (see
+``crank.controller.load``) kept per worker in a fixed-size array, and
+``route()`` picks the healthy worker with the lowest score. A report's
+weight halves every ``load_half_life`` seconds, so a worker that stops
+reporting drifts back to the fleet average instead of keeping a stale
+"idle" reading; requests routed since a worker's last report count as
+in-flight until the next one arrives.
+
+Requests carrying ``slo_constraints`` (e.g. ``{"latency_p95_ms": 100}``)
+are SLO-aware: with an ``SLOTracker`` attached, only workers whose live
+latency and error rate currently meet the constraints are candidates, and
+candidates are ranked by load plus how close they run to the targets. If
+none qualify, the constraint's ``fallback`` policy decides (see
+``slo_filter()``).
+
+Health is heartbeat freshness plus, with an ``OutlierDetector`` attached,
+the worker's circuit breaker: workers that keep failing or run far slower
+than their peers are ejected from routing and reintroduced through probe
+requests (see ``crank.controller.outliers``). Outcomes reach the breakers
+through ``record_outcome()``.
+
+Controllers replicate the registry among themselves (see
+``crank.controller.replication``): every registration, heartbeat and
+deregistration is versioned with a hybrid logical clock, peers pull the
+changes since their last pull (``export_changes()``) and reconcile the rest
+by Merkle anti-entropy (``tree_digests()``, ``export_leaves()``), and
+``import_remote_state()`` merges by last-writer-wins. Heartbeats are
+replicated at most every quarter ``heartbeat_timeout`` per worker, which
+keeps peers' view of the worker healthy without shipping every heartbeat.
 """
 
 import json
 import logging
+import socket
+import time
+from array import array
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
@@ -12,6 +46,17 @@ from typing import Any, Optional
 
 from pydantic import BaseModel, Field
 
+from .load import (
+    DEFAULT_MAX_CONCURRENCY,
+    LOAD_DIMENSIONS,
+    LOAD_FIELDS,
+    LoadReport,
+    load_score,
+)
+from .outliers import OutlierDetector
+from .replication import DEFAULT_CHANGE_LIMIT, ReplicaState, Version
+from .slo import SLOTracker, parse_slo_constraints
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,6 +70,7 @@ class CapabilitySchema(BaseModel):
         - name, verb, version: Basic identification
         - input_schema, output_schema: API contracts
         - requires_gpu, max_concurrency: Resource requirements
+        - idempotent: Duplicate invocations are harmless (enables hedging)
 
     Extended fields (Phase 3+, all optional):
         - FaaS metadata: runtime, env_profile, constraints
@@ -42,6 +88,7 @@ class CapabilitySchema(BaseModel):
     output_schema: dict[str, Any] = Field(default_factory=dict)
     requires_gpu: bool = False
     max_concurrency: int = 10
+    idempotent: bool = False  # Safe to run twice: eligible for request hedging
 
     # FaaS metadata (faas-worker-specification.md)
     runtime: Optional[str] = None  # "python3.11", "node20", "dotnet8"
@@ -75,6 +122,31 @@ class WorkerEndpoint:
     capabilities: list[CapabilitySchema]
     last_heartbeat: datetime = field(default_factory=datetime.now)
     registered_at: datetime = field(default_factory=datetime.now)
+    # Latest load vector (LOAD_FIELDS order), updated in place; not persisted
+    load: "array[float]" = field(default_factory=lambda: array("d", [0.0] * LOAD_DIMENSIONS))
+    load_reported_at: Optional[float] = None  # time.monotonic() of the report
+    routed_since_report: int = 0
+
+    def record_load(self, report: LoadReport) -> None:
+        """Store a load report and restart the routed-request count."""
+        for index, value in enumerate(report.to_vector()):
+            self.load[index] = value
+        self.load_reported_at = time.monotonic()
+        self.routed_since_report = 0
+
+    def max_concurrency(self, capability_key: str) -> int:
+        """Concurrency limit declared for a capability (verb:name)."""
+        for cap in self.capabilities:
+            if f"{cap.verb}:{cap.name}" == capability_key:
+                return cap.max_concurrency
+        return DEFAULT_MAX_CONCURRENCY
+
+    def is_idempotent(self, capability_key: str) -> bool:
+        """Whether a capability (verb:name) declares itself safe to run twice."""
+        return any(
+            f"{cap.verb}:{cap.name}" == capability_key and cap.idempotent
+            for cap in self.capabilities
+        )
 
     def is_healthy(self, timeout_seconds: int = 120) -> bool:
         """Check if worker is healthy (received heartbeat recently)."""
@@ -116,19 +188,32 @@ class CapabilityRegistry:
     - Track worker heartbeats (staleness detection)
     - Route capability requests to workers
     - Persist state to disk (JSONL format per ADR-0005)
-    - Support multi-controller sync (export/import state)
+    - Replicate state between controllers (versioned deltas, anti-entropy)
     """
 
     def __init__(
         self,
         state_file: Optional[Path] = None,
         heartbeat_timeout: int = 120,
+        load_half_life: float = 30.0,
+        slo_tracker: Optional[SLOTracker] = None,
+        outlier_detector: Optional[OutlierDetector] = None,
+        controller_id: Optional[str] = None,
+        tombstone_ttl: Optional[float] = None,
     ):
         """Initialize registry.
 
         Args:
             state_file: Path to JSONL persistence file (default: state/controller/registry.jsonl)
             heartbeat_timeout: Worker staleness timeout in seconds (default: 120)
+            load_half_life: Seconds for a load report to lose half its weight (default: 30)
+            slo_tracker: Live latency/error data for SLO-aware routing (default: none,
+                so slo_constraints are not enforced)
+            outlier_detector: Per-worker circuit breakers (default: none, so
+                health is heartbeat-only)
+            controller_id: Identity of this replica in versions (default: hostname)
+            tombstone_ttl: Seconds a deregistration is remembered for replication
+                (default: 10 x heartbeat_timeout)
         """
         self.state_file = (
             state_file
@@ -136,6 +221,14 @@ class CapabilityRegistry:
             else Path("state/controller/registry.jsonl")
         )
         self.heartbeat_timeout = heartbeat_timeout
+        self.load_half_life = load_half_life
+        self.slo_tracker = slo_tracker
+        self.outlier_detector = outlier_detector
+        self.controller_id = controller_id or socket.gethostname()
+        self.tombstone_ttl = (
+            tombstone_ttl if tombstone_ttl is not None else 10.0 * heartbeat_timeout
+        )
+        self.replica = ReplicaState(self.controller_id)
         self._workers: dict[str, WorkerEndpoint] = {}
         self._capability_index: dict[str, list[str]] = {}  # capability -> [worker_ids]
 
@@ -164,6 +257,7 @@ class CapabilityRegistry:
         )
 
         self._workers[worker_id] = worker
+        self.replica.stamp(worker_id)
         self._rebuild_capability_index()
         self._save_state()
 
@@ -175,20 +269,32 @@ class CapabilityRegistry:
 
     # --- Heartbeat ---
 
-    def heartbeat(self, worker_id: str) -> bool:
-        """Update worker heartbeat timestamp.
+    def heartbeat(
+        self,
+        worker_id: str,
+        load: Optional[Sequence[float]] = None,
+    ) -> bool:
+        """Update worker heartbeat timestamp and, if given, its load.
 
         Args:
             worker_id: Worker identifier
+            load: Load vector in LOAD_FIELDS order
 
         Returns:
             True if worker is registered, False otherwise
+
+        Raises:
+            ValueError: If the load vector is malformed
         """
         if worker_id not in self._workers:
             logger.warning("Heartbeat from unknown worker: %s", worker_id)
             return False
 
-        self._workers[worker_id].last_heartbeat = datetime.now()
+        worker = self._workers[worker_id]
+        if load is not None:
+            worker.record_load(LoadReport.from_vector(load))
+        worker.last_heartbeat = datetime.now()
+        self._stamp_heartbeat(worker_id)
         self._save_state()
 
         logger.debug("Worker heartbeat: %s", worker_id)
@@ -200,6 +306,9 @@ class CapabilityRegistry:
         """Deregister worker (graceful shutdown)."""
         if worker_id in self._workers:
             del self._workers[worker_id]
+            self.replica.stamp(worker_id, deleted=True)
+            if self.outlier_detector is not None:
+                self.outlier_detector.forget(worker_id)
             self._rebuild_capability_index()
             self._save_state()
             logger.info("Worker deregistered: %s", worker_id)
@@ -219,26 +328,20 @@ class CapabilityRegistry:
         Args:
             verb: Capability verb (e.g., "convert", "classify")
             capability: Capability name (e.g., "document_to_pdf")
-            slo_constraints: SLO requirements (future: SLO-aware routing)
+            slo_constraints: SLO requirements, e.g. {"latency_p95_ms": 100}, plus an
+                optional "fallback" policy (see slo_filter)
             requester_identity: SPIFFE ID (future: CAP policy)
             budget_tokens: Budget (future: economic routing)
 
         Returns:
-            WorkerEndpoint if found, None otherwise
+            Least-loaded healthy WorkerEndpoint meeting the constraints if found,
+            None otherwise
+
+        Raises:
+            ValueError: Malformed slo_constraints
         """
         capability_key = f"{verb}:{capability}"
-        worker_ids = self._capability_index.get(capability_key, [])
-
-        # Filter healthy workers
-        healthy = [
-            self._workers[wid]
-            for wid in worker_ids
-            if wid in self._workers and self._workers[wid].is_healthy(self.heartbeat_timeout)
-        ]
-
-        # FUTURE HOOK: SLO filtering
-        # if slo_constraints:
-        #     healthy = [w for w in healthy if w.meets_slo(slo_constraints)]
+        healthy = self.healthy_workers(capability_key)
 
         # FUTURE HOOK: Economic routing
         # if budget_tokens:
@@ -249,12 +352,138 @@ class CapabilityRegistry:
             logger.warning(
                 "No worker available for capability: %s (total registered: %d)",
                 capability_key,
-                len(worker_ids),
+                len(self._capability_index.get(capability_key, [])),
             )
             return None
 
-        # Simple routing: return first healthy worker
-        return healthy[0]
+        candidates = self.slo_filter(healthy, capability_key, slo_constraints)
+        if not candidates:
+            return None
+        return self.select(candidates, capability_key, slo_constraints)
+
+    def healthy_workers(self, capability_key: str) -> list[WorkerEndpoint]:
+        """Routable workers serving a capability, in registration order.
+
+        A worker is routable while it heartbeats and its circuit breaker (if
+        an outlier detector is attached) is closed or has a free probe slot.
+        """
+        detector = self.outlier_detector
+        return [
+            self._workers[wid]
+            for wid in self._capability_index.get(capability_key, [])
+            if wid in self._workers
+            and self._workers[wid].is_healthy(self.heartbeat_timeout)
+            and (detector is None or detector.available(wid))
+        ]
+
+    def record_outcome(
+        self, capability_key: str, worker_id: str, latency_ms: float, success: bool = True
+    ) -> None:
+        """Feed a completed invocation to the worker's circuit breaker."""
+        if self.outlier_detector is not None:
+            self.outlier_detector.record(capability_key, worker_id, latency_ms, success)
+
+    def slo_filter(
+        self,
+        workers: list[WorkerEndpoint],
+        capability_key: str,
+        slo_constraints: Optional[dict[str, Any]],
+    ) -> list[WorkerEndpoint]:
+        """Workers currently meeting ``slo_constraints``.
+
+        Constraints use the ``CapabilitySchema.slo`` keys (latency_p50_ms,
+        latency_p95_ms, latency_p99_ms, availability_pct). Workers without
+        enough recent samples are given the benefit of the doubt. When none
+        qualify, the "fallback" policy applies:
+        - "best_effort" (default): the worker(s) closest to meeting them
+        - "any": all ``workers``, ignoring the constraints
+        - "reject": none
+
+        Raises:
+            ValueError: Malformed constraints
+        """
+        if not slo_constraints or self.slo_tracker is None or not workers:
+            return workers
+        objectives, fallback = parse_slo_constraints(slo_constraints)
+        ratios = [
+            self.slo_tracker.slo_ratio(capability_key, worker.worker_id, objectives)
+            for worker in workers
+        ]
+        qualifying = [w for w, ratio in zip(workers, ratios) if ratio is None or ratio <= 1]
+        if qualifying:
+            return qualifying
+
+        logger.info(
+            "No worker meets SLO constraints %s for %s, fallback: %s",
+            slo_constraints,
+            capability_key,
+            fallback,
+        )
+        if fallback == "any":
+            return workers
+        if fallback == "reject":
+            return []
+        closest = min(ratio for ratio in ratios if ratio is not None)
+        return [w for w, ratio in zip(workers, ratios) if ratio == closest]
+
+    def select(
+        self,
+        workers: list[WorkerEndpoint],
+        capability_key: str,
+        slo_constraints: Optional[dict[str, Any]] = None,
+    ) -> WorkerEndpoint:
+        """Pick the best of ``workers`` and count the request against it.
+
+        Lowest load score wins; with SLO constraints each worker's
+        observed/target ratio is added, so among qualifying workers the one
+        with the most headroom is preferred. Ties keep list order.
+        ``workers`` must not be empty.
+        """
+        scores = self.load_scores(workers, capability_key)
+        if slo_constraints and self.slo_tracker is not None:
+            objectives, _ = parse_slo_constraints(slo_constraints)
+            ratios = [
+                self.slo_tracker.slo_ratio(capability_key, worker.worker_id, objectives)
+                for worker in workers
+            ]
+            known = [ratio for ratio in ratios if ratio is not None]
+            neutral = sum(known) / len(known) if known else 0.0
+            scores = [
+                score + (neutral if ratio is None else ratio)
+                for score, ratio in zip(scores, ratios)
+            ]
+        worker = workers[scores.index(min(scores))]
+        worker.routed_since_report += 1
+        if self.outlier_detector is not None:
+            self.outlier_detector.on_routed(worker.worker_id)
+        return worker
+
+    def load_scores(self, workers: list[WorkerEndpoint], capability_key: str) -> list[float]:
+        """Routing scores for workers serving a capability (lower is better).
+
+        Each reported score is blended toward the mean of the reported
+        scores by its age (weight 0.5 ** (age / load_half_life)); workers
+        with no report get that mean. Requests routed since the last report
+        are added as in-flight load.
+        """
+        now = time.monotonic()
+        reported: dict[str, tuple[float, float]] = {}  # worker_id -> (score, age)
+        for worker in workers:
+            if worker.load_reported_at is not None:
+                score = load_score(worker.load, worker.max_concurrency(capability_key))
+                reported[worker.worker_id] = (score, now - worker.load_reported_at)
+        neutral = sum(score for score, _ in reported.values()) / len(reported) if reported else 0.0
+
+        scores = []
+        for worker in workers:
+            base = neutral
+            if worker.worker_id in reported:
+                score, age = reported[worker.worker_id]
+                weight = 0.5 ** (age / self.load_half_life)
+                base = weight * score + (1 - weight) * neutral
+            pending = worker.routed_since_report / worker.max_concurrency(capability_key)
+            scores.append(base + pending)
+        return scores
 
     def get_workers_for_capability(
         self, capability: str
@@ -287,6 +516,9 @@ class CapabilityRegistry:
         for wid in stale:
             logger.warning("Worker stale, removing: %s", wid)
             del self._workers[wid]
+            self.replica.stamp(wid, deleted=True)
+            if self.outlier_detector is not None:
+                self.outlier_detector.forget(wid)
 
         if stale:
             self._rebuild_capability_index()
@@ -321,10 +553,20 @@ class CapabilityRegistry:
                 "worker_id": worker.worker_id,
                 "worker_url": worker.worker_url,
                 "is_healthy": worker.is_healthy(self.heartbeat_timeout),
+                "breaker": (
+                    self.outlier_detector.state(worker.worker_id)
+                    if self.outlier_detector is not None
+                    else None
+                ),
                 "last_heartbeat": worker.last_heartbeat.isoformat(),
                 "capabilities": [
                     f"{c.verb}:{c.name}" for c in worker.capabilities
                 ],
+                "load": (
+                    dict(zip(LOAD_FIELDS, worker.load))
+                    if worker.load_reported_at is not None
+                    else None
+                ),
             }
             for worker in self._workers.values()
         ]
@@ -337,7 +579,7 @@ class CapabilityRegistry:
 
         with open(self.state_file, "w") as f:
             for worker in self._workers.values():
-                f.write(json.dumps(worker.to_dict()) + "\n")
+                f.write(json.dumps(self._record(worker.worker_id)) + "\n")
 
         logger.debug("Registry state saved: %d workers", len(self._workers))
 
@@ -354,6 +596,11 @@ class CapabilityRegistry:
                         data = json.loads(line)
                         worker = WorkerEndpoint.from_dict(data)
                         self._workers[worker.worker_id] = worker
+                        if data.get("version"):
+                            version = Version.decode(data["version"])
+                            self.replica.apply(worker.worker_id, version, False)
+                        else:
+                            self.replica.stamp(worker.worker_id)
 
             self._rebuild_capability_index()
             logger.info(
@@ -363,35 +610,170 @@ class CapabilityRegistry:
         except Exception as e:
             logger.error("Registry state load failed: %s", str(e))
 
-    # --- Multi-Controller Support (Future) ---
+    # --- Multi-Controller Replication ---
 
     def export_state(self) -> dict[str, Any]:
-        """Export registry state for controller-to-controller sync.
+        """Export the full registry state, with versions and deletions.
 
         Returns:
-            Serializable state dictionary
+            Serializable state dictionary, accepted by import_remote_state()
         """
         return {
-            "workers": [w.to_dict() for w in self._workers.values()],
+            "controller_id": self.controller_id,
+            "epoch": self.replica.epoch,
+            "seq": self.replica.seq,
+            **self._records(self.replica.leaf_members(range(1 << self.replica.tree.depth))),
             "exported_at": datetime.now().isoformat(),
         }
 
-    def import_remote_state(self, controller_id: str, state: dict[str, Any]) -> None:
-        """Import state from remote controller (merge, not replace).
+    def export_changes(
+        self,
+        epoch: Optional[str],
+        since: int,
+        origin: Optional[str] = None,
+        limit: int = DEFAULT_CHANGE_LIMIT,
+    ) -> dict[str, Any]:
+        """Export the entries changed since a peer's last pull.
+
+        Args:
+            epoch: Change-log epoch of the previous pull (None: first pull)
+            since: Sequence number reached by the previous pull
+            origin: Only entries last changed by this controller (full mesh)
+            limit: Most entries returned; "more" is set when some are left
+
+        Returns:
+            Changes and the cursor ("epoch", "seq") for the next pull. With
+            "reset" set, the cursor is unusable (first pull, or this
+            controller restarted): no entries are returned and the caller
+            reconciles by anti-entropy, then pulls from the new cursor.
+        """
+        base = {"controller_id": self.controller_id, "epoch": self.replica.epoch}
+        if epoch != self.replica.epoch or not 0 <= since <= self.replica.seq:
+            return {
+                **base,
+                "reset": True,
+                "more": False,
+                "seq": self.replica.seq,
+                "workers": [],
+                "deleted": [],
+            }
+        changed, cursor = self.replica.changes(since, origin, limit)
+        return {
+            **base,
+            "reset": False,
+            "more": cursor < self.replica.seq,
+            "seq": cursor,
+            **self._records(changed),
+        }
+
+    def tree_digests(self, level: int, indices: Sequence[int]) -> list[str]:
+        """Merkle digests of nodes at ``level`` (0 is the root) for anti-entropy.
+
+        Raises:
+            ValueError: Level or index outside the tree
+        """
+        tree = self.replica.tree
+        if not 0 <= level <= tree.depth or any(not 0 <= i < 1 << level for i in indices):
+            raise ValueError(
+                f"Nodes {list(indices)} outside level {level} of a depth {tree.depth} tree"
+            )
+        return tree.digests(level, indices)
+
+    def export_leaves(self, leaves: Sequence[int]) -> dict[str, Any]:
+        """Export the entries (live and deleted) under the given Merkle leaves."""
+        return {
+            "controller_id": self.controller_id,
+            **self._records(self.replica.leaf_members(leaves)),
+        }
+
+    def import_remote_state(self, controller_id: str, state: dict[str, Any]) -> int:
+        """Merge another controller's entries (last writer wins).
+
+        Each entry is applied only if its version is newer than the local
+        one, so imports are idempotent and commutative. Entries without a
+        version are versioned by their heartbeat time.
 
         Args:
             controller_id: Source controller identifier
-            state: State dictionary from export_state()
+            state: From export_state(), export_changes() or export_leaves()
+
+        Returns:
+            Number of entries applied
         """
-        # FUTURE: Implement conflict resolution, quorum logic
-        logger.info(
-            "Import remote state stub called from controller: %s with %d workers",
-            controller_id,
-            len(state.get("workers", [])),
-        )
+        applied = 0
+        for data in state.get("workers", []):
+            worker_id = data["worker_id"]
+            version = self._remote_version(controller_id, data)
+            if not self.replica.newer(worker_id, version):
+                continue
+            self.replica.apply(worker_id, version, False)
+            remote = WorkerEndpoint.from_dict(data)
+            local = self._workers.get(worker_id)
+            if local is None:
+                self._workers[worker_id] = remote
+            else:
+                # Keep the local load view and any fresher local heartbeat
+                local.worker_url = remote.worker_url
+                local.capabilities = remote.capabilities
+                local.registered_at = remote.registered_at
+                local.last_heartbeat = max(local.last_heartbeat, remote.last_heartbeat)
+            applied += 1
+
+        expired_ms = self._tombstone_cutoff_ms()
+        for data in state.get("deleted", []):
+            worker_id = data["worker_id"]
+            version = Version.decode(data["version"])
+            if version.wall_ms < expired_ms or not self.replica.newer(worker_id, version):
+                continue
+            self.replica.apply(worker_id, version, True)
+            if self._workers.pop(worker_id, None) is not None and self.outlier_detector is not None:
+                self.outlier_detector.forget(worker_id)
+            applied += 1
+
+        if applied:
+            self._rebuild_capability_index()
+            self._save_state()
+            logger.info("Imported %d registry changes from controller %s", applied, controller_id)
+        return applied
+
+    def purge_tombstones(self) -> int:
+        """Forget deregistrations older than tombstone_ttl."""
+        return self.replica.purge_tombstones(self._tombstone_cutoff_ms())
 
     # --- Internal Helpers ---
 
+    def _stamp_heartbeat(self, worker_id: str) -> None:
+        """Version a heartbeat for replication, at most every quarter heartbeat_timeout."""
+        version = self.replica.version(worker_id)
+        interval_ms = self.heartbeat_timeout * 250
+        if version is None or time.time() * 1000 - version.wall_ms >= interval_ms:
+            self.replica.stamp(worker_id)
+
+    def _record(self, worker_id: str) -> dict[str, Any]:
+        """Replicated form of an entry: the worker and its version, or a deletion."""
+        version = self.replica.version(worker_id)
+        encoded = version.encode() if version else None
+        worker = self._workers.get(worker_id)
+        if worker is None:
+            return {"worker_id": worker_id, "version": encoded, "deleted": True}
+        return {**worker.to_dict(), "version": encoded}
+
+    def _records(self, worker_ids: Sequence[str]) -> dict[str, list[dict[str, Any]]]:
+        records: dict[str, list[dict[str, Any]]] = {"workers": [], "deleted": []}
+        for worker_id in worker_ids:
+            deleted = self.replica.is_deleted(worker_id)
+            records["deleted" if deleted else "workers"].append(self._record(worker_id))
+        return records
+
+    def _remote_version(self, controller_id: str, data: dict[str, Any]) -> Version:
+        if data.get("version"):
+            return Version.decode(data["version"])
+        heartbeat = datetime.fromisoformat(data["last_heartbeat"])
+        return Version(int(heartbeat.timestamp() * 1000), 0, controller_id)
+
+    def _tombstone_cutoff_ms(self) -> int:
+        return int((time.time() - self.tombstone_ttl) * 1000)
+
     def _rebuild_capability_index(self) -> None:
         """Rebuild capability -> workers index."""
         self._capability_index.clear()
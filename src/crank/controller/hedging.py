@@ -0,0 +1,269 @@
+"""Request hedging - cut tail latency for idempotent capabilities.
+
+A single slow worker dominates the tail when every request waits for
+whichever worker it was routed to. For capabilities that declare
+``CapabilitySchema.idempotent``, a request still unanswered after the
+capability's observed p95 latency is duplicated to a second worker; the
+first response wins and the other invocation is cancelled.
+
+Only about one request in twenty outlives the p95, but a pool that slows
+down as a whole would hedge far more, so hedges are also capped by a token
+bucket per capability: every request earns ``ratio`` tokens and a hedge
+spends one, bounding the extra load at ``ratio`` (5% by default) plus a
+small burst. Hedges use idle capacity only: they never queue, never take a
+slot a waiting request needs, and never go to the primary's worker.
+
+The controller routes but does not proxy: ``/route`` returns the delay
+as ``hedge_after_ms`` and the caller asks for the duplicate's worker with
+``hedge_of``. In-process dispatchers use ``Hedger.run()``, which does the
+whole race.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from typing import Any, Optional, TypeVar
+
+from .admission import AdmissionController, Lease
+from .slo import SLOTracker
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEDGE_RATIO = 0.05  # Hedges per request, i.e. at most ~5% extra load
+DEFAULT_HEDGE_BURST = 10.0  # Hedges that may be sent back to back
+HEDGE_QUANTILE = 0.95  # Hedge requests slower than this observed quantile
+MIN_HEDGE_DELAY_MS = 5.0  # Floor on the delay, so fast capabilities are not always hedged
+MIN_HEDGE_SAMPLES = 20  # Recent samples needed before the quantile is trusted
+
+T = TypeVar("T")
+
+
+class HedgeBudget:
+    """Token bucket bounding hedges to a fraction of requests.
+
+    Args:
+        ratio: Tokens earned per request (the long-run hedge rate)
+        burst: Bucket size; the bucket starts full
+    """
+
+    def __init__(self, ratio: float = DEFAULT_HEDGE_RATIO, burst: float = DEFAULT_HEDGE_BURST):
+        if not 0 <= ratio <= 1:
+            raise ValueError(f"Hedge ratio must be between 0 and 1, got {ratio}")
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = burst
+
+    def earn(self) -> None:
+        """Credit one request."""
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def available(self) -> bool:
+        """Whether a hedge may be sent now."""
+        return self.tokens >= 1.0
+
+    def spend(self) -> None:
+        """Debit one hedge."""
+        self.tokens -= 1.0
+
+
+class Hedger:
+    """Decides when to hedge, grants hedge slots and runs hedged invocations.
+
+    Args:
+        admission: Source of leases (the hedge takes an idle slot)
+        tracker: Observed latency per capability, also fed by ``run()``
+        ratio: Long-run hedges per request, per capability
+        burst: Hedges that may be sent back to back
+        quantile: Latency quantile after which a request is hedged
+        min_delay_ms: Lower bound on the hedge delay
+    """
+
+    def __init__(
+        self,
+        admission: AdmissionController,
+        tracker: SLOTracker,
+        *,
+        ratio: float = DEFAULT_HEDGE_RATIO,
+        burst: float = DEFAULT_HEDGE_BURST,
+        quantile: float = HEDGE_QUANTILE,
+        min_delay_ms: float = MIN_HEDGE_DELAY_MS,
+    ) -> None:
+        HedgeBudget(ratio, burst)  # Validate before the first capability needs one
+        self.admission = admission
+        self.tracker = tracker
+        self.ratio = ratio
+        self.burst = burst
+        self.quantile = quantile
+        self.min_delay_ms = min_delay_ms
+        self._budgets: dict[str, HedgeBudget] = {}
+        self._counts: dict[str, dict[str, int]] = defaultdict(
+            lambda: {"requests": 0, "hedged": 0, "hedge_wins": 0, "denied": 0, "no_capacity": 0}
+        )
+
+    # --- Decisions ---
+
+    def delay_ms(self, capability_key: str) -> Optional[float]:
+        """Time after which a request is hedged, or None without enough latency data."""
+        observed = self.tracker.quantile(
+            capability_key, self.quantile, min_samples=MIN_HEDGE_SAMPLES
+        )
+        return None if observed is None else max(observed, self.min_delay_ms)
+
+    def on_request(self, primary: Lease) -> Optional[float]:
+        """Count a routed request toward the hedge budget.
+
+        Returns:
+            Milliseconds after which to hedge it, or None if it must not be
+            hedged (capability not idempotent, or no latency data yet)
+        """
+        capability_key = primary.capability_key
+        if not primary.worker.is_idempotent(capability_key):
+            return None
+        self._counts[capability_key]["requests"] += 1
+        self._budget(capability_key).earn()
+        return self.delay_ms(capability_key)
+
+    def hedge(
+        self, primary: Lease, slo_constraints: Optional[dict[str, Any]] = None
+    ) -> Optional[Lease]:
+        """Lease a second worker for a duplicate of a slow primary.
+
+        Returns:
+            The hedge lease, or None if the budget is spent or no other
+            worker has an idle slot
+        """
+        capability_key = primary.capability_key
+        counts = self._counts[capability_key]
+        budget = self._budget(capability_key)
+        if not budget.available():
+            counts["denied"] += 1
+            return None
+        lease = self.admission.try_admit(
+            capability_key, exclude={primary.worker.worker_id}, slo_constraints=slo_constraints
+        )
+        if lease is None:
+            counts["no_capacity"] += 1
+            return None
+        budget.spend()
+        counts["hedged"] += 1
+        lease.metadata.update(primary.metadata)
+        lease.metadata["hedge_of"] = primary.lease_id
+        logger.debug(
+            "Hedging %s on %s (primary %s on %s)",
+            capability_key,
+            lease.worker.worker_id,
+            primary.lease_id,
+            primary.worker.worker_id,
+        )
+        return lease
+
+    def record_winner(self, lease: Lease) -> None:
+        """Count a hedge that answered before its primary."""
+        if "hedge_of" in lease.metadata:
+            self._counts[lease.capability_key]["hedge_wins"] += 1
+
+    # --- Invocation ---
+
+    async def run(
+        self,
+        primary: Lease,
+        invoke: Callable[[Lease], Awaitable[T]],
+        *,
+        slo_constraints: Optional[dict[str, Any]] = None,
+    ) -> T:
+        """Invoke on the primary's worker, hedging it if it is slow.
+
+        Every lease taken is released here, and completed attempts are
+        recorded in the tracker and the registry's circuit breakers; a
+        cancelled loser is not, since its latency is unknown. A failed
+        attempt does not end the race while the other is still running.
+
+        Args:
+            primary: Admitted lease for the request
+            invoke: Performs the invocation on ``lease.worker``
+            slo_constraints: Constraints the hedge's worker must meet
+
+        Returns:
+            The first successful result
+
+        Raises:
+            Exception: What the last attempt raised, if none succeeded
+        """
+        delay_ms = self.on_request(primary)
+        attempts: dict[asyncio.Future[T], Lease] = {
+            asyncio.ensure_future(self._attempt(primary, invoke)): primary
+        }
+        done: set[asyncio.Future[T]] = set()
+        pending: set[asyncio.Future[T]] = set(attempts)
+        error: Optional[BaseException] = None
+        try:
+            if delay_ms is not None:
+                done, pending = await asyncio.wait(pending, timeout=delay_ms / 1000)
+                if not done:
+                    hedge = self.hedge(primary, slo_constraints)
+                    if hedge is not None:
+                        attempt: asyncio.Future[T] = asyncio.ensure_future(
+                            self._attempt(hedge, invoke)
+                        )
+                        attempts[attempt] = hedge
+                        pending.add(attempt)
+            while True:
+                for attempt in done:
+                    error = attempt.exception()
+                    if error is None:
+                        self.record_winner(attempts[attempt])
+                        return attempt.result()
+                if not pending:
+                    assert error is not None
+                    raise error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for attempt in pending:
+                attempt.cancel()
+            if pending:
+                await asyncio.wait(pending)
+            for lease in attempts.values():  # Attempts cancelled before they started
+                self.admission.release(lease.lease_id, cancelled=True)
+
+    async def _attempt(self, lease: Lease, invoke: Callable[[Lease], Awaitable[T]]) -> T:
+        start = time.monotonic()
+        success = False
+        try:
+            result = await invoke(lease)
+            success = True
+            return result
+        except asyncio.CancelledError:
+            self.admission.release(lease.lease_id, cancelled=True)
+            raise
+        finally:
+            if self.admission.lease(lease.lease_id) is not None:
+                latency_ms = (time.monotonic() - start) * 1000
+                self.tracker.record(
+                    lease.capability_key, lease.worker.worker_id, latency_ms, success
+                )
+                self.admission.registry.record_outcome(
+                    lease.capability_key, lease.worker.worker_id, latency_ms, success
+                )
+                self.admission.release(lease.lease_id)
+
+    # --- Introspection ---
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Per-capability request, hedge and hedge-win counts, and the hedge delay."""
+        return {
+            key: {
+                **counts,
+                "hedge_rate": round(counts["hedged"] / max(counts["requests"], 1), 4),
+                "delay_ms": self.delay_ms(key),
+                "tokens": round(self._budget(key).tokens, 2),
+            }
+            for key, counts in sorted(self._counts.items())
+        }
+
+    def _budget(self, capability_key: str) -> HedgeBudget:
+        budget = self._budgets.get(capability_key)
+        if budget is None:
+            budget = self._budgets[capability_key] = HedgeBudget(self.ratio, self.burst)
+        return budget
@@ -0,0 +1,340 @@
+"""Idempotency cache - replay completed invocations instead of re-running them.
+
+Implementation of the idempotency manager from ADR-0026. Clients send an
+``Idempotency-Key`` with the request; the key is bound to a hash of the
+request (verb, capability, arguments) so a key reused for a different
+request is rejected rather than answered with someone else's result.
+
+The first request for a key becomes the leader and runs the invocation;
+duplicates arriving while it runs wait for its result (single-flight)
+instead of executing again. A completed result is kept for ``ttl`` seconds
+(1 hour by default) in an LRU bounded by entry count and encoded size, and
+optionally written to a directory so a restarted controller still answers
+retries. If the leader fails or disappears (``inflight_timeout``), the next
+duplicate takes over and runs the invocation itself. Expired results are
+only dropped on lookup, so ``start()`` runs a background sweep of memory
+and the disk tier every ``cleanup_interval`` seconds for keys never retried.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from crank.protocols.codecs import JSON_CODEC, canonical_digest
+from crank.storage import DurabilityMode, WriteBehindQueue
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 3600.0  # ADR-0026 dedup window (seconds)
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # Encoded results held in memory
+DEFAULT_WAIT_TIMEOUT = 30.0  # Longest a duplicate waits on the leader (seconds)
+DEFAULT_INFLIGHT_TIMEOUT = 300.0  # Leader presumed gone after this (seconds)
+DEFAULT_CLEANUP_INTERVAL = 60.0  # Seconds between background sweeps of expired results
+ENTRY_OVERHEAD_BYTES = 256  # Bookkeeping charged per entry on top of the result
+
+
+class IdempotencyError(ValueError):
+    """Request cannot be deduplicated.
+
+    ``status_code`` is 422 when the key was used for a different request and
+    409 when the original request is still running.
+    """
+
+    def __init__(self, message: str, status_code: int = 409) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResult:
+    """Completed invocation stored under an idempotency key."""
+
+    idempotency_key: str
+    request_hash: str
+    result: dict[str, Any]
+    worker_id: str
+    capability: str
+    stored_at: float  # time.time(), so disk entries age across restarts
+    size: int = 0
+
+    def age(self) -> float:
+        """Seconds since the result was stored."""
+        return max(time.time() - self.stored_at, 0.0)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Record written to the disk tier."""
+        return {
+            "idempotency_key": self.idempotency_key,
+            "request_hash": self.request_hash,
+            "result": self.result,
+            "worker_id": self.worker_id,
+            "capability": self.capability,
+            "stored_at": self.stored_at,
+        }
+
+
+@dataclass(slots=True)
+class _InFlight:
+    request_hash: str
+    started_at: float  # time.monotonic()
+    done: "asyncio.Future[Optional[CachedResult]]"  # None: leader gave up
+
+
+def request_hash(verb: str, capability: str, payload: Any = None) -> str:
+    """Hash identifying what an idempotency key was first used for."""
+    return canonical_digest({"verb": verb, "capability": capability, "payload": payload})
+
+
+class IdempotencyCache:
+    """In-memory LRU + TTL cache of completed results with single-flight.
+
+    Args:
+        ttl: Seconds a completed result is replayed
+        max_entries: Results held in memory
+        max_bytes: Encoded size of results held in memory
+        wait_timeout: Seconds a duplicate waits for the leader before a 409
+        inflight_timeout: Seconds after which a silent leader is replaced
+        disk_dir: Directory for the on-disk tier (None keeps results in memory only)
+        cleanup_interval: Seconds between background sweeps once ``start()`` ran
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        wait_timeout: float = DEFAULT_WAIT_TIMEOUT,
+        inflight_timeout: float = DEFAULT_INFLIGHT_TIMEOUT,
+        disk_dir: Optional[Path] = None,
+        cleanup_interval: float = DEFAULT_CLEANUP_INTERVAL,
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.wait_timeout = wait_timeout
+        self.inflight_timeout = inflight_timeout
+        self.disk_dir = disk_dir
+        self.cleanup_interval = cleanup_interval
+        self._entries: OrderedDict[str, CachedResult] = OrderedDict()  # LRU first
+        self._bytes = 0
+        self._inflight: dict[str, _InFlight] = {}
+        self._writer = WriteBehindQueue(DurabilityMode.GROUP) if disk_dir else None
+        self._counts = {"hits": 0, "misses": 0, "waited": 0, "evicted": 0, "disk_hits": 0}
+        self._task: Optional[asyncio.Task[None]] = None
+
+    # --- Single-Flight ---
+
+    async def acquire(self, key: str, request_hash: str) -> Optional[CachedResult]:
+        """Look up a key, waiting if the same request is already running.
+
+        Returns:
+            The stored result to replay, or None if the caller is now the
+            leader and must ``complete()`` or ``abandon()`` the key
+
+        Raises:
+            IdempotencyError: The key belongs to a different request (422), or
+                the running original did not finish within ``wait_timeout`` (409)
+        """
+        while True:
+            cached = self._get(key) or await self._load(key)
+            if cached is not None:
+                self._check_hash(cached.request_hash, request_hash, key)
+                self._counts["hits"] += 1
+                return cached
+
+            pending = self._inflight.get(key)
+            if pending is not None and self._is_stale(pending):
+                logger.warning("Idempotency key %s: original request went silent, retrying", key)
+                self.abandon(key)
+                pending = None
+            if pending is None:
+                self._counts["misses"] += 1
+                done = asyncio.get_running_loop().create_future()
+                self._inflight[key] = _InFlight(request_hash, time.monotonic(), done)
+                return None
+
+            self._check_hash(pending.request_hash, request_hash, key)
+            self._counts["waited"] += 1
+            try:
+                result = await asyncio.wait_for(asyncio.shield(pending.done), self.wait_timeout)
+            except asyncio.TimeoutError:
+                raise IdempotencyError(
+                    f"Request with idempotency key {key!r} is still in progress"
+                ) from None
+            if result is not None:
+                self._counts["hits"] += 1
+                return result
+            # Leader gave up: loop round and become the leader
+
+    async def complete(
+        self,
+        key: str,
+        request_hash: str,
+        result: dict[str, Any],
+        *,
+        worker_id: str,
+        capability: str,
+    ) -> CachedResult:
+        """Store a leader's result and hand it to duplicates waiting on it."""
+        cached = CachedResult(
+            key,
+            request_hash,
+            result,
+            worker_id,
+            capability,
+            time.time(),
+            len(JSON_CODEC.encode(result)) + ENTRY_OVERHEAD_BYTES,
+        )
+        pending = self._inflight.get(key)
+        if pending is not None and pending.request_hash == request_hash:
+            del self._inflight[key]
+            pending.done.set_result(cached)
+        self._put(cached)
+        if self._writer is not None:
+            await self._writer.write(self._path(key), JSON_CODEC.encode(cached.to_dict()))
+        return cached
+
+    def abandon(self, key: str) -> None:
+        """Release a key whose leader failed; one waiting duplicate takes over."""
+        pending = self._inflight.pop(key, None)
+        if pending is not None and not pending.done.done():
+            pending.done.set_result(None)
+
+    # --- Maintenance ---
+
+    def cleanup_expired(self) -> int:
+        """Drop expired results from memory; returns the number removed."""
+        expired = [key for key, cached in self._entries.items() if cached.age() >= self.ttl]
+        for key in expired:
+            self._remove(key)
+        return len(expired)
+
+    async def purge_disk(self) -> int:
+        """Delete expired results from the disk tier; returns the number removed."""
+        if self.disk_dir is None:
+            return 0
+        return await asyncio.to_thread(self._purge_disk, self.disk_dir)
+
+    def start(self) -> None:
+        """Start sweeping expired results in the background (call from the running loop)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background sweep."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def close(self) -> None:
+        """Stop the background sweep and flush pending disk writes."""
+        await self.stop()
+        if self._writer is not None:
+            await self._writer.close()
+
+    def stats(self) -> dict[str, Any]:
+        """Entry, byte, in-flight and hit/miss counts."""
+        return {
+            **self._counts,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "in_flight": len(self._inflight),
+            "disk": self.disk_dir is not None,
+        }
+
+    # --- Internal Helpers ---
+
+    def _get(self, key: str) -> Optional[CachedResult]:
+        cached = self._entries.get(key)
+        if cached is None:
+            return None
+        if cached.age() >= self.ttl:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return cached
+
+    def _put(self, cached: CachedResult) -> None:
+        if cached.idempotency_key in self._entries:
+            self._remove(cached.idempotency_key)
+        if cached.size > self.max_bytes:
+            return  # Larger than the whole budget: only the disk tier keeps it
+        self._entries[cached.idempotency_key] = cached
+        self._bytes += cached.size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self._counts["evicted"] += 1
+
+    def _remove(self, key: str) -> None:
+        cached = self._entries.pop(key)
+        self._bytes -= cached.size
+
+    def _is_stale(self, pending: _InFlight) -> bool:
+        return time.monotonic() - pending.started_at > self.inflight_timeout
+
+    def _check_hash(self, stored: str, requested: str, key: str) -> None:
+        if stored != requested:
+            raise IdempotencyError(
+                f"Idempotency key {key!r} was already used for a different request",
+                status_code=422,
+            )
+
+    def _path(self, key: str) -> Path:
+        assert self.disk_dir is not None
+        return self.disk_dir / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json"
+
+    async def _load(self, key: str) -> Optional[CachedResult]:
+        """Promote a result from the disk tier into memory."""
+        if self.disk_dir is None:
+            return None
+        path = self._path(key)
+        try:
+            data = await asyncio.to_thread(path.read_bytes)
+            record = JSON_CODEC.decode(data)
+            cached = CachedResult(**record, size=len(data))
+        except FileNotFoundError:
+            return None
+        except (ValueError, TypeError) as e:
+            logger.warning("Discarding unreadable idempotency record %s: %s", path, e)
+            await asyncio.to_thread(path.unlink, True)
+            return None
+        if cached.idempotency_key != key or cached.age() >= self.ttl:
+            return None
+        self._counts["disk_hits"] += 1
+        self._put(cached)
+        return cached
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.cleanup_interval)
+            expired = self.cleanup_expired()
+            try:
+                purged = await self.purge_disk()
+            except OSError as error:
+                logger.warning("Idempotency disk purge failed: %s", error)
+                purged = 0
+            if expired or purged:
+                logger.debug("Swept %d expired idempotency results (%d on disk)", expired, purged)
+
+    def _purge_disk(self, disk_dir: Path) -> int:
+        cutoff = time.time() - self.ttl
+        removed = 0
+        for path in disk_dir.glob("*.json"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
@@ -0,0 +1,83 @@
+"""Worker load reports - the load vector carried by heartbeats.
+
+Workers measure their load and send it with every heartbeat as a compact
+vector of floats in a fixed order (``LOAD_FIELDS``): a JSON array to the
+controller, or a comma-joined string in form-encoded heartbeats. The
+controller keeps the latest vector per worker and routes on its score.
+"""
+
+import math
+from collections.abc import Sequence
+from dataclasses import astuple, dataclass
+from typing import Union
+
+LOAD_FIELDS = ("in_flight", "queue_depth", "p95_ms", "cpu", "rss_mb")
+LOAD_DIMENSIONS = len(LOAD_FIELDS)
+
+DEFAULT_MAX_CONCURRENCY = 10  # CapabilitySchema.max_concurrency default
+LATENCY_SCALE_MS = 1000.0  # p95 latency that adds 1.0 to a load score
+
+
+@dataclass(frozen=True, slots=True)
+class LoadReport:
+    """One worker load sample.
+
+    Attributes:
+        in_flight: Requests being handled
+        queue_depth: Requests accepted but waiting to start
+        p95_ms: 95th percentile latency of recent requests
+        cpu: Process CPU use as a fraction of the machine (0.0-1.0)
+        rss_mb: Resident memory in MiB (reported, not scored)
+    """
+
+    in_flight: float = 0.0
+    queue_depth: float = 0.0
+    p95_ms: float = 0.0
+    cpu: float = 0.0
+    rss_mb: float = 0.0
+
+    def to_dict(self) -> dict[str, float]:
+        """Values keyed by field name."""
+        return dict(zip(LOAD_FIELDS, astuple(self)))
+
+    def to_vector(self) -> list[float]:
+        """Values in ``LOAD_FIELDS`` order."""
+        return list(astuple(self))
+
+    def encode(self) -> str:
+        """Comma-joined vector for form-encoded heartbeats."""
+        return ",".join(f"{value:g}" for value in astuple(self))
+
+    @classmethod
+    def from_vector(cls, values: Union[Sequence[float], str]) -> "LoadReport":
+        """Parse a vector (or its comma-joined form).
+
+        Values beyond ``LOAD_DIMENSIONS`` are ignored so newer workers can
+        report extra fields.
+
+        Raises:
+            ValueError: Too few values, or a value that is negative or not finite
+        """
+        if isinstance(values, str):
+            values = [float(part) for part in values.split(",")]
+        if len(values) < LOAD_DIMENSIONS:
+            raise ValueError(f"Load vector needs {LOAD_DIMENSIONS} values, got {len(values)}")
+        vector = [float(value) for value in values[:LOAD_DIMENSIONS]]
+        if not all(math.isfinite(value) and value >= 0 for value in vector):
+            raise ValueError(f"Load values must be finite and non-negative: {vector}")
+        return cls(*vector)
+
+    def score(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> float:
+        """Load score; lower is less loaded."""
+        return load_score(self.to_vector(), max_concurrency)
+
+
+def load_score(vector: Sequence[float], max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> float:
+    """Score a load vector: slot utilization + CPU fraction + scaled p95 latency.
+
+    A worker at its concurrency limit, a saturated CPU and a 1 s p95 each
+    add 1.0. Memory is not scored.
+    """
+    in_flight, queue_depth, p95_ms, cpu = vector[0], vector[1], vector[2], vector[3]
+    utilization = (in_flight + queue_depth) / max(max_concurrency, 1)
+    return utilization + cpu + p95_ms / LATENCY_SCALE_MS
@@ -0,0 +1,249 @@
+"""Outlier detection - per-worker circuit breakers fed by invocation outcomes.
+
+Heartbeats only prove a worker is alive; a worker that heartbeats but
+fails or stalls every request would otherwise stay routable forever. Each
+worker gets a breaker driven by the outcomes reported when leases are
+released:
+
+- closed: routable. ``consecutive_failures`` failures in a row, or an
+  average latency on some capability ``latency_factor`` times the median
+  of its peers on that capability, eject the worker (open).
+- open: not routable for the ejection time, which doubles with every
+  ejection in a row (``base_ejection`` up to ``max_ejection``).
+- half-open: once the ejection time is over, up to ``half_open_probes``
+  real requests are routed to the worker as probes. A probe that succeeds
+  within the peers' latency closes the breaker; one that fails opens it
+  again for longer. A probe that never reports back frees its slot after
+  ``base_ejection`` seconds.
+
+At most ``max_ejected_fraction`` of the workers seen are ejected at once,
+so a fleet-wide problem (a bad dependency, an overloaded controller) does
+not take every worker out of rotation.
+"""
+
+import logging
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+DEFAULT_CONSECUTIVE_FAILURES = 5
+DEFAULT_BASE_EJECTION = 30.0  # Seconds; doubled per repeated ejection
+DEFAULT_MAX_EJECTION = 300.0
+DEFAULT_LATENCY_FACTOR = 3.0  # Ejected when this many times slower than the peer median
+DEFAULT_MIN_OUTLIER_MS = 20.0  # Latency gaps below this are never outliers
+DEFAULT_MAX_EJECTED_FRACTION = 0.5
+HALF_OPEN_PROBES = 1  # Concurrent probe requests to a half-open worker
+LATENCY_ALPHA = 0.1  # EWMA weight of the newest latency
+MIN_LATENCY_SAMPLES = 20  # Samples before a worker's latency is compared to peers
+
+
+@dataclass(slots=True)
+class _Latency:
+    ewma_ms: float = 0.0
+    samples: int = 0
+
+
+@dataclass(slots=True)
+class _Breaker:
+    state: str = CLOSED
+    consecutive_failures: int = 0
+    ejections: int = 0  # In a row; reset once closed for max_ejection
+    reason: Optional[str] = None
+    open_until: float = 0.0
+    closed_at: float = 0.0
+    probes: int = 0
+    probe_deadline: float = 0.0
+    latency: dict[str, _Latency] = field(default_factory=dict)  # Per capability
+
+
+class OutlierDetector:
+    """Circuit breakers per worker with peer-relative latency ejection.
+
+    Args:
+        consecutive_failures: Failures in a row that eject a worker
+        base_ejection: First ejection time in seconds
+        max_ejection: Longest ejection time in seconds
+        latency_factor: Ejection threshold, relative to the peer median latency
+        min_outlier_ms: Minimum latency gap over the peer median to count
+        max_ejected_fraction: Most of the seen workers ejected at once
+        half_open_probes: Concurrent probes allowed to a half-open worker
+        clock: Time source (seconds)
+    """
+
+    def __init__(
+        self,
+        *,
+        consecutive_failures: int = DEFAULT_CONSECUTIVE_FAILURES,
+        base_ejection: float = DEFAULT_BASE_EJECTION,
+        max_ejection: float = DEFAULT_MAX_EJECTION,
+        latency_factor: float = DEFAULT_LATENCY_FACTOR,
+        min_outlier_ms: float = DEFAULT_MIN_OUTLIER_MS,
+        max_ejected_fraction: float = DEFAULT_MAX_EJECTED_FRACTION,
+        half_open_probes: int = HALF_OPEN_PROBES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.consecutive_failures = consecutive_failures
+        self.base_ejection = base_ejection
+        self.max_ejection = max_ejection
+        self.latency_factor = latency_factor
+        self.min_outlier_ms = min_outlier_ms
+        self.max_ejected_fraction = max_ejected_fraction
+        self.half_open_probes = half_open_probes
+        self.clock = clock
+        self._breakers: dict[str, _Breaker] = {}
+
+    # --- Routing ---
+
+    def available(self, worker_id: str) -> bool:
+        """Whether a worker may be routed to (closed, or half-open with a free probe).
+
+        An open breaker whose ejection time is over turns half-open here.
+        """
+        breaker = self._breakers.get(worker_id)
+        if breaker is None or breaker.state == CLOSED:
+            return True
+        now = self.clock()
+        if breaker.state == OPEN:
+            if now < breaker.open_until:
+                return False
+            breaker.state = HALF_OPEN
+            breaker.probes = 0
+            logger.info("Worker %s half-open, probing", worker_id)
+        if breaker.probes and now >= breaker.probe_deadline:
+            breaker.probes = 0  # Probes that never reported back
+        return breaker.probes < self.half_open_probes
+
+    def on_routed(self, worker_id: str) -> None:
+        """Count a request routed to a worker as a probe if it is half-open."""
+        breaker = self._breakers.get(worker_id)
+        if breaker is not None and breaker.state == HALF_OPEN:
+            breaker.probes += 1
+            breaker.probe_deadline = self.clock() + self.base_ejection
+
+    # --- Outcomes ---
+
+    def record(
+        self, capability_key: str, worker_id: str, latency_ms: float, success: bool = True
+    ) -> None:
+        """Feed one completed invocation into the worker's breaker."""
+        breaker = self._breakers.get(worker_id)
+        if breaker is None:
+            breaker = self._breakers[worker_id] = _Breaker()
+        if breaker.state == OPEN:
+            return  # Started before the ejection
+
+        if breaker.state == HALF_OPEN:
+            breaker.probes = max(breaker.probes - 1, 0)
+            outlier = self._latency_outlier(capability_key, worker_id, latency_ms)
+            if success and outlier is None:
+                self._close(worker_id, breaker)
+            else:
+                self._eject(worker_id, breaker, outlier or "probe failed", force=True)
+            return
+
+        breaker.consecutive_failures = 0 if success else breaker.consecutive_failures + 1
+        latency = breaker.latency.setdefault(capability_key, _Latency())
+        latency.ewma_ms = (
+            latency_ms
+            if latency.samples == 0
+            else latency.ewma_ms + LATENCY_ALPHA * (latency_ms - latency.ewma_ms)
+        )
+        latency.samples += 1
+
+        if breaker.consecutive_failures >= self.consecutive_failures:
+            self._eject(worker_id, breaker, f"{breaker.consecutive_failures} consecutive failures")
+        elif latency.samples >= MIN_LATENCY_SAMPLES:
+            outlier = self._latency_outlier(capability_key, worker_id, latency.ewma_ms)
+            if outlier is not None:
+                self._eject(worker_id, breaker, outlier)
+
+    def forget(self, worker_id: str) -> None:
+        """Drop a deregistered worker's breaker."""
+        self._breakers.pop(worker_id, None)
+
+    # --- Introspection ---
+
+    def state(self, worker_id: str) -> str:
+        """Breaker state of a worker (closed if never seen)."""
+        breaker = self._breakers.get(worker_id)
+        return CLOSED if breaker is None else breaker.state
+
+    def report(self) -> dict[str, dict[str, Any]]:
+        """Breaker state, failure streak and ejection history per worker."""
+        now = self.clock()
+        return {
+            worker_id: {
+                "state": breaker.state,
+                "consecutive_failures": breaker.consecutive_failures,
+                "ejections": breaker.ejections,
+                "reason": breaker.reason,
+                "reopens_in": (
+                    round(breaker.open_until - now, 1) if breaker.state == OPEN else None
+                ),
+                "latency_ms": {
+                    key: round(latency.ewma_ms, 2)
+                    for key, latency in sorted(breaker.latency.items())
+                },
+            }
+            for worker_id, breaker in sorted(self._breakers.items())
+        }
+
+    # --- Internal Helpers ---
+
+    def _latency_outlier(
+        self, capability_key: str, worker_id: str, latency_ms: float
+    ) -> Optional[str]:
+        """Why ``latency_ms`` is an outlier against the worker's peers, or None."""
+        peers = [
+            latency.ewma_ms
+            for peer_id, breaker in self._breakers.items()
+            if peer_id != worker_id and breaker.state == CLOSED
+            for key, latency in breaker.latency.items()
+            if key == capability_key and latency.samples >= MIN_LATENCY_SAMPLES
+        ]
+        if not peers:
+            return None
+        median = statistics.median(peers)
+        if latency_ms < median * self.latency_factor or latency_ms - median < self.min_outlier_ms:
+            return None
+        return f"{capability_key} latency {latency_ms:.0f}ms vs peer median {median:.0f}ms"
+
+    def _eject(self, worker_id: str, breaker: _Breaker, reason: str, force: bool = False) -> None:
+        """Open a breaker, unless that would eject too much of the fleet."""
+        now = self.clock()
+        ejected = sum(1 for other in self._breakers.values() if other.state != CLOSED)
+        if not force and ejected + 1 > self.max_ejected_fraction * len(self._breakers):
+            logger.warning(
+                "Not ejecting worker %s (%s): %d of %d workers already ejected",
+                worker_id,
+                reason,
+                ejected,
+                len(self._breakers),
+            )
+            return
+        if breaker.state == CLOSED and now - breaker.closed_at >= self.max_ejection:
+            breaker.ejections = 0  # Healthy long enough: start the backoff over
+        breaker.ejections += 1
+        duration = min(self.base_ejection * 2 ** (breaker.ejections - 1), self.max_ejection)
+        breaker.state = OPEN
+        breaker.reason = reason
+        breaker.open_until = now + duration
+        breaker.consecutive_failures = 0
+        breaker.probes = 0
+        breaker.latency.clear()  # Judged afresh once reintroduced
+        logger.warning("Ejecting worker %s for %.0fs: %s", worker_id, duration, reason)
+
+    def _close(self, worker_id: str, breaker: _Breaker) -> None:
+        breaker.state = CLOSED
+        breaker.reason = None
+        breaker.closed_at = self.clock()
+        breaker.consecutive_failures = 0
+        logger.info("Worker %s passed its probe, back in rotation", worker_id)
@@ -0,0 +1,516 @@
+"""Registry replication - delta sync and Merkle anti-entropy between controllers.
+
+Every worker entry in a ``CapabilityRegistry`` carries a version: a hybrid
+logical clock (HLC) timestamp taken by the controller that last changed it
+(registration, a heartbeat, deregistration). HLC timestamps follow wall
+time in milliseconds, never go backwards, and order every change a
+controller has seen before its own, so comparing versions is
+last-writer-wins on heartbeat time that stays consistent across clocks
+that drift. Ties break on the controller ID. Deregistered workers leave a
+tombstone version for ``tombstone_ttl`` seconds so the removal wins over
+older copies still held by peers.
+
+Each controller pulls from its peers two ways:
+
+- Delta sync (every ``interval``): the changes a peer made since the last
+  pull, read off the peer's change log by sequence number. A peer serves
+  only the entries it originated (``origin``), so in a full mesh each
+  change crosses the network once per controller.
+- Anti-entropy (every ``anti_entropy_interval``, and whenever the delta
+  cursor is unusable: first contact, peer restart): the entry versions are
+  hashed into a Merkle tree with a fixed shape (worker IDs hash to
+  ``2**depth`` leaves, a node's digest is the XOR of its entries' hashes,
+  so a change updates one path). Digests are compared from the root down,
+  ``DESCENT_STEP`` levels per request, and only the entries in differing
+  leaves are fetched. Bandwidth follows the divergence, not the registry
+  size.
+
+Replicated state is routing state: worker URLs, capabilities and heartbeat
+times. Load reports, admission leases and circuit breakers stay local to
+each controller.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Optional, Protocol
+
+import httpx
+
+if TYPE_CHECKING:
+    from .capability_registry import CapabilityRegistry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TREE_DEPTH = 12  # 4096 leaves: a few entries per leaf at 10k workers
+DESCENT_STEP = 4  # Tree levels descended per digest request (16 children per node)
+DEFAULT_SYNC_INTERVAL = 5.0  # Seconds between delta pulls
+DEFAULT_ANTI_ENTROPY_INTERVAL = 60.0  # Seconds between Merkle reconciliations per peer
+DEFAULT_CHANGE_LIMIT = 5000  # Entries per delta response; the rest on the next pull
+
+
+# --- Versions ---
+
+
+@dataclass(frozen=True, order=True, slots=True)
+class Version:
+    """Hybrid logical clock timestamp of a registry change."""
+
+    wall_ms: int
+    counter: int
+    node: str
+
+    def encode(self) -> list[Any]:
+        return [self.wall_ms, self.counter, self.node]
+
+    @classmethod
+    def decode(cls, value: Sequence[Any]) -> "Version":
+        wall_ms, counter, node = value
+        return cls(int(wall_ms), int(counter), str(node))
+
+
+class HybridLogicalClock:
+    """HLC (Kulkarni et al.): wall-clock milliseconds plus a logical counter.
+
+    Args:
+        node: ID of the controller owning the clock (tie-breaker)
+        wall: Wall clock in seconds (injectable for tests)
+    """
+
+    def __init__(self, node: str, wall: Callable[[], float] = time.time) -> None:
+        self.node = node
+        self._wall = wall
+        self._last_ms = 0
+        self._counter = 0
+
+    def now(self) -> Version:
+        """Timestamp for a local change, later than every timestamp seen."""
+        physical = int(self._wall() * 1000)
+        if physical > self._last_ms:
+            self._last_ms, self._counter = physical, 0
+        else:
+            self._counter += 1
+        return Version(self._last_ms, self._counter, self.node)
+
+    def observe(self, remote: Version) -> None:
+        """Move past a timestamp received from a peer."""
+        if remote.wall_ms > self._last_ms:
+            self._last_ms, self._counter = remote.wall_ms, remote.counter
+        elif remote.wall_ms == self._last_ms:
+            self._counter = max(self._counter, remote.counter)
+
+
+# --- Merkle Tree ---
+
+
+def _entry_hash(worker_id: str, version: Version) -> int:
+    digest = hashlib.blake2b(
+        f"{worker_id}\0{version.wall_ms}\0{version.counter}\0{version.node}".encode(),
+        digest_size=8,
+    ).digest()
+    return int.from_bytes(digest, "big")
+
+
+class MerkleTree:
+    """Fixed-shape hash tree over ``(worker_id, version)`` entries.
+
+    Level 0 is the root and level ``depth`` the leaves. A node's digest is
+    the XOR of the hashes of the entries below it, so updating an entry
+    touches one root-to-leaf path and two replicas with the same entries
+    have the same tree whatever order the entries arrived in.
+    """
+
+    def __init__(self, depth: int = DEFAULT_TREE_DEPTH) -> None:
+        self.depth = depth
+        self.levels = [[0] * (1 << level) for level in range(depth + 1)]
+
+    def leaf(self, worker_id: str) -> int:
+        """Leaf a worker ID hashes to."""
+        digest = hashlib.blake2b(worker_id.encode(), digest_size=4).digest()
+        return int.from_bytes(digest, "big") >> (32 - self.depth) if self.depth else 0
+
+    def update(self, worker_id: str, old: Optional[Version], new: Optional[Version]) -> None:
+        """Replace an entry's version (None: absent)."""
+        delta = (_entry_hash(worker_id, old) if old else 0) ^ (
+            _entry_hash(worker_id, new) if new else 0
+        )
+        index = self.leaf(worker_id)
+        for level in range(self.depth, -1, -1):
+            self.levels[level][index] ^= delta
+            index >>= 1
+
+    @property
+    def root(self) -> int:
+        return self.levels[0][0]
+
+    def digests(self, level: int, indices: Sequence[int]) -> list[str]:
+        """Hex digests of nodes at ``level``."""
+        nodes = self.levels[level]
+        return [f"{nodes[index]:016x}" for index in indices]
+
+
+# --- Replica State ---
+
+
+@dataclass(slots=True)
+class Entry:
+    """Replication metadata of one worker ID."""
+
+    version: Version
+    seq: int  # Local change-log position
+    deleted: bool = False
+
+
+class ReplicaState:
+    """Versions, change log and Merkle tree of one registry replica.
+
+    Args:
+        node: Controller ID stamped into local versions
+        depth: Merkle tree depth
+        wall: Wall clock in seconds (injectable for tests)
+    """
+
+    def __init__(
+        self,
+        node: str,
+        depth: int = DEFAULT_TREE_DEPTH,
+        wall: Callable[[], float] = time.time,
+    ) -> None:
+        self.node = node
+        self.clock = HybridLogicalClock(node, wall)
+        self.epoch = uuid.uuid4().hex[:12]  # Change-log identity; sequence numbers restart with it
+        self.seq = 0
+        self.tree = MerkleTree(depth)
+        self._entries: dict[str, Entry] = {}
+        self._log: OrderedDict[str, None] = OrderedDict()  # Worker IDs, oldest change first
+        self._leaves: dict[int, set[str]] = {}
+
+    def version(self, worker_id: str) -> Optional[Version]:
+        entry = self._entries.get(worker_id)
+        return entry.version if entry else None
+
+    def is_deleted(self, worker_id: str) -> bool:
+        entry = self._entries.get(worker_id)
+        return entry is not None and entry.deleted
+
+    def stamp(self, worker_id: str, deleted: bool = False) -> Version:
+        """Record a local change and return its version."""
+        version = self.clock.now()
+        self._set(worker_id, version, deleted)
+        return version
+
+    def newer(self, worker_id: str, version: Version) -> bool:
+        """Whether a peer's version of an entry beats the local one (last writer wins)."""
+        current = self.version(worker_id)
+        return current is None or version > current
+
+    def apply(self, worker_id: str, version: Version, deleted: bool) -> None:
+        """Record a peer's change that won against the local version."""
+        self.clock.observe(version)
+        self._set(worker_id, version, deleted)
+
+    def changes(
+        self, since: int, origin: Optional[str] = None, limit: int = DEFAULT_CHANGE_LIMIT
+    ) -> tuple[list[str], int]:
+        """Worker IDs changed after sequence ``since`` (oldest first), and the new cursor.
+
+        Args:
+            since: Cursor from the previous pull
+            origin: Only entries last changed by this controller
+            limit: Most entries returned; the cursor then stops at the last one
+        """
+        changed: list[str] = []
+        for worker_id in reversed(self._log):
+            if self._entries[worker_id].seq <= since:
+                break
+            changed.append(worker_id)
+        changed.reverse()
+        cursor = self.seq
+        if len(changed) > limit:
+            changed = changed[:limit]
+            cursor = self._entries[changed[-1]].seq
+        if origin is not None:
+            changed = [wid for wid in changed if self._entries[wid].version.node == origin]
+        return changed, cursor
+
+    def leaf_members(self, leaves: Sequence[int]) -> list[str]:
+        """Worker IDs (live and deleted) in the given leaves."""
+        return [wid for leaf in leaves for wid in sorted(self._leaves.get(leaf, ()))]
+
+    def purge_tombstones(self, before_ms: int) -> int:
+        """Forget deletions versioned before ``before_ms``; returns how many."""
+        expired = [
+            wid
+            for wid, entry in self._entries.items()
+            if entry.deleted and entry.version.wall_ms < before_ms
+        ]
+        for worker_id in expired:
+            self._forget(worker_id)
+        return len(expired)
+
+    def _set(self, worker_id: str, version: Version, deleted: bool) -> None:
+        entry = self._entries.get(worker_id)
+        self.tree.update(worker_id, entry.version if entry else None, version)
+        self.seq += 1
+        if entry is None:
+            self._entries[worker_id] = Entry(version, self.seq, deleted)
+            self._leaves.setdefault(self.tree.leaf(worker_id), set()).add(worker_id)
+        else:
+            entry.version, entry.seq, entry.deleted = version, self.seq, deleted
+        self._log[worker_id] = None
+        self._log.move_to_end(worker_id)
+
+    def _forget(self, worker_id: str) -> None:
+        entry = self._entries.pop(worker_id)
+        self.tree.update(worker_id, entry.version, None)
+        self._log.pop(worker_id, None)
+        self._leaves.get(self.tree.leaf(worker_id), set()).discard(worker_id)
+
+
+# --- Peers ---
+
+
+class RegistryPeer(Protocol):
+    """Another controller's registry, as seen by the replicator."""
+
+    name: str
+
+    async def changes(
+        self, epoch: Optional[str], since: int, origin: Optional[str]
+    ) -> dict[str, Any]:
+        """``CapabilityRegistry.export_changes()`` of the peer."""
+        ...
+
+    async def digests(self, level: int, indices: list[int]) -> list[str]:
+        """``CapabilityRegistry.tree_digests()`` of the peer."""
+        ...
+
+    async def leaves(self, leaves: list[int]) -> dict[str, Any]:
+        """``CapabilityRegistry.export_leaves()`` of the peer."""
+        ...
+
+
+class LocalPeer:
+    """Registry in the same process (tests, simulations).
+
+    Payloads go through JSON like over HTTP, so replicas never share
+    objects and ``bytes_received`` measures what the wire would carry.
+    """
+
+    def __init__(self, registry: "CapabilityRegistry", name: Optional[str] = None) -> None:
+        self.registry = registry
+        self.name = name or registry.controller_id
+        self.bytes_received = 0
+
+    def _wire(self, payload: Any) -> Any:
+        encoded = json.dumps(payload, separators=(",", ":"))
+        self.bytes_received += len(encoded)
+        return json.loads(encoded)
+
+    async def changes(
+        self, epoch: Optional[str], since: int, origin: Optional[str]
+    ) -> dict[str, Any]:
+        result: dict[str, Any] = self._wire(self.registry.export_changes(epoch, since, origin))
+        return result
+
+    async def digests(self, level: int, indices: list[int]) -> list[str]:
+        result: list[str] = self._wire(self.registry.tree_digests(level, indices))
+        return result
+
+    async def leaves(self, leaves: list[int]) -> dict[str, Any]:
+        result: dict[str, Any] = self._wire(self.registry.export_leaves(leaves))
+        return result
+
+
+class HttpPeer:
+    """Peer controller reached over its ``/replication`` endpoints.
+
+    Args:
+        url: Base URL of the peer controller
+        client: mTLS client presenting this controller's certificate
+    """
+
+    def __init__(self, url: str, client: httpx.AsyncClient) -> None:
+        self.name = url
+        self.url = url.rstrip("/")
+        self.client = client
+        self.bytes_received = 0
+
+    async def _json(self, response: httpx.Response) -> Any:
+        response.raise_for_status()
+        self.bytes_received += len(response.content)
+        return response.json()
+
+    async def changes(
+        self, epoch: Optional[str], since: int, origin: Optional[str]
+    ) -> dict[str, Any]:
+        params: dict[str, Any] = {"since": since}
+        if epoch is not None:
+            params["epoch"] = epoch
+        if origin is not None:
+            params["origin"] = origin
+        response = await self.client.get(f"{self.url}/replication/changes", params=params)
+        result: dict[str, Any] = await self._json(response)
+        return result
+
+    async def digests(self, level: int, indices: list[int]) -> list[str]:
+        response = await self.client.post(
+            f"{self.url}/replication/digests", json={"level": level, "indices": indices}
+        )
+        result: list[str] = (await self._json(response))["digests"]
+        return result
+
+    async def leaves(self, leaves: list[int]) -> dict[str, Any]:
+        response = await self.client.post(f"{self.url}/replication/leaves", json={"leaves": leaves})
+        result: dict[str, Any] = await self._json(response)
+        return result
+
+
+# --- Replicator ---
+
+
+@dataclass(slots=True)
+class _Cursor:
+    controller_id: Optional[str] = None
+    epoch: Optional[str] = None
+    seq: int = 0
+    reconciled_at: float = 0.0  # time.monotonic() of the last anti-entropy pass
+
+
+class Replicator:
+    """Pulls peers' registry changes into the local registry.
+
+    Args:
+        registry: Local registry
+        peers: Other controllers
+        interval: Seconds between delta pulls
+        anti_entropy_interval: Seconds between Merkle reconciliations per peer
+        full_mesh: Every controller pulls from every other one, so peers
+            only serve the changes they originated. Set False when peers
+            form a partial graph and must relay each other's changes
+    """
+
+    def __init__(
+        self,
+        registry: "CapabilityRegistry",
+        peers: Sequence[RegistryPeer],
+        interval: float = DEFAULT_SYNC_INTERVAL,
+        anti_entropy_interval: float = DEFAULT_ANTI_ENTROPY_INTERVAL,
+        full_mesh: bool = True,
+    ) -> None:
+        self.registry = registry
+        self.peers = list(peers)
+        self.interval = interval
+        self.anti_entropy_interval = anti_entropy_interval
+        self.full_mesh = full_mesh
+        self._cursors = {peer.name: _Cursor() for peer in self.peers}
+        self._task: Optional[asyncio.Task[None]] = None
+        self.counts = {"pulls": 0, "reconciliations": 0, "applied": 0, "failures": 0}
+
+    async def sync(self, peer: RegistryPeer) -> int:
+        """Pull a peer's changes, reconciling first when the cursor is unusable.
+
+        Returns:
+            Entries applied locally
+        """
+        cursor = self._cursors.setdefault(peer.name, _Cursor())
+        applied = 0
+        reset = False
+        while True:
+            origin = cursor.controller_id if self.full_mesh else None
+            response = await peer.changes(cursor.epoch, cursor.seq, origin)
+            if response["reset"]:
+                if reset:
+                    raise RuntimeError(f"{peer.name} reset its change log twice in one sync")
+                # New or restarted peer: fetch its state by divergence, then
+                # follow its change log from the position taken before that
+                reset = True
+                applied += await self.reconcile(peer)
+                cursor.controller_id = response["controller_id"]
+                cursor.epoch, cursor.seq = response["epoch"], response["seq"]
+                continue
+            applied += self.registry.import_remote_state(response["controller_id"], response)
+            cursor.seq = response["seq"]
+            self.counts["pulls"] += 1
+            if not response["more"]:
+                return applied
+
+    async def reconcile(self, peer: RegistryPeer) -> int:
+        """Merkle anti-entropy with one peer: fetch only divergent leaves.
+
+        Returns:
+            Entries applied locally
+        """
+        tree = self.registry.replica.tree
+        level, indices = 0, [0]
+        while True:
+            remote = await peer.digests(level, indices)
+            local = tree.digests(level, indices)
+            differing = [index for index, a, b in zip(indices, local, remote) if a != b]
+            if not differing:
+                applied = 0
+                break
+            if level == tree.depth:
+                state = await peer.leaves(differing)
+                applied = self.registry.import_remote_state(state["controller_id"], state)
+                break
+            step = min(DESCENT_STEP, tree.depth - level)
+            level += step
+            indices = [(index << step) + child for index in differing for child in range(1 << step)]
+        self._cursors.setdefault(peer.name, _Cursor()).reconciled_at = time.monotonic()
+        self.counts["reconciliations"] += 1
+        return applied
+
+    async def run_once(self) -> int:
+        """One round: delta pull from every peer, anti-entropy with those due."""
+        applied = 0
+        now = time.monotonic()
+        for peer in random.sample(self.peers, len(self.peers)):
+            try:
+                applied += await self.sync(peer)
+                cursor = self._cursors[peer.name]
+                if now - cursor.reconciled_at >= self.anti_entropy_interval:
+                    applied += await self.reconcile(peer)
+            except Exception as e:
+                self.counts["failures"] += 1
+                logger.warning("Registry sync with %s failed: %s", peer.name, e)
+        self.registry.purge_tombstones()
+        self.counts["applied"] += applied
+        return applied
+
+    def start(self) -> None:
+        """Start replicating in the background (call from the running loop)."""
+        if self._task is None and self.peers:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def report(self) -> dict[str, Any]:
+        """Counters and per-peer cursors."""
+        return {
+            **self.counts,
+            "peers": {
+                name: {"epoch": cursor.epoch, "seq": cursor.seq}
+                for name, cursor in self._cursors.items()
+            },
+        }
+
+    async def _run(self) -> None:
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
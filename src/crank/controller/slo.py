@@ -0,0 +1,425 @@
+"""SLO tracking - latency percentiles and error-budget burn per capability.
+
+Implementation of the SLO tracking in ADR-0026. Every invocation reported
+to the controller is recorded against its capability and worker:
+- Latency goes into an HDR-style histogram (log buckets with linear
+  sub-buckets, ~1.6% worst-case relative error) over a sliding window
+  built from a ring of time slices, for p50/p95/p99
+- Outcomes go into a longer ring of per-minute counters (total, errors,
+  requests over each latency target) for burn rates over 5m/30m/1h/6h
+
+Memory per series is fixed by the window configuration, not by traffic:
+the arrays are allocated once and slices are zeroed as the ring wraps.
+
+Objectives come from ``CapabilitySchema.slo``::
+
+    {"latency_p95_ms": 100, "latency_p99_ms": 250, "availability_pct": 99.9}
+
+The same keys work as routing constraints: ``slo_ratio()`` compares a
+worker's live percentiles and error rate with them, and the registry only
+routes a constrained request to workers whose ratio is at most 1.
+
+Each objective has an error budget (1 - availability, or the share of
+requests allowed over a latency target, e.g. 5% for p95); the burn rate is
+the observed bad fraction divided by that budget, so 1.0 spends the budget
+exactly over the SLO period. Alerts follow the multi-window rule: page when
+both the 1h and 5m burn exceed 14.4, ticket when the 6h and 30m exceed 6.
+"""
+
+import logging
+import time
+from collections.abc import Callable, Iterator, Mapping
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import numpy as np
+import numpy.typing as npt
+
+logger = logging.getLogger(__name__)
+
+SUB_BUCKET_BITS = 7  # 128 linear sub-buckets per power of two
+_HALF = 1 << (SUB_BUCKET_BITS - 1)
+MAX_LATENCY_US = (1 << 32) - 1  # ~71 minutes; longer values are clamped
+HISTOGRAM_BUCKETS = (32 - SUB_BUCKET_BITS + 1) * _HALF + _HALF
+
+LATENCY_WINDOW = 300.0  # Seconds of latency kept for percentiles
+LATENCY_SLICES = 5
+EVENT_SLICE = 60.0  # Seconds per outcome-counter slice
+BURN_WINDOWS = {"5m": 300, "30m": 1800, "1h": 3600, "6h": 21600}
+PAGE_BURN_RATE = 14.4  # 2% of a 30-day budget in one hour
+TICKET_BURN_RATE = 6.0  # 5% of a 30-day budget in six hours
+
+QUANTILES = (0.5, 0.95, 0.99)
+LATENCY_OBJECTIVES = {"latency_p50_ms": 0.5, "latency_p95_ms": 0.95, "latency_p99_ms": 0.99}
+_TOTAL, _ERRORS = 0, 1  # Event columns; latency objectives follow in LATENCY_OBJECTIVES order
+ALL_WORKERS = "*"
+
+MIN_SLO_SAMPLES = 20  # Fewer recent samples than this: a worker counts as meeting constraints
+SLO_FALLBACKS = ("best_effort", "any", "reject")  # When no worker meets the constraints
+DEFAULT_SLO_FALLBACK = "best_effort"
+
+
+# --- Histogram ---
+
+
+def bucket_index(latency_us: int) -> int:
+    """Histogram bucket for a latency in microseconds."""
+    value = min(max(latency_us, 0), MAX_LATENCY_US)
+    shift = max(value.bit_length() - SUB_BUCKET_BITS, 0)
+    return shift * _HALF + (value >> shift)
+
+
+def bucket_midpoint_us(index: int) -> float:
+    """Representative latency (microseconds) of a bucket."""
+    if index < 2 * _HALF:
+        return float(index)
+    shift = index // _HALF - 1
+    sub = index - shift * _HALF
+    return ((sub << shift) + ((sub + 1) << shift)) / 2
+
+
+def histogram_quantile(counts: npt.NDArray[np.uint64], quantile: float) -> Optional[float]:
+    """Latency (ms) at ``quantile`` of a bucket-count array; None when empty."""
+    cumulative = np.cumsum(counts)
+    total = int(cumulative[-1])
+    if total == 0:
+        return None
+    rank = max(int(np.ceil(quantile * total)), 1)
+    index = int(np.searchsorted(cumulative, rank))
+    return bucket_midpoint_us(index) / 1000
+
+
+class _SlicedRing:
+    """Fixed ring of per-slice rows; a row is zeroed when its slice is reused."""
+
+    __slots__ = ("epochs", "rows", "slice_seconds")
+
+    def __init__(self, slices: int, width: int, slice_seconds: float) -> None:
+        self.rows = np.zeros((slices, width), dtype=np.uint32)
+        self.epochs = np.full(slices, -1, dtype=np.int64)
+        self.slice_seconds = slice_seconds
+
+    def row(self, now: float) -> npt.NDArray[np.uint32]:
+        epoch = int(now // self.slice_seconds)
+        position = epoch % len(self.epochs)
+        if self.epochs[position] != epoch:
+            self.rows[position] = 0
+            self.epochs[position] = epoch
+        row: npt.NDArray[np.uint32] = self.rows[position]
+        return row
+
+    def total(self, now: float, window: float) -> npt.NDArray[np.uint64]:
+        """Column sums over the slices within ``window`` seconds of ``now``."""
+        current = int(now // self.slice_seconds)
+        oldest = current - max(int(np.ceil(window / self.slice_seconds)), 1) + 1
+        live = (self.epochs >= oldest) & (self.epochs <= current)
+        summed: npt.NDArray[np.uint64] = self.rows[live].sum(axis=0, dtype=np.uint64)
+        return summed
+
+
+# --- Objectives ---
+
+
+@dataclass(frozen=True, slots=True)
+class SLOObjectives:
+    """Targets parsed from ``CapabilitySchema.slo``."""
+
+    availability: Optional[float] = None  # Fraction, e.g. 0.999
+    latency_ms: tuple[Optional[float], ...] = (None,) * len(LATENCY_OBJECTIVES)
+
+    @classmethod
+    def from_schema(cls, slo: Optional[Mapping[str, Any]]) -> "SLOObjectives":
+        """Parse a capability's ``slo`` dict; unknown keys are ignored.
+
+        Raises:
+            ValueError: A target is not a positive number, or availability is
+                not below 100%
+        """
+        slo = slo or {}
+        latency = tuple(
+            _positive(slo[key], key) if slo.get(key) is not None else None
+            for key in LATENCY_OBJECTIVES
+        )
+        availability = None
+        if slo.get("availability_pct") is not None:
+            availability = _positive(slo["availability_pct"], "availability_pct") / 100
+            if availability >= 1:
+                raise ValueError("availability_pct must be below 100 (no error budget)")
+        return cls(availability, latency)
+
+    def budgets(self) -> Iterator[tuple[str, int, float, Optional[float]]]:
+        """(objective, event column, error budget, target) for each declared objective."""
+        if self.availability is not None:
+            yield "availability", _ERRORS, 1 - self.availability, self.availability
+        for column, ((name, quantile), target) in enumerate(
+            zip(LATENCY_OBJECTIVES.items(), self.latency_ms), start=2
+        ):
+            if target is not None:
+                yield name, column, 1 - quantile, target
+
+
+def parse_slo_constraints(constraints: Mapping[str, Any]) -> tuple[SLOObjectives, str]:
+    """Objectives and fallback policy from a request's ``slo_constraints``.
+
+    Raises:
+        ValueError: Malformed target or unknown fallback policy
+    """
+    fallback = constraints.get("fallback", DEFAULT_SLO_FALLBACK)
+    if fallback not in SLO_FALLBACKS:
+        raise ValueError(f"SLO fallback must be one of {', '.join(SLO_FALLBACKS)}: {fallback!r}")
+    return SLOObjectives.from_schema(constraints), fallback
+
+
+def _positive(value: Any, key: str) -> float:
+    number = float(value)
+    if not number > 0:
+        raise ValueError(f"SLO {key} must be positive, got {value!r}")
+    return number
+
+
+# --- Tracker ---
+
+
+class _Series:
+    """Windowed latency histogram and outcome counters for one capability/worker."""
+
+    __slots__ = ("errors", "events", "latency", "requests")
+
+    def __init__(self, latency_window: float, latency_slices: int, event_window: float) -> None:
+        self.latency = _SlicedRing(
+            latency_slices, HISTOGRAM_BUCKETS, latency_window / latency_slices
+        )
+        event_slices = int(np.ceil(event_window / EVENT_SLICE))
+        self.events = _SlicedRing(event_slices, 2 + len(LATENCY_OBJECTIVES), EVENT_SLICE)
+        self.requests = 0  # Lifetime counters for Prometheus
+        self.errors = 0
+
+
+class SLOTracker:
+    """Per-capability, per-worker latency and error-budget tracking.
+
+    Args:
+        latency_window: Seconds of latency the percentiles cover
+        latency_slices: Slices the latency window rotates in
+        clock: Time source (seconds); monotonic by default
+    """
+
+    def __init__(
+        self,
+        *,
+        latency_window: float = LATENCY_WINDOW,
+        latency_slices: int = LATENCY_SLICES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.latency_window = latency_window
+        self.latency_slices = latency_slices
+        self.clock = clock
+        self._event_window = float(max(BURN_WINDOWS.values()))
+        self._series: dict[str, dict[str, _Series]] = {}  # capability -> worker -> series
+        self._objectives: dict[str, SLOObjectives] = {}
+
+    # --- Recording ---
+
+    def set_objectives(self, capability_key: str, slo: Optional[Mapping[str, Any]]) -> None:
+        """Declare (or clear) a capability's SLO targets."""
+        objectives = SLOObjectives.from_schema(slo)
+        if objectives == SLOObjectives():
+            self._objectives.pop(capability_key, None)
+        else:
+            self._objectives[capability_key] = objectives
+
+    def record(
+        self, capability_key: str, worker_id: str, latency_ms: float, success: bool = True
+    ) -> None:
+        """Record one completed invocation."""
+        now = self.clock()
+        index = bucket_index(int(latency_ms * 1000))
+        targets = self._objectives.get(capability_key, SLOObjectives()).latency_ms
+        workers = self._series.setdefault(capability_key, {})
+        for key in (ALL_WORKERS, worker_id):
+            series = workers.get(key)
+            if series is None:
+                series = workers[key] = _Series(
+                    self.latency_window, self.latency_slices, self._event_window
+                )
+            series.latency.row(now)[index] += 1
+            events = series.events.row(now)
+            events[_TOTAL] += 1
+            series.requests += 1
+            if not success:
+                events[_ERRORS] += 1
+                series.errors += 1
+            for column, target in enumerate(targets, start=2):
+                if target is not None and latency_ms > target:
+                    events[column] += 1
+
+    def forget_worker(self, worker_id: str) -> None:
+        """Drop a deregistered worker's series (capability totals are kept)."""
+        for workers in self._series.values():
+            workers.pop(worker_id, None)
+
+    # --- Reporting ---
+
+    def latency(
+        self, capability_key: str, worker_id: str = ALL_WORKERS
+    ) -> dict[str, Optional[float]]:
+        """p50/p95/p99 (ms) over the latency window; None without samples."""
+        series = self._series.get(capability_key, {}).get(worker_id)
+        if series is None:
+            return {_quantile_label(q): None for q in QUANTILES}
+        counts = series.latency.total(self.clock(), self.latency_window)
+        return {_quantile_label(q): _round(histogram_quantile(counts, q)) for q in QUANTILES}
+
+    def quantile(
+        self,
+        capability_key: str,
+        quantile: float,
+        worker_id: str = ALL_WORKERS,
+        *,
+        min_samples: int = 1,
+    ) -> Optional[float]:
+        """One latency quantile (ms) over the latency window.
+
+        Returns:
+            The quantile, or None with fewer than ``min_samples`` recent samples
+        """
+        series = self._series.get(capability_key, {}).get(worker_id)
+        if series is None:
+            return None
+        counts = series.latency.total(self.clock(), self.latency_window)
+        if int(counts.sum()) < max(min_samples, 1):
+            return None
+        return histogram_quantile(counts, quantile)
+
+    def burn_rates(self, capability_key: str) -> dict[str, dict[str, Any]]:
+        """Burn rate per declared objective and window, with alert state."""
+        objectives = self._objectives.get(capability_key)
+        series = self._series.get(capability_key, {}).get(ALL_WORKERS)
+        if objectives is None:
+            return {}
+        now = self.clock()
+        window_events = {
+            label: series.events.total(now, seconds) if series else None
+            for label, seconds in BURN_WINDOWS.items()
+        }
+        report: dict[str, dict[str, Any]] = {}
+        for name, column, budget, target in objectives.budgets():
+            rates = {}
+            for label, events in window_events.items():
+                total = int(events[_TOTAL]) if events is not None else 0
+                bad = int(events[column]) if events is not None else 0
+                rates[label] = round(bad / total / budget, 3) if total else 0.0
+            if rates["1h"] > PAGE_BURN_RATE and rates["5m"] > PAGE_BURN_RATE:
+                alert = "page"
+            elif rates["6h"] > TICKET_BURN_RATE and rates["30m"] > TICKET_BURN_RATE:
+                alert = "ticket"
+            else:
+                alert = None
+            report[name] = {
+                "target": target,
+                "error_budget": round(budget, 6),
+                "burn_rate": rates,
+                "alert": alert,
+            }
+        return report
+
+    def slo_ratio(
+        self, capability_key: str, worker_id: str, objectives: SLOObjectives
+    ) -> Optional[float]:
+        """Worst observed/target ratio of a worker over the latency window.
+
+        At most 1.0 means the worker currently meets every objective. The
+        availability ratio is the error rate over the allowed error rate.
+
+        Returns:
+            The ratio, or None with fewer than ``MIN_SLO_SAMPLES`` recent samples
+        """
+        series = self._series.get(capability_key, {}).get(worker_id)
+        if series is None:
+            return None
+        now = self.clock()
+        counts = series.latency.total(now, self.latency_window)
+        if int(counts.sum()) < MIN_SLO_SAMPLES:
+            return None
+        ratio = 0.0
+        for quantile, target in zip(LATENCY_OBJECTIVES.values(), objectives.latency_ms):
+            if target is not None:
+                observed = histogram_quantile(counts, quantile) or 0.0
+                ratio = max(ratio, observed / target)
+        if objectives.availability is not None:
+            events = series.events.total(now, self.latency_window)
+            error_rate = int(events[_ERRORS]) / max(int(events[_TOTAL]), 1)
+            ratio = max(ratio, error_rate / (1 - objectives.availability))
+        return ratio
+
+    def report(self) -> dict[str, Any]:
+        """Latency, request counts and burn rates for every tracked capability."""
+        capabilities = sorted(set(self._series) | set(self._objectives))
+        return {key: self._capability_report(key) for key in capabilities}
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition (format 0.0.4) of the tracked series."""
+        lines = [
+            "# HELP crank_slo_latency_ms Invocation latency quantiles over the latency window",
+            "# TYPE crank_slo_latency_ms summary",
+        ]
+        counters = []
+        for capability_key, workers in sorted(self._series.items()):
+            for worker_id, series in sorted(workers.items()):
+                labels = f'capability="{_escape(capability_key)}",worker="{_escape(worker_id)}"'
+                for label, value in self.latency(capability_key, worker_id).items():
+                    if value is not None:
+                        quantile = int(label[1:]) / 100
+                        lines.append(
+                            f'crank_slo_latency_ms{{{labels},quantile="{quantile:g}"}} {value}'
+                        )
+                lines.append(f"crank_slo_latency_ms_count{{{labels}}} {series.requests}")
+                counters.append(f"crank_slo_errors_total{{{labels}}} {series.errors}")
+        lines += [
+            "# HELP crank_slo_errors_total Failed invocations",
+            "# TYPE crank_slo_errors_total counter",
+            *counters,
+            "# HELP crank_slo_burn_rate Error budget burn rate (1.0 spends it over the SLO period)",
+            "# TYPE crank_slo_burn_rate gauge",
+        ]
+        for capability_key in sorted(self._objectives):
+            for objective, state in self.burn_rates(capability_key).items():
+                for window, rate in state["burn_rate"].items():
+                    lines.append(
+                        f'crank_slo_burn_rate{{capability="{_escape(capability_key)}",'
+                        f'objective="{objective}",window="{window}"}} {rate}'
+                    )
+        return "\n".join(lines) + "\n"
+
+    # --- Internal Helpers ---
+
+    def _capability_report(self, capability_key: str) -> dict[str, Any]:
+        workers = self._series.get(capability_key, {})
+        overall = workers.get(ALL_WORKERS)
+        return {
+            "requests": overall.requests if overall else 0,
+            "errors": overall.errors if overall else 0,
+            "latency_ms": self.latency(capability_key),
+            "objectives": self.burn_rates(capability_key),
+            "workers": {
+                worker_id: {
+                    "requests": series.requests,
+                    "errors": series.errors,
+                    "latency_ms": self.latency(capability_key, worker_id),
+                }
+                for worker_id, series in sorted(workers.items())
+                if worker_id != ALL_WORKERS
+            },
+        }
+
+
+def _quantile_label(quantile: float) -> str:
+    return f"p{round(quantile * 100)}"
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 3)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
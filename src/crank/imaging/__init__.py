@@ -0,0 +1,46 @@
+"""
+Crank Imaging Package
+
+Shared helpers for image-processing workers. Provides:
+- Batch intake from multipart uploads or tar streams, with size limits
+- Thread-pool decoding with per-image error isolation
+- A per-request decode context shared by every model stage
+- Chunked classification of a batch, with one result record per image
+- NDJSON streaming responses for per-image results
+- Vectorized feature extraction (colours, brightness, contrast, edges)
+
+Usage:
+    from crank.imaging import decode_batch, ndjson_response, read_image_batch
+
+    images = await read_image_batch(request, max_images=32)
+    decoded = await decode_batch(images, decode_fn)
+    return ndjson_response(build_record(image, item) for image, item in zip(images, decoded))
+
+    features = await asyncio.to_thread(extract_features, rgb_array)
+"""
+
+from crank.imaging.batch import (
+    NDJSON_MEDIA_TYPE,
+    BatchImage,
+    BatchInputError,
+    decode_batch,
+    ndjson_response,
+    read_image_batch,
+    stream_batch_results,
+)
+from crank.imaging.decode import DecodedImage
+from crank.imaging.features import DominantColor, ImageFeatures, extract_features
+
+__all__: list[str] = [
+    "NDJSON_MEDIA_TYPE",
+    "BatchImage",
+    "BatchInputError",
+    "DecodedImage",
+    "DominantColor",
+    "ImageFeatures",
+    "decode_batch",
+    "extract_features",
+    "ndjson_response",
+    "read_image_batch",
+    "stream_batch_results",
+]
@@ -0,0 +1,282 @@
+"""
+Batch Image Intake
+
+Helpers for endpoints that classify many images in one request:
+- Read a batch from a multipart upload or an (optionally compressed) tar stream
+- Decode every image in the default thread pool, isolating per-image failures
+- Classify decoded images chunk by chunk off the event loop, producing one
+  result record per image
+- Stream per-image results back as NDJSON (one JSON object per line)
+
+Limits are enforced while reading so a single oversized request fails fast
+with a 413 instead of being buffered in full.
+"""
+
+import asyncio
+import io
+import json
+import logging
+import tarfile
+import uuid
+from collections.abc import AsyncIterable, AsyncIterator, Callable, Iterable, Sequence
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+from typing import Any, TypeVar
+
+from fastapi.responses import StreamingResponse
+from starlette.datastructures import UploadFile
+from starlette.requests import Request
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_MAX_IMAGES = 64
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # Whole request
+DEFAULT_MAX_IMAGE_BYTES = 32 * 1024 * 1024  # Single image
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+TAR_MEDIA_TYPES = frozenset(
+    {
+        "application/x-tar",
+        "application/tar",
+        "application/gzip",
+        "application/x-gtar",
+        "application/x-gzip",
+    }
+)
+
+
+@dataclass(frozen=True, slots=True)
+class BatchImage:
+    """One image extracted from a batch request, in request order."""
+
+    index: int
+    name: str
+    data: bytes
+
+
+class BatchInputError(ValueError):
+    """Batch request is malformed or exceeds limits.
+
+    ``status_code`` is the HTTP status the endpoint should return (400 for
+    malformed input, 413 when a limit is exceeded, 415 for unsupported
+    content types).
+    """
+
+    def __init__(self, message: str, status_code: int = 400) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+async def read_image_batch(
+    request: Request,
+    *,
+    max_images: int = DEFAULT_MAX_IMAGES,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    max_image_bytes: int = DEFAULT_MAX_IMAGE_BYTES,
+) -> list[BatchImage]:
+    """
+    Extract every image from a multipart or tar request body.
+
+    Multipart requests may use any field names; every file part becomes one
+    image. Tar requests (``Content-Type: application/x-tar``, gzip allowed)
+    contribute every regular file member.
+
+    Args:
+        request: Incoming request
+        max_images: Maximum number of images accepted
+        max_bytes: Maximum total image bytes accepted
+        max_image_bytes: Maximum size of a single image
+
+    Returns:
+        Images in request order
+
+    Raises:
+        BatchInputError: If the body is malformed, empty, or over a limit
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    if content_type == "multipart/form-data":
+        images = await _read_multipart(request, max_images, max_bytes, max_image_bytes)
+    elif content_type in TAR_MEDIA_TYPES:
+        body = await _read_body(request, max_bytes)
+        images = await asyncio.to_thread(_read_tar, body, max_images, max_bytes, max_image_bytes)
+    else:
+        raise BatchInputError(
+            f"Unsupported content type {content_type or '(none)'}; "
+            "send multipart/form-data or application/x-tar",
+            status_code=415,
+        )
+
+    if not images:
+        raise BatchInputError("Batch contains no images")
+    return images
+
+
+async def decode_batch(
+    images: Sequence[BatchImage], decode: Callable[[bytes], T]
+) -> list[T | Exception]:
+    """
+    Decode images concurrently in the default thread pool.
+
+    Image decoders (PIL, OpenCV) release the GIL, so decoding a batch in
+    threads overlaps well. A failing image yields its exception in place of
+    a result instead of failing the whole batch.
+    """
+    results = await asyncio.gather(
+        *(asyncio.to_thread(decode, image.data) for image in images),
+        return_exceptions=True,
+    )
+    decoded: list[T | Exception] = []
+    for result in results:
+        if isinstance(result, Exception):
+            decoded.append(result)
+        elif isinstance(result, BaseException):
+            raise result  # Cancellation and interpreter exits must propagate
+        else:
+            decoded.append(result)
+    return decoded
+
+
+async def stream_batch_results(
+    images: Sequence[BatchImage],
+    decoded: Sequence[T | Exception],
+    classify: Callable[[list[T]], list[list[dict[str, Any]]]],
+    batch_size: int,
+    *,
+    describe: Callable[[T], dict[str, Any]] | None = None,
+    id_prefix: str = "image",
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Classify a decoded batch in chunks and yield one record per image, in order.
+
+    ``classify`` runs in the default thread pool once per chunk of up to
+    ``batch_size`` decoded images and returns each image's result list.
+    Every record has ``index``, ``name``, ``image_id``, ``image_size`` and
+    ``success``; successes add ``results`` (plus ``describe(item)``),
+    failures add ``error``. A decode failure fails only its image; a failing
+    ``classify`` call fails the images of its chunk.
+    """
+    for start in range(0, len(images), batch_size):
+        chunk = list(zip(images[start : start + batch_size], decoded[start : start + batch_size]))
+        ready = [item for _, item in chunk if not isinstance(item, Exception)]
+
+        chunk_error: str | None = None
+        results: list[list[dict[str, Any]]] = []
+        if ready:
+            try:
+                results = await asyncio.to_thread(classify, ready)
+                if len(results) != len(ready):
+                    raise ValueError(f"classify returned {len(results)} results for {len(ready)}")
+            except Exception as e:
+                logger.exception("Batch classification failed for images %d+", start)
+                chunk_error = str(e)
+
+        ready_results = iter(results)
+        for image, item in chunk:
+            record: dict[str, Any] = {
+                "index": image.index,
+                "name": image.name,
+                "image_id": f"{id_prefix}-{uuid.uuid4().hex[:8]}",
+                "image_size": len(image.data),
+            }
+            if isinstance(item, Exception):
+                record.update(success=False, error=f"Image decode failed: {item}")
+            elif chunk_error is not None:
+                record.update(success=False, error=chunk_error)
+            else:
+                record.update(success=True, results=next(ready_results))
+                if describe is not None:
+                    record.update(describe(item))
+            yield record
+
+
+def ndjson_response(
+    records: AsyncIterable[dict[str, Any]] | Iterable[dict[str, Any]],
+    status_code: int = 200,
+) -> StreamingResponse:
+    """Stream records as newline-delimited JSON, one record per line."""
+    if isinstance(records, AsyncIterable):
+        body: Any = _encode_async(records)
+    else:
+        body = (_encode_record(record) for record in records)
+    return StreamingResponse(body, status_code=status_code, media_type=NDJSON_MEDIA_TYPE)
+
+
+async def _encode_async(records: AsyncIterable[dict[str, Any]]) -> AsyncIterable[bytes]:
+    async for record in records:
+        yield _encode_record(record)
+
+
+def _encode_record(record: dict[str, Any]) -> bytes:
+    return (json.dumps(record, separators=(",", ":"), default=str) + "\n").encode("utf-8")
+
+
+async def _read_multipart(
+    request: Request, max_images: int, max_bytes: int, max_image_bytes: int
+) -> list[BatchImage]:
+    try:
+        form = await request.form(max_files=max_images, max_part_size=max_image_bytes)
+    except Exception as e:  # Malformed body, or more parts than max_images
+        raise BatchInputError(f"Invalid multipart body: {e}") from e
+
+    images: list[BatchImage] = []
+    total = 0
+    try:
+        for _, value in form.multi_items():
+            if not isinstance(value, UploadFile):
+                continue
+            data = await value.read()
+            total += len(data)
+            _check_limits(len(images) + 1, len(data), total, max_images, max_image_bytes, max_bytes)
+            images.append(BatchImage(len(images), value.filename or f"image-{len(images)}", data))
+    finally:
+        await form.close()
+    return images
+
+
+async def _read_body(request: Request, max_bytes: int) -> bytes:
+    buffer = bytearray()
+    async for chunk in request.stream():
+        buffer.extend(chunk)
+        if len(buffer) > max_bytes:
+            raise BatchInputError(f"Batch exceeds {max_bytes} bytes", status_code=413)
+    return bytes(buffer)
+
+
+def _read_tar(
+    body: bytes, max_images: int, max_bytes: int, max_image_bytes: int
+) -> list[BatchImage]:
+    """Read regular file members in archive order (runs in a worker thread)."""
+    images: list[BatchImage] = []
+    total = 0
+    try:
+        # Stream mode reads members sequentially and handles gzip/bz2/xz transparently
+        with tarfile.open(fileobj=io.BytesIO(body), mode="r|*") as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                total += member.size  # Uncompressed size, so gzip bombs are caught too
+                _check_limits(
+                    len(images) + 1, member.size, total, max_images, max_image_bytes, max_bytes
+                )
+                extracted = archive.extractfile(member)
+                if extracted is None:
+                    continue
+                name = PurePosixPath(member.name).name or f"image-{len(images)}"
+                images.append(BatchImage(len(images), name, extracted.read()))
+    except tarfile.TarError as e:
+        raise BatchInputError(f"Invalid tar stream: {e}") from e
+    return images
+
+
+def _check_limits(
+    count: int, size: int, total: int, max_images: int, max_image_bytes: int, max_bytes: int
+) -> None:
+    if count > max_images:
+        raise BatchInputError(f"Batch exceeds {max_images} images", status_code=413)
+    if size > max_image_bytes:
+        raise BatchInputError(f"Image exceeds {max_image_bytes} bytes", status_code=413)
+    if total > max_bytes:
+        raise BatchInputError(f"Batch exceeds {max_bytes} bytes", status_code=413)
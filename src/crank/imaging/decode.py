@@ -0,0 +1,126 @@
+"""
+Per-Request Image Decode Context
+
+Model stages of an image worker (detection, CLIP, scene fusion, embeddings)
+all read the same upload. ``DecodedImage`` decodes the bytes once, on first
+use, and caches every form derived from the decode:
+- ``pil``: RGB PIL image (the only decode)
+- ``rgb``: HxWx3 uint8 array of ``pil``
+- ``bgr``: OpenCV channel order as a zero-copy reversed-channel view
+- ``model_input``: the worker's preprocessing of ``pil`` (e.g. a CLIP tensor)
+
+Each derivation is timed, so responses can report the decode cost and how
+much of it sharing the context across stages avoided (``stats()``).
+"""
+
+import contextlib
+import io
+import time
+from collections.abc import Callable, Iterator
+from functools import cached_property
+from typing import Any, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+from PIL import Image
+
+# Forms each derivation is built from (a reuse saves the whole chain)
+_DECODE_DEPENDENCIES: dict[str, tuple[str, ...]] = {
+    "pil": (),
+    "rgb": ("pil",),
+    "bgr": ("rgb",),
+    "model_input": ("pil",),
+}
+
+
+class DecodedImage:
+    """
+    Image bytes decoded once, with cached derived forms.
+
+    Stages take this object instead of raw bytes and fetch forms with
+    ``use()``, which counts reuse of forms already derived. ``prepare()``
+    derives forms eagerly (e.g. in a worker thread) without counting reuse.
+
+    Example:
+        decoded = DecodedImage(data, preprocess=clip_input)
+        detections = yolo(decoded.use("bgr"))
+        features = clip.encode_image(decoded.use("model_input"))
+        decoded.stats()  # {"decode_ms": ..., "saved_ms": ..., "reuse_counts": {...}}
+    """
+
+    def __init__(
+        self,
+        image_data: bytes,
+        preprocess: Optional[Callable[[Image.Image], Any]] = None,
+    ) -> None:
+        """
+        Wrap image bytes; nothing is decoded until a form is used.
+
+        Args:
+            image_data: Encoded image (any format PIL reads)
+            preprocess: Builds ``model_input`` from the RGB PIL image
+        """
+        self.image_data = image_data
+        self._preprocess = preprocess
+        self._cost_ms: dict[str, float] = {}
+        self._reuse: dict[str, int] = {}
+
+    @cached_property
+    def pil(self) -> Image.Image:
+        """Decoded RGB image."""
+        with self._timed("pil"):
+            return Image.open(io.BytesIO(self.image_data)).convert("RGB")
+
+    @cached_property
+    def rgb(self) -> NDArray[np.uint8]:
+        """RGB pixel array (HxWx3, uint8)."""
+        pil_image = self.pil
+        with self._timed("rgb"):
+            return np.asarray(pil_image)
+
+    @cached_property
+    def bgr(self) -> NDArray[np.uint8]:
+        """BGR view of ``rgb`` for OpenCV/YOLO (no copy)."""
+        return self.rgb[:, :, ::-1]
+
+    @cached_property
+    def model_input(self) -> Any:
+        """Result of ``preprocess`` on the decoded image."""
+        if self._preprocess is None:
+            raise ValueError("DecodedImage has no preprocess for model_input")
+        pil_image = self.pil
+        with self._timed("model_input"):
+            return self._preprocess(pil_image)
+
+    def prepare(self, forms: tuple[str, ...]) -> "DecodedImage":
+        """Derive forms eagerly without counting reuse."""
+        for form in forms:
+            getattr(self, form)
+        return self
+
+    def use(self, form: str) -> Any:
+        """Fetch a derived form, counting reuse when it was already computed."""
+        if form in self.__dict__:
+            self._reuse[form] = self._reuse.get(form, 0) + 1
+        return getattr(self, form)
+
+    def stats(self) -> dict[str, Any]:
+        """Decode cost and the time saved by sharing this context across stages."""
+        saved_ms = sum(self._chain_cost_ms(form) * hits for form, hits in self._reuse.items())
+        return {
+            "decode_ms": round(sum(self._cost_ms.values()), 3),
+            "saved_ms": round(saved_ms, 3),
+            "reuse_counts": dict(self._reuse),
+        }
+
+    def _chain_cost_ms(self, form: str) -> float:
+        own = self._cost_ms.get(form, 0.0)
+        return own + sum(self._chain_cost_ms(dep) for dep in _DECODE_DEPENDENCIES[form])
+
+    @contextlib.contextmanager
+    def _timed(self, form: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._cost_ms[form] = (time.perf_counter() - start) * 1000
@@ -0,0 +1,188 @@
+"""
+Image Feature Extraction
+
+NumPy/OpenCV-native statistics for lightweight (CPU) image classification:
+- Mean colour and dominant colours (weighted k-means over a colour histogram)
+- Brightness and contrast of the grayscale image
+- Edge density and contour count from a single Canny pass
+
+Large images are downsampled first (area interpolation preserves averages),
+and every statistic is derived from the same downsampled array, so the cost
+is bounded regardless of input resolution. ``extract_features`` is pure and
+CPU-bound; call it via ``asyncio.to_thread`` from async code.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIDE = 1024  # Longest side analysed, in pixels
+DEFAULT_DOMINANT_COLORS = 5
+HISTOGRAM_BITS = 4  # Bits kept per channel: 16^3 = 4096 colour bins
+KMEANS_ITERATIONS = 10
+
+
+@dataclass(frozen=True, slots=True)
+class DominantColor:
+    """One colour cluster and the share of pixels it covers."""
+
+    rgb: tuple[int, int, int]
+    fraction: float
+
+    @property
+    def hex(self) -> str:
+        """Colour as ``#rrggbb``."""
+        return "#{:02x}{:02x}{:02x}".format(*self.rgb)
+
+
+@dataclass(frozen=True, slots=True)
+class ImageFeatures:
+    """Statistics shared by every CPU classification stage."""
+
+    width: int  # Original dimensions (before downsampling)
+    height: int
+    scale: float  # Downsampling factor applied before analysis (1.0 = none)
+    mean_rgb: tuple[float, float, float]
+    dominant_colors: tuple[DominantColor, ...]
+    brightness: float  # Mean grayscale intensity, 0-255
+    contrast: float  # Grayscale standard deviation
+    edge_density: float  # Fraction of pixels on a Canny edge
+    contour_count: int  # External contours of the edge map
+
+    @property
+    def total_pixels(self) -> int:
+        """Pixel count of the original image."""
+        return self.width * self.height
+
+
+def extract_features(
+    image: NDArray[np.uint8],
+    *,
+    max_side: int = DEFAULT_MAX_SIDE,
+    dominant_colors: int = DEFAULT_DOMINANT_COLORS,
+    canny_thresholds: tuple[int, int] = (100, 200),
+) -> ImageFeatures:
+    """
+    Compute colour, brightness, contrast and edge statistics in one pass.
+
+    Args:
+        image: Pixel array; RGB (HxWx3), RGBA (alpha ignored) or grayscale (HxW)
+        max_side: Longest side to analyse; larger images are downsampled
+        dominant_colors: Number of colour clusters to report
+        canny_thresholds: Hysteresis thresholds for edge detection
+
+    Returns:
+        Extracted features
+
+    Raises:
+        ValueError: If the array is empty or not an image shape
+    """
+    rgb = _as_rgb(image)
+    height, width = rgb.shape[:2]
+    if height == 0 or width == 0:
+        raise ValueError("Image has no pixels")
+
+    scale = min(1.0, max_side / max(height, width))
+    if scale < 1.0:
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        rgb = np.asarray(cv2.resize(rgb, size, interpolation=cv2.INTER_AREA), dtype=np.uint8)
+
+    gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+    mean, std = cv2.meanStdDev(gray)
+    edges = cv2.Canny(gray, *canny_thresholds)
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    mean_r, mean_g, mean_b, _ = cv2.mean(rgb)
+
+    return ImageFeatures(
+        width=width,
+        height=height,
+        scale=scale,
+        mean_rgb=(mean_r, mean_g, mean_b),
+        dominant_colors=_dominant_colors(rgb.reshape(-1, 3), dominant_colors),
+        brightness=float(mean[0, 0]),
+        contrast=float(std[0, 0]),
+        edge_density=float(np.count_nonzero(edges)) / edges.size,
+        contour_count=len(contours),
+    )
+
+
+def _as_rgb(image: NDArray[Any]) -> NDArray[np.uint8]:
+    if image.ndim == 2:
+        return np.ascontiguousarray(cv2.cvtColor(image.astype(np.uint8), cv2.COLOR_GRAY2RGB))
+    if image.ndim == 3 and image.shape[2] in (3, 4):
+        return np.ascontiguousarray(image[:, :, :3], dtype=np.uint8)
+    raise ValueError(f"Unsupported image shape {image.shape}")
+
+
+def _dominant_colors(pixels: NDArray[np.uint8], k: int) -> tuple[DominantColor, ...]:
+    """
+    Weighted k-means over occupied histogram bins.
+
+    Clustering at most 4096 bin centres (weighted by pixel count) instead of
+    every pixel keeps the cost independent of image size.
+    """
+    shift = 8 - HISTOGRAM_BITS
+    levels = 1 << HISTOGRAM_BITS
+    quantized = (pixels >> shift).astype(np.int32)
+    bins = (quantized[:, 0] * levels + quantized[:, 1]) * levels + quantized[:, 2]
+    counts = np.bincount(bins, minlength=levels**3)
+
+    occupied = np.flatnonzero(counts)
+    weights = counts[occupied].astype(np.float64)
+    half_bin = (1 << shift) / 2
+    points = (
+        np.stack(
+            [occupied // (levels * levels), (occupied // levels) % levels, occupied % levels], 1
+        )
+        * (1 << shift)
+        + half_bin
+    ).astype(np.float64)
+
+    k = min(k, len(occupied))
+    if k == 0:
+        return ()
+
+    centroids = _init_centroids(points, weights, k)
+    for _ in range(KMEANS_ITERATIONS):
+        distances = ((points[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+        labels = distances.argmin(axis=1)
+        totals = np.bincount(labels, weights=weights, minlength=k)
+        sums = np.stack(
+            [np.bincount(labels, weights=weights * points[:, c], minlength=k) for c in range(3)],
+            axis=1,
+        )
+        updated = np.where(totals[:, None] > 0, sums / np.maximum(totals, 1)[:, None], centroids)
+        if np.allclose(updated, centroids, atol=0.5):
+            centroids = updated
+            break
+        centroids = updated
+
+    distances = ((points[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+    totals = np.bincount(distances.argmin(axis=1), weights=weights, minlength=k)
+    fractions = totals / weights.sum()
+
+    rounded = np.clip(np.rint(centroids), 0, 255).astype(int).tolist()
+    colors = [
+        DominantColor(rgb=(r, g, b), fraction=float(fractions[i]))
+        for i, (r, g, b) in enumerate(rounded)
+        if totals[i] > 0
+    ]
+    colors.sort(key=lambda color: color.fraction, reverse=True)
+    return tuple(colors)
+
+
+def _init_centroids(points: NDArray[np.float64], weights: NDArray[np.float64], k: int) -> Any:
+    """Deterministic k-means++: heaviest bin first, then the most weight-distant bins."""
+    chosen = [int(weights.argmax())]
+    nearest = ((points - points[chosen[0]]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        candidate = int((weights * nearest).argmax())
+        chosen.append(candidate)
+        nearest = np.minimum(nearest, ((points - points[candidate]) ** 2).sum(axis=1))
+    return points[chosen].copy()
@@ -0,0 +1,83 @@
+"""
+Crank Observability Package
+
+Telemetry shared by the controller, workers and protocol gateways
+(ADR-0024). Provides:
+- Distributed tracing in the OpenTelemetry data model: spans propagated
+  with the W3C ``traceparent`` header, tail-sampled in process (errors,
+  slow requests, upstream-sampled traces and a baseline ratio are kept)
+- Batched export as OTLP/JSON to a collector's OTLP/HTTP receiver or to a
+  JSON-lines file
+- ``TracingMiddleware`` for ASGI services and httpx event hooks for their
+  clients
+- A lock-free metrics registry (counters, gauges, histograms) rendered in
+  the Prometheus text format; the worker runtime and controller serve the
+  process-wide registry on ``/metrics``
+- On-demand profilers: a statistical stack sampler (CPU) and tracemalloc
+  heap-growth diffs, rendered as collapsed stacks or speedscope files
+
+Usage:
+    from crank.observability import TracingMiddleware, configure_tracing
+
+    tracer = configure_tracing("crank-controller")  # Reads CRANK_TRACE_EXPORT
+    app.add_middleware(TracingMiddleware)
+
+    with tracer.span("route") as span:
+        span.set_attribute("capability", "classify:classify")
+"""
+
+from crank.observability.export import (
+    BatchSpanExporter,
+    FileSpanSink,
+    HttpSpanSink,
+    encode_spans,
+)
+from crank.observability.http import TracingMiddleware, tracing_event_hooks
+from crank.observability.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    get_registry,
+)
+from crank.observability.profiling import AllocationTracer, StackSampler
+from crank.observability.tracing import (
+    Span,
+    SpanContext,
+    TailSampler,
+    Tracer,
+    configure_tracing,
+    current_span,
+    extract,
+    get_tracer,
+    inject,
+    parse_traceparent,
+    set_tracer,
+)
+
+__all__ = [
+    "AllocationTracer",
+    "BatchSpanExporter",
+    "Counter",
+    "FileSpanSink",
+    "Gauge",
+    "Histogram",
+    "HttpSpanSink",
+    "MetricsRegistry",
+    "Span",
+    "SpanContext",
+    "StackSampler",
+    "TailSampler",
+    "Tracer",
+    "TracingMiddleware",
+    "configure_tracing",
+    "current_span",
+    "encode_spans",
+    "extract",
+    "get_registry",
+    "get_tracer",
+    "inject",
+    "parse_traceparent",
+    "set_tracer",
+    "tracing_event_hooks",
+]
@@ -0,0 +1,225 @@
+"""
+Span Export
+
+Kept traces are queued in a bounded buffer and shipped in batches by a
+background task, so request handling never waits on the collector. Spans
+are encoded as OTLP/JSON (``ExportTraceServiceRequest``), which an
+OpenTelemetry Collector accepts on its OTLP/HTTP receiver and which the
+file sink writes one batch per line, for a local stand-in.
+
+When the buffer is full the oldest spans are dropped and counted.
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any, Optional, Protocol
+
+import httpx
+
+from crank.observability.tracing import Span
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_QUEUE = 8192  # Spans buffered before the oldest are dropped
+DEFAULT_BATCH_SIZE = 512  # Spans per export call
+DEFAULT_FLUSH_INTERVAL = 5.0  # Seconds between exports of a partial batch
+SCOPE_NAME = "crank.observability"
+
+
+class SpanSink(Protocol):
+    """Destination of encoded span batches."""
+
+    async def write(self, payload: dict[str, Any]) -> None:
+        """Deliver one OTLP/JSON ``ExportTraceServiceRequest``."""
+        ...
+
+    async def close(self) -> None:
+        """Release the sink's resources."""
+        ...
+
+
+# --- Encoding ---
+
+
+def _attribute(key: str, value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        encoded: dict[str, Any] = {"boolValue": value}
+    elif isinstance(value, int):
+        encoded = {"intValue": str(value)}  # int64 is a string in OTLP/JSON
+    elif isinstance(value, float):
+        encoded = {"doubleValue": value}
+    else:
+        encoded = {"stringValue": str(value)}
+    return {"key": key, "value": encoded}
+
+
+def encode_span(span: Span) -> dict[str, Any]:
+    """One span in OTLP/JSON form."""
+    encoded: dict[str, Any] = {
+        "traceId": span.context.trace_id,
+        "spanId": span.context.span_id,
+        "name": span.name,
+        "kind": span.kind,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns if span.end_ns is not None else span.start_ns),
+        "attributes": [_attribute(key, value) for key, value in span.attributes.items()],
+        "status": {"code": span.status},
+    }
+    if span.parent_span_id is not None:
+        encoded["parentSpanId"] = span.parent_span_id
+    if span.status_message:
+        encoded["status"]["message"] = span.status_message
+    return encoded
+
+
+def encode_spans(service_name: str, spans: Iterable[Span]) -> dict[str, Any]:
+    """An OTLP/JSON ``ExportTraceServiceRequest`` for one service's spans."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [_attribute("service.name", service_name)]},
+                "scopeSpans": [
+                    {
+                        "scope": {"name": SCOPE_NAME},
+                        "spans": [encode_span(span) for span in spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+# --- Sinks ---
+
+
+class FileSpanSink:
+    """Appends each batch to a file as one JSON line."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    async def write(self, payload: dict[str, Any]) -> None:
+        line = json.dumps(payload, separators=(",", ":")) + "\n"
+        await asyncio.to_thread(self._append, line)
+
+    def _append(self, line: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(line)
+
+    async def close(self) -> None:
+        return None
+
+
+class HttpSpanSink:
+    """POSTs each batch to an OTLP/HTTP collector (``/v1/traces``)."""
+
+    def __init__(self, url: str, timeout: float = 10.0) -> None:
+        self.url = url
+        self._client = httpx.AsyncClient(timeout=timeout)
+
+    async def write(self, payload: dict[str, Any]) -> None:
+        response = await self._client.post(self.url, json=payload)
+        response.raise_for_status()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def sink_from_target(target: str) -> SpanSink:
+    """Sink for a ``CRANK_TRACE_EXPORT`` value (``file:<path>`` or an http(s) URL)."""
+    if target.startswith("file:"):
+        return FileSpanSink(Path(target.removeprefix("file:")))
+    if target.startswith(("http://", "https://")):
+        return HttpSpanSink(target)
+    raise ValueError(f"Unsupported trace export target: {target!r}")
+
+
+# --- Batching ---
+
+
+class BatchSpanExporter:
+    """Buffers kept spans and exports them in batches from a background task.
+
+    The task starts with the first span submitted inside a running event
+    loop; spans submitted outside one wait for ``flush()`` or ``close()``.
+
+    Args:
+        sink: Destination of encoded batches
+        service_name: ``service.name`` resource attribute
+        max_queue: Spans buffered before the oldest are dropped
+        batch_size: Spans per export call
+        flush_interval: Seconds a partial batch waits before export
+    """
+
+    def __init__(
+        self,
+        sink: SpanSink,
+        service_name: str,
+        *,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ) -> None:
+        self.sink = sink
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: deque[Span] = deque(maxlen=max_queue)
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task[None]] = None
+        self._closed = False
+        self.counts = {"exported": 0, "dropped": 0, "failed": 0}
+
+    def submit(self, spans: list[Span]) -> None:
+        """Queue spans for export without blocking."""
+        overflow = len(self._queue) + len(spans) - (self._queue.maxlen or 0)
+        if overflow > 0:
+            self.counts["dropped"] += overflow
+        self._queue.extend(spans)
+        if self._closed:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        if len(self._queue) >= self.batch_size and self._wake is not None:
+            self._wake.set()
+
+    async def flush(self) -> None:
+        """Export everything queued."""
+        while self._queue:
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            try:
+                await self.sink.write(encode_spans(self.service_name, batch))
+                self.counts["exported"] += len(batch)
+            except Exception as e:
+                self.counts["failed"] += len(batch)
+                logger.warning("Failed to export %d spans: %s", len(batch), e)
+
+    async def close(self) -> None:
+        """Stop the background task, export what is left and close the sink."""
+        self._closed = True
+        if self._task is not None and self._wake is not None:
+            self._wake.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        await self.sink.close()
+
+    async def _run(self) -> None:
+        assert self._wake is not None
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
@@ -0,0 +1,113 @@
+"""
+HTTP Trace Propagation
+
+Server and client spans for the HTTP hops between controller and workers:
+- ``TracingMiddleware``: ASGI middleware opening a server span per request,
+  continuing the caller's trace from its ``traceparent`` header
+- ``tracing_event_hooks()``: httpx event hooks opening a client span per
+  outgoing request and sending its ``traceparent``
+"""
+
+import logging
+from typing import Any, Optional
+
+import httpx
+
+from crank.observability.tracing import (
+    SPAN_KIND_CLIENT,
+    SPAN_KIND_SERVER,
+    TRACEPARENT_HEADER,
+    Span,
+    Tracer,
+    get_tracer,
+    parse_traceparent,
+)
+
+logger = logging.getLogger(__name__)
+
+UNTRACED_PATHS = frozenset({"/health", "/metrics"})  # Probes, not work
+_SPAN_EXTENSION = "crank.span"
+
+
+class TracingMiddleware:
+    """ASGI middleware wrapping each HTTP request in a server span.
+
+    Responses with a 5xx status, and unhandled exceptions, mark the span
+    failed. Health and metrics probes are not traced.
+
+    Args:
+        app: ASGI application
+        tracer: Tracer to use (default: the process-wide tracer at request time)
+    """
+
+    def __init__(self, app: Any, tracer: Optional[Tracer] = None) -> None:
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or scope.get("path") in UNTRACED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        parent = None
+        for name, value in scope.get("headers", ()):
+            if name == b"traceparent":
+                parent = parse_traceparent(value.decode("latin-1"))
+                break
+        method, path = scope.get("method", "GET"), scope.get("path", "")
+        tracer = self.tracer or get_tracer()
+
+        with tracer.span(
+            f"{method} {path}",
+            kind=SPAN_KIND_SERVER,
+            parent=parent,
+            attributes={"http.request.method": method, "url.path": path},
+        ) as span:
+
+            async def send_with_status(message: dict[str, Any]) -> None:
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    span.set_attribute("http.response.status_code", status)
+                    if status >= 500:
+                        span.set_error(f"HTTP {status}")
+                await send(message)
+
+            await self.app(scope, receive, send_with_status)
+
+
+def tracing_event_hooks(tracer: Optional[Tracer] = None) -> dict[str, list[Any]]:
+    """httpx ``event_hooks`` tracing each request as a client span.
+
+    A request that fails before any response (connection refused, timeout)
+    leaves its span unended, so it is never exported.
+
+    Args:
+        tracer: Tracer to use (default: the process-wide tracer at request time)
+
+    Returns:
+        Hooks for ``httpx.AsyncClient(event_hooks=...)``
+    """
+
+    async def on_request(request: httpx.Request) -> None:
+        span = (tracer or get_tracer()).start_span(
+            f"{request.method} {request.url.path}",
+            kind=SPAN_KIND_CLIENT,
+            attributes={
+                "http.request.method": request.method,
+                "server.address": request.url.host,
+                "url.full": str(request.url.copy_with(query=None)),
+            },
+        )
+        request.headers[TRACEPARENT_HEADER] = span.context.traceparent()
+        request.extensions[_SPAN_EXTENSION] = span
+
+    async def on_response(response: httpx.Response) -> None:
+        span: Optional[Span] = response.request.extensions.get(_SPAN_EXTENSION)
+        if span is None:
+            return
+        span.set_attribute("http.response.status_code", response.status_code)
+        if response.status_code >= 500:
+            span.set_error(f"HTTP {response.status_code}")
+        (tracer or get_tracer()).end_span(span)
+
+    return {"request": [on_request], "response": [on_response]}
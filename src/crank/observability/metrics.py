@@ -0,0 +1,306 @@
+"""
+Metrics Registry
+
+Counters, gauges and histograms rendered in the Prometheus text exposition
+format (0.0.4), without the prometheus_client dependency.
+
+Updates are lock-free: every labelled series is a small object whose
+fields are updated with plain arithmetic. Each series is written from one
+thread at a time (the event loop, or the interpreter's GC callbacks for GC
+series), so no lock is taken on the hot path; a scrape may see one
+series mid-update, which only skews that sample. Looking up a series by
+its label values is a dict hit after the first use; callers on a hot path
+keep the series returned by ``labels()``.
+
+Families are created through the registry and are get-or-create, so
+several components (or several app instances in one process) declaring
+the same metric share it.
+"""
+
+import logging
+import math
+from bisect import bisect_left
+from collections.abc import Callable, Sequence
+from typing import Any, Generic, Optional, TypeVar, Union
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Number = Union[int, float]
+
+
+# --- Series ---
+
+
+class CounterSeries:
+    """One labelled counter value."""
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value: Number = 0
+
+    def inc(self, amount: Number = 1) -> None:
+        """Add a non-negative amount."""
+        if amount < 0:
+            raise ValueError(f"Counters only increase, got {amount}")
+        self.value += amount
+
+
+class GaugeSeries:
+    """One labelled gauge value, set directly or read from a function at scrape time."""
+
+    __slots__ = ("_function", "_value")
+
+    def __init__(self) -> None:
+        self._value: Number = 0
+        self._function: Optional[Callable[[], Number]] = None
+
+    def set(self, value: Number) -> None:
+        self._value = value
+
+    def inc(self, amount: Number = 1) -> None:
+        self._value += amount
+
+    def dec(self, amount: Number = 1) -> None:
+        self._value -= amount
+
+    def set_function(self, function: Callable[[], Number]) -> None:
+        """Report ``function()`` at each scrape instead of a stored value."""
+        self._function = function
+
+    @property
+    def value(self) -> Number:
+        return self._function() if self._function is not None else self._value
+
+
+class HistogramSeries:
+    """One labelled histogram: per-bucket counts, sum and count."""
+
+    __slots__ = ("bounds", "buckets", "count", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)  # Last bucket is +Inf; not cumulative
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+S = TypeVar("S", CounterSeries, GaugeSeries, HistogramSeries)
+
+
+# --- Families ---
+
+
+class MetricFamily(Generic[S]):
+    """A named metric and its series, one per combination of label values."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: dict[tuple[str, ...], S] = {}
+
+    def labels(self, *values: object) -> S:
+        """The series for these label values, in ``labelnames`` order."""
+        key = tuple(str(value) for value in values)
+        series = self._series.get(key)
+        if series is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(
+                    f"{self.name} takes labels {self.labelnames}, got {len(key)} values"
+                )
+            series = self._series[key] = self._new_series()
+        return series
+
+    def _new_series(self) -> S:
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        """Exposition lines for this family."""
+        lines = [
+            f"# HELP {self.name} {_escape_help(self.documentation)}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for key, series in list(self._series.items()):
+            lines += self._render_series(_labels(self.labelnames, key), series)
+        return lines
+
+    def _render_series(self, labels: str, series: S) -> list[str]:
+        raise NotImplementedError
+
+
+F = TypeVar("F", bound=MetricFamily[Any])
+
+
+class Counter(MetricFamily[CounterSeries]):
+    """Monotonic count (name it ``*_total``)."""
+
+    kind = "counter"
+
+    def _new_series(self) -> CounterSeries:
+        return CounterSeries()
+
+    def inc(self, amount: Number = 1) -> None:
+        """Increment the unlabelled series."""
+        self.labels().inc(amount)
+
+    def _render_series(self, labels: str, series: CounterSeries) -> list[str]:
+        return [f"{self.name}{_braces(labels)} {_format(series.value)}"]
+
+
+class Gauge(MetricFamily[GaugeSeries]):
+    """Value that goes up and down."""
+
+    kind = "gauge"
+
+    def _new_series(self) -> GaugeSeries:
+        return GaugeSeries()
+
+    def set(self, value: Number) -> None:
+        """Set the unlabelled series."""
+        self.labels().set(value)
+
+    def _render_series(self, labels: str, series: GaugeSeries) -> list[str]:
+        try:
+            value = series.value
+        except Exception as e:
+            logger.warning("Gauge %s{%s} failed to read: %s", self.name, labels, e)
+            return []
+        return [f"{self.name}{_braces(labels)} {_format(value)}"]
+
+
+class Histogram(MetricFamily[HistogramSeries]):
+    """Distribution over fixed buckets (upper bounds, ascending)."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        bounds = tuple(float(bound) for bound in buckets if not math.isinf(bound))
+        if list(bounds) != sorted(set(bounds)):
+            raise ValueError(f"{name} buckets must be strictly increasing, got {buckets}")
+        self.bounds = bounds
+
+    def _new_series(self) -> HistogramSeries:
+        return HistogramSeries(self.bounds)
+
+    def observe(self, value: float) -> None:
+        """Observe a value in the unlabelled series."""
+        self.labels().observe(value)
+
+    def _render_series(self, labels: str, series: HistogramSeries) -> list[str]:
+        sep = "," if labels else ""
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*series.bounds, math.inf), series.buckets):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{{labels}{sep}le="{_format(bound)}"}} {cumulative}')
+        lines.append(f"{self.name}_sum{_braces(labels)} {_format(series.sum)}")
+        lines.append(f"{self.name}_count{_braces(labels)} {cumulative}")
+        return lines
+
+
+# --- Registry ---
+
+
+class MetricsRegistry:
+    """Named metric families rendered together at scrape time."""
+
+    def __init__(self) -> None:
+        self._families: dict[str, MetricFamily[Any]] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._get_or_create(
+            Counter, name, labelnames, lambda: Counter(name, documentation, labelnames)
+        )
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge."""
+        return self._get_or_create(
+            Gauge, name, labelnames, lambda: Gauge(name, documentation, labelnames)
+        )
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Get or create a histogram (the buckets of an existing one are kept)."""
+        return self._get_or_create(
+            Histogram, name, labelnames, lambda: Histogram(name, documentation, labelnames, buckets)
+        )
+
+    def render(self) -> str:
+        """All families in Prometheus text exposition format."""
+        lines: list[str] = []
+        for family in list(self._families.values()):
+            lines += family.render()
+        return "\n".join(lines) + "\n"
+
+    def _get_or_create(
+        self, cls: type[F], name: str, labelnames: Sequence[str], create: Callable[[], F]
+    ) -> F:
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = create()
+        if not isinstance(family, cls) or family.labelnames != tuple(labelnames):
+            raise ValueError(
+                f"Metric {name} already registered as {family.kind} with labels {family.labelnames}"
+            )
+        return family
+
+
+REGISTRY = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """The process-wide registry served on ``/metrics``."""
+    return REGISTRY
+
+
+# --- Internal Helpers ---
+
+
+def _format(value: Number) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        if value.is_integer() and abs(value) < 1e15:
+            return f"{value:.1f}"
+        return repr(value)
+    return str(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+def _braces(labels: str) -> str:
+    return f"{{{labels}}}" if labels else ""
@@ -0,0 +1,287 @@
+"""
+On-Demand Profiling
+
+Low-overhead profilers for a running service, without redeploying it or
+loading a profiling dependency:
+- ``StackSampler``: statistical CPU profiler. A daemon thread samples the
+  Python stacks of every other thread with ``sys._current_frames()`` at a
+  fixed interval; the profiled code is never instrumented, so the cost is
+  one stack walk per thread per interval. Threads parked in a selector,
+  lock or queue wait are idle and not counted unless asked for
+- ``AllocationTracer``: ``tracemalloc`` snapshots at the start and end of
+  a window, diffed by allocation traceback, giving the stacks that grew
+  the heap during the window. Tracing slows allocations while it runs and
+  is stopped afterwards unless it was already on
+
+Both produce weighted stacks, rendered as collapsed stacks (one
+``frame;frame;frame weight`` line per stack, the input of flamegraph.pl
+and most flame graph tools) or as a speedscope file
+(https://www.speedscope.app).
+"""
+
+import linecache
+import logging
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from types import FrameType
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_INTERVAL = 0.01  # Seconds between stack samples (100 Hz)
+DEFAULT_STACK_DEPTH = 64  # Innermost frames kept per sampled stack
+DEFAULT_TRACE_FRAMES = 16  # Frames kept per allocation traceback
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+# Innermost frames of a thread waiting for work: (file name, function)
+_IDLE_FRAMES = frozenset(
+    {
+        ("selectors.py", "select"),
+        ("threading.py", "wait"),
+        ("threading.py", "_wait_for_tstate_lock"),
+        ("queue.py", "get"),
+        ("thread.py", "_worker"),  # concurrent.futures pool thread between jobs
+    }
+)
+
+Frame = tuple[str, str, int]  # (name, file, line): function and first line, or source line
+Stack = tuple[Frame, ...]  # Outermost frame first
+
+
+def _source(filename: str, lineno: int) -> str:
+    """Source text of an allocating line (tracemalloc frames carry no function name)."""
+    return linecache.getline(filename, lineno).strip()[:80] or "<unknown>"
+
+
+def _frame_label(frame: Frame) -> str:
+    function, filename, line = frame
+    if not filename:  # Thread root
+        return function
+    return f"{function} ({Path(filename).name}:{line})"
+
+
+def render_collapsed(stacks: Iterable[tuple[Stack, int]]) -> str:
+    """Collapsed stacks: ``outer;...;inner weight`` per line, heaviest first."""
+    lines = [
+        ";".join(_frame_label(frame).replace(";", ":") for frame in stack) + f" {weight}"
+        for stack, weight in sorted(stacks, key=lambda item: item[1], reverse=True)
+        if stack and weight > 0
+    ]
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def render_speedscope(
+    profiles: Mapping[str, Iterable[tuple[Stack, int]]],
+    unit: str,
+    name: str,
+    weight_scale: float = 1.0,
+) -> dict[str, Any]:
+    """A speedscope file with one sampled profile per entry of ``profiles``.
+
+    Args:
+        profiles: Weighted stacks by profile name (e.g. thread name)
+        unit: Unit of the scaled weights (``seconds``, ``bytes``, ``none``)
+        name: Name of the file, shown by speedscope
+        weight_scale: Factor from stack weights to ``unit``
+    """
+    frames: list[dict[str, Any]] = []
+    index: dict[Frame, int] = {}
+    encoded = []
+    for profile_name, stacks in profiles.items():
+        samples, weights = [], []
+        for stack, weight in stacks:
+            if weight <= 0:
+                continue
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    function, filename, line = frame
+                    frames.append({"name": function, "file": filename, "line": line})
+            samples.append([index[frame] for frame in stack])
+            weights.append(weight * weight_scale)
+        encoded.append(
+            {
+                "type": "sampled",
+                "name": profile_name,
+                "unit": unit,
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }
+        )
+    return {
+        "$schema": SPEEDSCOPE_SCHEMA,
+        "name": name,
+        "exporter": "crank",
+        "activeProfileIndex": 0,
+        "shared": {"frames": frames},
+        "profiles": encoded,
+    }
+
+
+# --- CPU ---
+
+
+class StackSampler:
+    """Statistical profiler sampling the stacks of all other threads.
+
+    Args:
+        interval: Seconds between samples
+        include_idle: Also count threads waiting for work
+        max_depth: Innermost frames kept per stack
+    """
+
+    def __init__(
+        self,
+        interval: float = DEFAULT_SAMPLE_INTERVAL,
+        include_idle: bool = False,
+        max_depth: int = DEFAULT_STACK_DEPTH,
+    ) -> None:
+        if interval <= 0:
+            raise ValueError(f"interval must be positive, got {interval}")
+        self.interval = interval
+        self.include_idle = include_idle
+        self.max_depth = max_depth
+        self.samples = 0  # Sampling passes taken
+        self.duration = 0.0
+        self._stacks: dict[str, Counter[Stack]] = {}
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+
+    def start(self) -> None:
+        """Start sampling on a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="crank-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling (the thread exits within one interval)."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+        self.duration = time.monotonic() - self._started
+
+    def stacks(self) -> dict[str, list[tuple[Stack, int]]]:
+        """Sample counts by stack, per thread name (read after ``stop()``)."""
+        return {thread: list(counts.items()) for thread, counts in self._stacks.items()}
+
+    def collapsed(self) -> str:
+        """Collapsed stacks rooted at their thread name; weights are sample counts."""
+        return render_collapsed(
+            (((thread, "", 0), *stack), count)
+            for thread, stacks in self.stacks().items()
+            for stack, count in stacks
+        )
+
+    def speedscope(self, name: str = "cpu") -> dict[str, Any]:
+        """Speedscope file with one profile per thread, weighted in seconds."""
+        return render_speedscope(self.stacks(), "seconds", name, self.interval)
+
+    # --- Sampling Thread ---
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stopping.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = self._stack(frame)
+                if not stack:
+                    continue
+                thread = names.get(ident, f"thread-{ident}")
+                self._stacks.setdefault(thread, Counter())[stack] += 1
+            self.samples += 1
+
+    def _stack(self, frame: Optional[FrameType]) -> Stack:
+        frames: list[Frame] = []
+        while frame is not None and len(frames) < self.max_depth:
+            code = frame.f_code
+            frames.append(
+                (getattr(code, "co_qualname", code.co_name), code.co_filename, code.co_firstlineno)
+            )
+            frame = frame.f_back
+        if frames and not self.include_idle:
+            function, filename, _ = frames[0]
+            if (Path(filename).name, function.rpartition(".")[2]) in _IDLE_FRAMES:
+                return ()
+        return tuple(reversed(frames))
+
+
+# --- Memory ---
+
+
+class AllocationTracer:
+    """Heap growth over a window, by allocation traceback (``tracemalloc``).
+
+    Args:
+        frames: Frames recorded per allocation, if tracing is not already on
+    """
+
+    def __init__(self, frames: int = DEFAULT_TRACE_FRAMES) -> None:
+        self.frames = frames
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._owns_tracing = False
+        self.growth: list[tuple[Stack, int]] = []  # Bytes allocated and still live, by stack
+        self.allocated = 0
+        self.freed = 0
+
+    def start(self) -> None:
+        """Start tracing (if off) and take the baseline snapshot."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._owns_tracing = True
+        self._baseline = self._snapshot()
+
+    def stop(self) -> None:
+        """Take the closing snapshot, diff it and stop tracing if this tracer started it."""
+        if self._baseline is None:
+            return
+        try:
+            diffs = self._snapshot().compare_to(self._baseline, "traceback")
+        finally:
+            self._baseline = None
+            if self._owns_tracing:
+                tracemalloc.stop()
+                self._owns_tracing = False
+        self.growth = []
+        self.allocated = self.freed = 0
+        for diff in diffs:
+            if diff.size_diff > 0:
+                self.allocated += diff.size_diff
+                stack = tuple(
+                    (_source(frame.filename, frame.lineno), frame.filename, frame.lineno)
+                    for frame in diff.traceback
+                )
+                self.growth.append((stack, diff.size_diff))
+            else:
+                self.freed -= diff.size_diff
+
+    def collapsed(self) -> str:
+        """Collapsed allocation stacks; weights are bytes of heap growth."""
+        return render_collapsed(self.growth)
+
+    def speedscope(self, name: str = "memory") -> dict[str, Any]:
+        """Speedscope file of heap growth in bytes."""
+        return render_speedscope({"heap growth": self.growth}, "bytes", name)
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            )
+        )
@@ -0,0 +1,388 @@
+"""
+Distributed Tracing
+
+Spans in the OpenTelemetry data model (ADR-0024), propagated between
+processes with the W3C ``traceparent`` header and exported as OTLP/JSON
+(see ``crank.observability.export``), without the OpenTelemetry SDK.
+
+Sampling is tail-based and in-process: spans are buffered per trace until
+the trace's local root span (the one that entered this process) ends, and
+only then is the trace kept or dropped:
+- any span failed
+- the local root took at least ``slow_ms``
+- the trace was sampled upstream (``traceparent`` flag ``01``)
+- a ``baseline_ratio`` fraction of traces, chosen from the trace ID so
+  every hop of a trace makes the same choice
+
+Until an exporter is configured, spans are created and propagated but
+never buffered, so tracing costs a few object allocations per request.
+"""
+
+import logging
+import os
+import random
+import time
+from collections import OrderedDict
+from collections.abc import Iterator, Mapping, MutableMapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from crank.observability.export import BatchSpanExporter
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+TRACEPARENT_VERSION = "00"
+SAMPLED_FLAG = 0x01
+
+# Span kinds and status codes as numbered by OTLP
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+DEFAULT_SLOW_MS = 500.0  # Local roots at least this slow are always kept
+DEFAULT_BASELINE_RATIO = 0.01  # Fraction of unremarkable traces kept
+DEFAULT_MAX_TRACES = 4096  # Traces buffered awaiting a decision
+DEFAULT_MAX_SPANS_PER_TRACE = 256
+DEFAULT_TRACE_TIMEOUT = 60.0  # Seconds before an undecided trace is dropped
+
+_ids = random.Random()  # Span and trace IDs need uniqueness, not secrecy
+_TRACE_ID_SPACE = 1 << 64  # Baseline sampling looks at the low 64 bits
+
+
+# --- Context Propagation ---
+
+
+@dataclass(frozen=True, slots=True)
+class SpanContext:
+    """Identity of a span as carried in ``traceparent``."""
+
+    trace_id: str  # 32 lowercase hex digits
+    span_id: str  # 16 lowercase hex digits
+    flags: int = 0
+
+    @property
+    def sampled(self) -> bool:
+        """Whether an upstream hop chose to keep this trace."""
+        return bool(self.flags & SAMPLED_FLAG)
+
+    def traceparent(self) -> str:
+        """The W3C ``traceparent`` header value."""
+        return f"{TRACEPARENT_VERSION}-{self.trace_id}-{self.span_id}-{self.flags:02x}"
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[SpanContext]:
+    """Parse a ``traceparent`` header; None if absent or malformed."""
+    if not value:
+        return None
+    parts = value.strip().lower().split("-")
+    if len(parts) < 4 or parts[0] == "ff":
+        return None
+    version, trace_id, span_id, flags = parts[:4]
+    if len(version) != 2 or len(trace_id) != 32 or len(span_id) != 16 or len(flags) != 2:
+        return None
+    if version == TRACEPARENT_VERSION and len(parts) != 4:
+        return None
+    try:
+        trace_bits, span_bits, flag_bits = int(trace_id, 16), int(span_id, 16), int(flags, 16)
+        int(version, 16)
+    except ValueError:
+        return None
+    if trace_bits == 0 or span_bits == 0:
+        return None
+    return SpanContext(trace_id, span_id, flag_bits)
+
+
+def extract(headers: Mapping[str, Any]) -> Optional[SpanContext]:
+    """Remote parent from request headers or transport metadata."""
+    value = headers.get(TRACEPARENT_HEADER) or headers.get(TRACEPARENT_HEADER.title())
+    return parse_traceparent(value)
+
+
+def inject(headers: MutableMapping[str, Any], span: Optional["Span"] = None) -> None:
+    """Set ``traceparent`` for an outgoing call from ``span`` (default: the current span)."""
+    span = span or current_span()
+    if span is not None:
+        headers[TRACEPARENT_HEADER] = span.context.traceparent()
+
+
+# --- Spans ---
+
+
+@dataclass(slots=True)
+class Span:
+    """One timed operation within a trace."""
+
+    name: str
+    context: SpanContext
+    parent_span_id: Optional[str]
+    kind: int
+    start_ns: int
+    local_root: bool  # Entered this process (no in-process parent)
+    attributes: dict[str, Any] = field(default_factory=dict)
+    end_ns: Optional[int] = None
+    status: int = STATUS_UNSET
+    status_message: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach a string, number or boolean attribute."""
+        self.attributes[key] = value
+
+    def set_error(self, message: Optional[str] = None) -> None:
+        """Mark the span failed; failed traces are always kept."""
+        self.status = STATUS_ERROR
+        self.status_message = message
+
+    def record_exception(self, exc: BaseException) -> None:
+        """Mark the span failed with an exception's type and message."""
+        self.attributes["exception.type"] = type(exc).__name__
+        self.attributes["exception.message"] = str(exc)
+        self.set_error(f"{type(exc).__name__}: {exc}")
+
+    @property
+    def duration_ms(self) -> float:
+        """Elapsed time in milliseconds (so far, if still open)."""
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("crank_current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    """The span active in this task, if any."""
+    return _current.get()
+
+
+# --- Tail Sampling ---
+
+
+class TailSampler:
+    """Buffers spans per trace and decides once the local root ends.
+
+    Args:
+        slow_ms: Keep traces whose local root took at least this long
+        baseline_ratio: Fraction of other traces kept
+        max_traces: Undecided traces buffered; the oldest are dropped beyond it
+        max_spans_per_trace: Spans buffered per trace; later spans are dropped
+        trace_timeout: Seconds after which an undecided trace is dropped
+    """
+
+    def __init__(
+        self,
+        *,
+        slow_ms: float = DEFAULT_SLOW_MS,
+        baseline_ratio: float = DEFAULT_BASELINE_RATIO,
+        max_traces: int = DEFAULT_MAX_TRACES,
+        max_spans_per_trace: int = DEFAULT_MAX_SPANS_PER_TRACE,
+        trace_timeout: float = DEFAULT_TRACE_TIMEOUT,
+    ) -> None:
+        if not 0 <= baseline_ratio <= 1:
+            raise ValueError(f"baseline_ratio must be between 0 and 1, got {baseline_ratio}")
+        self.slow_ms = slow_ms
+        self.baseline_ratio = baseline_ratio
+        self.max_traces = max_traces
+        self.max_spans_per_trace = max_spans_per_trace
+        self.trace_timeout = trace_timeout
+        self._pending: OrderedDict[str, tuple[float, list[Span]]] = OrderedDict()
+        self._decided: OrderedDict[str, bool] = OrderedDict()  # Late spans follow the decision
+        self.counts = {"kept": 0, "dropped": 0, "evicted": 0}
+
+    def baseline(self, trace_id: str) -> bool:
+        """Deterministic head decision shared by every hop of a trace."""
+        return int(trace_id[16:], 16) < self.baseline_ratio * _TRACE_ID_SPACE
+
+    def on_end(self, span: Span) -> list[Span]:
+        """Buffer an ended span.
+
+        Returns:
+            The spans to export now: the whole buffered trace when its local
+            root ends and the trace is kept, otherwise nothing
+        """
+        trace_id = span.context.trace_id
+        decided = self._decided.get(trace_id)
+        if decided is not None:
+            return [span] if decided else []
+
+        entry = self._pending.get(trace_id)
+        if entry is None:
+            self._evict(time.monotonic())
+            entry = self._pending[trace_id] = (time.monotonic(), [])
+        spans = entry[1]
+        if len(spans) < self.max_spans_per_trace:
+            spans.append(span)
+        if not span.local_root:
+            return []
+
+        del self._pending[trace_id]
+        keep = self._keep(span, spans)
+        self._decided[trace_id] = keep
+        if len(self._decided) > self.max_traces:
+            self._decided.popitem(last=False)
+        self.counts["kept" if keep else "dropped"] += 1
+        return spans if keep else []
+
+    def _keep(self, root: Span, spans: list[Span]) -> bool:
+        return (
+            root.context.sampled
+            or root.duration_ms >= self.slow_ms
+            or any(span.status == STATUS_ERROR for span in spans)
+            or self.baseline(root.context.trace_id)
+        )
+
+    def _evict(self, now: float) -> None:
+        while self._pending:
+            trace_id, (started, _) = next(iter(self._pending.items()))
+            if len(self._pending) < self.max_traces and now - started < self.trace_timeout:
+                return
+            del self._pending[trace_id]
+            self.counts["evicted"] += 1
+
+
+# --- Tracer ---
+
+
+class Tracer:
+    """Creates spans for one service and hands finished traces to an exporter.
+
+    Args:
+        service_name: ``service.name`` of exported spans
+        exporter: Destination of kept spans (default: none, spans are not recorded)
+        sampler: Tail-sampling policy
+    """
+
+    def __init__(
+        self,
+        service_name: str,
+        exporter: Optional["BatchSpanExporter"] = None,
+        sampler: Optional[TailSampler] = None,
+    ) -> None:
+        self.service_name = service_name
+        self.exporter = exporter
+        self.sampler = sampler or TailSampler()
+
+    @property
+    def recording(self) -> bool:
+        """Whether ended spans are sampled and exported."""
+        return self.exporter is not None
+
+    def start_span(
+        self,
+        name: str,
+        *,
+        kind: int = SPAN_KIND_INTERNAL,
+        parent: Optional[SpanContext] = None,
+        attributes: Optional[dict[str, Any]] = None,
+    ) -> Span:
+        """Start a span (not made current; see ``span()``).
+
+        Args:
+            name: Operation name
+            kind: SPAN_KIND_* constant
+            parent: Remote parent (default: the current span, else a new trace)
+            attributes: Initial attributes
+        """
+        local_parent = None if parent is not None else current_span()
+        if local_parent is not None:
+            parent = local_parent.context
+        if parent is None:
+            trace_id = f"{_ids.getrandbits(128) or 1:032x}"
+            flags = SAMPLED_FLAG if self.sampler.baseline(trace_id) else 0
+        else:
+            trace_id, flags = parent.trace_id, parent.flags
+        context = SpanContext(trace_id, f"{_ids.getrandbits(64) or 1:016x}", flags)
+        return Span(
+            name=name,
+            context=context,
+            parent_span_id=parent.span_id if parent is not None else None,
+            kind=kind,
+            start_ns=time.time_ns(),
+            local_root=local_parent is None,
+            attributes=dict(attributes or {}),
+        )
+
+    def end_span(self, span: Span) -> None:
+        """End a span and pass it to the sampler."""
+        if span.end_ns is not None:
+            return
+        span.end_ns = time.time_ns()
+        if self.exporter is None:
+            return
+        kept = self.sampler.on_end(span)
+        if kept:
+            self.exporter.submit(kept)
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        *,
+        kind: int = SPAN_KIND_INTERNAL,
+        parent: Optional[SpanContext] = None,
+        attributes: Optional[dict[str, Any]] = None,
+    ) -> Iterator[Span]:
+        """Run a block as the current span; exceptions mark it failed."""
+        span = self.start_span(name, kind=kind, parent=parent, attributes=attributes)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.record_exception(exc)
+            raise
+        finally:
+            _current.reset(token)
+            self.end_span(span)
+
+    async def close(self) -> None:
+        """Flush and stop the exporter."""
+        if self.exporter is not None:
+            await self.exporter.close()
+
+
+_tracer = Tracer("crank")
+
+
+def get_tracer() -> Tracer:
+    """The process-wide tracer (non-recording until ``configure_tracing``)."""
+    return _tracer
+
+
+def set_tracer(tracer: Tracer) -> None:
+    """Replace the process-wide tracer."""
+    global _tracer
+    _tracer = tracer
+
+
+def configure_tracing(service_name: str, environ: Optional[Mapping[str, str]] = None) -> Tracer:
+    """Build the process-wide tracer from the environment.
+
+    Environment:
+        CRANK_TRACE_EXPORT: ``file:<path>`` (OTLP/JSON lines) or an OTLP/HTTP
+            URL such as ``http://localhost:4318/v1/traces``; unset disables
+            recording (context is still propagated)
+        CRANK_TRACE_SLOW_MS: Local roots at least this slow are kept (default 500)
+        CRANK_TRACE_SAMPLE_RATIO: Fraction of other traces kept (default 0.01)
+
+    Returns:
+        The configured tracer, also installed as the process-wide tracer
+    """
+    from crank.observability.export import BatchSpanExporter, sink_from_target
+
+    env = os.environ if environ is None else environ
+    sampler = TailSampler(
+        slow_ms=float(env.get("CRANK_TRACE_SLOW_MS", DEFAULT_SLOW_MS)),
+        baseline_ratio=float(env.get("CRANK_TRACE_SAMPLE_RATIO", DEFAULT_BASELINE_RATIO)),
+    )
+    target = env.get("CRANK_TRACE_EXPORT", "")
+    exporter = BatchSpanExporter(sink_from_target(target), service_name) if target else None
+    tracer = Tracer(service_name, exporter, sampler)
+    set_tracer(tracer)
+    if exporter is not None:
+        logger.info("Tracing %s to %s", service_name, target)
+    return tracer
@@ -0,0 +1,154 @@
+"""
+Crank Protocols Package
+
+Wire-protocol engines that front mesh services for non-HTTP clients. Provides:
+- XDR (RFC 4506) streaming codec over memoryview, with a self-describing
+  value union for dynamic payloads
+- ONC-RPC (RFC 5531) over TCP: record-marking reassembly, call/reply
+  encoding, AUTH_SYS credentials, and a pipelined asyncio server
+- Canonical payload codecs (JSON, plus MessagePack and CBOR with the
+  optional ``codecs`` extra) negotiated via ``Content-Type``/``Accept``,
+  with per-codec encodings memoized for reuse by receipt hashing
+- ``Invocation``/``InvocationResult``: transport-neutral capability calls
+  shared by the gateways
+- ``DataLoader``: coalesces per-item loads made in one event-loop tick into
+  one batch call
+- JSON-RPC 2.0 dispatch with batches whose independent requests (MCP
+  ``tools/call``) run concurrently
+- ``ToolCatalog``: agent tool definitions built once, served as cached JSON
+  with an ``ETag``
+- Streaming MCP transports over stdio and HTTP+SSE: ``ToolStream`` progress
+  and result-chunk notifications, bounded send buffers, and cancellation
+  of requests whose client cancelled or went away
+- gRPC mesh gateway (``crank.protocols.grpc_gateway``, with its protobuf
+  contract in ``crank.protocols.mesh_contract``); not imported here because
+  it needs the optional ``grpc`` extra
+- GraphQL mesh gateway (``crank.protocols.graphql_gateway``) with a schema
+  generated from the capability catalog, persisted queries and batched
+  resolvers; needs the optional ``graphql`` extra
+
+Usage:
+    from crank.protocols import RPCCall, XDREncoder, start_onc_rpc_server
+
+    async def handler(call: RPCCall) -> bytes:
+        encoder = XDREncoder()
+        encoder.pack_value({"procedure": call.procedure})
+        return encoder.getvalue()
+
+    server = await start_onc_rpc_server(handler, port=1111)
+"""
+
+from crank.protocols.codecs import (
+    CANONICAL_CODEC,
+    CODECS,
+    Codec,
+    CodecError,
+    EncodedPayload,
+    canonical_digest,
+    codec_for_content_type,
+    encode_envelope,
+    negotiate,
+)
+from crank.protocols.dataloader import DataLoader
+from crank.protocols.invocation import (
+    BatchInvokeHandler,
+    Invocation,
+    InvocationResult,
+    InvokeHandler,
+)
+from crank.protocols.jsonrpc import (
+    INTERNAL_ERROR,
+    INVALID_PARAMS,
+    INVALID_REQUEST,
+    METHOD_NOT_FOUND,
+    PARSE_ERROR,
+    dispatch_jsonrpc,
+    jsonrpc_error,
+)
+from crank.protocols.mcp_stream import (
+    Outbox,
+    StreamingSession,
+    ToolStream,
+    open_stdio,
+    serve_stdio,
+    sse_response,
+)
+from crank.protocols.oncrpc import (
+    AcceptStatus,
+    AuthFlavor,
+    AuthStatus,
+    AuthSys,
+    OpaqueAuth,
+    RecordReassembler,
+    RejectStatus,
+    ReplyStatus,
+    RPCCall,
+    RPCDecodeError,
+    RPCReplyError,
+    decode_call,
+    decode_reply,
+    encode_accepted_reply,
+    encode_auth_sys,
+    encode_call,
+    encode_rejected_reply,
+    frame_record,
+    handle_call_record,
+    start_onc_rpc_server,
+)
+from crank.protocols.tool_catalog import ToolCatalog
+from crank.protocols.xdr import ValueType, XDRDecoder, XDREncoder, XDRError
+
+__all__: list[str] = [
+    "CANONICAL_CODEC",
+    "CODECS",
+    "INTERNAL_ERROR",
+    "INVALID_PARAMS",
+    "INVALID_REQUEST",
+    "METHOD_NOT_FOUND",
+    "PARSE_ERROR",
+    "AcceptStatus",
+    "AuthFlavor",
+    "AuthStatus",
+    "AuthSys",
+    "BatchInvokeHandler",
+    "Codec",
+    "CodecError",
+    "DataLoader",
+    "EncodedPayload",
+    "Invocation",
+    "InvocationResult",
+    "InvokeHandler",
+    "OpaqueAuth",
+    "Outbox",
+    "RPCCall",
+    "RPCDecodeError",
+    "RPCReplyError",
+    "RecordReassembler",
+    "RejectStatus",
+    "ReplyStatus",
+    "StreamingSession",
+    "ToolCatalog",
+    "ToolStream",
+    "ValueType",
+    "XDRDecoder",
+    "XDREncoder",
+    "XDRError",
+    "canonical_digest",
+    "codec_for_content_type",
+    "decode_call",
+    "decode_reply",
+    "dispatch_jsonrpc",
+    "encode_accepted_reply",
+    "encode_auth_sys",
+    "encode_call",
+    "encode_envelope",
+    "encode_rejected_reply",
+    "frame_record",
+    "handle_call_record",
+    "jsonrpc_error",
+    "negotiate",
+    "open_stdio",
+    "serve_stdio",
+    "sse_response",
+    "start_onc_rpc_server",
+]
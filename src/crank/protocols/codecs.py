@@ -0,0 +1,370 @@
+"""
+Payload Codecs
+
+Pluggable wire encodings for mesh requests and responses, negotiated over
+HTTP ``Content-Type``/``Accept``:
+- JSON (``application/json``), always available
+- MessagePack (``application/msgpack``), with ``msgpack`` installed
+- CBOR (``application/cbor``), with ``cbor2`` installed
+
+An ``EncodedPayload`` memoizes a value's encodings per codec: the canonical
+JSON bytes feed the receipt hash, and the bytes for the negotiated codec are
+spliced into the response envelope by ``encode_envelope``, so a large result
+is encoded once per codec rather than once for hashing and again for the
+wire. JSON clients, the common case, get the hashed bytes themselves.
+
+Canonical JSON is ``json.dumps(value, sort_keys=True)``, the form receipts
+have always been hashed with, so digests do not depend on which codec a
+client negotiated and match receipts issued before codecs existed. Since
+only JSON bytes are hashed, MessagePack and CBOR keep map keys in insertion
+order instead of paying for a canonical sort.
+"""
+
+import hashlib
+import json
+import logging
+import struct
+from abc import ABC, abstractmethod
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+from fastapi.responses import Response
+from starlette.requests import Request
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:  # msgpack is part of the optional "codecs" extra
+    MSGPACK_AVAILABLE = False
+
+try:
+    import cbor2
+
+    CBOR_AVAILABLE = True
+except ImportError:  # cbor2 is part of the optional "codecs" extra
+    CBOR_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BODY_BYTES = 64 * 1024 * 1024  # Base64 images and documents
+_HASH_CHUNK_BYTES = 64 * 1024  # Larger updates let hashlib release the GIL
+
+
+class CodecError(ValueError):
+    """Payload cannot be decoded or no acceptable codec exists.
+
+    ``status_code`` is the HTTP status the endpoint should return (400 for
+    undecodable bodies, 406 when ``Accept`` matches no codec, 413 for
+    oversized bodies, 415 for unsupported content types).
+    """
+
+    def __init__(self, message: str, status_code: int = 400) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class Codec(ABC):
+    """Encoder/decoder for one media type."""
+
+    name: str
+    media_type: str
+
+    @abstractmethod
+    def encode(self, value: Any) -> bytes:
+        """Encode ``value``; objects with no native encoding are sent as ``str()``."""
+
+    @abstractmethod
+    def decode(self, data: bytes) -> Any:
+        """Decode a payload; raises ``CodecError`` when malformed."""
+
+    @abstractmethod
+    def encode_map(self, entries: Mapping[str, bytes]) -> bytes:
+        """
+        Encode a string-keyed map whose values are already encoded.
+
+        Equal to ``encode({key: decode(value), ...})`` for the same key
+        order, without re-encoding the values.
+        """
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.media_type!r})"
+
+
+class JSONCodec(Codec):
+    """JSON with sorted keys (``json.dumps(sort_keys=True)`` output)."""
+
+    name = "json"
+    media_type = "application/json"
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+
+    def decode(self, data: bytes) -> Any:
+        try:
+            return json.loads(data)
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise CodecError(f"Invalid JSON: {e}") from e
+
+    def encode_map(self, entries: Mapping[str, bytes]) -> bytes:
+        return b"{%s}" % b", ".join(
+            json.dumps(key).encode("utf-8") + b": " + entries[key] for key in sorted(entries)
+        )
+
+
+class MsgPackCodec(Codec):
+    """MessagePack (str as raw, bytes as bin)."""
+
+    name = "msgpack"
+    media_type = "application/msgpack"
+
+    def encode(self, value: Any) -> bytes:
+        data: bytes = msgpack.packb(value, use_bin_type=True, default=str)
+        return data
+
+    def decode(self, data: bytes) -> Any:
+        try:
+            return msgpack.unpackb(data, raw=False)
+        except (ValueError, msgpack.UnpackException) as e:
+            raise CodecError(f"Invalid MessagePack: {e}") from e
+
+    def encode_map(self, entries: Mapping[str, bytes]) -> bytes:
+        header: bytes = msgpack.Packer().pack_map_header(len(entries))
+        return header + b"".join(self.encode(key) + value for key, value in entries.items())
+
+
+class CBORCodec(Codec):
+    """CBOR (RFC 8949)."""
+
+    name = "cbor"
+    media_type = "application/cbor"
+
+    def encode(self, value: Any) -> bytes:
+        data: bytes = cbor2.dumps(value, default=_cbor_default)
+        return data
+
+    def decode(self, data: bytes) -> Any:
+        try:
+            return cbor2.loads(data)
+        except (ValueError, cbor2.CBORDecodeError) as e:
+            raise CodecError(f"Invalid CBOR: {e}") from e
+
+    def encode_map(self, entries: Mapping[str, bytes]) -> bytes:
+        return _cbor_head(5, len(entries)) + b"".join(
+            self.encode(key) + value for key, value in entries.items()
+        )
+
+
+JSON_CODEC = JSONCodec()
+CANONICAL_CODEC: Codec = JSON_CODEC  # Receipt hashes are computed over this encoding
+
+CODECS: dict[str, Codec] = {JSON_CODEC.media_type: JSON_CODEC}
+if MSGPACK_AVAILABLE:
+    CODECS[MsgPackCodec.media_type] = MsgPackCodec()
+    CODECS["application/x-msgpack"] = CODECS[MsgPackCodec.media_type]
+if CBOR_AVAILABLE:
+    CODECS[CBORCodec.media_type] = CBORCodec()
+
+
+def _cbor_default(encoder: Any, value: Any) -> None:
+    encoder.encode(str(value))
+
+
+def _cbor_head(major_type: int, length: int) -> bytes:
+    prefix = major_type << 5
+    if length < 24:
+        return bytes((prefix | length,))
+    for info, fmt in ((24, ">B"), (25, ">H"), (26, ">I"), (27, ">Q")):
+        if length < 1 << (8 * struct.calcsize(fmt)):
+            return bytes((prefix | info,)) + struct.pack(fmt, length)
+    raise ValueError(f"CBOR length {length} out of range")
+
+
+# --- Encoded payloads ---
+
+
+class EncodedPayload:
+    """
+    A value with its encodings memoized per codec.
+
+    ``digest`` is the SHA-256 of the canonical (JSON) encoding; when the
+    negotiated codec is also JSON, the hash and the wire share one encoding.
+    """
+
+    __slots__ = ("_digest", "_encodings", "value")
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+        self._encodings: dict[str, bytes] = {}
+        self._digest: str | None = None
+
+    def encoded(self, codec: Codec) -> bytes:
+        """The value encoded with ``codec`` (encoded on first use)."""
+        data = self._encodings.get(codec.name)
+        if data is None:
+            data = self._encodings[codec.name] = codec.encode(self.value)
+        return data
+
+    @property
+    def digest(self) -> str:
+        """Hex SHA-256 of the canonical encoding."""
+        if self._digest is None:
+            self._digest = hashlib.sha256(self.encoded(CANONICAL_CODEC)).hexdigest()
+        return self._digest
+
+    def stream_digest(self) -> str:
+        """
+        ``digest`` without materializing the canonical encoding.
+
+        Reuses the memoized encoding when there is one; otherwise hashes
+        ``iter_canonical`` pieces, so peak memory is bounded by the largest
+        nested value rather than the whole payload.
+        """
+        if self._digest is None:
+            data = self._encodings.get(CANONICAL_CODEC.name)
+            if data is not None:
+                self._digest = hashlib.sha256(data).hexdigest()
+            else:
+                hasher = hashlib.sha256()
+                buffer = bytearray()
+                for piece in iter_canonical(self.value):
+                    buffer += piece
+                    if len(buffer) >= _HASH_CHUNK_BYTES:
+                        hasher.update(buffer)
+                        buffer.clear()
+                hasher.update(buffer)
+                self._digest = hasher.hexdigest()
+        return self._digest
+
+
+def iter_canonical(value: Any, depth: int = 2) -> Iterator[bytes]:
+    """
+    The canonical JSON encoding of ``value`` in pieces.
+
+    Containers in the top ``depth`` levels are split into their items; each
+    item is encoded in one C-accelerated ``json.dumps`` call. Joined, the
+    pieces equal ``CANONICAL_CODEC.encode(value)``.
+    """
+    if depth > 0 and isinstance(value, dict) and value and all(isinstance(k, str) for k in value):
+        separator = b"{"
+        for key in sorted(value):
+            yield separator + json.dumps(key).encode("utf-8") + b": "
+            yield from iter_canonical(value[key], depth - 1)
+            separator = b", "
+        yield b"}"
+    elif depth > 0 and isinstance(value, list | tuple) and value:
+        separator = b"["
+        for item in value:
+            yield separator
+            yield from iter_canonical(item, depth - 1)
+            separator = b", "
+        yield b"]"
+    else:
+        yield JSON_CODEC.encode(value)
+
+
+def canonical_digest(value: Any) -> str:
+    """Hex SHA-256 of ``value``'s canonical encoding."""
+    return EncodedPayload(value).digest
+
+
+def encode_envelope(
+    codec: Codec, fields: Mapping[str, Any], payloads: Mapping[str, EncodedPayload]
+) -> bytes:
+    """
+    Encode a map of small ``fields`` plus pre-encoded ``payloads``.
+
+    The payloads' memoized encodings are reused, so a result hashed for a
+    receipt is not encoded a second time for the response body.
+    """
+    entries = {key: codec.encode(value) for key, value in fields.items()}
+    entries.update((key, payload.encoded(codec)) for key, payload in payloads.items())
+    return codec.encode_map(entries)
+
+
+# --- Negotiation ---
+
+
+def codec_for_content_type(content_type: str | None) -> Codec:
+    """Codec for a request ``Content-Type``; JSON when absent."""
+    media_type = _media_type(content_type or "") or JSON_CODEC.media_type
+    codec = CODECS.get(media_type)
+    if codec is None:
+        supported = ", ".join(sorted(CODECS))
+        raise CodecError(f"Unsupported content type {media_type!r} ({supported})", 415)
+    return codec
+
+
+def negotiate(accept: str | None, default: Codec = JSON_CODEC) -> Codec:
+    """
+    Pick the response codec for an ``Accept`` header.
+
+    Media ranges are ranked by q-value (then header order); ``*/*`` or a
+    missing header selects ``default``. Raises ``CodecError`` (406) when
+    nothing acceptable is available.
+    """
+    if not accept or not accept.strip():
+        return default
+
+    ranked: list[tuple[float, int, str]] = []
+    for index, item in enumerate(accept.split(",")):
+        media_range, *params = (part.strip() for part in item.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_range and quality > 0:
+            ranked.append((-quality, index, media_range.lower()))
+
+    for _, _, media_range in sorted(ranked):
+        if media_range in ("*/*", "application/*"):
+            return default
+        codec = CODECS.get(media_range)
+        if codec is not None:
+            return codec
+    raise CodecError(f"None of {accept!r} is available ({', '.join(sorted(CODECS))})", 406)
+
+
+def _media_type(content_type: str) -> str:
+    return content_type.split(";", 1)[0].strip().lower()
+
+
+# --- HTTP helpers ---
+
+
+async def read_payload(
+    request: Request, max_bytes: int = DEFAULT_MAX_BODY_BYTES
+) -> tuple[Any, Codec]:
+    """
+    Read and decode a request body by its ``Content-Type``.
+
+    Returns:
+        The decoded value and the codec it arrived in (the natural default
+        for the response)
+    """
+    codec = codec_for_content_type(request.headers.get("content-type"))
+    buffer = bytearray()
+    async for chunk in request.stream():
+        buffer.extend(chunk)
+        if len(buffer) > max_bytes:
+            raise CodecError(f"Body exceeds {max_bytes} bytes", 413)
+    return codec.decode(bytes(buffer)), codec
+
+
+def encoded_response(body: bytes, codec: Codec, status_code: int = 200) -> Response:
+    """Response carrying already-encoded bytes."""
+    return Response(content=body, status_code=status_code, media_type=codec.media_type)
+
+
+def openapi_request_body(schema: dict[str, Any]) -> dict[str, Any]:
+    """``openapi_extra`` documenting a body accepted in every available codec."""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {media_type: {"schema": schema} for media_type in CODECS},
+        }
+    }
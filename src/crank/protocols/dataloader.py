@@ -0,0 +1,120 @@
+"""
+Request Batching (DataLoader)
+
+Coalesces individual ``load(key)`` calls made during one event-loop tick
+into a single call to a batch function, in the style of Facebook's
+DataLoader. Resolvers stay written one item at a time while the backend
+sees one call per batch:
+
+- Loads are queued, and the queue is dispatched on the next loop iteration
+  (``loop.call_soon``), after every coroutine scheduled alongside the first
+  load has had a chance to enqueue its own
+- Identical keys within a loader's lifetime share one future (deduplication)
+- Batches are split at ``max_batch_size``
+- The batch function returns one value per key, in order; an exception
+  instance in that list fails only its own key
+
+Loaders are meant to be short-lived (one per request), so the dedup cache
+never serves one caller's result to another.
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Hashable, Iterable, Sequence
+from typing import Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+BatchLoadFn = Callable[[list[K]], Awaitable[Sequence[V | BaseException]]]
+
+
+class DataLoader(Generic[K, V]):
+    """
+    Per-tick batching loader.
+
+    Args:
+        batch_load: Coroutine taking a list of keys and returning one value
+            (or exception instance) per key, in the same order
+        max_batch_size: Largest batch passed to ``batch_load``; unbounded
+            when omitted
+        cache_key: Maps a key to a hashable dedup key (e.g. canonical JSON of
+            a parameter dict); the key itself is used when omitted
+        cache: Deduplicate identical keys (disable for non-idempotent loads)
+    """
+
+    def __init__(
+        self,
+        batch_load: BatchLoadFn[K, V],
+        *,
+        max_batch_size: int | None = None,
+        cache_key: Callable[[K], Hashable] | None = None,
+        cache: bool = True,
+    ) -> None:
+        if max_batch_size is not None and max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self._batch_load = batch_load
+        self._max_batch_size = max_batch_size
+        self._cache_key = cache_key
+        self._cache_enabled = cache
+        self._cache: dict[Hashable, asyncio.Future[V]] = {}
+        self._queue: list[tuple[K, asyncio.Future[V]]] = []
+        self._tasks: set[asyncio.Task[None]] = set()
+        self.batch_sizes: list[int] = []  # One entry per batch_load call
+
+    def load(self, key: K) -> asyncio.Future[V]:
+        """Queue ``key`` for the next batch; returns a future for its value."""
+        if self._cache_enabled:
+            dedup_key = self._cache_key(key) if self._cache_key else key
+            cached = self._cache.get(dedup_key)
+            if cached is not None:
+                return cached
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[V] = loop.create_future()
+        if self._cache_enabled:
+            self._cache[dedup_key] = future
+        self._queue.append((key, future))
+        if len(self._queue) == 1:
+            loop.call_soon(self._dispatch)
+        return future
+
+    async def load_many(self, keys: Iterable[K]) -> list[V]:
+        """Load several keys (batched together) and return their values in order."""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def clear(self) -> None:
+        """Forget deduplicated results (e.g. after a write)."""
+        self._cache.clear()
+
+    def _dispatch(self) -> None:
+        queue, self._queue = self._queue, []
+        size = self._max_batch_size or len(queue)
+        for start in range(0, len(queue), size):
+            task = asyncio.create_task(self._run_batch(queue[start : start + size]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: list[tuple[K, asyncio.Future[V]]]) -> None:
+        self.batch_sizes.append(len(batch))
+        try:
+            values = await self._batch_load([key for key, _ in batch])
+            if len(values) != len(batch):
+                raise ValueError(
+                    f"Batch function returned {len(values)} values for {len(batch)} keys"
+                )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), value in zip(batch, values, strict=True):
+            if future.done():  # Caller cancelled
+                continue
+            if isinstance(value, BaseException):
+                future.set_exception(value)
+            else:
+                future.set_result(value)
@@ -0,0 +1,523 @@
+"""
+GraphQL Mesh Gateway
+
+GraphQL front door whose schema is generated from the capability catalog:
+- Every capability becomes a root field (``document.convert`` ->
+  ``documentConvert(input: DocumentConvertInput!): DocumentConvertResult!``)
+  on both ``Query`` and ``Mutation``; input and output object types are
+  derived from the capability's JSON Schema contract
+- ``capabilities(tag)`` lists the catalog
+- Parsed and validated documents are cached by the SHA-256 of the query
+  text, and the same cache serves Automatic Persisted Queries: clients send
+  ``extensions.persistedQuery.sha256Hash`` instead of the query once the
+  server has seen it
+- Resolvers load through a per-request ``DataLoader`` per capability, so
+  sibling fields (aliases) calling the same capability are coalesced into
+  one call to the batch handler instead of one call per field; identical
+  ``Query`` calls are deduplicated, ``Mutation`` calls never are (each
+  field is a side effect of its own)
+
+Root ``Query`` fields execute concurrently and therefore batch; ``Mutation``
+fields execute one after another as GraphQL requires, so use ``Query`` for
+bulk read-style calls and ``Mutation`` where ordering matters.
+
+Like the gRPC gateway, this module owns only the protocol: the application
+passes a ``BatchInvokeHandler`` that executes a list of invocations of one
+capability.
+
+Requires ``graphql-core`` (the ``graphql`` extra).
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+from collections import OrderedDict
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass
+from inspect import isawaitable
+from typing import Any
+
+from graphql import (
+    DocumentNode,
+    ExecutionResult,
+    GraphQLArgument,
+    GraphQLBoolean,
+    GraphQLError,
+    GraphQLField,
+    GraphQLFloat,
+    GraphQLInputField,
+    GraphQLInputObjectType,
+    GraphQLInt,
+    GraphQLList,
+    GraphQLNonNull,
+    GraphQLNullableInputType,
+    GraphQLNullableOutputType,
+    GraphQLObjectType,
+    GraphQLResolveInfo,
+    GraphQLScalarType,
+    GraphQLSchema,
+    GraphQLString,
+    OperationType,
+    ValueNode,
+    execute,
+    parse,
+    print_schema,
+    validate,
+)
+from graphql.utilities import value_from_ast_untyped
+
+from crank.capabilities import CAPABILITY_CATALOG, CapabilityDefinition
+from crank.protocols.dataloader import DataLoader
+from crank.protocols.invocation import (
+    BatchInvokeHandler,
+    Invocation,
+    InvocationResult,
+    InvokeHandler,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH_SIZE = 64  # Invocations per batch handler call
+DEFAULT_MAX_DOCUMENTS = 1024  # Cached (persisted) query documents
+
+PERSISTED_QUERY_NOT_FOUND = "PERSISTED_QUERY_NOT_FOUND"
+PERSISTED_QUERY_HASH_MISMATCH = "PERSISTED_QUERY_HASH_MISMATCH"
+BAD_REQUEST = "BAD_REQUEST"
+
+_NAME_SEPARATOR = re.compile(r"[^0-9A-Za-z]+")
+_INVALID_NAME_CHARS = re.compile(r"\W")
+
+
+def _parse_json_literal(node: ValueNode, variables: dict[str, Any] | None = None) -> Any:
+    return value_from_ast_untyped(node, variables)
+
+
+JSONScalar = GraphQLScalarType(
+    name="JSON",
+    description="Arbitrary JSON value",
+    serialize=lambda value: value,
+    parse_value=lambda value: value,
+    parse_literal=_parse_json_literal,
+)
+
+
+def query_hash(query: str) -> str:
+    """SHA-256 hex digest of a query, as used by Automatic Persisted Queries."""
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+def concurrent_batch_handler(handler: InvokeHandler) -> BatchInvokeHandler:
+    """
+    Adapt a single-invocation handler to the batch interface.
+
+    Invocations still run as separate handler calls (concurrently); use a
+    native batch handler to get one backend call per batch.
+    """
+
+    async def handle_batch(invocations: list[Invocation]) -> list[InvocationResult]:
+        return list(await asyncio.gather(*(handler(invocation) for invocation in invocations)))
+
+    return handle_batch
+
+
+# --- Schema generation ---
+
+
+def _type_name(capability_id: str) -> str:
+    return "".join(part[:1].upper() + part[1:] for part in _NAME_SEPARATOR.split(capability_id))
+
+
+def _field_name(capability_id: str) -> str:
+    name = _type_name(capability_id)
+    return name[:1].lower() + name[1:]
+
+
+def _property_name(name: str) -> str:
+    name = _INVALID_NAME_CHARS.sub("_", name)
+    return f"_{name}" if name[:1].isdigit() else name
+
+
+def _is_typed_object(schema: Mapping[str, Any]) -> bool:
+    return schema.get("type") == "object" and bool(schema.get("properties"))
+
+
+def _scalar_type(schema: Mapping[str, Any]) -> GraphQLScalarType:
+    return {
+        "string": GraphQLString,
+        "integer": GraphQLInt,
+        "number": GraphQLFloat,
+        "boolean": GraphQLBoolean,
+    }.get(schema.get("type"), JSONScalar)  # type: ignore[arg-type]
+
+
+def _describe(schema: Mapping[str, Any]) -> str | None:
+    description = schema.get("description")
+    if "enum" in schema:
+        allowed = ", ".join(str(value) for value in schema["enum"])
+        description = f"{description} (one of: {allowed})" if description else f"One of: {allowed}"
+    return description
+
+
+def _input_type(schema: Mapping[str, Any], name: str) -> GraphQLNullableInputType:
+    if schema.get("type") == "array":
+        return GraphQLList(_input_type(schema.get("items", {}), f"{name}Item"))
+    if not _is_typed_object(schema) or schema.get("additionalProperties"):
+        # Open objects would reject extra keys as an input type
+        return _scalar_type(schema)
+
+    required = set(schema.get("required", ()))
+    fields: dict[str, GraphQLInputField] = {}
+    for key, prop in schema["properties"].items():
+        field_type = _input_type(prop, f"{name}{_type_name(key)}")
+        fields[_property_name(key)] = GraphQLInputField(
+            GraphQLNonNull(field_type) if key in required else field_type,
+            description=_describe(prop),
+            out_name=key,
+        )
+    return GraphQLInputObjectType(name, fields, description=schema.get("description"))
+
+
+def _resolve_key(key: str) -> Callable[..., Any]:
+    def resolve(source: Any, _info: GraphQLResolveInfo[Any]) -> Any:
+        return source.get(key) if isinstance(source, Mapping) else None
+
+    return resolve
+
+
+def _output_type(schema: Mapping[str, Any], name: str) -> GraphQLNullableOutputType:
+    if schema.get("type") == "array":
+        return GraphQLList(_output_type(schema.get("items", {}), f"{name}Item"))
+    if not _is_typed_object(schema):
+        return _scalar_type(schema)
+
+    # Outputs stay nullable: workers are not validated against their schema
+    fields = {
+        _property_name(key): GraphQLField(
+            _output_type(prop, f"{name}{_type_name(key)}"),
+            resolve=_resolve_key(key),
+            description=_describe(prop),
+        )
+        for key, prop in schema["properties"].items()
+    }
+    return GraphQLObjectType(name, fields, description=schema.get("description"))
+
+
+def _result_type(capability: CapabilityDefinition) -> GraphQLObjectType:
+    name = _type_name(capability.id)
+    output_schema = capability.contract.output_schema
+    return GraphQLObjectType(
+        f"{name}Result",
+        {
+            "success": GraphQLField(
+                GraphQLNonNull(GraphQLBoolean), resolve=lambda r, _info: r.success
+            ),
+            "receiptId": GraphQLField(GraphQLString, resolve=lambda r, _info: r.receipt_id),
+            "processingTimeMs": GraphQLField(
+                GraphQLNonNull(GraphQLInt), resolve=lambda r, _info: r.processing_time_ms
+            ),
+            "nodeId": GraphQLField(GraphQLString, resolve=lambda r, _info: r.node_id),
+            "errors": GraphQLField(
+                GraphQLNonNull(GraphQLList(GraphQLNonNull(GraphQLString))),
+                resolve=lambda r, _info: r.errors,
+            ),
+            "output": GraphQLField(
+                _output_type(output_schema, f"{name}Output"),
+                resolve=lambda r, _info: r.result,
+                description="Result shaped by the capability's output schema",
+            ),
+            "rawOutput": GraphQLField(
+                JSONScalar,
+                resolve=lambda r, _info: r.result,
+                description="Result as returned by the worker",
+            ),
+        },
+        description=f"Outcome of {capability.id} {capability.version}",
+    )
+
+
+def _capability_type() -> GraphQLObjectType:
+    return GraphQLObjectType(
+        "Capability",
+        {
+            "id": GraphQLField(GraphQLNonNull(GraphQLString)),
+            "version": GraphQLField(
+                GraphQLNonNull(GraphQLString), resolve=lambda c, _info: str(c.version)
+            ),
+            "name": GraphQLField(GraphQLNonNull(GraphQLString)),
+            "description": GraphQLField(GraphQLNonNull(GraphQLString)),
+            "tags": GraphQLField(GraphQLNonNull(GraphQLList(GraphQLNonNull(GraphQLString)))),
+            "requiresGpu": GraphQLField(
+                GraphQLNonNull(GraphQLBoolean), resolve=lambda c, _info: c.requires_gpu
+            ),
+            "estimatedDurationMs": GraphQLField(
+                GraphQLInt, resolve=lambda c, _info: c.estimated_duration_ms
+            ),
+            "inputSchema": GraphQLField(
+                JSONScalar, resolve=lambda c, _info: c.contract.input_schema
+            ),
+            "outputSchema": GraphQLField(
+                JSONScalar, resolve=lambda c, _info: c.contract.output_schema
+            ),
+        },
+    )
+
+
+def build_mesh_schema(
+    capabilities: Sequence[CapabilityDefinition] = CAPABILITY_CATALOG,
+) -> GraphQLSchema:
+    """
+    Generate the GraphQL schema for a capability catalog.
+
+    Capability resolvers expect the context value to be the per-request
+    context created by ``MeshGraphQL``.
+    """
+    capability_type = _capability_type()
+
+    def resolve_capabilities(
+        _root: Any, _info: GraphQLResolveInfo[Any], tag: str | None = None
+    ) -> list[CapabilityDefinition]:
+        return [cap for cap in capabilities if tag is None or tag in cap.tags]
+
+    def invoke_field(capability: CapabilityDefinition) -> GraphQLField:
+        async def resolve(
+            _root: Any, info: GraphQLResolveInfo[Any], input: dict[str, Any]
+        ) -> InvocationResult:
+            context: _RequestContext = info.context
+            mutation = info.operation.operation is OperationType.MUTATION
+            return await context.loader(capability, dedupe=not mutation).load(input)
+
+        input_type = _input_type(
+            capability.contract.input_schema, f"{_type_name(capability.id)}Input"
+        )
+        if not isinstance(input_type, GraphQLInputObjectType):
+            input_type = JSONScalar  # Parameters must be an object; non-object schemas stay raw
+        return GraphQLField(
+            GraphQLNonNull(_result_type(capability)),
+            args={"input": GraphQLArgument(GraphQLNonNull(input_type))},
+            resolve=resolve,
+            description=f"{capability.name}: {capability.description}",
+        )
+
+    fields = {_field_name(cap.id): invoke_field(cap) for cap in capabilities}
+    query_fields: dict[str, GraphQLField] = {
+        "capabilities": GraphQLField(
+            GraphQLNonNull(GraphQLList(GraphQLNonNull(capability_type))),
+            args={"tag": GraphQLArgument(GraphQLString)},
+            resolve=resolve_capabilities,
+        ),
+        **fields,
+    }
+    return GraphQLSchema(
+        query=GraphQLObjectType("Query", query_fields),
+        mutation=GraphQLObjectType("Mutation", dict(fields)),
+    )
+
+
+# --- Document cache / persisted queries ---
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledDocument:
+    """A query parsed and validated once, reused for every execution."""
+
+    query: str
+    document: DocumentNode | None
+    errors: tuple[GraphQLError, ...] = ()
+
+
+class DocumentCache:
+    """
+    LRU of compiled documents keyed by the SHA-256 of the query text.
+
+    Doubles as the persisted query store: ``lookup`` by hash succeeds for
+    any query compiled before (and not yet evicted).
+    """
+
+    def __init__(self, schema: GraphQLSchema, max_documents: int = DEFAULT_MAX_DOCUMENTS) -> None:
+        self._schema = schema
+        self._max_documents = max_documents
+        self._documents: OrderedDict[str, CompiledDocument] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def lookup(self, sha256: str) -> CompiledDocument | None:
+        """Compiled document for a query hash, if cached."""
+        compiled = self._documents.get(sha256)
+        if compiled is not None:
+            self._documents.move_to_end(sha256)
+            self.hits += 1
+        return compiled
+
+    def compile(self, query: str) -> CompiledDocument:
+        """Parse and validate ``query``, or return the cached result."""
+        sha256 = query_hash(query)
+        compiled = self.lookup(sha256)
+        if compiled is not None:
+            return compiled
+
+        self.misses += 1
+        try:
+            document = parse(query)
+        except GraphQLError as e:
+            compiled = CompiledDocument(query, None, (e,))
+        else:
+            errors = validate(self._schema, document)
+            compiled = CompiledDocument(query, None if errors else document, tuple(errors))
+
+        self._documents[sha256] = compiled
+        if len(self._documents) > self._max_documents:
+            self._documents.popitem(last=False)
+        return compiled
+
+
+# --- Execution ---
+
+
+class _RequestContext:
+    """Per-request state: transport metadata and one loader per capability."""
+
+    __slots__ = ("_handler", "_loaders", "_max_batch_size", "metadata")
+
+    def __init__(
+        self, handler: BatchInvokeHandler, metadata: dict[str, str], max_batch_size: int
+    ) -> None:
+        self.metadata = metadata
+        self._handler = handler
+        self._max_batch_size = max_batch_size
+        self._loaders: dict[tuple[str, bool], DataLoader[dict[str, Any], InvocationResult]] = {}
+
+    def loader(
+        self, capability: CapabilityDefinition, *, dedupe: bool = True
+    ) -> DataLoader[dict[str, Any], InvocationResult]:
+        """Loader for a capability; ``dedupe=False`` runs identical inputs separately."""
+        loader = self._loaders.get((capability.id, dedupe))
+        if loader is None:
+
+            async def load(params: list[dict[str, Any]]) -> list[InvocationResult]:
+                invocations = [
+                    Invocation(capability, item, request_id=str(index), metadata=self.metadata)
+                    for index, item in enumerate(params)
+                ]
+                return await self._handler(invocations)
+
+            loader = DataLoader(
+                load,
+                max_batch_size=self._max_batch_size,
+                cache_key=lambda params: json.dumps(params, sort_keys=True, default=str),
+                cache=dedupe,
+            )
+            self._loaders[capability.id, dedupe] = loader
+        return loader
+
+
+class MeshGraphQL:
+    """
+    GraphQL executor for the mesh.
+
+    Args:
+        handler: Coroutine executing a list of invocations of one capability
+            (see ``concurrent_batch_handler`` to adapt a per-item handler)
+        capabilities: Catalog the schema is generated from
+        max_batch_size: Largest list passed to ``handler``
+        max_documents: Compiled/persisted documents kept in the LRU
+    """
+
+    def __init__(
+        self,
+        handler: BatchInvokeHandler,
+        capabilities: Sequence[CapabilityDefinition] = CAPABILITY_CATALOG,
+        *,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_documents: int = DEFAULT_MAX_DOCUMENTS,
+    ) -> None:
+        self.schema = build_mesh_schema(capabilities)
+        self.documents = DocumentCache(self.schema, max_documents)
+        self._handler = handler
+        self._max_batch_size = max_batch_size
+
+    def sdl(self) -> str:
+        """Schema in GraphQL SDL."""
+        return print_schema(self.schema)
+
+    async def execute(
+        self, request: Mapping[str, Any], metadata: Mapping[str, str] | None = None
+    ) -> dict[str, Any]:
+        """
+        Execute a GraphQL-over-HTTP request body.
+
+        Args:
+            request: ``{"query", "variables", "operationName", "extensions"}``;
+                ``query`` may be omitted when
+                ``extensions.persistedQuery.sha256Hash`` names a cached query
+            metadata: Transport metadata (auth headers) passed to invocations
+
+        Returns:
+            The GraphQL response (``data`` and/or ``errors``)
+        """
+        try:
+            compiled = self._resolve_document(request)
+            variables = request.get("variables")
+            if variables is not None and not isinstance(variables, dict):
+                raise _request_error("variables must be an object")
+        except GraphQLError as e:
+            return {"errors": [e.formatted]}
+        if compiled.document is None:
+            return {"errors": [error.formatted for error in compiled.errors]}
+
+        context = _RequestContext(self._handler, dict(metadata or {}), self._max_batch_size)
+        result = execute(
+            self.schema,
+            compiled.document,
+            context_value=context,
+            variable_values=variables,
+            operation_name=request.get("operationName"),
+        )
+        if isawaitable(result):
+            result = await result
+        assert isinstance(result, ExecutionResult)
+        return dict(result.formatted)
+
+    def _resolve_document(self, request: Mapping[str, Any]) -> CompiledDocument:
+        query = request.get("query")
+        if query is not None and not isinstance(query, str):
+            raise _request_error("query must be a string")
+
+        extensions = request.get("extensions") or {}
+        if not isinstance(extensions, Mapping):
+            raise _request_error("extensions must be an object")
+        persisted = extensions.get("persistedQuery")
+        if persisted:
+            if not isinstance(persisted, Mapping):
+                raise _request_error("persistedQuery must be an object")
+            sha256 = persisted.get("sha256Hash")
+            if not isinstance(sha256, str):
+                raise _request_error("persistedQuery requires sha256Hash")
+            if query is None:
+                compiled = self.documents.lookup(sha256)
+                if compiled is None:
+                    raise GraphQLError(
+                        "PersistedQueryNotFound", extensions={"code": PERSISTED_QUERY_NOT_FOUND}
+                    )
+                return compiled
+            if query_hash(query) != sha256:
+                raise GraphQLError(
+                    "provided sha does not match query",
+                    extensions={"code": PERSISTED_QUERY_HASH_MISMATCH},
+                )
+
+        if not query:
+            raise _request_error("Must provide query string.")
+        return self.documents.compile(query)
+
+
+def _request_error(message: str) -> GraphQLError:
+    return GraphQLError(message, extensions={"code": BAD_REQUEST})
+
+
+if __name__ == "__main__":  # pragma: no cover
+    print(print_schema(build_mesh_schema()))
@@ -0,0 +1,321 @@
+"""
+gRPC Mesh Gateway
+
+HTTP/2 front door serving the ``crank.mesh.v1.Mesh`` service built by
+``crank.protocols.mesh_contract``:
+- ``Invoke``: unary call to one capability
+- ``InvokeStream``: bidirectional stream; every request runs concurrently
+  and responses are sent as they finish, matched by ``request_id``
+- ``ListCapabilities``: the catalog the contract was built from
+
+Payloads are binary protobuf, and one channel multiplexes any number of
+concurrent calls, so internal callers hold a single connection per peer
+instead of a pool of HTTP/1.1 connections.
+
+Like the ONC-RPC server, the gateway owns only the transport: the
+application passes an async handler that turns an ``Invocation`` into an
+``InvocationResult``.
+
+Requires ``grpcio`` and ``protobuf`` (the ``grpc`` extra).
+"""
+
+import asyncio
+import itertools
+import logging
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Sequence
+from typing import Any
+
+import grpc
+from google.protobuf.message import Message
+
+from crank.capabilities import CAPABILITY_CATALOG, CapabilityDefinition
+from crank.protocols.invocation import InvocationResult, InvokeHandler
+from crank.protocols.mesh_contract import SERVICE_NAME, ContractError, MeshContract
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STREAM_CONCURRENCY = 64  # Requests in flight per InvokeStream call
+DEFAULT_MAX_MESSAGE_BYTES = 64 * 1024 * 1024  # Base64 images and documents
+DEFAULT_SERVER_OPTIONS: tuple[tuple[str, Any], ...] = (
+    ("grpc.max_receive_message_length", DEFAULT_MAX_MESSAGE_BYTES),
+    ("grpc.max_send_message_length", DEFAULT_MAX_MESSAGE_BYTES),
+    ("grpc.max_concurrent_streams", 1024),
+    ("grpc.keepalive_time_ms", 30_000),
+    ("grpc.keepalive_permit_without_calls", 1),
+)
+
+
+class MeshGateway:
+    """
+    ``Mesh`` service implementation.
+
+    Args:
+        handler: Coroutine that executes one invocation
+        capabilities: Catalog exposed by the contract
+        stream_concurrency: Requests run concurrently per ``InvokeStream``;
+            reading from the client pauses once this many are outstanding
+    """
+
+    def __init__(
+        self,
+        handler: InvokeHandler,
+        capabilities: Sequence[CapabilityDefinition] = CAPABILITY_CATALOG,
+        *,
+        stream_concurrency: int = DEFAULT_STREAM_CONCURRENCY,
+    ) -> None:
+        self.contract = MeshContract(capabilities)
+        self._handler = handler
+        self._stream_concurrency = stream_concurrency
+
+    def rpc_handler(self) -> grpc.GenericRpcHandler:
+        """Generic handler to register on a ``grpc.aio.Server``."""
+        contract = self.contract
+        return grpc.method_handlers_generic_handler(
+            SERVICE_NAME,
+            {
+                "Invoke": grpc.unary_unary_rpc_method_handler(
+                    self.invoke,
+                    request_deserializer=contract.InvokeRequest.FromString,
+                    response_serializer=contract.InvokeResponse.SerializeToString,
+                ),
+                "InvokeStream": grpc.stream_stream_rpc_method_handler(
+                    self.invoke_stream,
+                    request_deserializer=contract.InvokeRequest.FromString,
+                    response_serializer=contract.InvokeResponse.SerializeToString,
+                ),
+                "ListCapabilities": grpc.unary_unary_rpc_method_handler(
+                    self.list_capabilities,
+                    request_deserializer=contract.ListCapabilitiesRequest.FromString,
+                    response_serializer=contract.ListCapabilitiesResponse.SerializeToString,
+                ),
+            },
+        )
+
+    async def invoke(self, request: Message, context: grpc.aio.ServicerContext) -> Message:
+        """Unary ``Invoke``: contract and handler errors become gRPC status codes."""
+        try:
+            invocation = self.contract.parse_request(request, _metadata(context))
+        except ContractError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+            raise  # abort() always raises; keeps type checkers aware of that
+
+        try:
+            result = await self._handler(invocation)
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+            raise
+        except Exception:
+            logger.exception("gRPC invoke of %s failed", invocation.capability.id)
+            await context.abort(grpc.StatusCode.INTERNAL, "Capability invocation failed")
+            raise
+        return self.contract.build_response(result, invocation.capability, invocation.request_id)
+
+    async def invoke_stream(
+        self, requests: AsyncIterator[Message], context: grpc.aio.ServicerContext
+    ) -> AsyncIterator[Message]:
+        """
+        Bidirectional ``InvokeStream``.
+
+        Failures are reported per request (``success=False``) so one bad
+        request does not end the stream.
+        """
+        metadata = _metadata(context)
+        slots = asyncio.Semaphore(self._stream_concurrency)
+        responses: asyncio.Queue[Message | None] = asyncio.Queue()
+
+        async def run(request: Message) -> None:
+            responses.put_nowait(await self._invoke_isolated(request, metadata))
+
+        async def read_requests() -> None:
+            tasks: set[asyncio.Task[None]] = set()
+            try:
+                async for request in requests:
+                    await slots.acquire()  # Released once the response is sent
+                    task = asyncio.create_task(run(request))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                if tasks:
+                    await asyncio.gather(*tasks)
+            except asyncio.CancelledError:
+                for task in tasks:
+                    task.cancel()
+                raise
+            finally:
+                responses.put_nowait(None)
+
+        reader = asyncio.create_task(read_requests())
+        try:
+            while (response := await responses.get()) is not None:
+                yield response
+                slots.release()
+            await reader  # Surface client stream errors
+        finally:
+            reader.cancel()
+
+    async def list_capabilities(
+        self, request: Message, context: grpc.aio.ServicerContext
+    ) -> Message:
+        """Unary ``ListCapabilities``."""
+        return self.contract.capability_list(request.tag)
+
+    async def _invoke_isolated(self, request: Message, metadata: dict[str, str]) -> Message:
+        request_id: str = request.request_id
+        capability: CapabilityDefinition | None = None
+        try:
+            invocation = self.contract.parse_request(request, metadata)
+            capability = invocation.capability
+            result = await self._handler(invocation)
+        except ValueError as e:
+            result = InvocationResult(success=False, errors=[str(e)])
+        except Exception:
+            logger.exception("gRPC stream invoke %r failed", request_id)
+            result = InvocationResult(success=False, errors=["Capability invocation failed"])
+        return self.contract.build_response(result, capability, request_id)
+
+
+async def start_grpc_gateway(
+    handler: InvokeHandler,
+    address: str = "[::]:50051",
+    *,
+    capabilities: Sequence[CapabilityDefinition] = CAPABILITY_CATALOG,
+    server_credentials: grpc.ServerCredentials | None = None,
+    stream_concurrency: int = DEFAULT_STREAM_CONCURRENCY,
+    options: Iterable[tuple[str, Any]] = DEFAULT_SERVER_OPTIONS,
+) -> tuple[grpc.aio.Server, int]:
+    """
+    Start a gRPC server exposing the mesh gateway.
+
+    Args:
+        handler: Coroutine that executes one invocation
+        address: ``host:port`` to bind (port 0 picks a free port)
+        capabilities: Catalog exposed by the contract
+        server_credentials: TLS credentials (e.g. from ``grpc.ssl_server_credentials``
+            with the platform certificates); plaintext when omitted
+        stream_concurrency: Requests in flight per ``InvokeStream``
+        options: gRPC channel arguments
+
+    Returns:
+        The started server and the bound port
+    """
+    gateway = MeshGateway(handler, capabilities, stream_concurrency=stream_concurrency)
+    server = grpc.aio.server(options=list(options))
+    server.add_generic_rpc_handlers((gateway.rpc_handler(),))
+    if server_credentials is None:
+        port = server.add_insecure_port(address)
+    else:
+        port = server.add_secure_port(address, server_credentials)
+    await server.start()
+    logger.info("gRPC mesh gateway listening on %s (port %d)", address, port)
+    return server, port
+
+
+class MeshGatewayClient:
+    """
+    Client for the ``Mesh`` service over one multiplexed channel.
+
+    Args:
+        target: ``host:port`` of the gateway
+        contract: Contract matching the server's catalog
+        credentials: TLS channel credentials; plaintext when omitted
+        metadata: Sent with every call (e.g. ``(("authorization", "Bearer ..."),)``)
+    """
+
+    def __init__(
+        self,
+        target: str,
+        contract: MeshContract | None = None,
+        *,
+        credentials: grpc.ChannelCredentials | None = None,
+        metadata: Sequence[tuple[str, str]] = (),
+    ) -> None:
+        self.contract = contract or MeshContract()
+        options = [
+            ("grpc.max_receive_message_length", DEFAULT_MAX_MESSAGE_BYTES),
+            ("grpc.max_send_message_length", DEFAULT_MAX_MESSAGE_BYTES),
+        ]
+        if credentials is None:
+            self._channel = grpc.aio.insecure_channel(target, options=options)
+        else:
+            self._channel = grpc.aio.secure_channel(target, credentials, options=options)
+        self._metadata = tuple(metadata)
+        self._request_ids = itertools.count()
+
+        path = f"/{SERVICE_NAME}"
+        self._invoke = self._channel.unary_unary(
+            f"{path}/Invoke",
+            request_serializer=_serialize,
+            response_deserializer=self.contract.InvokeResponse.FromString,
+        )
+        self._invoke_stream = self._channel.stream_stream(
+            f"{path}/InvokeStream",
+            request_serializer=_serialize,
+            response_deserializer=self.contract.InvokeResponse.FromString,
+        )
+        self._list = self._channel.unary_unary(
+            f"{path}/ListCapabilities",
+            request_serializer=_serialize,
+            response_deserializer=self.contract.ListCapabilitiesResponse.FromString,
+        )
+
+    async def invoke(
+        self,
+        capability_id: str,
+        params: dict[str, Any],
+        *,
+        version: str = "",
+        timeout: float | None = None,
+    ) -> InvocationResult:
+        """Call one capability."""
+        request = self.contract.make_request(capability_id, params, version=version)
+        response = await self._invoke(request, timeout=timeout, metadata=self._metadata)
+        return self.contract.read_response(response)
+
+    async def invoke_many(
+        self,
+        calls: AsyncIterable[tuple[str, dict[str, Any]]] | Iterable[tuple[str, dict[str, Any]]],
+    ) -> AsyncIterator[tuple[str, InvocationResult]]:
+        """
+        Send ``(capability_id, params)`` pairs over one ``InvokeStream``.
+
+        Yields ``(request_id, result)`` in completion order; request ids are
+        assigned by the client and returned so callers can correlate.
+        """
+
+        async def requests() -> AsyncIterator[Message]:
+            if isinstance(calls, AsyncIterable):
+                async for capability_id, params in calls:
+                    yield self._stream_request(capability_id, params)
+            else:
+                for capability_id, params in calls:
+                    yield self._stream_request(capability_id, params)
+
+        call = self._invoke_stream(requests(), metadata=self._metadata)
+        async for response in call:
+            yield response.request_id, self.contract.read_response(response)
+
+    async def list_capabilities(self, tag: str = "") -> Message:
+        """Fetch the server's capability list."""
+        request = self.contract.ListCapabilitiesRequest(tag=tag)
+        response: Message = await self._list(request, metadata=self._metadata)
+        return response
+
+    async def close(self) -> None:
+        """Close the channel."""
+        await self._channel.close()
+
+    def _stream_request(self, capability_id: str, params: dict[str, Any]) -> Message:
+        request_id = str(next(self._request_ids))
+        return self.contract.make_request(capability_id, params, request_id=request_id)
+
+
+def _serialize(message: Message) -> bytes:
+    data: bytes = message.SerializeToString()
+    return data
+
+
+def _metadata(context: grpc.aio.ServicerContext) -> dict[str, str]:
+    return {
+        key: value
+        for key, value in (context.invocation_metadata() or ())
+        if isinstance(value, str)  # Skip binary (-bin) headers
+    }
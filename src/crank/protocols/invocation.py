@@ -0,0 +1,44 @@
+"""
+Capability Invocations
+
+Transport-neutral request/result types shared by the protocol gateways
+(gRPC, GraphQL): a gateway decodes its wire format into an ``Invocation``,
+the application executes it, and the gateway encodes the
+``InvocationResult`` back.
+"""
+
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from crank.capabilities import CapabilityDefinition
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class Invocation:
+    """One capability call decoded from a protocol request."""
+
+    capability: CapabilityDefinition
+    params: dict[str, Any]
+    request_id: str = ""
+    metadata: dict[str, str] = field(default_factory=dict)  # Transport metadata (auth headers)
+
+
+@dataclass(slots=True)
+class InvocationResult:
+    """Outcome of a capability call."""
+
+    success: bool
+    result: dict[str, Any] | None = None
+    receipt_id: str | None = None
+    processing_time_ms: int = 0
+    node_id: str | None = None
+    errors: list[str] = field(default_factory=list)
+
+
+InvokeHandler = Callable[[Invocation], Awaitable[InvocationResult]]
+# Invocations of one capability in, one result per invocation out (same order)
+BatchInvokeHandler = Callable[[list[Invocation]], Awaitable[list[InvocationResult]]]
@@ -0,0 +1,103 @@
+"""
+JSON-RPC 2.0 Dispatch
+
+Request and batch handling shared by JSON-RPC front ends (MCP):
+- A payload is a single request object or a batch (array) of them
+- Notifications (no ``id``) are executed but produce no response
+- In a batch, requests for methods marked concurrent (MCP ``tools/call``)
+  run together under a concurrency limit; any other request acts as a
+  barrier, so an ``initialize`` still completes before the calls after it
+- Responses keep request order; malformed entries get an error response
+  without failing the rest of the batch
+
+The application supplies a coroutine that turns one request object into
+one response object.
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Collection
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+DEFAULT_MAX_CONCURRENCY = 16  # Concurrent requests per batch
+
+MessageHandler = Callable[[dict[str, Any]], Awaitable[dict[str, Any]]]
+JSONRPCResponse = dict[str, Any] | list[dict[str, Any]] | None
+
+
+def jsonrpc_error(request_id: Any, code: int, message: str) -> dict[str, Any]:
+    """JSON-RPC error response object."""
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def is_notification(message: dict[str, Any]) -> bool:
+    """Whether a request expects no response (no ``id`` member)."""
+    return "id" not in message
+
+
+async def dispatch_jsonrpc(
+    payload: Any,
+    handle: MessageHandler,
+    *,
+    concurrent_methods: Collection[str] = (),
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> JSONRPCResponse:
+    """
+    Handle a decoded JSON-RPC payload.
+
+    Args:
+        payload: A request object or a list of them
+        handle: Coroutine producing the response object for one request
+        concurrent_methods: Methods whose requests may run concurrently with
+            each other within a batch
+        max_concurrency: Requests in flight at once within a batch
+
+    Returns:
+        A response object, a list of them for a batch, or None when nothing
+        needs a response (only notifications)
+    """
+    if not isinstance(payload, list):
+        return await _dispatch_one(payload, handle)
+    if not payload:
+        return jsonrpc_error(None, INVALID_REQUEST, "Empty batch")
+
+    slots = asyncio.Semaphore(max_concurrency)
+
+    async def run(message: Any) -> dict[str, Any] | None:
+        async with slots:
+            return await _dispatch_one(message, handle)
+
+    responses: list[dict[str, Any] | None] = []
+    group: list[Any] = []  # Consecutive concurrent requests
+    for message in payload:
+        if isinstance(message, dict) and message.get("method") in concurrent_methods:
+            group.append(message)
+            continue
+        if group:
+            responses.extend(await asyncio.gather(*(run(item) for item in group)))
+            group = []
+        responses.append(await _dispatch_one(message, handle))
+    if group:
+        responses.extend(await asyncio.gather(*(run(item) for item in group)))
+
+    results = [response for response in responses if response is not None]
+    return results or None
+
+
+async def _dispatch_one(message: Any, handle: MessageHandler) -> dict[str, Any] | None:
+    if not isinstance(message, dict) or not isinstance(message.get("method"), str):
+        return jsonrpc_error(None, INVALID_REQUEST, "Invalid request")
+    try:
+        response = await handle(message)
+    except Exception as e:
+        logger.exception("JSON-RPC method %s failed", message["method"])
+        response = jsonrpc_error(message.get("id"), INTERNAL_ERROR, f"Internal error: {e}")
+    return None if is_notification(message) else response
@@ -0,0 +1,385 @@
+"""
+Streaming MCP Transports
+
+Serves MCP over newline-delimited JSON on stdio and over HTTP with
+Server-Sent Events, so long-running tools can report as they go:
+- ``ToolStream`` is handed to the tool; it emits MCP progress
+  notifications (``notifications/progress``) and incremental result chunks
+  (``notifications/tools/chunk``) when the client asked for them with a
+  ``_meta.progressToken``, and is a no-op otherwise
+- Every outgoing message goes through a bounded ``Outbox``; when an agent
+  reads slowly the writes block, the tool's next ``progress``/``chunk``
+  call waits, and memory held per session stays at ``buffer_size`` messages
+- A session admits at most ``max_concurrency`` running plus ``max_backlog``
+  queued requests; past that, submitting waits, so the stdio reader and
+  SSE batch loop stop taking requests instead of piling up tasks (a
+  cancellation sent meanwhile is read once a request finishes)
+- ``notifications/cancelled`` cancels the matching request's task, and a
+  closed connection (stdio EOF on the write side, SSE client disconnect)
+  cancels everything still running for it
+
+Responses may arrive in any order on a stream; clients match them by id.
+"""
+
+import asyncio
+import json
+import logging
+import sys
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+from fastapi.responses import StreamingResponse
+
+from crank.protocols.jsonrpc import (
+    DEFAULT_MAX_CONCURRENCY,
+    INTERNAL_ERROR,
+    INVALID_REQUEST,
+    PARSE_ERROR,
+    is_notification,
+    jsonrpc_error,
+)
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_NOTIFICATION = "notifications/progress"
+CHUNK_NOTIFICATION = "notifications/tools/chunk"
+CANCELLED_NOTIFICATION = "notifications/cancelled"
+
+DEFAULT_BUFFER_MESSAGES = 64  # Outgoing messages buffered per session
+DEFAULT_MAX_BACKLOG = 64  # Requests queued per session beyond max_concurrency
+DEFAULT_MAX_LINE_BYTES = 16 * 1024 * 1024  # Largest stdio request line
+
+Send = Callable[[dict[str, Any]], Awaitable[None]]
+StreamingHandler = Callable[[dict[str, Any], Send], Awaitable[dict[str, Any]]]
+
+
+class Outbox:
+    """
+    Bounded queue of outgoing JSON-RPC messages.
+
+    ``send`` waits while ``maxsize`` messages are queued, which is how a
+    slow reader pushes back on the tools producing output.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_BUFFER_MESSAGES) -> None:
+        self._queue: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue()
+        self._room = asyncio.Semaphore(maxsize)
+        self.high_water = 0  # Most messages queued at once
+
+    async def send(self, message: dict[str, Any]) -> None:
+        """Queue a message, waiting for room."""
+        await self._room.acquire()
+        self._queue.put_nowait(message)
+        self.high_water = max(self.high_water, self._queue.qsize())
+
+    def close(self) -> None:
+        """End the stream after the messages already queued (never waits)."""
+        self._queue.put_nowait(None)
+
+    async def messages(self) -> AsyncIterator[dict[str, Any]]:
+        """Queued messages in order, until ``close``."""
+        while (message := await self._queue.get()) is not None:
+            self._room.release()
+            yield message
+
+
+class ToolStream:
+    """
+    Progress and partial-result channel for one ``tools/call``.
+
+    Args:
+        send: Where notifications go (the session outbox); None disables
+            streaming
+        progress_token: The request's ``_meta.progressToken``; without one
+            the client did not ask for notifications and nothing is sent
+
+    Chunks are extra, incremental delivery: the tool still returns its
+    final result, which may omit what it already streamed when
+    ``streaming`` is true.
+    """
+
+    def __init__(self, send: Send | None = None, progress_token: str | int | None = None) -> None:
+        self._send = send
+        self.progress_token = progress_token
+        self.chunks_sent = 0
+
+    @property
+    def streaming(self) -> bool:
+        """Whether notifications reach the client."""
+        return self._send is not None and self.progress_token is not None
+
+    async def progress(
+        self, progress: float, total: float | None = None, message: str | None = None
+    ) -> None:
+        """Report progress (``total`` and ``message`` are optional)."""
+        params: dict[str, Any] = {"progressToken": self.progress_token, "progress": progress}
+        if total is not None:
+            params["total"] = total
+        if message is not None:
+            params["message"] = message
+        await self._notify(PROGRESS_NOTIFICATION, params)
+
+    async def chunk(self, data: Any) -> None:
+        """Send part of the result; strings as text, anything else as JSON text."""
+        text = data if isinstance(data, str) else json.dumps(data, default=str)
+        params = {
+            "progressToken": self.progress_token,
+            "index": self.chunks_sent,
+            "content": [{"type": "text", "text": text}],
+        }
+        await self._notify(CHUNK_NOTIFICATION, params)
+        if self.streaming:
+            self.chunks_sent += 1
+
+    async def _notify(self, method: str, params: dict[str, Any]) -> None:
+        if self._send is not None and self.progress_token is not None:
+            await self._send({"jsonrpc": "2.0", "method": method, "params": params})
+
+
+class StreamingSession:
+    """
+    JSON-RPC requests of one connection, run as tasks writing to one outbox.
+
+    Args:
+        handle: Coroutine producing the response for one request; it gets
+            the outbox's ``send`` for notifications
+        buffer_size: Outgoing messages buffered before producers wait
+        max_concurrency: Requests handled at once; later ones queue
+        max_backlog: Requests queued behind the running ones before
+            ``submit`` waits for one to finish
+    """
+
+    def __init__(
+        self,
+        handle: StreamingHandler,
+        *,
+        buffer_size: int = DEFAULT_BUFFER_MESSAGES,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_backlog: int = DEFAULT_MAX_BACKLOG,
+    ) -> None:
+        self.outbox = Outbox(buffer_size)
+        self._handle = handle
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._admitted = asyncio.Semaphore(max_concurrency + max_backlog)
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._by_id: dict[str | int, asyncio.Task[None]] = {}
+        self.cancelled = 0  # Requests cancelled by the client
+
+    async def submit(self, payload: Any) -> None:
+        """Start handling a request object or a batch of them, waiting while the backlog is full."""
+        if not isinstance(payload, list):
+            await self._submit_one(payload)
+        elif not payload:
+            await self.outbox.send(jsonrpc_error(None, INVALID_REQUEST, "Empty batch"))
+        else:
+            for message in payload:
+                await self._submit_one(message)
+
+    @property
+    def running(self) -> int:
+        """Requests started and not yet finished."""
+        return len(self._tasks)
+
+    def cancel(self, request_id: Any) -> bool:
+        """Cancel a running request; False if it is unknown or finished."""
+        task = self._by_id.get(request_id) if isinstance(request_id, (str, int)) else None
+        if task is None or task.done():
+            return False
+        task.cancel()
+        self.cancelled += 1
+        return True
+
+    def abort(self) -> None:
+        """Cancel every running request (the connection is gone)."""
+        for task in self._tasks:
+            task.cancel()
+
+    async def join(self) -> None:
+        """Wait for the running requests to finish."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def aclose(self) -> None:
+        """Cancel the running requests and wait for them to unwind."""
+        self.abort()
+        await self.join()
+
+    async def _submit_one(self, message: Any) -> None:
+        if not isinstance(message, dict) or not isinstance(message.get("method"), str):
+            await self.outbox.send(jsonrpc_error(None, INVALID_REQUEST, "Invalid request"))
+            return
+        if message["method"] == CANCELLED_NOTIFICATION:
+            self.cancel((message.get("params") or {}).get("requestId"))
+            return
+
+        await self._admitted.acquire()
+        task = asyncio.create_task(self._run(message))
+        task.add_done_callback(lambda _: self._admitted.release())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        request_id = message.get("id")
+        if isinstance(request_id, (str, int)):
+            self._by_id[request_id] = task
+            task.add_done_callback(lambda _: self._by_id.pop(request_id, None))
+
+    async def _run(self, message: dict[str, Any]) -> None:
+        async with self._slots:
+            try:
+                response = await self._handle(message, self.outbox.send)
+            except Exception as e:
+                logger.exception("MCP method %s failed", message["method"])
+                response = jsonrpc_error(message.get("id"), INTERNAL_ERROR, f"Internal error: {e}")
+        if not is_notification(message):
+            await self.outbox.send(response)
+
+
+# --- stdio ---
+
+
+async def open_stdio(
+    max_line_bytes: int = DEFAULT_MAX_LINE_BYTES,
+) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """Asyncio streams over the process's stdin and stdout."""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=max_line_bytes)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    transport, protocol = await loop.connect_write_pipe(
+        asyncio.streams.FlowControlMixin, sys.stdout
+    )
+    writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+    return reader, writer
+
+
+async def serve_stdio(
+    handle: StreamingHandler,
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    *,
+    buffer_size: int = DEFAULT_BUFFER_MESSAGES,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    max_backlog: int = DEFAULT_MAX_BACKLOG,
+) -> None:
+    """
+    Serve newline-delimited JSON-RPC until the reader hits EOF.
+
+    Requests still running at EOF finish and their responses are written
+    before this returns. If writing fails, running requests are cancelled.
+    """
+    session = StreamingSession(
+        handle, buffer_size=buffer_size, max_concurrency=max_concurrency, max_backlog=max_backlog
+    )
+
+    output_lost = asyncio.Event()
+
+    async def write_messages() -> None:
+        messages = session.outbox.messages()
+        try:
+            async for message in messages:
+                writer.write(json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n")
+                await writer.drain()
+        except (ConnectionError, OSError):
+            logger.warning("MCP stdio output closed; cancelling %d requests", session.running)
+            output_lost.set()
+            session.abort()
+            async for _ in messages:  # Discard the rest so no sender waits on a dead pipe
+                pass
+
+    writer_task = asyncio.create_task(write_messages())
+    lost = asyncio.create_task(output_lost.wait())
+    try:
+        while True:
+            read = asyncio.ensure_future(reader.readline())
+            await asyncio.wait({read, lost}, return_when=asyncio.FIRST_COMPLETED)
+            if not read.done():  # Output is gone; stop taking requests
+                read.cancel()
+                break
+            try:
+                line = read.result()
+            except ValueError:  # Line longer than the reader's limit
+                await session.outbox.send(jsonrpc_error(None, PARSE_ERROR, "Request too large"))
+                continue
+            if not line:
+                break
+            if not line.strip():
+                continue
+            try:
+                payload = json.loads(line)
+            except ValueError:
+                await session.outbox.send(jsonrpc_error(None, PARSE_ERROR, "Parse error"))
+                continue
+            await session.submit(payload)
+
+        await session.join()
+        session.outbox.close()
+        await writer_task
+    finally:
+        await session.aclose()
+        writer_task.cancel()
+        lost.cancel()
+
+
+# --- HTTP + SSE ---
+
+
+def format_sse(message: dict[str, Any]) -> bytes:
+    """One Server-Sent Events ``message`` event carrying a JSON-RPC message."""
+    data = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    return b"event: message\ndata: " + data + b"\n\n"
+
+
+async def sse_events(
+    handle: StreamingHandler,
+    payload: Any,
+    *,
+    buffer_size: int = DEFAULT_BUFFER_MESSAGES,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    max_backlog: int = DEFAULT_MAX_BACKLOG,
+) -> AsyncIterator[bytes]:
+    """
+    SSE events for one POSTed request or batch.
+
+    Notifications and responses are yielded as they are produced; the
+    stream ends after the last response. If the consumer stops early (client
+    disconnect), the requests are cancelled.
+    """
+    session = StreamingSession(
+        handle, buffer_size=buffer_size, max_concurrency=max_concurrency, max_backlog=max_backlog
+    )
+
+    async def run() -> None:
+        await session.submit(payload)
+        await session.join()
+        session.outbox.close()
+
+    runner = asyncio.create_task(run())
+    try:
+        async for message in session.outbox.messages():
+            yield format_sse(message)
+        await runner
+    finally:
+        runner.cancel()
+        session.abort()  # Before awaiting: the await may itself be cancelled
+        await session.aclose()
+
+
+def sse_response(
+    handle: StreamingHandler,
+    payload: Any,
+    *,
+    buffer_size: int = DEFAULT_BUFFER_MESSAGES,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    max_backlog: int = DEFAULT_MAX_BACKLOG,
+) -> StreamingResponse:
+    """``text/event-stream`` response streaming ``sse_events``."""
+    events = sse_events(
+        handle,
+        payload,
+        buffer_size=buffer_size,
+        max_concurrency=max_concurrency,
+        max_backlog=max_backlog,
+    )
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
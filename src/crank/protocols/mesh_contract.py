@@ -0,0 +1,617 @@
+"""
+Mesh Protobuf Contract
+
+Builds the ``crank.mesh.v1`` protobuf contract from the capability catalog:
+- One ``<Capability>Input`` / ``<Capability>Output`` message per capability,
+  derived from its JSON Schema input/output contract
+- ``InvokeRequest`` / ``InvokeResponse`` envelopes whose ``input`` / ``output``
+  oneofs select the capability
+- ``ListCapabilities`` messages describing the catalog itself
+
+Descriptors are built in memory (no protoc step), so the contract always
+matches ``crank.capabilities.schema``. ``MeshContract.render_proto()`` emits
+the equivalent ``.proto`` source for clients in other languages.
+
+JSON Schema mapping:
+- string, integer, number, boolean -> string, int64, double, bool (proto3
+  ``optional``, so absent and zero values stay distinguishable)
+- array -> ``repeated`` of the item type (nested arrays -> ``ListValue``)
+- object with ``properties`` -> nested message; open objects
+  (no properties, or ``additionalProperties: true``) -> ``Struct``
+- anything untyped -> ``google.protobuf.Value``
+
+Capabilities are numbered by catalog position, so the catalog is append-only.
+Requires ``protobuf`` (the ``grpc`` extra).
+"""
+
+import json
+import logging
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from google.protobuf import (
+    descriptor_pb2,
+    descriptor_pool,
+    json_format,
+    message_factory,
+    struct_pb2,
+)
+from google.protobuf.descriptor import Descriptor, FieldDescriptor
+from google.protobuf.message import Message
+
+from crank.capabilities import CAPABILITY_CATALOG, CapabilityDefinition, CapabilityVersion
+from crank.protocols.invocation import Invocation, InvocationResult
+
+logger = logging.getLogger(__name__)
+
+PROTO_PACKAGE = "crank.mesh.v1"
+PROTO_FILE_NAME = "crank/mesh/v1/mesh.proto"
+SERVICE_NAME = f"{PROTO_PACKAGE}.Mesh"
+# Envelope fields use 1-15 (single-byte tags); capability oneof members start here
+FIRST_CAPABILITY_FIELD = 16
+
+_FDP = descriptor_pb2.FieldDescriptorProto
+_STRUCT = ".google.protobuf.Struct"
+_VALUE = ".google.protobuf.Value"
+_LIST_VALUE = ".google.protobuf.ListValue"
+_WELL_KNOWN = frozenset(
+    {"google.protobuf.Struct", "google.protobuf.Value", "google.protobuf.ListValue"}
+)
+
+_SCALAR_TYPES = {
+    "string": _FDP.TYPE_STRING,
+    "integer": _FDP.TYPE_INT64,
+    "number": _FDP.TYPE_DOUBLE,
+    "boolean": _FDP.TYPE_BOOL,
+}
+# Message full name -> field number -> value converter (see message_to_dict)
+_CONVERTERS: dict[str, dict[int, Callable[[Any], Any]]] = {}
+_TYPE_NAMES = {
+    _FDP.TYPE_STRING: "string",
+    _FDP.TYPE_INT64: "int64",
+    _FDP.TYPE_DOUBLE: "double",
+    _FDP.TYPE_BOOL: "bool",
+}
+
+
+class ContractError(ValueError):
+    """Request does not fit the contract (no capability selected, bad version)."""
+
+
+class MeshContract:
+    """
+    Protobuf message classes for a capability catalog.
+
+    Args:
+        capabilities: Catalog to expose, in field-numbering order
+
+    Raises:
+        ValueError: If a capability schema cannot be expressed in protobuf
+    """
+
+    def __init__(self, capabilities: Sequence[CapabilityDefinition] = CAPABILITY_CATALOG) -> None:
+        self.file_descriptor = _build_file(capabilities)
+        self._pool = descriptor_pool.DescriptorPool()
+        self._pool.AddSerializedFile(struct_pb2.DESCRIPTOR.serialized_pb)
+        self._pool.Add(self.file_descriptor)
+
+        self.InvokeRequest = self._message_class("InvokeRequest")
+        self.InvokeResponse = self._message_class("InvokeResponse")
+        self.ListCapabilitiesRequest = self._message_class("ListCapabilitiesRequest")
+        self.ListCapabilitiesResponse = self._message_class("ListCapabilitiesResponse")
+
+        # oneof member name -> capability, and capability id -> oneof member name
+        self._by_field = {_field_name(c.id): c for c in capabilities}
+        self._field_by_id = {c.id: name for name, c in self._by_field.items()}
+
+    @property
+    def capabilities(self) -> list[CapabilityDefinition]:
+        """Capabilities in the contract, in catalog order."""
+        return list(self._by_field.values())
+
+    def render_proto(self) -> str:
+        """``.proto`` source equivalent to the in-memory descriptors."""
+        return _render_file(self.file_descriptor)
+
+    # --- Server side ---
+
+    def parse_request(self, request: Message, metadata: dict[str, str] | None = None) -> Invocation:
+        """
+        Decode an ``InvokeRequest`` into an invocation.
+
+        Raises:
+            ContractError: If no capability input is set or the requested
+                version is incompatible with the catalog version
+        """
+        selected = request.WhichOneof("input")
+        if selected is None:
+            raise ContractError("InvokeRequest has no capability input set")
+        capability = self._by_field[selected]
+
+        version: str = request.version
+        if version:
+            try:
+                required = CapabilityVersion.parse(version)
+            except ValueError as e:
+                raise ContractError(str(e)) from e
+            if not capability.is_compatible_with(required):
+                raise ContractError(
+                    f"{capability.id} is version {capability.version}, "
+                    f"incompatible with requested {version}"
+                )
+
+        return Invocation(
+            capability=capability,
+            params=message_to_dict(getattr(request, selected)),
+            request_id=request.request_id,
+            metadata=metadata or {},
+        )
+
+    def build_response(
+        self,
+        result: InvocationResult,
+        capability: CapabilityDefinition | None,
+        request_id: str = "",
+    ) -> Message:
+        """
+        Encode an invocation result.
+
+        The result dict is written into the capability's typed output message;
+        results that do not fit the output schema are sent as
+        ``untyped_result`` instead of being dropped.
+        """
+        envelope = {
+            "request_id": request_id,
+            "success": result.success,
+            "receipt_id": result.receipt_id or "",
+            "processing_time_ms": int(result.processing_time_ms or 0),
+            "node_id": result.node_id or "",
+            "errors": result.errors,
+        }
+        if result.result is None:
+            return self.InvokeResponse(**envelope)
+
+        if capability is not None:
+            output = {self._field_by_id[capability.id]: result.result}
+            try:
+                return _build(self.InvokeResponse, **envelope, **output)
+            except (TypeError, ValueError, json_format.Error) as e:
+                logger.debug("%s result does not match output schema: %s", capability.id, e)
+
+        # JSON round trip coerces values Struct cannot hold (datetimes, tuples)
+        untyped = json.loads(json.dumps(result.result, default=str))
+        return self.InvokeResponse(**envelope, untyped_result=untyped)
+
+    def capability_list(self, tag: str = "") -> Message:
+        """``ListCapabilitiesResponse`` for the catalog, optionally filtered by tag."""
+        response = self.ListCapabilitiesResponse()
+        for field_name, capability in self._by_field.items():
+            if tag and tag not in capability.tags:
+                continue
+            entry = response.capabilities.add()
+            entry.id = capability.id
+            entry.version = str(capability.version)
+            entry.name = capability.name
+            entry.description = capability.description
+            entry.tags.extend(capability.tags)
+            entry.requires_gpu = capability.requires_gpu
+            entry.estimated_duration_ms = capability.estimated_duration_ms or 0
+            entry.input_field = field_name
+            for error in capability.contract.error_codes:
+                entry.error_codes.add(
+                    code=error.code, description=error.description, retryable=error.retryable
+                )
+        return response
+
+    # --- Client side ---
+
+    def make_request(
+        self, capability_id: str, params: dict[str, Any], *, request_id: str = "", version: str = ""
+    ) -> Message:
+        """
+        Build an ``InvokeRequest`` for a capability.
+
+        Raises:
+            ContractError: If the capability is not in the contract
+            ValueError: If ``params`` has keys outside the input schema
+            TypeError: If a param has the wrong type
+        """
+        field_name = self._field_by_id.get(capability_id)
+        if field_name is None:
+            raise ContractError(f"Unknown capability {capability_id!r}")
+        return _build(
+            self.InvokeRequest, request_id=request_id, version=version, **{field_name: params}
+        )
+
+    def read_response(self, response: Message) -> InvocationResult:
+        """Decode an ``InvokeResponse`` (typed or untyped result) to a result."""
+        selected = response.WhichOneof("output")
+        result: dict[str, Any] | None = None
+        if selected is not None:
+            result = message_to_dict(getattr(response, selected))
+        elif response.HasField("untyped_result"):
+            result = json_format.MessageToDict(response.untyped_result)
+        return InvocationResult(
+            success=response.success,
+            result=result,
+            receipt_id=response.receipt_id or None,
+            processing_time_ms=response.processing_time_ms,
+            node_id=response.node_id or None,
+            errors=list(response.errors),
+        )
+
+    def _message_class(self, name: str) -> Any:
+        return message_factory.GetMessageClass(
+            self._pool.FindMessageTypeByName(f"{PROTO_PACKAGE}.{name}")
+        )
+
+
+# --- Message <-> dict conversion ---
+
+
+def message_to_dict(message: Message) -> dict[str, Any]:
+    """
+    Convert a message to a plain dict keyed by field name.
+
+    Unlike ``json_format.MessageToDict`` this keeps int64 values as ints and
+    only includes fields that are set. The per-field conversion is resolved
+    once per message type.
+    """
+    converters = _converters(message.DESCRIPTOR)
+    return {
+        descriptor.name: converters[descriptor.number](value)
+        for descriptor, value in message.ListFields()
+    }
+
+
+def _converters(message_type: Descriptor) -> dict[int, Callable[[Any], Any]]:
+    converters = _CONVERTERS.get(message_type.full_name)
+    if converters is None:
+        converters = {field.number: _converter(field) for field in message_type.fields}
+        _CONVERTERS[message_type.full_name] = converters
+    return converters
+
+
+def _converter(field: FieldDescriptor) -> Callable[[Any], Any]:
+    convert: Callable[[Any], Any]
+    if field.message_type is None:
+        return list if field.is_repeated else _identity
+    if field.message_type.full_name in _WELL_KNOWN:
+        convert = json_format.MessageToDict
+    else:
+        convert = message_to_dict
+    if field.is_repeated:
+        return lambda values: [convert(value) for value in values]
+    return convert
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _build(message_class: Any, **fields: Any) -> Message:
+    """
+    Construct a message from plain values.
+
+    The generated constructor converts nested dicts and lists in C; it only
+    refuses bare values for ``Value``/``ListValue`` fields, which fall back
+    to a field-by-field fill.
+    """
+    try:
+        message: Message = message_class(**fields)
+    except TypeError:
+        message = message_class()
+        _fill_message(message, fields)
+    return message
+
+
+def _fill_message(message: Message, data: dict[str, Any]) -> None:
+    fields = message.DESCRIPTOR.fields_by_name
+    for key, value in data.items():
+        descriptor = fields.get(key)
+        if descriptor is None:
+            raise ValueError(f'Protocol message {message.DESCRIPTOR.name} has no "{key}" field.')
+        if value is None:
+            continue
+        if descriptor.message_type is None:
+            if descriptor.is_repeated:
+                getattr(message, key).extend(value)
+            else:
+                setattr(message, key, value)
+        elif descriptor.is_repeated:
+            for item in value:
+                _fill_value(descriptor.message_type, getattr(message, key).add(), item)
+        else:
+            _fill_value(descriptor.message_type, getattr(message, key), value)
+
+
+def _fill_value(message_type: Descriptor, target: Message, value: Any) -> None:
+    if message_type.full_name in _WELL_KNOWN:
+        json_format.ParseDict(value, target)
+    elif isinstance(value, dict):
+        _fill_message(target, value)
+        target.SetInParent()
+    else:
+        raise TypeError(f"Expected an object for {message_type.name}, got {type(value).__name__}")
+
+
+# --- Descriptor construction ---
+
+
+def _field_name(capability_id: str) -> str:
+    return capability_id.replace(".", "_")
+
+
+def _message_name(capability_id: str) -> str:
+    return _camel(_field_name(capability_id))
+
+
+def _camel(name: str) -> str:
+    return "".join(part[:1].upper() + part[1:] for part in name.split("_"))
+
+
+def _build_file(capabilities: Sequence[CapabilityDefinition]) -> descriptor_pb2.FileDescriptorProto:
+    file = descriptor_pb2.FileDescriptorProto(
+        name=PROTO_FILE_NAME,
+        package=PROTO_PACKAGE,
+        syntax="proto3",
+        dependency=["google/protobuf/struct.proto"],
+    )
+
+    request = file.message_type.add(name="InvokeRequest")
+    _add_field(request, "request_id", 1, _FDP.TYPE_STRING)
+    _add_field(request, "version", 2, _FDP.TYPE_STRING)
+    request.oneof_decl.add(name="input")
+
+    response = file.message_type.add(name="InvokeResponse")
+    _add_field(response, "request_id", 1, _FDP.TYPE_STRING)
+    _add_field(response, "success", 2, _FDP.TYPE_BOOL)
+    _add_field(response, "receipt_id", 3, _FDP.TYPE_STRING)
+    _add_field(response, "processing_time_ms", 4, _FDP.TYPE_INT64)
+    _add_field(response, "node_id", 5, _FDP.TYPE_STRING)
+    _add_field(response, "errors", 6, _FDP.TYPE_STRING, repeated=True)
+    _add_field(response, "untyped_result", 7, _FDP.TYPE_MESSAGE, type_name=_STRUCT)
+    response.oneof_decl.add(name="output")
+
+    scope = f".{PROTO_PACKAGE}"
+    seen: set[str] = set()
+    for index, capability in enumerate(capabilities):
+        name = _field_name(capability.id)
+        if not name.isidentifier() or name in seen:
+            raise ValueError(f"Capability id {capability.id!r} does not map to a unique field")
+        seen.add(name)
+
+        message = _message_name(capability.id)
+        number = FIRST_CAPABILITY_FIELD + index
+        _add_schema_message(file, f"{message}Input", capability.contract.input_schema, scope)
+        _add_schema_message(file, f"{message}Output", capability.contract.output_schema, scope)
+        _add_field(
+            request,
+            name,
+            number,
+            _FDP.TYPE_MESSAGE,
+            type_name=f".{PROTO_PACKAGE}.{message}Input",
+            oneof=0,
+        )
+        _add_field(
+            response,
+            name,
+            number,
+            _FDP.TYPE_MESSAGE,
+            type_name=f".{PROTO_PACKAGE}.{message}Output",
+            oneof=0,
+        )
+
+    error_code = file.message_type.add(name="ErrorCode")
+    _add_field(error_code, "code", 1, _FDP.TYPE_STRING)
+    _add_field(error_code, "description", 2, _FDP.TYPE_STRING)
+    _add_field(error_code, "retryable", 3, _FDP.TYPE_BOOL)
+
+    info = file.message_type.add(name="Capability")
+    for number, (name, type_) in enumerate(
+        [
+            ("id", _FDP.TYPE_STRING),
+            ("version", _FDP.TYPE_STRING),
+            ("name", _FDP.TYPE_STRING),
+            ("description", _FDP.TYPE_STRING),
+            ("requires_gpu", _FDP.TYPE_BOOL),
+            ("estimated_duration_ms", _FDP.TYPE_INT64),
+            ("input_field", _FDP.TYPE_STRING),  # InvokeRequest.input member to set
+        ],
+        start=1,
+    ):
+        _add_field(info, name, number, type_)
+    _add_field(info, "tags", 8, _FDP.TYPE_STRING, repeated=True)
+    _add_field(
+        info,
+        "error_codes",
+        9,
+        _FDP.TYPE_MESSAGE,
+        type_name=f".{PROTO_PACKAGE}.ErrorCode",
+        repeated=True,
+    )
+
+    list_request = file.message_type.add(name="ListCapabilitiesRequest")
+    _add_field(list_request, "tag", 1, _FDP.TYPE_STRING)  # Empty lists everything
+    list_response = file.message_type.add(name="ListCapabilitiesResponse")
+    _add_field(
+        list_response,
+        "capabilities",
+        1,
+        _FDP.TYPE_MESSAGE,
+        type_name=f".{PROTO_PACKAGE}.Capability",
+        repeated=True,
+    )
+
+    service = file.service.add(name="Mesh")
+    for method, request_type, response_type, streaming in [
+        ("Invoke", "InvokeRequest", "InvokeResponse", False),
+        ("InvokeStream", "InvokeRequest", "InvokeResponse", True),
+        ("ListCapabilities", "ListCapabilitiesRequest", "ListCapabilitiesResponse", False),
+    ]:
+        service.method.add(
+            name=method,
+            input_type=f".{PROTO_PACKAGE}.{request_type}",
+            output_type=f".{PROTO_PACKAGE}.{response_type}",
+            client_streaming=streaming,
+            server_streaming=streaming,
+        )
+    return file
+
+
+def _add_field(
+    message: descriptor_pb2.DescriptorProto,
+    name: str,
+    number: int,
+    type_: int,
+    *,
+    type_name: str = "",
+    repeated: bool = False,
+    oneof: int | None = None,
+    optional: bool = False,
+) -> None:
+    field_proto = message.field.add(
+        name=name,
+        number=number,
+        type=type_,
+        label=_FDP.LABEL_REPEATED if repeated else _FDP.LABEL_OPTIONAL,
+    )
+    if type_name:
+        field_proto.type_name = type_name
+    if oneof is not None:
+        field_proto.oneof_index = oneof
+    elif optional:
+        # proto3 `optional` is a synthetic single-member oneof
+        field_proto.proto3_optional = True
+        field_proto.oneof_index = len(message.oneof_decl)
+        message.oneof_decl.add(name=f"_{name}")
+
+
+def _add_schema_message(
+    parent: descriptor_pb2.FileDescriptorProto | descriptor_pb2.DescriptorProto,
+    name: str,
+    schema: dict[str, Any],
+    scope: str,
+) -> str:
+    """Add a message for an object schema to ``parent``; return its full type name."""
+    if isinstance(parent, descriptor_pb2.FileDescriptorProto):
+        message = parent.message_type.add(name=name)
+    else:
+        message = parent.nested_type.add(name=name)
+    full_name = f"{scope}.{name}"
+
+    for number, (prop, prop_schema) in enumerate(schema.get("properties", {}).items(), start=1):
+        if not prop.isidentifier():
+            raise ValueError(f"{name}: property {prop!r} is not a valid protobuf field name")
+        repeated = prop_schema.get("type") == "array"
+        item = prop_schema.get("items", {}) if repeated else prop_schema
+        item_type = item.get("type")
+
+        if repeated and item_type == "array":
+            _add_field(message, prop, number, _FDP.TYPE_MESSAGE, type_name=_LIST_VALUE)
+        elif item_type in _SCALAR_TYPES:
+            _add_field(
+                message,
+                prop,
+                number,
+                _SCALAR_TYPES[item_type],
+                repeated=repeated,
+                optional=not repeated,
+            )
+        elif (
+            item_type == "object"
+            and item.get("properties")
+            and not item.get("additionalProperties")
+        ):
+            nested = _add_schema_message(
+                message, _camel(prop) + ("Item" if repeated else ""), item, full_name
+            )
+            _add_field(
+                message, prop, number, _FDP.TYPE_MESSAGE, type_name=nested, repeated=repeated
+            )
+        elif item_type == "object":
+            _add_field(
+                message, prop, number, _FDP.TYPE_MESSAGE, type_name=_STRUCT, repeated=repeated
+            )
+        else:
+            _add_field(
+                message, prop, number, _FDP.TYPE_MESSAGE, type_name=_VALUE, repeated=repeated
+            )
+    return full_name
+
+
+# --- .proto rendering ---
+
+
+def _render_file(file: descriptor_pb2.FileDescriptorProto) -> str:
+    lines = [
+        "// Generated from crank.capabilities.schema by crank.protocols.mesh_contract.",
+        "// Do not edit; regenerate with `python -m crank.protocols.mesh_contract`.",
+        f'syntax = "{file.syntax}";',
+        "",
+        f"package {file.package};",
+        "",
+    ]
+    lines.extend(f'import "{dependency}";' for dependency in file.dependency)
+    for message in file.message_type:
+        lines.append("")
+        lines.extend(_render_message(message, file.package, ""))
+    for service in file.service:
+        lines.append("")
+        lines.append(f"service {service.name} {{")
+        for method in service.method:
+            request = _type_ref(method.input_type, file.package)
+            response = _type_ref(method.output_type, file.package)
+            stream_in = "stream " if method.client_streaming else ""
+            stream_out = "stream " if method.server_streaming else ""
+            lines.append(
+                f"  rpc {method.name}({stream_in}{request}) returns ({stream_out}{response});"
+            )
+        lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _render_message(
+    message: descriptor_pb2.DescriptorProto, package: str, indent: str
+) -> list[str]:
+    lines = [f"{indent}message {message.name} {{"]
+    inner = indent + "  "
+    for nested in message.nested_type:
+        lines.extend(_render_message(nested, package, inner))
+
+    real_oneofs: dict[int, list[str]] = {}
+    for field_proto in message.field:
+        if field_proto.HasField("oneof_index") and not field_proto.proto3_optional:
+            real_oneofs.setdefault(field_proto.oneof_index, []).append(
+                _render_field(field_proto, package)
+            )
+            continue
+        label = ""
+        if field_proto.label == _FDP.LABEL_REPEATED:
+            label = "repeated "
+        elif field_proto.proto3_optional:
+            label = "optional "
+        lines.append(f"{inner}{label}{_render_field(field_proto, package)}")
+
+    for index, members in real_oneofs.items():
+        lines.append(f"{inner}oneof {message.oneof_decl[index].name} {{")
+        lines.extend(f"{inner}  {member}" for member in members)
+        lines.append(f"{inner}}}")
+    lines.append(f"{indent}}}")
+    return lines
+
+
+def _render_field(field_proto: descriptor_pb2.FieldDescriptorProto, package: str) -> str:
+    if field_proto.type == _FDP.TYPE_MESSAGE:
+        type_ = _type_ref(field_proto.type_name, package)
+    else:
+        type_ = _TYPE_NAMES[field_proto.type]
+    return f"{type_} {field_proto.name} = {field_proto.number};"
+
+
+def _type_ref(type_name: str, package: str) -> str:
+    return type_name.removeprefix(f".{package}.").lstrip(".")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    print(MeshContract().render_proto(), end="")
@@ -0,0 +1,569 @@
+"""
+ONC-RPC over TCP (RFC 5531)
+
+Protocol engine for legacy RPC clients:
+- Record marking: fragments are reassembled per connection (RFC 5531 §11)
+- Call headers, credentials and replies encoded with ``crank.protocols.xdr``
+- Pipelining: every complete call is dispatched as its own task, and replies
+  are written as they finish, matched by xid (out of order is allowed)
+- Backpressure: reading pauses while too many calls are in flight or the
+  transport's write buffer is full
+
+The server only handles transport and RPC framing; the application supplies
+an async handler that receives an ``RPCCall`` and returns the XDR-encoded
+result body. Handlers signal RPC-level failures (unknown program,
+procedure, bad arguments) by raising ``RPCReplyError``.
+"""
+
+import asyncio
+import logging
+import struct
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any
+
+from crank.protocols.xdr import XDRDecoder, XDREncoder, XDRError
+
+logger = logging.getLogger(__name__)
+
+RPC_VERSION = 2
+LAST_FRAGMENT = 0x80000000
+MAX_FRAGMENT_SIZE = 0x7FFFFFFF
+DEFAULT_MAX_RECORD_SIZE = 16 * 1024 * 1024
+DEFAULT_MAX_INFLIGHT = 1024
+MAX_AUTH_BYTES = 400  # RFC 5531 opaque_auth body limit
+
+_RECORD_MARK = struct.Struct(">I")
+
+
+class MessageType(IntEnum):
+    """RPC message direction."""
+
+    CALL = 0
+    REPLY = 1
+
+
+class AuthFlavor(IntEnum):
+    """Credential and verifier flavors."""
+
+    NONE = 0
+    SYS = 1
+    SHORT = 2
+    DH = 3
+    RPCSEC_GSS = 6
+
+
+class ReplyStatus(IntEnum):
+    """Whether the server accepted the call."""
+
+    MSG_ACCEPTED = 0
+    MSG_DENIED = 1
+
+
+class AcceptStatus(IntEnum):
+    """Outcome of an accepted call."""
+
+    SUCCESS = 0
+    PROG_UNAVAIL = 1
+    PROG_MISMATCH = 2
+    PROC_UNAVAIL = 3
+    GARBAGE_ARGS = 4
+    SYSTEM_ERR = 5
+
+
+class RejectStatus(IntEnum):
+    """Reason a call was denied."""
+
+    RPC_MISMATCH = 0
+    AUTH_ERROR = 1
+
+
+class AuthStatus(IntEnum):
+    """Authentication failure detail for AUTH_ERROR replies."""
+
+    AUTH_OK = 0
+    AUTH_BADCRED = 1
+    AUTH_REJECTEDCRED = 2
+    AUTH_BADVERF = 3
+    AUTH_REJECTEDVERF = 4
+    AUTH_TOOWEAK = 5
+
+
+class RPCDecodeError(XDRError):
+    """Call header could not be decoded.
+
+    ``xid`` is set when it was read before the failure, so a GARBAGE_ARGS
+    reply can still be sent.
+    """
+
+    def __init__(self, message: str, xid: int | None = None) -> None:
+        super().__init__(message)
+        self.xid = xid
+
+
+class RPCReplyError(Exception):
+    """Raised by handlers to send a non-SUCCESS reply.
+
+    Args:
+        status: Accept status to reply with
+        mismatch: (low, high) supported versions for PROG_MISMATCH
+        auth_status: If set, the call is denied with AUTH_ERROR instead
+    """
+
+    def __init__(
+        self,
+        status: AcceptStatus = AcceptStatus.SYSTEM_ERR,
+        *,
+        mismatch: tuple[int, int] | None = None,
+        auth_status: AuthStatus | None = None,
+    ) -> None:
+        super().__init__(status.name if auth_status is None else auth_status.name)
+        self.status = status
+        self.mismatch = mismatch
+        self.auth_status = auth_status
+
+
+@dataclass(frozen=True, slots=True)
+class OpaqueAuth:
+    """Credential or verifier: flavor plus opaque body."""
+
+    flavor: int
+    body: bytes
+
+
+NULL_AUTH = OpaqueAuth(AuthFlavor.NONE, b"")
+
+
+@dataclass(frozen=True, slots=True)
+class AuthSys:
+    """Decoded AUTH_SYS (AUTH_UNIX) credential body."""
+
+    stamp: int
+    machine_name: str
+    uid: int
+    gid: int
+    gids: tuple[int, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class RPCCall:
+    """One decoded call; ``args`` is a zero-copy view of the argument bytes."""
+
+    xid: int
+    rpc_version: int
+    program: int
+    version: int
+    procedure: int
+    credential: OpaqueAuth
+    verifier: OpaqueAuth
+    args: memoryview
+
+    def auth_sys(self) -> AuthSys | None:
+        """Decode the credential if it is AUTH_SYS.
+
+        Raises:
+            RPCReplyError: AUTH_BADCRED if the AUTH_SYS body is malformed
+        """
+        if self.credential.flavor != AuthFlavor.SYS:
+            return None
+        try:
+            decoder = XDRDecoder(self.credential.body)
+            auth = AuthSys(
+                stamp=decoder.unpack_uint(),
+                machine_name=decoder.unpack_string(255),
+                uid=decoder.unpack_uint(),
+                gid=decoder.unpack_uint(),
+                gids=tuple(decoder.unpack_array(decoder.unpack_uint, 16)),
+            )
+            decoder.done()
+        except XDRError as e:
+            raise RPCReplyError(auth_status=AuthStatus.AUTH_BADCRED) from e
+        return auth
+
+
+RPCHandler = Callable[[RPCCall], Awaitable[bytes]]
+
+
+# --- Message encoding ---
+
+
+def decode_call(record: bytes | bytearray | memoryview) -> RPCCall:
+    """
+    Decode an RPC call message (one reassembled record).
+
+    Raises:
+        RPCDecodeError: If the header is malformed or the message is not a call
+    """
+    decoder = XDRDecoder(record)
+    xid: int | None = None
+    try:
+        xid = decoder.unpack_uint()
+        msg_type = decoder.unpack_int()
+        if msg_type != MessageType.CALL:
+            raise RPCDecodeError(f"Expected CALL message, got type {msg_type}", xid)
+        rpc_version = decoder.unpack_uint()
+        program = decoder.unpack_uint()
+        version = decoder.unpack_uint()
+        procedure = decoder.unpack_uint()
+        credential = _unpack_auth(decoder)
+        verifier = _unpack_auth(decoder)
+    except RPCDecodeError:
+        raise
+    except XDRError as e:
+        raise RPCDecodeError(str(e), xid) from e
+
+    return RPCCall(
+        xid=xid,
+        rpc_version=rpc_version,
+        program=program,
+        version=version,
+        procedure=procedure,
+        credential=credential,
+        verifier=verifier,
+        args=decoder.rest(),
+    )
+
+
+def encode_call(
+    xid: int,
+    program: int,
+    version: int,
+    procedure: int,
+    args: bytes = b"",
+    credential: OpaqueAuth = NULL_AUTH,
+    verifier: OpaqueAuth = NULL_AUTH,
+) -> bytes:
+    """Encode a call message (client side; used by tests and tooling)."""
+    encoder = XDREncoder()
+    encoder.pack_uint(xid)
+    encoder.pack_int(MessageType.CALL)
+    encoder.pack_uint(RPC_VERSION)
+    encoder.pack_uint(program)
+    encoder.pack_uint(version)
+    encoder.pack_uint(procedure)
+    _pack_auth(encoder, credential)
+    _pack_auth(encoder, verifier)
+    encoder.pack_fixed_opaque(args)
+    return encoder.getvalue()
+
+
+def encode_auth_sys(
+    uid: int, gid: int, machine_name: str = "", gids: tuple[int, ...] = (), stamp: int = 0
+) -> OpaqueAuth:
+    """Build an AUTH_SYS credential."""
+    encoder = XDREncoder()
+    encoder.pack_uint(stamp)
+    encoder.pack_string(machine_name)
+    encoder.pack_uint(uid)
+    encoder.pack_uint(gid)
+    encoder.pack_array(gids, encoder.pack_uint)
+    return OpaqueAuth(AuthFlavor.SYS, encoder.getvalue())
+
+
+def encode_accepted_reply(
+    xid: int,
+    status: AcceptStatus = AcceptStatus.SUCCESS,
+    body: bytes = b"",
+    *,
+    mismatch: tuple[int, int] | None = None,
+    verifier: OpaqueAuth = NULL_AUTH,
+) -> bytes:
+    """Encode a MSG_ACCEPTED reply; ``body`` is the XDR result for SUCCESS."""
+    encoder = XDREncoder()
+    encoder.pack_uint(xid)
+    encoder.pack_int(MessageType.REPLY)
+    encoder.pack_int(ReplyStatus.MSG_ACCEPTED)
+    _pack_auth(encoder, verifier)
+    encoder.pack_int(status)
+    if status == AcceptStatus.SUCCESS:
+        encoder.pack_fixed_opaque(body)
+    elif status == AcceptStatus.PROG_MISMATCH:
+        low, high = mismatch or (0, 0)
+        encoder.pack_uint(low)
+        encoder.pack_uint(high)
+    return encoder.getvalue()
+
+
+def encode_rejected_reply(
+    xid: int,
+    status: RejectStatus,
+    *,
+    mismatch: tuple[int, int] = (RPC_VERSION, RPC_VERSION),
+    auth_status: AuthStatus = AuthStatus.AUTH_BADCRED,
+) -> bytes:
+    """Encode a MSG_DENIED reply (RPC version mismatch or auth error)."""
+    encoder = XDREncoder()
+    encoder.pack_uint(xid)
+    encoder.pack_int(MessageType.REPLY)
+    encoder.pack_int(ReplyStatus.MSG_DENIED)
+    encoder.pack_int(status)
+    if status == RejectStatus.RPC_MISMATCH:
+        encoder.pack_uint(mismatch[0])
+        encoder.pack_uint(mismatch[1])
+    else:
+        encoder.pack_int(auth_status)
+    return encoder.getvalue()
+
+
+def decode_reply(record: bytes | bytearray | memoryview) -> tuple[int, int, int, memoryview]:
+    """
+    Decode a reply header (client side).
+
+    Returns:
+        (xid, reply_status, accept_or_reject_status, remaining body view)
+    """
+    decoder = XDRDecoder(record)
+    xid = decoder.unpack_uint()
+    if decoder.unpack_int() != MessageType.REPLY:
+        raise XDRError("Expected REPLY message")
+    reply_status = decoder.unpack_int()
+    if reply_status == ReplyStatus.MSG_ACCEPTED:
+        _unpack_auth(decoder)
+    status = decoder.unpack_int()
+    return xid, reply_status, status, decoder.rest()
+
+
+def frame_record(message: bytes, max_fragment: int = MAX_FRAGMENT_SIZE) -> bytes:
+    """Wrap a message in record marking, splitting into fragments if needed."""
+    if len(message) <= max_fragment:
+        return _RECORD_MARK.pack(LAST_FRAGMENT | len(message)) + message
+    parts: list[bytes] = []
+    view = memoryview(message)
+    for start in range(0, len(message), max_fragment):
+        chunk = view[start : start + max_fragment]
+        last = start + max_fragment >= len(message)
+        parts.append(_RECORD_MARK.pack((LAST_FRAGMENT if last else 0) | len(chunk)))
+        parts.append(bytes(chunk))
+    return b"".join(parts)
+
+
+def _unpack_auth(decoder: XDRDecoder) -> OpaqueAuth:
+    flavor = decoder.unpack_int()
+    return OpaqueAuth(flavor, bytes(decoder.unpack_opaque(MAX_AUTH_BYTES)))
+
+
+def _pack_auth(encoder: XDREncoder, auth: OpaqueAuth) -> None:
+    encoder.pack_int(auth.flavor)
+    encoder.pack_opaque(auth.body)
+
+
+# --- Record marking ---
+
+
+class RecordReassembler:
+    """
+    Incremental record-marking parser.
+
+    ``feed()`` accepts arbitrary TCP chunks and returns every record that
+    became complete. Single-fragment records (the common case) are sliced
+    out of the receive buffer once; multi-fragment records are joined.
+    """
+
+    __slots__ = ("_buffer", "_fragments", "_fragments_size", "_offset", "max_record_size")
+
+    def __init__(self, max_record_size: int = DEFAULT_MAX_RECORD_SIZE) -> None:
+        self.max_record_size = max_record_size
+        self._buffer = bytearray()
+        self._offset = 0
+        self._fragments: list[bytes] = []
+        self._fragments_size = 0
+
+    def feed(self, data: bytes) -> list[bytes]:
+        """
+        Add received bytes and return completed records.
+
+        Raises:
+            RPCDecodeError: If a record exceeds ``max_record_size``
+        """
+        self._buffer += data
+        records: list[bytes] = []
+        buffer = self._buffer
+
+        # Fragments are copied straight out of a view; the view is released
+        # before the buffer is compacted or grown
+        with memoryview(buffer) as view:
+            while len(buffer) - self._offset >= 4:
+                (mark,) = _RECORD_MARK.unpack_from(buffer, self._offset)
+                length = mark & MAX_FRAGMENT_SIZE
+                if self._fragments_size + length > self.max_record_size:
+                    raise RPCDecodeError(f"Record exceeds {self.max_record_size} bytes")
+                start = self._offset + 4
+                end = start + length
+                if end > len(buffer):
+                    break
+
+                fragment = bytes(view[start:end])
+                self._offset = end
+                if mark & LAST_FRAGMENT:
+                    if self._fragments:
+                        self._fragments.append(fragment)
+                        fragment = b"".join(self._fragments)
+                        self._fragments.clear()
+                        self._fragments_size = 0
+                    records.append(fragment)
+                else:
+                    self._fragments.append(fragment)
+                    self._fragments_size += length
+
+        # Compact once consumed data dominates, so large buffers are not moved per record
+        if self._offset and self._offset * 2 >= len(buffer):
+            del buffer[: self._offset]
+            self._offset = 0
+        return records
+
+
+# --- Server ---
+
+
+class ONCRPCProtocol(asyncio.Protocol):
+    """One TCP connection: reassembles records and dispatches calls concurrently."""
+
+    def __init__(
+        self,
+        handler: RPCHandler,
+        *,
+        max_inflight: int = DEFAULT_MAX_INFLIGHT,
+        max_record_size: int = DEFAULT_MAX_RECORD_SIZE,
+    ) -> None:
+        self._handler = handler
+        self._max_inflight = max_inflight
+        self._reassembler = RecordReassembler(max_record_size)
+        self._transport: asyncio.Transport | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._reading_paused = False
+        self._writing_paused = False
+        self.calls_received = 0
+        self.replies_sent = 0
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        """Remember the transport for replies."""
+        assert isinstance(transport, asyncio.Transport)
+        self._transport = transport
+
+    def data_received(self, data: bytes) -> None:
+        """Reassemble records and start a task per call."""
+        try:
+            records = self._reassembler.feed(data)
+        except RPCDecodeError as e:
+            logger.warning("Closing ONC-RPC connection: %s", e)
+            self._close()
+            return
+
+        for record in records:
+            self.calls_received += 1
+            task = asyncio.get_running_loop().create_task(self._dispatch(record))
+            self._tasks.add(task)
+            task.add_done_callback(self._call_finished)
+        self._update_flow_control()
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        """Cancel calls whose replies can no longer be delivered."""
+        self._transport = None
+        for task in self._tasks:
+            task.cancel()
+
+    def pause_writing(self) -> None:
+        """Transport buffer is full: stop accepting new calls."""
+        self._writing_paused = True
+        self._update_flow_control()
+
+    def resume_writing(self) -> None:
+        """Transport buffer drained."""
+        self._writing_paused = False
+        self._update_flow_control()
+
+    async def _dispatch(self, record: bytes) -> None:
+        reply = await handle_call_record(self._handler, record)
+        if reply is not None and self._transport is not None:
+            self._transport.write(frame_record(reply))
+            self.replies_sent += 1
+
+    def _call_finished(self, task: "asyncio.Task[None]") -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("ONC-RPC dispatch failed", exc_info=task.exception())
+        self._update_flow_control()
+
+    def _update_flow_control(self) -> None:
+        if self._transport is None:
+            return
+        should_pause = self._writing_paused or len(self._tasks) >= self._max_inflight
+        if should_pause and not self._reading_paused:
+            self._transport.pause_reading()
+            self._reading_paused = True
+        elif not should_pause and self._reading_paused:
+            self._transport.resume_reading()
+            self._reading_paused = False
+
+    def _close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+
+
+async def handle_call_record(handler: RPCHandler, record: bytes) -> bytes | None:
+    """
+    Decode one call record, run the handler and build the reply message.
+
+    Returns None when no reply can be sent (the xid could not be read or
+    the message was not a call).
+    """
+    try:
+        call = decode_call(record)
+    except RPCDecodeError as e:
+        if e.xid is None:
+            logger.warning("Dropping undecodable ONC-RPC record: %s", e)
+            return None
+        return encode_accepted_reply(e.xid, AcceptStatus.GARBAGE_ARGS)
+
+    if call.rpc_version != RPC_VERSION:
+        return encode_rejected_reply(call.xid, RejectStatus.RPC_MISMATCH)
+
+    try:
+        body = await handler(call)
+    except RPCReplyError as e:
+        if e.auth_status is not None:
+            return encode_rejected_reply(
+                call.xid, RejectStatus.AUTH_ERROR, auth_status=e.auth_status
+            )
+        return encode_accepted_reply(call.xid, e.status, mismatch=e.mismatch)
+    except XDRError:
+        return encode_accepted_reply(call.xid, AcceptStatus.GARBAGE_ARGS)
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        logger.exception("ONC-RPC handler failed for xid %d", call.xid)
+        return encode_accepted_reply(call.xid, AcceptStatus.SYSTEM_ERR)
+    return encode_accepted_reply(call.xid, AcceptStatus.SUCCESS, body)
+
+
+async def start_onc_rpc_server(
+    handler: RPCHandler,
+    host: str = "0.0.0.0",
+    port: int = 0,
+    *,
+    max_inflight: int = DEFAULT_MAX_INFLIGHT,
+    max_record_size: int = DEFAULT_MAX_RECORD_SIZE,
+    **server_kwargs: Any,
+) -> asyncio.Server:
+    """
+    Listen for ONC-RPC over TCP.
+
+    Args:
+        handler: Coroutine returning the XDR result body for a call
+        host: Bind address
+        port: Bind port (0 picks a free port; see ``server.sockets``)
+        max_inflight: Concurrent calls per connection before reading pauses
+        max_record_size: Largest accepted record; larger ones close the connection
+        **server_kwargs: Passed to ``loop.create_server`` (e.g. ``ssl``)
+
+    Returns:
+        The started server (use ``async with server`` or ``server.close()``)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.create_server(
+        lambda: ONCRPCProtocol(handler, max_inflight=max_inflight, max_record_size=max_record_size),
+        host,
+        port,
+        **server_kwargs,
+    )
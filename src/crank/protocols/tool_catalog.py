@@ -0,0 +1,87 @@
+"""
+Tool Catalog
+
+Agent-facing tool definitions (MCP ``tools/list``) built once and served
+from cache:
+- The definitions are built on first use from whatever is registered, and
+  rebuilt only after ``invalidate()`` (called when the registry changes)
+- The ``{"tools": [...]}`` document is serialized once into bytes with a
+  strong ``ETag``, so discovery endpoints answer ``If-None-Match`` with 304
+  and otherwise send the cached bytes as-is
+"""
+
+import hashlib
+import json
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from fastapi.responses import Response
+
+logger = logging.getLogger(__name__)
+
+ToolBuilder = Callable[[], list[dict[str, Any]]]
+
+
+class ToolCatalog:
+    """
+    Lazily built, cached tool list.
+
+    Args:
+        build: Returns the tool definitions; called on first use and again
+            after each ``invalidate()``
+
+    The list returned by ``tools`` is shared between callers; treat it as
+    read-only.
+    """
+
+    def __init__(self, build: ToolBuilder) -> None:
+        self._build = build
+        self._tools: list[dict[str, Any]] | None = None
+        self._body: bytes | None = None
+        self._etag: str | None = None
+        self.builds = 0  # Times the definitions were (re)built
+
+    def invalidate(self) -> None:
+        """Drop the cached definitions; the next access rebuilds them."""
+        self._tools = None
+        self._body = None
+        self._etag = None
+
+    @property
+    def tools(self) -> list[dict[str, Any]]:
+        """Tool definitions."""
+        if self._tools is None:
+            self._tools = self._build()
+            self.builds += 1
+            logger.debug("Built tool catalog (%d tools)", len(self._tools))
+        return self._tools
+
+    @property
+    def body(self) -> bytes:
+        """The ``{"tools": [...]}`` document as JSON bytes."""
+        if self._body is None:
+            document = {"tools": self.tools}
+            self._body = json.dumps(document, separators=(",", ":")).encode("utf-8")
+        return self._body
+
+    @property
+    def etag(self) -> str:
+        """Strong entity tag of ``body``."""
+        if self._etag is None:
+            self._etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        return self._etag
+
+    def matches(self, if_none_match: str | None) -> bool:
+        """Whether an ``If-None-Match`` header covers the current catalog."""
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or self.etag in tags
+
+    def http_response(self, if_none_match: str | None = None) -> Response:
+        """200 with the cached body, or 304 when the client's copy is current."""
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if self.matches(if_none_match):
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
@@ -0,0 +1,36 @@
+"""
+Crank Search Package
+
+Shared search infrastructure for knowledge workers. Provides:
+- Full-text inverted index with BM25 ranking (zettel content search)
+- Tokenization shared by indexing and query paths
+- Dense vector index (exact flat or IVF) for embedding similarity search
+
+Both zettel workers (Sonnet manager and Codex repository) use the same index
+so search behaviour stays consistent regardless of which worker stored a note.
+
+Usage:
+    from crank.search import InvertedIndex
+
+    index = InvertedIndex()
+    index.add("zk-001", "Capability routing in the controller")
+    hits = index.search("controller routing", limit=10)
+
+    from crank.search import VectorIndex
+
+    vectors = VectorIndex(dimension=512)
+    vectors.add(["img-001"], clip_embeddings)
+    nearest = vectors.search(query_embedding, k=5)[0]
+"""
+
+from crank.search.inverted_index import InvertedIndex, SearchHit, tokenize
+from crank.search.vector_index import IVFVectorIndex, VectorHit, VectorIndex
+
+__all__: list[str] = [
+    "IVFVectorIndex",
+    "InvertedIndex",
+    "SearchHit",
+    "VectorHit",
+    "VectorIndex",
+    "tokenize",
+]
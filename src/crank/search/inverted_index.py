@@ -0,0 +1,816 @@
+"""
+Inverted Index with BM25 Ranking
+
+In-memory full-text index shared by the zettel workers.
+
+Design:
+- Documents are identified externally by a string key (zettel ID) and
+  internally by a dense, monotonically increasing document number
+- Each term maps to a postings list stored as compact ``array('I')``
+  buffers: delta-encoded document numbers and term frequencies
+- Because document numbers only grow, incremental adds append to the end
+  of each postings list without re-encoding
+- Postings are grouped into fixed-size blocks. Each block keeps a skip
+  pointer (the document number preceding it) and the maximum BM25 impact
+  of its postings, so queries decode and score only blocks that can still
+  reach the current top-k (block-max / MaxScore pruning)
+- Queries whose every term is very common (block bounds barely separate
+  postings there) take an impact-ordered path instead: each long postings
+  list caches its highest-impact postings as a tier, and candidates from
+  the tiers are scored exactly until the threshold algorithm's bound proves
+  the top-k. The bound is checked up to ``tier_depth`` postings per term;
+  past that the best exactly scored candidates are returned (the only case
+  in which results can differ from exhaustive BM25)
+- Removals (and re-adds of an existing key) tombstone the old document
+  number; postings are rewritten by ``compact()`` once tombstones pile up.
+  Like Lucene, document frequencies include tombstones until compaction.
+
+The index is not thread-safe. Workers call it from the event loop only.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import re
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+logger = logging.getLogger(__name__)
+
+# Word characters excluding underscore, so snake_case splits into terms
+_TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+# ``array('I')`` is a C unsigned int; ``np.uintc`` is the matching NumPy dtype
+_POSTING_TYPECODE = "I"
+_POSTING_DTYPE = np.uintc
+
+# Postings per block (skip pointer + max impact granularity)
+_BLOCK_SIZE = 128
+_BLOCK_OFFSETS = np.arange(_BLOCK_SIZE, dtype=np.int64)
+
+# Block impacts are stored as float32; widen bounds so rounding never prunes a hit
+_BOUND_SLACK = 1.0001
+
+# Impact tiers are rebuilt once this many postings were appended after them
+_TIER_TAIL = 2048
+
+# Terms a tiered search can track (one bit each in a uint32)
+_TIER_MAX_TERMS = 32
+
+# Candidates resolved when a tiered search reaches ``tier_depth`` unbounded
+_TIER_RESOLVE_BUDGET = 1024
+
+IntArray = npt.NDArray[np.int64]
+FloatArray = npt.NDArray[np.float64]
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split text into case-folded alphanumeric terms.
+
+    The same function is used for indexing and querying so both sides
+    always agree on term boundaries.
+
+    Args:
+        text: Raw text (markdown is fine; punctuation is discarded)
+
+    Returns:
+        List of terms in document order (duplicates preserved)
+    """
+    return _TOKEN_PATTERN.findall(text.casefold())
+
+
+@dataclass(frozen=True)
+class _ImpactTier:
+    """
+    Highest-impact postings of one list, in descending impact order.
+
+    Impacts are BM25 term-frequency components (no idf) at ``avg_length``.
+    Every posting before ``covered`` that is not in the tier has an impact
+    of at most ``floor``; postings appended later are not ranked.
+    """
+
+    doc_ids: npt.NDArray[Any]
+    positions: npt.NDArray[Any]
+    impacts: npt.NDArray[np.float32]
+    floor: float
+    avg_length: float
+    covered: int
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """Single ranked search result."""
+
+    doc_key: str
+    score: float
+
+
+class _PostingsList:
+    """
+    Postings for one term.
+
+    ``block_max`` holds each block's largest BM25 term-frequency component
+    (the score without idf) computed at the average document length seen when
+    the posting was added; ``block_avg`` holds the smallest such average.
+    A larger average at query time can only raise a score by the ratio of
+    the averages, which gives a safe upper bound without re-scoring.
+    """
+
+    __slots__ = ("block_avg", "block_base", "block_max", "deltas", "freqs", "last_doc", "tier")
+
+    def __init__(self) -> None:
+        self.deltas = array(_POSTING_TYPECODE)
+        self.freqs = array(_POSTING_TYPECODE)
+        self.block_base = array(_POSTING_TYPECODE)
+        self.block_max = array("f")
+        self.block_avg = array("f")
+        self.last_doc = 0
+        self.tier: _ImpactTier | None = None
+
+    def __len__(self) -> int:
+        return len(self.deltas)
+
+    def append(self, doc: int, freq: int, impact: float, avg_length: float) -> None:
+        """Append a posting (``doc`` must exceed every existing entry)."""
+        if len(self.deltas) % _BLOCK_SIZE == 0:
+            self.block_base.append(self.last_doc)
+            self.block_max.append(impact)
+            self.block_avg.append(avg_length)
+        else:
+            if impact > self.block_max[-1]:
+                self.block_max[-1] = impact
+            if avg_length < self.block_avg[-1]:
+                self.block_avg[-1] = avg_length
+
+        self.deltas.append(doc - self.last_doc)
+        self.freqs.append(freq)
+        self.last_doc = doc
+
+    def extend(
+        self,
+        doc_ids: IntArray,
+        freqs: npt.NDArray[Any],
+        impacts: FloatArray,
+        avg_length: float,
+    ) -> None:
+        """Bulk-load an empty list from sorted absolute document numbers."""
+        starts = np.arange(0, doc_ids.size, _BLOCK_SIZE)
+        base = np.concatenate(([0], doc_ids[starts[1:] - 1]))
+
+        self.deltas.frombytes(np.diff(doc_ids, prepend=0).astype(_POSTING_DTYPE).tobytes())
+        self.freqs.frombytes(freqs.astype(_POSTING_DTYPE).tobytes())
+        self.block_base.frombytes(base.astype(_POSTING_DTYPE).tobytes())
+        self.block_max.frombytes(np.maximum.reduceat(impacts, starts).astype(np.float32).tobytes())
+        self.block_avg.frombytes(np.full(starts.size, avg_length, dtype=np.float32).tobytes())
+        self.last_doc = int(doc_ids[-1])
+
+    def doc_ids(self) -> IntArray:
+        """Decode every absolute document number."""
+        return np.cumsum(np.frombuffer(self.deltas, dtype=_POSTING_DTYPE), dtype=np.int64)
+
+    def decode_blocks(self, blocks: IntArray) -> tuple[IntArray, IntArray]:
+        """
+        Decode selected blocks via their skip pointers.
+
+        Args:
+            blocks: Sorted block indexes
+
+        Returns:
+            (document numbers, posting positions), both ascending
+        """
+        size = len(self.deltas)
+        positions = (blocks[:, None] * _BLOCK_SIZE + _BLOCK_OFFSETS[None, :]).ravel()
+        valid = positions < size
+        deltas = np.frombuffer(self.deltas, dtype=_POSTING_DTYPE)[np.minimum(positions, size - 1)]
+        deltas[~valid] = 0
+
+        base = np.frombuffer(self.block_base, dtype=_POSTING_DTYPE)[blocks].astype(np.int64)
+        doc_ids = np.cumsum(deltas.reshape(-1, _BLOCK_SIZE), axis=1, dtype=np.int64)
+        doc_ids += base[:, None]
+        return doc_ids.ravel()[valid], positions[valid]
+
+    def decode_from(self, start: int) -> tuple[IntArray, IntArray]:
+        """Decode postings from position ``start`` to the end of the list."""
+        blocks = np.arange(start // _BLOCK_SIZE, self.block_count, dtype=np.int64)
+        doc_ids, positions = self.decode_blocks(blocks)
+        keep = positions >= start
+        return doc_ids[keep], positions[keep]
+
+    def block_of(self, doc_ids: IntArray) -> IntArray:
+        """Index of the block whose document range would contain each id."""
+        base = np.frombuffer(self.block_base, dtype=_POSTING_DTYPE)
+        return np.maximum(np.searchsorted(base, doc_ids, side="left") - 1, 0)
+
+    def block_bounds(self, avg_length: float) -> FloatArray:
+        """Upper bound of the tf component of any posting in each block."""
+        block_max = np.frombuffer(self.block_max, dtype=np.float32).astype(np.float64)
+        block_avg = np.frombuffer(self.block_avg, dtype=np.float32)
+        drift = np.maximum(avg_length / block_avg, 1.0)
+        bounds: FloatArray = block_max * drift * _BOUND_SLACK
+        return bounds
+
+    def frequencies(self) -> npt.NDArray[Any]:
+        """Zero-copy view of term frequencies (valid until the next append)."""
+        return np.frombuffer(self.freqs, dtype=_POSTING_DTYPE)
+
+    @property
+    def block_count(self) -> int:
+        return len(self.block_base)
+
+    def nbytes(self) -> int:
+        """Bytes used by the encoded buffers."""
+        return (
+            self.deltas.itemsize * (len(self.deltas) + len(self.freqs) + len(self.block_base))
+            + self.block_max.itemsize * (len(self.block_max) + len(self.block_avg))
+        )
+
+
+class InvertedIndex:
+    """
+    Full-text index with incremental updates and BM25 ranking.
+
+    Example:
+        index = InvertedIndex()
+        index.add("zk-1", "mTLS certificates for every worker")
+        index.add("zk-2", "Controller routes capabilities to workers")
+        index.search("worker certificates")  # zk-1 ranks first
+    """
+
+    def __init__(
+        self,
+        k1: float = 1.2,
+        b: float = 0.75,
+        compact_ratio: float = 0.25,
+        min_compact_tombstones: int = 1024,
+        tier_min_postings: int | None = 16384,
+        tier_depth: int = 8192,
+    ) -> None:
+        """
+        Initialize an empty index.
+
+        Args:
+            k1: BM25 term-frequency saturation parameter
+            b: BM25 document-length normalization parameter
+            compact_ratio: Tombstone fraction that triggers automatic compaction
+            min_compact_tombstones: Minimum tombstones before compaction is considered
+            tier_min_postings: Queries whose rarest term has at least this many
+                postings use impact tiers (None: always exhaustive-exact pruning)
+            tier_depth: Postings ranked in the impact tier of a queried common
+                term (12 bytes each)
+        """
+        self.k1 = k1
+        self.b = b
+        self.compact_ratio = compact_ratio
+        self.min_compact_tombstones = min_compact_tombstones
+        self.tier_min_postings = tier_min_postings
+        self.tier_depth = tier_depth
+
+        self._postings: dict[str, _PostingsList] = {}
+        self._doc_keys: list[str | None] = []
+        self._doc_numbers: dict[str, int] = {}
+        self._doc_lengths = array(_POSTING_TYPECODE)
+        self._live = bytearray()
+        self._live_length = 0
+        self._tier_scores: FloatArray = np.zeros(0, dtype=np.float64)
+        self._tier_seen: npt.NDArray[np.uint32] = np.zeros(0, dtype=np.uint32)
+
+    def __len__(self) -> int:
+        """Number of live (searchable) documents."""
+        return len(self._doc_numbers)
+
+    def __contains__(self, doc_key: object) -> bool:
+        return doc_key in self._doc_numbers
+
+    @property
+    def tombstone_count(self) -> int:
+        """Removed documents still occupying postings space."""
+        return len(self._doc_keys) - len(self._doc_numbers)
+
+    # --- Updates ---
+
+    def add(self, doc_key: str, text: str) -> None:
+        """
+        Index a document, replacing any previous version with the same key.
+
+        Args:
+            doc_key: External identifier returned in search hits
+            text: Document text to tokenize and index
+        """
+        if doc_key in self._doc_numbers:
+            self.remove(doc_key)
+
+        term_counts = Counter(tokenize(text))
+        doc = len(self._doc_keys)
+        length = sum(term_counts.values())
+
+        self._doc_keys.append(doc_key)
+        self._doc_numbers[doc_key] = doc
+        self._doc_lengths.append(length)
+        self._live.append(1)
+        self._live_length += length
+
+        avg_length = self._average_length()
+        norm = self.k1 * (1.0 - self.b + self.b * length / avg_length)
+        saturation = self.k1 + 1.0
+
+        for term, freq in term_counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = _PostingsList()
+                self._postings[term] = postings
+            postings.append(doc, freq, freq * saturation / (freq + norm), avg_length)
+            # Keep tiers current here so queries never pay for building one
+            if (
+                self.tier_min_postings is not None
+                and len(postings) >= self.tier_min_postings
+                and (postings.tier is None or len(postings) - postings.tier.covered >= _TIER_TAIL)
+            ):
+                self._impact_tier(postings, avg_length)
+
+    def remove(self, doc_key: str) -> bool:
+        """
+        Remove a document from search results.
+
+        Args:
+            doc_key: External identifier
+
+        Returns:
+            True if the document was indexed, False otherwise
+        """
+        doc = self._doc_numbers.pop(doc_key, None)
+        if doc is None:
+            return False
+
+        self._live[doc] = 0
+        self._doc_keys[doc] = None
+        self._live_length -= self._doc_lengths[doc]
+
+        tombstones = self.tombstone_count
+        if (
+            tombstones >= self.min_compact_tombstones
+            and tombstones >= self.compact_ratio * len(self._doc_keys)
+        ):
+            self.compact()
+        return True
+
+    def compact(self) -> None:
+        """Rewrite postings without tombstoned documents and renumber densely."""
+        if self.tombstone_count == 0:
+            return
+
+        live = np.frombuffer(self._live, dtype=np.bool_)
+        remap = np.cumsum(live, dtype=np.int64) - 1
+        lengths = np.frombuffer(self._doc_lengths, dtype=_POSTING_DTYPE)[live]
+        avg_length = max(float(lengths.mean()) if lengths.size else 1.0, 1.0)
+        norms = self.k1 * (1.0 - self.b + self.b * lengths / avg_length)
+
+        postings: dict[str, _PostingsList] = {}
+        for term, old in self._postings.items():
+            doc_ids = old.doc_ids()
+            keep = live[doc_ids]
+            if not keep.any():
+                continue
+            new_ids = remap[doc_ids[keep]]
+            freqs = old.frequencies()[keep].astype(np.float64)
+            impacts = freqs * (self.k1 + 1.0) / (freqs + norms[new_ids])
+            postings[term] = _PostingsList()
+            postings[term].extend(new_ids, freqs, impacts, avg_length)
+
+        doc_lengths = array(_POSTING_TYPECODE)
+        doc_lengths.frombytes(lengths.tobytes())
+        doc_keys = [key for key in self._doc_keys if key is not None]
+        removed = self.tombstone_count
+        del live, lengths
+
+        self._postings = postings
+        self._doc_lengths = doc_lengths
+        self._doc_keys = list(doc_keys)
+        self._doc_numbers = {key: doc for doc, key in enumerate(doc_keys)}
+        self._live = bytearray(b"\x01" * len(doc_keys))
+        if self.tier_min_postings is not None:
+            for term_postings in postings.values():
+                if len(term_postings) >= self.tier_min_postings:
+                    self._impact_tier(term_postings, avg_length)
+
+        logger.debug("Inverted index compacted: %d tombstones removed", removed)
+
+    # --- Queries ---
+
+    def search(self, query: str, limit: int = 10) -> list[SearchHit]:
+        """
+        Rank documents against a free-text query with BM25.
+
+        Terms are processed rarest-first. For each term only the blocks whose
+        impact bound (plus the bound of all remaining terms) can still beat the
+        current k-th best score are decoded and scored. Candidates whose score
+        bound drops below that threshold are discarded, and the rest that fall
+        in skipped blocks are resolved by skip-pointer lookup so their scores
+        stay exact. Results are identical to exhaustive BM25.
+
+        Queries made only of terms with at least ``tier_min_postings``
+        postings are answered from impact tiers instead (``_search_tiered``),
+        exactly unless the walk reaches ``tier_depth`` before the top-k is
+        proven. Queries asking for more than ``tier_depth`` hits, or whose
+        tiers hold fewer than ``limit`` live documents by then (e.g. after
+        removals), use the exhaustive-exact path.
+
+        Args:
+            query: Free-text query (tokenized like documents)
+            limit: Maximum number of hits to return
+
+        Returns:
+            Hits ordered by descending score (ties broken by insertion order)
+        """
+        doc_count = len(self._doc_numbers)
+        terms = dict.fromkeys(tokenize(query))
+        if not terms or doc_count == 0 or limit <= 0:
+            return []
+
+        total_docs = len(self._doc_keys)
+        avg_length = self._average_length()
+        lists = sorted(
+            (p for p in (self._postings.get(term) for term in terms) if p is not None),
+            key=len,
+        )
+        if not lists:
+            return []
+
+        idfs = [math.log(1.0 + (total_docs - len(p) + 0.5) / (len(p) + 0.5)) for p in lists]
+        if (
+            self.tier_min_postings is not None
+            and len(lists[0]) >= self.tier_min_postings
+            and len(lists) <= _TIER_MAX_TERMS
+            and limit <= self.tier_depth
+        ):
+            hits = self._search_tiered(lists, idfs, avg_length, limit)
+            if hits is not None:
+                return hits
+
+        bounds = [idf * p.block_bounds(avg_length) for idf, p in zip(idfs, lists)]
+        remaining = np.cumsum([float(bound.max()) for bound in bounds][::-1])[::-1].tolist()
+        remaining.append(0.0)
+
+        cand_ids: IntArray = np.empty(0, dtype=np.int64)
+        cand_scores: FloatArray = np.empty(0, dtype=np.float64)
+        floor = 0.0
+
+        for i, (postings, idf, bound) in enumerate(zip(lists, idfs, bounds)):
+            scored = np.zeros(postings.block_count, dtype=np.bool_)
+
+            if cand_ids.size < limit:
+                # Seed the threshold with the highest-bound blocks. Each block
+                # usually holds only one or two near-maximal postings, so taking
+                # ~2 blocks per requested hit gets close to the final threshold.
+                seed_count = min(postings.block_count, 2 * limit)
+                seed = np.sort(np.argpartition(-bound, seed_count - 1)[:seed_count])
+                scored[seed] = True
+                ids, scores = self._score_blocks(postings, seed, idf, avg_length)
+                cand_ids, cand_scores = _merge(cand_ids, cand_scores, ids, scores)
+                probe = self._probe_floor(lists, idfs, i, avg_length, cand_ids, cand_scores, limit)
+                floor = max(floor, probe)
+
+            threshold = max(floor, _kth_largest(cand_scores, limit))
+            promising = np.flatnonzero((bound + remaining[i + 1] >= threshold) & ~scored)
+            if promising.size:
+                scored[promising] = True
+                ids, scores = self._score_blocks(postings, promising, idf, avg_length)
+                cand_ids, cand_scores = _merge(cand_ids, cand_scores, ids, scores)
+                threshold = max(threshold, _kth_largest(cand_scores, limit))
+
+            if cand_ids.size == 0:
+                continue
+
+            # Drop candidates that can no longer reach the threshold, then
+            # resolve the rest that fall in skipped blocks by lookup.
+            cand_blocks = postings.block_of(cand_ids)
+            unscored = ~scored[cand_blocks]
+            potential = cand_scores + remaining[i + 1] + np.where(unscored, bound[cand_blocks], 0.0)
+            keep = potential >= threshold
+            cand_ids, cand_scores, unscored = cand_ids[keep], cand_scores[keep], unscored[keep]
+            pending = np.flatnonzero(unscored)
+            if pending.size:
+                cand_scores[pending] += self._lookup(postings, cand_ids[pending], idf, avg_length)
+
+        return self._top_hits(cand_ids, cand_scores, limit)
+
+    def _search_tiered(
+        self,
+        lists: list[_PostingsList],
+        idfs: list[float],
+        avg_length: float,
+        limit: int,
+    ) -> list[SearchHit] | None:
+        """
+        Threshold-algorithm search over impact tiers.
+
+        Walks the tiers to a growing depth. Each candidate seen there has a
+        lower bound (its seen contributions) and an upper bound (plus each
+        unseen term's impact at that depth). The walk deepens until the k-th
+        lower bound beats any document not seen yet, or reaches ``tier_depth``.
+        Candidates whose upper bound still reaches the threshold are then
+        scored exactly by skip-pointer lookup, best first.
+
+        Returns None when the walk reaches ``tier_depth`` unproven with fewer
+        than ``limit`` live documents in the tiers: they ran out of candidates
+        and the caller must score exhaustively.
+        """
+        tiers = [self._impact_tier(postings, avg_length) for postings in lists]
+        # Postings appended since a tier was built are scored in full
+        tails = [postings.decode_from(tier.covered) for postings, tier in zip(lists, tiers)]
+
+        # Dense accumulators, reused across queries and cleared on the way out
+        if self._tier_scores.size < len(self._doc_keys):
+            self._tier_scores = np.zeros(len(self._doc_keys), dtype=np.float64)
+            self._tier_seen = np.zeros(len(self._doc_keys), dtype=np.uint32)
+        accumulated, seen_terms = self._tier_scores, self._tier_seen
+        live = np.frombuffer(self._live, dtype=np.bool_)
+        touched: list[IntArray] = []
+
+        try:
+            walked, depth, bounded = 0, min(max(64, 4 * limit), self.tier_depth), True
+            while True:
+                frontiers: list[float] = []
+                for bit, (postings, idf, tier) in enumerate(zip(lists, idfs, tiers)):
+                    doc_ids = tier.doc_ids[walked:depth]
+                    positions = tier.positions[walked:depth]
+                    if walked == 0:
+                        doc_ids = np.concatenate((doc_ids, tails[bit][0]))
+                        positions = np.concatenate((positions, tails[bit][1]))
+                    touched.append(doc_ids[seen_terms[doc_ids] == 0])
+                    accumulated[doc_ids] += self._bm25(
+                        postings, doc_ids, positions, idf, avg_length
+                    )
+                    seen_terms[doc_ids] |= 1 << bit
+                    edge = tier.floor
+                    if depth < tier.impacts.size:
+                        edge = max(edge, float(tier.impacts[depth]))
+                    drift = max(avg_length / tier.avg_length, 1.0)
+                    frontiers.append(idf * edge * drift * _BOUND_SLACK)
+                walked = depth
+
+                seen_ids = np.concatenate(touched)
+                threshold = _kth_largest(accumulated[seen_ids[live[seen_ids]]], limit)
+                if sum(frontiers) <= threshold:
+                    break
+                if depth >= max(tier.impacts.size for tier in tiers):
+                    bounded = False
+                    tier_ids = np.concatenate([tier.doc_ids[:depth] for tier in tiers])
+                    if np.unique(tier_ids[live[tier_ids]]).size < limit:
+                        logger.debug("Tiers ran out of live candidates; scoring exhaustively")
+                        return None
+                    logger.debug(
+                        "Tiered search stopped at depth %d before its bound (%.3f > %.3f)",
+                        depth,
+                        sum(frontiers),
+                        threshold,
+                    )
+                    break
+                depth = min(depth * 8, self.tier_depth)
+
+            cand_ids = np.sort(seen_ids[live[seen_ids]]).astype(np.int64)
+            lower = accumulated[cand_ids]
+            # A term whose tier was walked to the end has nothing left to find
+            exhausted = sum(1 << bit for bit, frontier in enumerate(frontiers) if frontier == 0.0)
+            seen = seen_terms[cand_ids] | exhausted
+        finally:
+            for doc_ids in touched:
+                accumulated[doc_ids] = 0.0
+                seen_terms[doc_ids] = 0
+
+        upper = lower.copy()
+        for bit, frontier in enumerate(frontiers):
+            upper += np.where(seen & (1 << bit), 0.0, frontier)
+        complete = seen == (1 << len(lists)) - 1
+        exact_ids, exact_scores = cand_ids[complete], lower[complete]
+
+        # Resolve the most promising candidates first to raise the threshold,
+        # then every candidate that can still reach it in one pass
+        pending = np.flatnonzero(~complete & (upper >= threshold))
+        best = min(pending.size, 4 * limit)
+        order = np.argpartition(-upper[pending], best - 1) if pending.size else pending
+        batches = [pending[order[:best]], pending[order[best:]]]
+        if not bounded:
+            # Bounds are loose past the depth limit: resolve the candidates
+            # with the most seen score, up to a budget
+            rest = batches[1]
+            budget = min(rest.size, _TIER_RESOLVE_BUDGET)
+            batches[1] = (
+                rest[np.argpartition(-lower[rest], budget - 1)[:budget]] if budget else rest
+            )
+        # Terms are looked up widest bound first; after each, candidates whose
+        # tightened bound falls below the threshold skip the remaining lookups
+        terms = sorted(range(len(lists)), key=lambda bit: -frontiers[bit])
+        for batch in batches:
+            batch = np.sort(batch[upper[batch] >= threshold])
+            scores, bounds = lower[batch], upper[batch]
+            for bit in terms:
+                keep = bounds >= threshold
+                batch, scores, bounds = batch[keep], scores[keep], bounds[keep]
+                missing = (seen[batch] & (1 << bit)) == 0
+                if missing.any():
+                    found = self._lookup(
+                        lists[bit], cand_ids[batch[missing]], idfs[bit], avg_length
+                    )
+                    scores[missing] += found
+                    bounds[missing] += found - frontiers[bit]
+            exact_ids, exact_scores = _merge(exact_ids, exact_scores, cand_ids[batch], scores)
+            threshold = max(threshold, _kth_largest(exact_scores, limit))
+
+        return self._top_hits(exact_ids, exact_scores, limit)
+
+    def _impact_tier(self, postings: _PostingsList, avg_length: float) -> _ImpactTier:
+        """
+        Cached impact tier of a list, refreshed once its unranked tail grows.
+
+        A refresh merges the tail into the previous tier instead of rescoring
+        the whole list, so it costs O(tier_depth + tail). Postings that fall
+        out of the tier (or never made it in) are bounded by ``floor``.
+        """
+        tier = postings.tier
+        if tier is not None and len(postings) - tier.covered < _TIER_TAIL:
+            return tier
+
+        if tier is None:
+            doc_ids = postings.doc_ids()
+            positions = np.arange(doc_ids.size, dtype=np.int64)
+            floor = 0.0
+        else:
+            tail_ids, tail_positions = postings.decode_from(tier.covered)
+            doc_ids = np.concatenate((tier.doc_ids.astype(np.int64), tail_ids))
+            positions = np.concatenate((tier.positions.astype(np.int64), tail_positions))
+            floor = tier.floor * max(avg_length / tier.avg_length, 1.0)
+        impacts = self._bm25(postings, doc_ids, positions, 1.0, avg_length)
+        depth = min(self.tier_depth, impacts.size)
+        if depth < impacts.size:
+            top = np.argpartition(-impacts, depth - 1)[:depth]
+        else:
+            top = np.arange(impacts.size, dtype=np.int64)
+        top = top[np.argsort(-impacts[top], kind="stable")]
+        if depth < impacts.size:
+            floor = max(floor, float(impacts[top[-1]]))
+        tier = _ImpactTier(
+            doc_ids=doc_ids[top].astype(_POSTING_DTYPE),
+            positions=positions[top].astype(_POSTING_DTYPE),
+            impacts=impacts[top].astype(np.float32),
+            floor=floor,
+            avg_length=avg_length,
+            covered=len(postings),
+        )
+        postings.tier = tier
+        return tier
+
+    def _score_blocks(
+        self,
+        postings: _PostingsList,
+        blocks: IntArray,
+        idf: float,
+        avg_length: float,
+    ) -> tuple[IntArray, FloatArray]:
+        """Decode and BM25-score every live posting in the given blocks."""
+        doc_ids, positions = postings.decode_blocks(blocks)
+        if self.tombstone_count:
+            keep = np.frombuffer(self._live, dtype=np.bool_)[doc_ids]
+            doc_ids, positions = doc_ids[keep], positions[keep]
+        return doc_ids, self._bm25(postings, doc_ids, positions, idf, avg_length)
+
+    def _probe_floor(
+        self,
+        lists: list[_PostingsList],
+        idfs: list[float],
+        current: int,
+        avg_length: float,
+        cand_ids: IntArray,
+        cand_scores: FloatArray,
+        limit: int,
+    ) -> float:
+        """
+        Lower-bound the final k-th score from fully scored seed candidates.
+
+        The best partial candidates are looked up in every later term so their
+        scores are exact; the k-th of those is a threshold any result must beat.
+        """
+        if current + 1 >= len(lists) or cand_ids.size < limit:
+            return 0.0
+        probe_count = min(cand_ids.size, 2 * limit)
+        probe = np.argpartition(-cand_scores, probe_count - 1)[:probe_count]
+        probe = probe[np.argsort(cand_ids[probe])]
+        full = cand_scores[probe].copy()
+        for postings, idf in zip(lists[current + 1 :], idfs[current + 1 :]):
+            full += self._lookup(postings, cand_ids[probe], idf, avg_length)
+        return _kth_largest(full, limit)
+
+    def _lookup(
+        self,
+        postings: _PostingsList,
+        doc_ids: IntArray,
+        idf: float,
+        avg_length: float,
+    ) -> FloatArray:
+        """This term's BM25 contribution for sorted ``doc_ids`` (0 where absent)."""
+        contributions = np.zeros(doc_ids.size, dtype=np.float64)
+        if doc_ids.size == 0:
+            return contributions
+
+        blocks = None
+        if doc_ids.size * 2 <= postings.block_count:
+            blocks = np.unique(postings.block_of(doc_ids))
+        if blocks is None or blocks.size * 4 > postings.block_count:
+            # Most blocks are needed: one pass over the whole list is cheaper
+            # (32-bit prefix sums; document numbers fit the posting type)
+            deltas = np.frombuffer(postings.deltas, dtype=_POSTING_DTYPE)
+            list_ids = np.cumsum(deltas, dtype=_POSTING_DTYPE)
+            found = np.searchsorted(list_ids, doc_ids.astype(_POSTING_DTYPE))
+            positions = np.minimum(found, list_ids.size - 1)
+            hit = list_ids[positions] == doc_ids
+        else:
+            block_ids, block_positions = postings.decode_blocks(blocks)
+            found = np.minimum(np.searchsorted(block_ids, doc_ids), block_ids.size - 1)
+            hit = block_ids[found] == doc_ids
+            positions = block_positions[found]
+        if hit.any():
+            contributions[hit] = self._bm25(postings, doc_ids[hit], positions[hit], idf, avg_length)
+        return contributions
+
+    def _bm25(
+        self,
+        postings: _PostingsList,
+        doc_ids: IntArray,
+        positions: IntArray,
+        idf: float,
+        avg_length: float,
+    ) -> FloatArray:
+        """BM25 contribution of one term for the given postings."""
+        freqs = postings.frequencies()[positions].astype(np.float64)
+        lengths = np.frombuffer(self._doc_lengths, dtype=_POSTING_DTYPE)[doc_ids]
+        # idf * f * (k1 + 1) / (f + k1 * (1 - b + b * length / avg)), in place
+        norm = lengths * (self.k1 * self.b / avg_length)
+        norm += self.k1 * (1.0 - self.b) + freqs
+        freqs *= idf * (self.k1 + 1.0)
+        scores: FloatArray = np.divide(freqs, norm, out=freqs)
+        return scores
+
+    def _top_hits(self, doc_ids: IntArray, scores: FloatArray, limit: int) -> list[SearchHit]:
+        """Select the top ``limit`` candidates in score order."""
+        if limit < doc_ids.size:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            top = np.arange(doc_ids.size)
+
+        order = top[np.lexsort((doc_ids[top], -scores[top]))]
+
+        hits: list[SearchHit] = []
+        for position in order:
+            doc_key = self._doc_keys[int(doc_ids[position])]
+            if doc_key is not None:
+                hits.append(SearchHit(doc_key=doc_key, score=float(scores[position])))
+        return hits
+
+    def _average_length(self) -> float:
+        """Average live document length (floored at 1 to avoid division by zero)."""
+        return max(self._live_length / max(len(self._doc_numbers), 1), 1.0)
+
+    # --- Introspection ---
+
+    def stats(self) -> dict[str, int]:
+        """Index size statistics for status endpoints and benchmarks."""
+        return {
+            "documents": len(self._doc_numbers),
+            "tombstones": self.tombstone_count,
+            "terms": len(self._postings),
+            "postings": sum(len(p) for p in self._postings.values()),
+            "postings_bytes": sum(p.nbytes() for p in self._postings.values()),
+        }
+
+
+def _merge(
+    cand_ids: IntArray,
+    cand_scores: FloatArray,
+    doc_ids: IntArray,
+    scores: FloatArray,
+) -> tuple[IntArray, FloatArray]:
+    """Sum partial scores into the sorted candidate set."""
+    if cand_ids.size == 0:
+        order = np.argsort(doc_ids, kind="stable")
+        return doc_ids[order], scores[order]
+    if doc_ids.size == 0:
+        return cand_ids, cand_scores
+
+    merged_ids, inverse = np.unique(np.concatenate((cand_ids, doc_ids)), return_inverse=True)
+    merged_scores: FloatArray = np.bincount(
+        inverse, weights=np.concatenate((cand_scores, scores))
+    ).astype(np.float64, copy=False)
+    return merged_ids, merged_scores
+
+
+def _kth_largest(scores: FloatArray, k: int) -> float:
+    """Current admission threshold (0 until ``k`` candidates exist)."""
+    if scores.size < k:
+        return 0.0
+    return float(np.partition(scores, scores.size - k)[scores.size - k])
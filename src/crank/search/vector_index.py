@@ -0,0 +1,628 @@
+"""
+Vector Similarity Index
+
+Dense-embedding index for semantic search over zettels and images.
+
+Design:
+- Vectors live in one contiguous float32 matrix (row per key), grown by
+  capacity doubling so appends are amortised O(1)
+- ``metric="cosine"`` normalises vectors on insert, so cosine similarity
+  becomes a plain inner product
+- Exact (flat) search is a batched matrix multiply over fixed-size row
+  chunks, keeping a running top-k per query; memory stays bounded no
+  matter how many vectors are indexed
+- ``IVFVectorIndex`` adds an inverted-file coarse quantiser (k-means
+  centroids) and keeps the rows of each cluster in its own list, so a
+  query scores only the rows of its ``nprobe`` closest lists
+- ``save()`` writes ``.npy`` files; ``load()`` memory-maps them read-only
+  so a large index opens instantly and pages in on demand. The first
+  mutation copies the matrix into memory.
+
+Removals swap the last row into the freed slot, so row numbers are not
+stable; callers only ever see string keys.
+
+The index is not thread-safe. Workers call it from the event loop only.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+logger = logging.getLogger(__name__)
+
+Matrix = npt.NDArray[np.float32]
+IntArray = npt.NDArray[np.int64]
+
+SUPPORTED_METRICS = ("cosine", "dot")
+
+# Scores held in memory per search chunk (queries x rows), ~64 MiB of float32
+_CHUNK_SCORE_BUDGET = 16 * 1024 * 1024
+
+_META_FILE = "index.json"
+_VECTORS_FILE = "vectors.npy"
+_KEYS_FILE = "keys.json"
+_CENTROIDS_FILE = "centroids.npy"
+_ASSIGNMENTS_FILE = "assignments.npy"
+
+
+@dataclass(frozen=True)
+class VectorHit:
+    """Single nearest-neighbour result."""
+
+    key: str
+    score: float
+
+
+class VectorIndex:
+    """
+    Exact (brute-force) top-k vector index.
+
+    Usage:
+        index = VectorIndex(dimension=512)
+        index.add(["img-1", "img-2"], embeddings)
+        hits = index.search(query_vector, k=5)[0]
+    """
+
+    kind = "flat"
+
+    def __init__(self, dimension: int, metric: str = "cosine") -> None:
+        """
+        Initialize an empty index.
+
+        Args:
+            dimension: Length of every vector
+            metric: ``"cosine"`` (normalised inner product) or ``"dot"``
+
+        Raises:
+            ValueError: If dimension or metric is invalid
+        """
+        if dimension < 1:
+            raise ValueError("dimension must be positive")
+        if metric not in SUPPORTED_METRICS:
+            raise ValueError(f"metric must be one of {SUPPORTED_METRICS}")
+
+        self.dimension = dimension
+        self.metric = metric
+        self._vectors: Matrix = np.empty((0, dimension), dtype=np.float32)
+        self._size = 0
+        self._keys: list[str] = []
+        self._rows: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._rows
+
+    @property
+    def keys(self) -> list[str]:
+        """Indexed keys in row order."""
+        return list(self._keys)
+
+    @property
+    def vectors(self) -> Matrix:
+        """Read-only view of the stored (normalised) vectors."""
+        view = self._vectors[: self._size]
+        view.flags.writeable = False
+        return view
+
+    # --- Mutation ---
+
+    def add(self, keys: Sequence[str], vectors: npt.ArrayLike) -> None:
+        """
+        Insert or replace vectors.
+
+        Args:
+            keys: One key per row of ``vectors``
+            vectors: Array of shape ``(len(keys), dimension)``
+
+        Raises:
+            ValueError: On shape mismatch or non-finite values
+        """
+        matrix = self._prepare(vectors)
+        if matrix.shape[0] != len(keys):
+            raise ValueError(f"got {len(keys)} keys for {matrix.shape[0]} vectors")
+
+        # Later duplicates in the same call win, like repeated single adds
+        latest = {key: position for position, key in enumerate(keys)}
+        new_keys = [key for key in latest if key not in self._rows]
+        self._reserve(self._size + len(new_keys))
+
+        for key, position in latest.items():
+            row = self._rows.get(key)
+            if row is None:
+                row = self._size
+                self._rows[key] = row
+                self._keys.append(key)
+                self._size += 1
+            self._vectors[row] = matrix[position]
+            self._on_row_written(row)
+
+    def remove(self, key: str) -> bool:
+        """
+        Delete a key.
+
+        Returns:
+            True if the key was present
+        """
+        row = self._rows.pop(key, None)
+        if row is None:
+            return False
+
+        self._make_writable()
+        self._on_row_removed(row)
+        last = self._size - 1
+        if row != last:
+            moved_key = self._keys[last]
+            self._vectors[row] = self._vectors[last]
+            self._keys[row] = moved_key
+            self._rows[moved_key] = row
+            self._on_row_moved(last, row)
+        self._keys.pop()
+        self._size = last
+        return True
+
+    # --- Queries ---
+
+    def search(self, queries: npt.ArrayLike, k: int = 10) -> list[list[VectorHit]]:
+        """
+        Return the ``k`` nearest keys for each query.
+
+        Args:
+            queries: One vector ``(dimension,)`` or a batch ``(n, dimension)``
+            k: Results per query
+
+        Returns:
+            One hit list per query, best first (ties broken by insertion row)
+        """
+        batch = self._prepare(queries)
+        if k <= 0 or self._size == 0:
+            return [[] for _ in range(batch.shape[0])]
+
+        rows, scores = self._search_rows(batch, min(k, self._size))
+        return [
+            [
+                VectorHit(key=self._keys[row], score=float(score))
+                for row, score in zip(r, s)
+                if row >= 0
+            ]
+            for r, s in zip(rows.tolist(), scores.tolist())
+        ]
+
+    def _search_rows(self, batch: Matrix, k: int) -> tuple[IntArray, Matrix]:
+        """Exact top-k rows for every query via chunked matmul."""
+        return _top_k_chunked(batch, self._vectors, self._size, k)
+
+    # --- Persistence ---
+
+    def save(self, directory: Path) -> None:
+        """
+        Write the index to ``directory`` (created if missing).
+
+        Each file is written to a temporary name and renamed into place,
+        with the metadata file last, so a crash never leaves a torn index.
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        _save_array(directory / _VECTORS_FILE, np.ascontiguousarray(self._vectors[: self._size]))
+        _save_text(directory / _KEYS_FILE, json.dumps(self._keys))
+        self._save_extra(directory)
+        _save_text(directory / _META_FILE, json.dumps(self._metadata(), indent=2))
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> VectorIndex:
+        """
+        Open an index written by ``save()``.
+
+        Args:
+            directory: Directory holding the index files
+            mmap: Memory-map the vector matrix instead of reading it
+
+        Returns:
+            ``VectorIndex`` or ``IVFVectorIndex`` depending on what was saved
+        """
+        metadata = json.loads((directory / _META_FILE).read_text(encoding="utf-8"))
+        index_class = IVFVectorIndex if metadata.get("kind") == IVFVectorIndex.kind else VectorIndex
+        index = index_class._from_metadata(metadata)
+
+        mmap_mode: Any = "r" if mmap else None
+        vectors = np.load(directory / _VECTORS_FILE, mmap_mode=mmap_mode)
+        keys: list[str] = json.loads((directory / _KEYS_FILE).read_text(encoding="utf-8"))
+        if vectors.shape != (len(keys), index.dimension):
+            raise ValueError(f"corrupt vector index at {directory}: shape {vectors.shape}")
+
+        index._vectors = vectors
+        index._size = len(keys)
+        index._keys = keys
+        index._rows = {key: row for row, key in enumerate(keys)}
+        index._load_extra(directory, mmap_mode)
+        logger.info("Loaded %s vector index: %d x %d", index.kind, index._size, index.dimension)
+        return index
+
+    @classmethod
+    def _from_metadata(cls, metadata: dict[str, Any]) -> VectorIndex:
+        return cls(dimension=int(metadata["dimension"]), metric=str(metadata["metric"]))
+
+    def _metadata(self) -> dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "dimension": self.dimension,
+            "metric": self.metric,
+            "size": self._size,
+        }
+
+    def _save_extra(self, directory: Path) -> None:
+        """Hook for subclasses to persist extra arrays."""
+
+    def _load_extra(self, directory: Path, mmap_mode: Any) -> None:
+        """Hook for subclasses to restore extra arrays."""
+
+    def stats(self) -> dict[str, Any]:
+        """Size and memory figures for status endpoints."""
+        return {
+            **self._metadata(),
+            "memory_mapped": isinstance(self._vectors, np.memmap),
+            "vector_bytes": self._size * self.dimension * 4,
+        }
+
+    # --- Internals ---
+
+    def _prepare(self, vectors: npt.ArrayLike) -> Matrix:
+        """Validate shape, cast to float32 and normalise for cosine."""
+        matrix = np.array(vectors, dtype=np.float32, ndmin=2, copy=True)
+        if matrix.ndim != 2 or matrix.shape[1] != self.dimension:
+            raise ValueError(f"expected vectors of dimension {self.dimension}, got {matrix.shape}")
+        if not np.isfinite(matrix).all():
+            raise ValueError("vectors must not contain NaN or infinity")
+        if self.metric == "cosine":
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+    def _reserve(self, rows: int) -> None:
+        """Ensure a writable in-memory buffer with room for ``rows`` vectors."""
+        if (
+            rows <= self._vectors.shape[0]
+            and self._vectors.flags.writeable
+            and not isinstance(self._vectors, np.memmap)
+        ):
+            return
+        capacity = max(rows, 2 * self._vectors.shape[0], 64)
+        grown = np.empty((capacity, self.dimension), dtype=np.float32)
+        grown[: self._size] = self._vectors[: self._size]
+        self._vectors = grown
+
+    def _make_writable(self) -> None:
+        self._reserve(self._size)
+
+    def _on_row_written(self, row: int) -> None:
+        """Hook: a row's vector was (re)written."""
+
+    def _on_row_removed(self, row: int) -> None:
+        """Hook: the vector at ``row`` is being deleted (before the last row moves in)."""
+
+    def _on_row_moved(self, source: int, target: int) -> None:
+        """Hook: the vector at ``source`` now lives at ``target``."""
+
+
+class IVFVectorIndex(VectorIndex):
+    """
+    Approximate index with an inverted-file coarse quantiser.
+
+    ``train()`` clusters a sample into ``nlist`` centroids; each vector is
+    assigned to its nearest centroid and a query scans only the ``nprobe``
+    closest clusters. Before training, searches fall back to exact.
+
+    Every cluster keeps an array of its rows (an inverted list), maintained
+    on add, remove and retraining, so a query touches only the probed
+    lists rather than every row's assignment.
+    """
+
+    kind = "ivf"
+
+    def __init__(
+        self,
+        dimension: int,
+        metric: str = "cosine",
+        nlist: int = 256,
+        nprobe: int = 8,
+    ) -> None:
+        """
+        Initialize an untrained IVF index.
+
+        Args:
+            dimension: Length of every vector
+            metric: ``"cosine"`` or ``"dot"``
+            nlist: Number of clusters
+            nprobe: Clusters scanned per query (recall/latency trade-off)
+        """
+        super().__init__(dimension, metric)
+        if nlist < 1 or nprobe < 1:
+            raise ValueError("nlist and nprobe must be positive")
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self._centroids: Matrix | None = None
+        self._assignments: npt.NDArray[np.int32] = np.empty(0, dtype=np.int32)
+        # Inverted lists: rows of each cluster (first _list_sizes[c] entries used)
+        self._lists: list[IntArray] = []
+        self._list_sizes: IntArray = np.zeros(nlist, dtype=np.int64)
+        self._list_positions: IntArray = np.empty(0, dtype=np.int64)  # Row -> slot in its list
+
+    @property
+    def is_trained(self) -> bool:
+        """Whether centroids exist."""
+        return self._centroids is not None
+
+    def train(
+        self, sample: npt.ArrayLike | None = None, iterations: int = 10, seed: int = 0
+    ) -> None:
+        """
+        Learn centroids with spherical k-means and assign every stored vector.
+
+        Args:
+            sample: Training vectors (defaults to the vectors already indexed)
+            iterations: Lloyd iterations
+            seed: RNG seed for centroid initialisation
+
+        Raises:
+            ValueError: If the sample has fewer vectors than ``nlist``
+        """
+        self.set_centroids(self.fit_centroids(sample, iterations, seed))
+
+    def fit_centroids(
+        self, sample: npt.ArrayLike | None = None, iterations: int = 10, seed: int = 0
+    ) -> Matrix:
+        """
+        Run the k-means of ``train()`` without touching the index.
+
+        Safe to call from another thread on a sample the index does not own,
+        so callers can train while the index keeps serving and taking writes.
+
+        Raises:
+            ValueError: If the sample has fewer vectors than ``nlist``
+        """
+        data = self.vectors if sample is None else self._prepare(sample)
+        if data.shape[0] < self.nlist:
+            raise ValueError(f"need at least nlist={self.nlist} training vectors")
+
+        rng = np.random.default_rng(seed)
+        centroids = np.array(data[rng.choice(data.shape[0], self.nlist, replace=False)])
+        for _ in range(iterations):
+            labels = self._nearest_centroids(data, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, data)
+            counts = np.bincount(labels, minlength=self.nlist)
+            filled = counts > 0
+            centroids[filled] = sums[filled] / counts[filled, None]
+            # Re-seed empty clusters from random points so none stay dead
+            empty = np.flatnonzero(~filled)
+            if empty.size:
+                centroids[empty] = data[rng.choice(data.shape[0], empty.size, replace=False)]
+            centroids = self._normalise_centroids(centroids)
+        return centroids
+
+    def set_centroids(self, centroids: npt.ArrayLike) -> None:
+        """
+        Install centroids and assign every stored vector to one.
+
+        Searches switch from exact to IVF only once all assignments exist.
+
+        Raises:
+            ValueError: On a shape other than ``(nlist, dimension)``
+        """
+        matrix = np.asarray(centroids, dtype=np.float32)
+        if matrix.shape != (self.nlist, self.dimension):
+            raise ValueError(f"expected centroids of shape ({self.nlist}, {self.dimension})")
+
+        assignments = np.zeros(self._vectors.shape[0], dtype=np.int32)
+        assignments[: self._size] = self._nearest_centroids(self.vectors, matrix)
+        self._assignments = assignments
+        self._build_lists()
+        self._centroids = matrix
+
+    def _search_rows(self, batch: Matrix, k: int) -> tuple[IntArray, Matrix]:
+        if self._centroids is None:
+            return super()._search_rows(batch, k)
+
+        nprobe = min(self.nprobe, self.nlist)
+        probes = np.argpartition(-(batch @ self._centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+
+        rows = np.full((batch.shape[0], k), -1, dtype=np.int64)
+        scores = np.full((batch.shape[0], k), -np.inf, dtype=np.float32)
+        for query_number, query in enumerate(batch):
+            # Row order keeps ties broken by insertion row, as in exact search
+            probed = [
+                self._lists[probe][: self._list_sizes[probe]] for probe in probes[query_number]
+            ]
+            candidates = np.sort(np.concatenate(probed))
+            if candidates.size == 0:
+                continue
+            found_rows, found_scores = _top_k_chunked(
+                query[None, :], self._vectors[candidates], candidates.size, min(k, candidates.size)
+            )
+            count = found_rows.shape[1]
+            rows[query_number, :count] = candidates[found_rows[0]]
+            scores[query_number, :count] = found_scores[0]
+        return rows, scores
+
+    def _nearest_centroids(self, data: Matrix, centroids: Matrix) -> npt.NDArray[np.int32]:
+        labels = np.empty(data.shape[0], dtype=np.int32)
+        chunk = max(1, _CHUNK_SCORE_BUDGET // centroids.shape[0])
+        for start in range(0, data.shape[0], chunk):
+            block = data[start : start + chunk]
+            if self.metric == "cosine":
+                labels[start : start + chunk] = np.argmax(block @ centroids.T, axis=1)
+            else:
+                # Inner-product data: assign by Euclidean distance so clusters stay local
+                distances = (centroids**2).sum(axis=1) - 2.0 * (block @ centroids.T)
+                labels[start : start + chunk] = np.argmin(distances, axis=1)
+        return labels
+
+    def _normalise_centroids(self, centroids: Matrix) -> Matrix:
+        if self.metric != "cosine":
+            return centroids
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        np.divide(centroids, norms, out=centroids, where=norms > 0)
+        return centroids
+
+    def _build_lists(self) -> None:
+        """Rebuild the inverted lists from ``_assignments``."""
+        assignments = self._assignments[: self._size]
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=self.nlist).astype(np.int64)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        self._lists = [
+            np.array(order[start : start + count], dtype=np.int64)
+            for start, count in zip(starts.tolist(), counts.tolist())
+        ]
+        self._list_sizes = counts
+        positions = np.full(self._assignments.shape[0], -1, dtype=np.int64)
+        positions[order] = np.arange(self._size) - starts[assignments[order]]
+        self._list_positions = positions
+
+    def _list_append(self, cluster: int, row: int) -> None:
+        rows = self._lists[cluster]
+        size = int(self._list_sizes[cluster])
+        if size == rows.shape[0]:
+            grown = np.empty(max(2 * size, 16), dtype=np.int64)
+            grown[:size] = rows
+            self._lists[cluster] = rows = grown
+        rows[size] = row
+        self._list_positions[row] = size
+        self._list_sizes[cluster] = size + 1
+
+    def _list_discard(self, cluster: int, row: int) -> None:
+        rows = self._lists[cluster]
+        position = int(self._list_positions[row])
+        last = int(self._list_sizes[cluster]) - 1
+        moved = int(rows[last])
+        rows[position] = moved
+        self._list_positions[moved] = position
+        self._list_positions[row] = -1
+        self._list_sizes[cluster] = last
+
+    def _reserve(self, rows: int) -> None:
+        super()._reserve(rows)
+        if (
+            self._assignments.shape[0] < self._vectors.shape[0]
+            or not self._assignments.flags.writeable
+        ):
+            grown = np.zeros(self._vectors.shape[0], dtype=np.int32)
+            grown[: self._size] = self._assignments[: self._size]
+            self._assignments = grown
+        if self._list_positions.shape[0] < self._vectors.shape[0]:
+            positions = np.full(self._vectors.shape[0], -1, dtype=np.int64)
+            positions[: self._list_positions.shape[0]] = self._list_positions
+            self._list_positions = positions
+
+    def _on_row_written(self, row: int) -> None:
+        if self._centroids is not None:
+            vector = self._vectors[row : row + 1]
+            cluster = int(self._nearest_centroids(vector, self._centroids)[0])
+            if self._list_positions[row] >= 0:
+                previous = int(self._assignments[row])
+                if previous == cluster:
+                    return
+                self._list_discard(previous, row)
+            self._assignments[row] = cluster
+            self._list_append(cluster, row)
+
+    def _on_row_removed(self, row: int) -> None:
+        if self._centroids is not None:
+            self._list_discard(int(self._assignments[row]), row)
+
+    def _on_row_moved(self, source: int, target: int) -> None:
+        self._assignments[target] = self._assignments[source]
+        if self._centroids is not None:
+            position = int(self._list_positions[source])
+            self._lists[int(self._assignments[target])][position] = target
+            self._list_positions[target] = position
+            self._list_positions[source] = -1
+
+    @classmethod
+    def _from_metadata(cls, metadata: dict[str, Any]) -> VectorIndex:
+        return cls(
+            dimension=int(metadata["dimension"]),
+            metric=str(metadata["metric"]),
+            nlist=int(metadata["nlist"]),
+            nprobe=int(metadata["nprobe"]),
+        )
+
+    def _metadata(self) -> dict[str, Any]:
+        return {
+            **super()._metadata(),
+            "nlist": self.nlist,
+            "nprobe": self.nprobe,
+            "trained": self.is_trained,
+        }
+
+    def _save_extra(self, directory: Path) -> None:
+        if self._centroids is not None:
+            _save_array(directory / _CENTROIDS_FILE, self._centroids)
+            _save_array(directory / _ASSIGNMENTS_FILE, self._assignments[: self._size])
+
+    def _load_extra(self, directory: Path, mmap_mode: Any) -> None:
+        if (directory / _CENTROIDS_FILE).exists():
+            self._centroids = np.load(directory / _CENTROIDS_FILE)
+            self._assignments = np.load(directory / _ASSIGNMENTS_FILE, mmap_mode=mmap_mode)
+            self._build_lists()
+
+
+def _top_k_chunked(batch: Matrix, vectors: Matrix, size: int, k: int) -> tuple[IntArray, Matrix]:
+    """
+    Exact top-k by inner product over the first ``size`` rows of ``vectors``.
+
+    Rows are scored in chunks sized so the score matrix stays within
+    ``_CHUNK_SCORE_BUDGET``; each chunk's top-k is merged into a running
+    top-k per query.
+    """
+    queries = batch.shape[0]
+    best_rows = np.full((queries, k), -1, dtype=np.int64)
+    best_scores = np.full((queries, k), -np.inf, dtype=np.float32)
+    chunk = max(k, _CHUNK_SCORE_BUDGET // max(queries, 1))
+
+    for start in range(0, size, chunk):
+        block = vectors[start : min(start + chunk, size)]
+        scores = batch @ block.T
+        take = min(k, block.shape[0])
+        local = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+
+        merged_scores = np.concatenate(
+            [best_scores, np.take_along_axis(scores, local, axis=1)], axis=1
+        )
+        merged_rows = np.concatenate([best_rows, local + start], axis=1)
+        keep = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(merged_scores, keep, axis=1)
+        best_rows = np.take_along_axis(merged_rows, keep, axis=1)
+
+    # Order each query's hits by score, then by row for stable ties
+    order = np.lexsort((best_rows, -best_scores), axis=1)
+    return np.take_along_axis(best_rows, order, axis=1), np.take_along_axis(
+        best_scores, order, axis=1
+    )
+
+
+def _save_array(path: Path, array: npt.NDArray[Any]) -> None:
+    temp_path = path.with_name(f".{path.name}.tmp")
+    with temp_path.open("wb") as handle:
+        np.save(handle, array)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temp_path, path)
+
+
+def _save_text(path: Path, text: str) -> None:
+    temp_path = path.with_name(f".{path.name}.tmp")
+    with temp_path.open("w", encoding="utf-8") as handle:
+        handle.write(text)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temp_path, path)
@@ -27,6 +27,7 @@ Security Guarantees:
     - Observability hooks for all certificate lifecycle events
 """
 
+from .admin import AdminAuthorizer
 from .certificates import CertificateBundle, CertificateManager
 from .config import CertificatePaths, SecurityConfig, get_security_config, reset_security_config
 from .constants import (
@@ -71,6 +72,7 @@ __all__ = [
     "DEFAULT_CERT_DIR",
     "PLATFORM_CERT_FILENAME",
     "PLATFORM_KEY_FILENAME",
+    "AdminAuthorizer",
     "CertificateBundle",
     "CertificateEvent",
     "CertificateEventContext",
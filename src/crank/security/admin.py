@@ -0,0 +1,174 @@
+"""
+Admin Authorization over mTLS
+
+Operator-only endpoints (``/debug/*``) are authorized by the client
+certificate of the TLS connection: its subject CN must be one of the
+admin identities in ``CRANK_ADMIN_IDENTITIES`` (comma-separated). With no
+admin identities configured, or no verified client certificate, the
+request is refused with 403 and the refusal is logged for audit.
+
+The peer certificate reaches the app through the ASGI TLS extension
+(``scope["extensions"]["tls"]["client_cert_name"]``). uvicorn does not
+fill it in, so services run it with ``tls_http_protocol()``, which adds
+the extension for connections whose client presented a certificate the
+CA verified (``ssl_cert_reqs=CERT_OPTIONAL``: clients without one still
+connect, they just are not admins).
+"""
+
+import logging
+import os
+import ssl
+from collections.abc import Iterable, Mapping
+from typing import Any, Optional
+
+from fastapi import HTTPException, Request
+
+logger = logging.getLogger(__name__)
+
+ADMIN_IDENTITIES_ENV = "CRANK_ADMIN_IDENTITIES"
+
+# getpeercert() attribute names to their RFC 4514 short forms
+_RDN_NAMES = {
+    "commonName": "CN",
+    "countryName": "C",
+    "domainComponent": "DC",
+    "localityName": "L",
+    "organizationName": "O",
+    "organizationalUnitName": "OU",
+    "stateOrProvinceName": "ST",
+    "streetAddress": "STREET",
+    "userId": "UID",
+}
+
+
+# --- Peer Identity ---
+
+
+def subject_name(peer_cert: Mapping[str, Any]) -> str:
+    """RFC 4514 subject of a ``SSLSocket.getpeercert()`` dict (most specific RDN first)."""
+    return ",".join(
+        f"{_RDN_NAMES.get(attribute, attribute)}={value}"
+        for rdn in reversed(peer_cert.get("subject", ()))
+        for attribute, value in rdn
+    )
+
+
+def common_name(subject: str) -> Optional[str]:
+    """CN of an RFC 4514 subject, if any."""
+    for attribute in subject.split(","):
+        key, _, value = attribute.partition("=")
+        if key.strip().upper() == "CN":
+            return value.strip()
+    return None
+
+
+def peer_subject(scope: Mapping[str, Any]) -> Optional[str]:
+    """Subject of the verified client certificate of a request, from the ASGI TLS extension."""
+    tls = scope.get("extensions", {}).get("tls") or {}
+    name = tls.get("client_cert_name")
+    return str(name) if name else None
+
+
+class TLSScopeApp:
+    """ASGI wrapper adding the TLS extension for one connection's requests."""
+
+    def __init__(self, app: Any, tls: dict[str, Any]) -> None:
+        self.app = app
+        self.tls = tls
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] in ("http", "websocket"):
+            scope.setdefault("extensions", {})["tls"] = self.tls
+        await self.app(scope, receive, send)
+
+
+def tls_extension(ssl_object: ssl.SSLObject) -> dict[str, Any]:
+    """ASGI TLS extension for a handshaken connection."""
+    peer_cert = ssl_object.getpeercert()
+    peer_der = ssl_object.getpeercert(binary_form=True)
+    cipher = ssl_object.cipher()
+    return {
+        "server_cert": None,
+        "client_cert_chain": [ssl.DER_cert_to_PEM_cert(peer_der)] if peer_der else [],
+        "client_cert_name": subject_name(peer_cert) if peer_cert else None,
+        "client_cert_error": None,
+        "tls_version": ssl_object.version(),
+        "cipher_suite": cipher[0] if cipher else None,
+    }
+
+
+def tls_http_protocol() -> type:
+    """uvicorn HTTP protocol class that exposes the client certificate to the app.
+
+    Pass as ``uvicorn.run(..., http=tls_http_protocol(), ssl_cert_reqs=ssl.CERT_OPTIONAL)``.
+    """
+    from uvicorn.protocols.http.auto import AutoHTTPProtocol
+
+    class TLSHTTPProtocol(AutoHTTPProtocol):  # type: ignore[misc, valid-type]
+        app: Any
+
+        def connection_made(self, transport: Any) -> None:
+            super().connection_made(transport)
+            ssl_object = transport.get_extra_info("ssl_object")
+            if ssl_object is not None:
+                self.app = TLSScopeApp(self.app, tls_extension(ssl_object))
+
+    return TLSHTTPProtocol
+
+
+# --- Authorization ---
+
+
+class AdminAuthorizer:
+    """FastAPI dependency admitting only requests from allowed client certificates.
+
+    Admits admins by default; other roles (e.g. peer controllers) reuse it
+    with their own identities, audit wording and log level.
+
+    Args:
+        identities: Certificate CNs allowed to call the endpoints
+        role: Who the identities are, as worded in logs and 403 details
+        audit_level: Log level of admitted calls
+    """
+
+    def __init__(
+        self,
+        identities: Iterable[str] = (),
+        role: str = "admin",
+        audit_level: int = logging.INFO,
+    ) -> None:
+        self.identities = frozenset(identity.strip() for identity in identities if identity.strip())
+        self.role = role
+        self.audit_level = audit_level
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None) -> "AdminAuthorizer":
+        """Authorizer for the identities in ``CRANK_ADMIN_IDENTITIES``."""
+        environ = os.environ if environ is None else environ
+        return cls(environ.get(ADMIN_IDENTITIES_ENV, "").split(","))
+
+    async def __call__(self, request: Request) -> str:
+        """Return the allowed CN of the request, or raise 403."""
+        subject = peer_subject(request.scope)
+        identity = common_name(subject) if subject else None
+        if identity is not None and identity in self.identities:
+            logger.log(
+                self.audit_level,
+                "%s %s called %s %s",
+                self.role.capitalize(),
+                identity,
+                request.method,
+                request.url.path,
+            )
+            return identity
+        logger.warning(
+            "Denied %s endpoint %s %s to %s (client %s)",
+            self.role,
+            request.method,
+            request.url.path,
+            subject or "unauthenticated peer",
+            request.client.host if request.client else "unknown",
+        )
+        raise HTTPException(
+            status_code=403, detail=f"{self.role.capitalize()} client certificate required"
+        )
@@ -4,6 +4,9 @@ Certificate Lifecycle Events and Observability
 Provides event emission, structured logging, and metrics hooks for
 certificate operations. All certificate lifecycle transitions emit
 events that can be consumed for alerting, metrics, and audit trails.
+
+Metrics are recorded in the process-wide registry that workers and the
+controller serve on ``/metrics`` (``crank.observability.metrics``).
 """
 
 import logging
@@ -12,8 +15,24 @@ from datetime import UTC, datetime
 from enum import Enum
 from typing import Any, Callable, Optional
 
+from crank.observability import current_span
+from crank.observability.metrics import get_registry
+
 logger = logging.getLogger(__name__)
 
+_EVENTS = get_registry().counter(
+    "crank_cert_events_total", "Certificate lifecycle events emitted", ("event",)
+)
+_ISSUANCE = get_registry().counter(
+    "crank_cert_issuance_total", "Certificate issuance attempts", ("worker_id", "status")
+)
+_EXPIRATION = get_registry().gauge(
+    "crank_cert_expiration_seconds", "Time until the certificate expires", ("worker_id",)
+)
+_CA_UNAVAILABLE = get_registry().counter(
+    "crank_ca_unavailable_total", "Failed attempts to reach the CA service", ("worker_id",)
+)
+
 
 class CertificateEvent(str, Enum):
     """Certificate lifecycle events for observability."""
@@ -43,7 +62,8 @@ class CertificateEventContext:
 
     Provides correlation IDs, timestamps, and metadata for all
     certificate lifecycle events to enable distributed tracing
-    and audit trails.
+    and audit trails. Events emitted inside a traced request also
+    carry its trace and span IDs, linking them to the request's spans.
     """
 
     def __init__(
@@ -67,6 +87,9 @@ class CertificateEventContext:
         self.correlation_id = correlation_id or self._generate_correlation_id()
         self.timestamp = datetime.now(UTC).isoformat()
         self.metadata = metadata or {}
+        span = current_span()
+        self.trace_id = span.context.trace_id if span else None
+        self.span_id = span.context.span_id if span else None
 
     @staticmethod
     def _generate_correlation_id() -> str:
@@ -75,13 +98,16 @@ class CertificateEventContext:
 
     def to_dict(self) -> dict[str, Any]:
         """Convert event context to dictionary for logging/metrics."""
-        return {
+        data: dict[str, Any] = {
             "event": self.event.value,
             "correlation_id": self.correlation_id,
             "worker_id": self.worker_id,
             "timestamp": self.timestamp,
-            **self.metadata,
         }
+        if self.trace_id:
+            data["trace_id"] = self.trace_id
+            data["span_id"] = self.span_id
+        return {**data, **self.metadata}
 
     def log(self, level: int = logging.INFO, message: Optional[str] = None) -> None:
         """
@@ -162,8 +188,9 @@ def emit_certificate_event(
         metadata=metadata,
     )
 
-    # Structured logging
+    # Structured logging and metrics
     ctx.log(level=log_level)
+    _EVENTS.labels(event.value).inc()
 
     # Notify registered handlers
     for handler in _event_handlers[event]:
@@ -180,19 +207,16 @@ def emit_certificate_event(
     return ctx
 
 
-# Metrics helpers (Prometheus integration points)
-# These are placeholder functions that can be implemented with
-# prometheus_client library or OpenTelemetry SDK
+# Metrics helpers (Prometheus series on /metrics)
 
 
 def record_cert_issuance(worker_id: str, success: bool) -> None:
     """
     Record certificate issuance attempt.
 
-    Future implementation: Prometheus counter
-    crank_cert_issuance_total{worker_id, status}
+    Prometheus counter crank_cert_issuance_total{worker_id, status}
     """
-    # TODO: Implement with prometheus_client.Counter
+    _ISSUANCE.labels(worker_id, "success" if success else "failure").inc()
     logger.debug("Cert issuance: worker=%s, success=%s", worker_id, success)
 
 
@@ -200,10 +224,9 @@ def record_cert_expiration(worker_id: str, days_until_expiry: int) -> None:
     """
     Record certificate expiration time.
 
-    Future implementation: Prometheus histogram
-    crank_cert_expiration_seconds{worker_id}
+    Prometheus gauge crank_cert_expiration_seconds{worker_id}
     """
-    # TODO: Implement with prometheus_client.Histogram
+    _EXPIRATION.labels(worker_id).set(days_until_expiry * 86400)
     logger.debug("Cert expiration: worker=%s, days=%d", worker_id, days_until_expiry)
 
 
@@ -211,8 +234,7 @@ def record_ca_unavailable(worker_id: str) -> None:
     """
     Record CA service unavailability.
 
-    Future implementation: Prometheus counter
-    crank_ca_unavailable_total{worker_id}
+    Prometheus counter crank_ca_unavailable_total{worker_id}
     """
-    # TODO: Implement with prometheus_client.Counter
+    _CA_UNAVAILABLE.labels(worker_id).inc()
     logger.warning("CA unavailable for worker=%s", worker_id)
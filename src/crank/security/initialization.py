@@ -29,7 +29,12 @@ from .constants import (
     DEFAULT_CA_SERVICE_URL,
     RSA_KEY_SIZE,
 )
-from .events import CertificateEvent, emit_certificate_event, record_ca_unavailable
+from .events import (
+    CertificateEvent,
+    emit_certificate_event,
+    record_ca_unavailable,
+    record_cert_issuance,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -408,6 +413,7 @@ async def submit_csr(
                     },
                     log_level=logging.ERROR,
                 )
+                record_cert_issuance(worker_id, success=False)
                 if isinstance(e, CertificateInitializationError):
                     raise
                 raise CertificateInitializationError(f"CSR submission failed: {e}") from e
@@ -528,6 +534,7 @@ async def initialize_worker_certificates(
                 "ca_cert_file": str(ca_cert_file),
             },
         )
+        record_cert_issuance(worker_id, success=True)
 
         return cert_file, key_file, ca_cert_file
 
@@ -545,6 +552,7 @@ async def initialize_worker_certificates(
             metadata={"error": str(e), "phase": "bootstrap_other"},
             log_level=logging.ERROR,
         )
+        record_cert_issuance(worker_id, success=False)
         raise
 
 
@@ -8,6 +8,8 @@ This module enforces the platform's zero-trust security model:
 - HTTPS only (no HTTP fallback)
 - Certificate verification always enabled
 - Fails fast if certificates unavailable
+
+Clients propagate the W3C ``traceparent`` of the current span.
 """
 
 import logging
@@ -16,6 +18,8 @@ from typing import Any, Optional
 
 import httpx  # type: ignore[import-not-found]
 
+from crank.observability import tracing_event_hooks
+
 from .config import get_security_config
 from .constants import (
     DEFAULT_HTTP_CLIENT_TIMEOUT,
@@ -130,6 +134,7 @@ def create_mtls_client(
         ),
         # mTLS configuration - client certificate
         "cert": (str(cert_file), str(key_file)),
+        "event_hooks": tracing_event_hooks(),
     }
 
     # Certificate verification against CA
@@ -175,4 +180,5 @@ def create_ca_bootstrap_client(timeout: int = DEFAULT_HTTP_CLIENT_TIMEOUT) -> ht
         timeout=httpx.Timeout(timeout),
         verify=False,  # Only acceptable during bootstrap
         follow_redirects=False,
+        event_hooks=tracing_event_hooks(),
     )
@@ -0,0 +1,50 @@
+"""
+Crank Storage Package
+
+Shared persistence helpers for file-backed workers. Provides:
+- Write-behind queue that coalesces and batches small file writes
+- Atomic writes (temp file + rename) off the event loop
+- Configurable durability: per-write fsync, group commit, or none
+- Segmented receipt log with a signed Merkle root per segment, indexed
+  proof lookup, and a background hashing/append pipeline
+
+Usage:
+    from crank.storage import DurabilityMode, WriteBehindQueue
+
+    writer = WriteBehindQueue(DurabilityMode.GROUP)
+    await writer.write(Path("zettels/inbox/zk-001.md"), text)
+    await writer.close()  # on shutdown
+
+    pipeline = ReceiptPipeline(ReceiptLog(Path("receipts")))
+    pipeline.submit(receipt_fields, {"input_hash": EncodedPayload(input_data)})
+    proof = await pipeline.lookup(receipt_id)
+"""
+
+from crank.storage.merkle import MerkleProof, MerkleTree, leaf_hash
+from crank.storage.receipt_log import (
+    ReceiptLocation,
+    ReceiptLog,
+    ReceiptPipeline,
+    ReceiptProof,
+    SegmentSeal,
+    Signer,
+    digest_signer,
+    hmac_signer,
+)
+from crank.storage.write_behind import DurabilityMode, WriteBehindQueue
+
+__all__: list[str] = [
+    "DurabilityMode",
+    "MerkleProof",
+    "MerkleTree",
+    "ReceiptLocation",
+    "ReceiptLog",
+    "ReceiptPipeline",
+    "ReceiptProof",
+    "SegmentSeal",
+    "Signer",
+    "WriteBehindQueue",
+    "digest_signer",
+    "hmac_signer",
+    "leaf_hash",
+]
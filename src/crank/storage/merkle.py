@@ -0,0 +1,126 @@
+"""
+Merkle Trees
+
+Binary hash trees over a sequence of records, used to commit to a whole
+segment of receipts with one root (and one signature):
+- Leaves and interior nodes are domain-separated (RFC 6962 prefixes
+  ``0x00``/``0x01``), so a leaf can never be passed off as a subtree
+- A level with an odd node count promotes its last node unchanged
+- ``MerkleTree.proof(index)`` returns the sibling path for one leaf;
+  ``MerkleProof.verify(root)`` checks it without the other records
+"""
+
+import hashlib
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+EMPTY_ROOT = hashlib.sha256(b"").digest()
+
+
+def leaf_hash(data: bytes) -> bytes:
+    """Hash of one record as a tree leaf."""
+    return hashlib.sha256(LEAF_PREFIX + data).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    """Hash of an interior node from its children."""
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+@dataclass(frozen=True, slots=True)
+class MerkleProof:
+    """
+    Inclusion proof for one leaf.
+
+    ``path`` lists the sibling hashes from the leaf up to the root, each
+    flagged with whether the sibling sits on the left.
+    """
+
+    index: int
+    size: int
+    leaf: bytes
+    path: tuple[tuple[bool, bytes], ...]
+
+    def root(self) -> bytes:
+        """Root implied by the leaf and its path."""
+        digest = self.leaf
+        for sibling_is_left, sibling in self.path:
+            digest = node_hash(sibling, digest) if sibling_is_left else node_hash(digest, sibling)
+        return digest
+
+    def verify(self, root: bytes) -> bool:
+        """Whether the proof leads to ``root``."""
+        return self.root() == root
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-ready form (hashes as hex)."""
+        return {
+            "index": self.index,
+            "size": self.size,
+            "leaf": self.leaf.hex(),
+            "path": [
+                {"side": "left" if is_left else "right", "hash": sibling.hex()}
+                for is_left, sibling in self.path
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "MerkleProof":
+        """Inverse of ``to_dict``."""
+        return cls(
+            index=data["index"],
+            size=data["size"],
+            leaf=bytes.fromhex(data["leaf"]),
+            path=tuple(
+                (step["side"] == "left", bytes.fromhex(step["hash"])) for step in data["path"]
+            ),
+        )
+
+
+class MerkleTree:
+    """
+    Tree over precomputed leaf hashes (see ``leaf_hash``).
+
+    Every level is kept, so proofs cost O(log n) once the tree is built.
+    """
+
+    def __init__(self, leaves: Iterable[bytes]) -> None:
+        level = list(leaves)
+        self.levels: list[list[bytes]] = [level]
+        while len(level) > 1:
+            parents = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+            if len(level) % 2:
+                parents.append(level[-1])
+            level = parents
+            self.levels.append(level)
+
+    @property
+    def size(self) -> int:
+        """Number of leaves."""
+        return len(self.levels[0])
+
+    @property
+    def root(self) -> bytes:
+        """Root hash (``EMPTY_ROOT`` for an empty tree)."""
+        return self.levels[-1][0] if self.size else EMPTY_ROOT
+
+    def proof(self, index: int) -> MerkleProof:
+        """Inclusion proof for the leaf at ``index``."""
+        if not 0 <= index < self.size:
+            raise IndexError(f"Leaf {index} out of range for tree of {self.size}")
+        path: list[tuple[bool, bytes]] = []
+        position = index
+        for level in self.levels[:-1]:
+            sibling = position ^ 1
+            if sibling < len(level):  # No sibling: the node was promoted
+                path.append((sibling < position, level[sibling]))
+            position //= 2
+        return MerkleProof(
+            index=index, size=self.size, leaf=self.levels[0][index], path=tuple(path)
+        )
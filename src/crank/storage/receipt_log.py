@@ -0,0 +1,611 @@
+"""
+Receipt Log
+
+Durable, append-only store for audit receipts with one signed Merkle root
+per segment:
+- Receipts are appended as canonical JSON lines to the open segment file
+- A segment is sealed once it holds ``segment_size`` receipts (or on
+  ``seal()``): the root over its lines is signed and written beside it, so
+  one signature covers every receipt in the segment
+- An in-memory index maps receipt ids to segment, position and byte offset,
+  so ``lookup`` reads a single line and returns an inclusion proof without
+  scanning; the index is rebuilt from the segment files on open
+- ``ReceiptPipeline`` keeps all of this off the request path: payload
+  digests are computed in a thread pool and receipts are appended in batches
+
+Layout: ``segment-00000001.jsonl`` plus ``segment-00000001.seal.json`` once
+sealed. A partial trailing line left by a crash is truncated on open, and
+a full or non-final segment that was never sealed is sealed then.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from crank.protocols.codecs import CANONICAL_CODEC, EncodedPayload
+from crank.storage.merkle import MerkleProof, MerkleTree, leaf_hash
+from crank.storage.write_behind import DurabilityMode
+
+logger = logging.getLogger(__name__)
+
+Signer = Callable[[bytes], str]
+
+
+def digest_signer(message: bytes) -> str:
+    """Unkeyed SHA-256 (integrity only), the scheme receipts were signed with so far."""
+    return hashlib.sha256(message).hexdigest()
+
+
+def hmac_signer(key: bytes) -> Signer:
+    """HMAC-SHA256 signer; verifying a seal needs the same key."""
+
+    def sign(message: bytes) -> str:
+        return hmac.new(key, message, hashlib.sha256).hexdigest()
+
+    return sign
+
+
+@dataclass(frozen=True, slots=True)
+class ReceiptLocation:
+    """Where a receipt lives: segment, leaf position, and byte range of its line."""
+
+    segment: int
+    index: int
+    offset: int
+    length: int
+
+
+@dataclass(frozen=True, slots=True)
+class SegmentSeal:
+    """Signed Merkle root of a sealed segment."""
+
+    segment: int
+    size: int
+    root: str
+    sealed_at: str
+    signature: str
+
+    def message(self) -> bytes:
+        """The bytes covered by ``signature``."""
+        return CANONICAL_CODEC.encode(
+            {
+                "segment": self.segment,
+                "size": self.size,
+                "root": self.root,
+                "sealed_at": self.sealed_at,
+            }
+        )
+
+    def verify(self, signer: Signer = digest_signer) -> bool:
+        """Whether ``signature`` matches, given the signer that produced it."""
+        return hmac.compare_digest(signer(self.message()), self.signature)
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-ready form."""
+        return asdict(self)
+
+
+@dataclass(frozen=True, slots=True)
+class ReceiptProof:
+    """A stored receipt plus, once its segment is sealed, its inclusion proof."""
+
+    receipt: dict[str, Any]
+    location: ReceiptLocation
+    seal: SegmentSeal | None
+    proof: MerkleProof | None
+
+    @property
+    def sealed(self) -> bool:
+        """Whether the receipt is covered by a signed root yet."""
+        return self.seal is not None
+
+    def verify(self) -> bool:
+        """Whether the receipt hashes to the proof's leaf and the proof reaches the root."""
+        if self.seal is None or self.proof is None:
+            return False
+        if leaf_hash(CANONICAL_CODEC.encode(self.receipt)) != self.proof.leaf:
+            return False
+        return self.proof.verify(bytes.fromhex(self.seal.root))
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-ready form for receipt lookup endpoints."""
+        return {
+            "receipt": self.receipt,
+            "segment": self.location.segment,
+            "index": self.location.index,
+            "sealed": self.sealed,
+            "seal": self.seal.to_dict() if self.seal else None,
+            "proof": self.proof.to_dict() if self.proof else None,
+        }
+
+
+class ReceiptLog:
+    """
+    Segmented receipt store.
+
+    Methods do blocking file I/O; async callers go through ``ReceiptPipeline``
+    (or ``asyncio.to_thread``). Appends and seals are serialized by a lock;
+    lookups run concurrently with them.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        segment_size: int = 4096,
+        durability: DurabilityMode = DurabilityMode.GROUP,
+        signer: Signer = digest_signer,
+        id_field: str = "receipt_id",
+        tree_cache_size: int = 8,
+    ) -> None:
+        """
+        Open (or create) a log, rebuilding the index from existing segments.
+
+        Args:
+            directory: Holds the segment and seal files
+            segment_size: Receipts per segment before it is sealed
+            durability: NONE skips fsync; FSYNC and GROUP fsync every append
+            signer: Signs segment roots (e.g. ``hmac_signer(key)``)
+            id_field: Receipt field holding its unique id
+            tree_cache_size: Sealed segment trees kept in memory for proofs
+        """
+        if segment_size < 1:
+            raise ValueError("segment_size must be at least 1")
+
+        self.directory = Path(directory)
+        self.segment_size = segment_size
+        self.durability = durability
+        self.id_field = id_field
+        self._signer = signer
+        self._tree_cache_size = tree_cache_size
+
+        self._lock = threading.Lock()
+        self._tree_lock = threading.Lock()
+        self._index: dict[str, ReceiptLocation] = {}
+        self._seals: dict[int, SegmentSeal] = {}
+        self._trees: OrderedDict[int, MerkleTree] = OrderedDict()
+
+        # Open segment
+        self._segment = 1
+        self._leaves: list[bytes] = []
+        self._offset = 0
+        self._opened_at: float | None = None
+
+        self.receipts_appended = 0
+        self.segments_sealed = 0
+        self.fsync_calls = 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._recover()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def open_age(self) -> float:
+        """Seconds since the first receipt entered the open segment (0 when empty)."""
+        return 0.0 if self._opened_at is None else time.monotonic() - self._opened_at
+
+    def append(self, receipts: Sequence[Mapping[str, Any]]) -> list[ReceiptLocation]:
+        """
+        Append receipts, sealing segments as they fill.
+
+        Returns:
+            One location per receipt, in order
+        """
+        locations: list[ReceiptLocation] = []
+        with self._lock:
+            remaining = list(receipts)
+            while remaining:
+                room = self.segment_size - len(self._leaves)
+                chunk, remaining = remaining[:room], remaining[room:]
+                locations.extend(self._write(chunk))
+                if len(self._leaves) >= self.segment_size:
+                    self._seal_open_segment()
+        return locations
+
+    def seal(self) -> SegmentSeal | None:
+        """Seal the open segment now; None when it is empty."""
+        with self._lock:
+            return self._seal_open_segment() if self._leaves else None
+
+    def lookup(self, receipt_id: str) -> ReceiptProof | None:
+        """A receipt and its proof by id; None when unknown."""
+        location = self._index.get(receipt_id)
+        if location is None:
+            return None
+        with self._segment_path(location.segment).open("rb") as segment_file:
+            segment_file.seek(location.offset)
+            line = segment_file.read(location.length)
+
+        seal = self._seals.get(location.segment)
+        proof = None
+        if seal is not None:
+            proof = self._tree(location.segment, seal).proof(location.index)
+        return ReceiptProof(json.loads(line), location, seal, proof)
+
+    def stats(self) -> dict[str, int | float]:
+        """Counters for status endpoints and benchmarks."""
+        return {
+            "receipts": len(self._index),
+            "open_segment": self._segment,
+            "open_receipts": len(self._leaves),
+            "segments_sealed": len(self._seals),
+            "receipts_appended": self.receipts_appended,
+            "fsync_calls": self.fsync_calls,
+        }
+
+    # --- Writing ---
+
+    def _write(self, receipts: list[Mapping[str, Any]]) -> list[ReceiptLocation]:
+        lines = [CANONICAL_CODEC.encode(dict(receipt)) for receipt in receipts]
+        data = b"".join(line + b"\n" for line in lines)
+        path = self._segment_path(self._segment)
+        durable = self.durability is not DurabilityMode.NONE
+
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view) :]
+            if durable:
+                os.fsync(fd)
+                self.fsync_calls += 1
+        except OSError:
+            os.ftruncate(fd, self._offset)  # Drop a partially written batch
+            raise
+        finally:
+            os.close(fd)
+        if durable and self._offset == 0:
+            self._fsync_directory()  # New segment file
+
+        locations = []
+        for receipt, line in zip(receipts, lines):
+            location = ReceiptLocation(self._segment, len(self._leaves), self._offset, len(line))
+            self._index[str(receipt[self.id_field])] = location
+            self._leaves.append(leaf_hash(line))
+            self._offset += len(line) + 1
+            locations.append(location)
+        if self._opened_at is None:
+            self._opened_at = time.monotonic()
+        self.receipts_appended += len(lines)
+        return locations
+
+    def _seal_open_segment(self) -> SegmentSeal:
+        tree = MerkleTree(self._leaves)
+        sealed_at = datetime.now(timezone.utc).isoformat()
+        unsigned = SegmentSeal(self._segment, tree.size, tree.root.hex(), sealed_at, "")
+        seal = replace(unsigned, signature=self._signer(unsigned.message()))
+
+        path = self._seal_path(self._segment)
+        temp_path = path.with_name(f".{path.name}.tmp")
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, CANONICAL_CODEC.encode(seal.to_dict()))
+            if self.durability is not DurabilityMode.NONE:
+                os.fsync(fd)
+                self.fsync_calls += 1
+        finally:
+            os.close(fd)
+        os.replace(temp_path, path)
+        if self.durability is not DurabilityMode.NONE:
+            self._fsync_directory()
+
+        self._seals[seal.segment] = seal
+        self._cache_tree(seal.segment, tree)
+        self.segments_sealed += 1
+        logger.info(
+            "Sealed receipt segment %d (%d receipts, root %s)", seal.segment, seal.size, seal.root
+        )
+
+        self._segment += 1
+        self._leaves = []
+        self._offset = 0
+        self._opened_at = None
+        return seal
+
+    def _fsync_directory(self) -> None:
+        try:
+            fd = os.open(self.directory, os.O_RDONLY)
+        except OSError:
+            return  # Platforms without directory handles (Windows)
+        try:
+            os.fsync(fd)
+            self.fsync_calls += 1
+        except OSError as exc:
+            logger.debug("Directory fsync unsupported for %s: %s", self.directory, exc)
+        finally:
+            os.close(fd)
+
+    # --- Reading ---
+
+    def _recover(self) -> None:
+        numbers = sorted(
+            int(path.name[len("segment-") : -len(".jsonl")])
+            for path in self.directory.glob("segment-*.jsonl")
+        )
+        for number in numbers:
+            seal_path = self._seal_path(number)
+            if seal_path.exists():
+                self._seals[number] = SegmentSeal(**json.loads(seal_path.read_bytes()))
+            leaves, size = self._index_segment(number)
+            if number in self._seals:
+                continue
+            self._segment, self._leaves, self._offset = number, leaves, size
+            self._opened_at = time.monotonic() if leaves else None
+            if number != numbers[-1] or len(leaves) >= self.segment_size:
+                logger.warning("Sealing receipt segment %d left open by a previous run", number)
+                self._seal_open_segment()
+        if numbers and numbers[-1] in self._seals:
+            self._segment = numbers[-1] + 1
+        if numbers:
+            logger.info(
+                "Opened receipt log %s: %d receipts in %d segments",
+                self.directory,
+                len(self._index),
+                len(numbers),
+            )
+
+    def _index_segment(self, number: int) -> tuple[list[bytes], int]:
+        path = self._segment_path(number)
+        data = path.read_bytes()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            logger.warning(
+                "Truncating %d bytes of partial receipt at end of %s", len(data) - end, path
+            )
+            os.truncate(path, end)
+
+        leaves = []
+        offset = 0
+        for position, line in enumerate(data[:end].split(b"\n")[:-1]):
+            receipt_id = str(json.loads(line)[self.id_field])
+            self._index[receipt_id] = ReceiptLocation(number, position, offset, len(line))
+            leaves.append(leaf_hash(line))
+            offset += len(line) + 1
+        return leaves, end
+
+    def _tree(self, number: int, seal: SegmentSeal) -> MerkleTree:
+        with self._tree_lock:
+            tree = self._trees.get(number)
+            if tree is not None:
+                self._trees.move_to_end(number)
+                return tree
+
+        lines = self._segment_path(number).read_bytes().split(b"\n")[:-1]
+        tree = MerkleTree(leaf_hash(line) for line in lines)
+        if tree.root.hex() != seal.root:
+            logger.error("Receipt segment %d does not match its sealed root", number)
+        self._cache_tree(number, tree)
+        return tree
+
+    def _cache_tree(self, number: int, tree: MerkleTree) -> None:
+        with self._tree_lock:
+            self._trees[number] = tree
+            self._trees.move_to_end(number)
+            while len(self._trees) > self._tree_cache_size:
+                self._trees.popitem(last=False)
+
+    def _segment_path(self, number: int) -> Path:
+        return self.directory / f"segment-{number:08d}.jsonl"
+
+    def _seal_path(self, number: int) -> Path:
+        return self.directory / f"segment-{number:08d}.seal.json"
+
+
+# --- Background pipeline ---
+
+
+@dataclass(slots=True)
+class _PendingReceipt:
+    """A submitted receipt waiting for its digests and append."""
+
+    receipt: dict[str, Any]
+    payloads: Mapping[str, EncodedPayload | None]
+    future: "asyncio.Future[ReceiptLocation]" = field(repr=False)
+
+
+def _retrieve_exception(future: "asyncio.Future[ReceiptLocation]") -> None:
+    # Failures are logged by the pipeline; fire-and-forget callers never await
+    if not future.cancelled():
+        future.exception()
+
+
+class ReceiptPipeline:
+    """
+    Asynchronous receipt hashing and batched appends for a ``ReceiptLog``.
+
+    The background task starts lazily on the first ``submit()``, so the
+    pipeline can be constructed outside a running event loop. Call
+    ``close()`` during shutdown to drain it; the open segment stays open and
+    is continued (or sealed) by the next process.
+    """
+
+    def __init__(
+        self,
+        log: ReceiptLog,
+        *,
+        hash_workers: int = 2,
+        max_batch: int = 512,
+        max_delay: float = 0.005,
+        digest_chars: int = 64,
+        seal_interval: float | None = 60.0,
+    ) -> None:
+        """
+        Initialize the pipeline.
+
+        Args:
+            log: Destination log
+            hash_workers: Threads computing payload digests
+            max_batch: Receipts appended per write (forced to 1 for FSYNC)
+            max_delay: Seconds to wait for more receipts before writing
+            digest_chars: Hex characters of each payload digest kept in the receipt
+            seal_interval: Seal a non-empty open segment after this many
+                seconds even if not full, bounding how long receipts wait for
+                a proof; never when None
+        """
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+
+        self.log = log
+        self.hash_workers = hash_workers
+        self.max_batch = 1 if log.durability is DurabilityMode.FSYNC else max_batch
+        self.max_delay = max_delay
+        self.digest_chars = digest_chars
+        self.seal_interval = seal_interval
+
+        self._queue: list[_PendingReceipt] = []
+        self._inflight: list[_PendingReceipt] = []
+        self._pending_ids: set[str] = set()
+        self._executor = ThreadPoolExecutor(hash_workers, thread_name_prefix="receipt-hash")
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._closed = False
+
+        self.receipts_submitted = 0
+        self.batches_written = 0
+        self.receipts_failed = 0
+
+    def submit(
+        self, receipt: Mapping[str, Any], payloads: Mapping[str, EncodedPayload | None]
+    ) -> "asyncio.Future[ReceiptLocation]":
+        """
+        Queue a receipt without waiting for it.
+
+        Args:
+            receipt: Receipt fields (JSON-ready); must include the log's id field
+            payloads: Receipt field -> payload whose canonical digest fills it
+                (None stores null)
+
+        Returns:
+            Future resolving to the receipt's location once it is written
+        """
+        if self._closed:
+            raise RuntimeError("ReceiptPipeline is closed")
+
+        future: asyncio.Future[ReceiptLocation] = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_retrieve_exception)
+        self._queue.append(_PendingReceipt(dict(receipt), payloads, future))
+        self._pending_ids.add(str(receipt[self.log.id_field]))
+        self.receipts_submitted += 1
+
+        self._ensure_worker()
+        self._wakeup.set()
+        return future
+
+    def is_pending(self, receipt_id: str) -> bool:
+        """Whether a submitted receipt has not been written yet."""
+        return receipt_id in self._pending_ids
+
+    async def lookup(self, receipt_id: str) -> ReceiptProof | None:
+        """``ReceiptLog.lookup`` off the event loop."""
+        return await asyncio.to_thread(self.log.lookup, receipt_id)
+
+    async def flush(self) -> None:
+        """Wait for every receipt submitted so far to be written (errors ignored)."""
+        futures = [item.future for item in self._queue + self._inflight]
+        if futures:
+            await asyncio.gather(*futures, return_exceptions=True)
+
+    async def close(self) -> None:
+        """Drain outstanding receipts and stop the background task."""
+        self._closed = True
+        await self.flush()
+        if self._task is not None:
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> dict[str, int | float]:
+        """Counters for status endpoints and benchmarks."""
+        return {
+            "pending": len(self._pending_ids),
+            "receipts_submitted": self.receipts_submitted,
+            "batches_written": self.batches_written,
+            "receipts_failed": self.receipts_failed,
+            **self.log.stats(),
+        }
+
+    def _ensure_worker(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="receipt-pipeline")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._seal_timeout())
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self.max_delay and self._queue and not self._closed:
+                await asyncio.sleep(self.max_delay)
+
+            while self._queue:
+                await self._write_next_batch()
+
+            if self.seal_interval is not None and self.log.open_age >= self.seal_interval:
+                try:
+                    await asyncio.to_thread(self.log.seal)
+                except OSError as exc:
+                    logger.error("Sealing receipt segment failed: %s", exc)
+
+            if self._closed:
+                return
+
+    def _seal_timeout(self) -> float | None:
+        if self.seal_interval is None or self.log.open_age == 0.0:
+            return None  # Nothing to seal; the next submit wakes the task
+        return max(self.seal_interval - self.log.open_age, 0.0)
+
+    async def _write_next_batch(self) -> None:
+        batch, self._queue = self._queue[: self.max_batch], self._queue[self.max_batch :]
+        self._inflight = batch
+
+        results: list[ReceiptLocation | Exception]
+        try:
+            loop = asyncio.get_running_loop()
+            step = -(-len(batch) // self.hash_workers)  # One slice per hash worker
+            await asyncio.gather(
+                *(
+                    loop.run_in_executor(self._executor, self._complete, batch[i : i + step])
+                    for i in range(0, len(batch), step)
+                )
+            )
+            locations = await asyncio.to_thread(self.log.append, [i.receipt for i in batch])
+            results = list(locations)
+            self.batches_written += 1
+        except Exception as exc:  # The batch as a whole is lost; fail every waiter
+            logger.error("Writing %d receipts failed: %s", len(batch), exc)
+            self.receipts_failed += len(batch)
+            results = [exc] * len(batch)
+        finally:
+            self._inflight = []
+
+        for item, result in zip(batch, results):
+            self._pending_ids.discard(str(item.receipt[self.log.id_field]))
+            if item.future.done():
+                continue
+            if isinstance(result, Exception):
+                item.future.set_exception(result)
+            else:
+                item.future.set_result(result)
+
+    def _complete(self, batch: list[_PendingReceipt]) -> None:
+        """Fill in payload digests (runs in a hash worker thread)."""
+        for item in batch:
+            for name, payload in item.payloads.items():
+                digest = None if payload is None else payload.stream_digest()[: self.digest_chars]
+                item.receipt[name] = digest
@@ -0,0 +1,257 @@
+"""
+Write-Behind File Persistence
+
+Async queue that takes file writes off the event loop:
+- Pending writes to the same path are coalesced (last write wins)
+- Batches are committed in a worker thread via ``asyncio.to_thread``
+- Every file is written atomically (temp file + ``os.replace``)
+- Parent directories are created once and remembered
+
+Durability is configurable per queue (see ``DurabilityMode``). Callers
+await ``write()`` and are acknowledged only once their data has reached
+the configured durability level.
+"""
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class DurabilityMode(str, Enum):
+    """
+    How far a write must get before it is acknowledged.
+
+    Inherits from str so modes can be read straight from environment
+    variables (``DurabilityMode("group")``).
+    """
+
+    FSYNC = "fsync"  # Each write committed alone: file and directory fsync
+    GROUP = "group"  # Writes committed in batches: file fsyncs, one fsync per directory
+    NONE = "none"  # Atomic rename only; the OS flushes when it likes
+
+
+def _empty_waiters() -> list["asyncio.Future[None]"]:
+    """Factory for empty waiter list with explicit type."""
+    return []
+
+
+@dataclass(slots=True)
+class _PendingWrite:
+    """Latest data queued for one path plus everyone waiting on it."""
+
+    path: Path
+    data: bytes
+    waiters: list["asyncio.Future[None]"] = field(default_factory=_empty_waiters)
+
+
+class WriteBehindQueue:
+    """
+    Coalescing, batching writer for small files.
+
+    The background task starts lazily on the first ``write()`` so the queue
+    can be constructed outside a running event loop (e.g. in worker
+    ``__init__``). Call ``close()`` during shutdown to drain it.
+    """
+
+    def __init__(
+        self,
+        durability: DurabilityMode = DurabilityMode.GROUP,
+        *,
+        max_batch: int = 256,
+        max_delay: float = 0.002,
+    ) -> None:
+        """
+        Initialize the queue.
+
+        Args:
+            durability: Acknowledgement guarantee for writes
+            max_batch: Maximum writes committed per batch (forced to 1 for FSYNC)
+            max_delay: Seconds to wait for more writes before committing a batch
+        """
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+
+        self.durability = durability
+        self.max_batch = 1 if durability is DurabilityMode.FSYNC else max_batch
+        self.max_delay = 0.0 if durability is DurabilityMode.FSYNC else max_delay
+
+        self._pending: dict[Path, _PendingWrite] = {}
+        self._inflight: list[asyncio.Future[None]] = []
+        self._known_dirs: set[Path] = set()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._closed = False
+
+        self.writes_submitted = 0
+        self.writes_coalesced = 0
+        self.batches_committed = 0
+        self.fsync_calls = 0
+
+    async def write(self, path: Path, data: str | bytes) -> None:
+        """
+        Queue a write and wait until it is committed.
+
+        Args:
+            path: Destination file
+            data: Text (UTF-8 encoded) or bytes
+
+        Raises:
+            RuntimeError: If the queue has been closed
+            OSError: If the write failed
+        """
+        await self.submit(path, data)
+
+    def submit(self, path: Path, data: str | bytes) -> "asyncio.Future[None]":
+        """
+        Queue a write without waiting for it.
+
+        Must be called from a running event loop. The returned future
+        resolves when the write is committed.
+        """
+        if self._closed:
+            raise RuntimeError("WriteBehindQueue is closed")
+
+        payload = data.encode("utf-8") if isinstance(data, str) else data
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self.writes_submitted += 1
+
+        pending = self._pending.get(path)
+        if pending is None:
+            self._pending[path] = _PendingWrite(path=path, data=payload, waiters=[waiter])
+        else:
+            pending.data = payload
+            pending.waiters.append(waiter)
+            self.writes_coalesced += 1
+
+        self._ensure_worker()
+        self._wakeup.set()
+        return waiter
+
+    async def flush(self) -> None:
+        """Wait for every write queued so far to be committed (errors ignored)."""
+        waiters = [w for pending in self._pending.values() for w in pending.waiters]
+        waiters.extend(self._inflight)
+        if waiters:
+            await asyncio.gather(*waiters, return_exceptions=True)
+
+    async def close(self) -> None:
+        """Drain outstanding writes and stop the background task."""
+        self._closed = True
+        await self.flush()
+        if self._task is not None:
+            self._wakeup.set()
+            await self._task
+            self._task = None
+
+    def stats(self) -> dict[str, int | str]:
+        """Counters for status endpoints and benchmarks."""
+        return {
+            "durability": self.durability.value,
+            "pending": len(self._pending),
+            "writes_submitted": self.writes_submitted,
+            "writes_coalesced": self.writes_coalesced,
+            "batches_committed": self.batches_committed,
+            "fsync_calls": self.fsync_calls,
+        }
+
+    def _ensure_worker(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="write-behind-queue")
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self.max_delay and not self._closed:
+                await asyncio.sleep(self.max_delay)
+
+            while self._pending:
+                await self._commit_next_batch()
+
+            if self._closed:
+                return
+
+    async def _commit_next_batch(self) -> None:
+        paths = list(self._pending)[: self.max_batch]
+        batch = [self._pending.pop(path) for path in paths]
+        self._inflight = [w for pending in batch for w in pending.waiters]
+
+        try:
+            errors = await asyncio.to_thread(self._commit, [(p.path, p.data) for p in batch])
+        except Exception as exc:  # Thread failed as a whole; fail every waiter
+            errors = [exc] * len(batch)
+        finally:
+            self._inflight = []
+
+        self.batches_committed += 1
+        for pending, error in zip(batch, errors):
+            for waiter in pending.waiters:
+                if waiter.done():
+                    continue
+                if error is None:
+                    waiter.set_result(None)
+                else:
+                    waiter.set_exception(error)
+
+    def _commit(self, items: list[tuple[Path, bytes]]) -> list[Exception | None]:
+        """Write one batch (runs in a worker thread)."""
+        errors: list[Exception | None] = []
+        dirty_dirs: set[Path] = set()
+        sync_files = self.durability is not DurabilityMode.NONE
+
+        for path, data in items:
+            try:
+                self._ensure_directory(path.parent)
+                self._write_atomic(path, data, sync_files)
+                if sync_files:
+                    dirty_dirs.add(path.parent)
+                errors.append(None)
+            except OSError as exc:
+                logger.error("Write-behind commit failed for %s: %s", path, exc)
+                errors.append(exc)
+
+        # Directory fsync makes the renames durable; once per directory per batch
+        for directory in dirty_dirs:
+            self._fsync_directory(directory)
+        return errors
+
+    def _ensure_directory(self, directory: Path) -> None:
+        if directory not in self._known_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._known_dirs.add(directory)
+
+    def _write_atomic(self, path: Path, data: bytes, sync: bool) -> None:
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view) :]
+                if sync:
+                    os.fsync(fd)
+                    self.fsync_calls += 1
+            finally:
+                os.close(fd)
+            os.replace(temp_path, path)
+        except OSError:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+    def _fsync_directory(self, directory: Path) -> None:
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return  # Platforms without directory handles (Windows)
+        try:
+            os.fsync(fd)
+            self.fsync_calls += 1
+        except OSError as exc:
+            logger.debug("Directory fsync unsupported for %s: %s", directory, exc)
+        finally:
+            os.close(fd)
@@ -4,7 +4,15 @@ Worker Runtime Package
 Shared runtime infrastructure for all Crank workers. Provides:
 - WorkerApplication base class with lifecycle management
 - Controller registration and heartbeat logic
+- Load measurement (in-flight, queue depth, p95 latency, CPU/RSS) reported
+  with each heartbeat for load-aware routing
 - Health check and graceful shutdown
+- Prometheus metrics: per-route request counts and latency histograms,
+  in-flight requests, event-loop lag and GC pauses
+- Blocking-call detection: event-loop stalls caught with the stack of the
+  blocking code, logged and summarized as hot spots in /status
+- On-demand CPU and heap profiling on /debug/profile for admin client
+  certificates
 - Certificate management (retrieval from controller)
 
 This eliminates code duplication across workers and enforces
@@ -24,7 +32,11 @@ Usage:
 """
 
 from crank.worker_runtime.base import WorkerApplication
+from crank.worker_runtime.blocking import BlockingDetector
+from crank.worker_runtime.debug import DebugProfiler
 from crank.worker_runtime.lifecycle import HealthStatus, ShutdownHandler, ShutdownTask
+from crank.worker_runtime.load import LoadTracker, LoadTrackingMiddleware
+from crank.worker_runtime.metrics import MetricsMiddleware, RuntimeMetrics
 from crank.worker_runtime.registration import (
     ControllerClient,
     WorkerRegistration,
@@ -32,10 +44,16 @@ from crank.worker_runtime.registration import (
 from crank.security import CertificateBundle, CertificateManager
 
 __all__: list[str] = [
+    "BlockingDetector",
     "CertificateBundle",
     "CertificateManager",
     "ControllerClient",
+    "DebugProfiler",
     "HealthStatus",
+    "LoadTracker",
+    "LoadTrackingMiddleware",
+    "MetricsMiddleware",
+    "RuntimeMetrics",
     "ShutdownHandler",
     "ShutdownTask",
     "WorkerApplication",
@@ -7,6 +7,14 @@ Provides the foundation for all Crank workers, handling:
 - Health check endpoints
 - Certificate management
 - FastAPI application setup
+- Request tracing (spans exported when CRANK_TRACE_EXPORT is set)
+- Prometheus metrics on /metrics (requests, latency, event-loop lag, GC)
+- Blocking-call detection: event-loop stalls over WORKER_BLOCKING_THRESHOLD_MS
+  (default 100, 0 disables) are logged with their stack and summarized
+  as hot spots in /status
+- On-demand profiling on /debug/profile (CPU stack samples or tracemalloc
+  heap growth), admin-only: callers need a client certificate whose CN is
+  listed in CRANK_ADMIN_IDENTITIES
 
 Workers subclass WorkerApplication and implement business logic.
 
@@ -20,21 +28,29 @@ Implementation Notes:
 
 import abc
 import logging
+import os
+import ssl
 import uuid
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from typing import Any, Optional
 
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from fastapi import Depends, FastAPI
+from fastapi.responses import JSONResponse, Response
 
 from crank.capabilities.schema import CapabilityDefinition
+from crank.observability import TracingMiddleware, configure_tracing
+from crank.observability.metrics import CONTENT_TYPE
 from crank.security import CertificateManager
+from crank.security.admin import AdminAuthorizer, tls_http_protocol
+from crank.worker_runtime.debug import DebugProfiler
 from crank.worker_runtime.lifecycle import (
     HealthCheckManager,
     HealthStatus,
     ShutdownHandler,
 )
+from crank.worker_runtime.load import LoadTracker, LoadTrackingMiddleware
+from crank.worker_runtime.metrics import MetricsMiddleware, RuntimeMetrics
 from crank.worker_runtime.registration import ControllerClient
 
 logger = logging.getLogger(__name__)
@@ -95,6 +111,12 @@ class WorkerApplication(abc.ABC):
         self.shutdown_handler = ShutdownHandler()
         self.health_manager = HealthCheckManager(self.worker_id)
         self.cert_manager = CertificateManager(self.worker_id)
+        self.load_tracker = LoadTracker()
+        self.tracer = configure_tracing(self.service_name)
+        blocking_ms = float(os.getenv("WORKER_BLOCKING_THRESHOLD_MS", "100"))
+        self.metrics = RuntimeMetrics(blocking_threshold=blocking_ms / 1000 or None)
+        self.admin = AdminAuthorizer.from_env()
+        self.profiler = DebugProfiler(self.service_name)
         self.controller_client: Optional[ControllerClient] = None
 
     def _configure_app(self) -> None:
@@ -112,6 +134,9 @@ class WorkerApplication(abc.ABC):
             lifespan=lifespan,
         )
 
+        self.app.add_middleware(LoadTrackingMiddleware, tracker=self.load_tracker)
+        self.app.add_middleware(MetricsMiddleware, metrics=self.metrics.http)
+        self.app.add_middleware(TracingMiddleware, tracer=self.tracer)
         self._setup_core_routes()
         self.shutdown_handler.setup_signal_handlers()
 
@@ -181,12 +206,12 @@ class WorkerApplication(abc.ABC):
 
     def _setup_core_routes(self) -> None:
         """
-        Set up standard health check and status routes.
+        Set up standard health check, status, metrics and profiling routes.
 
         NOTE: Route registration uses explicit binding pattern to avoid Pylance warnings.
         A route helper (_register_route) is DEFERRED until we have 5+ core routes.
-        Current: 2 routes (/health, /status). Future triggers:
-        - Adding /metrics, /debug, /admin endpoints
+        Current: 4 routes (/health, /status, /metrics, /debug/profile). Future triggers:
+        - Adding more /debug, /admin endpoints
         - Need for consistent middleware/tags across routes
         See: AGENT_CONTEXT.md "Code Beauty Philosophy" for rationale.
         """
@@ -211,11 +236,22 @@ class WorkerApplication(abc.ABC):
                 "capabilities": [cap.id for cap in self.get_capabilities()],
                 "uptime_seconds": self.health_manager.get_uptime(),
                 "health_status": self.health_manager.status.value,
+                "load": self.load_tracker.report().to_dict(),
+                "event_loop": self.metrics.event_loop_report(),
             }
 
         # Same explicit binding pattern for consistency
         self.app.get("/status")(status)
 
+        async def metrics() -> Response:
+            """Prometheus scrape endpoint (text exposition format 0.0.4)."""
+            return Response(self.metrics.render(), media_type=CONTENT_TYPE)
+
+        self.app.get("/metrics")(metrics)
+
+        # Admin-only: the dependency refuses callers without an admin client certificate
+        self.app.get("/debug/profile", dependencies=[Depends(self.admin)])(self.profiler.profile)
+
     async def _startup_handler(self) -> None:
         """
         Handle application startup (called by lifespan).
@@ -227,6 +263,7 @@ class WorkerApplication(abc.ABC):
         See: AGENT_CONTEXT.md "Code Beauty Philosophy" for rationale.
         """
         logger.info("🚀 Worker startup initiated")
+        self.metrics.start()
 
         # Initialize capabilities and controller client
         capabilities = self.get_capabilities()
@@ -234,6 +271,7 @@ class WorkerApplication(abc.ABC):
             worker_id=self.worker_id,
             worker_url=self.worker_url,
             capabilities=capabilities,
+            load_tracker=self.load_tracker,
         )
 
         # Register with controller
@@ -265,6 +303,10 @@ class WorkerApplication(abc.ABC):
         # Execute registered shutdown callbacks
         await self.shutdown_handler.execute_shutdown()
 
+        # Export the spans still buffered, stop runtime monitors
+        await self.tracer.close()
+        await self.metrics.stop()
+
         logger.info("✅ Worker shutdown complete")
 
     # ========================================================================
@@ -319,4 +361,8 @@ class WorkerApplication(abc.ABC):
             ssl_certfile=ssl_config["ssl_certfile"],
             ssl_keyfile=ssl_config["ssl_keyfile"],
             ssl_ca_certs=ssl_config["ssl_ca_certs"],
+            # Verify client certificates when presented, and expose them to the
+            # app so admin endpoints can authorize by certificate
+            ssl_cert_reqs=ssl.CERT_OPTIONAL,
+            http=tls_http_protocol(),
         )
@@ -0,0 +1,214 @@
+"""
+Blocking-Call Detection
+
+Finds the code that blocks a service's event loop in production
+(synchronous subprocesses, CPU-bound inference, file I/O in coroutines):
+- The loop beats periodically (``EventLoopLagMonitor``, one timer callback)
+- A watchdog thread polls the beat. Once a beat is ``threshold`` overdue
+  the loop is blocked right now, so the watchdog samples the loop thread's
+  stack: the stack of the blocking callback
+- When the loop beats again the stall is over: it is counted in
+  ``crank_event_loop_blocked_total`` and ``crank_event_loop_blocked_seconds``,
+  aggregated by stack into hot spots (reported on ``/status``) and logged
+  with its stack, at most once per ``LOG_INTERVAL`` per hot spot
+
+The loop only ever runs the beat; stacks are sampled on the watchdog
+thread, and only while the loop is blocked.
+"""
+
+import importlib.util
+import logging
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+from crank.observability.metrics import MetricsRegistry, get_registry
+
+if TYPE_CHECKING:
+    from crank.worker_runtime.metrics import EventLoopLagMonitor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BLOCKING_THRESHOLD = 0.1  # Seconds a beat may be overdue before it is a stall
+DEFAULT_MAX_HOT_SPOTS = 32  # Distinct stacks kept; the least costly is evicted beyond
+DEFAULT_STACK_LIMIT = 12  # Innermost frames kept per stack
+LOG_INTERVAL = 60.0  # Seconds between log lines for the same hot spot
+BLOCKED_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Dispatch machinery between the loop and the handler; not useful in a stack
+_FRAMEWORK_PACKAGES = ("anyio", "asyncio", "fastapi", "starlette", "uvicorn")
+
+
+def _package_dirs(names: tuple[str, ...]) -> tuple[str, ...]:
+    dirs = []
+    for name in names:
+        spec = importlib.util.find_spec(name)
+        for location in (spec and spec.submodule_search_locations) or ():
+            dirs.append(str(Path(location)) + "/")
+    return tuple(dirs)
+
+
+_FRAMEWORK_DIRS = _package_dirs(_FRAMEWORK_PACKAGES)
+
+
+@dataclass(slots=True)
+class HotSpot:
+    """Stalls that shared one stack."""
+
+    stack: tuple[str, ...]
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    last_seen: float = 0.0  # Unix time
+    logged_at: float = 0.0  # time.monotonic() of the last log line
+    unlogged: int = 0  # Stalls since the last log line
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "stack": list(self.stack),
+            "count": self.count,
+            "total_ms": round(self.total_seconds * 1000, 1),
+            "max_ms": round(self.max_seconds * 1000, 1),
+            "last_seen": datetime.fromtimestamp(self.last_seen, UTC).isoformat(),
+        }
+
+
+class BlockingDetector:
+    """Watchdog thread catching event-loop stalls with their stacks.
+
+    Args:
+        monitor: Beating lag monitor of the loop to watch
+        threshold: Seconds a beat may be overdue before it counts as a stall
+        registry: Registry for the stall series
+        max_hot_spots: Distinct stacks kept
+        stack_limit: Innermost frames kept per stack
+    """
+
+    def __init__(
+        self,
+        monitor: "EventLoopLagMonitor",
+        threshold: float = DEFAULT_BLOCKING_THRESHOLD,
+        registry: Optional[MetricsRegistry] = None,
+        max_hot_spots: int = DEFAULT_MAX_HOT_SPOTS,
+        stack_limit: int = DEFAULT_STACK_LIMIT,
+    ) -> None:
+        if threshold <= 0:
+            raise ValueError(f"threshold must be positive, got {threshold}")
+        registry = registry or get_registry()
+        self.monitor = monitor
+        self.threshold = threshold
+        self.max_hot_spots = max_hot_spots
+        self.stack_limit = stack_limit
+        self.stalls = registry.counter(
+            "crank_event_loop_blocked_total", "Event-loop stalls longer than the threshold"
+        ).labels()
+        self.stall_seconds = registry.histogram(
+            "crank_event_loop_blocked_seconds",
+            "Duration of event-loop stalls longer than the threshold",
+            buckets=BLOCKED_BUCKETS,
+        ).labels()
+        self._hot_spots: dict[tuple[str, ...], HotSpot] = {}
+        self._lock = threading.Lock()  # Watchdog writes, /status reads; never the loop
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loop_thread_id: Optional[int] = None
+
+    def start(self) -> None:
+        """Watch the loop of the calling thread (call from the running loop)."""
+        if self._thread is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._watch, name="crank-blocking-detector", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the watchdog thread."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+
+    def report(self) -> dict[str, Any]:
+        """Stall totals and hot spots, most total blocking time first."""
+        with self._lock:
+            hot_spots = sorted(
+                self._hot_spots.values(), key=lambda spot: spot.total_seconds, reverse=True
+            )
+            return {
+                "threshold_ms": round(self.threshold * 1000, 1),
+                "stalls": int(self.stalls.value),
+                "blocked_ms": round(self.stall_seconds.sum * 1000, 1),
+                "hot_spots": [spot.to_dict() for spot in hot_spots],
+            }
+
+    # --- Watchdog Thread ---
+
+    def _watch(self) -> None:
+        poll = max(self.threshold / 4, 0.005)
+        stalled_beat = 0.0  # next_due of the beat the current stall is holding up
+        stack: tuple[str, ...] = ()
+        longest = 0.0
+        while not self._stopping.wait(poll):
+            due = self.monitor.next_due
+            if not due:
+                continue
+            overdue = time.monotonic() - due
+            if stalled_beat and due != stalled_beat:
+                self._record(stack, longest)  # The loop beat again: stall over
+                stalled_beat = 0.0
+            if stalled_beat:
+                longest = max(longest, overdue)
+            elif overdue >= self.threshold:
+                stalled_beat, stack, longest = due, self._sample(), overdue
+
+    def _sample(self) -> tuple[str, ...]:
+        """Innermost frames of the loop thread, without the dispatch machinery."""
+        frame = sys._current_frames().get(self._loop_thread_id or 0)
+        if frame is None:
+            return ("<loop thread gone>",)
+        frames = [
+            entry
+            for entry in traceback.extract_stack(frame)
+            if not entry.filename.startswith(_FRAMEWORK_DIRS)
+        ]
+        return tuple(
+            f"{entry.filename}:{entry.lineno} in {entry.name}"
+            for entry in frames[-self.stack_limit :]
+        )
+
+    def _record(self, stack: tuple[str, ...], seconds: float) -> None:
+        self.stalls.inc()
+        self.stall_seconds.observe(seconds)
+        now = time.monotonic()
+        with self._lock:
+            spot = self._hot_spots.get(stack)
+            if spot is None:
+                if len(self._hot_spots) >= self.max_hot_spots:
+                    cheapest = min(self._hot_spots.values(), key=lambda s: s.total_seconds)
+                    del self._hot_spots[cheapest.stack]
+                spot = self._hot_spots[stack] = HotSpot(stack)
+            spot.count += 1
+            spot.total_seconds += seconds
+            spot.max_seconds = max(spot.max_seconds, seconds)
+            spot.last_seen = time.time()
+            spot.unlogged += 1
+            if spot.logged_at and now - spot.logged_at < LOG_INTERVAL:
+                return
+            stalls, spot.unlogged, spot.logged_at = spot.unlogged, 0, now
+        logger.warning(
+            "Event loop blocked for %.0fms (threshold %.0fms, %d stall(s) here since last "
+            "report), at:\n%s",
+            seconds * 1000,
+            self.threshold * 1000,
+            stalls,
+            "\n".join(f"  {line}" for line in stack),
+        )
@@ -0,0 +1,90 @@
+"""
+Debug Endpoints
+
+``GET /debug/profile`` profiles a running worker or controller on demand:
+
+    /debug/profile?seconds=10                       CPU, collapsed stacks
+    /debug/profile?seconds=10&format=speedscope     CPU, speedscope JSON
+    /debug/profile?seconds=30&kind=memory           Heap growth by allocation stack
+
+CPU profiles come from a statistical stack sampler and memory profiles
+from ``tracemalloc`` snapshots diffed over the window
+(``crank.observability.profiling``). The request waits out the window
+while the service keeps serving; stopping the profiler (joining the
+sampler thread, diffing snapshots) and rendering run in a worker thread
+so they never stall the event loop either. One profile runs at a time per
+process (409 otherwise).
+
+The route is admin-only: callers must present an admin client
+certificate (``crank.security.admin``).
+"""
+
+import asyncio
+import logging
+from typing import Literal
+
+from fastapi import HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+
+from crank.observability.profiling import (
+    DEFAULT_SAMPLE_INTERVAL,
+    AllocationTracer,
+    StackSampler,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_PROFILE_SECONDS = 120.0
+
+_profile_lock = asyncio.Lock()  # Sampler and tracemalloc are process-wide
+
+
+class DebugProfiler:
+    """Handler of ``/debug/profile``.
+
+    Args:
+        service_name: Name given to speedscope files
+        max_seconds: Longest profile accepted
+    """
+
+    def __init__(self, service_name: str, max_seconds: float = MAX_PROFILE_SECONDS) -> None:
+        self.service_name = service_name
+        self.max_seconds = max_seconds
+
+    async def profile(
+        self,
+        seconds: float = Query(10.0, gt=0, description="Profiling window"),
+        kind: Literal["cpu", "memory"] = Query("cpu"),
+        format: Literal["collapsed", "speedscope"] = Query("collapsed"),
+        interval_ms: float = Query(DEFAULT_SAMPLE_INTERVAL * 1000, ge=1, le=1000),
+        idle: bool = Query(False, description="Count threads waiting for work"),
+    ) -> Response:
+        """Profile the process for ``seconds`` and return the weighted stacks."""
+        if seconds > self.max_seconds:
+            raise HTTPException(422, f"seconds must be at most {self.max_seconds:g}")
+        if _profile_lock.locked():
+            raise HTTPException(409, "A profile is already running")
+
+        async with _profile_lock:
+            logger.info("Profiling %s for %.1fs (%s, %s)", self.service_name, seconds, kind, format)
+            name = f"{self.service_name} {kind} {seconds:g}s"
+            if kind == "cpu":
+                sampler = StackSampler(interval_ms / 1000, include_idle=idle)
+                sampler.start()
+                try:
+                    await asyncio.sleep(seconds)
+                finally:
+                    await asyncio.to_thread(sampler.stop)
+                if format == "speedscope":
+                    return JSONResponse(await asyncio.to_thread(sampler.speedscope, name))
+                return PlainTextResponse(await asyncio.to_thread(sampler.collapsed))
+
+            tracer = AllocationTracer()
+            tracer.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                await asyncio.to_thread(tracer.stop)
+            if format == "speedscope":
+                return JSONResponse(await asyncio.to_thread(tracer.speedscope, name))
+            return PlainTextResponse(await asyncio.to_thread(tracer.collapsed))
@@ -0,0 +1,107 @@
+"""
+Worker Load Measurement
+
+Measures what the controller needs to route on and packs it into the
+heartbeat load vector (``crank.controller.load.LoadReport``):
+- In-flight requests and queue depth
+- p95 latency over a ring buffer of the most recent requests
+- Process CPU (fraction of the machine) and resident memory
+
+``LoadTrackingMiddleware`` counts HTTP requests automatically; workers with
+their own internal queue pass ``queue_depth`` to report it.
+"""
+
+import logging
+import os
+import time
+from array import array
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, Optional
+
+import psutil
+
+from crank.controller.load import LoadReport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LATENCY_WINDOW = 256  # Recent requests the p95 is computed over
+UNTRACKED_PATHS = frozenset({"/health", "/status", "/metrics"})  # Probes, not work
+
+
+class LoadTracker:
+    """
+    Running load measurements for one worker process.
+
+    Args:
+        latency_window: Number of recent request latencies kept for the p95
+        queue_depth: Returns the number of requests waiting to start
+            (default: none are queued)
+    """
+
+    def __init__(
+        self,
+        latency_window: int = DEFAULT_LATENCY_WINDOW,
+        queue_depth: Optional[Callable[[], int]] = None,
+    ) -> None:
+        self.in_flight = 0
+        self.completed = 0
+        self._latencies = array("d", [0.0] * latency_window)
+        self._queue_depth = queue_depth
+        self._process = psutil.Process(os.getpid())
+        self._cpu_count = psutil.cpu_count() or 1
+        self._process.cpu_percent(None)  # Prime: the next call measures since now
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        """Count a request as in flight and record its latency."""
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.observe((time.perf_counter() - start) * 1000)
+
+    def observe(self, latency_ms: float) -> None:
+        """Record a completed request's latency."""
+        self._latencies[self.completed % len(self._latencies)] = latency_ms
+        self.completed += 1
+
+    def p95_ms(self) -> float:
+        """95th percentile latency of the recent requests (0 before any)."""
+        count = min(self.completed, len(self._latencies))
+        if count == 0:
+            return 0.0
+        recent = sorted(self._latencies[:count])
+        return recent[min(count - 1, int(count * 0.95))]
+
+    def report(self) -> LoadReport:
+        """Current load sample (CPU is measured since the previous report)."""
+        cpu = self._process.cpu_percent(None) / 100 / self._cpu_count
+        rss_mb = self._process.memory_info().rss / (1024 * 1024)
+        return LoadReport(
+            in_flight=float(self.in_flight),
+            queue_depth=float(self._queue_depth() if self._queue_depth else 0),
+            p95_ms=round(self.p95_ms(), 2),
+            cpu=round(min(cpu, 1.0), 4),
+            rss_mb=round(rss_mb, 1),
+        )
+
+
+class LoadTrackingMiddleware:
+    """ASGI middleware counting HTTP requests into a ``LoadTracker``.
+
+    Health, status and metrics probes are not counted.
+    """
+
+    def __init__(self, app: Any, tracker: LoadTracker) -> None:
+        self.app = app
+        self.tracker = tracker
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or scope.get("path") in UNTRACKED_PATHS:
+            await self.app(scope, receive, send)
+            return
+        with self.tracker.track():
+            await self.app(scope, receive, send)
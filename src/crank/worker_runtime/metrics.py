@@ -0,0 +1,290 @@
+"""
+Worker Runtime Metrics
+
+Prometheus series served on ``/metrics`` by every worker and the controller
+(registry and exposition format in ``crank.observability.metrics``):
+- ``crank_http_requests_total{method,route,status}``
+- ``crank_http_request_duration_seconds{method,route}`` (histogram)
+- ``crank_http_requests_in_flight``
+- ``crank_event_loop_lag_seconds`` (histogram): how late a periodic timer
+  fires, i.e. how long callbacks wait behind blocking work
+- ``crank_gc_pause_seconds{generation}`` (histogram),
+  ``crank_gc_collections_total{generation}`` and
+  ``crank_gc_collected_objects_total{generation}``
+- ``crank_event_loop_blocked_total`` and ``crank_event_loop_blocked_seconds``:
+  stalls caught by the blocking detector (``crank.worker_runtime.blocking``)
+
+Requests are labelled with their route template (``/jobs/{job_id}``), not
+the raw path, so label values stay bounded; requests matching no route
+share ``route="unmatched"``. Health, status and metrics probes are not
+counted.
+"""
+
+import asyncio
+import gc
+import logging
+import time
+from typing import Any, Optional
+from weakref import WeakKeyDictionary
+
+from crank.observability.metrics import MetricsRegistry, get_registry
+from crank.worker_runtime.blocking import DEFAULT_BLOCKING_THRESHOLD, BlockingDetector
+from crank.worker_runtime.load import UNTRACKED_PATHS
+
+logger = logging.getLogger(__name__)
+
+UNMATCHED_ROUTE = "unmatched"
+LOOP_LAG_INTERVAL = 0.05  # Seconds between event-loop lag beats
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+GC_PAUSE_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+
+
+# --- HTTP ---
+
+
+class HttpMetrics:
+    """Request count, latency and in-flight series for one ASGI app."""
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None) -> None:
+        registry = registry or get_registry()
+        self.requests = registry.counter(
+            "crank_http_requests_total", "HTTP requests handled", ("method", "route", "status")
+        )
+        self.duration = registry.histogram(
+            "crank_http_request_duration_seconds",
+            "HTTP request latency",
+            ("method", "route"),
+        )
+        self.in_flight = registry.gauge(
+            "crank_http_requests_in_flight", "HTTP requests being handled"
+        ).labels()
+
+    def observe(self, method: str, route: str, status: int, seconds: float) -> None:
+        """Record one completed request."""
+        self.requests.labels(method, route, status).inc()
+        self.duration.labels(method, route).observe(seconds)
+
+
+class MetricsMiddleware:
+    """ASGI middleware feeding ``HttpMetrics``.
+
+    Requests that raise count as status 500.
+    """
+
+    def __init__(self, app: Any, metrics: HttpMetrics) -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or scope.get("path") in UNTRACKED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight = self.metrics.in_flight
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            route = scope.get("route")  # Set by the router once matched
+            self.metrics.observe(
+                scope.get("method", "GET"),
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status,
+                time.perf_counter() - start,
+            )
+
+
+# --- Event Loop Lag ---
+
+
+class EventLoopLagMonitor:
+    """Measures event-loop lag with a periodic timer callback.
+
+    Each beat records how late it ran and schedules the next one, so the
+    loop pays one cheap callback per interval. ``next_due`` lets another
+    thread see that a beat is overdue while the loop is still blocked
+    (``crank.worker_runtime.blocking``).
+
+    Args:
+        registry: Registry for ``crank_event_loop_lag_seconds``
+        interval: Seconds between beats
+    """
+
+    def __init__(
+        self, registry: Optional[MetricsRegistry] = None, interval: float = LOOP_LAG_INTERVAL
+    ) -> None:
+        self.interval = interval
+        self.lag = (registry or get_registry()).histogram(
+            "crank_event_loop_lag_seconds",
+            "Delay of a periodic event-loop timer past its due time",
+            buckets=LOOP_LAG_BUCKETS,
+        )
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.next_due = 0.0  # time.monotonic() of the next beat; 0 while stopped
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def running(self) -> bool:
+        return self._handle is not None
+
+    def start(self) -> None:
+        """Start beating on the running event loop."""
+        if self._handle is None:
+            self._schedule(asyncio.get_running_loop())
+
+    async def stop(self) -> None:
+        """Stop beating."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self.next_due = 0.0
+
+    def _schedule(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.next_due = time.monotonic() + self.interval
+        self._handle = loop.call_later(self.interval, self._beat, loop)
+
+    def _beat(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.last_lag = max(time.monotonic() - self.next_due, 0.0)
+        self.max_lag = max(self.max_lag, self.last_lag)
+        self.lag.labels().observe(self.last_lag)
+        self._schedule(loop)
+
+
+# --- Garbage Collection ---
+
+
+class GCMonitor:
+    """Times garbage-collector pauses through ``gc.callbacks``.
+
+    Installs are counted so that several apps sharing a registry (and so a
+    monitor, see ``gc_monitor()``) install one callback between them.
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None) -> None:
+        registry = registry or get_registry()
+        self.pause = registry.histogram(
+            "crank_gc_pause_seconds",
+            "Garbage collector pause",
+            ("generation",),
+            buckets=GC_PAUSE_BUCKETS,
+        )
+        self.collections = registry.counter(
+            "crank_gc_collections_total", "Garbage collections", ("generation",)
+        )
+        self.collected = registry.counter(
+            "crank_gc_collected_objects_total",
+            "Objects freed by the garbage collector",
+            ("generation",),
+        )
+        self._installs = 0
+        self._started = 0.0
+
+    def install(self) -> None:
+        """Start timing collections."""
+        if self._installs == 0:
+            gc.callbacks.append(self._on_gc)
+        self._installs += 1
+
+    def uninstall(self) -> None:
+        """Stop timing collections once every install is undone."""
+        self._installs = max(self._installs - 1, 0)
+        if self._installs == 0 and self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+
+    def _on_gc(self, phase: str, info: dict[str, int]) -> None:
+        if phase == "start":
+            self._started = time.perf_counter()
+            return
+        generation = info["generation"]
+        self.pause.labels(generation).observe(time.perf_counter() - self._started)
+        self.collections.labels(generation).inc()
+        self.collected.labels(generation).inc(info["collected"])
+
+
+_gc_monitors: WeakKeyDictionary[MetricsRegistry, GCMonitor] = WeakKeyDictionary()
+
+
+def gc_monitor(registry: Optional[MetricsRegistry] = None) -> GCMonitor:
+    """The GC monitor recording into ``registry`` (one per registry)."""
+    registry = registry or get_registry()
+    monitor = _gc_monitors.get(registry)
+    if monitor is None:
+        monitor = _gc_monitors[registry] = GCMonitor(registry)
+    return monitor
+
+
+# --- Runtime Bundle ---
+
+
+class RuntimeMetrics:
+    """HTTP, event-loop and GC metrics for one service, served on ``/metrics``.
+
+    Args:
+        registry: Registry to record into (default: the process-wide one,
+            which also holds the certificate event series)
+        blocking_threshold: Seconds of event-loop stall reported with its
+            stack by the blocking detector (None disables the detector)
+    """
+
+    def __init__(
+        self,
+        registry: Optional[MetricsRegistry] = None,
+        blocking_threshold: Optional[float] = DEFAULT_BLOCKING_THRESHOLD,
+    ) -> None:
+        self.registry = registry or get_registry()
+        self.http = HttpMetrics(self.registry)
+        self.loop_lag = EventLoopLagMonitor(self.registry)
+        self.blocking = (
+            BlockingDetector(self.loop_lag, blocking_threshold, self.registry)
+            if blocking_threshold
+            else None
+        )
+        self.gc = gc_monitor(self.registry)
+        self._started = False
+
+    def start(self) -> None:
+        """Start event-loop, blocking and GC monitoring (call from the running loop)."""
+        if self._started:
+            return
+        self._started = True
+        self.loop_lag.start()
+        if self.blocking is not None:
+            self.blocking.start()
+        self.gc.install()
+
+    async def stop(self) -> None:
+        """Stop event-loop, blocking and GC monitoring."""
+        if not self._started:
+            return
+        self._started = False
+        if self.blocking is not None:
+            self.blocking.stop()
+        await self.loop_lag.stop()
+        self.gc.uninstall()
+
+    def event_loop_report(self) -> dict[str, Any]:
+        """Loop lag and, with the detector on, stalls and their hot spots."""
+        report: dict[str, Any] = {
+            "lag_ms": {
+                "last": round(self.loop_lag.last_lag * 1000, 2),
+                "max": round(self.loop_lag.max_lag * 1000, 2),
+            }
+        }
+        if self.blocking is not None:
+            report.update(self.blocking.report())
+        return report
+
+    def render(self) -> str:
+        """All series in the registry, in Prometheus text format."""
+        return self.registry.render()
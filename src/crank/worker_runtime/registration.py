@@ -3,7 +3,8 @@ Worker Registration and Controller Communication
 
 Handles:
 - Worker registration with controller
-- Heartbeat mechanism with retry logic
+- Heartbeat mechanism with retry logic, reporting the worker's load vector
+  to the routing controller
 - Controller discovery
 - HTTP client management with proper SSL/TLS
 """
@@ -17,6 +18,9 @@ import httpx
 from pydantic import BaseModel, Field
 
 from crank.capabilities.schema import CapabilityDefinition
+from crank.controller.load import LoadReport
+from crank.observability import tracing_event_hooks
+from crank.worker_runtime.load import LoadTracker
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +62,8 @@ class ControllerClient:
         controller_url: Optional[str] = None,
         auth_token: Optional[str] = None,
         verify_ssl: bool = False,
+        load_tracker: Optional[LoadTracker] = None,
+        routing_url: Optional[str] = None,
     ) -> None:
         """
         Initialize controller client.
@@ -69,11 +75,17 @@ class ControllerClient:
             controller_url: Controller endpoint (defaults to PLATFORM_URL env var)
             auth_token: Authentication token (defaults to PLATFORM_AUTH_TOKEN env var)
             verify_ssl: Whether to verify SSL certificates (default: False for dev)
+            load_tracker: Source of the load reported with each heartbeat
+                (default: report an idle worker)
+            routing_url: Controller that routes requests to this worker; its
+                /heartbeat receives the load vector (defaults to CONTROLLER_URL
+                env var, unset: load is only summarized in load_score)
         """
         self.worker_id = worker_id
         self.worker_url = worker_url
         self.capabilities = capabilities
         self.verify_ssl = verify_ssl
+        self.load_tracker = load_tracker
 
         # Controller connection settings (with backwards-compatible defaults)
         self.controller_url = controller_url or os.getenv(
@@ -84,6 +96,7 @@ class ControllerClient:
             "PLATFORM_AUTH_TOKEN",
             "local-dev-key",
         )
+        self.routing_url = routing_url or os.getenv("CONTROLLER_URL")
 
         # HTTP client lifecycle
         self._http_client: Optional[httpx.AsyncClient] = None
@@ -97,7 +110,8 @@ class ControllerClient:
         """
         Get or create HTTP client with proper configuration.
 
-        Client is lazily initialized and reused across requests.
+        Client is lazily initialized and reused across requests, and sends
+        the caller's trace context (``traceparent``) with each one.
         """
         if self._http_client is None:
             self._http_client = httpx.AsyncClient(
@@ -107,6 +121,7 @@ class ControllerClient:
                     max_keepalive_connections=5,
                     max_connections=10,
                 ),
+                event_hooks=tracing_event_hooks(),
             )
         return self._http_client
 
@@ -204,9 +219,10 @@ class ControllerClient:
 
         # Platform expects form data with service_type and load_score
         service_type = self._derive_service_type()
+        load = self.load_tracker.report() if self.load_tracker else LoadReport()
         form_data = {
             "service_type": service_type,
-            "load_score": "0.0",
+            "load_score": f"{load.score():.4f}",
         }
 
         try:
@@ -223,6 +239,27 @@ class ControllerClient:
         except Exception as e:
             logger.warning(f"💔 Heartbeat error: {e}")
 
+        if self.routing_url:
+            await self._send_load(load)
+
+    async def _send_load(self, load: LoadReport) -> None:
+        """Heartbeat the routing controller with the full load vector."""
+        try:
+            client = await self._get_http_client()
+            response = await client.post(
+                f"{self.routing_url}/heartbeat",
+                json={"worker_id": self.worker_id, "load": load.to_vector()},
+            )
+
+            if response.status_code != 200:
+                logger.warning(
+                    f"⚠️  Load report to {self.routing_url} failed with status "
+                    f"{response.status_code}"
+                )
+
+        except Exception as e:
+            logger.warning(f"💔 Load report error: {e}")
+
     def start_heartbeat(self) -> None:
         """Start the background heartbeat task."""
 
@@ -37,6 +37,7 @@ from services.crank_hello_world import HelloWorldWorker
 from services.crank_philosophical_analyzer import PhilosophicalAnalyzerWorker
 from services.crank_sonnet_zettel_manager import SonnetZettelManagerWorker
 from services.crank_streaming import StreamingWorker
+from services.crank_vector_index import VectorIndexWorker
 
 
 # Worker registry - maps manifest worker_id to worker class
@@ -49,6 +50,7 @@ WORKER_REGISTRY = {
     "sonnet_zettel": SonnetZettelManagerWorker,
     "codex_zettel": CodexZettelRepositoryWorker,
     "hello_world": HelloWorldWorker,
+    "vector_index": VectorIndexWorker,
 }
 
 
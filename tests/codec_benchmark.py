@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Mesh Payload Codec Benchmark
+
+Encode + hash cost per request for the /v1/process response path, at
+1 KB, 100 KB and 10 MB payloads, in two shapes:
+- blob: one base64 string (documents, images)
+- records: many small objects (classification/search results)
+
+Compared paths:
+- legacy: json.dumps(sort_keys=True) of input and result for the receipt
+  hashes, then model_dump(mode="json") + json.dumps for the response body
+- json/msgpack/cbor: EncodedPayload + encode_envelope, with the canonical
+  JSON encoding shared by hash and body when the client negotiated JSON
+
+Usage:
+    python tests/codec_benchmark.py --repeat 5
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "services"))
+
+from crank_mesh_interface import CrankMeshResponse
+
+from crank.protocols.codecs import CODECS, Codec, EncodedPayload, encode_envelope
+
+SIZES = {"1 KB": 1024, "100 KB": 100 * 1024, "10 MB": 10 * 1024 * 1024}
+
+
+def make_payload(shape: str, size: int) -> dict[str, Any]:
+    """Result dict of roughly ``size`` encoded bytes."""
+    if shape == "blob":
+        raw = os.urandom(size * 3 // 4)
+        return {"converted_data": base64.b64encode(raw).decode(), "target_format": "pdf"}
+    record = {"label": "label-000", "score": 0.123456, "type": "objects", "rank": 1}
+    count = max(1, size // len(json.dumps(record)))
+    return {
+        "results": [{**record, "label": f"label-{i:03d}", "rank": i} for i in range(count)],
+        "processing_time_ms": 12.5,
+    }
+
+
+def legacy(input_data: dict[str, Any], result: dict[str, Any]) -> int:
+    """Pre-codec path: hash input and result, then serialize the response."""
+    hashlib.sha256(json.dumps(input_data, sort_keys=True).encode()).hexdigest()
+    hashlib.sha256(json.dumps(result, sort_keys=True).encode()).hexdigest()
+    response = CrankMeshResponse(success=True, result=result, receipt_id="r", processing_time_ms=1)
+    body = json.dumps(response.model_dump(mode="json"), separators=(",", ":")).encode()
+    return len(body)
+
+
+def codec_path(codec: Codec) -> Callable[[dict[str, Any], dict[str, Any]], int]:
+    """Codec path: digests from EncodedPayload, body spliced from its encodings."""
+
+    def run(input_data: dict[str, Any], result: dict[str, Any]) -> int:
+        receipt_hashes = (
+            EncodedPayload(input_data).digest,
+            (output := EncodedPayload(result)).digest,
+        )
+        assert all(receipt_hashes)
+        response = CrankMeshResponse(success=True, receipt_id="r", processing_time_ms=1)
+        fields = response.model_dump(mode="json", exclude={"result"})
+        return len(encode_envelope(codec, fields, {"result": output}))
+
+    return run
+
+
+def time_path(
+    path: Callable[[dict[str, Any], dict[str, Any]], int],
+    input_data: dict[str, Any],
+    result: dict[str, Any],
+    repeat: int,
+) -> tuple[float, int]:
+    """Best-of-``repeat`` milliseconds and body size."""
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = path(input_data, result)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, size
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    paths: dict[str, Callable[[dict[str, Any], dict[str, Any]], int]] = {"legacy": legacy}
+    for codec in sorted(set(CODECS.values()), key=lambda codec: codec.name):
+        paths[codec.name] = codec_path(codec)
+
+    print("📦 Mesh Payload Codec Benchmark (encode + hash per request, best of runs)")
+    print("=" * 72)
+    for shape in ("blob", "records"):
+        for label, size in SIZES.items():
+            payload = make_payload(shape, size)
+            print(f"{shape} {label}:")
+            for name, path in paths.items():
+                ms, body = time_path(path, payload, payload, args.repeat)
+                print(f"  {name:8s} {ms:10.3f} ms   {body:10d} bytes")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+GraphQL Batching and Document Cache Benchmark
+
+Measures the GraphQL mesh gateway on a query selecting N aliases of one
+capability, against a simulated worker with a fixed per-call cost (network
+round trip, model dispatch) plus a small per-item cost, and a bounded
+number of calls in flight (a worker's max_concurrency):
+
+1. Per-field dispatch (``max_batch_size=1``): N worker calls
+2. Batched dispatch (DataLoader): one worker call per request
+3. Document handling: parse + validate on every request vs the compiled
+   document cache (and a persisted-query hash instead of the query text)
+
+Requires the ``graphql`` extra (graphql-core).
+
+Usage:
+    python tests/graphql_batch_benchmark.py --items 32 --requests 200
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from graphql import parse, validate
+
+from crank.protocols.graphql_gateway import MeshGraphQL, query_hash
+from crank.protocols.invocation import Invocation, InvocationResult
+
+
+class SimulatedWorker:
+    """Batch handler costing ``call_ms`` per call plus ``item_ms`` per item."""
+
+    def __init__(self, call_ms: float, item_ms: float, concurrency: int) -> None:
+        self.call_s = call_ms / 1000
+        self.item_s = item_ms / 1000
+        self.slots = asyncio.Semaphore(concurrency)
+        self.calls = 0
+
+    async def __call__(self, invocations: list[Invocation]) -> list[InvocationResult]:
+        self.calls += 1
+        async with self.slots:
+            await asyncio.sleep(self.call_s + self.item_s * len(invocations))
+        return [
+            InvocationResult(
+                success=True,
+                result={
+                    "classifications": [{"type": "objects", "label": "cat", "confidence": 0.9}]
+                },
+            )
+            for _ in invocations
+        ]
+
+
+def build_query(items: int) -> str:
+    """Query with ``items`` aliased imageClassify fields."""
+    fields = " ".join(
+        f'i{i}: imageClassify(input: {{image_data: "img-{i}", classification_types: ["objects"]}})'
+        " { success output { classifications { label confidence } } }"
+        for i in range(items)
+    )
+    return f"{{ {fields} }}"
+
+
+async def bench_dispatch(
+    query: str, requests: int, max_batch_size: int, worker: SimulatedWorker
+) -> tuple[float, int]:
+    """Return (seconds, worker calls) for sequential requests."""
+    gateway = MeshGraphQL(worker, max_batch_size=max_batch_size)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await gateway.execute({"query": query})
+    return time.perf_counter() - start, worker.calls
+
+
+async def bench_documents(query: str, iterations: int) -> None:
+    """Compare parse + validate per request with the compiled document cache."""
+    gateway = MeshGraphQL(SimulatedWorker(0, 0, 1))
+    start = time.perf_counter()
+    for _ in range(iterations):
+        validate(gateway.schema, parse(query))
+    uncached_us = (time.perf_counter() - start) / iterations * 1e6
+
+    gateway.documents.compile(query)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        gateway.documents.compile(query)
+    cached_us = (time.perf_counter() - start) / iterations * 1e6
+
+    persisted = {"persistedQuery": {"version": 1, "sha256Hash": query_hash(query)}}
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await gateway.execute({"extensions": persisted})
+    persisted_us = (time.perf_counter() - start) / iterations * 1e6
+
+    print("Document handling (per request):")
+    print(f"  parse + validate:        {uncached_us:8.1f} µs   {len(query):6d} bytes sent")
+    print(f"  compiled cache hit:      {cached_us:8.1f} µs")
+    print(f"  persisted query execute: {persisted_us:8.1f} µs   {64:6d} bytes sent (hash)")
+
+
+async def run_benchmark(
+    items: int, requests: int, call_ms: float, item_ms: float, concurrency: int
+) -> None:
+    """Run every comparison and print a summary."""
+    print("🧮 GraphQL Batching Benchmark")
+    print("=" * 50)
+    query = build_query(items)
+    per_field, per_field_calls = await bench_dispatch(
+        query, requests, 1, SimulatedWorker(call_ms, item_ms, concurrency)
+    )
+    batched, batched_calls = await bench_dispatch(
+        query, requests, items, SimulatedWorker(call_ms, item_ms, concurrency)
+    )
+
+    print(f"{requests} requests x {items} aliases")
+    print(f"  worker: {call_ms} ms/call + {item_ms} ms/item, {concurrency} calls in flight")
+    print(
+        f"  per-field dispatch: {requests / per_field:8.1f} req/s   {per_field_calls} worker calls"
+    )
+    print(f"  batched dispatch:   {requests / batched:8.1f} req/s   {batched_calls} worker calls")
+    print()
+    await bench_documents(query, max(requests, 100))
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--items", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--call-ms", type=float, default=2.0)
+    parser.add_argument("--item-ms", type=float, default=0.05)
+    parser.add_argument("--worker-concurrency", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(
+        run_benchmark(
+            args.items, args.requests, args.call_ms, args.item_ms, args.worker_concurrency
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+gRPC Gateway vs JSON/REST Benchmark
+
+Compares the gRPC mesh gateway with an equivalent JSON-over-HTTP/1.1
+endpoint for internal service-to-service calls:
+
+1. Serialization: encode + decode of an image.classify request and response
+   (protobuf vs json), plus payload sizes
+2. End to end: N concurrent calls against the same handler
+   - REST: FastAPI + uvicorn, httpx client (one TCP connection per
+     concurrent request, as HTTP/1.1 has no multiplexing)
+   - gRPC unary: concurrent Invoke calls on one HTTP/2 channel
+   - gRPC stream: one InvokeStream carrying every call
+
+Requires the ``grpc`` extra (grpcio, protobuf) plus uvicorn and httpx.
+
+Usage:
+    python tests/grpc_gateway_benchmark.py --calls 2000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+from crank.capabilities import IMAGE_CLASSIFICATION
+from crank.protocols.grpc_gateway import MeshGatewayClient, start_grpc_gateway
+from crank.protocols.invocation import Invocation, InvocationResult
+from crank.protocols.mesh_contract import MeshContract
+
+PARAMS = {
+    "image_data": "A" * 4096,  # Small base64 thumbnail
+    "classification_types": ["objects", "scenes"],
+    "max_results": 5,
+}
+RESULT = {
+    "classifications": [
+        {"type": "objects", "label": f"label-{i}", "confidence": 0.9 - i * 0.1} for i in range(5)
+    ],
+    "processing_time_ms": 12.5,
+}
+
+
+async def handler(invocation: Invocation) -> InvocationResult:
+    """Constant result, so the benchmark measures transport and encoding."""
+    return InvocationResult(success=True, result=RESULT, receipt_id="bench", processing_time_ms=1)
+
+
+def bench_serialization(iterations: int) -> None:
+    """Time request+response encode/decode for protobuf and JSON."""
+    contract = MeshContract()
+    result = InvocationResult(success=True, result=RESULT, receipt_id="bench", processing_time_ms=1)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        request = contract.make_request("image.classify", PARAMS).SerializeToString()
+        contract.parse_request(contract.InvokeRequest.FromString(request))
+        response = contract.build_response(result, IMAGE_CLASSIFICATION).SerializeToString()
+        contract.read_response(contract.InvokeResponse.FromString(response))
+    proto_us = (time.perf_counter() - start) / iterations * 1e6
+
+    envelope = {"capability": "image.classify", "params": PARAMS}
+    reply = {"success": True, "result": RESULT, "receipt_id": "bench", "processing_time_ms": 1}
+    start = time.perf_counter()
+    for _ in range(iterations):
+        json.loads(json.dumps(envelope).encode())
+        json.loads(json.dumps(reply).encode())
+    json_us = (time.perf_counter() - start) / iterations * 1e6
+
+    print("Serialization (request + response, encode + decode):")
+    print(f"  protobuf: {proto_us:7.1f} µs   {len(request) + len(response):6d} bytes")
+    print(
+        f"  json:     {json_us:7.1f} µs   {len(json.dumps(envelope)) + len(json.dumps(reply)):6d} bytes"
+    )
+
+
+def free_port() -> int:
+    """Pick an unused TCP port for the REST server."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port: int = sock.getsockname()[1]
+        return port
+
+
+async def bench_rest(calls: int, concurrency: int) -> tuple[float, int]:
+    """JSON over HTTP/1.1; returns (seconds, connections opened)."""
+    app = FastAPI()
+    connections: set[tuple[str, int]] = set()
+
+    @app.post("/invoke")
+    async def invoke(body: dict[str, Any]) -> dict[str, Any]:
+        return {"success": True, "result": RESULT, "receipt_id": "bench", "processing_time_ms": 1}
+
+    @app.middleware("http")
+    async def count_connections(request: Any, call_next: Any) -> Any:
+        if request.client:
+            connections.add((request.client.host, request.client.port))
+        return await call_next(request)
+
+    # Own thread and event loop, so the server does not share the client's loop
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="error", access_log=False))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits) as client:
+        semaphore = asyncio.Semaphore(concurrency)
+        body = {"capability": "image.classify", "params": PARAMS}
+
+        async def one() -> None:
+            async with semaphore:
+                response = await client.post("/invoke", json=body)
+                response.json()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(calls)))
+        elapsed = time.perf_counter() - start
+
+    server.should_exit = True
+    await asyncio.to_thread(thread.join)
+    return elapsed, len(connections)
+
+
+async def bench_grpc(calls: int, concurrency: int) -> tuple[float, float]:
+    """Return (unary seconds, stream seconds) over one channel."""
+    server, port = await start_grpc_gateway(handler, "127.0.0.1:0", stream_concurrency=concurrency)
+    client = MeshGatewayClient(f"127.0.0.1:{port}")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore:
+            await client.invoke("image.classify", PARAMS)
+
+    await asyncio.gather(*(one() for _ in range(min(calls, 100))))  # Warm up the channel
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(calls)))
+    unary = time.perf_counter() - start
+
+    start = time.perf_counter()
+    async for _ in client.invoke_many(("image.classify", PARAMS) for _ in range(calls)):
+        pass
+    stream = time.perf_counter() - start
+
+    await client.close()
+    await server.stop(None)
+    return unary, stream
+
+
+async def run_benchmark(calls: int, concurrency: int, iterations: int) -> None:
+    """Run every comparison and print a summary."""
+    print("📡 gRPC Gateway vs JSON/REST Benchmark")
+    print("=" * 50)
+    bench_serialization(iterations)
+    print()
+
+    rest, connections = await bench_rest(calls, concurrency)
+    unary, stream = await bench_grpc(calls, concurrency)
+    print(f"End to end ({calls} calls, concurrency {concurrency}):")
+    print(f"  REST/JSON (HTTP/1.1): {calls / rest:8.0f} calls/s   {connections} connections")
+    print(f"  gRPC unary (HTTP/2):  {calls / unary:8.0f} calls/s   1 connection")
+    print(f"  gRPC InvokeStream:    {calls / stream:8.0f} calls/s   1 connection")
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.calls, args.concurrency, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Request Hedging Benchmark
+
+Client-observed latency of an idempotent capability served by diagnostic
+workers running the load_test operation, with and without hedging:
+- unhedged: every request waits for the worker it was admitted to
+- hedged: Hedger.run() with the default 5% budget, duplicating requests
+  unanswered after the observed p95 to another idle worker
+
+Each worker is a DiagnosticMeshService from mesh_diagnostics_v2 (the
+handle_load_test operation of mesh_diagnostics.py, on the current mesh
+interface) whose cpu_work_ms is drawn per call: about 20 ms normally,
+with injected stalls of --stall-ms on --slow-prob of calls to worker 0
+and on 1% of calls to any worker. Admission, SLO tracking and hedging
+are the controller's own classes, in process.
+
+Usage:
+    python tests/hedging_benchmark.py --requests 2000 --clients 16 --seed 7
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "services"))
+
+from mesh_diagnostics_v2 import DiagnosticMeshService
+from mesh_interface_v2 import MeshRequest
+
+from crank.controller import AdmissionController, Hedger, Lease
+from crank.controller.capability_registry import CapabilityRegistry, CapabilitySchema
+from crank.controller.slo import SLOTracker
+
+WORKERS = 4
+MAX_CONCURRENCY = 8
+BASE_WORK_MS = 20
+BACKGROUND_STALL_PROB = 0.01
+AUTH_CONTEXT = {"authenticated": True}
+
+
+class InjectedWorkers:
+    """Diagnostic services whose load_test work includes injected stalls."""
+
+    def __init__(self, seed: int, slow_prob: float, stall_ms: int) -> None:
+        self.rng = random.Random(seed)
+        self.slow_prob = slow_prob
+        self.stall_ms = stall_ms
+        self.services = {
+            f"worker-{index}": DiagnosticMeshService(node_id=f"worker-{index}")
+            for index in range(WORKERS)
+        }
+
+    def work_ms(self, worker_id: str) -> int:
+        """cpu_work_ms for one call (load_test caps it at 1000)."""
+        work = BASE_WORK_MS * self.rng.uniform(0.8, 1.3)
+        stall_prob = self.slow_prob if worker_id == "worker-0" else BACKGROUND_STALL_PROB
+        if self.rng.random() < stall_prob:
+            work += self.stall_ms
+        return min(int(work), 1000)
+
+    async def invoke(self, lease: Lease) -> dict[str, object]:
+        """Run load_test on the leased worker."""
+        worker_id = lease.worker.worker_id
+        request = MeshRequest(
+            service_type="diagnostic",
+            operation="load_test",
+            input_data={"cpu_work_ms": self.work_ms(worker_id), "memory_mb": 0},
+        )
+        response = await self.services[worker_id].process_request(request, AUTH_CONTEXT)
+        if not response.success or response.result is None:
+            raise RuntimeError(f"load_test failed on {worker_id}: {response.errors}")
+        return response.result
+
+
+async def run_policy(
+    name: str, args: argparse.Namespace, state_dir: Path
+) -> tuple[np.ndarray, dict[str, object]]:
+    """Client-observed latencies (ms) and hedge stats for one policy."""
+    registry = CapabilityRegistry(state_file=state_dir / f"{name}.jsonl")
+    cap = CapabilitySchema(
+        name="load_test",
+        verb="diagnostic",
+        version="1.0.0",
+        max_concurrency=MAX_CONCURRENCY,
+        idempotent=True,
+    )
+    for index in range(WORKERS):
+        registry.register(f"worker-{index}", f"https://localhost:{8500 + index}", [cap])
+    admission = AdmissionController(registry, max_queue=args.clients)
+    ratio = 0.0 if name == "unhedged" else args.ratio
+    hedger = Hedger(admission, SLOTracker(), ratio=ratio, burst=0.0 if ratio == 0 else 10.0)
+    workers = InjectedWorkers(args.seed, args.slow_prob, args.stall_ms)
+
+    latencies: list[float] = []
+    remaining = args.requests
+
+    async def client() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            lease = await admission.admit("diagnostic", "load_test")
+            assert lease is not None
+            await hedger.run(lease, workers.invoke)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(client() for _ in range(args.clients)))
+    return np.array(latencies), hedger.stats().get("diagnostic:load_test", {})
+
+
+def main() -> None:
+    """Parse arguments and run both policies."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent callers")
+    parser.add_argument("--slow-prob", type=float, default=0.2, help="Stall rate on worker 0")
+    parser.add_argument("--stall-ms", type=int, default=400, help="Injected stall length")
+    parser.add_argument("--ratio", type=float, default=0.05, help="Hedge budget (extra load)")
+    args = parser.parse_args()
+
+    print("✂️  Request Hedging Benchmark (client-observed latency, ms)")
+    print("=" * 72)
+    print(
+        f"{'policy':10s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'max':>8s} {'hedged':>8s} {'wins':>6s}"
+    )
+    with tempfile.TemporaryDirectory() as state_dir:
+        for name in ("unhedged", "hedged"):
+            latencies, stats = asyncio.run(run_policy(name, args, Path(state_dir)))
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            hedged = f"{float(stats.get('hedge_rate', 0.0)) * 100:.2f}%"
+            wins = stats.get("hedge_wins", 0)
+            print(
+                f"{name:10s} {p50:8.1f} {p95:8.1f} {p99:8.1f} {latencies.max():8.1f} "
+                f"{hedged:>8s} {wins!s:>6s}"
+            )
+
+
+if __name__ == "__main__":
+    main()
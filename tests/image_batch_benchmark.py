@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Image Batch Classification Benchmark
+
+Measures GPU image classifier throughput (images/s) on CPU at several batch
+sizes. Batch size 1 is the /classify path (one forward pass per image per
+model); larger sizes use classify_batch, which stacks CLIP tensors into a
+single forward pass and hands YOLO a list of frames.
+
+Decoding happens in the thread pool exactly as /classify/batch does it, and
+is included in the timings.
+
+Requires the GPU worker's dependencies (torch, ultralytics, openai-clip,
+sentence-transformers) and either cached model weights or network access.
+
+Usage:
+    python tests/image_batch_benchmark.py --images 64 --batch-sizes 1 8 32
+"""
+
+import argparse
+import asyncio
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "services"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from crank.imaging import BatchImage, decode_batch
+
+DEFAULT_TYPES = ["yolo_detection", "clip_analysis", "advanced_scene_classification"]
+
+
+def make_images(count: int, width: int, height: int) -> list[BatchImage]:
+    """Random-noise JPEGs (noise defeats JPEG compression, so decode cost is realistic)."""
+    rng = np.random.default_rng(7)
+    images: list[BatchImage] = []
+    for i in range(count):
+        pixels = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+        buffer = io.BytesIO()
+        Image.fromarray(pixels).save(buffer, format="JPEG", quality=90)
+        images.append(BatchImage(i, f"bench-{i}.jpg", buffer.getvalue()))
+    return images
+
+
+async def classify_all(classifier: object, images: list[BatchImage], types: list[str]) -> None:
+    """Decode in the thread pool, then classify chunk by chunk (as the endpoint does)."""
+    from crank_image_classifier_advanced import _decode_forms
+
+    forms = _decode_forms(types)
+    decoded = await decode_batch(
+        images,
+        lambda data: classifier.decode(data).prepare(forms),  # type: ignore[attr-defined]
+    )
+    ready = [item for item in decoded if not isinstance(item, Exception)]
+    await asyncio.to_thread(classifier.classify_batch, ready, types)  # type: ignore[attr-defined]
+
+
+def run_benchmark(
+    image_count: int, batch_sizes: list[int], size: tuple[int, int], types: list[str]
+) -> None:
+    """Load models once, then time every batch size over the same images."""
+    from crank_image_classifier_advanced import GPUImageClassifier
+
+    print("🖼️  Image Batch Classification Benchmark (CPU)")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    classifier = GPUImageClassifier(device="cpu")
+    print(f"Model load:      {time.perf_counter() - start:.1f}s")
+
+    images = make_images(image_count, *size)
+    print(f"Images:          {image_count} x {size[0]}x{size[1]} JPEG")
+    print(f"Stages:          {', '.join(types)}")
+
+    # Warm up lazy initialisation (text features, YOLO fuse) outside the timings
+    asyncio.run(classify_all(classifier, images[:2], types))
+
+    baseline: float | None = None
+    for batch_size in batch_sizes:
+        classifier.batch_size = batch_size
+        start = time.perf_counter()
+        asyncio.run(classify_all(classifier, images, types))
+        elapsed = time.perf_counter() - start
+
+        throughput = image_count / elapsed
+        baseline = baseline or throughput
+        print(
+            f"Batch {batch_size:>3}:       {throughput:6.2f} images/s  "
+            f"({elapsed / image_count * 1000:.0f} ms/image, {throughput / baseline:.2f}x)"
+        )
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--images", type=int, default=64)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--types", default=",".join(DEFAULT_TYPES))
+    args = parser.parse_args()
+    run_benchmark(
+        args.images,
+        args.batch_sizes,
+        (args.width, args.height),
+        [t.strip() for t in args.types.split(",")],
+    )
+
+
+if __name__ == "__main__":
+    main()
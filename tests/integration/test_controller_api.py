@@ -3,12 +3,19 @@
 Tests the controller service API endpoints with actual capability registry.
 """
 
+import logging
 from pathlib import Path
 from tempfile import NamedTemporaryFile
 
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 
+from crank.capabilities.schema import STREAMING_CLASSIFICATION
+from crank.controller import LoadReport
+from crank.security.admin import TLSScopeApp
+from crank.worker_runtime.load import LoadTracker
+from crank.worker_runtime.registration import ControllerClient
 from services.crank_controller import ControllerService
 
 
@@ -294,3 +301,256 @@ def test_extended_capability_fields(client: TestClient) -> None:
     })
     assert route_response.status_code == 200
     assert route_response.json()["worker_id"] == "worker-extended"
+
+
+def test_route_sheds_with_429_when_workers_full(
+    temp_state_file: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test routing beyond max_concurrency returns 429 + Retry-After until a lease is released."""
+    monkeypatch.setenv("CONTROLLER_STATE_FILE", str(temp_state_file))
+    monkeypatch.setenv("CONTROLLER_ADMISSION_QUEUE", "0")
+    client = TestClient(ControllerService(https_port=9999).app)
+    client.post("/register", json={
+        "worker_id": "worker-busy",
+        "worker_url": "https://localhost:8500",
+        "capabilities": [
+            {"name": "email.classify", "verb": "invoke", "version": "1.0.0", "max_concurrency": 1}
+        ],
+    })
+    route_request = {"verb": "invoke", "capability": "email.classify"}
+
+    first = client.post("/route", json=route_request)
+    assert first.status_code == 200
+    lease_id = first.json()["lease_id"]
+
+    shed = client.post("/route", json=route_request)
+    assert shed.status_code == 429
+    assert int(shed.headers["retry-after"]) >= 1
+    assert client.get("/admission").json()["capabilities"]["invoke:email.classify"]["shed"] == 1
+
+    assert client.post(f"/release/{lease_id}").status_code == 200
+    assert client.post(f"/release/{lease_id}").status_code == 404
+    assert client.post("/route", json=route_request).status_code == 200
+
+
+def test_idempotent_route_replays_released_result(client: TestClient) -> None:
+    """Test a retry with the same Idempotency-Key gets the stored result, not a new lease."""
+    client.post("/register", json={
+        "worker_id": "worker-pdf",
+        "worker_url": "https://localhost:8500",
+        "capabilities": [{"name": "document_to_pdf", "verb": "convert", "version": "1.0.0"}],
+    })
+    route_request = {
+        "verb": "convert",
+        "capability": "document_to_pdf",
+        "payload": {"document": "report.md"},
+    }
+    headers = {"Idempotency-Key": "job-42"}
+
+    first = client.post("/route", json=route_request, headers=headers)
+    assert first.status_code == 200
+    release = client.post(
+        f"/release/{first.json()['lease_id']}", json={"success": True, "result": {"pdf": "..."}}
+    )
+    assert release.status_code == 200
+
+    retry = client.post("/route", json=route_request, headers=headers)
+    assert retry.status_code == 200
+    assert retry.headers["x-idempotent-replay"] == "true"
+    assert retry.json()["result"] == {"pdf": "..."}
+    assert retry.json()["worker_id"] == "worker-pdf"
+
+    reused = client.post(
+        "/route", json={**route_request, "payload": {"document": "other.md"}}, headers=headers
+    )
+    assert reused.status_code == 422
+
+
+def test_released_leases_feed_slo_tracking(client: TestClient) -> None:
+    """Test lease outcomes are recorded against the capability's declared SLO."""
+    client.post("/register", json={
+        "worker_id": "worker-slo",
+        "worker_url": "https://localhost:8500",
+        "capabilities": [{
+            "name": "document_to_pdf",
+            "verb": "convert",
+            "version": "1.0.0",
+            "slo": {"latency_p95_ms": 100, "availability_pct": 99.0},
+        }],
+    })
+    route_request = {"verb": "convert", "capability": "document_to_pdf"}
+    for duration_ms, success in [(40.0, True), (250.0, True), (30.0, False)]:
+        lease_id = client.post("/route", json=route_request).json()["lease_id"]
+        client.post(f"/release/{lease_id}", json={"success": success, "duration_ms": duration_ms})
+
+    slo = client.get("/slo").json()["capabilities"]["convert:document_to_pdf"]
+    assert slo["requests"] == 3
+    assert slo["errors"] == 1
+    assert slo["workers"]["worker-slo"]["latency_ms"]["p99"] == pytest.approx(250, rel=0.02)
+    assert slo["objectives"]["availability"]["burn_rate"]["5m"] == pytest.approx(33.333, rel=1e-3)
+
+    metrics = client.get("/slo/metrics")
+    assert metrics.headers["content-type"].startswith("text/plain")
+    assert 'crank_slo_errors_total{capability="convert:document_to_pdf"' in metrics.text
+
+    bad_slo = client.post("/register", json={
+        "worker_id": "worker-bad",
+        "worker_url": "https://localhost:8501",
+        "capabilities": [{
+            "name": "x", "verb": "y", "version": "1.0.0", "slo": {"availability_pct": 100}
+        }],
+    })
+    assert bad_slo.status_code == 422
+
+
+def test_metrics_endpoint_serves_runtime_and_slo_series(client: TestClient) -> None:
+    """Test /metrics carries per-route request counts alongside the SLO series."""
+    client.post("/register", json={
+        "worker_id": "worker-metrics",
+        "worker_url": "https://localhost:8500",
+        "capabilities": [{"name": "summarize", "verb": "text", "version": "1.0.0"}],
+    })
+    lease_id = client.post("/route", json={"verb": "text", "capability": "summarize"}).json()[
+        "lease_id"
+    ]
+    client.post(f"/release/{lease_id}", json={"success": True, "duration_ms": 12.0})
+
+    metrics = client.get("/metrics")
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'crank_http_requests_total{method="POST",route="/route",status="200"}' in metrics.text
+    assert 'route="/release/{lease_id}"' in metrics.text
+    assert 'crank_slo_latency_ms_count{capability="text:summarize"' in metrics.text
+
+
+def test_debug_profile_requires_admin_certificate(client: TestClient) -> None:
+    """Test /debug/profile is refused to callers without an admin client certificate."""
+    response = client.get("/debug/profile", params={"seconds": 0.1})
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Admin client certificate required"
+
+
+def test_replication_status_and_peer_only_changes(client: TestClient) -> None:
+    """Test /replication reports the change log and /replication/* is refused to non-peers."""
+    client.post("/register", json={
+        "worker_id": "worker-1",
+        "worker_url": "https://localhost:8500",
+        "capabilities": [{"name": "classify", "verb": "classify", "version": "1.0.0"}],
+    })
+    status = client.get("/replication").json()
+    assert status["seq"] >= 1
+    assert status["peers"] == {}
+    assert client.get("/replication/changes").status_code == 403
+    assert client.post("/replication/leaves", json={"leaves": [0]}).status_code == 403
+
+
+def test_replication_peer_audit(
+    temp_state_file: Path, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test peer-only routes name peer controllers in refusals and audit peers at DEBUG."""
+    monkeypatch.setenv("CONTROLLER_STATE_FILE", str(temp_state_file))
+    monkeypatch.setenv("CONTROLLER_PEER_IDENTITIES", "controller-b")
+    app = ControllerService(https_port=9999).app
+    caplog.set_level(logging.DEBUG, logger="crank.security.admin")
+
+    peer = TestClient(TLSScopeApp(app, {"client_cert_name": "CN=controller-b,O=Crank"}))
+    assert peer.get("/replication/changes").status_code == 200
+    [admitted] = [record for record in caplog.records if "called" in record.message]
+    assert admitted.levelno == logging.DEBUG
+    assert admitted.message == "Peer controller controller-b called GET /replication/changes"
+
+    stranger = TestClient(TLSScopeApp(app, {"client_cert_name": "CN=worker-1,O=Crank"}))
+    response = stranger.get("/replication/changes")
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Peer controller client certificate required"
+    assert "Denied peer controller endpoint GET /replication/changes to CN=worker-1" in caplog.text
+    assert "Admin" not in caplog.text
+
+
+def test_hedged_route_for_idempotent_capability(client: TestClient) -> None:
+    """Test hedge_after_ms is offered once latency is known and hedge_of leases another worker."""
+    capability = {"name": "classify", "verb": "classify", "version": "1.0.0", "idempotent": True}
+    for index in range(2):
+        client.post("/register", json={
+            "worker_id": f"worker-{index}",
+            "worker_url": f"https://localhost:{8500 + index}",
+            "capabilities": [capability],
+        })
+    route_request = {"verb": "classify", "capability": "classify"}
+    for _ in range(20):
+        lease_id = client.post("/route", json=route_request).json()["lease_id"]
+        client.post(f"/release/{lease_id}", json={"duration_ms": 40.0})
+
+    primary = client.post("/route", json=route_request).json()
+    assert primary["hedge_after_ms"] == pytest.approx(40, rel=0.02)
+    hedge = client.post("/route", json={**route_request, "hedge_of": primary["lease_id"]})
+    assert hedge.status_code == 200
+    assert hedge.json()["worker_id"] != primary["worker_id"]
+
+    client.post(f"/release/{hedge.json()['lease_id']}", json={"duration_ms": 5.0})
+    client.post(f"/release/{primary['lease_id']}", json={"cancelled": True})
+    assert client.get("/slo").json()["capabilities"]["classify:classify"]["requests"] == 21
+    stats = client.get("/hedging").json()["capabilities"]["classify:classify"]
+    assert stats["hedged"] == 1
+
+    gone = client.post("/route", json={**route_request, "hedge_of": primary["lease_id"]})
+    assert gone.status_code == 404
+
+
+def test_failing_worker_is_ejected_from_routing(client: TestClient) -> None:
+    """Test a worker that heartbeats but fails every request stops being routed to."""
+    capability = {"name": "classify", "verb": "classify", "version": "1.0.0"}
+    for index in range(2):
+        client.post("/register", json={
+            "worker_id": f"worker-{index}",
+            "worker_url": f"https://localhost:{8500 + index}",
+            "capabilities": [capability],
+        })
+    route_request = {"verb": "classify", "capability": "classify"}
+    for _ in range(20):
+        routed = client.post("/route", json=route_request).json()
+        success = routed["worker_id"] == "worker-1"
+        client.post(f"/release/{routed['lease_id']}", json={"success": success})
+
+    breakers = client.get("/breakers").json()["workers"]
+    assert breakers["worker-0"]["state"] == "open"
+    assert breakers["worker-1"]["state"] == "closed"
+    for _ in range(5):
+        routed = client.post("/route", json=route_request).json()
+        assert routed["worker_id"] == "worker-1"
+        client.post(f"/release/{routed['lease_id']}")
+
+
+@pytest.mark.asyncio
+async def test_worker_heartbeat_load_reaches_routing(
+    controller: ControllerService, client: TestClient
+) -> None:
+    """Test the load a worker reports in its heartbeat feeds the routing scores."""
+    capability = {"name": "classify", "verb": "classify", "version": "1.0.0"}
+    for index in range(2):
+        client.post("/register", json={
+            "worker_id": f"worker-{index}",
+            "worker_url": f"https://localhost:{8500 + index}",
+            "capabilities": [capability],
+        })
+
+    worker = ControllerClient(
+        worker_id="worker-0",
+        worker_url="https://localhost:8500",
+        capabilities=[STREAMING_CLASSIFICATION],
+        controller_url="https://platform",
+        load_tracker=LoadTracker(queue_depth=lambda: 8),
+        routing_url="https://controller",
+    )
+    worker._http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=controller.app))
+    await worker.send_heartbeat()
+    await worker.close()
+
+    workers = controller.registry.healthy_workers("classify:classify")
+    scores = dict(zip(
+        (w.worker_id for w in workers),
+        controller.registry.load_scores(workers, "classify:classify"),
+    ))
+    reported = LoadReport.from_vector(controller.registry.get_worker("worker-0").load)
+    assert reported.queue_depth == 8
+    assert scores["worker-0"] >= 0.8  # 8 queued of 10 slots
+    assert scores["worker-1"] == scores["worker-0"]  # Unreported: the reported mean
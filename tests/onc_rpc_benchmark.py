@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+ONC-RPC Pipelining Benchmark
+
+Measures calls/s over a single TCP connection to the ONC-RPC server in
+crank.protocols. The client writes every call up front (pipelined, no
+waiting for replies) and then reads all replies, so the result reflects
+server-side reassembly, XDR decoding, dispatch and reply framing.
+
+The handler decodes the argument value map and encodes a result value, the
+same shape of work the ONCRPCAdapter does before handing off to the mesh.
+
+Usage:
+    python tests/onc_rpc_benchmark.py --calls 20000 --windows 1 64 1000
+"""
+
+import argparse
+import asyncio
+import struct
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from crank.protocols import (
+    AcceptStatus,
+    RPCCall,
+    XDRDecoder,
+    XDREncoder,
+    decode_reply,
+    encode_auth_sys,
+    encode_call,
+    frame_record,
+    start_onc_rpc_server,
+)
+
+PROGRAM = 100001
+
+
+async def handler(call: RPCCall) -> bytes:
+    """Decode the argument map and echo a small result map."""
+    decoder = XDRDecoder(call.args)
+    params = decoder.unpack_value()
+    decoder.done()
+    encoder = XDREncoder()
+    encoder.pack_value({"ok": True, "format": params["target_format"]})
+    return encoder.getvalue()
+
+
+async def run_client(port: int, calls: int, window: int) -> float:
+    """Send calls in pipelined windows over one connection; return elapsed seconds."""
+    args = XDREncoder()
+    args.pack_value({"file_path": "/legacy/systems/document.txt", "target_format": "pdf"})
+    credential = encode_auth_sys(1000, 1000, "bench-host")
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+    start = time.perf_counter()
+    sent = 0
+    while sent < calls:
+        batch = min(window, calls - sent)
+        writer.write(
+            b"".join(
+                frame_record(encode_call(xid, PROGRAM, 1, 1, args.getvalue(), credential))
+                for xid in range(sent, sent + batch)
+            )
+        )
+        for _ in range(batch):
+            (mark,) = struct.unpack(">I", await reader.readexactly(4))
+            _, _, status, _ = decode_reply(await reader.readexactly(mark & 0x7FFFFFFF))
+            if status != AcceptStatus.SUCCESS:
+                raise RuntimeError(f"Call failed with {AcceptStatus(status).name}")
+        sent += batch
+    elapsed = time.perf_counter() - start
+
+    writer.close()
+    await writer.wait_closed()
+    return elapsed
+
+
+async def run_benchmark(calls: int, windows: list[int]) -> None:
+    """Start a server and time each pipelining window."""
+    server = await start_onc_rpc_server(handler, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    print("📡 ONC-RPC Pipelining Benchmark (one connection)")
+    print("=" * 50)
+    print(f"Calls per run:   {calls}")
+
+    await run_client(port, min(calls, 1000), max(windows))  # Warm up
+    for window in windows:
+        elapsed = await run_client(port, calls, window)
+        print(
+            f"Window {window:>5}:    {calls / elapsed:9.0f} calls/s  "
+            f"({elapsed / calls * 1e6:.1f} µs/call)"
+        )
+
+    server.close()
+    await server.wait_closed()
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--windows", type=int, nargs="+", default=[1, 64, 1000])
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.calls, args.windows))
+
+
+if __name__ == "__main__":
+    main()
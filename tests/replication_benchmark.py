@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Registry Replication Benchmark
+
+Bytes exchanged by a full mesh of controllers replicating their
+capability registries (crank.controller.replication), compared with
+shipping the whole export_state() to every peer on each round:
+- initial: first round, every cursor resets and is reconciled by Merkle
+  anti-entropy (an empty replica fetches every leaf)
+- idle: a round with no changes
+- churn: rounds in which --changes random workers are re-registered
+  elsewhere or deregistered on random controllers
+
+Each controller starts with its share of --workers registered locally
+(seeded through its state file) and reaches its peers through LocalPeer,
+which round-trips payloads through JSON and counts the bytes.
+
+Usage:
+    python tests/replication_benchmark.py --controllers 10 --workers 10000 --changes 20
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from crank.controller.capability_registry import CapabilityRegistry, CapabilitySchema
+from crank.controller.replication import LocalPeer, Replicator
+
+CAPABILITY = CapabilitySchema(name="classify", verb="classify", version="1.0.0")
+
+
+def seed_registries(args: argparse.Namespace, state_dir: Path) -> list[CapabilityRegistry]:
+    """Controllers owning an equal share of the workers each."""
+    now = datetime.now().isoformat()
+    registries = []
+    for index in range(args.controllers):
+        state_file = state_dir / f"controller-{index}.jsonl"
+        with open(state_file, "w") as f:
+            for n in range(index, args.workers, args.controllers):
+                record = {
+                    "worker_id": f"worker-{n}",
+                    "worker_url": f"https://10.0.{n // 250}.{n % 250}:8500",
+                    "capabilities": [CAPABILITY.model_dump()],
+                    "last_heartbeat": now,
+                    "registered_at": now,
+                }
+                f.write(json.dumps(record) + "\n")
+        registries.append(
+            CapabilityRegistry(state_file=state_file, controller_id=f"controller-{index}")
+        )
+    return registries
+
+
+def churn(
+    registries: list[CapabilityRegistry], args: argparse.Namespace, rng: random.Random
+) -> None:
+    """Re-register or deregister random workers on random controllers."""
+    for _ in range(args.changes):
+        registry = rng.choice(registries)
+        worker_id = f"worker-{rng.randrange(args.workers)}"
+        if rng.random() < 0.2:
+            registry.deregister(worker_id)
+        else:
+            registry.register(worker_id, f"https://moved-{rng.randrange(1000)}:8500", [CAPABILITY])
+
+
+async def run(args: argparse.Namespace, state_dir: Path) -> None:
+    """Seed the mesh, then measure each round."""
+    rng = random.Random(args.seed)
+    registries = seed_registries(args, state_dir)
+    peers = [
+        [LocalPeer(peer) for peer in registries if peer is not registry] for registry in registries
+    ]
+    replicators = [
+        Replicator(registry, registry_peers, anti_entropy_interval=float("inf"))
+        for registry, registry_peers in zip(registries, peers)
+    ]
+
+    def received() -> int:
+        return sum(peer.bytes_received for registry_peers in peers for peer in registry_peers)
+
+    async def round_(name: str) -> None:
+        before, start = received(), time.perf_counter()
+        applied = sum([await replicator.run_once() for replicator in replicators])
+        elapsed = time.perf_counter() - start
+        full = sum(
+            len(json.dumps(registry.export_state(), separators=(",", ":")))
+            for registry in registries
+        ) * (args.controllers - 1)
+        roots = {registry.replica.tree.root for registry in registries}
+        print(
+            f"{name:10s} {applied:>8d} {received() - before:>12,d} {full:>14,d} "
+            f"{elapsed:>8.2f}s {'yes' if len(roots) == 1 else 'no':>10s}"
+        )
+
+    print(
+        f"{'round':10s} {'applied':>8s} {'delta bytes':>12s} {'full bytes':>14s} "
+        f"{'time':>9s} {'converged':>10s}"
+    )
+    await round_("initial")
+    await round_("idle")
+    for index in range(args.rounds):
+        churn(registries, args, rng)
+        await round_(f"churn {index + 1}")
+
+
+def main() -> None:
+    """Parse arguments and run the mesh."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--controllers", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=10000, help="Workers across the mesh")
+    parser.add_argument("--changes", type=int, default=20, help="Registry changes per round")
+    parser.add_argument("--rounds", type=int, default=3, help="Churn rounds")
+    args = parser.parse_args()
+
+    print("🔁 Registry Replication Benchmark (bytes received across the mesh per round)")
+    print("=" * 72)
+    with tempfile.TemporaryDirectory() as state_dir:
+        asyncio.run(run(args, Path(state_dir)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+SLO-Aware Routing Simulation Benchmark
+
+Deterministic discrete-event simulation of one capability served by six
+workers, comparing the latency clients see under three routing policies:
+- first-healthy: the first registered healthy worker (routing before load
+  reports existed)
+- load-aware: CapabilityRegistry.route() without constraints
+- slo-aware: route() with slo_constraints={"latency_p95_ms": 100}
+
+Worker model: lognormal service time (median 30 ms), slowed by
+1 + in_flight / max_concurrency. Worker 0 degrades to a 250 ms median
+after a minute; worker 3 has a 5% chance of a 400 ms pause per request.
+Workers heartbeat their in-flight count every 5 s; completed requests are
+recorded into an SLOTracker on a simulated clock, as the controller does
+when leases are released.
+
+Usage:
+    python tests/slo_routing_benchmark.py --seed 7 --duration 300 --rate 50
+"""
+
+import argparse
+import heapq
+import math
+import random
+import sys
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from crank.controller.capability_registry import (
+    CapabilityRegistry,
+    CapabilitySchema,
+    WorkerEndpoint,
+)
+from crank.controller.slo import SLOTracker
+
+WORKERS = 6
+MAX_CONCURRENCY = 8
+HEARTBEAT_INTERVAL = 5.0
+DEGRADE_AT = 60.0
+CONSTRAINTS = {"latency_p95_ms": 100}
+KEY = "classify:classify"
+
+
+class SimClock:
+    """Simulated time for the SLO tracker."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def service_ms(worker_index: int, now: float, in_flight: int, rng: random.Random) -> float:
+    """Latency of one request on a worker at simulated time ``now``."""
+    median = 250.0 if worker_index == 0 and now >= DEGRADE_AT else 30.0
+    latency = median * math.exp(rng.gauss(0, 0.35))
+    if worker_index == 3 and rng.random() < 0.05:
+        latency += 400.0
+    return latency * (1 + in_flight / MAX_CONCURRENCY)
+
+
+def build_registry(state_dir: Path, clock: SimClock) -> CapabilityRegistry:
+    """Registry with the simulated pool and a tracker on simulated time."""
+    registry = CapabilityRegistry(
+        state_file=state_dir / "registry.jsonl",
+        load_half_life=math.inf,  # Load decay runs on wall time; keep the simulation deterministic
+        slo_tracker=SLOTracker(clock=clock),
+    )
+    cap = CapabilitySchema(
+        name="classify", verb="classify", version="1.0.0", max_concurrency=MAX_CONCURRENCY
+    )
+    for index in range(WORKERS):
+        registry.register(f"worker-{index}", f"https://localhost:{8500 + index}", [cap])
+    return registry
+
+
+Policy = Callable[[CapabilityRegistry], WorkerEndpoint | None]
+
+POLICIES: dict[str, Policy] = {
+    "first-healthy": lambda registry: registry.healthy_workers(KEY)[0],
+    "load-aware": lambda registry: registry.route("classify", "classify"),
+    "slo-aware": lambda registry: registry.route(
+        "classify", "classify", slo_constraints=CONSTRAINTS
+    ),
+}
+
+
+def simulate(policy: Policy, seed: int, duration: float, rate: float) -> np.ndarray:
+    """Client-observed latencies (ms) for one policy."""
+    rng = random.Random(seed)
+    clock = SimClock()
+    with tempfile.TemporaryDirectory() as state_dir:
+        registry = build_registry(Path(state_dir), clock)
+        tracker = registry.slo_tracker
+        assert tracker is not None
+        in_flight = {worker.worker_id: 0 for worker in registry.healthy_workers(KEY)}
+        completions: list[tuple[float, int, str, float]] = []
+        latencies = []
+        next_heartbeat = 0.0
+        sequence = 0
+
+        while clock.now < duration:
+            arrival = clock.now + rng.expovariate(rate)
+            while completions and completions[0][0] <= arrival:
+                clock.now, _, worker_id, latency = heapq.heappop(completions)
+                in_flight[worker_id] -= 1
+                tracker.record(KEY, worker_id, latency)
+            clock.now = arrival
+            if clock.now >= next_heartbeat:
+                for worker_id, count in in_flight.items():
+                    registry.heartbeat(worker_id, [count, 0, 0, 0, 0])
+                next_heartbeat += HEARTBEAT_INTERVAL
+
+            worker = policy(registry)
+            assert worker is not None
+            index = int(worker.worker_id.rsplit("-", 1)[1])
+            latency = service_ms(index, clock.now, in_flight[worker.worker_id], rng)
+            in_flight[worker.worker_id] += 1
+            sequence += 1
+            completion = (clock.now + latency / 1000, sequence, worker.worker_id, latency)
+            heapq.heappush(completions, completion)
+            latencies.append(latency)
+        return np.array(latencies)
+
+
+def main() -> None:
+    """Parse arguments and run the simulation for each policy."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--duration", type=float, default=300.0, help="Simulated seconds")
+    parser.add_argument("--rate", type=float, default=50.0, help="Requests per second")
+    args = parser.parse_args()
+
+    print("🎯 SLO-Aware Routing Simulation (client-observed latency, ms)")
+    print("=" * 72)
+    print(f"{'policy':14s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'max':>9s} {'>100ms':>8s}")
+    for name, policy in POLICIES.items():
+        latencies = simulate(policy, args.seed, args.duration, args.rate)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        over = float(np.mean(latencies > CONSTRAINTS["latency_p95_ms"])) * 100
+        print(f"{name:14s} {p50:8.1f} {p95:8.1f} {p99:8.1f} {latencies.max():9.1f} {over:7.2f}%")
+
+
+if __name__ == "__main__":
+    main()
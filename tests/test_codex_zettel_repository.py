@@ -0,0 +1,125 @@
+"""
+Tests for the Codex zettel repository worker's batch ingestion
+
+Covers POST /ingest/batch (CodexZettelService.ingest_batch):
+- 201 when every zettel is stored
+- 207 Multi-Status with per-item errors on partial failure
+- 413 when the batch exceeds MAX_INGEST_BATCH
+- 400 on malformed bodies
+"""
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+from crank_codex_zettel_repository import (
+    MAX_INGEST_BATCH,
+    CodexZettelRepositoryWorker,
+    ZettelRecord,
+)
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def worker(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> CodexZettelRepositoryWorker:
+    """Worker whose repository lives in a temporary directory."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("CONTROLLER_URL", raising=False)
+    worker = CodexZettelRepositoryWorker()
+    worker.setup_routes()
+    return worker
+
+
+@pytest.fixture
+def client(worker: CodexZettelRepositoryWorker) -> TestClient:
+    """Test client for the worker app."""
+    return TestClient(worker.app)
+
+
+def test_batch_fully_stored(worker: CodexZettelRepositoryWorker, client: TestClient) -> None:
+    """Every zettel stored: 201, results in input order, all searchable."""
+    zettels = [
+        {"zettel_id": f"zk-{i}", "content": f"Batch note {i} about mTLS", "tags": ["security"]}
+        for i in range(3)
+    ]
+
+    response = client.post("/ingest/batch", json={"zettels": zettels})
+
+    assert response.status_code == 201
+    body = response.json()
+    assert body["stored"] == body["count"] == 3
+    assert [result["zettel_id"] for result in body["results"]] == ["zk-0", "zk-1", "zk-2"]
+    assert all(result["status"] == "stored" for result in body["results"])
+    for result in body["results"]:
+        assert (worker.service.repository.base_path / result["relative_path"]).exists()
+    search = client.post("/zettels/search", json={"query": "mtls"}).json()
+    assert search["count"] == 3
+
+
+def test_batch_partial_failure(
+    worker: CodexZettelRepositoryWorker, client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Rejected and unstorable zettels get per-item errors; the rest are stored (207)."""
+    repository = worker.service.repository
+    store = repository.store
+
+    async def failing_store(record: ZettelRecord) -> Path:
+        if record.zettel_id == "zk-disk":
+            raise OSError("disk full")
+        return await store(record)
+
+    monkeypatch.setattr(repository, "store", failing_store)
+    zettels: list[Any] = [
+        {"zettel_id": "zk-ok", "content": "Stored fine"},
+        {"zettel_id": "zk-empty", "content": "   "},
+        "not an object",
+        {"zettel_id": "zk-disk", "content": "Cannot be written"},
+        {"zettel_id": "zk-tags", "content": "Bad tags", "tags": {"a": 1}},
+    ]
+
+    response = client.post("/ingest/batch", json={"zettels": zettels})
+
+    assert response.status_code == 207
+    body = response.json()
+    assert body["stored"] == 1
+    assert body["count"] == 5
+    ok, empty, not_object, disk, tags = body["results"]
+    assert ok["status"] == "stored"
+    assert ok["zettel_id"] == "zk-ok"
+    assert empty == {"status": "rejected", "error": "content is required for zettel ingestion"}
+    assert not_object == {"status": "rejected", "error": "each zettel must be a JSON object"}
+    assert disk == {"status": "failed", "zettel_id": "zk-disk", "error": "ZETTEL_STORAGE_FAILED"}
+    assert tags["status"] == "rejected"
+    assert "tags" in tags["error"]
+    assert client.post("/zettels/search", json={"query": "written"}).json()["count"] == 0
+
+
+def test_batch_too_large(client: TestClient) -> None:
+    """More than MAX_INGEST_BATCH zettels is refused before anything is stored."""
+    zettels = [{"content": f"note {i}"} for i in range(MAX_INGEST_BATCH + 1)]
+
+    response = client.post("/ingest/batch", json={"zettels": zettels})
+
+    assert response.status_code == 413
+    assert str(MAX_INGEST_BATCH) in response.json()["detail"]
+    assert client.post("/zettels/search", json={"query": "note"}).json()["count"] == 0
+
+
+@pytest.mark.parametrize(
+    ("content", "detail"),
+    [
+        (b"{not json", "request body must be JSON"),
+        (b'[{"content": "x"}]', "request body must be a JSON object"),
+        (b"{}", "zettels must be a non-empty list"),
+        (b'{"zettels": []}', "zettels must be a non-empty list"),
+        (b'{"zettels": {"content": "x"}}', "zettels must be a non-empty list"),
+    ],
+)
+def test_batch_malformed_body(client: TestClient, content: bytes, detail: str) -> None:
+    """Bodies that are not {"zettels": [...]} are a 400."""
+    response = client.post(
+        "/ingest/batch", content=content, headers={"Content-Type": "application/json"}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == detail
@@ -0,0 +1,236 @@
+"""
+Tests for MCP tool catalog caching and JSON-RPC batches
+
+Covers the mesh MCP server/adapter (mcp_interface) and the platform MCP
+adapter (universal_protocol_service):
+- Tool lists are built once and rebuilt when services are (un)registered
+- Batched tools/call requests run concurrently and answer in order
+- The platform /mcp endpoint answers single requests and batches as JSON-RPC,
+  and notification-only requests with an empty 202
+"""
+
+import asyncio
+import json
+from typing import Any
+
+from crank_platform_app import CrankPlatformApp, get_current_user
+from crank_platform_service import User
+from dependencies import get_protocol_service
+from fastapi.testclient import TestClient
+from mcp_interface import MCPMeshAdapter, create_mcp_adapter_with_services
+from mesh_interface_v2 import MeshCapability, MeshInterface, MeshRequest, MeshResponse
+from universal_protocol_service import MCPAdapter, UniversalProtocolService
+
+USER = User(user_id="u-1", username="agent", roles=["user"])
+
+
+class SlowService(MeshInterface):
+    """Mesh service whose single operation sleeps, tracking concurrency."""
+
+    def __init__(self, service_type: str = "document", delay: float = 0.05) -> None:
+        super().__init__(service_type, node_id=f"{service_type}-node")
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+
+    async def process_request(
+        self, request: MeshRequest, auth_context: dict[str, Any]
+    ) -> MeshResponse:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        return MeshResponse(
+            success=True,
+            result={"echo": request.input_data},
+            receipt_id="r",
+            processing_time_ms=0,
+            mesh_node_id=self.node_id,
+        )
+
+    def get_capabilities(self) -> list[MeshCapability]:
+        return [
+            MeshCapability(
+                operation="convert",
+                description="Convert a document",
+                input_schema={"properties": {"text": {"type": "string"}}, "required": ["text"]},
+                output_schema={},
+            )
+        ]
+
+
+def _call(request_id: int) -> dict[str, Any]:
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "tools/call",
+        "params": {
+            "name": "document_convert",
+            "arguments": {"text": str(request_id), "auth_token": "t"},
+        },
+    }
+
+
+# --- Mesh MCP server ---
+
+
+def test_tool_list_is_cached_until_registry_changes() -> None:
+    """list_tools reuses one build; registering or removing a service rebuilds it."""
+    adapter = create_mcp_adapter_with_services([SlowService()])
+    server = adapter.server
+
+    first = server.list_tools()
+    assert server.list_tools() is first
+    assert server.catalog.builds == 1
+    assert [tool["name"] for tool in first] == ["document_convert"]
+
+    server.register_mesh_service(SlowService("email"))
+    assert {tool["name"] for tool in server.list_tools()} == {
+        "document_convert",
+        "email_convert",
+    }
+    server.unregister_mesh_service("email")
+    assert [tool["name"] for tool in server.list_tools()] == ["document_convert"]
+    assert server.catalog.builds == 3
+
+
+async def test_batched_tool_calls_run_concurrently() -> None:
+    """A batch of tools/call requests overlaps on the service and answers in order."""
+    service = SlowService()
+    adapter = create_mcp_adapter_with_services([service])
+    batch = [{"jsonrpc": "2.0", "id": "init", "method": "initialize", "params": {}}]
+    batch += [_call(i) for i in range(8)]
+
+    responses = await adapter.handle_mcp_payload(batch)
+
+    assert service.peak == 8
+    assert isinstance(responses, list)
+    assert [r["id"] for r in responses] == ["init", *range(8)]
+    payload = json.loads(responses[3]["result"]["content"][0]["text"])
+    assert payload["result"] == {"echo": {"text": "2"}}
+
+
+async def test_batch_concurrency_is_bounded() -> None:
+    """max_concurrent_calls caps the calls in flight."""
+    service = SlowService(delay=0.01)
+    adapter = MCPMeshAdapter(max_concurrent_calls=2)
+    adapter.server.register_mesh_service(service)
+
+    await adapter.handle_mcp_payload([_call(i) for i in range(6)])
+    assert service.peak == 2
+
+
+async def test_unknown_method_is_method_not_found() -> None:
+    """Unknown methods answer with the JSON-RPC METHOD_NOT_FOUND code."""
+    adapter = MCPMeshAdapter()
+    response = await adapter.handle_mcp_payload({"jsonrpc": "2.0", "id": 1, "method": "nope"})
+    assert isinstance(response, dict)
+    assert response["error"]["code"] == -32601
+
+
+# --- Platform MCP adapter ---
+
+
+async def test_platform_adapter_builds_catalog_once() -> None:
+    """tools/list serves the cached catalog and reuses one diagnostic service."""
+    adapter = MCPAdapter(platform_service=None)
+
+    first = await adapter.handle_request({"jsonrpc": "2.0", "id": 1, "method": "tools/list"}, USER)
+    second = await adapter.handle_request({"jsonrpc": "2.0", "id": 2, "method": "tools/list"}, USER)
+
+    assert isinstance(first, dict)
+    assert isinstance(second, dict)
+    first, second = first["result"], second["result"]
+    assert first["tools"] is second["tools"]
+    assert adapter.catalog.builds == 1
+    assert {"crank_ping", "crank_route_request"} <= {tool["name"] for tool in first["tools"]}
+    assert adapter.catalog.http_response(adapter.catalog.etag).status_code == 304
+
+
+async def test_platform_adapter_batch() -> None:
+    """A batch mixes tools/list, tools/call and errors as JSON-RPC responses."""
+    adapter = MCPAdapter(platform_service=None)
+    batch = [
+        {"jsonrpc": "2.0", "id": 1, "method": "tools/list"},
+        {
+            "jsonrpc": "2.0",
+            "id": 2,
+            "method": "tools/call",
+            "params": {"name": "crank_ping", "arguments": {"message": "hi"}},
+        },
+        {"jsonrpc": "2.0", "id": 3, "method": "tools/call", "params": {"name": "crank_nope"}},
+        {"jsonrpc": "2.0", "id": 4, "method": "resources/list"},
+    ]
+
+    responses = await adapter.handle_request(batch, USER)
+
+    assert [r["id"] for r in responses] == [1, 2, 3, 4]
+    assert responses[0]["result"]["tools"] is adapter.catalog.tools
+    assert json.loads(responses[1]["result"]["content"][0]["text"])["success"] is True
+    assert responses[2]["error"]["code"] == -32602
+    assert responses[3]["error"]["code"] == -32601
+
+
+async def test_platform_adapter_single_request_is_jsonrpc() -> None:
+    """Single requests get the same JSON-RPC responses as batch entries."""
+    adapter = MCPAdapter(platform_service=None)
+
+    call = await adapter.handle_request(
+        {"jsonrpc": "2.0", "id": "c", "method": "tools/call", "params": {"name": "crank_ping"}},
+        USER,
+    )
+    unknown = await adapter.handle_request({"jsonrpc": "2.0", "id": 5, "method": "x"}, USER)
+    invalid = await adapter.handle_request({"jsonrpc": "2.0", "id": 6}, USER)
+
+    assert isinstance(call, dict)
+    assert call["id"] == "c"
+    assert json.loads(call["result"]["content"][0]["text"])["success"] is True
+    assert unknown == {
+        "jsonrpc": "2.0",
+        "id": 5,
+        "error": {"code": -32601, "message": "Unknown MCP method: x"},
+    }
+    assert isinstance(invalid, dict)
+    assert invalid["error"]["code"] == -32600
+    assert await adapter.handle_request({"jsonrpc": "2.0", "method": "tools/list"}, USER) is None
+
+
+def _platform_client() -> TestClient:
+    app = CrankPlatformApp().app
+    protocol = UniversalProtocolService(platform_service=None)
+    app.dependency_overrides[get_current_user] = lambda: USER
+    app.dependency_overrides[get_protocol_service] = lambda: protocol
+    return TestClient(app)
+
+
+def test_platform_endpoint_answers_jsonrpc() -> None:
+    """/mcp returns JSON-RPC responses for single requests and batches."""
+    client = _platform_client()
+
+    single = client.post("/mcp", json={"jsonrpc": "2.0", "id": 1, "method": "tools/list"})
+    batch = client.post(
+        "/mcp",
+        json=[
+            {"jsonrpc": "2.0", "id": 1, "method": "tools/list"},
+            {"jsonrpc": "2.0", "method": "tools/list"},
+            {"jsonrpc": "2.0", "id": 2, "method": "nope"},
+        ],
+    )
+
+    assert single.status_code == 200
+    assert single.json()["id"] == 1
+    assert "crank_ping" in {tool["name"] for tool in single.json()["result"]["tools"]}
+    assert batch.status_code == 200
+    assert [response["id"] for response in batch.json()] == [1, 2]
+    assert batch.json()[1]["error"]["code"] == -32601
+
+
+def test_platform_endpoint_notifications_get_empty_response() -> None:
+    """Notification-only requests and batches get an empty 202, not a null body."""
+    client = _platform_client()
+    notification = {"jsonrpc": "2.0", "method": "tools/list"}
+
+    for payload in (notification, [notification, notification]):
+        response = client.post("/mcp", json=payload)
+        assert response.status_code == 202
+        assert response.content == b""
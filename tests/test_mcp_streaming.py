@@ -0,0 +1,128 @@
+"""
+Tests for the streaming MCP server (mcp_server)
+
+Covers tool calls against the diagnostic mesh service:
+- SSE responses carry progress and chunk notifications before the result
+- Plain JSON requests and calls without a progress token are unchanged
+- stdio serving through MCPMeshAdapter.handle_streaming_message
+"""
+
+import asyncio
+import json
+from typing import Any
+
+from fastapi.testclient import TestClient
+from mcp_server import CrankMCPServer
+
+from crank.protocols import serve_stdio
+from crank.protocols.mcp_stream import CHUNK_NOTIFICATION, PROGRESS_NOTIFICATION
+
+
+class LineWriter:
+    """StreamWriter stand-in collecting the JSON lines written."""
+
+    def __init__(self) -> None:
+        self.lines: list[dict[str, Any]] = []
+
+    def write(self, data: bytes) -> None:
+        self.lines.append(json.loads(data))
+
+    async def drain(self) -> None:
+        pass
+
+
+def _server() -> CrankMCPServer:
+    server = CrankMCPServer(transport="http")
+    asyncio.run(server._register_services())
+    return server
+
+
+def _load_test(request_id: int, token: Any = None, response_size_kb: int = 16) -> dict[str, Any]:
+    params: dict[str, Any] = {
+        "name": "diagnostic_load_test",
+        "arguments": {"cpu_work_ms": 20, "response_size_kb": response_size_kb, "auth_token": "t"},
+    }
+    if token is not None:
+        params["_meta"] = {"progressToken": token}
+    return {"jsonrpc": "2.0", "id": request_id, "method": "tools/call", "params": params}
+
+
+def _sse_messages(body: str) -> list[dict[str, Any]]:
+    return [
+        json.loads(line.removeprefix("data: "))
+        for line in body.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+def _tool_result(response: dict[str, Any]) -> dict[str, Any]:
+    return json.loads(response["result"]["content"][0]["text"])
+
+
+def test_sse_streams_progress_and_chunks() -> None:
+    """An SSE tools/call with a progress token streams notifications, then the response."""
+    client = TestClient(_server().create_http_app())
+
+    response = client.post(
+        "/mcp", json=_load_test(1, token="job-1"), headers={"Accept": "text/event-stream"}
+    )
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    messages = _sse_messages(response.text)
+    methods = [message.get("method") for message in messages[:-1]]
+    assert methods.count(PROGRESS_NOTIFICATION) == 10
+    assert methods.count(CHUNK_NOTIFICATION) == 4  # 16 KiB in 4 KiB chunks
+    assert all(message["params"]["progressToken"] == "job-1" for message in messages[:-1])
+    streamed = "".join(
+        message["params"]["content"][0]["text"]
+        for message in messages
+        if message.get("method") == CHUNK_NOTIFICATION
+    )
+    assert streamed == "data" * 16 * 256
+
+    final = messages[-1]
+    assert final["id"] == 1
+    assert _tool_result(final)["chunks_sent"] == 4
+
+
+def test_sse_without_token_sends_only_the_response() -> None:
+    """Without a progress token the stream holds just the usual response."""
+    client = TestClient(_server().create_http_app())
+
+    response = client.post("/mcp", json=_load_test(2), headers={"Accept": "text/event-stream"})
+
+    messages = _sse_messages(response.text)
+    assert len(messages) == 1
+    result = _tool_result(messages[0])
+    assert result["success"] is True
+    assert "chunks_sent" not in result
+
+
+def test_json_post_and_tool_listing() -> None:
+    """Plain JSON requests (and batches) still get JSON; tools are served with an ETag."""
+    client = TestClient(_server().create_http_app())
+
+    batch = client.post("/mcp", json=[_load_test(1, token="ignored"), _load_test(2)])
+    assert [message["id"] for message in batch.json()] == [1, 2]
+    assert client.post("/mcp", json={"jsonrpc": "2.0", "method": "x"}).status_code == 202
+
+    tools = client.get("/mcp/tools")
+    assert "diagnostic_load_test" in {tool["name"] for tool in tools.json()["tools"]}
+    revalidated = client.get("/mcp/tools", headers={"If-None-Match": tools.headers["etag"]})
+    assert revalidated.status_code == 304
+
+
+async def test_stdio_with_mesh_adapter() -> None:
+    """The adapter's streaming handler serves tool calls over stdio."""
+    server = CrankMCPServer()
+    await server._register_services()
+    reader = asyncio.StreamReader()
+    reader.feed_data(json.dumps(_load_test(5, token=5, response_size_kb=8)).encode() + b"\n")
+    reader.feed_eof()
+
+    writer = LineWriter()
+    await serve_stdio(server.adapter.handle_streaming_message, reader, writer)  # type: ignore[arg-type]
+
+    assert [line.get("method") for line in writer.lines].count(CHUNK_NOTIFICATION) == 2
+    assert writer.lines[-1]["id"] == 5
+    assert _tool_result(writer.lines[-1])["chunks_sent"] == 2
@@ -0,0 +1,170 @@
+"""
+Tests for codec negotiation on the mesh /v1/process endpoints
+
+Exercises both mesh interfaces (crank_mesh_interface and mesh_interface_v2)
+with JSON, MessagePack and CBOR bodies and checks receipts hash the
+canonical encoding.
+"""
+
+import hashlib
+import json
+from typing import Any
+
+import pytest
+from crank_mesh_interface import (
+    CrankMeshInterface,
+    CrankMeshReceiptSystem,
+    CrankMeshRequest,
+    CrankMeshResponse,
+)
+from fastapi.testclient import TestClient
+from mesh_interface_v2 import MeshInterface, MeshReceiptGenerator, MeshRequest, MeshResponse
+
+from crank.protocols import CODECS
+from crank.protocols.codecs import CBOR_AVAILABLE, MSGPACK_AVAILABLE
+
+AUTH = {"Authorization": "Bearer test-key"}
+RESULT = {"converted_data": "cGRm", "target_format": "pdf", "note": "✓"}
+
+binary_codecs = pytest.mark.skipif(
+    not (MSGPACK_AVAILABLE and CBOR_AVAILABLE), reason="codecs extra not installed"
+)
+
+
+class EchoService(CrankMeshInterface):
+    """Mesh service returning a fixed result."""
+
+    def __init__(self) -> None:
+        super().__init__("document", node_id="codec-node")
+
+    async def process_request(
+        self, request: CrankMeshRequest, auth_context: dict[str, Any]
+    ) -> CrankMeshResponse:
+        return CrankMeshResponse(success=True, result=RESULT, processing_time_ms=3)
+
+    def get_capabilities(self) -> list[Any]:
+        return []
+
+
+class EchoServiceV2(MeshInterface):
+    """v2 mesh service returning a fixed result."""
+
+    def __init__(self) -> None:
+        super().__init__("document", node_id="codec-node-v2")
+
+    async def process_request(
+        self, request: MeshRequest, auth_context: dict[str, Any]
+    ) -> MeshResponse:
+        return MeshResponse(
+            success=True, result=RESULT, receipt_id="", processing_time_ms=0, mesh_node_id=""
+        )
+
+    def get_capabilities(self) -> list[Any]:
+        return []
+
+
+REQUEST = {
+    "service_type": "document",
+    "operation": "convert",
+    "input_data": {"document_data": "ZG9j", "target_format": "pdf"},
+}
+
+
+@pytest.fixture(params=["v1", "v2"])
+def client(request: pytest.FixtureRequest) -> TestClient:
+    """Test client for each mesh interface generation."""
+    service = EchoService() if request.param == "v1" else EchoServiceV2()
+    return TestClient(service.create_app(api_key="test-key"))
+
+
+# --- Negotiation ---
+
+
+def test_json_requests_keep_working(client: TestClient) -> None:
+    """Test plain JSON clients see the same response shape as before."""
+    response = client.post("/v1/process", json=REQUEST, headers=AUTH)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    body = response.json()
+    assert body["success"] is True
+    assert body["result"] == RESULT
+    assert body["receipt_id"]
+
+
+@binary_codecs
+@pytest.mark.parametrize(
+    ("content_type", "accept"),
+    [
+        ("application/msgpack", None),
+        ("application/cbor", None),
+        ("application/msgpack", "application/cbor"),
+        ("application/json", "application/msgpack"),
+    ],
+)
+def test_binary_codecs_are_negotiated(
+    client: TestClient, content_type: str, accept: str | None
+) -> None:
+    """Test the body codec follows Content-Type and the reply follows Accept."""
+    request_codec = CODECS[content_type]
+    headers = {**AUTH, "Content-Type": content_type}
+    if accept:
+        headers["Accept"] = accept
+
+    response = client.post("/v1/process", content=request_codec.encode(REQUEST), headers=headers)
+
+    response_codec = CODECS[accept or content_type]
+    assert response.status_code == 200
+    assert response.headers["content-type"] == response_codec.media_type
+    assert response_codec.decode(response.content)["result"] == RESULT
+
+
+def test_unsupported_content_type_is_415(client: TestClient) -> None:
+    """Test bodies in unknown encodings are rejected."""
+    headers = {**AUTH, "Content-Type": "text/xml"}
+    response = client.post("/v1/process", content=b"<x/>", headers=headers)
+    assert response.status_code == 415
+
+
+def test_unacceptable_accept_is_406(client: TestClient) -> None:
+    """Test Accept headers matching no codec are rejected."""
+    response = client.post("/v1/process", json=REQUEST, headers={**AUTH, "Accept": "text/html"})
+    assert response.status_code == 406
+
+
+def test_invalid_request_is_422(client: TestClient) -> None:
+    """Test model validation still applies to decoded bodies."""
+    response = client.post("/v1/process", json={"operation": "convert"}, headers=AUTH)
+    assert response.status_code == 422
+    assert response.json()["detail"]
+
+
+# --- Receipt hashes ---
+
+
+def legacy_hash(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def test_v1_receipt_hashes_match_legacy_encoding() -> None:
+    """Test receipts hash the same bytes as the pre-codec implementation."""
+    request = CrankMeshRequest(**REQUEST)
+    response = CrankMeshResponse(success=True, result=RESULT)
+
+    receipt = CrankMeshReceiptSystem("node").generate_receipt(request, response, 0.0)
+
+    assert receipt.input_hash == legacy_hash(request.model_dump())
+    assert receipt.output_hash == legacy_hash(RESULT)
+
+
+def test_v2_receipt_hashes_match_legacy_encoding() -> None:
+    """Test v2 receipts hash the same bytes as the pre-codec implementation."""
+    request = MeshRequest(**REQUEST)
+    response = MeshResponse(
+        success=True, result=RESULT, receipt_id="", processing_time_ms=0, mesh_node_id=""
+    )
+
+    receipt = MeshReceiptGenerator("node").generate_receipt(request, response, {}, 0.0)
+
+    assert receipt.input_hash == legacy_hash(REQUEST["input_data"])
+    assert receipt.output_hash == legacy_hash(RESULT)
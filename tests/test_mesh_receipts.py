@@ -0,0 +1,111 @@
+"""
+Tests for the v2 mesh receipt pipeline and /v1/receipts lookup
+
+Runs mesh_interface_v2 with a ReceiptPipeline over a temporary receipt log:
+receipts are hashed and stored in the background, and lookups return the
+stored receipt with a Merkle inclusion proof once its segment is sealed.
+"""
+
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from mesh_interface_v2 import MeshInterface, MeshRequest, MeshResponse
+
+from crank.protocols import CANONICAL_CODEC, canonical_digest
+from crank.storage import DurabilityMode, MerkleProof, ReceiptLog, ReceiptPipeline, leaf_hash
+
+AUTH = {"Authorization": "Bearer test-key"}
+RESULT = {"converted_data": "cGRm", "target_format": "pdf"}
+REQUEST = {
+    "service_type": "document",
+    "operation": "convert",
+    "input_data": {"document_data": "ZG9j", "target_format": "pdf"},
+}
+
+
+class EchoService(MeshInterface):
+    """v2 mesh service returning a fixed result."""
+
+    async def process_request(
+        self, request: MeshRequest, auth_context: dict[str, Any]
+    ) -> MeshResponse:
+        return MeshResponse(
+            success=True, result=RESULT, receipt_id="", processing_time_ms=0, mesh_node_id=""
+        )
+
+    def get_capabilities(self) -> list[Any]:
+        return []
+
+
+@pytest.fixture
+def pipeline(tmp_path: Path) -> ReceiptPipeline:
+    """Pipeline over a fresh log; sealing is left to the tests."""
+    log = ReceiptLog(tmp_path, durability=DurabilityMode.NONE)
+    return ReceiptPipeline(log, digest_chars=16, seal_interval=None)
+
+
+def _wait_until_recorded(client: TestClient, receipt_id: str) -> dict[str, Any]:
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        response = client.get(f"/v1/receipts/{receipt_id}", headers=AUTH)
+        if response.status_code == 200:
+            return dict(response.json())
+        assert response.status_code == 202
+        time.sleep(0.01)
+    raise AssertionError(f"Receipt {receipt_id} was never recorded")
+
+
+def test_receipt_is_recorded_then_proven(pipeline: ReceiptPipeline) -> None:
+    """A processed request's receipt is stored, then sealed with a valid proof."""
+    service = EchoService("document", node_id="receipts-node", receipt_pipeline=pipeline)
+    with TestClient(service.create_app(api_key="test-key")) as client:
+        processed = client.post("/v1/process", json=REQUEST, headers=AUTH).json()
+        receipt_id = processed["receipt_id"]
+
+        recorded = _wait_until_recorded(client, receipt_id)
+        assert recorded["status"] == "recorded"
+        assert recorded["proof"] is None
+        receipt = recorded["receipt"]
+        assert receipt["input_hash"] == canonical_digest(REQUEST["input_data"])[:16]
+        assert receipt["output_hash"] == canonical_digest(RESULT)[:16]
+
+        pipeline.log.seal()
+        sealed = client.get(f"/v1/receipts/{receipt_id}", headers=AUTH).json()
+
+    assert sealed["status"] == "sealed"
+    proof = MerkleProof.from_dict(sealed["proof"])
+    assert proof.leaf == leaf_hash(CANONICAL_CODEC.encode(sealed["receipt"]))
+    assert proof.verify(bytes.fromhex(sealed["seal"]["root"]))
+
+
+def test_unknown_receipt_is_404(pipeline: ReceiptPipeline) -> None:
+    """Looking up an id that was never issued returns 404."""
+    service = EchoService("document", receipt_pipeline=pipeline)
+    with TestClient(service.create_app(api_key="test-key")) as client:
+        response = client.get("/v1/receipts/receipt_missing", headers=AUTH)
+    assert response.status_code == 404
+
+
+def test_without_receipt_log_receipts_are_synchronous(monkeypatch: pytest.MonkeyPatch) -> None:
+    """With no log configured, receipts are generated inline and lookups are 404."""
+    monkeypatch.delenv("MESH_RECEIPT_DIR", raising=False)
+    service = EchoService("document")
+    assert service.receipt_generator.pipeline is None
+
+    with TestClient(service.create_app(api_key="test-key")) as client:
+        processed = client.post("/v1/process", json=REQUEST, headers=AUTH).json()
+        response = client.get(f"/v1/receipts/{processed['receipt_id']}", headers=AUTH)
+    assert processed["receipt_id"].startswith("receipt_")
+    assert response.status_code == 404
+
+
+def test_receipt_log_from_environment(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """MESH_RECEIPT_DIR enables the pipeline for every v2 service."""
+    monkeypatch.setenv("MESH_RECEIPT_DIR", str(tmp_path))
+    service = EchoService("document")
+    pipeline = service.receipt_generator.pipeline
+    assert pipeline is not None
+    assert pipeline.log.directory == tmp_path
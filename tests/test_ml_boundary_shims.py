@@ -117,6 +117,57 @@ class TestMLBoundaryShims:
         assert result["confidence"] == 0.0
         assert result["scores"] == []
 
+    def test_safe_yolo_detect_batch_one_result_per_image(self) -> None:
+        """Test batched YOLO detection calls the model once for the whole list."""
+        from services.ml_boundary_shims import safe_yolo_detect_batch
+
+        mock_model = MagicMock()
+        empty_result = MagicMock()
+        empty_result.boxes = None
+        mock_model.return_value = [empty_result, empty_result, empty_result]
+
+        results = safe_yolo_detect_batch(mock_model, ["a", "b", "c"], confidence=0.4)
+
+        assert len(results) == 3
+        assert all(r["prediction"] == "no_objects_detected" for r in results)
+        mock_model.assert_called_once_with(["a", "b", "c"], conf=0.4, verbose=False)
+
+    def test_safe_yolo_detect_batch_exception_handling(self) -> None:
+        """Test batched YOLO detection fails every image when the call fails."""
+        from services.ml_boundary_shims import safe_yolo_detect_batch
+
+        mock_model = MagicMock()
+        mock_model.side_effect = RuntimeError("GPU out of memory")
+
+        results = safe_yolo_detect_batch(mock_model, ["a", "b"])
+
+        assert [r["prediction"] for r in results] == ["detection_failed", "detection_failed"]
+
+    def test_safe_clip_zero_shot_batch(self) -> None:
+        """Test zero-shot scoring returns one ranked result per image row."""
+        import torch
+
+        from services.ml_boundary_shims import safe_clip_zero_shot
+
+        image_features = torch.tensor([[1.0, 0.0], [0.0, 1.0]])
+        text_features = torch.tensor([[1.0, 0.0], [0.0, 1.0]])
+
+        results = safe_clip_zero_shot(image_features, text_features, ["cat", "dog"])
+
+        assert [r["prediction"] for r in results] == ["cat", "dog"]
+        assert results[0]["confidence"] > 0.99
+        assert [s["category"] for s in results[1]["scores"]] == ["dog", "cat"]
+
+    def test_safe_clip_zero_shot_exception_handling(self) -> None:
+        """Test zero-shot scoring with mismatched feature shapes."""
+        import torch
+
+        from services.ml_boundary_shims import safe_clip_zero_shot
+
+        results = safe_clip_zero_shot(torch.ones(2, 3), torch.ones(2, 4), ["cat", "dog"])
+
+        assert [r["prediction"] for r in results] == ["analysis_failed", "analysis_failed"]
+
     def test_safe_sentence_transformer_encode_success(self) -> None:
         """Test successful sentence transformer encoding."""
         from services.ml_boundary_shims import safe_sentence_transformer_encode
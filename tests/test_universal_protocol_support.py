@@ -0,0 +1,160 @@
+"""
+Tests for the universal protocol adapters
+
+Runs the gRPC, ONC-RPC and GraphQL adapters against a recording mesh service, both
+through ``handle_request`` and over their real transports.
+"""
+
+import json
+from typing import Any
+
+import pytest
+from crank_mesh_interface import CrankMeshInterface, CrankMeshRequest, CrankMeshResponse
+from universal_protocol_support import (
+    GRAPHQL_AVAILABLE,
+    GRPC_AVAILABLE,
+    GraphQLAdapter,
+    GRPCAdapter,
+    ONCRPCAdapter,
+    decode_mesh_result,
+)
+
+from crank.protocols import (
+    AcceptStatus,
+    XDREncoder,
+    decode_reply,
+    encode_auth_sys,
+    encode_call,
+)
+
+
+class RecordingMeshService(CrankMeshInterface):
+    """Mesh service that records requests and echoes their input."""
+
+    def __init__(self) -> None:
+        super().__init__("document", node_id="test-node")
+        self.calls: list[tuple[CrankMeshRequest, dict[str, Any]]] = []
+        self.batches: list[list[CrankMeshRequest]] = []
+
+    async def process_request(
+        self, request: CrankMeshRequest, auth_context: dict[str, Any]
+    ) -> CrankMeshResponse:
+        self.calls.append((request, auth_context))
+        return CrankMeshResponse(
+            success=True,
+            result={"converted_data": "cGRm", "target_format": request.input_data["target_format"]},
+            receipt_id="receipt-1",
+            processing_time_ms=7,
+            mesh_node_id=self.node_id,
+        )
+
+    async def process_batch(
+        self, requests: list[CrankMeshRequest], auth_context: dict[str, Any]
+    ) -> list[CrankMeshResponse]:
+        self.batches.append(requests)
+        return await super().process_batch(requests, auth_context)
+
+    def get_capabilities(self) -> list[Any]:
+        return []
+
+
+CONVERT = {"document_data": "ZG9j", "source_format": "txt", "target_format": "pdf"}
+
+
+@pytest.mark.skipif(not GRPC_AVAILABLE, reason="grpc extra not installed")
+async def test_grpc_adapter_dispatches_capability_to_mesh() -> None:
+    """Test a binary InvokeRequest reaches the mesh as the capability's operation."""
+    mesh = RecordingMeshService()
+    adapter = GRPCAdapter(mesh)
+    request = adapter.contract.make_request("document.convert", CONVERT, request_id="job-1")
+
+    raw = await adapter.handle_request(request.SerializeToString())
+    result = adapter.contract.read_response(adapter.contract.InvokeResponse.FromString(raw))
+
+    assert result.success
+    assert result.result == {"converted_data": "cGRm", "target_format": "pdf"}
+    mesh_request, auth = mesh.calls[0]
+    assert (mesh_request.service_type, mesh_request.operation) == ("document", "convert")
+    assert mesh_request.input_data == CONVERT
+    assert mesh_request.metadata is not None
+    assert mesh_request.metadata["capability"] == "document.convert"
+    assert auth["access_method"] == "grpc"
+
+
+@pytest.mark.skipif(not GRPC_AVAILABLE, reason="grpc extra not installed")
+async def test_grpc_adapter_serves_http2() -> None:
+    """Test the adapter's gRPC server passes bearer tokens to the mesh."""
+    from crank.protocols.grpc_gateway import MeshGatewayClient
+
+    mesh = RecordingMeshService()
+    adapter = GRPCAdapter(mesh)
+    server, port = await adapter.serve("127.0.0.1:0")
+    client = MeshGatewayClient(
+        f"127.0.0.1:{port}", adapter.contract, metadata=(("authorization", "Bearer abc"),)
+    )
+    try:
+        result = await client.invoke("document.convert", CONVERT)
+    finally:
+        await client.close()
+        await server.stop(None)
+
+    assert result.receipt_id == "receipt-1"
+    assert mesh.calls[0][1]["api_key"] == "abc"
+
+
+async def test_onc_rpc_adapter_round_trip() -> None:
+    """Test an ONC-RPC call with AUTH_SYS is dispatched and its XDR result decodes."""
+    mesh = RecordingMeshService()
+    adapter = ONCRPCAdapter(mesh)
+    args = XDREncoder()
+    args.pack_value(CONVERT)
+    call = encode_call(99, 100001, 1, 1, args.getvalue(), encode_auth_sys(1000, 100, "legacy-host"))
+
+    xid, _, status, body = decode_reply(await adapter.handle_request(call))
+
+    assert (xid, status) == (99, AcceptStatus.SUCCESS)
+    result = decode_mesh_result(body)
+    assert result["success"] is True
+    assert result["result"] == {"converted_data": "cGRm", "target_format": "pdf"}
+    assert mesh.calls[0][0].input_data == CONVERT
+
+
+async def test_onc_rpc_adapter_rejects_unknown_program() -> None:
+    """Test calls to another program number get PROG_UNAVAIL."""
+    adapter = ONCRPCAdapter(RecordingMeshService())
+    _, _, status, _ = decode_reply(await adapter.handle_request(encode_call(1, 424242, 1, 1)))
+    assert status == AcceptStatus.PROG_UNAVAIL
+
+
+@pytest.mark.skipif(not GRAPHQL_AVAILABLE, reason="graphql extra not installed")
+async def test_graphql_adapter_batches_aliases_into_one_mesh_call() -> None:
+    """Test aliased capability fields reach the mesh as one process_batch call."""
+    mesh = RecordingMeshService()
+    adapter = GraphQLAdapter(mesh)
+    fields = " ".join(
+        f'd{i}: documentConvert(input: {{document_data: "d{i}", source_format: "txt", '
+        f'target_format: "pdf"}}) {{ success receiptId output {{ target_format }} }}'
+        for i in range(4)
+    )
+    body = json.dumps({"query": f"{{ {fields} }}"}).encode()
+
+    response = json.loads(await adapter.handle_request(body, {"x-api-key": "key-1"}))
+
+    assert response["data"]["d2"] == {
+        "success": True,
+        "receiptId": "receipt-1",
+        "output": {"target_format": "pdf"},
+    }
+    assert [len(batch) for batch in mesh.batches] == [4]
+    mesh_request, auth = mesh.calls[0]
+    assert (mesh_request.service_type, mesh_request.operation) == ("document", "convert")
+    assert mesh_request.metadata is not None
+    assert mesh_request.metadata["protocol"] == "graphql"
+    assert auth["api_key"] == "key-1"
+
+
+@pytest.mark.skipif(not GRAPHQL_AVAILABLE, reason="graphql extra not installed")
+async def test_graphql_adapter_rejects_invalid_json() -> None:
+    """Test a non-JSON body gets a GraphQL error response."""
+    response = json.loads(await GraphQLAdapter(RecordingMeshService()).handle_request(b"{"))
+    assert response["errors"][0]["extensions"]["code"] == "BAD_REQUEST"
@@ -0,0 +1,170 @@
+"""
+Tests for the vector index worker engine
+
+Covers VectorIndexEngine IVF namespaces:
+- Training starts once enough vectors arrive and runs off the event loop
+- Recall of the trained index against a brute-force reference
+- Upserts and queries keep working while k-means runs
+- Text embedding runs in a worker thread, not on the event loop
+"""
+
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+from crank_vector_index import (
+    QueryVectorsRequest,
+    UpsertVectorsRequest,
+    VectorIndexEngine,
+    VectorItem,
+)
+
+from crank.search import IVFVectorIndex
+
+NLIST = 16
+DIMENSION = 32
+# Namespaces train at 39 vectors per list
+THRESHOLD = NLIST * 39
+COUNT = NLIST * 40
+
+
+def _clustered(rng: np.random.Generator, count: int) -> np.ndarray:
+    """Unit vectors scattered around NLIST random directions."""
+    centres = rng.standard_normal((NLIST, DIMENSION))
+    vectors = centres[rng.integers(NLIST, size=count)] + 0.3 * rng.standard_normal(
+        (count, DIMENSION)
+    )
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _upsert(keys: list[str], vectors: np.ndarray) -> UpsertVectorsRequest:
+    return UpsertVectorsRequest(
+        namespace="image.clip",
+        index_type="ivf",
+        items=[VectorItem(key=key, vector=vector.tolist()) for key, vector in zip(keys, vectors)],
+    )
+
+
+def _query(vector: np.ndarray, k: int = 10) -> QueryVectorsRequest:
+    return QueryVectorsRequest(namespace="image.clip", vector=vector.tolist(), k=k)
+
+
+@pytest.fixture
+def engine(tmp_path: Path) -> VectorIndexEngine:
+    """Engine with small IVF namespaces."""
+    return VectorIndexEngine(storage_path=tmp_path, ivf_nlist=NLIST)
+
+
+@pytest.mark.asyncio
+async def test_training_runs_in_background(engine: VectorIndexEngine) -> None:
+    """Crossing the threshold schedules training instead of running it inline."""
+    vectors = _clustered(np.random.default_rng(1), THRESHOLD)
+    await engine.upsert(_upsert([f"v{i}" for i in range(THRESHOLD - 1)], vectors[:-1]))
+    assert not engine._training
+
+    await engine.upsert(_upsert([f"v{THRESHOLD - 1}"], vectors[-1:]))
+    index = engine._indexes["image.clip"]
+    assert isinstance(index, IVFVectorIndex)
+    assert not index.is_trained  # Upsert returned before k-means ran
+
+    await engine.wait_for_training()
+
+    assert index.is_trained
+    assert engine.namespaces["image.clip"]["trained"] is True
+    assert not engine._training
+
+
+@pytest.mark.asyncio
+async def test_trained_recall_against_brute_force(engine: VectorIndexEngine) -> None:
+    """IVF results after training mostly match the exact top-10."""
+    rng = np.random.default_rng(2)
+    vectors = _clustered(rng, COUNT)
+    keys = [f"v{i}" for i in range(COUNT)]
+    await engine.upsert(_upsert(keys, vectors))
+    await engine.wait_for_training()
+
+    found = 0
+    queries = _clustered(rng, 50)
+    for query in queries:
+        expected = {keys[i] for i in np.argsort(-(vectors @ query), kind="stable")[:10]}
+        response = await engine.query(_query(query))
+        found += len(expected & {match.key for match in response.results})
+
+    assert found / (10 * len(queries)) >= 0.9
+
+
+@pytest.mark.asyncio
+async def test_upserts_and_queries_during_training(
+    engine: VectorIndexEngine, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The namespace serves while k-means runs; vectors added meanwhile get assigned."""
+    started, release = threading.Event(), threading.Event()
+    fit_centroids = IVFVectorIndex.fit_centroids
+
+    def blocked_fit(self: IVFVectorIndex, *args: object, **kwargs: object) -> np.ndarray:
+        started.set()
+        release.wait(timeout=10)
+        return fit_centroids(self, *args, **kwargs)  # type: ignore[arg-type]
+
+    monkeypatch.setattr(IVFVectorIndex, "fit_centroids", blocked_fit)
+    rng = np.random.default_rng(3)
+    vectors = _clustered(rng, COUNT)
+    await engine.upsert(_upsert([f"v{i}" for i in range(COUNT)], vectors))
+    assert await asyncio.to_thread(started.wait, 10)  # Snapshot taken, k-means running
+    training = engine._training["image.clip"]
+
+    late = _clustered(rng, 20)
+    result = await engine.upsert(_upsert([f"late{i}" for i in range(20)], late))
+    response = await engine.query(_query(late[0], k=1))
+
+    assert result["size"] == COUNT + 20
+    assert response.results[0].key == "late0"  # Exact search until training lands
+    assert not training.done()
+
+    release.set()
+    await engine.wait_for_training()
+
+    assert engine._indexes["image.clip"].is_trained  # type: ignore[attr-defined]
+    for i in range(20):
+        response = await engine.query(_query(late[i], k=1))
+        assert response.results[0].key == f"late{i}"
+
+
+@pytest.mark.asyncio
+async def test_text_embedding_runs_off_the_loop(
+    engine: VectorIndexEngine, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Text items and queries are embedded in a worker thread while the loop keeps serving."""
+    embed_threads: list[int] = []
+
+    def slow_embed(texts: list[str]) -> list[list[float]]:
+        embed_threads.append(threading.get_ident())
+        time.sleep(0.1)  # Stands in for model load / encode
+        return [[float(len(text)), 1.0] for text in texts]
+
+    monkeypatch.setattr(engine, "_embed_texts", slow_embed)
+    ticks = 0
+
+    async def ticker() -> None:
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticking = asyncio.create_task(ticker())
+    await engine.upsert(
+        UpsertVectorsRequest(
+            namespace="notes",
+            items=[VectorItem(key="a", text="short"), VectorItem(key="b", vector=[9.0, 1.0])],
+        )
+    )
+    response = await engine.query(QueryVectorsRequest(namespace="notes", text="longer text", k=1))
+    ticking.cancel()
+
+    assert response.results[0].key == "b"
+    assert threading.get_ident() not in embed_threads
+    assert len(embed_threads) == 2
+    assert ticks >= 10  # The loop ran through ~0.2s of embedding
@@ -4,6 +4,10 @@ Tests for worker runtime components.
 Validates:
 - WorkerApplication base class behavior
 - Registration and heartbeat logic
+- Load measurement reported with heartbeats
+- Prometheus metrics: per-route requests, event-loop lag, GC pauses
+- Blocking-call detection with stack samples in /status and logs
+- Admin-only /debug/profile authorized by client certificate
 - Lifecycle management (startup/shutdown)
 - Health check functionality
 - Certificate management
@@ -12,21 +16,40 @@ Uses test data corpus from tests/data/ for comprehensive coverage.
 """
 
 import asyncio
+import gc
+import threading
+import time
 from pathlib import Path
+from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
 
 from crank.capabilities.schema import STREAMING_CLASSIFICATION, CapabilityDefinition
+from crank.controller import LoadReport
 from crank.worker_runtime import (
     ControllerClient,
     HealthStatus,
+    LoadTracker,
     ShutdownHandler,
     WorkerApplication,
     WorkerRegistration,
 )
+from crank.observability.metrics import MetricsRegistry
+from crank.observability.profiling import AllocationTracer, StackSampler
+from crank.worker_runtime.blocking import BlockingDetector
+from crank.worker_runtime.debug import DebugProfiler
 from crank.worker_runtime.lifecycle import HealthCheckManager
+from crank.worker_runtime.metrics import (
+    EventLoopLagMonitor,
+    GCMonitor,
+    HttpMetrics,
+    MetricsMiddleware,
+)
 from crank.security import CertificateBundle, CertificateManager
+from crank.security.admin import TLSScopeApp, common_name, subject_name
 
 
 class TestWorkerRegistration:
@@ -568,6 +591,347 @@ class TestControllerClient:
             await client.close()
 
 
+class TestLoadTracker:
+    """Test worker load measurement."""
+
+    def test_track_counts_in_flight_and_latency(self) -> None:
+        """Tracked requests are in flight while running and recorded after."""
+        tracker = LoadTracker()
+        with tracker.track():
+            assert tracker.in_flight == 1
+        assert tracker.in_flight == 0
+        assert tracker.completed == 1
+
+    def test_p95_over_recent_window(self) -> None:
+        """p95 comes from the most recent latencies only."""
+        tracker = LoadTracker(latency_window=100)
+        assert tracker.p95_ms() == 0.0
+        for latency in range(1, 101):
+            tracker.observe(float(latency))
+        assert tracker.p95_ms() == 96.0
+
+        for _ in range(100):  # Window now holds only fast requests
+            tracker.observe(1.0)
+        assert tracker.p95_ms() == 1.0
+
+    def test_report_includes_queue_depth_and_process_stats(self) -> None:
+        """Reports carry the queue depth callback and real CPU/RSS readings."""
+        tracker = LoadTracker(queue_depth=lambda: 3)
+        report = tracker.report()
+        assert report.queue_depth == 3
+        assert 0.0 <= report.cpu <= 1.0
+        assert report.rss_mb > 0
+        assert LoadReport.from_vector(report.encode()) == report
+
+    def test_worker_app_tracks_requests_but_not_probes(self) -> None:
+        """Business routes are tracked; /health and /status are not."""
+
+        class TestWorker(WorkerApplication):
+            def get_capabilities(self) -> list[CapabilityDefinition]:
+                return [STREAMING_CLASSIFICATION]
+
+            def setup_routes(self) -> None:
+                async def work() -> dict[str, int]:
+                    return {"in_flight": self.load_tracker.in_flight}
+
+                self.app.get("/work")(work)
+
+        worker = TestWorker()
+        worker.setup_routes()
+        client = TestClient(worker.app)
+
+        assert client.get("/work").json() == {"in_flight": 1}
+        status = client.get("/status").json()
+        assert worker.load_tracker.completed == 1
+        assert status["load"]["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_sends_load_vector(self) -> None:
+        """The routing controller gets the load vector; the platform a matching load_score."""
+        tracker = LoadTracker(queue_depth=lambda: 5)
+        client = ControllerClient(
+            worker_id="test-worker",
+            worker_url="https://worker:8500",
+            capabilities=[STREAMING_CLASSIFICATION],
+            load_tracker=tracker,
+            routing_url="https://controller:9000",
+        )
+        mock_http = AsyncMock()
+        mock_http.post.return_value = MagicMock(status_code=200)
+
+        with patch.object(client, "_get_http_client", AsyncMock(return_value=mock_http)):
+            await client.send_heartbeat()
+
+        platform_call, controller_call = mock_http.post.call_args_list
+        assert float(platform_call.kwargs["data"]["load_score"]) >= 0.5  # 5 queued of 10 slots
+        assert controller_call.args == ("https://controller:9000/heartbeat",)
+        body = controller_call.kwargs["json"]
+        assert body["worker_id"] == "test-worker"
+        assert LoadReport.from_vector(body["load"]).queue_depth == 5
+
+
+class TestRuntimeMetrics:
+    """Test Prometheus runtime metrics."""
+
+    def test_requests_labelled_by_route_template(self) -> None:
+        """Requests count under their route template; probes are not counted."""
+        registry = MetricsRegistry()
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware, metrics=HttpMetrics(registry))
+
+        async def get_job(job_id: str) -> dict[str, str]:
+            return {"job_id": job_id}
+
+        async def health() -> dict[str, str]:
+            return {"status": "ok"}
+
+        app.get("/jobs/{job_id}")(get_job)
+        app.get("/health")(health)
+        client = TestClient(app)
+        for job_id in ("a", "b"):
+            client.get(f"/jobs/{job_id}")
+        client.get("/nowhere")
+        client.get("/health")
+
+        text = registry.render()
+        requests = 'crank_http_requests_total{method="GET",route="%s",status="%d"}'
+        assert requests % ("/jobs/{job_id}", 200) + " 2" in text
+        assert requests % ("unmatched", 404) + " 1" in text
+        assert "/health" not in text
+        assert (
+            'crank_http_request_duration_seconds_count{method="GET",route="/jobs/{job_id}"} 2'
+            in text
+        )
+        assert "crank_http_requests_in_flight 0" in text
+
+    def test_gc_pauses_are_timed(self) -> None:
+        """Collections are counted and timed per generation while installed."""
+        monitor = GCMonitor(MetricsRegistry())
+        monitor.install()
+        try:
+            gc.collect()
+        finally:
+            monitor.uninstall()
+        assert monitor.collections.labels(2).value >= 1
+        assert monitor.pause.labels(2).count >= 1
+        assert monitor._on_gc not in gc.callbacks
+
+    @pytest.mark.asyncio
+    async def test_event_loop_lag_detects_blocking(self) -> None:
+        """A blocking call shows up as lag of the periodic timer."""
+        monitor = EventLoopLagMonitor(MetricsRegistry(), interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0.02)
+        time.sleep(0.1)  # Blocks the loop
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+        assert monitor.lag.labels().count >= 2
+        assert monitor.lag.labels().sum >= 0.05
+
+    def test_worker_serves_metrics(self) -> None:
+        """Workers expose their series on /metrics in the text format."""
+
+        class TestWorker(WorkerApplication):
+            def get_capabilities(self) -> list[CapabilityDefinition]:
+                return [STREAMING_CLASSIFICATION]
+
+            def setup_routes(self) -> None:
+                async def work() -> dict[str, str]:
+                    return {"status": "ok"}
+
+                self.app.get("/metrics-work")(work)
+
+        worker = TestWorker()
+        worker.setup_routes()
+        client = TestClient(worker.app)
+        client.get("/metrics-work")
+
+        response = client.get("/metrics")
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert 'route="/metrics-work",status="200"' in response.text
+        assert "# TYPE crank_event_loop_lag_seconds histogram" in response.text
+
+
+def _blocking_handler(seconds: float) -> None:
+    """Stand-in for a handler calling blocking code on the event loop."""
+    time.sleep(seconds)
+
+
+class TestBlockingDetector:
+    """Test event-loop stall detection."""
+
+    @pytest.mark.asyncio
+    async def test_stall_is_reported_with_its_stack(
+        self, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        """A blocking call is caught while it blocks, with the blocking frame on top."""
+        registry = MetricsRegistry()
+        monitor = EventLoopLagMonitor(registry, interval=0.01)
+        detector = BlockingDetector(monitor, threshold=0.05, registry=registry)
+        monitor.start()
+        detector.start()
+        try:
+            await asyncio.sleep(0.03)
+            _blocking_handler(0.25)
+            await asyncio.sleep(0.1)  # Short lag only: not a stall
+        finally:
+            detector.stop()
+            await monitor.stop()
+
+        report = detector.report()
+        assert report["stalls"] == 1
+        spot = report["hot_spots"][0]
+        assert spot["count"] == 1
+        assert spot["max_ms"] >= 150
+        assert spot["stack"][-1].endswith("in _blocking_handler")
+        assert not any("/asyncio/" in frame for frame in spot["stack"])
+        assert "Event loop blocked for" in caplog.text
+        assert "crank_event_loop_blocked_total 1" in registry.render()
+
+    @pytest.mark.asyncio
+    async def test_repeated_stalls_aggregate_into_one_hot_spot(self) -> None:
+        """Stalls with the same stack share a hot spot; logging is rate-limited."""
+        monitor = EventLoopLagMonitor(MetricsRegistry(), interval=0.01)
+        detector = BlockingDetector(monitor, threshold=0.04, registry=MetricsRegistry())
+        monitor.start()
+        detector.start()
+        try:
+            for _ in range(3):
+                await asyncio.sleep(0.05)
+                _blocking_handler(0.15)
+            await asyncio.sleep(0.05)
+        finally:
+            detector.stop()
+            await monitor.stop()
+
+        report = detector.report()
+        assert report["stalls"] == 3
+        assert [spot["count"] for spot in report["hot_spots"]] == [3]
+
+    def test_worker_status_includes_event_loop(self) -> None:
+        """Worker /status reports loop lag and the detector's hot spots."""
+
+        class TestWorker(WorkerApplication):
+            def get_capabilities(self) -> list[CapabilityDefinition]:
+                return [STREAMING_CLASSIFICATION]
+
+            def setup_routes(self) -> None:
+                pass
+
+        status = TestClient(TestWorker().app).get("/status").json()
+        assert status["event_loop"]["threshold_ms"] == 100
+        assert status["event_loop"]["hot_spots"] == []
+        assert set(status["event_loop"]["lag_ms"]) == {"last", "max"}
+
+
+class _ProfiledWorker(WorkerApplication):
+    def get_capabilities(self) -> list[CapabilityDefinition]:
+        return [STREAMING_CLASSIFICATION]
+
+    def setup_routes(self) -> None:
+        pass
+
+
+def _client_with_cert(app: FastAPI, subject: str) -> TestClient:
+    """Client whose requests carry a verified client certificate (ASGI TLS extension)."""
+    return TestClient(TLSScopeApp(app, {"client_cert_name": subject}))
+
+
+class TestDebugProfile:
+    """Test the admin-only profiling endpoint."""
+
+    def test_subject_name_from_peer_certificate(self) -> None:
+        """getpeercert() subjects become RFC 4514 names, most specific RDN first."""
+        peer_cert = {
+            "subject": (
+                (("organizationName", "Crank"),),
+                (("commonName", "ops-admin"),),
+            )
+        }
+        subject = subject_name(peer_cert)
+        assert subject == "CN=ops-admin,O=Crank"
+        assert common_name(subject) == "ops-admin"
+        assert common_name("O=Crank") is None
+
+    def test_profile_refused_without_admin_certificate(
+        self, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        """No client certificate, or one that is not an admin's, gets 403 and is logged."""
+        monkeypatch.setenv("CRANK_ADMIN_IDENTITIES", "ops-admin")
+        app = _ProfiledWorker().app
+
+        assert TestClient(app).get("/debug/profile?seconds=0.1").status_code == 403
+        worker_cert = _client_with_cert(app, "CN=worker-1,O=Crank")
+        assert worker_cert.get("/debug/profile?seconds=0.1").status_code == 403
+        assert "Denied admin endpoint GET /debug/profile to CN=worker-1" in caplog.text
+
+    def test_profile_refused_when_no_admins_configured(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Without CRANK_ADMIN_IDENTITIES nobody may profile."""
+        monkeypatch.delenv("CRANK_ADMIN_IDENTITIES", raising=False)
+        client = _client_with_cert(_ProfiledWorker().app, "CN=ops-admin")
+        assert client.get("/debug/profile?seconds=0.1").status_code == 403
+
+    def test_admin_gets_cpu_and_memory_profiles(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """An admin certificate gets collapsed stacks or a speedscope file."""
+        monkeypatch.setenv("CRANK_ADMIN_IDENTITIES", "ops-admin, sre")
+        client = _client_with_cert(_ProfiledWorker().app, "CN=sre,O=Crank")
+
+        collapsed = client.get("/debug/profile?seconds=0.2&interval_ms=2&idle=true")
+        assert collapsed.status_code == 200
+        assert collapsed.headers["content-type"].startswith("text/plain")
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed.text.splitlines())
+        assert collapsed.text
+
+        speedscope = client.get("/debug/profile?seconds=0.1&format=speedscope&kind=memory")
+        assert speedscope.status_code == 200
+        document = speedscope.json()
+        assert document["$schema"] == "https://www.speedscope.app/file-format-schema.json"
+        assert document["profiles"][0]["unit"] == "bytes"
+
+        assert client.get("/debug/profile?seconds=600").status_code == 422
+        assert client.get("/debug/profile?kind=disk").status_code == 422
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("kind", ["cpu", "memory"])
+    async def test_profile_stop_and_render_run_off_the_loop(
+        self, kind: str, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Slow profiler shutdown and rendering happen in worker threads, not on the loop."""
+        profiler_class = StackSampler if kind == "cpu" else AllocationTracer
+        loop_threads: set[int] = set()
+
+        def slow(method: Any) -> Any:
+            def wrapper(self: Any, *args: Any) -> Any:
+                loop_threads.add(threading.get_ident())
+                time.sleep(0.1)
+                return method(self, *args)
+
+            return wrapper
+
+        for name in ("stop", "collapsed"):
+            monkeypatch.setattr(profiler_class, name, slow(getattr(profiler_class, name)))
+
+        ticks = 0
+
+        async def ticker() -> None:
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticking = asyncio.create_task(ticker())
+        response = await DebugProfiler("test").profile(
+            seconds=0.01, kind=kind, format="collapsed", interval_ms=5.0, idle=False
+        )
+        ticking.cancel()
+
+        assert response.status_code == 200
+        assert threading.get_ident() not in loop_threads
+        assert ticks >= 10  # The loop kept running through ~0.2s of blocking calls
+
+
 class TestWorkerApplication:
     """Test worker application base class."""
 
@@ -0,0 +1,224 @@
+"""Unit tests for AdmissionController.
+
+Tests core functionality:
+- Per-(worker, capability) concurrency limits from CapabilitySchema.max_concurrency
+- Bounded wait queue with direct hand-off on release
+- Fast shedding: full queue, unattainable deadlines, waiting too long
+- Lease expiry and cancellation of waiting requests
+- SLO constraints narrowing the candidate workers
+"""
+
+import asyncio
+import time
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+import pytest
+
+from crank.controller import AdmissionController, AdmissionRejected, Lease
+from crank.controller.capability_registry import CapabilityRegistry, CapabilitySchema
+from crank.controller.slo import SLOTracker
+
+KEY = "classify:classify"
+
+# --- Fixtures ---
+
+
+@pytest.fixture
+def registry() -> CapabilityRegistry:
+    """Registry with two workers, each allowing two concurrent classify calls."""
+    with NamedTemporaryFile(suffix=".jsonl", delete=False) as f:
+        state_file = Path(f.name)
+    registry = CapabilityRegistry(state_file=state_file, heartbeat_timeout=5)
+    cap = CapabilitySchema(name="classify", verb="classify", version="1.0.0", max_concurrency=2)
+    for index in range(2):
+        registry.register(
+            worker_id=f"worker-{index}",
+            worker_url=f"https://localhost:{8500 + index}",
+            capabilities=[cap],
+        )
+    return registry
+
+
+@pytest.fixture
+def admission(registry: CapabilityRegistry) -> AdmissionController:
+    """Admission controller with a small queue and short wait."""
+    return AdmissionController(registry, max_queue=2, max_wait=0.5)
+
+
+async def _fill(admission: AdmissionController) -> list[Lease]:
+    leases = [await admission.admit("classify", "classify") for _ in range(4)]
+    assert all(leases)
+    return [lease for lease in leases if lease]
+
+
+def _seed_service_time(admission: AdmissionController, lease: Lease, seconds: float) -> None:
+    """Release a lease as if it had run for ``seconds``."""
+    lease.granted_at = time.monotonic() - seconds
+    admission.release(lease.lease_id)
+
+
+# --- Limits ---
+
+
+async def test_admit_respects_max_concurrency(admission: AdmissionController) -> None:
+    """Test slots fill across workers up to each worker's max_concurrency."""
+    leases = await _fill(admission)
+
+    assert sorted(lease.worker.worker_id for lease in leases) == ["worker-0"] * 2 + ["worker-1"] * 2
+    assert admission.outstanding("worker-0", KEY) == 2
+    assert admission.outstanding("worker-1", KEY) == 2
+    assert all(lease.queued_ms == 0 for lease in leases)
+
+
+async def test_unknown_capability_returns_none(admission: AdmissionController) -> None:
+    """Test no healthy worker means no lease (404 at the endpoint), not a 429."""
+    assert await admission.admit("convert", "nothing") is None
+
+
+async def test_limits_are_per_capability(registry: CapabilityRegistry) -> None:
+    """Test a full capability does not block another on the same worker."""
+    other = CapabilitySchema(name="summarize", verb="invoke", version="1.0.0", max_concurrency=1)
+    registry.register("worker-9", "https://localhost:8509", [other])
+    admission = AdmissionController(registry, max_queue=0)
+    await _fill(admission)
+
+    assert await admission.admit("invoke", "summarize") is not None
+    with pytest.raises(AdmissionRejected):
+        await admission.admit("invoke", "summarize")
+
+
+# --- Queueing ---
+
+
+async def test_release_hands_slot_to_waiter(admission: AdmissionController) -> None:
+    """Test a queued request gets the released slot, in FIFO order."""
+    leases = await _fill(admission)
+    first = asyncio.create_task(admission.admit("classify", "classify"))
+    second = asyncio.create_task(admission.admit("classify", "classify"))
+    await asyncio.sleep(0.01)
+    assert admission.stats()[KEY]["waiting"] == 2
+
+    assert admission.release(leases[1].lease_id)
+    granted = await first
+    assert granted is not None
+    assert granted.worker is leases[1].worker
+    assert granted.queued_ms > 0
+    assert not second.done()
+
+    admission.release(leases[2].lease_id)
+    assert await second is not None
+    assert admission.release(leases[1].lease_id) is None  # Already released
+
+
+async def test_full_queue_sheds_immediately(admission: AdmissionController) -> None:
+    """Test requests beyond the queue bound get a 429 without waiting."""
+    await _fill(admission)
+    waiters = [asyncio.create_task(admission.admit("classify", "classify")) for _ in range(2)]
+    await asyncio.sleep(0.01)
+
+    start = time.monotonic()
+    with pytest.raises(AdmissionRejected) as excinfo:
+        await admission.admit("classify", "classify")
+    assert time.monotonic() - start < 0.05
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.retry_after >= 1
+    for waiter in waiters:
+        waiter.cancel()
+
+
+async def test_wait_times_out(admission: AdmissionController) -> None:
+    """Test a request without a deadline gives up after max_wait."""
+    await _fill(admission)
+    admission.max_wait = 0.05
+
+    with pytest.raises(AdmissionRejected, match="timed out"):
+        await admission.admit("classify", "classify")
+    assert admission.stats()[KEY]["waiting"] == 0
+    assert admission.stats()[KEY]["shed"] == 1
+
+
+async def test_unattainable_deadline_sheds_on_arrival(admission: AdmissionController) -> None:
+    """Test a deadline shorter than queue wait plus service time is rejected at once."""
+    leases = await _fill(admission)
+    _seed_service_time(admission, leases[0], 1.0)  # Typical call takes ~1 s
+    assert await admission.admit("classify", "classify") is not None  # Retake the slot
+
+    start = time.monotonic()
+    with pytest.raises(AdmissionRejected, match="deadline"):
+        await admission.admit("classify", "classify", deadline_ms=500)
+    assert time.monotonic() - start < 0.05
+
+
+async def test_cancelled_waiter_leaves_queue(admission: AdmissionController) -> None:
+    """Test a caller that goes away does not hold a queue position or a slot."""
+    leases = await _fill(admission)
+    waiter = asyncio.create_task(admission.admit("classify", "classify"))
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    admission.release(leases[0].lease_id)
+    assert admission.stats()[KEY]["waiting"] == 0
+    assert admission.stats()[KEY]["outstanding"] == 3
+
+
+# --- Leases ---
+
+
+async def test_expired_leases_are_reclaimed(admission: AdmissionController) -> None:
+    """Test slots whose lease was never released come back after lease_ttl."""
+    leases = await _fill(admission)
+    admission.lease_ttl = 10.0
+    leases[0].granted_at -= 11.0
+
+    lease = await admission.admit("classify", "classify")
+    assert lease is not None
+    assert lease.worker is leases[0].worker
+    assert admission.stats()[KEY]["expired"] == 1
+    assert admission.release(leases[0].lease_id) is None
+
+
+async def test_new_worker_capacity_dispatches_waiters(
+    registry: CapabilityRegistry, admission: AdmissionController
+) -> None:
+    """Test dispatch_all grants queued requests capacity from a newly registered worker."""
+    await _fill(admission)
+    waiter = asyncio.create_task(admission.admit("classify", "classify"))
+    await asyncio.sleep(0.01)
+
+    cap = CapabilitySchema(name="classify", verb="classify", version="1.0.0", max_concurrency=1)
+    registry.register("worker-new", "https://localhost:8600", [cap])
+    admission.dispatch_all()
+
+    lease = await waiter
+    assert lease is not None
+    assert lease.worker.worker_id == "worker-new"
+
+
+# --- SLO Constraints ---
+
+
+async def test_slo_constraints_limit_candidates(registry: CapabilityRegistry) -> None:
+    """Test constrained requests only take slots on workers meeting the SLO."""
+    registry.slo_tracker = SLOTracker()
+    for _ in range(30):
+        registry.slo_tracker.record(KEY, "worker-0", 400.0)
+        registry.slo_tracker.record(KEY, "worker-1", 20.0)
+    admission = AdmissionController(registry, max_queue=0)
+    constraints = {"latency_p95_ms": 100, "fallback": "reject"}
+
+    leases = [
+        await admission.admit("classify", "classify", slo_constraints=constraints) for _ in range(2)
+    ]
+    assert [lease.worker.worker_id for lease in leases if lease] == ["worker-1", "worker-1"]
+    with pytest.raises(AdmissionRejected) as full:
+        await admission.admit("classify", "classify", slo_constraints=constraints)
+    assert full.value.status_code == 429  # worker-0 has room but misses the SLO
+
+    with pytest.raises(AdmissionRejected) as unmet:
+        await admission.admit(
+            "classify", "classify", slo_constraints={**constraints, "latency_p95_ms": 5}
+        )
+    assert unmet.value.status_code == 503
@@ -4,6 +4,8 @@ Tests core functionality:
 - Worker registration with capabilities
 - Heartbeat tracking
 - Routing (capability -> worker lookup)
+- Load-aware routing (heartbeat load vectors, staleness decay)
+- SLO-aware routing (slo_constraints filtering, fallback policies)
 - Stale worker cleanup
 - State persistence (JSONL)
 - Extended schema fields (future-proof)
@@ -20,6 +22,7 @@ from crank.controller.capability_registry import (
     CapabilityRegistry,
     CapabilitySchema,
 )
+from crank.controller.slo import SLOTracker
 
 # --- Fixtures ---
 
@@ -299,6 +302,170 @@ def test_route_excludes_stale_workers(registry: CapabilityRegistry) -> None:
     assert worker is None  # Stale worker not returned
 
 
+# --- Load-Aware Routing Tests ---
+
+
+def _register_pool(registry: CapabilityRegistry, count: int) -> None:
+    cap = CapabilitySchema(name="classify", verb="classify", version="1.0.0", max_concurrency=4)
+    for index in range(count):
+        registry.register(
+            worker_id=f"worker-{index}",
+            worker_url=f"https://localhost:{8500 + index}",
+            capabilities=[cap],
+        )
+
+
+def test_route_prefers_least_loaded_worker(registry: CapabilityRegistry) -> None:
+    """Test routing follows reported load, not registration order."""
+    _register_pool(registry, 3)
+    registry.heartbeat("worker-0", [4, 2, 800, 0.9, 512])
+    registry.heartbeat("worker-1", [0, 0, 20, 0.05, 256])
+    registry.heartbeat("worker-2", [2, 0, 100, 0.4, 256])
+
+    worker = registry.route(verb="classify", capability="classify")
+    assert worker is not None
+    assert worker.worker_id == "worker-1"
+
+
+def test_routed_requests_count_until_next_report(registry: CapabilityRegistry) -> None:
+    """Test requests routed between heartbeats spread load across equal workers."""
+    _register_pool(registry, 2)
+    for worker_id in ("worker-0", "worker-1"):
+        registry.heartbeat(worker_id, [0, 0, 0, 0, 100])
+
+    chosen = [registry.route(verb="classify", capability="classify") for _ in range(4)]
+    assert [w.worker_id for w in chosen if w] == ["worker-0", "worker-1"] * 2
+
+    registry.heartbeat("worker-0", [0, 0, 0, 0, 100])  # Fresh report resets the count
+    worker = registry.get_worker("worker-0")
+    assert worker is not None
+    assert worker.routed_since_report == 0
+
+
+def test_stale_load_report_decays_toward_fleet_average(registry: CapabilityRegistry) -> None:
+    """Test an old "idle" report loses its pull as it ages."""
+    registry.load_half_life = 10.0
+    _register_pool(registry, 2)
+    registry.heartbeat("worker-0", [0, 0, 0, 0, 100])  # Idle, about to go stale
+    registry.heartbeat("worker-1", [2, 0, 0, 0.2, 100])
+    idle = registry.get_worker("worker-0")
+    assert idle is not None
+
+    workers = registry.get_workers_for_capability("classify:classify")
+    fresh_scores = registry.load_scores(workers, "classify:classify")
+    idle.load_reported_at = time.monotonic() - 10.0  # One half-life old
+    aged_scores = registry.load_scores(workers, "classify:classify")
+    idle.load_reported_at = time.monotonic() - 1000.0
+    ancient_scores = registry.load_scores(workers, "classify:classify")
+
+    # worker-1: 2 of 4 slots + 0.2 CPU = 0.7; the fleet average is 0.35
+    assert fresh_scores == pytest.approx([0.0, 0.7], abs=1e-3)
+    assert aged_scores[0] == pytest.approx(0.175, abs=1e-3)  # Halfway to the average
+    assert ancient_scores[0] == pytest.approx(0.35, abs=1e-3)
+
+
+def test_heartbeat_rejects_malformed_load(registry: CapabilityRegistry) -> None:
+    """Test short or negative load vectors are rejected."""
+    _register_pool(registry, 1)
+    with pytest.raises(ValueError):
+        registry.heartbeat("worker-0", [1, 2])
+    with pytest.raises(ValueError):
+        registry.heartbeat("worker-0", [1, 0, 0, -0.5, 10])
+
+
+def test_get_all_workers_includes_load(registry: CapabilityRegistry) -> None:
+    """Test worker listings show the latest load report."""
+    _register_pool(registry, 2)
+    registry.heartbeat("worker-0", [1, 0, 12.5, 0.1, 300])
+
+    workers = {w["worker_id"]: w for w in registry.get_all_workers()}
+    assert workers["worker-0"]["load"] == {
+        "in_flight": 1.0,
+        "queue_depth": 0.0,
+        "p95_ms": 12.5,
+        "cpu": 0.1,
+        "rss_mb": 300.0,
+    }
+    assert workers["worker-1"]["load"] is None
+
+
+# --- SLO-Aware Routing Tests ---
+
+
+def _slo_registry(state_file: Path) -> CapabilityRegistry:
+    """Pool of three workers with latency history: fast, slow, flaky."""
+    registry = CapabilityRegistry(
+        state_file=state_file, heartbeat_timeout=5, slo_tracker=SLOTracker()
+    )
+    _register_pool(registry, 3)
+    assert registry.slo_tracker is not None
+    for index in range(50):
+        registry.slo_tracker.record("classify:classify", "worker-0", 300.0)
+        registry.slo_tracker.record("classify:classify", "worker-1", 40.0)
+        registry.slo_tracker.record("classify:classify", "worker-2", 30.0, success=index % 5 != 0)
+    return registry
+
+
+def test_route_honors_slo_constraints(temp_state_file: Path) -> None:
+    """Test constrained requests skip workers missing the latency or availability target."""
+    registry = _slo_registry(temp_state_file)
+
+    unconstrained = registry.route(verb="classify", capability="classify")
+    assert unconstrained is not None
+    assert unconstrained.worker_id == "worker-0"  # Registration order on equal load
+
+    latency_only = {"latency_p95_ms": 100}
+    chosen = {
+        worker.worker_id
+        for _ in range(6)
+        if (worker := registry.route("classify", "classify", slo_constraints=latency_only))
+    }
+    assert chosen == {"worker-1", "worker-2"}
+
+    both = {"latency_p95_ms": 100, "availability_pct": 99.0}
+    for _ in range(4):
+        worker = registry.route("classify", "classify", slo_constraints=both)
+        assert worker is not None
+        assert worker.worker_id == "worker-1"
+
+
+def test_slo_fallback_policies(temp_state_file: Path) -> None:
+    """Test what happens when no worker meets the constraints."""
+    registry = _slo_registry(temp_state_file)
+    impossible = {"latency_p95_ms": 10}
+
+    closest = registry.route("classify", "classify", slo_constraints=impossible)
+    assert closest is not None
+    assert closest.worker_id == "worker-2"  # best_effort: nearest to the target
+
+    rejected = registry.route(
+        "classify", "classify", slo_constraints={**impossible, "fallback": "reject"}
+    )
+    assert rejected is None
+
+    healthy = registry.healthy_workers("classify:classify")
+    assert (
+        registry.slo_filter(healthy, "classify:classify", {**impossible, "fallback": "any"})
+        == healthy
+    )
+
+    with pytest.raises(ValueError):
+        registry.route("classify", "classify", slo_constraints={"fallback": "pray"})
+
+
+def test_workers_without_samples_stay_eligible(temp_state_file: Path) -> None:
+    """Test a new worker is not starved before it has latency history."""
+    registry = _slo_registry(temp_state_file)
+    cap = CapabilitySchema(name="classify", verb="classify", version="1.0.0", max_concurrency=4)
+    registry.register(
+        worker_id="worker-new", worker_url="https://localhost:8600", capabilities=[cap]
+    )
+
+    healthy = registry.healthy_workers("classify:classify")
+    eligible = registry.slo_filter(healthy, "classify:classify", {"latency_p95_ms": 100})
+    assert [w.worker_id for w in eligible] == ["worker-1", "worker-2", "worker-new"]
+
+
 # --- Deregistration Tests ---
 
 
@@ -403,7 +570,7 @@ def test_get_all_workers(registry: CapabilityRegistry) -> None:
     assert "test:test" in workers[0]["capabilities"]
 
 
-# --- Multi-Controller Tests (Scaffolding) ---
+# --- Multi-Controller Tests (see test_replication.py) ---
 
 
 def test_export_state(registry: CapabilityRegistry) -> None:
@@ -420,11 +587,12 @@ def test_export_state(registry: CapabilityRegistry) -> None:
     assert "workers" in state
     assert len(state["workers"]) == 1
     assert state["workers"][0]["worker_id"] == "worker-1"
+    assert state["workers"][0]["version"][2] == registry.controller_id
     assert "exported_at" in state
 
 
-def test_import_remote_state_stub(registry: CapabilityRegistry) -> None:
-    """Test import_remote_state (stub for future work)."""
+def test_import_remote_state(registry: CapabilityRegistry) -> None:
+    """Test import_remote_state merges remote workers."""
     state = {
         "workers": [
             {
@@ -438,5 +606,5 @@ def test_import_remote_state_stub(registry: CapabilityRegistry) -> None:
         "exported_at": datetime.now().isoformat(),
     }
 
-    # Should not raise (stub implementation)
-    registry.import_remote_state("controller-remote", state)
+    assert registry.import_remote_state("controller-remote", state) == 1
+    assert registry.get_worker("remote-worker") is not None
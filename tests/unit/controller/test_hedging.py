@@ -0,0 +1,197 @@
+"""Unit tests for request hedging.
+
+Tests core functionality:
+- Hedge delay from the observed p95, only for idempotent capabilities
+- Token-bucket budget bounding the hedge rate
+- Hedges taking idle slots on another worker only
+- Racing primary and hedge: first success wins, the loser is cancelled
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+import pytest
+
+from crank.controller import AdmissionController, HedgeBudget, Hedger, Lease
+from crank.controller.capability_registry import CapabilityRegistry, CapabilitySchema
+from crank.controller.slo import SLOTracker
+
+KEY = "classify:classify"
+
+# --- Fixtures ---
+
+
+@pytest.fixture
+def registry() -> CapabilityRegistry:
+    """Registry with two workers serving an idempotent and a non-idempotent capability."""
+    with NamedTemporaryFile(suffix=".jsonl", delete=False) as f:
+        state_file = Path(f.name)
+    registry = CapabilityRegistry(state_file=state_file, heartbeat_timeout=5)
+    caps = [
+        CapabilitySchema(
+            name="classify", verb="classify", version="1.0.0", max_concurrency=2, idempotent=True
+        ),
+        CapabilitySchema(name="send", verb="email", version="1.0.0", max_concurrency=2),
+    ]
+    for index in range(2):
+        registry.register(f"worker-{index}", f"https://localhost:{8500 + index}", caps)
+    return registry
+
+
+@pytest.fixture
+def admission(registry: CapabilityRegistry) -> AdmissionController:
+    return AdmissionController(registry, max_queue=4)
+
+
+@pytest.fixture
+def hedger(admission: AdmissionController) -> Hedger:
+    """Hedger whose tracker puts the classify p95 at about 20 ms."""
+    tracker = SLOTracker()
+    for _ in range(30):
+        tracker.record(KEY, "worker-0", 20.0)
+    return Hedger(admission, tracker)
+
+
+async def _primary(admission: AdmissionController, worker_id: str = "worker-0") -> Lease:
+    """Admit a classify request and make sure it landed on ``worker_id``."""
+    lease = await admission.admit("classify", "classify")
+    assert lease is not None
+    assert lease.worker.worker_id == worker_id
+    return lease
+
+
+def _responder(delays: dict[str, float], calls: list[str]) -> Callable[[Lease], Awaitable[str]]:
+    """Invoke function answering with the worker ID after a per-worker delay."""
+
+    async def invoke(lease: Lease) -> str:
+        calls.append(lease.worker.worker_id)
+        await asyncio.sleep(delays[lease.worker.worker_id])
+        return lease.worker.worker_id
+
+    return invoke
+
+
+# --- Decisions ---
+
+
+async def test_delay_follows_observed_p95(hedger: Hedger, admission: AdmissionController) -> None:
+    """Test the hedge delay is the tracked p95, and needs enough samples."""
+    assert hedger.delay_ms(KEY) == pytest.approx(20, rel=0.02)
+    assert hedger.delay_ms("email:send") is None
+
+    lease = await admission.admit("classify", "classify")
+    assert lease is not None
+    assert hedger.on_request(lease) == pytest.approx(20, rel=0.02)
+
+
+async def test_non_idempotent_capability_is_never_hedged(
+    hedger: Hedger, admission: AdmissionController
+) -> None:
+    """Test capabilities without idempotent=True get no hedge delay."""
+    for _ in range(30):
+        hedger.tracker.record("email:send", "worker-0", 20.0)
+    lease = await admission.admit("email", "send")
+    assert lease is not None
+    assert hedger.on_request(lease) is None
+    assert "email:send" not in hedger.stats()
+
+
+def test_budget_bounds_hedge_rate() -> None:
+    """Test hedges stay within ratio of requests plus the initial burst."""
+    budget = HedgeBudget(ratio=0.05, burst=2)
+    hedges = 0
+    for _ in range(1_000):
+        budget.earn()
+        if budget.available():
+            budget.spend()
+            hedges += 1
+    assert hedges <= 2 + 50
+    assert hedges >= 49
+
+    with pytest.raises(ValueError):
+        HedgeBudget(ratio=1.5)
+
+
+# --- Hedge Slots ---
+
+
+async def test_hedge_uses_another_idle_worker(
+    hedger: Hedger, admission: AdmissionController
+) -> None:
+    """Test the hedge avoids the primary's worker and declines when none is idle."""
+    primary = await _primary(admission)
+    hedge = hedger.hedge(primary)
+    assert hedge is not None
+    assert hedge.worker.worker_id == "worker-1"
+    assert hedge.metadata["hedge_of"] == primary.lease_id
+
+    assert hedger.hedge(primary) is not None  # worker-1's second slot
+    assert hedger.hedge(primary) is None  # worker-1 full; worker-0 is excluded
+    assert hedger.stats()[KEY]["no_capacity"] == 1
+
+
+async def test_spent_budget_declines_hedges(admission: AdmissionController) -> None:
+    """Test a hedge is refused once the bucket is empty."""
+    hedger = Hedger(admission, SLOTracker(), burst=1)
+    primary = await _primary(admission)
+    hedge = hedger.hedge(primary)
+    assert hedge is not None
+    admission.release(hedge.lease_id)
+
+    assert hedger.hedge(primary) is None
+    assert hedger.stats()[KEY]["denied"] == 1
+
+
+# --- Racing ---
+
+
+async def test_fast_primary_is_not_hedged(hedger: Hedger, admission: AdmissionController) -> None:
+    """Test a primary answering within the delay runs alone and is released."""
+    calls: list[str] = []
+    primary = await _primary(admission)
+    invoke = _responder({"worker-0": 0.001, "worker-1": 0.001}, calls)
+
+    assert await hedger.run(primary, invoke) == "worker-0"
+    assert calls == ["worker-0"]
+    assert admission.stats()[KEY]["outstanding"] == 0
+
+
+async def test_slow_primary_loses_to_hedge(hedger: Hedger, admission: AdmissionController) -> None:
+    """Test the hedge's answer is returned and the slow primary is cancelled."""
+    calls: list[str] = []
+    primary = await _primary(admission)
+    invoke = _responder({"worker-0": 5.0, "worker-1": 0.001}, calls)
+
+    assert await asyncio.wait_for(hedger.run(primary, invoke), timeout=1) == "worker-1"
+    assert calls == ["worker-0", "worker-1"]
+    assert admission.stats()[KEY]["outstanding"] == 0
+    stats = hedger.stats()[KEY]
+    assert (stats["hedged"], stats["hedge_wins"]) == (1, 1)
+    report = hedger.tracker.report()[KEY]["workers"]
+    assert report["worker-0"]["requests"] == 30  # Cancelled loser not recorded
+    assert report["worker-1"]["requests"] == 1
+
+
+async def test_failed_primary_waits_for_hedge(
+    hedger: Hedger, admission: AdmissionController
+) -> None:
+    """Test a primary failing after the hedge was sent does not end the race."""
+
+    async def invoke(lease: Lease) -> str:
+        if lease.worker.worker_id == "worker-0":
+            await asyncio.sleep(0.05)
+            raise ConnectionError("worker-0 reset")
+        await asyncio.sleep(0.1)
+        return "hedged"
+
+    primary = await _primary(admission)
+    assert await hedger.run(primary, invoke) == "hedged"
+    assert hedger.tracker.report()[KEY]["workers"]["worker-0"]["errors"] == 1
+
+    primary = await _primary(admission)
+    hedger.min_delay_ms = 1_000  # No hedge: the primary's error is raised
+    with pytest.raises(ConnectionError):
+        await hedger.run(primary, invoke)
+    assert admission.stats()[KEY]["outstanding"] == 0
@@ -0,0 +1,194 @@
+"""Unit tests for IdempotencyCache.
+
+Tests core functionality:
+- Replaying completed results and rejecting key reuse for other requests
+- Single-flight: duplicates wait on the running original
+- Leader failure and silent leaders hand the key to a duplicate
+- TTL expiry and LRU eviction by entry count and size
+- Background sweep of expired results that are never retried
+- On-disk tier surviving a restart
+"""
+
+import asyncio
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from crank.controller.idempotency import IdempotencyCache, IdempotencyError, request_hash
+
+HASH = request_hash("convert", "document_to_pdf", {"document": "a.md"})
+
+
+async def _store(cache: IdempotencyCache, key: str, result: dict[str, object]) -> None:
+    assert await cache.acquire(key, HASH) is None
+    await cache.complete(key, HASH, result, worker_id="worker-1", capability="convert:pdf")
+
+
+# --- Replay ---
+
+
+async def test_completed_result_is_replayed() -> None:
+    """Test a retry gets the stored result instead of leading a new run."""
+    cache = IdempotencyCache()
+    await _store(cache, "key-1", {"pdf": "abc"})
+
+    cached = await cache.acquire("key-1", HASH)
+    assert cached is not None
+    assert cached.result == {"pdf": "abc"}
+    assert cached.worker_id == "worker-1"
+    assert cache.stats()["hits"] == 1
+
+
+async def test_key_reuse_for_different_request_rejected() -> None:
+    """Test the same key with different arguments is a 422, not a replay."""
+    cache = IdempotencyCache()
+    await _store(cache, "key-1", {"pdf": "abc"})
+    other = request_hash("convert", "document_to_pdf", {"document": "b.md"})
+
+    with pytest.raises(IdempotencyError) as excinfo:
+        await cache.acquire("key-1", other)
+    assert excinfo.value.status_code == 422
+
+
+def test_request_hash_ignores_key_order() -> None:
+    """Test the hash is over the canonical encoding of the arguments."""
+    assert request_hash("v", "c", {"a": 1, "b": 2}) == request_hash("v", "c", {"b": 2, "a": 1})
+    assert request_hash("v", "c", {"a": 1}) != request_hash("v", "other", {"a": 1})
+
+
+# --- Single-Flight ---
+
+
+async def test_duplicates_wait_for_leader() -> None:
+    """Test concurrent duplicates get the leader's result without running."""
+    cache = IdempotencyCache()
+    assert await cache.acquire("key-1", HASH) is None
+    duplicates = [asyncio.create_task(cache.acquire("key-1", HASH)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    assert not any(task.done() for task in duplicates)
+
+    await cache.complete("key-1", HASH, {"ok": True}, worker_id="w", capability="c")
+    results = await asyncio.gather(*duplicates)
+    assert [cached.result for cached in results if cached] == [{"ok": True}] * 3
+    assert cache.stats()["misses"] == 1
+
+
+async def test_abandoned_key_passes_to_one_duplicate() -> None:
+    """Test a failed leader lets exactly one waiting duplicate run the request."""
+    cache = IdempotencyCache()
+    assert await cache.acquire("key-1", HASH) is None
+    first = asyncio.create_task(cache.acquire("key-1", HASH))
+    second = asyncio.create_task(cache.acquire("key-1", HASH))
+    await asyncio.sleep(0.01)
+
+    cache.abandon("key-1")
+    assert await first is None  # New leader
+    await asyncio.sleep(0.01)
+    assert not second.done()
+    await cache.complete("key-1", HASH, {"ok": True}, worker_id="w", capability="c")
+    cached = await second
+    assert cached is not None
+    assert cached.result == {"ok": True}
+
+
+async def test_duplicate_times_out_while_leader_runs() -> None:
+    """Test a duplicate waiting longer than wait_timeout gets a 409."""
+    cache = IdempotencyCache(wait_timeout=0.02)
+    assert await cache.acquire("key-1", HASH) is None
+
+    with pytest.raises(IdempotencyError) as excinfo:
+        await cache.acquire("key-1", HASH)
+    assert excinfo.value.status_code == 409
+
+
+async def test_silent_leader_is_replaced() -> None:
+    """Test a leader that never reports back stops blocking the key."""
+    cache = IdempotencyCache(inflight_timeout=0.01)
+    assert await cache.acquire("key-1", HASH) is None
+    await asyncio.sleep(0.02)
+
+    assert await cache.acquire("key-1", HASH) is None
+
+
+# --- Bounds ---
+
+
+async def test_results_expire_after_ttl() -> None:
+    """Test results older than ttl are not replayed."""
+    cache = IdempotencyCache(ttl=0.01)
+    await _store(cache, "key-1", {"ok": True})
+    await asyncio.sleep(0.02)
+
+    assert await cache.acquire("key-1", HASH) is None
+    assert cache.cleanup_expired() == 0  # Already dropped on lookup
+
+
+async def test_background_sweep_evicts_without_lookups(tmp_path: Path) -> None:
+    """Test started caches drop expired results from memory and disk with no further access."""
+    cache = IdempotencyCache(ttl=0.05, disk_dir=tmp_path, cleanup_interval=0.02)
+    await _store(cache, "key-1", {"ok": True})
+    await cache.close()  # Flush the disk record
+    assert cache.stats()["entries"] == 1
+    assert len(list(tmp_path.glob("*.json"))) == 1
+    old = time.time() - 60
+    for path in tmp_path.glob("*.json"):
+        os.utime(path, (old, old))
+
+    cache.start()
+    await asyncio.sleep(0.15)
+    await cache.stop()
+
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["bytes"] == 0
+    assert list(tmp_path.glob("*.json")) == []
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (0, 1)  # Only the first store
+
+
+async def test_lru_eviction_by_entries_and_bytes() -> None:
+    """Test the least recently used results go first when bounds are exceeded."""
+    cache = IdempotencyCache(max_entries=2)
+    for key in ("a", "b"):
+        await _store(cache, key, {"key": key})
+    assert await cache.acquire("a", HASH) is not None  # "a" is now most recent
+    await _store(cache, "c", {"key": "c"})
+
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["evicted"] == 1
+    assert await cache.acquire("b", HASH) is None
+
+    small = IdempotencyCache(max_bytes=2000)
+    await _store(small, "big", {"blob": "x" * 1500})
+    await _store(small, "next", {"blob": "y" * 1500})
+    assert small.stats()["entries"] == 1
+    assert small.stats()["bytes"] <= 2000
+
+
+# --- Disk Tier ---
+
+
+async def test_disk_tier_survives_restart(tmp_path: Path) -> None:
+    """Test a new cache over the same directory replays earlier results."""
+    cache = IdempotencyCache(disk_dir=tmp_path)
+    await _store(cache, "key-1", {"pdf": "abc"})
+    await cache.close()
+
+    restarted = IdempotencyCache(disk_dir=tmp_path)
+    cached = await restarted.acquire("key-1", HASH)
+    assert cached is not None
+    assert cached.result == {"pdf": "abc"}
+    assert restarted.stats()["disk_hits"] == 1
+
+
+async def test_purge_disk_removes_expired(tmp_path: Path) -> None:
+    """Test expired records are deleted from the disk tier."""
+    cache = IdempotencyCache(disk_dir=tmp_path, ttl=60)
+    await _store(cache, "key-1", {"ok": True})
+    await cache.close()
+    old = time.time() - 120
+    for path in tmp_path.glob("*.json"):
+        os.utime(path, (old, old))
+
+    assert await cache.purge_disk() == 1
+    assert list(tmp_path.glob("*.json")) == []
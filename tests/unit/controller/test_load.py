@@ -0,0 +1,43 @@
+"""Unit tests for worker load reports.
+
+Tests core functionality:
+- Vector and comma-joined encodings
+- Validation of malformed vectors
+- Load scoring
+"""
+
+import pytest
+
+from crank.controller.load import LOAD_FIELDS, LoadReport, load_score
+
+
+def test_vector_round_trip() -> None:
+    """Reports survive both wire encodings."""
+    report = LoadReport(in_flight=3, queue_depth=1, p95_ms=41.5, cpu=0.37, rss_mb=212.4)
+    assert report.encode() == "3,1,41.5,0.37,212.4"
+    assert LoadReport.from_vector(report.encode()) == report
+    assert LoadReport.from_vector(report.to_vector()) == report
+    assert list(report.to_dict()) == list(LOAD_FIELDS)
+
+
+def test_extra_values_are_ignored() -> None:
+    """Newer workers may append fields."""
+    assert LoadReport.from_vector([1, 2, 3, 0.5, 4, 99]) == LoadReport(1, 2, 3, 0.5, 4)
+
+
+@pytest.mark.parametrize(
+    "vector",
+    [[1, 2, 3], [1, 0, 0, float("nan"), 10], [-1, 0, 0, 0, 10], "1,2,x,0,0"],
+)
+def test_malformed_vectors_rejected(vector: object) -> None:
+    """Short, non-finite, negative or unparsable vectors raise ValueError."""
+    with pytest.raises(ValueError):
+        LoadReport.from_vector(vector)  # type: ignore[arg-type]
+
+
+def test_score_components() -> None:
+    """Slot utilization, CPU and p95 latency each contribute; memory does not."""
+    assert LoadReport().score() == 0.0
+    assert load_score([5, 5, 0, 0, 0], max_concurrency=10) == 1.0
+    assert load_score([0, 0, 500, 0.25, 4096]) == 0.75
+    assert LoadReport(in_flight=2).score(max_concurrency=4) == 0.5
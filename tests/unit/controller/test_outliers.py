@@ -0,0 +1,171 @@
+"""Unit tests for OutlierDetector circuit breakers.
+
+Tests core functionality:
+- Ejection after consecutive failures, with exponential ejection times
+- Half-open probing: success closes, failure re-ejects for longer
+- Latency outliers relative to peers on the same capability
+- Never ejecting more than max_ejected_fraction of the workers
+- Registry routing skipping ejected workers
+"""
+
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+import pytest
+
+from crank.controller import CapabilityRegistry, OutlierDetector
+from crank.controller.capability_registry import CapabilitySchema
+from crank.controller.outliers import CLOSED, HALF_OPEN, OPEN
+
+KEY = "classify:classify"
+
+
+class FakeClock:
+    """Settable time source."""
+
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def detector(clock: FakeClock) -> OutlierDetector:
+    """Detector that has seen four healthy workers."""
+    detector = OutlierDetector(consecutive_failures=3, base_ejection=10, clock=clock)
+    for index in range(4):
+        detector.record(KEY, f"worker-{index}", 20.0)
+    return detector
+
+
+def _fail(detector: OutlierDetector, worker_id: str, times: int) -> None:
+    for _ in range(times):
+        detector.record(KEY, worker_id, 20.0, success=False)
+
+
+# --- Consecutive Failures ---
+
+
+def test_consecutive_failures_eject(detector: OutlierDetector) -> None:
+    """Test a failure streak opens the breaker; a success in between resets it."""
+    _fail(detector, "worker-0", 2)
+    detector.record(KEY, "worker-0", 20.0)
+    _fail(detector, "worker-0", 2)
+    assert detector.available("worker-0")
+
+    _fail(detector, "worker-0", 1)
+    assert detector.state("worker-0") == OPEN
+    assert not detector.available("worker-0")
+    assert detector.report()["worker-0"]["reason"] == "3 consecutive failures"
+
+
+def test_probe_success_closes_breaker(detector: OutlierDetector, clock: FakeClock) -> None:
+    """Test an ejected worker is probed after its ejection time and closes on success."""
+    _fail(detector, "worker-0", 3)
+    clock.now += 10
+
+    assert detector.available("worker-0")
+    assert detector.state("worker-0") == HALF_OPEN
+    detector.on_routed("worker-0")
+    assert not detector.available("worker-0")  # One probe at a time
+
+    detector.record(KEY, "worker-0", 20.0)
+    assert detector.state("worker-0") == CLOSED
+    assert detector.available("worker-0")
+
+
+def test_probe_failure_doubles_ejection(detector: OutlierDetector, clock: FakeClock) -> None:
+    """Test a failed probe re-ejects for twice as long, up to max_ejection."""
+    _fail(detector, "worker-0", 3)
+    clock.now += 10
+    assert detector.available("worker-0")
+    detector.on_routed("worker-0")
+    _fail(detector, "worker-0", 1)
+
+    assert detector.state("worker-0") == OPEN
+    assert detector.report()["worker-0"]["reopens_in"] == 20
+    clock.now += 19
+    assert not detector.available("worker-0")
+    clock.now += 1
+    assert detector.available("worker-0")
+
+
+def test_lost_probe_frees_its_slot(detector: OutlierDetector, clock: FakeClock) -> None:
+    """Test a probe that never reports back does not block probing forever."""
+    _fail(detector, "worker-0", 3)
+    clock.now += 10
+    assert detector.available("worker-0")
+    detector.on_routed("worker-0")
+    clock.now += 10
+    assert detector.available("worker-0")
+
+
+# --- Latency Outliers ---
+
+
+def test_slow_worker_is_ejected_relative_to_peers(
+    detector: OutlierDetector, clock: FakeClock
+) -> None:
+    """Test a worker several times slower than its peers' median is ejected."""
+    for _ in range(30):
+        for index in range(3):
+            detector.record(KEY, f"worker-{index}", 20.0)
+        detector.record(KEY, "worker-3", 200.0)
+
+    assert detector.state("worker-3") == OPEN
+    assert "peer median" in detector.report()["worker-3"]["reason"]
+    assert detector.state("worker-0") == CLOSED
+
+    clock.now += 10
+    assert detector.available("worker-3")
+    detector.record(KEY, "worker-3", 200.0)  # Still slow: probe fails
+    assert detector.state("worker-3") == OPEN
+
+
+def test_small_latency_gaps_are_not_outliers(detector: OutlierDetector) -> None:
+    """Test 3x of a tiny latency is not enough to eject."""
+    for _ in range(30):
+        for index in range(3):
+            detector.record(KEY, f"worker-{index}", 2.0)
+        detector.record(KEY, "worker-3", 10.0)
+    assert detector.state("worker-3") == CLOSED
+
+
+def test_ejection_fraction_is_capped(detector: OutlierDetector) -> None:
+    """Test at most half the fleet is ejected, whatever fails."""
+    for index in range(4):
+        _fail(detector, f"worker-{index}", 3)
+    states = [detector.state(f"worker-{index}") for index in range(4)]
+    assert states.count(OPEN) == 2
+
+
+# --- Routing ---
+
+
+def test_registry_skips_ejected_workers(clock: FakeClock) -> None:
+    """Test routing avoids a heartbeating worker that fails every request."""
+    with NamedTemporaryFile(suffix=".jsonl", delete=False) as f:
+        state_file = Path(f.name)
+    detector = OutlierDetector(consecutive_failures=3, base_ejection=10, clock=clock)
+    registry = CapabilityRegistry(state_file=state_file, outlier_detector=detector)
+    cap = CapabilitySchema(name="classify", verb="classify", version="1.0.0")
+    for index in range(2):
+        registry.register(f"worker-{index}", f"https://localhost:{8500 + index}", [cap])
+    registry.record_outcome(KEY, "worker-1", 20.0)
+    for _ in range(3):
+        registry.record_outcome(KEY, "worker-0", 20.0, success=False)
+
+    assert [w.worker_id for w in registry.healthy_workers(KEY)] == ["worker-1"]
+    assert {w["worker_id"]: w["breaker"] for w in registry.get_all_workers()} == {
+        "worker-0": OPEN,
+        "worker-1": CLOSED,
+    }
+
+    registry.deregister("worker-0")
+    assert "worker-0" not in detector.report()
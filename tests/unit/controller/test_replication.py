@@ -0,0 +1,258 @@
+"""Unit tests for registry replication between controllers.
+
+Tests core functionality:
+- Hybrid logical clock ordering
+- Merkle tree digests independent of arrival order
+- Versioned registry changes, delta export and change-log cursors
+- Last-writer-wins merge, tombstones and heartbeat coalescing
+- Replicator convergence with bandwidth proportional to change
+- Anti-entropy fetching only divergent leaves, and peer restarts
+"""
+
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from crank.controller.capability_registry import CapabilityRegistry, CapabilitySchema
+from crank.controller.replication import (
+    HybridLogicalClock,
+    LocalPeer,
+    MerkleTree,
+    Replicator,
+    Version,
+)
+
+CAPABILITY = CapabilitySchema(name="classify", verb="classify", version="1.0.0")
+
+
+@pytest.fixture
+def make_registry(tmp_path: Path):
+    """Factory of registries with their own state files."""
+
+    def make(controller_id: str) -> CapabilityRegistry:
+        return CapabilityRegistry(
+            state_file=tmp_path / f"{controller_id}.jsonl",
+            heartbeat_timeout=60,
+            controller_id=controller_id,
+        )
+
+    return make
+
+
+def _register(registry: CapabilityRegistry, *worker_ids: str) -> None:
+    for worker_id in worker_ids:
+        registry.register(worker_id, f"https://{worker_id}:8500", [CAPABILITY])
+
+
+def _mesh(registries: list[CapabilityRegistry]) -> list[Replicator]:
+    """Full-mesh replicators; anti-entropy only when a cursor resets."""
+    return [
+        Replicator(
+            registry,
+            [LocalPeer(peer) for peer in registries if peer is not registry],
+            anti_entropy_interval=float("inf"),
+        )
+        for registry in registries
+    ]
+
+
+async def _round(replicators: list[Replicator]) -> int:
+    return sum([await replicator.run_once() for replicator in replicators])
+
+
+def _bytes(replicators: list[Replicator]) -> int:
+    return sum(peer.bytes_received for r in replicators for peer in r.peers)  # type: ignore[attr-defined]
+
+
+# --- Clock and Tree ---
+
+
+def test_hybrid_clock_orders_changes_despite_a_stalled_wall_clock() -> None:
+    """Test timestamps keep increasing and move past timestamps observed from peers."""
+    clock = HybridLogicalClock("a", wall=lambda: 1000.0)
+    first, second = clock.now(), clock.now()
+    assert first < second
+    assert (second.wall_ms, second.counter) == (1_000_000, 1)
+
+    clock.observe(Version(2_000_000, 7, "b"))  # Peer clock ahead
+    after = clock.now()
+    assert after > Version(2_000_000, 7, "b")
+    assert after.node == "a"
+
+
+def test_merkle_root_is_independent_of_arrival_order() -> None:
+    """Test replicas with the same entries agree and one changed entry differs in one leaf."""
+    entries = {f"worker-{i}": Version(1000 + i, 0, "a") for i in range(100)}
+    forward, backward = MerkleTree(depth=6), MerkleTree(depth=6)
+    for worker_id, version in entries.items():
+        forward.update(worker_id, None, version)
+    for worker_id, version in reversed(entries.items()):
+        backward.update(worker_id, None, version)
+    assert forward.root == backward.root != 0
+
+    backward.update("worker-7", entries["worker-7"], Version(5000, 0, "b"))
+    leaves = range(1 << 6)
+    differing = [
+        leaf
+        for leaf, a, b in zip(leaves, forward.digests(6, leaves), backward.digests(6, leaves))
+        if a != b
+    ]
+    assert differing == [forward.leaf("worker-7")]
+
+
+# --- Registry ---
+
+
+def test_export_changes_follows_the_change_log(make_registry) -> None:
+    """Test deltas carry only entries changed since the cursor, paginated by limit."""
+    registry = make_registry("a")
+    first = registry.export_changes(None, 0)
+    assert first["reset"] and first["workers"] == []
+
+    _register(registry, "w1", "w2", "w3")
+    epoch, cursor = first["epoch"], first["seq"]
+    page = registry.export_changes(epoch, cursor, limit=2)
+    assert [w["worker_id"] for w in page["workers"]] == ["w1", "w2"]
+    assert page["more"]
+    rest = registry.export_changes(epoch, page["seq"])
+    assert [w["worker_id"] for w in rest["workers"]] == ["w3"]
+    assert not rest["more"]
+
+    registry.deregister("w2")
+    delta = registry.export_changes(epoch, rest["seq"])
+    assert delta["workers"] == []
+    assert [d["worker_id"] for d in delta["deleted"]] == ["w2"]
+    assert registry.export_changes("other-epoch", rest["seq"])["reset"]
+
+
+def test_import_is_last_writer_wins(make_registry) -> None:
+    """Test newer versions replace entries, older ones are ignored, deletions win by version."""
+    a, b = make_registry("a"), make_registry("b")
+    _register(a, "w1")
+    assert b.import_remote_state("a", a.export_state()) == 1
+    assert b.get_worker("w1") is not None
+
+    b.register("w1", "https://moved:8500", [CAPABILITY])  # Newer than a's copy
+    assert a.import_remote_state("b", b.export_state()) == 1
+    assert a.get_worker("w1").worker_url == "https://moved:8500"  # type: ignore[union-attr]
+    assert b.import_remote_state("a", a.export_state()) == 0  # Same version: no-op
+
+    a.deregister("w1")
+    assert b.import_remote_state("a", a.export_state()) == 1
+    assert b.get_worker("w1") is None
+    assert b.route("classify", "classify") is None
+
+    _register(b, "w1")  # Back after the deletion: newer than the tombstone
+    assert a.import_remote_state("b", b.export_state()) == 1
+    assert a.get_worker("w1") is not None
+
+
+def test_unversioned_records_are_versioned_by_heartbeat(make_registry) -> None:
+    """Test records without a version merge by heartbeat time."""
+    registry = make_registry("a")
+    record = {
+        "worker_id": "remote-worker",
+        "worker_url": "https://remote:8500",
+        "capabilities": [CAPABILITY.model_dump()],
+        "last_heartbeat": datetime.now().isoformat(),
+        "registered_at": datetime.now().isoformat(),
+    }
+    assert registry.import_remote_state("controller-remote", {"workers": [record]}) == 1
+    assert registry.replica.version("remote-worker").node == "controller-remote"  # type: ignore[union-attr]
+    assert registry.route("classify", "classify").worker_id == "remote-worker"  # type: ignore[union-attr]
+
+
+def test_heartbeats_are_replicated_at_most_every_quarter_timeout(make_registry) -> None:
+    """Test a heartbeat right after registration is not a replicated change."""
+    registry = make_registry("a")
+    _register(registry, "w1")
+    version = registry.replica.version("w1")
+    registry.heartbeat("w1")
+    assert registry.replica.version("w1") == version
+
+    registry.heartbeat_timeout = 0
+    registry.heartbeat("w1")
+    assert registry.replica.version("w1") > version  # type: ignore[operator]
+
+
+def test_versions_survive_a_restart(make_registry) -> None:
+    """Test persisted entries keep their versions, so peers see no change."""
+    registry = make_registry("a")
+    _register(registry, "w1")
+    version = registry.replica.version("w1")
+    restarted = make_registry("a")
+    assert restarted.replica.version("w1") == version
+    assert restarted.replica.tree.root == registry.replica.tree.root
+
+
+# --- Replicator ---
+
+
+@pytest.mark.asyncio
+async def test_mesh_converges_with_bandwidth_proportional_to_change(make_registry) -> None:
+    """Test five controllers converge, then reconverge on a few changes for a few bytes."""
+    registries = [make_registry(f"c{i}") for i in range(5)]
+    for index, registry in enumerate(registries):
+        _register(registry, *(f"c{index}-w{n}" for n in range(40)))
+    replicators = _mesh(registries)
+
+    await _round(replicators)
+    roots = {registry.replica.tree.root for registry in registries}
+    assert len(roots) == 1
+    assert all(len(r.get_all_workers()) == 200 for r in registries)
+    initial_bytes = _bytes(replicators)
+
+    assert await _round(replicators) == 0  # Nothing changed
+    idle_bytes = _bytes(replicators) - initial_bytes
+
+    registries[0].deregister("c0-w0")
+    registries[3].register("c3-w1", "https://moved:8500", [CAPABILITY])
+    before = _bytes(replicators)
+    assert await _round(replicators) == 8  # Two changes, four other controllers each
+    change_bytes = _bytes(replicators) - before - idle_bytes
+
+    assert len({registry.replica.tree.root for registry in registries}) == 1
+    assert all(r.get_worker("c0-w0") is None for r in registries)
+    assert {r.get_worker("c3-w1").worker_url for r in registries} == {"https://moved:8500"}  # type: ignore[union-attr]
+    assert change_bytes < initial_bytes / 50
+
+
+@pytest.mark.asyncio
+async def test_anti_entropy_fetches_only_divergent_leaves(make_registry) -> None:
+    """Test a replica that missed a change gets it by Merkle descent, not a full export."""
+    a, b = make_registry("a"), make_registry("b")
+    _register(a, *(f"w{n}" for n in range(300)))
+    peer = LocalPeer(a)
+    replicator = Replicator(b, [peer])
+    await replicator.sync(peer)
+    assert b.replica.tree.root == a.replica.tree.root
+    full_bytes = peer.bytes_received
+
+    a.register("w42", "https://moved:8500", [CAPABILITY])  # b misses the delta
+    peer.bytes_received = 0
+    assert await replicator.reconcile(peer) == 1
+    assert b.get_worker("w42").worker_url == "https://moved:8500"  # type: ignore[union-attr]
+    assert b.replica.tree.root == a.replica.tree.root
+    assert peer.bytes_received < full_bytes / 20
+
+    peer.bytes_received = 0
+    assert await replicator.reconcile(peer) == 0  # In sync: one root digest
+    assert peer.bytes_received < 40
+
+
+@pytest.mark.asyncio
+async def test_peer_restart_resets_the_cursor(make_registry) -> None:
+    """Test a restarted peer (new change-log epoch) is reconciled, then followed again."""
+    a, b = make_registry("a"), make_registry("b")
+    _register(a, "w1", "w2")
+    replicator = Replicator(b, [LocalPeer(a, name="a")])
+    await replicator.run_once()
+    assert b.get_worker("w2") is not None
+
+    restarted = make_registry("a")  # Same state file, new epoch
+    _register(restarted, "w3")
+    replicator.peers = [LocalPeer(restarted, name="a")]
+    assert await replicator.run_once() == 1
+    assert b.get_worker("w3") is not None
+    assert replicator.report()["peers"]["a"]["epoch"] == restarted.replica.epoch
@@ -0,0 +1,168 @@
+"""Unit tests for SLOTracker.
+
+Tests core functionality:
+- HDR-style bucketing precision and quantiles
+- Sliding latency window and fixed memory per series
+- Objective parsing from CapabilitySchema.slo
+- Burn rates per window and multi-window alerts
+- Per-worker series and Prometheus exposition
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from crank.controller.slo import (
+    HISTOGRAM_BUCKETS,
+    SLOObjectives,
+    SLOTracker,
+    bucket_index,
+    bucket_midpoint_us,
+    histogram_quantile,
+)
+
+KEY = "convert:document_to_pdf"
+
+
+class FakeClock:
+    """Settable time source."""
+
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def tracker(clock: FakeClock) -> SLOTracker:
+    tracker = SLOTracker(clock=clock)
+    tracker.set_objectives(KEY, {"latency_p95_ms": 100, "availability_pct": 99.0})
+    return tracker
+
+
+# --- Histogram ---
+
+
+def test_bucket_relative_error_is_bounded() -> None:
+    """Test every value maps to a bucket whose midpoint is within 1.6%."""
+    for value in [0, 1, 127, 128, 1000, 65_537, 10**6, 10**9, 2**32 - 1]:
+        index = bucket_index(value)
+        assert 0 <= index < HISTOGRAM_BUCKETS
+        assert abs(bucket_midpoint_us(index) - value) <= max(value * 0.016, 0.5)
+    assert bucket_index(10**12) == HISTOGRAM_BUCKETS - 1  # Clamped
+
+
+def test_histogram_quantiles_track_exact_values() -> None:
+    """Test quantiles from bucket counts match the sorted samples closely."""
+    rng = random.Random(7)
+    samples = sorted(rng.lognormvariate(3.5, 1.0) for _ in range(20_000))
+    counts = np.zeros(HISTOGRAM_BUCKETS, dtype=np.uint64)
+    for sample in samples:
+        counts[bucket_index(int(sample * 1000))] += 1
+
+    for quantile in (0.5, 0.95, 0.99):
+        exact = samples[int(quantile * len(samples)) - 1]
+        estimate = histogram_quantile(counts, quantile)
+        assert estimate == pytest.approx(exact, rel=0.02)
+    assert histogram_quantile(np.zeros(HISTOGRAM_BUCKETS, dtype=np.uint64), 0.5) is None
+
+
+# --- Windows ---
+
+
+def test_latency_window_slides(tracker: SLOTracker, clock: FakeClock) -> None:
+    """Test old samples leave the percentiles once their slice ages out."""
+    for _ in range(100):
+        tracker.record(KEY, "worker-1", 500.0)
+    clock.now += 120
+    for _ in range(100):
+        tracker.record(KEY, "worker-1", 10.0)
+    assert tracker.latency(KEY)["p99"] == pytest.approx(500, rel=0.02)
+
+    clock.now += 240  # First batch is now older than the 300 s window
+    assert tracker.latency(KEY)["p99"] == pytest.approx(10, rel=0.02)
+    clock.now += 300
+    assert tracker.latency(KEY) == {"p50": None, "p95": None, "p99": None}
+
+
+def test_memory_is_fixed_regardless_of_traffic(tracker: SLOTracker, clock: FakeClock) -> None:
+    """Test series arrays are allocated once and reused as the ring wraps."""
+    tracker.record(KEY, "worker-1", 5.0)
+    series = tracker._series[KEY]["worker-1"]
+    sizes = (series.latency.rows.nbytes, series.events.rows.nbytes)
+    for step in range(2_000):
+        clock.now += 30
+        tracker.record(KEY, "worker-1", float(step % 400))
+    assert (series.latency.rows.nbytes, series.events.rows.nbytes) == sizes
+    assert sum(sizes) < 64 * 1024
+
+
+# --- Objectives ---
+
+
+def test_objectives_parse_and_validate() -> None:
+    """Test SLO dicts parse into budgets; bad targets are rejected."""
+    objectives = SLOObjectives.from_schema({"latency_p99_ms": 250, "availability_pct": 99.9})
+    budgets = {name: budget for name, _, budget, _ in objectives.budgets()}
+    assert budgets == pytest.approx({"availability": 0.001, "latency_p99_ms": 0.01})
+    assert SLOObjectives.from_schema(None) == SLOObjectives()
+
+    with pytest.raises(ValueError):
+        SLOObjectives.from_schema({"availability_pct": 100})
+    with pytest.raises(ValueError):
+        SLOObjectives.from_schema({"latency_p95_ms": -5})
+
+
+def test_burn_rate_against_declared_slo(tracker: SLOTracker) -> None:
+    """Test burn rate is the bad fraction over the error budget."""
+    for index in range(100):
+        tracker.record(KEY, "worker-1", 50.0 if index % 10 else 150.0, success=index % 50 != 0)
+
+    objectives = tracker.burn_rates(KEY)
+    assert objectives["availability"]["burn_rate"]["5m"] == pytest.approx(2.0)  # 2% / 1%
+    assert objectives["latency_p95_ms"]["burn_rate"]["1h"] == pytest.approx(2.0)  # 10% / 5%
+    assert objectives["availability"]["alert"] is None
+
+
+def test_fast_burn_pages(tracker: SLOTracker, clock: FakeClock) -> None:
+    """Test sustained failures page; a burst already past the 5m window does not."""
+    for _ in range(50):
+        tracker.record(KEY, "worker-1", 20.0, success=False)
+    assert tracker.burn_rates(KEY)["availability"]["alert"] == "page"
+
+    clock.now += 600
+    for _ in range(1_000):
+        tracker.record(KEY, "worker-1", 20.0)
+    state = tracker.burn_rates(KEY)["availability"]
+    assert state["burn_rate"]["5m"] == 0.0
+    assert state["alert"] != "page"
+
+
+# --- Reporting ---
+
+
+def test_report_and_prometheus(tracker: SLOTracker) -> None:
+    """Test per-worker breakdowns and the exposition format."""
+    tracker.record(KEY, "worker-1", 40.0)
+    tracker.record(KEY, "worker-2", 80.0, success=False)
+
+    report = tracker.report()[KEY]
+    assert report["requests"] == 2
+    assert report["errors"] == 1
+    assert set(report["workers"]) == {"worker-1", "worker-2"}
+
+    text = tracker.prometheus()
+    assert "# TYPE crank_slo_latency_ms summary" in text
+    assert f'crank_slo_errors_total{{capability="{KEY}",worker="worker-2"}} 1' in text
+    assert f'crank_slo_burn_rate{{capability="{KEY}",objective="availability",window="1h"}}' in text
+
+    tracker.forget_worker("worker-2")
+    assert set(tracker.report()[KEY]["workers"]) == {"worker-1"}
+    assert tracker.report()[KEY]["requests"] == 2
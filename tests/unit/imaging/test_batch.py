@@ -0,0 +1,294 @@
+"""Unit tests for batch image intake.
+
+Tests core functionality:
+- Reading batches from multipart uploads and tar streams
+- Image count and size limits
+- Thread-pool decoding with per-image error isolation
+- Chunked classification records (shape, decode and model failures)
+- NDJSON streaming responses
+"""
+
+import io
+import json
+import tarfile
+from typing import Any
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from crank.imaging import (
+    NDJSON_MEDIA_TYPE,
+    BatchImage,
+    BatchInputError,
+    DecodedImage,
+    decode_batch,
+    ndjson_response,
+    read_image_batch,
+    stream_batch_results,
+)
+
+
+def _decode(data: bytes) -> int:
+    if data.startswith(b"bad"):
+        raise ValueError("cannot decode")
+    return len(data)
+
+
+def _make_client() -> TestClient:
+    app = FastAPI()
+
+    @app.post("/batch")
+    async def batch(request: Request) -> Response:
+        try:
+            images = await read_image_batch(request, max_images=3, max_image_bytes=64)
+        except BatchInputError as e:
+            return JSONResponse({"detail": str(e)}, status_code=e.status_code)
+        decoded = await decode_batch(images, _decode)
+        return ndjson_response(
+            {
+                "index": image.index,
+                "name": image.name,
+                "success": not isinstance(item, Exception),
+                "size": None if isinstance(item, Exception) else item,
+            }
+            for image, item in zip(images, decoded)
+        )
+
+    return TestClient(app)
+
+
+def _classify(images: list[DecodedImage]) -> list[list[dict[str, Any]]]:
+    """Stand-in model: brightness of each image; black frames crash the chunk."""
+    results = []
+    for image in images:
+        brightness = float(image.use("rgb").mean())
+        if brightness == 0:
+            raise RuntimeError("model crashed")
+        results.append([{"prediction": "bright" if brightness > 127 else "dark"}])
+    return results
+
+
+def _make_classify_client(batch_size: int = 2) -> TestClient:
+    """Endpoint wired like the GPU classifier's /classify/batch."""
+    app = FastAPI()
+
+    @app.post("/classify/batch")
+    async def classify_batch(request: Request) -> Response:
+        try:
+            images = await read_image_batch(request, max_images=8)
+        except BatchInputError as e:
+            return JSONResponse({"detail": str(e)}, status_code=e.status_code)
+        decoded = await decode_batch(images, lambda data: DecodedImage(data).prepare(("rgb",)))
+        return ndjson_response(
+            stream_batch_results(
+                images,
+                decoded,
+                _classify,
+                batch_size,
+                describe=lambda item: {"image_decode": item.stats()},
+                id_prefix="test-image",
+            )
+        )
+
+    return TestClient(app)
+
+
+def _png(value: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.fromarray(np.full((8, 8, 3), value, dtype=np.uint8)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _tar(members: dict[str, bytes], mode: str = "w") -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode=mode) as archive:  # type: ignore[call-overload]
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def _lines(body: str) -> list[dict[str, object]]:
+    return [json.loads(line) for line in body.splitlines()]
+
+
+# --- Intake ---
+
+
+def test_multipart_batch_preserves_order() -> None:
+    """Every file part becomes one image, in upload order."""
+    client = _make_client()
+    files = [
+        ("files", ("a.jpg", b"aaaa", "image/jpeg")),
+        ("files", ("b.jpg", b"bb", "image/jpeg")),
+    ]
+
+    response = client.post("/batch", files=files)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == NDJSON_MEDIA_TYPE
+    records = _lines(response.text)
+    assert [r["name"] for r in records] == ["a.jpg", "b.jpg"]
+    assert [r["size"] for r in records] == [4, 2]
+
+
+def test_gzipped_tar_stream_batch() -> None:
+    """Regular tar members are read in archive order; gzip is transparent."""
+    client = _make_client()
+    body = _tar({"imgs/one.png": b"1111", "imgs/two.png": b"22"}, mode="w:gz")
+
+    response = client.post("/batch", content=body, headers={"content-type": "application/x-tar"})
+
+    assert response.status_code == 200
+    assert [(r["index"], r["name"]) for r in _lines(response.text)] == [
+        (0, "one.png"),
+        (1, "two.png"),
+    ]
+
+
+# --- Limits and errors ---
+
+
+def test_too_many_images_rejected() -> None:
+    """Tar batches larger than max_images fail with 413."""
+    client = _make_client()
+    body = _tar({f"{i}.jpg": b"x" for i in range(4)})
+
+    response = client.post("/batch", content=body, headers={"content-type": "application/x-tar"})
+
+    assert response.status_code == 413
+
+
+def test_oversized_image_rejected() -> None:
+    """A single image above max_image_bytes fails the request with 413."""
+    client = _make_client()
+    body = _tar({"huge.jpg": b"x" * 65})
+
+    response = client.post("/batch", content=body, headers={"content-type": "application/x-tar"})
+
+    assert response.status_code == 413
+
+
+def test_unsupported_content_type_and_empty_batch() -> None:
+    """Non-batch content types get 415; a batch with no files gets 400."""
+    client = _make_client()
+
+    assert client.post("/batch", json={"x": 1}).status_code == 415
+    empty = client.post("/batch", content=_tar({}), headers={"content-type": "application/x-tar"})
+    assert empty.status_code == 400
+
+
+def test_decode_failures_are_isolated() -> None:
+    """A bad image yields an error record without failing its neighbours."""
+    client = _make_client()
+    files = [
+        ("files", ("ok.jpg", b"good", "image/jpeg")),
+        ("files", ("bad.jpg", b"bad-bytes", "image/jpeg")),
+    ]
+
+    records = _lines(client.post("/batch", files=files).text)
+
+    assert [r["success"] for r in records] == [True, False]
+
+
+# --- Classification stream ---
+
+
+def test_classify_stream_record_shape() -> None:
+    """One record per image, in order across chunks, with results and decode stats."""
+    client = _make_classify_client(batch_size=2)
+    images = {"a.png": _png(250), "b.png": _png(10), "c.png": _png(200)}
+    files = [("files", (name, data, "image/png")) for name, data in images.items()]
+
+    response = client.post("/classify/batch", files=files)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == NDJSON_MEDIA_TYPE
+    records = _lines(response.text)
+    assert [(r["index"], r["name"]) for r in records] == [(0, "a.png"), (1, "b.png"), (2, "c.png")]
+    for record, data in zip(records, images.values()):
+        assert set(record) == {
+            "index",
+            "name",
+            "image_id",
+            "image_size",
+            "success",
+            "results",
+            "image_decode",
+        }
+        assert record["success"] is True
+        assert record["image_size"] == len(data)
+        assert str(record["image_id"]).startswith("test-image-")
+        assert set(record["image_decode"]) == {"decode_ms", "saved_ms", "reuse_counts"}
+        assert record["image_decode"]["reuse_counts"] == {"rgb": 1}  # Prepared in the pool
+    assert [r["results"][0]["prediction"] for r in records] == ["bright", "dark", "bright"]
+    assert len({r["image_id"] for r in records}) == 3
+
+
+def test_classify_stream_failures_stay_per_image_or_chunk() -> None:
+    """A corrupt image fails alone; a model error fails only its own chunk."""
+    client = _make_classify_client(batch_size=2)
+    files = [
+        ("files", ("ok.png", _png(250), "image/png")),
+        ("files", ("corrupt.png", b"not an image", "image/png")),
+        ("files", ("black.png", _png(0), "image/png")),
+        ("files", ("neighbour.png", _png(250), "image/png")),
+        ("files", ("next-chunk.png", _png(10), "image/png")),
+    ]
+
+    records = _lines(client.post("/classify/batch", files=files).text)
+
+    assert [r["success"] for r in records] == [True, False, False, False, True]
+    corrupt, black, neighbour = records[1:4]
+    assert str(corrupt["error"]).startswith("Image decode failed: ")
+    assert black["error"] == neighbour["error"] == "model crashed"
+    for record in (corrupt, black, neighbour):
+        assert set(record) == {"index", "name", "image_id", "image_size", "success", "error"}
+    assert records[4]["results"] == [{"prediction": "dark"}]
+
+
+def test_classify_batch_rejections() -> None:
+    """Intake errors surface as their HTTP status before anything is classified."""
+    client = _make_classify_client()
+
+    too_many = [("files", (f"{i}.png", _png(i), "image/png")) for i in range(9)]
+    assert client.post("/classify/batch", files=too_many).status_code == 400  # Multipart cap
+    tar_body = _tar({f"{i}.png": _png(i) for i in range(9)})
+    tar = client.post(
+        "/classify/batch", content=tar_body, headers={"content-type": "application/x-tar"}
+    )
+    assert tar.status_code == 413
+    assert client.post("/classify/batch", json={"images": []}).status_code == 415
+    broken = client.post(
+        "/classify/batch", content=b"not a tar", headers={"content-type": "application/x-tar"}
+    )
+    assert broken.status_code == 400
+    assert "Invalid tar stream" in broken.json()["detail"]
+
+
+async def test_decode_batch_returns_exceptions_in_place() -> None:
+    """decode_batch keeps results aligned with inputs."""
+    images = [BatchImage(0, "a", b"abc"), BatchImage(1, "b", b"bad"), BatchImage(2, "c", b"")]
+
+    results = await decode_batch(images, _decode)
+
+    assert results[0] == 3
+    assert isinstance(results[1], ValueError)
+    assert results[2] == 0
+
+
+async def test_ndjson_response_accepts_async_iterables() -> None:
+    """Async generators stream one compact JSON document per line."""
+
+    async def records():  # type: ignore[no-untyped-def]
+        yield {"index": 0}
+        yield {"index": 1}
+
+    response = ndjson_response(records())
+    chunks = [chunk async for chunk in response.body_iterator]
+
+    assert chunks == [b'{"index":0}\n', b'{"index":1}\n']
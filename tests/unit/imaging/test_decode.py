@@ -0,0 +1,130 @@
+"""Unit tests for the per-request image decode context.
+
+Tests core functionality:
+- One decode per request, however many stages read the image
+- The BGR form is a view of the RGB array, not a copy
+- Decode stats: decode_ms and the saved_ms credited to reuse
+"""
+
+import io
+from typing import Any
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from crank.imaging import DecodedImage
+from crank.imaging import decode as decode_module
+
+# --- Fixtures ---
+
+
+@pytest.fixture
+def png_bytes() -> bytes:
+    """A 64x48 RGB PNG with distinct channel values."""
+    pixels = np.zeros((48, 64, 3), dtype=np.uint8)
+    pixels[..., 0], pixels[..., 1], pixels[..., 2] = 200, 100, 30
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def image_opens(monkeypatch: pytest.MonkeyPatch) -> list[Any]:
+    """Record every Image.open call made while decoding."""
+    calls: list[Any] = []
+    image_open = Image.open
+
+    def counting_open(*args: Any, **kwargs: Any) -> Image.Image:
+        calls.append(args)
+        return image_open(*args, **kwargs)
+
+    monkeypatch.setattr(decode_module.Image, "open", counting_open)
+    return calls
+
+
+def _thumbnail(image: Image.Image) -> np.ndarray:
+    return np.asarray(image.resize((8, 8)), dtype=np.float32)
+
+
+# --- Decoding once ---
+
+
+def test_request_stages_share_one_decode(png_bytes: bytes, image_opens: list[Any]) -> None:
+    """The GPU classifier's /classify stages read a single decode of the upload."""
+    decoded = DecodedImage(png_bytes, preprocess=_thumbnail)
+
+    decoded.use("bgr")  # YOLO detection
+    decoded.use("model_input")  # CLIP analysis
+    decoded.use("bgr")  # Scene fusion: colour ratios...
+    decoded.use("rgb")  # ...and edges
+    decoded.use("pil")  # Sentence-transformer embedding
+
+    assert len(image_opens) == 1
+    assert decoded.stats()["reuse_counts"] == {"bgr": 1, "rgb": 1, "pil": 1}
+
+
+def test_prepared_batch_images_are_not_decoded_again(
+    png_bytes: bytes, image_opens: list[Any]
+) -> None:
+    """Forms derived up front (in the thread pool) are only reused by the stages."""
+    images = [
+        DecodedImage(png_bytes, preprocess=_thumbnail).prepare(("pil", "rgb", "bgr", "model_input"))
+        for _ in range(3)
+    ]
+    assert len(image_opens) == 3
+
+    for image in images:
+        image.use("model_input")
+        image.use("bgr")
+        image.use("rgb")
+
+    assert len(image_opens) == 3
+    assert all(
+        image.stats()["reuse_counts"] == {"model_input": 1, "bgr": 1, "rgb": 1} for image in images
+    )
+
+
+def test_model_input_needs_preprocess(png_bytes: bytes) -> None:
+    """Without a preprocess function there is no model input to derive."""
+    with pytest.raises(ValueError, match="preprocess"):
+        DecodedImage(png_bytes).use("model_input")
+
+
+# --- Zero-copy BGR ---
+
+
+def test_bgr_is_a_view_of_rgb(png_bytes: bytes) -> None:
+    """BGR reverses the channel axis of the RGB array without copying it."""
+    decoded = DecodedImage(png_bytes)
+
+    assert np.shares_memory(decoded.bgr, decoded.rgb)
+    assert decoded.bgr.strides[2] == -decoded.rgb.strides[2]
+    assert decoded.bgr[0, 0].tolist() == [30, 100, 200]
+    assert decoded.rgb[0, 0].tolist() == [200, 100, 30]
+
+
+# --- Stats ---
+
+
+def test_stats_account_for_reuse(png_bytes: bytes) -> None:
+    """decode_ms sums each derivation; saved_ms credits each reuse with its whole chain."""
+    decoded = DecodedImage(png_bytes, preprocess=_thumbnail)
+    decoded.prepare(("bgr", "model_input"))  # Eager derivation is not reuse
+    assert decoded.stats()["reuse_counts"] == {}
+    assert decoded.stats()["saved_ms"] == 0.0
+
+    decoded.use("bgr")
+    decoded.use("bgr")
+    decoded.use("pil")
+    decoded.use("model_input")
+
+    cost = decoded._cost_ms
+    assert set(cost) == {"pil", "rgb", "model_input"}  # The BGR view costs nothing
+    stats = decoded.stats()
+    assert stats["reuse_counts"] == {"bgr": 2, "pil": 1, "model_input": 1}
+    assert stats["decode_ms"] == round(sum(cost.values()), 3)
+    expected_saved = (
+        2 * (cost["rgb"] + cost["pil"]) + cost["pil"] + (cost["model_input"] + cost["pil"])
+    )
+    assert stats["saved_ms"] == pytest.approx(round(expected_saved, 3), abs=1e-3)
@@ -0,0 +1,90 @@
+"""Unit tests for vectorized image feature extraction.
+
+Tests core functionality:
+- Mean colour, brightness and contrast
+- Dominant colour clustering
+- Edge density and contour counting
+- Downsampling of large images and input shape handling
+"""
+
+import numpy as np
+import pytest
+
+from crank.imaging import extract_features
+
+# --- Colour statistics ---
+
+
+def test_uniform_image_statistics() -> None:
+    """A flat image has its own colour as mean and a single dominant cluster."""
+    image = np.full((40, 60, 3), (200, 100, 50), dtype=np.uint8)
+
+    features = extract_features(image)
+
+    assert features.mean_rgb == pytest.approx((200, 100, 50))
+    assert features.contrast == pytest.approx(0.0)
+    assert features.edge_density == 0.0
+    assert len(features.dominant_colors) == 1
+    assert features.dominant_colors[0].fraction == pytest.approx(1.0)
+    assert features.total_pixels == 2400
+
+
+def test_dominant_colors_ranked_by_coverage() -> None:
+    """Two-colour image: clusters match the colours and their shares."""
+    image = np.zeros((100, 100, 3), dtype=np.uint8)
+    image[:, :75] = (250, 10, 10)
+    image[:, 75:] = (10, 10, 250)
+
+    colors = extract_features(image, dominant_colors=3).dominant_colors
+
+    assert colors[0].fraction == pytest.approx(0.75)
+    assert colors[1].fraction == pytest.approx(0.25)
+    assert colors[0].rgb[0] > 240 and colors[0].rgb[2] < 20
+    assert colors[1].hex.startswith("#0")
+
+
+# --- Edges ---
+
+
+def test_edges_and_contours_detected() -> None:
+    """A bright square on black yields edges and one external contour."""
+    image = np.zeros((100, 100, 3), dtype=np.uint8)
+    image[30:70, 30:70] = 255
+
+    features = extract_features(image)
+
+    assert 0.0 < features.edge_density < 0.1
+    assert features.contour_count == 1
+    assert features.brightness == pytest.approx(255 * 0.16, rel=0.01)
+
+
+# --- Downsampling and input shapes ---
+
+
+def test_large_images_are_downsampled() -> None:
+    """Analysis runs on a bounded image but reports original dimensions."""
+    image = np.full((3000, 4000, 3), 128, dtype=np.uint8)
+
+    features = extract_features(image, max_side=1000)
+
+    assert features.scale == pytest.approx(0.25)
+    assert (features.width, features.height) == (4000, 3000)
+    assert features.mean_rgb == pytest.approx((128, 128, 128))
+
+
+def test_grayscale_and_rgba_inputs() -> None:
+    """Grayscale is expanded to RGB and alpha is ignored."""
+    gray = np.full((10, 10), 90, dtype=np.uint8)
+    rgba = np.zeros((10, 10, 4), dtype=np.uint8)
+    rgba[..., 0] = 255
+
+    assert extract_features(gray).mean_rgb == pytest.approx((90, 90, 90))
+    assert extract_features(rgba).mean_rgb == pytest.approx((255, 0, 0))
+
+
+def test_invalid_shapes_rejected() -> None:
+    """Non-image arrays raise ValueError."""
+    with pytest.raises(ValueError):
+        extract_features(np.zeros((4, 4, 2), dtype=np.uint8))
+    with pytest.raises(ValueError):
+        extract_features(np.zeros((0, 4, 3), dtype=np.uint8))
@@ -0,0 +1,135 @@
+"""Unit tests for the metrics registry.
+
+Tests core functionality:
+- Prometheus text exposition of counters, gauges and histograms
+- Get-or-create families and conflicting re-registration
+- Label validation and escaping
+- Certificate event helpers recording into the process-wide registry
+"""
+
+import pytest
+
+from crank.observability.metrics import MetricsRegistry, get_registry
+from crank.security.events import (
+    CertificateEvent,
+    emit_certificate_event,
+    record_ca_unavailable,
+    record_cert_expiration,
+    record_cert_issuance,
+)
+
+
+@pytest.fixture
+def registry() -> MetricsRegistry:
+    return MetricsRegistry()
+
+
+def _sample(text: str, series: str) -> float:
+    """Value of one series line in an exposition."""
+    for line in text.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{series} not in exposition")
+
+
+# --- Exposition ---
+
+
+def test_counter_and_gauge_exposition(registry: MetricsRegistry) -> None:
+    """Test HELP/TYPE headers and one line per labelled series."""
+    requests = registry.counter("jobs_total", "Jobs run", ("queue",))
+    requests.labels("fast").inc()
+    requests.labels("fast").inc(2)
+    requests.labels("slow").inc()
+    depth = registry.gauge("queue_depth", "Jobs waiting")
+    depth.set(7)
+
+    assert registry.render().splitlines() == [
+        "# HELP jobs_total Jobs run",
+        "# TYPE jobs_total counter",
+        'jobs_total{queue="fast"} 3',
+        'jobs_total{queue="slow"} 1',
+        "# HELP queue_depth Jobs waiting",
+        "# TYPE queue_depth gauge",
+        "queue_depth 7",
+    ]
+    with pytest.raises(ValueError):
+        requests.labels("fast").inc(-1)
+
+
+def test_histogram_buckets_are_cumulative(registry: MetricsRegistry) -> None:
+    """Test bucket counts include smaller buckets and +Inf equals the count."""
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value)
+
+    text = registry.render()
+    assert _sample(text, 'latency_seconds_bucket{le="0.1"}') == 2
+    assert _sample(text, 'latency_seconds_bucket{le="1.0"}') == 3
+    assert _sample(text, 'latency_seconds_bucket{le="+Inf"}') == 4
+    assert _sample(text, "latency_seconds_sum") == pytest.approx(3.65)
+    assert _sample(text, "latency_seconds_count") == 4
+
+    with pytest.raises(ValueError):
+        registry.histogram("unsorted_seconds", "Bad buckets", buckets=(1.0, 0.1))
+
+
+def test_gauge_function_is_read_at_scrape(registry: MetricsRegistry) -> None:
+    """Test a function gauge reports its current value, and a failing one is skipped."""
+    value = [1]
+    registry.gauge("live", "Live value").labels().set_function(lambda: value[0])
+    registry.gauge("broken", "Raises").labels().set_function(lambda: 1 / 0)
+    value[0] = 5
+
+    text = registry.render()
+    assert _sample(text, "live") == 5
+    assert "\nbroken " not in text
+
+
+# --- Families ---
+
+
+def test_families_are_get_or_create(registry: MetricsRegistry) -> None:
+    """Test re-declaring a metric shares it; a conflicting declaration is refused."""
+    first = registry.counter("shared_total", "Shared", ("route",))
+    assert registry.counter("shared_total", "Shared", ("route",)) is first
+
+    with pytest.raises(ValueError):
+        registry.gauge("shared_total", "Shared", ("route",))
+    with pytest.raises(ValueError):
+        registry.counter("shared_total", "Shared", ("method",))
+
+
+def test_labels_are_validated_and_escaped(registry: MetricsRegistry) -> None:
+    """Test label arity is checked and quotes, backslashes and newlines are escaped."""
+    counter = registry.counter("paths_total", "Paths", ("path",))
+    with pytest.raises(ValueError):
+        counter.labels("a", "b")
+
+    counter.labels('say "hi"\\\n').inc()
+    assert 'paths_total{path="say \\"hi\\"\\\\\\n"} 1' in registry.render()
+
+
+# --- Certificate Events ---
+
+
+def test_cert_helpers_record_into_process_registry() -> None:
+    """Test the certificate helpers and events update the /metrics registry."""
+    before = get_registry().render()
+    issued = 'crank_cert_issuance_total{worker_id="metrics-test",status="success"}'
+    events = 'crank_cert_events_total{event="cert_renewed"}'
+    baseline = {
+        series: _sample(before, series) if f"\n{series} " in before else 0.0
+        for series in (issued, events)
+    }
+
+    record_cert_issuance("metrics-test", success=True)
+    record_cert_expiration("metrics-test", days_until_expiry=2)
+    record_ca_unavailable("metrics-test")
+    emit_certificate_event(CertificateEvent.CERT_RENEWED, worker_id="metrics-test")
+
+    text = get_registry().render()
+    assert _sample(text, issued) == baseline[issued] + 1
+    assert _sample(text, events) == baseline[events] + 1
+    assert _sample(text, 'crank_cert_expiration_seconds{worker_id="metrics-test"}') == 172800
+    assert _sample(text, 'crank_ca_unavailable_total{worker_id="metrics-test"}') >= 1
@@ -0,0 +1,103 @@
+"""Unit tests for the on-demand profilers.
+
+Tests core functionality:
+- Stack sampling of busy threads, with idle threads left out
+- Collapsed-stack and speedscope rendering
+- Heap growth by allocation stack from tracemalloc snapshots
+"""
+
+import threading
+import time
+import tracemalloc
+
+from crank.observability.profiling import (
+    AllocationTracer,
+    StackSampler,
+    render_collapsed,
+    render_speedscope,
+)
+
+
+def _spin(stop: threading.Event) -> None:
+    """CPU-bound stand-in for a hot handler."""
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def _allocate(store: list[bytes]) -> None:
+    """Allocation stand-in: keeps 2 MB alive."""
+    store.extend(bytes(1024) for _ in range(2048))
+
+
+# --- CPU ---
+
+
+def test_sampler_attributes_samples_to_the_busy_thread() -> None:
+    """Test a spinning thread dominates its profile and an idle one is skipped."""
+    stop = threading.Event()
+    busy = threading.Thread(target=_spin, args=(stop,), name="busy")
+    idle = threading.Thread(target=stop.wait, name="idle")
+    busy.start()
+    idle.start()
+    sampler = StackSampler(interval=0.002)
+    sampler.start()
+    try:
+        time.sleep(0.2)
+    finally:
+        sampler.stop()
+        stop.set()
+        busy.join()
+        idle.join()
+
+    stacks = sampler.stacks()
+    assert "idle" not in stacks
+    assert sampler.samples > 10
+    hot = max(stacks["busy"], key=lambda item: item[1])
+    assert any(function == "_spin" for function, _, _ in hot[0])
+
+    lines = sampler.collapsed().splitlines()
+    assert any(line.startswith("busy;") and "_spin (test_profiling.py:" in line for line in lines)
+
+
+def test_renderers_share_frames_and_keep_weights() -> None:
+    """Test collapsed lines are heaviest first and speedscope frames are deduplicated."""
+    main = ("main", "/app/service.py", 1)
+    handler = ("handler", "/app/service.py", 10)
+    parse = ("parse", "/app/codec.py", 3)
+    stacks = [((main, handler), 2), ((main, handler, parse), 5), ((main,), 0)]
+
+    assert render_collapsed(stacks).splitlines() == [
+        "main (service.py:1);handler (service.py:10);parse (codec.py:3) 5",
+        "main (service.py:1);handler (service.py:10) 2",
+    ]
+
+    speedscope = render_speedscope({"MainThread": stacks}, "seconds", "cpu", weight_scale=0.01)
+    assert [frame["name"] for frame in speedscope["shared"]["frames"]] == [
+        "main",
+        "handler",
+        "parse",
+    ]
+    (profile,) = speedscope["profiles"]
+    assert profile["samples"] == [[0, 1], [0, 1, 2]]
+    assert profile["weights"] == [0.02, 0.05]
+    assert profile["endValue"] == 0.07
+
+
+# --- Memory ---
+
+
+def test_allocation_tracer_reports_heap_growth_by_stack() -> None:
+    """Test allocations kept alive over the window show up with their stack."""
+    assert not tracemalloc.is_tracing()
+    store: list[bytes] = []
+    tracer = AllocationTracer()
+    tracer.start()
+    _allocate(store)
+    tracer.stop()
+
+    assert not tracemalloc.is_tracing()  # Stopped: this tracer started it
+    assert tracer.allocated >= 2048 * 1024
+    stack, size = max(tracer.growth, key=lambda item: item[1])
+    assert size >= 2048 * 1024
+    assert any("store.extend" in source for source, _, _ in stack)
+    assert tracer.speedscope()["profiles"][0]["unit"] == "bytes"
@@ -0,0 +1,308 @@
+"""Unit tests for distributed tracing.
+
+Tests core functionality:
+- W3C traceparent parsing, propagation and span parenting
+- Tail sampling: errors, slow roots and upstream-sampled traces are kept
+- Bounded, batched OTLP/JSON export to a file
+- Server spans from the ASGI middleware and client spans from httpx hooks
+"""
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Any
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from crank.observability import (
+    BatchSpanExporter,
+    FileSpanSink,
+    Span,
+    SpanContext,
+    TailSampler,
+    Tracer,
+    TracingMiddleware,
+    configure_tracing,
+    current_span,
+    get_tracer,
+    parse_traceparent,
+    set_tracer,
+    tracing_event_hooks,
+)
+from crank.observability.tracing import SPAN_KIND_SERVER, STATUS_ERROR
+from crank.security.events import CertificateEvent, CertificateEventContext
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+TRACEPARENT = f"00-{TRACE_ID}-00f067aa0ba902b7-01"
+
+
+class MemorySink:
+    """Sink keeping encoded batches in memory."""
+
+    def __init__(self) -> None:
+        self.payloads: list[dict[str, Any]] = []
+
+    async def write(self, payload: dict[str, Any]) -> None:
+        self.payloads.append(payload)
+
+    async def close(self) -> None:
+        return None
+
+    def spans(self) -> list[dict[str, Any]]:
+        return [
+            span
+            for payload in self.payloads
+            for resource in payload["resourceSpans"]
+            for scope in resource["scopeSpans"]
+            for span in scope["spans"]
+        ]
+
+
+@pytest.fixture
+def sink() -> MemorySink:
+    return MemorySink()
+
+
+@pytest.fixture
+def tracer(sink: MemorySink) -> Tracer:
+    """Recording tracer keeping only errors, slow and upstream-sampled traces."""
+    exporter = BatchSpanExporter(sink, "test-service")
+    return Tracer("test-service", exporter, TailSampler(slow_ms=50, baseline_ratio=0.0))
+
+
+# --- Propagation ---
+
+
+def test_parse_traceparent() -> None:
+    """Test valid headers round-trip and malformed ones are ignored."""
+    context = parse_traceparent(TRACEPARENT)
+    assert context is not None
+    assert (context.trace_id, context.span_id, context.sampled) == (
+        TRACE_ID,
+        "00f067aa0ba902b7",
+        True,
+    )
+    assert context.traceparent() == TRACEPARENT
+
+    for bad in (
+        None,
+        "",
+        "00-xyz-00f067aa0ba902b7-01",
+        f"00-{'0' * 32}-00f067aa0ba902b7-01",  # All-zero trace ID
+        f"ff-{TRACE_ID}-00f067aa0ba902b7-01",  # Forbidden version
+        f"00-{TRACE_ID}-00f067aa0ba902b7-01-extra",
+    ):
+        assert parse_traceparent(bad) is None
+
+
+def test_spans_nest_and_continue_remote_traces(tracer: Tracer) -> None:
+    """Test child spans share the trace, and a remote parent's trace is continued."""
+    with tracer.span("outer") as outer:
+        assert current_span() is outer
+        with tracer.span("inner") as inner:
+            assert inner.context.trace_id == outer.context.trace_id
+            assert inner.parent_span_id == outer.context.span_id
+            assert not inner.local_root
+    assert outer.local_root and outer.parent_span_id is None
+    assert current_span() is None
+
+    remote = parse_traceparent(TRACEPARENT)
+    with tracer.span("handler", parent=remote) as span:
+        assert span.context.trace_id == TRACE_ID
+        assert span.parent_span_id == "00f067aa0ba902b7"
+        assert span.local_root
+
+
+# --- Tail Sampling ---
+
+
+async def test_unremarkable_traces_are_dropped(tracer: Tracer, sink: MemorySink) -> None:
+    """Test a fast, successful, unsampled trace is not exported."""
+    with tracer.span("request"), tracer.span("child"):
+        pass
+    await tracer.close()
+    assert sink.spans() == []
+    assert tracer.sampler.counts["dropped"] == 1
+
+
+async def test_error_in_child_keeps_whole_trace(tracer: Tracer, sink: MemorySink) -> None:
+    """Test one failed span keeps every span of its trace."""
+    with tracer.span("request"):
+        with tracer.span("ok"):
+            pass
+        with pytest.raises(RuntimeError), tracer.span("fails"):
+            raise RuntimeError("boom")
+    await tracer.close()
+
+    spans = {span["name"]: span for span in sink.spans()}
+    assert set(spans) == {"request", "ok", "fails"}
+    assert spans["fails"]["status"] == {"code": STATUS_ERROR, "message": "RuntimeError: boom"}
+    assert len({span["traceId"] for span in spans.values()}) == 1
+
+
+async def test_slow_and_upstream_sampled_traces_are_kept(tracer: Tracer, sink: MemorySink) -> None:
+    """Test slow local roots and traces sampled upstream are exported."""
+    with tracer.span("slow"):
+        await asyncio.sleep(0.06)
+    with tracer.span("sampled upstream", parent=parse_traceparent(TRACEPARENT)):
+        pass
+    await tracer.close()
+    assert [span["name"] for span in sink.spans()] == ["slow", "sampled upstream"]
+
+
+def test_baseline_sampling_is_deterministic_per_trace() -> None:
+    """Test the baseline ratio picks the same traces on every hop."""
+    trace_ids = [f"{(index * 0x9E3779B97F4A7C15) % (1 << 128):032x}" for index in range(1, 4001)]
+    picks = [TailSampler(baseline_ratio=0.25).baseline(trace_id) for trace_id in trace_ids]
+    assert picks == [TailSampler(baseline_ratio=0.25).baseline(trace_id) for trace_id in trace_ids]
+    assert 0.2 < sum(picks) / len(picks) < 0.3
+
+
+def test_sampler_buffers_are_bounded() -> None:
+    """Test undecided traces beyond max_traces are evicted, oldest first."""
+    sampler = TailSampler(max_traces=2, baseline_ratio=0.0)
+    for index in range(1, 5):
+        # Child spans whose local root never ends in this process
+        span = Span(
+            name="orphan",
+            context=SpanContext(f"{index:032x}", f"{index:016x}"),
+            parent_span_id="00f067aa0ba902b7",
+            kind=SPAN_KIND_SERVER,
+            start_ns=0,
+            local_root=False,
+            end_ns=0,
+        )
+        assert sampler.on_end(span) == []
+    assert sampler.counts["evicted"] == 2
+
+
+# --- Export ---
+
+
+async def test_file_export_writes_otlp_json(tmp_path: Path) -> None:
+    """Test kept spans are written as OTLP/JSON lines with the service resource."""
+    path = tmp_path / "traces.jsonl"
+    exporter = BatchSpanExporter(FileSpanSink(path), "crank-controller")
+    tracer = Tracer("crank-controller", exporter, TailSampler(baseline_ratio=1.0))
+
+    with tracer.span("route", attributes={"attempt": 2, "hedged": True, "ratio": 0.5}):
+        pass
+    await tracer.close()
+
+    payload = json.loads(path.read_text().splitlines()[0])
+    resource = payload["resourceSpans"][0]
+    assert resource["resource"]["attributes"] == [
+        {"key": "service.name", "value": {"stringValue": "crank-controller"}}
+    ]
+    span = resource["scopeSpans"][0]["spans"][0]
+    assert span["name"] == "route"
+    assert span["attributes"] == [
+        {"key": "attempt", "value": {"intValue": "2"}},
+        {"key": "hedged", "value": {"boolValue": True}},
+        {"key": "ratio", "value": {"doubleValue": 0.5}},
+    ]
+    assert int(span["endTimeUnixNano"]) >= int(span["startTimeUnixNano"])
+
+
+async def test_exporter_batches_in_background_and_drops_overflow(sink: MemorySink) -> None:
+    """Test full batches are exported without waiting, and overflow is counted."""
+    exporter = BatchSpanExporter(sink, "test-service", max_queue=4, batch_size=2)
+    tracer = Tracer("test-service", exporter, TailSampler(baseline_ratio=1.0))
+
+    for _ in range(2):
+        with tracer.span("request"):
+            pass
+    await asyncio.sleep(0.01)
+    assert len(sink.spans()) == 2  # A full batch, well before flush_interval
+
+    exporter.submit([tracer.start_span("queued") for _ in range(6)])
+    assert exporter.counts["dropped"] == 2
+    await exporter.close()
+    assert exporter.counts["exported"] == 6
+
+
+def test_configure_tracing_from_environment(tmp_path: Path) -> None:
+    """Test export is off by default and enabled by CRANK_TRACE_EXPORT."""
+    previous = get_tracer()
+    try:
+        assert not configure_tracing("worker", environ={}).recording
+        tracer = configure_tracing(
+            "worker",
+            environ={
+                "CRANK_TRACE_EXPORT": f"file:{tmp_path / 'traces.jsonl'}",
+                "CRANK_TRACE_SLOW_MS": "250",
+                "CRANK_TRACE_SAMPLE_RATIO": "0.5",
+            },
+        )
+        assert tracer.recording and get_tracer() is tracer
+        assert (tracer.sampler.slow_ms, tracer.sampler.baseline_ratio) == (250, 0.5)
+        with pytest.raises(ValueError):
+            configure_tracing("worker", environ={"CRANK_TRACE_EXPORT": "udp://collector"})
+    finally:
+        set_tracer(previous)
+
+
+# --- HTTP ---
+
+
+async def test_trace_crosses_server_and_client_hops(tracer: Tracer, sink: MemorySink) -> None:
+    """Test a traced request's outgoing call carries its trace to the next hop."""
+    seen: list[str] = []
+
+    def downstream(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers["traceparent"])
+        return httpx.Response(503)
+
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+
+    async def handler() -> dict[str, str]:
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(downstream), event_hooks=tracing_event_hooks(tracer)
+        ) as client:
+            await client.get("https://worker-1:8500/classify")
+        return {"status": "ok"}
+
+    async def health() -> dict[str, str]:
+        return {"status": "healthy"}
+
+    app.get("/route")(handler)
+    app.get("/health")(health)
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://controller"
+    ) as client:
+        response = await client.get("/route", headers={"traceparent": TRACEPARENT})
+        assert response.status_code == 200
+        await client.get("/health")
+    await tracer.close()
+
+    downstream_context = parse_traceparent(seen[0])
+    assert downstream_context is not None and downstream_context.trace_id == TRACE_ID
+    spans = {span["name"]: span for span in sink.spans()}
+    assert set(spans) == {"GET /route", "GET /classify"}  # Health probes are not traced
+    server, client_span = spans["GET /route"], spans["GET /classify"]
+    assert server["kind"] == SPAN_KIND_SERVER
+    assert server["parentSpanId"] == "00f067aa0ba902b7"
+    assert client_span["parentSpanId"] == server["spanId"]
+    assert client_span["spanId"] == downstream_context.span_id
+    assert client_span["status"]["code"] == STATUS_ERROR  # 503 from the next hop
+
+
+def test_cert_events_carry_trace_ids(tracer: Tracer) -> None:
+    """Test certificate events inside a span are linked to it."""
+    assert "trace_id" not in CertificateEventContext(CertificateEvent.CERT_ISSUED, "w").to_dict()
+    with tracer.span("renew") as span:
+        event = CertificateEventContext(CertificateEvent.CERT_RENEWED, "worker-1").to_dict()
+    assert (event["trace_id"], event["span_id"]) == (span.context.trace_id, span.context.span_id)
+
+
+def test_spans_are_cheap_without_an_exporter() -> None:
+    """Test a non-recording tracer still propagates context but buffers nothing."""
+    tracer = Tracer("test-service")
+    with tracer.span("request") as span:
+        assert isinstance(span, Span)
+    assert not tracer.recording
+    assert tracer.sampler.counts == {"kept": 0, "dropped": 0, "evicted": 0}
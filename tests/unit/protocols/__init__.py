@@ -0,0 +1 @@
+"""Unit tests for protocols package."""
@@ -0,0 +1,165 @@
+"""Unit tests for the payload codecs.
+
+Tests core functionality:
+- Round trips for every available codec; canonical JSON
+- encode_map/encode_envelope equal to encoding the whole map
+- Receipt digests identical to the legacy json.dumps(sort_keys=True) hash
+- Accept/Content-Type negotiation and error status codes
+"""
+
+import hashlib
+import json
+from typing import Any
+
+import pytest
+
+from crank.protocols import (
+    CANONICAL_CODEC,
+    CODECS,
+    Codec,
+    CodecError,
+    EncodedPayload,
+    canonical_digest,
+    codec_for_content_type,
+    encode_envelope,
+    negotiate,
+)
+from crank.protocols.codecs import CBOR_AVAILABLE, JSON_CODEC, MSGPACK_AVAILABLE, iter_canonical
+
+PAYLOAD: dict[str, Any] = {
+    "zeta": 1,
+    "alpha": [1, 2.5, {"nested": None, "flag": True}],
+    "unicode": "héllo ✓",
+    "é": {"b": "x", "a": "y"},
+}
+
+ALL_CODECS = sorted(set(CODECS.values()), key=lambda codec: codec.name)
+
+
+@pytest.fixture(params=ALL_CODECS, ids=lambda codec: codec.name)
+def codec(request: pytest.FixtureRequest) -> Codec:
+    """Every codec available in this environment."""
+    result: Codec = request.param
+    return result
+
+
+# --- Encoding ---
+
+
+def test_round_trip(codec: Codec) -> None:
+    """Test values decode to what was encoded."""
+    assert codec.decode(codec.encode(PAYLOAD)) == PAYLOAD
+
+
+def test_canonical_encoding_ignores_key_order() -> None:
+    """Test key insertion order does not change the hashed bytes."""
+    reordered = {key: PAYLOAD[key] for key in reversed(PAYLOAD)}
+    reordered["é"] = {"a": "y", "b": "x"}
+    assert CANONICAL_CODEC.encode(reordered) == CANONICAL_CODEC.encode(PAYLOAD)
+
+
+@pytest.mark.parametrize("size", [3, 30, 300])
+def test_encode_map_matches_full_encoding(codec: Codec, size: int) -> None:
+    """Test splicing pre-encoded values equals encoding the whole map."""
+    value = {**PAYLOAD, **{f"key{i}": i for i in range(size)}}
+    entries = {key: codec.encode(item) for key, item in value.items()}
+    assert codec.encode_map(entries) == codec.encode(value)
+
+
+def test_encode_envelope_reuses_payload_encoding(codec: Codec) -> None:
+    """Test the envelope embeds the payload's memoized bytes."""
+    payload = EncodedPayload(PAYLOAD)
+    body = encode_envelope(codec, {"success": True, "receipt_id": "r-1"}, {"result": payload})
+
+    assert codec.decode(body) == {"success": True, "receipt_id": "r-1", "result": PAYLOAD}
+    assert payload.encoded(codec) is payload.encoded(codec)
+
+
+def test_malformed_payload_raises_codec_error(codec: Codec) -> None:
+    """Test undecodable bodies raise CodecError with a 400 status."""
+    with pytest.raises(CodecError) as info:
+        codec.decode(b"\xc1\xff{")
+    assert info.value.status_code == 400
+
+
+class PathLike:
+    def __str__(self) -> str:
+        return "/tmp/x"
+
+
+def test_non_native_values_fall_back_to_str() -> None:
+    """Test objects without a native encoding are encoded as strings."""
+    assert JSON_CODEC.decode(JSON_CODEC.encode({"path": PathLike()})) == {"path": "/tmp/x"}
+
+
+# --- Digests ---
+
+
+def test_digest_matches_legacy_receipt_hash() -> None:
+    """Test the canonical digest is the hash receipts have always used."""
+    legacy = hashlib.sha256(json.dumps(PAYLOAD, sort_keys=True).encode()).hexdigest()
+    assert canonical_digest(PAYLOAD) == legacy
+
+
+def test_digest_does_not_depend_on_wire_codec(codec: Codec) -> None:
+    """Test encoding for another codec first leaves the digest unchanged."""
+    payload = EncodedPayload(PAYLOAD)
+    payload.encoded(codec)
+    assert payload.digest == canonical_digest(PAYLOAD)
+
+
+@pytest.mark.parametrize("depth", [0, 1, 2, 5])
+@pytest.mark.parametrize("value", [PAYLOAD, [], {}, [[1, [2, ()]], {"k": []}], "plain"])
+def test_iter_canonical_pieces_join_to_canonical_encoding(value: Any, depth: int) -> None:
+    """Test the incremental encoding is byte-identical at any split depth."""
+    assert b"".join(iter_canonical(value, depth)) == CANONICAL_CODEC.encode(value)
+
+
+def test_stream_digest_matches_digest() -> None:
+    """Test incremental hashing agrees with hashing the full encoding."""
+    records = {"records": [{"id": i, "text": "x" * 100} for i in range(2000)]}
+    streamed = EncodedPayload(records)
+    assert streamed.stream_digest() == canonical_digest(records)
+    assert not streamed._encodings  # Never materialized
+
+
+# --- Negotiation ---
+
+
+def test_content_type_selects_codec() -> None:
+    """Test parameters are ignored and a missing header means JSON."""
+    assert codec_for_content_type("application/json; charset=utf-8") is JSON_CODEC
+    assert codec_for_content_type(None) is JSON_CODEC
+
+
+def test_unsupported_content_type_is_415() -> None:
+    """Test unknown content types are rejected with 415."""
+    with pytest.raises(CodecError) as info:
+        codec_for_content_type("text/xml")
+    assert info.value.status_code == 415
+
+
+def test_accept_wildcards_and_missing_use_default() -> None:
+    """Test */* and an absent Accept header pick the default codec."""
+    assert negotiate(None) is JSON_CODEC
+    assert negotiate("text/html;q=0.9, */*;q=0.1") is JSON_CODEC
+
+
+def test_accept_prefers_highest_quality() -> None:
+    """Test q-values rank media ranges and q=0 excludes one."""
+    assert negotiate("application/msgpack;q=0, application/json;q=0.5") is JSON_CODEC
+
+
+@pytest.mark.skipif(not (MSGPACK_AVAILABLE and CBOR_AVAILABLE), reason="codecs extra missing")
+def test_accept_selects_binary_codecs() -> None:
+    """Test binary codecs are chosen by q-value, then header order."""
+    assert negotiate("application/cbor;q=0.5, application/msgpack").name == "msgpack"
+    assert negotiate("application/cbor, application/msgpack").name == "cbor"
+    assert negotiate("application/x-msgpack").name == "msgpack"
+
+
+def test_unacceptable_accept_is_406() -> None:
+    """Test an Accept header matching no codec is rejected with 406."""
+    with pytest.raises(CodecError) as info:
+        negotiate("text/html")
+    assert info.value.status_code == 406
@@ -0,0 +1,143 @@
+"""Unit tests for the DataLoader request batcher.
+
+Tests core functionality:
+- Loads in one event-loop tick coalesce into one batch
+- Deduplication of identical keys
+- max_batch_size splitting
+- Per-key exceptions and whole-batch failures
+"""
+
+import asyncio
+from collections.abc import Sequence
+
+import pytest
+
+from crank.protocols import DataLoader
+
+
+class RecordingBatch:
+    """Batch function that doubles keys and records each call."""
+
+    def __init__(self) -> None:
+        self.calls: list[list[int]] = []
+
+    async def __call__(self, keys: list[int]) -> Sequence[int | BaseException]:
+        self.calls.append(keys)
+        return [ValueError(f"bad key {key}") if key < 0 else key * 2 for key in keys]
+
+
+# --- Batching ---
+
+
+async def test_loads_in_one_tick_share_a_batch() -> None:
+    """Test concurrent loads reach the batch function once, in order."""
+    batch = RecordingBatch()
+    loader: DataLoader[int, int] = DataLoader(batch)
+
+    assert await asyncio.gather(loader.load(1), loader.load(2), loader.load(3)) == [2, 4, 6]
+    assert batch.calls == [[1, 2, 3]]
+    assert loader.batch_sizes == [3]
+
+
+async def test_sibling_coroutines_are_coalesced() -> None:
+    """Test loads from separately scheduled coroutines still batch together."""
+    batch = RecordingBatch()
+    loader: DataLoader[int, int] = DataLoader(batch)
+
+    async def resolve(key: int) -> int:
+        return await loader.load(key)
+
+    assert await asyncio.gather(*(resolve(key) for key in range(10))) == [
+        key * 2 for key in range(10)
+    ]
+    assert len(batch.calls) == 1
+
+
+async def test_later_ticks_get_new_batches() -> None:
+    """Test a load after the first batch dispatched starts another batch."""
+    batch = RecordingBatch()
+    loader: DataLoader[int, int] = DataLoader(batch)
+
+    await loader.load(1)
+    await loader.load(2)
+
+    assert batch.calls == [[1], [2]]
+
+
+async def test_duplicate_keys_are_loaded_once() -> None:
+    """Test identical keys share a future (and cache_key normalizes keys)."""
+    calls: list[list[dict[str, int]]] = []
+
+    async def load(keys: list[dict[str, int]]) -> list[int]:
+        calls.append(keys)
+        return [key["a"] for key in keys]
+
+    loader: DataLoader[dict[str, int], int] = DataLoader(
+        load, cache_key=lambda key: tuple(sorted(key.items()))
+    )
+
+    assert await loader.load_many([{"a": 1}, {"a": 1}, {"a": 2}]) == [1, 1, 2]
+    assert calls == [[{"a": 1}, {"a": 2}]]
+
+
+async def test_cache_disabled_keeps_duplicates() -> None:
+    """Test cache=False sends every key to the batch function."""
+    batch = RecordingBatch()
+    loader: DataLoader[int, int] = DataLoader(batch, cache=False)
+
+    await loader.load_many([1, 1])
+
+    assert batch.calls == [[1, 1]]
+
+
+async def test_max_batch_size_splits_batches() -> None:
+    """Test large batches are split at max_batch_size."""
+    batch = RecordingBatch()
+    loader: DataLoader[int, int] = DataLoader(batch, max_batch_size=4)
+
+    assert await loader.load_many(range(10)) == [key * 2 for key in range(10)]
+    assert loader.batch_sizes == [4, 4, 2]
+
+
+def test_max_batch_size_must_be_positive() -> None:
+    """Test a zero batch size is rejected."""
+    with pytest.raises(ValueError, match="max_batch_size"):
+        DataLoader(RecordingBatch(), max_batch_size=0)
+
+
+# --- Errors ---
+
+
+async def test_exception_values_fail_only_their_key() -> None:
+    """Test an exception instance in the results fails just that load."""
+    loader: DataLoader[int, int] = DataLoader(RecordingBatch())
+
+    results = await asyncio.gather(loader.load(1), loader.load(-1), return_exceptions=True)
+
+    assert results[0] == 2
+    assert isinstance(results[1], ValueError)
+
+
+async def test_batch_failure_fails_every_key() -> None:
+    """Test an exception from the batch function fails the whole batch."""
+
+    async def load(keys: list[int]) -> list[int]:
+        raise RuntimeError("backend down")
+
+    loader: DataLoader[int, int] = DataLoader(load)
+
+    results = await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+async def test_wrong_result_count_is_an_error() -> None:
+    """Test a batch function returning the wrong number of values fails the batch."""
+
+    async def load(keys: list[int]) -> list[int]:
+        return [1]
+
+    loader: DataLoader[int, int] = DataLoader(load)
+
+    with pytest.raises(ValueError, match="returned 1 values for 2 keys"):
+        await asyncio.gather(loader.load(1), loader.load(2))
@@ -0,0 +1,311 @@
+"""Unit tests for the GraphQL mesh gateway.
+
+Tests core functionality:
+- Schema generation from the capability catalog
+- Aliased fields on one capability coalesced into one batch call
+- Document cache and Automatic Persisted Queries
+- Invocation failures, handler errors and malformed requests
+"""
+
+import pytest
+
+pytest.importorskip("graphql")
+
+from crank.capabilities import CAPABILITY_CATALOG, DOCUMENT_CONVERSION
+from crank.protocols.graphql_gateway import (
+    PERSISTED_QUERY_HASH_MISMATCH,
+    PERSISTED_QUERY_NOT_FOUND,
+    MeshGraphQL,
+    build_mesh_schema,
+    concurrent_batch_handler,
+    query_hash,
+)
+from crank.protocols.invocation import Invocation, InvocationResult
+
+CONVERT_FIELDS = "success receiptId errors output { converted_data target_format }"
+
+
+class RecordingBatchHandler:
+    """Batch handler that echoes params and records each batch."""
+
+    def __init__(self) -> None:
+        self.batches: list[list[Invocation]] = []
+
+    async def __call__(self, invocations: list[Invocation]) -> list[InvocationResult]:
+        self.batches.append(invocations)
+        results = []
+        for invocation in invocations:
+            if invocation.params.get("target_format") == "crash":
+                raise RuntimeError("worker exploded")
+            results.append(
+                InvocationResult(
+                    success=invocation.params.get("target_format") != "txt",
+                    result={
+                        "converted_data": invocation.params["document_data"],
+                        "target_format": invocation.params["target_format"],
+                    },
+                    receipt_id=f"receipt-{invocation.params['document_data']}",
+                    errors=["txt disabled"] if invocation.params["target_format"] == "txt" else [],
+                )
+            )
+        return results
+
+
+def convert_field(alias: str, document_data: str, target_format: str = "pdf") -> str:
+    return (
+        f'{alias}: documentConvert(input: {{document_data: "{document_data}", '
+        f'source_format: "docx", target_format: "{target_format}"}}) {{ {CONVERT_FIELDS} }}'
+    )
+
+
+# --- Schema ---
+
+
+def test_schema_has_a_field_per_capability() -> None:
+    """Test every catalog entry becomes a Query and Mutation field."""
+    schema = build_mesh_schema()
+    assert schema.query_type is not None
+    assert schema.mutation_type is not None
+
+    assert "documentConvert" in schema.query_type.fields
+    assert "vectorSimilaritySearch" in schema.query_type.fields
+    assert "capabilities" in schema.query_type.fields
+    assert len(schema.mutation_type.fields) == len(CAPABILITY_CATALOG)
+
+
+def test_schema_types_follow_json_schema() -> None:
+    """Test required inputs are non-null and nested outputs become object types."""
+    sdl = MeshGraphQL(RecordingBatchHandler()).sdl()
+
+    assert "document_data: String!" in sdl
+    assert "max_results: Int\n" in sdl
+    assert "classifications: [ImageClassifyOutputClassificationsItem]" in sdl
+    assert "context: JSON" in sdl  # Open object (additionalProperties)
+
+
+# --- Execution and batching ---
+
+
+async def test_aliased_fields_are_one_batch() -> None:
+    """Test N aliases of one capability reach the handler as one batch of N."""
+    handler = RecordingBatchHandler()
+    gateway = MeshGraphQL(handler)
+    fields = " ".join(convert_field(f"doc{i}", f"d{i}") for i in range(5))
+
+    response = await gateway.execute({"query": f"{{ {fields} }}"})
+
+    assert "errors" not in response
+    assert response["data"]["doc3"]["output"] == {"converted_data": "d3", "target_format": "pdf"}
+    assert len(handler.batches) == 1
+    assert [inv.params["document_data"] for inv in handler.batches[0]] == [
+        f"d{i}" for i in range(5)
+    ]
+
+
+async def test_identical_calls_are_deduplicated() -> None:
+    """Test identical inputs in one request invoke the capability once."""
+    handler = RecordingBatchHandler()
+    gateway = MeshGraphQL(handler)
+    query = f"{{ {convert_field('a', 'same')} {convert_field('b', 'same')} }}"
+
+    response = await gateway.execute({"query": query})
+
+    assert response["data"]["a"] == response["data"]["b"]
+    assert len(handler.batches[0]) == 1
+
+
+async def test_identical_mutations_each_run() -> None:
+    """Test identical mutation fields are separate side effects, not deduplicated."""
+    handler = RecordingBatchHandler()
+    gateway = MeshGraphQL(handler)
+    query = f"mutation {{ {convert_field('a', 'same')} {convert_field('b', 'same')} }}"
+
+    response = await gateway.execute({"query": query})
+
+    assert "errors" not in response
+    assert response["data"]["a"]["success"] is response["data"]["b"]["success"] is True
+    assert [len(batch) for batch in handler.batches] == [1, 1]  # Serial, one call each
+
+
+async def test_batches_respect_max_batch_size() -> None:
+    """Test batches are split at max_batch_size."""
+    handler = RecordingBatchHandler()
+    gateway = MeshGraphQL(handler, max_batch_size=2)
+    fields = " ".join(convert_field(f"doc{i}", f"d{i}") for i in range(5))
+
+    await gateway.execute({"query": f"{{ {fields} }}"})
+
+    assert [len(batch) for batch in handler.batches] == [2, 2, 1]
+
+
+async def test_variables_and_metadata_reach_invocations() -> None:
+    """Test variables are coerced to params and transport metadata is attached."""
+    handler = RecordingBatchHandler()
+    gateway = MeshGraphQL(handler)
+    query = "query($in: DocumentConvertInput!) { documentConvert(input: $in) { success } }"
+    params = {"document_data": "ZG9j", "source_format": "txt", "target_format": "pdf"}
+
+    response = await gateway.execute(
+        {"query": query, "variables": {"in": params}}, {"authorization": "Bearer t"}
+    )
+
+    assert response["data"]["documentConvert"]["success"] is True
+    invocation = handler.batches[0][0]
+    assert invocation.capability is DOCUMENT_CONVERSION
+    assert invocation.params == params
+    assert invocation.metadata == {"authorization": "Bearer t"}
+
+
+async def test_capabilities_query_filters_by_tag() -> None:
+    """Test the capabilities field lists the catalog."""
+    gateway = MeshGraphQL(RecordingBatchHandler())
+
+    response = await gateway.execute({"query": '{ capabilities(tag: "document") { id version } }'})
+
+    assert response["data"]["capabilities"] == [{"id": "document.convert", "version": "1.0.0"}]
+
+
+async def test_concurrent_batch_handler_adapts_per_item_handlers() -> None:
+    """Test a single-invocation handler can back the gateway."""
+    seen: list[str] = []
+
+    async def handler(invocation: Invocation) -> InvocationResult:
+        seen.append(invocation.params["document_data"])
+        return InvocationResult(
+            success=True, result={"converted_data": "x", "target_format": "pdf"}
+        )
+
+    gateway = MeshGraphQL(concurrent_batch_handler(handler))
+    query = f"{{ {convert_field('a', '1')} {convert_field('b', '2')} }}"
+
+    response = await gateway.execute({"query": query})
+
+    assert response["data"]["b"]["success"] is True
+    assert seen == ["1", "2"]
+
+
+# --- Errors ---
+
+
+async def test_failed_invocation_is_data_not_error() -> None:
+    """Test success=False results are returned in data alongside siblings."""
+    gateway = MeshGraphQL(RecordingBatchHandler())
+    query = f"{{ {convert_field('ok', '1')} {convert_field('bad', '2', 'txt')} }}"
+
+    response = await gateway.execute({"query": query})
+
+    assert "errors" not in response
+    assert response["data"]["ok"]["success"] is True
+    assert response["data"]["bad"] == {
+        "success": False,
+        "receiptId": "receipt-2",
+        "errors": ["txt disabled"],
+        "output": {"converted_data": "2", "target_format": "txt"},
+    }
+
+
+async def test_handler_exception_becomes_field_error() -> None:
+    """Test a raising handler yields GraphQL errors with the field path."""
+    gateway = MeshGraphQL(RecordingBatchHandler())
+
+    response = await gateway.execute({"query": f"{{ {convert_field('a', '1', 'crash')} }}"})
+
+    assert response["data"] is None
+    assert response["errors"][0]["message"] == "worker exploded"
+    assert response["errors"][0]["path"] == ["a"]
+
+
+async def test_validation_errors_are_reported() -> None:
+    """Test invalid documents are rejected before any invocation."""
+    handler = RecordingBatchHandler()
+    gateway = MeshGraphQL(handler)
+
+    missing_input = await gateway.execute({"query": "{ documentConvert { success } }"})
+    syntax = await gateway.execute({"query": "{ documentConvert("})
+
+    assert "input" in missing_input["errors"][0]["message"]
+    assert "Syntax Error" in syntax["errors"][0]["message"]
+    assert handler.batches == []
+
+
+async def test_malformed_requests_are_rejected() -> None:
+    """Test missing queries and non-object variables return BAD_REQUEST."""
+    gateway = MeshGraphQL(RecordingBatchHandler())
+
+    no_query = await gateway.execute({})
+    bad_variables = await gateway.execute({"query": "{ capabilities { id } }", "variables": [1]})
+
+    assert no_query["errors"][0]["extensions"]["code"] == "BAD_REQUEST"
+    assert bad_variables["errors"][0]["extensions"]["code"] == "BAD_REQUEST"
+
+
+# --- Document cache / persisted queries ---
+
+
+async def test_documents_are_parsed_once() -> None:
+    """Test repeated queries hit the compiled document cache."""
+    gateway = MeshGraphQL(RecordingBatchHandler())
+    request = {"query": "{ capabilities { id } }"}
+
+    for _ in range(3):
+        await gateway.execute(request)
+
+    assert (gateway.documents.misses, gateway.documents.hits) == (1, 2)
+
+
+async def test_persisted_query_by_hash() -> None:
+    """Test a hash-only request runs the query registered earlier."""
+    gateway = MeshGraphQL(RecordingBatchHandler())
+    query = "{ capabilities { id } }"
+    extensions = {"persistedQuery": {"version": 1, "sha256Hash": query_hash(query)}}
+
+    unknown = await gateway.execute({"extensions": extensions})
+    registered = await gateway.execute({"query": query, "extensions": extensions})
+    by_hash = await gateway.execute({"extensions": extensions})
+
+    assert unknown["errors"][0]["extensions"]["code"] == PERSISTED_QUERY_NOT_FOUND
+    assert by_hash == registered
+    assert len(by_hash["data"]["capabilities"]) == len(CAPABILITY_CATALOG)
+
+
+async def test_persisted_query_hash_must_match() -> None:
+    """Test a query registered under the wrong hash is refused."""
+    gateway = MeshGraphQL(RecordingBatchHandler())
+    extensions = {"persistedQuery": {"version": 1, "sha256Hash": "0" * 64}}
+
+    response = await gateway.execute({"query": "{ capabilities { id } }", "extensions": extensions})
+
+    assert response["errors"][0]["extensions"]["code"] == PERSISTED_QUERY_HASH_MISMATCH
+
+
+@pytest.mark.parametrize(
+    "extensions",
+    [
+        [1],
+        "persistedQuery",
+        {"persistedQuery": "abc"},
+        {"persistedQuery": [1]},
+        {"persistedQuery": {"version": 1, "sha256Hash": 42}},
+    ],
+)
+async def test_malformed_extensions_are_rejected(extensions: object) -> None:
+    """Test non-object extensions or persistedQuery return BAD_REQUEST instead of raising."""
+    handler = RecordingBatchHandler()
+    gateway = MeshGraphQL(handler)
+
+    response = await gateway.execute({"query": "{ capabilities { id } }", "extensions": extensions})
+
+    assert response["errors"][0]["extensions"]["code"] == "BAD_REQUEST"
+    assert "data" not in response
+
+
+async def test_document_cache_is_bounded() -> None:
+    """Test the least recently used document is evicted."""
+    gateway = MeshGraphQL(RecordingBatchHandler(), max_documents=2)
+    queries = ["{ capabilities { id } }", "{ capabilities { name } }", "{ capabilities { tags } }"]
+
+    for query in queries:
+        await gateway.execute({"query": query})
+
+    assert len(gateway.documents) == 2
+    assert gateway.documents.lookup(query_hash(queries[0])) is None
@@ -0,0 +1,159 @@
+"""Unit tests for the gRPC mesh gateway.
+
+Tests core functionality:
+- Unary Invoke over a real HTTP/2 channel
+- Error mapping to gRPC status codes
+- InvokeStream concurrency, per-request errors and backpressure
+- ListCapabilities and metadata pass-through
+"""
+
+import asyncio
+from collections.abc import AsyncIterator
+
+import pytest
+
+grpc = pytest.importorskip("grpc")
+
+from crank.protocols.grpc_gateway import MeshGatewayClient, start_grpc_gateway  # noqa: E402
+from crank.protocols.invocation import Invocation, InvocationResult  # noqa: E402
+
+CONVERT = {"document_data": "ZG9j", "source_format": "txt", "target_format": "pdf"}
+
+
+class RecordingHandler:
+    """Handler that echoes params and tracks concurrency."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self.invocations: list[Invocation] = []
+
+    async def __call__(self, invocation: Invocation) -> InvocationResult:
+        self.invocations.append(invocation)
+        if invocation.params.get("target_format") == "bad":
+            raise ValueError("unsupported target format")
+        if invocation.params.get("target_format") == "crash":
+            raise RuntimeError("worker exploded")
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.running -= 1
+        return InvocationResult(
+            success=True,
+            result={"converted_data": "cGRm", "target_format": invocation.params["target_format"]},
+            receipt_id=f"receipt-{len(self.invocations)}",
+            processing_time_ms=1,
+        )
+
+
+@pytest.fixture
+async def gateway() -> AsyncIterator[tuple[MeshGatewayClient, RecordingHandler]]:
+    """Running gateway plus a client on one channel."""
+    handler = RecordingHandler(delay=0.01)
+    server, port = await start_grpc_gateway(handler, "127.0.0.1:0", stream_concurrency=8)
+    client = MeshGatewayClient(
+        f"127.0.0.1:{port}", metadata=(("authorization", "Bearer token-123"),)
+    )
+    yield client, handler
+    await client.close()
+    await server.stop(None)
+
+
+# --- Unary Tests ---
+
+
+async def test_invoke_round_trip(gateway: tuple[MeshGatewayClient, RecordingHandler]) -> None:
+    """Test a unary call reaches the handler and returns a typed result."""
+    client, handler = gateway
+    result = await client.invoke("document.convert", CONVERT)
+
+    assert result.success
+    assert result.result == {"converted_data": "cGRm", "target_format": "pdf"}
+    assert handler.invocations[0].params == CONVERT
+    assert handler.invocations[0].metadata["authorization"] == "Bearer token-123"
+
+
+async def test_invoke_value_error_is_invalid_argument(
+    gateway: tuple[MeshGatewayClient, RecordingHandler],
+) -> None:
+    """Test handler ValueErrors map to INVALID_ARGUMENT."""
+    client, _ = gateway
+    with pytest.raises(grpc.aio.AioRpcError) as excinfo:
+        await client.invoke("document.convert", {"target_format": "bad"})
+    assert excinfo.value.code() == grpc.StatusCode.INVALID_ARGUMENT
+
+
+async def test_invoke_crash_is_internal(
+    gateway: tuple[MeshGatewayClient, RecordingHandler],
+) -> None:
+    """Test unexpected handler errors map to INTERNAL without leaking details."""
+    client, _ = gateway
+    with pytest.raises(grpc.aio.AioRpcError) as excinfo:
+        await client.invoke("document.convert", {"target_format": "crash"})
+    assert excinfo.value.code() == grpc.StatusCode.INTERNAL
+    assert "exploded" not in (excinfo.value.details() or "")
+
+
+async def test_invoke_incompatible_version(
+    gateway: tuple[MeshGatewayClient, RecordingHandler],
+) -> None:
+    """Test version mismatches are rejected before the handler runs."""
+    client, handler = gateway
+    with pytest.raises(grpc.aio.AioRpcError) as excinfo:
+        await client.invoke("document.convert", CONVERT, version="9.0.0")
+    assert excinfo.value.code() == grpc.StatusCode.INVALID_ARGUMENT
+    assert handler.invocations == []
+
+
+async def test_concurrent_unary_calls_share_channel(
+    gateway: tuple[MeshGatewayClient, RecordingHandler],
+) -> None:
+    """Test many unary calls multiplex over one channel concurrently."""
+    client, handler = gateway
+    results = await asyncio.gather(*(client.invoke("document.convert", CONVERT) for _ in range(50)))
+
+    assert all(result.success for result in results)
+    assert handler.peak > 1
+
+
+# --- Streaming Tests ---
+
+
+async def test_invoke_stream_reports_per_request_errors(
+    gateway: tuple[MeshGatewayClient, RecordingHandler],
+) -> None:
+    """Test a failing request in a stream does not end the stream."""
+    client, _ = gateway
+    calls = [("document.convert", {"target_format": "bad" if i == 3 else "pdf"}) for i in range(10)]
+    results = dict([item async for item in client.invoke_many(calls)])
+
+    assert set(results) == {str(i) for i in range(10)}
+    assert results["3"].success is False
+    assert results["3"].errors == ["unsupported target format"]
+    assert all(results[str(i)].success for i in range(10) if i != 3)
+
+
+async def test_invoke_stream_bounds_concurrency(
+    gateway: tuple[MeshGatewayClient, RecordingHandler],
+) -> None:
+    """Test no more than stream_concurrency requests run at once."""
+    client, handler = gateway
+    results = [
+        item async for item in client.invoke_many(("document.convert", CONVERT) for _ in range(40))
+    ]
+
+    assert len(results) == 40
+    assert 1 < handler.peak <= 8
+
+
+# --- Catalog Tests ---
+
+
+async def test_list_capabilities(gateway: tuple[MeshGatewayClient, RecordingHandler]) -> None:
+    """Test the catalog is served over gRPC."""
+    client, _ = gateway
+    listing = await client.list_capabilities()
+    assert "document.convert" in [entry.id for entry in listing.capabilities]
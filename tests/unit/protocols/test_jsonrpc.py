@@ -0,0 +1,138 @@
+"""Unit tests for JSON-RPC dispatch.
+
+Tests core functionality:
+- Single requests, notifications and handler failures
+- Batches: response order, concurrent methods, barriers, concurrency limit
+- Invalid requests and empty batches
+"""
+
+import asyncio
+from typing import Any
+
+from crank.protocols import (
+    INTERNAL_ERROR,
+    INVALID_REQUEST,
+    dispatch_jsonrpc,
+)
+
+
+class Recorder:
+    """Handler that records execution order and peak concurrency."""
+
+    def __init__(self, delay: float = 0.01) -> None:
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.events: list[str] = []
+
+    async def __call__(self, message: dict[str, Any]) -> dict[str, Any]:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        self.events.append(f"start {message['method']} {message.get('id')}")
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        self.events.append(f"end {message['method']} {message.get('id')}")
+        return {"jsonrpc": "2.0", "id": message.get("id"), "result": message["method"]}
+
+
+def _call(request_id: int) -> dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "method": "tools/call", "params": {}}
+
+
+# --- Single requests ---
+
+
+async def test_single_request_returns_response() -> None:
+    """A request object yields its handler's response."""
+    response = await dispatch_jsonrpc({"id": 1, "method": "ping"}, Recorder(0))
+    assert response == {"jsonrpc": "2.0", "id": 1, "result": "ping"}
+
+
+async def test_notification_gets_no_response() -> None:
+    """A request without an id runs but returns None."""
+    handler = Recorder(0)
+    assert await dispatch_jsonrpc({"method": "notifications/initialized"}, handler) is None
+    assert handler.events
+
+
+async def test_handler_exception_becomes_internal_error() -> None:
+    """A raising handler yields an INTERNAL_ERROR response with the request id."""
+
+    async def broken(message: dict[str, Any]) -> dict[str, Any]:
+        raise RuntimeError("boom")
+
+    response = await dispatch_jsonrpc({"id": 7, "method": "x"}, broken)
+    assert isinstance(response, dict)
+    assert response["id"] == 7
+    assert response["error"]["code"] == INTERNAL_ERROR
+
+
+async def test_invalid_request_object() -> None:
+    """Non-objects and missing methods are INVALID_REQUEST."""
+    response = await dispatch_jsonrpc({"id": 1}, Recorder(0))
+    assert isinstance(response, dict)
+    assert response["error"]["code"] == INVALID_REQUEST
+
+
+# --- Batches ---
+
+
+async def test_concurrent_methods_overlap_and_keep_order() -> None:
+    """tools/call requests in a batch run together; responses stay in order."""
+    handler = Recorder()
+    batch = [_call(i) for i in range(5)]
+
+    responses = await dispatch_jsonrpc(batch, handler, concurrent_methods={"tools/call"})
+
+    assert handler.peak == 5
+    assert isinstance(responses, list)
+    assert [r["id"] for r in responses] == [0, 1, 2, 3, 4]
+
+
+async def test_other_methods_are_barriers() -> None:
+    """initialize finishes before later calls start; calls after it still overlap."""
+    handler = Recorder()
+    batch = [{"id": "init", "method": "initialize"}, _call(1), _call(2)]
+
+    await dispatch_jsonrpc(batch, handler, concurrent_methods={"tools/call"})
+
+    assert handler.events[:2] == ["start initialize init", "end initialize init"]
+    assert handler.peak == 2
+
+
+async def test_batch_without_concurrent_methods_is_sequential() -> None:
+    """With no concurrent methods configured, a batch runs one at a time."""
+    handler = Recorder()
+    await dispatch_jsonrpc([_call(i) for i in range(3)], handler)
+    assert handler.peak == 1
+
+
+async def test_max_concurrency_bounds_batch() -> None:
+    """No more than max_concurrency requests run at once."""
+    handler = Recorder()
+    await dispatch_jsonrpc(
+        [_call(i) for i in range(10)],
+        handler,
+        concurrent_methods={"tools/call"},
+        max_concurrency=3,
+    )
+    assert handler.peak == 3
+
+
+async def test_batch_mixes_errors_and_notifications() -> None:
+    """Invalid entries get errors, notifications are dropped, the rest answer."""
+    batch: list[Any] = [_call(1), 42, {"method": "tools/call"}]
+    responses = await dispatch_jsonrpc(batch, Recorder(0), concurrent_methods={"tools/call"})
+
+    assert isinstance(responses, list)
+    assert len(responses) == 2
+    assert responses[0]["id"] == 1
+    assert responses[1]["error"]["code"] == INVALID_REQUEST
+
+
+async def test_empty_batch_and_all_notifications() -> None:
+    """An empty batch is one INVALID_REQUEST; a notification-only batch returns None."""
+    empty = await dispatch_jsonrpc([], Recorder(0))
+    assert isinstance(empty, dict)
+    assert empty["error"]["code"] == INVALID_REQUEST
+    assert await dispatch_jsonrpc([{"method": "a"}, {"method": "b"}], Recorder(0)) is None
@@ -0,0 +1,310 @@
+"""Unit tests for the streaming MCP transports.
+
+Tests core functionality:
+- Outbox bounds and ordering
+- ToolStream notifications, with and without a progress token
+- StreamingSession batches, client cancellation and the bounded backlog
+- stdio serving: framing, parse errors, backpressure, broken output
+- SSE events and cancellation when the consumer goes away
+"""
+
+import asyncio
+import json
+from typing import Any
+
+import pytest
+
+from crank.protocols import (
+    INVALID_REQUEST,
+    PARSE_ERROR,
+    Outbox,
+    StreamingSession,
+    ToolStream,
+    serve_stdio,
+)
+from crank.protocols.mcp_stream import (
+    CANCELLED_NOTIFICATION,
+    CHUNK_NOTIFICATION,
+    PROGRESS_NOTIFICATION,
+    Send,
+    format_sse,
+    sse_events,
+)
+
+
+async def chunky(message: dict[str, Any], send: Send) -> dict[str, Any]:
+    """Handler streaming ``params.chunks`` chunks, then answering."""
+    params = message.get("params") or {}
+    stream = ToolStream(send, params.get("token"))
+    total = params.get("chunks", 0)
+    for index in range(total):
+        await stream.progress(index + 1, total)
+        await stream.chunk({"part": index})
+    return {"jsonrpc": "2.0", "id": message.get("id"), "result": {"sent": stream.chunks_sent}}
+
+
+class Hanging:
+    """Handler that never finishes, recording cancellations."""
+
+    def __init__(self) -> None:
+        self.started = asyncio.Event()
+        self.cancelled = 0
+
+    async def __call__(self, message: dict[str, Any], send: Send) -> dict[str, Any]:
+        self.started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return {}
+
+
+class Gated:
+    """Handler that waits for ``gate``, counting the requests it has started."""
+
+    def __init__(self) -> None:
+        self.gate = asyncio.Event()
+        self.started = 0
+
+    async def __call__(self, message: dict[str, Any], send: Send) -> dict[str, Any]:
+        self.started += 1
+        await self.gate.wait()
+        return {"jsonrpc": "2.0", "id": message.get("id"), "result": {}}
+
+
+class MemoryWriter:
+    """StreamWriter stand-in; ``drain`` can be slowed or made to fail."""
+
+    def __init__(self, delay: float = 0, fail: bool = False) -> None:
+        self.lines: list[dict[str, Any]] = []
+        self.delay = delay
+        self.fail = fail
+
+    def write(self, data: bytes) -> None:
+        self.lines.append(json.loads(data))
+
+    async def drain(self) -> None:
+        if self.fail:
+            raise BrokenPipeError
+        await asyncio.sleep(self.delay)
+
+
+def _reader(*lines: Any) -> asyncio.StreamReader:
+    reader = asyncio.StreamReader()
+    for line in lines:
+        reader.feed_data(line if isinstance(line, bytes) else json.dumps(line).encode() + b"\n")
+    reader.feed_eof()
+    return reader
+
+
+def _request(request_id: Any, chunks: int = 0, token: Any = None) -> dict[str, Any]:
+    params = {"chunks": chunks, "token": token}
+    return {"jsonrpc": "2.0", "id": request_id, "method": "tools/call", "params": params}
+
+
+# --- Outbox / ToolStream ---
+
+
+async def test_outbox_blocks_when_full() -> None:
+    """send waits for room; reading frees it; close ends iteration after queued messages."""
+    outbox = Outbox(maxsize=2)
+    await outbox.send({"n": 1})
+    await outbox.send({"n": 2})
+    blocked = asyncio.create_task(outbox.send({"n": 3}))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    received = []
+    messages = outbox.messages()
+    received.append(await messages.__anext__())
+    await blocked
+    outbox.close()
+    received.extend([message async for message in messages])
+
+    assert [m["n"] for m in received] == [1, 2, 3]
+    assert outbox.high_water == 2
+
+
+async def test_tool_stream_without_token_sends_nothing() -> None:
+    """No progress token means the client did not ask; nothing is sent."""
+    sent: list[dict[str, Any]] = []
+
+    async def send(message: dict[str, Any]) -> None:
+        sent.append(message)
+
+    stream = ToolStream(send, None)
+    await stream.progress(1, 2)
+    await stream.chunk("x")
+    assert not stream.streaming
+    assert sent == []
+    assert stream.chunks_sent == 0
+
+
+async def test_tool_stream_notifications() -> None:
+    """Progress and chunk notifications carry the token; chunks are indexed."""
+    sent: list[dict[str, Any]] = []
+
+    async def send(message: dict[str, Any]) -> None:
+        sent.append(message)
+
+    stream = ToolStream(send, "tok")
+    await stream.progress(1, 4, "working")
+    await stream.chunk("a")
+    await stream.chunk({"b": 1})
+
+    assert sent[0]["method"] == PROGRESS_NOTIFICATION
+    assert sent[0]["params"] == {
+        "progressToken": "tok",
+        "progress": 1,
+        "total": 4,
+        "message": "working",
+    }
+    assert [m["method"] for m in sent[1:]] == [CHUNK_NOTIFICATION] * 2
+    assert [m["params"]["index"] for m in sent[1:]] == [0, 1]
+    assert sent[2]["params"]["content"] == [{"type": "text", "text": '{"b": 1}'}]
+    assert stream.chunks_sent == 2
+
+
+# --- Sessions ---
+
+
+async def test_session_batch_and_invalid_entries() -> None:
+    """Batch entries run separately; invalid ones get errors; empty batches are invalid."""
+    session = StreamingSession(chunky)
+    await session.submit([_request(1), 42])
+    await session.submit([])
+    await session.join()
+    session.outbox.close()
+    messages = [message async for message in session.outbox.messages()]
+
+    assert [m.get("id") for m in messages if "result" in m] == [1]
+    errors = [m["error"]["code"] for m in messages if "error" in m]
+    assert errors == [INVALID_REQUEST, INVALID_REQUEST]
+
+
+async def test_cancelled_notification_cancels_request() -> None:
+    """notifications/cancelled stops the running request; no response is sent for it."""
+    handler = Hanging()
+    session = StreamingSession(handler)
+    await session.submit({"jsonrpc": "2.0", "id": "a", "method": "tools/call"})
+    await handler.started.wait()
+
+    await session.submit({"method": CANCELLED_NOTIFICATION, "params": {"requestId": "a"}})
+    await session.join()
+
+    assert handler.cancelled == 1
+    assert session.cancelled == 1
+    assert session.outbox.high_water == 0
+
+
+async def test_session_backlog_is_bounded() -> None:
+    """Past max_concurrency + max_backlog requests, submit waits instead of adding tasks."""
+    handler = Gated()
+    session = StreamingSession(handler, max_concurrency=2, max_backlog=1)
+    for request_id in range(3):
+        await session.submit(_request(request_id))
+
+    fourth = asyncio.create_task(session.submit(_request(3)))
+    await asyncio.sleep(0.01)
+
+    assert not fourth.done()
+    assert session.running == 3
+    assert handler.started == 2
+    handler.gate.set()
+    await asyncio.wait_for(fourth, timeout=1)
+    await session.join()
+    session.outbox.close()
+    responses = [message["id"] async for message in session.outbox.messages()]
+    assert sorted(responses) == [0, 1, 2, 3]
+
+
+# --- stdio ---
+
+
+async def test_stdio_serves_notifications_and_responses() -> None:
+    """Each request gets its notifications then its response, one JSON object per line."""
+    writer = MemoryWriter()
+    reader = _reader(_request(1, chunks=2, token="t"), b"\n", b"{not json\n", _request(2))
+
+    await serve_stdio(chunky, reader, writer)  # type: ignore[arg-type]
+
+    methods = [line.get("method") for line in writer.lines if line.get("id") is None]
+    assert methods.count(PROGRESS_NOTIFICATION) == 2
+    assert methods.count(CHUNK_NOTIFICATION) == 2
+    responses = {line["id"]: line for line in writer.lines if "result" in line}
+    assert responses[1]["result"] == {"sent": 2}
+    assert responses[2]["result"] == {"sent": 0}
+    assert any(line.get("error", {}).get("code") == PARSE_ERROR for line in writer.lines)
+
+
+async def test_stdio_slow_reader_bounds_buffer() -> None:
+    """With a small buffer and a slow consumer, every message still arrives in order."""
+    writer = MemoryWriter(delay=0.001)
+    reader = _reader(_request(1, chunks=50, token="t"))
+
+    await serve_stdio(chunky, reader, writer, buffer_size=4)  # type: ignore[arg-type]
+
+    assert len(writer.lines) == 101  # 50 progress + 50 chunks + response
+    chunk_indexes = [
+        line["params"]["index"] for line in writer.lines if line.get("method") == CHUNK_NOTIFICATION
+    ]
+    assert chunk_indexes == list(range(50))
+
+
+async def test_stdio_broken_output_cancels_requests() -> None:
+    """If the agent stops reading (broken pipe), running tools are cancelled."""
+    handler = Hanging()
+    reader = asyncio.StreamReader()
+    reader.feed_data(json.dumps(_request(1)).encode() + b"\n" + b"{bad\n")
+
+    serving = asyncio.create_task(serve_stdio(handler, reader, MemoryWriter(fail=True)))  # type: ignore[arg-type]
+    await asyncio.wait_for(serving, timeout=2)
+
+    assert handler.cancelled == 1
+
+
+async def test_stdio_flood_pushes_back_on_the_reader() -> None:
+    """A client flooding stdio leaves requests unread rather than queued as tasks."""
+    handler = Gated()
+    reader = _reader(*(_request(request_id) for request_id in range(500)))
+    writer = MemoryWriter()
+
+    serving = asyncio.create_task(
+        serve_stdio(handler, reader, writer, max_concurrency=4, max_backlog=8)  # type: ignore[arg-type]
+    )
+    await asyncio.sleep(0.05)
+
+    assert handler.started == 4
+    assert not reader.at_eof()  # The rest is still in the pipe
+    assert len(asyncio.all_tasks()) <= 4 + 8 + 5  # Requests plus the server's own tasks
+    handler.gate.set()
+    await asyncio.wait_for(serving, timeout=5)
+    assert sorted(line["id"] for line in writer.lines) == list(range(500))
+
+
+# --- SSE ---
+
+
+async def test_sse_events_stream_in_order() -> None:
+    """Events are SSE-framed messages, ending with the response."""
+    events = [event async for event in sse_events(chunky, _request(7, chunks=3, token=1))]
+
+    assert len(events) == 7
+    assert all(event.startswith(b"event: message\ndata: ") for event in events)
+    assert events[-1] == format_sse({"jsonrpc": "2.0", "id": 7, "result": {"sent": 3}})
+
+
+async def test_sse_consumer_leaving_cancels_tool() -> None:
+    """Closing the event iterator early (client disconnect) cancels the request."""
+    handler = Hanging()
+    events = sse_events(handler, _request(1))
+    pending = asyncio.create_task(events.__anext__())
+    await handler.started.wait()
+
+    pending.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await pending
+    await events.aclose()
+
+    assert handler.cancelled == 1
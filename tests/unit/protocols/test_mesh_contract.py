@@ -0,0 +1,185 @@
+"""Unit tests for the mesh protobuf contract.
+
+Tests core functionality:
+- Message generation from capability JSON Schemas
+- Request/response round trips through binary protobuf
+- Typed output with untyped fallback for off-schema results
+- Version checks and catalog listing
+- Checked-in .proto matches the catalog
+"""
+
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("google.protobuf")
+
+from crank.capabilities import (
+    DOCUMENT_CONVERSION,
+    EMAIL_CLASSIFICATION,
+    IMAGE_CLASSIFICATION,
+    CapabilityDefinition,
+    CapabilityVersion,
+    IOContract,
+)
+from crank.protocols.mesh_contract import (
+    ContractError,
+    InvocationResult,
+    MeshContract,
+)
+
+PROTO_PATH = Path(__file__).parents[3] / "docs/schemas/grpc/crank/mesh/v1/mesh.proto"
+
+
+@pytest.fixture(scope="module")
+def contract() -> MeshContract:
+    """Contract for the full catalog."""
+    return MeshContract()
+
+
+# --- Generation Tests ---
+
+
+def test_checked_in_proto_matches_catalog(contract: MeshContract) -> None:
+    """Test docs/schemas .proto is regenerated whenever the catalog changes."""
+    assert PROTO_PATH.read_text() == contract.render_proto()
+
+
+def test_capabilities_numbered_by_catalog_position() -> None:
+    """Test oneof field numbers follow catalog order starting at 16."""
+    contract = MeshContract([DOCUMENT_CONVERSION, IMAGE_CLASSIFICATION])
+    fields = contract.InvokeRequest.DESCRIPTOR.fields_by_name
+    assert fields["document_convert"].number == 16
+    assert fields["image_classify"].number == 17
+
+
+def test_schema_types_map_to_protobuf() -> None:
+    """Test scalars, arrays, nested objects and open objects."""
+    capability = CapabilityDefinition(
+        id="test.types",
+        version=CapabilityVersion(major=1, minor=0, patch=0),
+        name="Types",
+        description="Schema mapping",
+        contract=IOContract(
+            input_schema={
+                "type": "object",
+                "properties": {
+                    "count": {"type": "integer"},
+                    "ratio": {"type": "number"},
+                    "labels": {"type": "array", "items": {"type": "string"}},
+                    "point": {"type": "object", "properties": {"x": {"type": "number"}}},
+                    "extra": {"type": "object", "additionalProperties": True},
+                    "anything": {},
+                },
+            },
+            output_schema={"type": "object"},
+        ),
+    )
+    contract = MeshContract([capability])
+    request = contract.make_request(
+        "test.types",
+        {
+            "count": 2**40,
+            "ratio": 0.5,
+            "labels": ["a", "b"],
+            "point": {"x": 1.5},
+            "extra": {"k": "v"},
+            "anything": [1, "two"],
+        },
+    )
+    decoded = contract.InvokeRequest.FromString(request.SerializeToString())
+    params = contract.parse_request(decoded).params
+
+    assert params["count"] == 2**40 and isinstance(params["count"], int)
+    assert params["labels"] == ["a", "b"]
+    assert params["point"] == {"x": 1.5}
+    assert params["extra"] == {"k": "v"}
+    assert params["anything"] == [1, "two"]
+
+
+def test_optional_scalars_keep_zero_values(contract: MeshContract) -> None:
+    """Test explicitly set zero/false values survive (proto3 optional)."""
+    request = contract.make_request("email.parse", {"raw_email": "", "extract_attachments": False})
+    params = contract.parse_request(request).params
+    assert params == {"raw_email": "", "extract_attachments": False}
+
+
+def test_unknown_param_rejected(contract: MeshContract) -> None:
+    """Test params outside the input schema are rejected on the client side."""
+    with pytest.raises(ValueError, match="bogus"):
+        contract.make_request("document.convert", {"bogus": 1})
+
+
+# --- Request Tests ---
+
+
+def test_request_without_input_rejected(contract: MeshContract) -> None:
+    """Test an InvokeRequest must select a capability."""
+    with pytest.raises(ContractError, match="no capability"):
+        contract.parse_request(contract.InvokeRequest(request_id="r"))
+
+
+def test_incompatible_version_rejected(contract: MeshContract) -> None:
+    """Test a different major version is refused."""
+    request = contract.make_request("document.convert", {}, version="2.0.0")
+    with pytest.raises(ContractError, match="incompatible"):
+        contract.parse_request(request)
+
+
+def test_compatible_version_accepted(contract: MeshContract) -> None:
+    """Test the same major version is accepted."""
+    request = contract.make_request("document.convert", {}, version="1.4.2")
+    assert contract.parse_request(request).capability is DOCUMENT_CONVERSION
+
+
+# --- Response Tests ---
+
+
+def test_typed_response_round_trip(contract: MeshContract) -> None:
+    """Test results matching the output schema use the typed message."""
+    result = InvocationResult(
+        success=True,
+        result={"classifications": [{"type": "spam", "value": "no", "confidence": 0.75}]},
+        receipt_id="receipt-1",
+        processing_time_ms=12,
+        node_id="node-a",
+    )
+    response = contract.build_response(result, EMAIL_CLASSIFICATION, "req-1")
+    assert response.WhichOneof("output") == "email_classify"
+
+    decoded = contract.read_response(
+        contract.InvokeResponse.FromString(response.SerializeToString())
+    )
+    assert decoded == result
+    assert response.request_id == "req-1"
+
+
+def test_off_schema_result_falls_back_to_untyped(contract: MeshContract) -> None:
+    """Test results that do not fit the output message are not dropped."""
+    result = InvocationResult(success=True, result={"converted_file": "/out.pdf"})
+    response = contract.build_response(result, DOCUMENT_CONVERSION)
+
+    assert response.WhichOneof("output") is None
+    assert contract.read_response(response).result == {"converted_file": "/out.pdf"}
+
+
+def test_failure_response_has_errors(contract: MeshContract) -> None:
+    """Test failed invocations carry their errors and no result."""
+    response = contract.build_response(
+        InvocationResult(success=False, errors=["boom"]), DOCUMENT_CONVERSION
+    )
+    decoded = contract.read_response(response)
+    assert (decoded.success, decoded.result, decoded.errors) == (False, None, ["boom"])
+
+
+# --- Catalog Tests ---
+
+
+def test_capability_list_filters_by_tag(contract: MeshContract) -> None:
+    """Test ListCapabilities reports catalog entries and their error codes."""
+    listing = contract.capability_list("cv")
+    assert [entry.id for entry in listing.capabilities] == ["image.classify"]
+    entry = listing.capabilities[0]
+    assert entry.input_field == "image_classify"
+    assert entry.version == "1.0.0"
+    assert {error.code for error in entry.error_codes} >= {"INVALID_IMAGE"}
@@ -0,0 +1,269 @@
+"""Unit tests for the ONC-RPC protocol engine.
+
+Tests core functionality:
+- Call and reply encoding, AUTH_SYS credentials
+- Record-marking reassembly across fragments and TCP chunks
+- Reply mapping (GARBAGE_ARGS, PROG_UNAVAIL, RPC_MISMATCH, AUTH_ERROR)
+- Pipelined calls over one TCP connection with out-of-order replies
+"""
+
+import asyncio
+import struct
+
+import pytest
+
+from crank.protocols import (
+    AcceptStatus,
+    AuthStatus,
+    RecordReassembler,
+    RejectStatus,
+    ReplyStatus,
+    RPCCall,
+    RPCDecodeError,
+    RPCReplyError,
+    XDRDecoder,
+    XDREncoder,
+    decode_call,
+    decode_reply,
+    encode_auth_sys,
+    encode_call,
+    frame_record,
+    handle_call_record,
+    start_onc_rpc_server,
+)
+
+PROGRAM = 100001
+
+# --- Helpers ---
+
+
+async def echo_handler(call: RPCCall) -> bytes:
+    """Return the argument value; unknown programs are PROG_UNAVAIL."""
+    if call.program != PROGRAM:
+        raise RPCReplyError(AcceptStatus.PROG_UNAVAIL)
+    decoder = XDRDecoder(call.args)
+    value = decoder.unpack_value()
+    decoder.done()
+    encoder = XDREncoder()
+    encoder.pack_value(value)
+    return encoder.getvalue()
+
+
+def value_args(value: object) -> bytes:
+    """XDR-encode a single value."""
+    encoder = XDREncoder()
+    encoder.pack_value(value)
+    return encoder.getvalue()
+
+
+async def read_record(reader: asyncio.StreamReader) -> bytes:
+    """Read one single-fragment record."""
+    (mark,) = struct.unpack(">I", await reader.readexactly(4))
+    return await reader.readexactly(mark & 0x7FFFFFFF)
+
+
+# --- Message Tests ---
+
+
+def test_call_round_trip_with_auth_sys() -> None:
+    """Test call headers and AUTH_SYS credentials decode as encoded."""
+    credential = encode_auth_sys(1000, 100, "legacy-host", gids=(4, 24))
+    call = decode_call(encode_call(42, PROGRAM, 1, 7, value_args("x"), credential))
+
+    assert (call.xid, call.program, call.version, call.procedure) == (42, PROGRAM, 1, 7)
+    auth = call.auth_sys()
+    assert auth is not None
+    assert (auth.uid, auth.gid, auth.machine_name, auth.gids) == (1000, 100, "legacy-host", (4, 24))
+    assert XDRDecoder(call.args).unpack_value() == "x"
+
+
+def test_auth_none_has_no_auth_sys() -> None:
+    """Test AUTH_NONE calls report no AUTH_SYS credential."""
+    assert decode_call(encode_call(1, PROGRAM, 1, 0)).auth_sys() is None
+
+
+def test_reply_message_is_rejected_as_call() -> None:
+    """Test decoding a reply as a call fails with the xid attached."""
+    with pytest.raises(RPCDecodeError) as excinfo:
+        decode_call(b"\x00\x00\x00\x09\x00\x00\x00\x01")
+    assert excinfo.value.xid == 9
+
+
+# --- Reassembly Tests ---
+
+
+def test_reassembles_multi_fragment_record() -> None:
+    """Test a record split into fragments is joined."""
+    message = bytes(range(256)) * 4
+    framed = frame_record(message, max_fragment=100)
+
+    assert RecordReassembler().feed(framed) == [message]
+
+
+def test_reassembles_across_arbitrary_chunks() -> None:
+    """Test records split at every byte boundary are still recovered in order."""
+    messages = [b"a" * 8, b"b" * 300, b"c" * 4]
+    stream = b"".join(frame_record(m, max_fragment=64) for m in messages)
+
+    reassembler = RecordReassembler()
+    records: list[bytes] = []
+    for i in range(len(stream)):
+        records.extend(reassembler.feed(stream[i : i + 1]))
+    assert records == messages
+
+
+def test_record_size_limit() -> None:
+    """Test records (including fragments so far) over the limit are rejected."""
+    reassembler = RecordReassembler(max_record_size=100)
+    reassembler.feed(frame_record(b"x" * 120, max_fragment=60)[:64])
+    with pytest.raises(RPCDecodeError, match="exceeds"):
+        reassembler.feed(frame_record(b"x" * 120, max_fragment=60)[64:])
+
+
+def test_records_outlive_buffer_compaction() -> None:
+    """Test records are independent bytes and the buffer keeps growing and compacting."""
+    reassembler = RecordReassembler()
+    first = reassembler.feed(frame_record(b"first") + frame_record(b"second")[:6])
+    rest = reassembler.feed(frame_record(b"second")[6:] + frame_record(b"third"))
+
+    assert first == [b"first"]
+    assert rest == [b"second", b"third"]
+    assert all(type(record) is bytes for record in first + rest)
+
+    failing = RecordReassembler(max_record_size=4)
+    with pytest.raises(RPCDecodeError):
+        failing.feed(frame_record(b"too long"))
+    with pytest.raises(RPCDecodeError):  # Not BufferError: the view was released
+        failing.feed(b"\x00")
+
+
+# --- Reply Mapping Tests ---
+
+
+async def test_success_reply() -> None:
+    """Test a successful call returns the handler body."""
+    reply = await handle_call_record(echo_handler, encode_call(5, PROGRAM, 1, 1, value_args(3)))
+    assert reply is not None
+    xid, reply_status, status, body = decode_reply(reply)
+    assert (xid, reply_status, status) == (5, ReplyStatus.MSG_ACCEPTED, AcceptStatus.SUCCESS)
+    assert XDRDecoder(body).unpack_value() == 3
+
+
+async def test_garbage_args_reply() -> None:
+    """Test undecodable arguments yield GARBAGE_ARGS."""
+    reply = await handle_call_record(echo_handler, encode_call(6, PROGRAM, 1, 1, b"\xff" * 4))
+    assert reply is not None
+    assert decode_reply(reply)[2] == AcceptStatus.GARBAGE_ARGS
+
+
+async def test_prog_unavail_reply() -> None:
+    """Test handler-raised RPCReplyError statuses are sent back."""
+    reply = await handle_call_record(echo_handler, encode_call(7, 999, 1, 1, value_args(None)))
+    assert reply is not None
+    assert decode_reply(reply)[2] == AcceptStatus.PROG_UNAVAIL
+
+
+async def test_rpc_version_mismatch_reply() -> None:
+    """Test calls with an RPC version other than 2 are denied."""
+    record = bytearray(encode_call(8, PROGRAM, 1, 1, value_args(None)))
+    record[8:12] = struct.pack(">I", 3)
+    reply = await handle_call_record(echo_handler, bytes(record))
+    assert reply is not None
+    xid, reply_status, status, _ = decode_reply(reply)
+    assert (xid, reply_status, status) == (8, ReplyStatus.MSG_DENIED, RejectStatus.RPC_MISMATCH)
+
+
+async def test_bad_auth_sys_is_denied() -> None:
+    """Test a malformed AUTH_SYS body is denied with AUTH_BADCRED."""
+
+    async def handler(call: RPCCall) -> bytes:
+        call.auth_sys()
+        return b""
+
+    credential = encode_auth_sys(1, 1)
+    broken = type(credential)(credential.flavor, credential.body[:-4])
+    reply = await handle_call_record(handler, encode_call(9, PROGRAM, 1, 1, b"", broken))
+    assert reply is not None
+    _, reply_status, status, body = decode_reply(reply)
+    assert (reply_status, status) == (ReplyStatus.MSG_DENIED, RejectStatus.AUTH_ERROR)
+    assert XDRDecoder(body).unpack_int() == AuthStatus.AUTH_BADCRED
+
+
+async def test_handler_exception_is_system_err() -> None:
+    """Test unexpected handler failures yield SYSTEM_ERR."""
+
+    async def handler(call: RPCCall) -> bytes:
+        raise RuntimeError("boom")
+
+    reply = await handle_call_record(handler, encode_call(10, PROGRAM, 1, 1))
+    assert reply is not None
+    assert decode_reply(reply)[2] == AcceptStatus.SYSTEM_ERR
+
+
+# --- Server Tests ---
+
+
+async def test_pipelined_calls_reply_out_of_order() -> None:
+    """Test many calls on one connection run concurrently and match by xid."""
+
+    async def handler(call: RPCCall) -> bytes:
+        # Earlier xids sleep longer, so replies come back in reverse order
+        await asyncio.sleep((20 - call.xid) * 0.002)
+        return await echo_handler(call)
+
+    server = await start_onc_rpc_server(handler, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(
+            b"".join(
+                frame_record(encode_call(xid, PROGRAM, 1, 1, value_args(f"call-{xid}")))
+                for xid in range(20)
+            )
+        )
+        replies = {}
+        order = []
+        for _ in range(20):
+            xid, _, status, body = decode_reply(await read_record(reader))
+            assert status == AcceptStatus.SUCCESS
+            replies[xid] = XDRDecoder(body).unpack_value()
+            order.append(xid)
+    finally:
+        writer.close()
+        server.close()
+        await server.wait_closed()
+
+    assert replies == {xid: f"call-{xid}" for xid in range(20)}
+    assert order != sorted(order)
+
+
+async def test_inflight_limit_applies_backpressure() -> None:
+    """Test no more than max_inflight calls run at once per connection."""
+    running = 0
+    peak = 0
+
+    async def handler(call: RPCCall) -> bytes:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+        return b""
+
+    server = await start_onc_rpc_server(handler, "127.0.0.1", 0, max_inflight=4)
+    port = server.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        # Send one call per write so the reads can be paused between them
+        for xid in range(40):
+            writer.write(frame_record(encode_call(xid, PROGRAM, 1, 1)))
+            await writer.drain()
+        xids = {decode_reply(await read_record(reader))[0] for _ in range(40)}
+    finally:
+        writer.close()
+        server.close()
+        await server.wait_closed()
+
+    assert xids == set(range(40))
+    # A single read can deliver several records, so allow one read's worth of overshoot
+    assert peak < 40
@@ -0,0 +1,84 @@
+"""Unit tests for ToolCatalog.
+
+Tests core functionality:
+- Definitions built once and rebuilt only after invalidation
+- Cached body and ETag stability
+- If-None-Match matching and 304 responses
+"""
+
+import json
+from typing import Any
+
+from crank.protocols import ToolCatalog
+
+
+class Registry:
+    """Mutable tool source counting builds."""
+
+    def __init__(self) -> None:
+        self.names = ["ping"]
+
+    def build(self) -> list[dict[str, Any]]:
+        return [{"name": name, "inputSchema": {"type": "object"}} for name in self.names]
+
+
+# --- Caching ---
+
+
+def test_tools_built_once() -> None:
+    """Repeated access reuses the same list."""
+    catalog = ToolCatalog(Registry().build)
+    first = catalog.tools
+    assert catalog.tools is first
+    assert catalog.body is catalog.body
+    assert catalog.builds == 1
+
+
+def test_invalidate_rebuilds_with_new_etag() -> None:
+    """After a registry change and invalidate(), body and ETag follow the new tools."""
+    registry = Registry()
+    catalog = ToolCatalog(registry.build)
+    etag = catalog.etag
+
+    registry.names.append("echo")
+    assert catalog.etag == etag  # Still cached
+    catalog.invalidate()
+
+    assert catalog.etag != etag
+    assert [tool["name"] for tool in json.loads(catalog.body)["tools"]] == ["ping", "echo"]
+    assert catalog.builds == 2
+
+
+def test_etag_is_stable_across_instances() -> None:
+    """Equal definitions give equal ETags (safe behind several replicas)."""
+    assert ToolCatalog(Registry().build).etag == ToolCatalog(Registry().build).etag
+
+
+# --- Conditional requests ---
+
+
+def test_if_none_match_forms() -> None:
+    """Exact, weak, listed and wildcard tags match; others do not."""
+    catalog = ToolCatalog(Registry().build)
+    etag = catalog.etag
+    assert catalog.matches(etag)
+    assert catalog.matches(f"W/{etag}")
+    assert catalog.matches(f'"other", {etag}')
+    assert catalog.matches("*")
+    assert not catalog.matches('"other"')
+    assert not catalog.matches(None)
+
+
+def test_http_response_200_then_304() -> None:
+    """The first fetch returns the body; revalidation with the ETag returns 304."""
+    catalog = ToolCatalog(Registry().build)
+
+    full = catalog.http_response()
+    assert full.status_code == 200
+    assert full.body == catalog.body
+    assert full.headers["etag"] == catalog.etag
+
+    revalidated = catalog.http_response(catalog.etag)
+    assert revalidated.status_code == 304
+    assert revalidated.body == b""
+    assert revalidated.headers["etag"] == catalog.etag
@@ -0,0 +1,153 @@
+"""Unit tests for the XDR codec.
+
+Tests core functionality:
+- Primitive round trips and big-endian layout
+- Opaque/string padding and zero-copy views
+- Self-describing value union round trips
+- Truncation, padding and length-limit errors
+"""
+
+import pytest
+
+from crank.protocols import XDRDecoder, XDREncoder, XDRError
+
+# --- Primitive Tests ---
+
+
+def test_primitives_round_trip() -> None:
+    """Test every primitive decodes to the value it was encoded from."""
+    encoder = XDREncoder()
+    encoder.pack_int(-5)
+    encoder.pack_uint(2**32 - 1)
+    encoder.pack_hyper(-(2**63))
+    encoder.pack_uhyper(2**64 - 1)
+    encoder.pack_bool(True)
+    encoder.pack_double(1.5)
+
+    decoder = XDRDecoder(encoder.getvalue())
+    assert decoder.unpack_int() == -5
+    assert decoder.unpack_uint() == 2**32 - 1
+    assert decoder.unpack_hyper() == -(2**63)
+    assert decoder.unpack_uhyper() == 2**64 - 1
+    assert decoder.unpack_bool() is True
+    assert decoder.unpack_double() == 1.5
+    decoder.done()
+
+
+def test_int_is_big_endian() -> None:
+    """Test integers use network byte order."""
+    encoder = XDREncoder()
+    encoder.pack_uint(1)
+    assert encoder.getvalue() == b"\x00\x00\x00\x01"
+
+
+def test_out_of_range_value_raises() -> None:
+    """Test values that do not fit the XDR type are rejected."""
+    with pytest.raises(XDRError):
+        XDREncoder().pack_int(2**31)
+
+
+def test_invalid_bool_raises() -> None:
+    """Test bools other than 0 or 1 are rejected."""
+    with pytest.raises(XDRError, match="bool"):
+        XDRDecoder(b"\x00\x00\x00\x02").unpack_bool()
+
+
+# --- Opaque Tests ---
+
+
+def test_opaque_is_padded_to_four_bytes() -> None:
+    """Test variable-length opaque data is padded with zeros."""
+    encoder = XDREncoder()
+    encoder.pack_opaque(b"abcde")
+    assert encoder.getvalue() == b"\x00\x00\x00\x05abcde\x00\x00\x00"
+
+
+def test_opaque_is_zero_copy_view() -> None:
+    """Test opaque data is returned as a view into the source buffer."""
+    encoder = XDREncoder()
+    encoder.pack_opaque(b"payload")
+    source = bytearray(encoder.getvalue())
+
+    view = XDRDecoder(source).unpack_opaque()
+    assert isinstance(view, memoryview)
+    source[4] = ord("P")
+    assert bytes(view) == b"Payload"
+
+
+def test_string_round_trip_unicode() -> None:
+    """Test strings are UTF-8 encoded."""
+    encoder = XDREncoder()
+    encoder.pack_string("résumé ✓")
+    assert XDRDecoder(encoder.getvalue()).unpack_string() == "résumé ✓"
+
+
+def test_truncated_opaque_raises() -> None:
+    """Test a length prefix larger than the data is rejected."""
+    with pytest.raises(XDRError, match="Truncated"):
+        XDRDecoder(b"\x00\x00\x00\x08abc").unpack_opaque()
+
+
+def test_missing_padding_raises() -> None:
+    """Test opaque data without its padding bytes is rejected."""
+    with pytest.raises(XDRError, match="padding"):
+        XDRDecoder(b"\x00\x00\x00\x03abc").unpack_opaque()
+
+
+def test_opaque_max_length_enforced() -> None:
+    """Test declared lengths above the maximum are rejected before reading."""
+    encoder = XDREncoder()
+    encoder.pack_opaque(b"x" * 10)
+    with pytest.raises(XDRError, match="exceeds maximum"):
+        XDRDecoder(encoder.getvalue()).unpack_opaque(max_length=8)
+
+
+def test_array_count_larger_than_buffer_raises() -> None:
+    """Test a hostile array count cannot trigger a huge allocation."""
+    decoder = XDRDecoder(b"\xff\xff\xff\xff")
+    with pytest.raises(XDRError, match="remaining"):
+        decoder.unpack_array(decoder.unpack_uint)
+
+
+def test_trailing_bytes_detected() -> None:
+    """Test done() rejects unread data."""
+    decoder = XDRDecoder(b"\x00\x00\x00\x01\x00\x00\x00\x02")
+    decoder.unpack_int()
+    with pytest.raises(XDRError, match="trailing"):
+        decoder.done()
+
+
+# --- Value Union Tests ---
+
+
+def test_value_round_trip() -> None:
+    """Test nested dynamic values survive a round trip."""
+    value = {
+        "file_path": "/legacy/doc.txt",
+        "pages": 12,
+        "ratio": 0.25,
+        "flags": [True, False, None],
+        "blob": b"\x00\x01",
+        "nested": {"empty": [], "negative": -7},
+    }
+    encoder = XDREncoder()
+    encoder.pack_value(value)
+
+    decoder = XDRDecoder(encoder.getvalue())
+    assert decoder.unpack_value() == value
+    decoder.done()
+
+
+def test_value_unknown_type_raises() -> None:
+    """Test an unknown discriminant is rejected."""
+    with pytest.raises(XDRError, match="Unknown"):
+        XDRDecoder(b"\x00\x00\x00\x63").unpack_value()
+
+
+def test_value_depth_limited() -> None:
+    """Test deeply nested values are rejected instead of recursing unbounded."""
+    value: list[object] = []
+    for _ in range(40):
+        value = [value]
+    with pytest.raises(XDRError, match="deeply"):
+        XDREncoder().pack_value(value)
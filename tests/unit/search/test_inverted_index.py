@@ -0,0 +1,281 @@
+"""Unit tests for InvertedIndex.
+
+Tests core functionality:
+- Tokenization
+- BM25 ranking
+- Incremental updates (add, replace, remove)
+- Compaction of tombstoned postings
+- Impact-tier search for queries made only of common terms, and its exhaustive fallback
+"""
+
+import math
+import random
+
+import pytest
+
+from crank.search import InvertedIndex, tokenize
+
+# --- Fixtures ---
+
+
+@pytest.fixture
+def index() -> InvertedIndex:
+    """Index with a small zettel corpus."""
+    index = InvertedIndex()
+    index.add("zk-1", "Workers use mTLS certificates issued by the CA service")
+    index.add("zk-2", "The controller routes capabilities to healthy workers")
+    index.add("zk-3", "Zettelkasten notes link ideas; notes about notes")
+    return index
+
+
+# --- Tokenization Tests ---
+
+
+def test_tokenize_casefolds_and_splits_punctuation() -> None:
+    """Test tokenizer lowercases and drops punctuation and underscores."""
+    assert tokenize("Hello, World! snake_case mTLS-2") == [
+        "hello", "world", "snake", "case", "mtls", "2",
+    ]
+
+
+# --- Ranking Tests ---
+
+
+def test_search_ranks_matching_documents(index: InvertedIndex) -> None:
+    """Test documents containing query terms are returned best-first."""
+    hits = index.search("controller workers")
+
+    assert [hit.doc_key for hit in hits] == ["zk-2", "zk-1"]
+    assert hits[0].score > hits[1].score
+
+
+def test_search_term_frequency_increases_score(index: InvertedIndex) -> None:
+    """Test repeated terms score higher than single occurrences."""
+    index.add("zk-4", "notes")
+
+    hits = index.search("notes")
+
+    assert hits[0].doc_key == "zk-3"
+
+
+def test_search_respects_limit(index: InvertedIndex) -> None:
+    """Test limit truncates ranked results."""
+    assert len(index.search("workers notes controller", limit=2)) == 2
+
+
+def test_search_unknown_terms_return_nothing(index: InvertedIndex) -> None:
+    """Test queries with no indexed terms return no hits."""
+    assert index.search("pandoc") == []
+    assert index.search("   ") == []
+
+
+# --- Incremental Update Tests ---
+
+
+def test_add_existing_key_replaces_document(index: InvertedIndex) -> None:
+    """Test re-adding a key replaces its previous content."""
+    index.add("zk-1", "Completely different subject matter")
+
+    assert "zk-1" not in [hit.doc_key for hit in index.search("certificates")]
+    assert index.search("subject")[0].doc_key == "zk-1"
+    assert len(index) == 3
+
+
+def test_remove_hides_document(index: InvertedIndex) -> None:
+    """Test removed documents disappear from results."""
+    assert index.remove("zk-2") is True
+    assert index.remove("zk-2") is False
+
+    assert [hit.doc_key for hit in index.search("workers")] == ["zk-1"]
+    assert index.tombstone_count == 1
+
+
+def test_compact_preserves_results(index: InvertedIndex) -> None:
+    """Test compaction drops tombstones without changing rankings."""
+    index.remove("zk-2")
+    before = [hit.doc_key for hit in index.search("workers notes")]
+
+    index.compact()
+
+    assert index.tombstone_count == 0
+    assert [hit.doc_key for hit in index.search("workers notes")] == before
+    index.add("zk-5", "more workers")
+    assert "zk-5" in [hit.doc_key for hit in index.search("workers")]
+
+
+def test_automatic_compaction_on_tombstone_threshold() -> None:
+    """Test compaction triggers once tombstones exceed the configured ratio."""
+    index = InvertedIndex(compact_ratio=0.5, min_compact_tombstones=2)
+    for i in range(4):
+        index.add(f"zk-{i}", f"shared term{i}")
+
+    index.remove("zk-0")
+    index.remove("zk-1")
+
+    assert index.tombstone_count == 0
+    assert index.stats()["documents"] == 2
+    assert {hit.doc_key for hit in index.search("shared")} == {"zk-2", "zk-3"}
+
+
+# --- Pruning Correctness Tests ---
+
+
+def _exhaustive_bm25(corpus: dict[str, str], query: str) -> dict[str, float]:
+    """Reference BM25 that scores every document."""
+    docs = {key: tokenize(text) for key, text in corpus.items()}
+    avg_length = max(sum(len(t) for t in docs.values()) / len(docs), 1.0)
+    scores: dict[str, float] = {}
+    for term in dict.fromkeys(tokenize(query)):
+        df = sum(1 for t in docs.values() if term in t)
+        idf = math.log(1.0 + (len(docs) - df + 0.5) / (df + 0.5))
+        for key, tokens in docs.items():
+            tf = tokens.count(term)
+            if tf == 0:
+                continue
+            norm = 1.2 * (1.0 - 0.75 + 0.75 * len(tokens) / avg_length)
+            scores[key] = scores.get(key, 0.0) + idf * tf * 2.2 / (tf + norm)
+    return scores
+
+
+def test_pruned_search_matches_exhaustive_ranking() -> None:
+    """Test block-max pruning returns the exact exhaustive top-k."""
+    rng = random.Random(42)
+    vocabulary = [f"w{i}" for i in range(60)]
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    index = InvertedIndex(min_compact_tombstones=10**9)
+    corpus: dict[str, str] = {}
+
+    for i in range(3000):
+        text = " ".join(rng.choices(vocabulary, weights=weights, k=rng.randint(3, 40)))
+        corpus[f"zk-{i}"] = text
+        index.add(f"zk-{i}", text)
+
+    for _ in range(5):
+        query = " ".join(rng.sample(vocabulary, rng.randint(1, 3)))
+        expected = _exhaustive_bm25(corpus, query)
+        hits = index.search(query, limit=10)
+        best = sorted(expected.values(), reverse=True)[:10]
+        assert [hit.score for hit in hits] == pytest.approx(best)
+        for hit in hits:
+            assert hit.score == pytest.approx(expected[hit.doc_key])
+
+
+def test_pruned_search_after_removals_and_compaction() -> None:
+    """Test pruning stays exact with tombstones and after compaction."""
+    rng = random.Random(7)
+    vocabulary = [f"w{i}" for i in range(30)]
+    index = InvertedIndex(min_compact_tombstones=10**9)
+    corpus: dict[str, str] = {}
+
+    for i in range(1500):
+        text = " ".join(rng.choices(vocabulary, k=rng.randint(2, 25)))
+        corpus[f"zk-{i}"] = text
+        index.add(f"zk-{i}", text)
+    for i in range(0, 1500, 3):
+        index.remove(f"zk-{i}")
+        del corpus[f"zk-{i}"]
+
+    index.compact()
+    for query in ("w0", "w1 w2", "w3 w17 w29"):
+        expected = _exhaustive_bm25(corpus, query)
+        hits = index.search(query, limit=5)
+        assert [hit.score for hit in hits] == pytest.approx(
+            sorted(expected.values(), reverse=True)[:5]
+        )
+
+
+# --- Impact Tier Tests ---
+
+
+def _zipf_corpus(rng: random.Random, documents: int, vocabulary: list[str]) -> dict[str, str]:
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    return {
+        f"zk-{i}": " ".join(rng.choices(vocabulary, weights=weights, k=rng.randint(3, 40)))
+        for i in range(documents)
+    }
+
+
+def test_tiered_search_matches_exhaustive_ranking() -> None:
+    """Test common-term queries answered from impact tiers return the exact top-k."""
+    rng = random.Random(3)
+    vocabulary = [f"w{i}" for i in range(40)]
+    corpus = _zipf_corpus(rng, 3000, vocabulary)
+    index = InvertedIndex(min_compact_tombstones=10**9, tier_min_postings=1, tier_depth=256)
+    for key, text in corpus.items():
+        index.add(key, text)
+
+    for query in ("w0", "w0 w1", "w1 w2 w3", "w0 w5 w9", "w12 w30"):
+        expected = _exhaustive_bm25(corpus, query)
+        hits = index.search(query, limit=10)
+        assert [hit.score for hit in hits] == pytest.approx(
+            sorted(expected.values(), reverse=True)[:10]
+        )
+        for hit in hits:
+            assert hit.score == pytest.approx(expected[hit.doc_key])
+
+
+def test_tiered_search_sees_updates_after_the_tier_was_built() -> None:
+    """Test documents added or removed after a tier was cached are reflected in results."""
+    rng = random.Random(5)
+    vocabulary = [f"w{i}" for i in range(20)]
+    corpus = _zipf_corpus(rng, 1000, vocabulary)
+    index = InvertedIndex(min_compact_tombstones=10**9, tier_min_postings=1, tier_depth=128)
+    for key, text in corpus.items():
+        index.add(key, text)
+    index.search("w3 w4")  # Builds and caches the tiers
+
+    corpus["zk-new"] = "w3 w3 w3 w4 w4"
+    index.add("zk-new", corpus["zk-new"])
+    expected = _exhaustive_bm25(corpus, "w3 w4")
+    hits = index.search("w3 w4", limit=5)
+    assert hits[0].doc_key == "zk-new"
+    assert [hit.score for hit in hits] == pytest.approx(
+        sorted(expected.values(), reverse=True)[:5]
+    )
+
+    index.remove("zk-new")
+    assert "zk-new" not in [hit.doc_key for hit in index.search("w3 w4", limit=5)]
+
+
+def _common_corpus(rng: random.Random) -> dict[str, str]:
+    # 2049 adds refresh the tiers with an empty tail, so they hold only tier_depth postings
+    return {
+        f"zk-{i}": f"common {'w' * rng.randint(1, 5)} " * rng.randint(1, 3) for i in range(2049)
+    }
+
+
+def test_tiered_search_limit_beyond_tier_depth() -> None:
+    """Test asking for more hits than a tier holds returns the full exhaustive top-k."""
+    corpus = _common_corpus(random.Random(9))
+    index = InvertedIndex(min_compact_tombstones=10**9, tier_min_postings=1, tier_depth=16)
+    for key, text in corpus.items():
+        index.add(key, text)
+    tier = index._postings["common"].tier
+    assert tier is not None
+    assert tier.covered == len(corpus)
+
+    expected = _exhaustive_bm25(corpus, "common")
+    hits = index.search("common", limit=50)
+    assert len(hits) == 50
+    assert [hit.score for hit in hits] == pytest.approx(
+        sorted(expected.values(), reverse=True)[:50]
+    )
+
+
+def test_tiered_search_falls_back_when_tier_documents_are_removed() -> None:
+    """Test a tier left with fewer live documents than the limit defers to exhaustive search."""
+    corpus = _common_corpus(random.Random(7))
+    index = InvertedIndex(min_compact_tombstones=10**9, tier_min_postings=1, tier_depth=16)
+    exhaustive = InvertedIndex(min_compact_tombstones=10**9, tier_min_postings=None)
+    for key, text in corpus.items():
+        index.add(key, text)
+        exhaustive.add(key, text)
+
+    for hit in index.search("common", limit=12):  # Most of the tier
+        index.remove(hit.doc_key)
+        exhaustive.remove(hit.doc_key)
+
+    hits = index.search("common", limit=10)
+    expected = exhaustive.search("common", limit=10)
+    assert [hit.doc_key for hit in hits] == [hit.doc_key for hit in expected]
+    assert [hit.score for hit in hits] == pytest.approx([hit.score for hit in expected])
@@ -0,0 +1,204 @@
+"""Unit tests for VectorIndex and IVFVectorIndex.
+
+Tests core functionality:
+- Exact top-k against a brute-force reference
+- Upsert, removal and batch queries
+- Chunked search across chunk boundaries
+- Memory-mapped persistence round trips
+- IVF recall and fallback before training
+- IVF inverted lists kept in step with adds, removals and reloads
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from crank.search import IVFVectorIndex, VectorIndex
+from crank.search import vector_index as vector_index_module
+
+# --- Fixtures ---
+
+
+@pytest.fixture
+def embeddings() -> np.ndarray:
+    """2,000 random 32-d vectors."""
+    return np.random.default_rng(3).standard_normal((2000, 32)).astype(np.float32)
+
+
+@pytest.fixture
+def flat_index(embeddings: np.ndarray) -> VectorIndex:
+    """Flat cosine index over the fixture embeddings."""
+    index = VectorIndex(dimension=32)
+    index.add([f"v{i}" for i in range(len(embeddings))], embeddings)
+    return index
+
+
+def _reference_top_k(embeddings: np.ndarray, query: np.ndarray, k: int) -> list[str]:
+    normalised = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    scores = normalised @ (query / np.linalg.norm(query))
+    return [f"v{i}" for i in np.argsort(-scores, kind="stable")[:k]]
+
+
+# --- Flat index ---
+
+
+def test_flat_search_matches_brute_force(flat_index: VectorIndex, embeddings: np.ndarray) -> None:
+    """Flat search returns the exact cosine top-k."""
+    query = np.random.default_rng(5).standard_normal(32)
+
+    hits = flat_index.search(query, k=10)[0]
+
+    assert [hit.key for hit in hits] == _reference_top_k(embeddings, query, 10)
+    assert all(a.score >= b.score for a, b in zip(hits, hits[1:]))
+
+
+def test_search_across_chunks(
+    flat_index: VectorIndex, embeddings: np.ndarray, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Results are unchanged when rows are scored in many small chunks."""
+    monkeypatch.setattr(vector_index_module, "_CHUNK_SCORE_BUDGET", 64)
+    queries = np.random.default_rng(6).standard_normal((4, 32))
+
+    results = flat_index.search(queries, k=5)
+
+    assert len(results) == 4
+    for query, hits in zip(queries, results):
+        assert [hit.key for hit in hits] == _reference_top_k(embeddings, query, 5)
+
+
+def test_add_replaces_existing_key(flat_index: VectorIndex, embeddings: np.ndarray) -> None:
+    """Re-adding a key overwrites its vector instead of duplicating it."""
+    flat_index.add(["v0"], embeddings[1:2])
+
+    assert len(flat_index) == 2000
+    top = flat_index.search(embeddings[1], k=2)[0]
+    assert {hit.key for hit in top} == {"v0", "v1"}
+
+
+def test_remove_swaps_last_row(flat_index: VectorIndex, embeddings: np.ndarray) -> None:
+    """Removed keys disappear and the moved key stays searchable."""
+    assert flat_index.remove("v10")
+    assert not flat_index.remove("v10")
+
+    assert "v10" not in flat_index
+    assert flat_index.search(embeddings[10], k=1)[0][0].key != "v10"
+    assert flat_index.search(embeddings[1999], k=1)[0][0].key == "v1999"
+
+
+def test_rejects_wrong_dimension() -> None:
+    """Vectors must match the index dimension."""
+    index = VectorIndex(dimension=4)
+    with pytest.raises(ValueError):
+        index.add(["a"], np.ones((1, 3)))
+
+
+def test_k_larger_than_index() -> None:
+    """Asking for more neighbours than stored returns everything."""
+    index = VectorIndex(dimension=2, metric="dot")
+    index.add(["a", "b"], [[1.0, 0.0], [0.5, 0.0]])
+
+    hits = index.search([1.0, 0.0], k=10)[0]
+
+    assert [hit.key for hit in hits] == ["a", "b"]
+    assert hits[0].score == pytest.approx(1.0)
+
+
+# --- Persistence ---
+
+
+def test_save_and_load_memory_mapped(flat_index: VectorIndex, tmp_path: Path) -> None:
+    """Loaded index is memory-mapped and returns identical results."""
+    query = np.random.default_rng(7).standard_normal(32)
+    expected = flat_index.search(query, k=5)[0]
+
+    flat_index.save(tmp_path / "index")
+    loaded = VectorIndex.load(tmp_path / "index")
+
+    assert loaded.stats()["memory_mapped"] is True
+    assert loaded.search(query, k=5)[0] == expected
+
+    # First mutation copies the mapping into memory
+    loaded.add(["extra"], np.ones((1, 32)))
+    assert loaded.stats()["memory_mapped"] is False
+    assert len(loaded) == 2001
+
+
+# --- IVF ---
+
+
+def test_ivf_untrained_falls_back_to_exact(embeddings: np.ndarray) -> None:
+    """Before training, IVF search is exact."""
+    index = IVFVectorIndex(dimension=32, nlist=16, nprobe=2)
+    index.add([f"v{i}" for i in range(len(embeddings))], embeddings)
+    query = embeddings[42]
+
+    assert [hit.key for hit in index.search(query, k=5)[0]] == _reference_top_k(
+        embeddings, query, 5
+    )
+
+
+def test_ivf_recall_and_persistence(embeddings: np.ndarray, tmp_path: Path) -> None:
+    """Trained IVF finds stored vectors and survives a save/load."""
+    index = IVFVectorIndex(dimension=32, nlist=16, nprobe=4)
+    index.add([f"v{i}" for i in range(len(embeddings))], embeddings)
+    index.train()
+    index.add(["late"], embeddings[7:8] * 2.0)
+
+    # A stored vector is always in its own (probed) cluster
+    for i in range(0, 2000, 97):
+        assert index.search(embeddings[i], k=1)[0][0].key in {f"v{i}", "late"}
+
+    index.save(tmp_path / "ivf")
+    loaded = VectorIndex.load(tmp_path / "ivf")
+    assert isinstance(loaded, IVFVectorIndex)
+    assert loaded.is_trained
+    assert loaded.search(embeddings[5], k=1)[0][0].key == "v5"
+
+
+def _assert_lists_cover_rows(index: IVFVectorIndex) -> None:
+    """Every row sits in exactly the inverted list of its assigned cluster."""
+    for cluster, rows in enumerate(index._lists):
+        members = rows[: index._list_sizes[cluster]]
+        assert (index._assignments[members] == cluster).all()
+        assert (index._list_positions[members] == np.arange(members.size)).all()
+    in_use = [rows[:size] for rows, size in zip(index._lists, index._list_sizes)]
+    assert sorted(np.concatenate(in_use).tolist()) == list(range(len(index)))
+
+
+def _assert_same_hits(index: VectorIndex, reference: VectorIndex, queries: np.ndarray) -> None:
+    for hits, expected in zip(index.search(queries, k=10), reference.search(queries, k=10)):
+        assert [hit.key for hit in hits] == [hit.key for hit in expected]
+        assert [hit.score for hit in hits] == pytest.approx([hit.score for hit in expected])
+
+
+def test_ivf_inverted_lists_track_mutations(embeddings: np.ndarray, tmp_path: Path) -> None:
+    """Adds, rewrites and removals keep the inverted lists exact; all lists probed == flat."""
+    index = IVFVectorIndex(dimension=32, nlist=16, nprobe=16)
+    flat = VectorIndex(dimension=32)
+    keys = [f"v{i}" for i in range(len(embeddings))]
+    for target in (index, flat):
+        target.add(keys[:1500], embeddings[:1500])
+    index.train()
+    rng = np.random.default_rng(11)
+
+    def mutate(target: VectorIndex) -> None:
+        target.add(keys[1500:], embeddings[1500:])
+        target.add(keys[:50], embeddings[1000:1050])  # Rewrites move rows between lists
+        for key in (keys[-1], keys[3], keys[700], keys[1998]):
+            target.remove(key)
+
+    for target in (index, flat):
+        mutate(target)
+    _assert_lists_cover_rows(index)
+    queries = rng.standard_normal((20, 32))
+    _assert_same_hits(index, flat, queries)
+
+    index.save(tmp_path / "ivf")
+    loaded = VectorIndex.load(tmp_path / "ivf")
+    assert isinstance(loaded, IVFVectorIndex)
+    for target in (loaded, flat):
+        target.remove(keys[10])
+        target.add(["extra"], embeddings[10:11])
+    _assert_lists_cover_rows(loaded)
+    _assert_same_hits(loaded, flat, queries)
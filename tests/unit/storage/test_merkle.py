@@ -0,0 +1,75 @@
+"""Unit tests for Merkle trees.
+
+Tests core functionality:
+- Roots for empty, single-leaf and odd-sized trees
+- Inclusion proofs for every leaf and their rejection when tampered
+- Proof serialization round trip
+"""
+
+import pytest
+
+from crank.storage import MerkleProof, MerkleTree, leaf_hash
+from crank.storage.merkle import EMPTY_ROOT, node_hash
+
+
+def _leaves(count: int) -> list[bytes]:
+    return [leaf_hash(f"receipt-{i}".encode()) for i in range(count)]
+
+
+# --- Roots ---
+
+
+def test_empty_and_single_leaf_roots() -> None:
+    """An empty tree has the empty root; a single leaf is its own root."""
+    assert MerkleTree([]).root == EMPTY_ROOT
+    [leaf] = _leaves(1)
+    assert MerkleTree([leaf]).root == leaf
+
+
+def test_odd_node_is_promoted() -> None:
+    """With three leaves the third pairs with the hash of the first two."""
+    a, b, c = _leaves(3)
+    assert MerkleTree([a, b, c]).root == node_hash(node_hash(a, b), c)
+
+
+def test_leaf_and_node_hashes_are_domain_separated() -> None:
+    """A leaf over two concatenated hashes differs from their interior node."""
+    a, b = _leaves(2)
+    assert leaf_hash(a + b) != node_hash(a, b)
+
+
+# --- Proofs ---
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 8, 17])
+def test_every_leaf_proof_verifies(size: int) -> None:
+    """Each leaf's proof leads to the root, in O(log n) steps."""
+    tree = MerkleTree(_leaves(size))
+    for index in range(size):
+        proof = tree.proof(index)
+        assert proof.verify(tree.root)
+        assert len(proof.path) <= max(size - 1, 0).bit_length()
+
+
+def test_tampered_proof_is_rejected() -> None:
+    """A different leaf or a wrong root fails verification."""
+    tree = MerkleTree(_leaves(5))
+    proof = tree.proof(2)
+    forged = MerkleProof(proof.index, proof.size, leaf_hash(b"forged"), proof.path)
+    assert not forged.verify(tree.root)
+    assert not proof.verify(MerkleTree(_leaves(6)).root)
+
+
+def test_proof_index_out_of_range() -> None:
+    """Asking for a leaf past the end raises IndexError."""
+    with pytest.raises(IndexError):
+        MerkleTree(_leaves(2)).proof(2)
+
+
+def test_proof_dict_round_trip() -> None:
+    """to_dict/from_dict preserve the proof."""
+    tree = MerkleTree(_leaves(9))
+    proof = tree.proof(8)
+    restored = MerkleProof.from_dict(proof.to_dict())
+    assert restored == proof
+    assert restored.verify(tree.root)
@@ -0,0 +1,196 @@
+"""Unit tests for ReceiptLog and ReceiptPipeline.
+
+Tests core functionality:
+- Appends, indexed lookup and segment sealing with verifiable proofs
+- Seal signatures (plain digest and HMAC)
+- Recovery on reopen: index rebuild, partial line truncation, late sealing
+- Pipeline: background digests, pending state, interval sealing, failures
+"""
+
+import asyncio
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from crank.protocols import EncodedPayload, canonical_digest
+from crank.storage import DurabilityMode, ReceiptLog, ReceiptPipeline, hmac_signer
+
+
+def _receipt(i: int) -> dict[str, Any]:
+    return {"receipt_id": f"r-{i}", "operation": "convert", "success": True}
+
+
+def _log(directory: Path, **kwargs: Any) -> ReceiptLog:
+    kwargs.setdefault("durability", DurabilityMode.NONE)
+    return ReceiptLog(directory, **kwargs)
+
+
+# --- Log ---
+
+
+def test_lookup_before_seal_has_no_proof(tmp_path: Path) -> None:
+    """An appended receipt is found by id but is not yet covered by a seal."""
+    log = _log(tmp_path)
+    log.append([_receipt(i) for i in range(3)])
+
+    found = log.lookup("r-1")
+    assert found is not None
+    assert found.receipt == _receipt(1)
+    assert not found.sealed and found.proof is None
+    assert log.lookup("missing") is None
+
+
+def test_segments_seal_when_full(tmp_path: Path) -> None:
+    """Filling a segment seals it; every receipt in it gets a valid proof."""
+    log = _log(tmp_path, segment_size=4)
+    locations = log.append([_receipt(i) for i in range(10)])
+
+    assert [loc.segment for loc in locations] == [1] * 4 + [2] * 4 + [3] * 2
+    assert log.segments_sealed == 2
+    for i in range(8):
+        found = log.lookup(f"r-{i}")
+        assert found is not None and found.sealed
+        assert found.verify()
+    assert not log.lookup("r-9").sealed  # type: ignore[union-attr]
+
+
+def test_manual_seal_and_signature(tmp_path: Path) -> None:
+    """seal() covers the open segment; the HMAC signature needs the key."""
+    signer = hmac_signer(b"secret")
+    log = _log(tmp_path, signer=signer)
+    log.append([_receipt(i) for i in range(5)])
+
+    seal = log.seal()
+    assert seal is not None and seal.size == 5
+    assert seal.verify(signer)
+    assert not seal.verify(hmac_signer(b"other"))
+    assert log.seal() is None  # Nothing left open
+
+
+def test_tampered_receipt_fails_verification(tmp_path: Path) -> None:
+    """A receipt edited on disk no longer matches its proof."""
+    log = _log(tmp_path)
+    log.append([_receipt(i) for i in range(3)])
+    log.seal()
+    segment = tmp_path / "segment-00000001.jsonl"
+    segment.write_bytes(segment.read_bytes().replace(b"convert", b"deleted", 1))
+
+    found = _log(tmp_path).lookup("r-0")
+    assert found is not None and not found.verify()
+
+
+# --- Recovery ---
+
+
+def test_reopen_rebuilds_index_and_continues_segment(tmp_path: Path) -> None:
+    """A reopened log finds old receipts and keeps appending to the open segment."""
+    _log(tmp_path, segment_size=4).append([_receipt(i) for i in range(6)])
+
+    log = _log(tmp_path, segment_size=4)
+    assert len(log) == 6
+    assert log.lookup("r-0").sealed  # type: ignore[union-attr]
+    [location] = log.append([_receipt(6)])
+    assert (location.segment, location.index) == (2, 2)
+
+
+def test_reopen_truncates_partial_line(tmp_path: Path) -> None:
+    """A torn trailing write is dropped instead of corrupting the segment."""
+    _log(tmp_path).append([_receipt(0)])
+    segment = tmp_path / "segment-00000001.jsonl"
+    with segment.open("ab") as handle:
+        handle.write(b'{"receipt_id": "r-torn"')
+
+    log = _log(tmp_path)
+    assert len(log) == 1
+    log.append([_receipt(1)])
+    assert log.lookup("r-1").receipt == _receipt(1)  # type: ignore[union-attr]
+
+
+def test_reopen_seals_full_unsealed_segment(tmp_path: Path) -> None:
+    """A full segment left unsealed by a crash is sealed on open."""
+    _log(tmp_path, segment_size=2).append([_receipt(i) for i in range(2)])
+    (tmp_path / "segment-00000001.seal.json").unlink()
+
+    log = _log(tmp_path, segment_size=2)
+    found = log.lookup("r-1")
+    assert found is not None and found.verify()
+
+
+# --- Pipeline ---
+
+
+async def test_pipeline_fills_digests_in_background(tmp_path: Path) -> None:
+    """Submitted receipts are pending until written, then carry payload digests."""
+    pipeline = ReceiptPipeline(_log(tmp_path), digest_chars=16, seal_interval=None)
+    payload = {"records": [{"id": i} for i in range(100)]}
+
+    future = pipeline.submit(
+        _receipt(0), {"input_hash": EncodedPayload(payload), "output_hash": None}
+    )
+    assert pipeline.is_pending("r-0")
+    location = await future
+    assert not pipeline.is_pending("r-0")
+    assert location.index == 0
+
+    found = await pipeline.lookup("r-0")
+    assert found is not None
+    assert found.receipt["input_hash"] == canonical_digest(payload)[:16]
+    assert found.receipt["output_hash"] is None
+    await pipeline.close()
+
+
+async def test_pipeline_batches_appends(tmp_path: Path) -> None:
+    """Receipts submitted together are written in one batch."""
+    pipeline = ReceiptPipeline(_log(tmp_path), seal_interval=None)
+    futures = [pipeline.submit(_receipt(i), {}) for i in range(50)]
+    await asyncio.gather(*futures)
+
+    assert pipeline.batches_written == 1
+    await pipeline.close()
+
+
+async def test_pipeline_seals_after_interval(tmp_path: Path) -> None:
+    """A partly filled segment is sealed once seal_interval has passed."""
+    log = _log(tmp_path)
+    pipeline = ReceiptPipeline(log, seal_interval=0.05)
+    await pipeline.submit(_receipt(0), {})
+
+    for _ in range(100):
+        if log.segments_sealed:
+            break
+        await asyncio.sleep(0.01)
+    found = await pipeline.lookup("r-0")
+    assert found is not None and found.verify()
+    await pipeline.close()
+
+
+async def test_pipeline_failure_reaches_waiters(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A failed append fails the batch's futures and is counted."""
+    log = _log(tmp_path)
+    pipeline = ReceiptPipeline(log, seal_interval=None)
+
+    def broken_append(receipts: Any) -> Any:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(log, "append", broken_append)
+    with pytest.raises(OSError, match="disk full"):
+        await pipeline.submit(_receipt(0), {})
+    assert pipeline.receipts_failed == 1
+    assert not pipeline.is_pending("r-0")
+    await pipeline.close()
+
+
+async def test_close_drains_and_rejects_new_receipts(tmp_path: Path) -> None:
+    """close() writes everything queued; later submits raise."""
+    log = _log(tmp_path)
+    pipeline = ReceiptPipeline(log, seal_interval=None)
+    for i in range(10):
+        pipeline.submit(_receipt(i), {})
+
+    await pipeline.close()
+    assert len(log) == 10
+    with pytest.raises(RuntimeError):
+        pipeline.submit(_receipt(10), {})
@@ -0,0 +1,116 @@
+"""Unit tests for WriteBehindQueue.
+
+Tests core functionality:
+- Atomic writes and directory creation
+- Coalescing of pending writes to the same path
+- Batching and fsync behaviour per durability mode
+- Error propagation and shutdown draining
+"""
+
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+
+from crank.storage import DurabilityMode, WriteBehindQueue
+
+# --- Writes ---
+
+
+async def test_write_creates_directories_and_file(tmp_path: Path) -> None:
+    """Nested directories are created and content lands atomically."""
+    queue = WriteBehindQueue(DurabilityMode.NONE)
+    target = tmp_path / "inbox" / "deep" / "zk-1.md"
+
+    await queue.write(target, "hello zettel")
+    await queue.close()
+
+    assert target.read_text(encoding="utf-8") == "hello zettel"
+    assert not list(target.parent.glob(".*.tmp"))
+
+
+async def test_pending_writes_to_same_path_coalesce(tmp_path: Path) -> None:
+    """Only the last queued version is written; every waiter is acknowledged."""
+    queue = WriteBehindQueue(DurabilityMode.NONE, max_delay=0.01)
+    target = tmp_path / "zk-1.md"
+
+    waiters = [queue.submit(target, f"version {i}") for i in range(5)]
+    await asyncio.gather(*waiters)
+    await queue.close()
+
+    assert target.read_text(encoding="utf-8") == "version 4"
+    assert queue.writes_coalesced == 4
+    assert queue.batches_committed == 1
+
+
+async def test_group_commit_batches_writes(tmp_path: Path) -> None:
+    """Group commit writes many files per batch with one fsync per directory."""
+    queue = WriteBehindQueue(DurabilityMode.GROUP, max_batch=64)
+
+    await asyncio.gather(*(queue.write(tmp_path / f"zk-{i}.md", str(i)) for i in range(50)))
+    await queue.close()
+
+    assert len(list(tmp_path.glob("*.md"))) == 50
+    assert queue.batches_committed == 1
+    # 50 file fsyncs + 1 directory fsync
+    assert queue.fsync_calls == 51
+
+
+async def test_fsync_mode_commits_each_write_alone(tmp_path: Path) -> None:
+    """Per-write durability never batches."""
+    queue = WriteBehindQueue(DurabilityMode.FSYNC)
+
+    await asyncio.gather(*(queue.write(tmp_path / f"zk-{i}.md", str(i)) for i in range(5)))
+    await queue.close()
+
+    assert queue.batches_committed == 5
+    assert queue.fsync_calls == 10
+
+
+async def test_none_mode_skips_fsync(tmp_path: Path) -> None:
+    """No durability means no fsync calls at all."""
+    queue = WriteBehindQueue(DurabilityMode.NONE)
+
+    await queue.write(tmp_path / "zk-1.md", b"bytes are fine too")
+    await queue.close()
+
+    assert queue.fsync_calls == 0
+
+
+# --- Errors and shutdown ---
+
+
+async def test_failed_write_raises_for_waiter_only(tmp_path: Path) -> None:
+    """A failing path does not fail the rest of its batch."""
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("file in the way", encoding="utf-8")
+    queue = WriteBehindQueue(DurabilityMode.NONE, max_delay=0.01)
+
+    bad = queue.submit(blocker / "zk-1.md", "x")
+    good = queue.submit(tmp_path / "zk-2.md", "y")
+
+    with pytest.raises(OSError):
+        await bad
+    await good
+    await queue.close()
+    assert (tmp_path / "zk-2.md").exists()
+
+
+async def test_close_drains_and_rejects_new_writes(tmp_path: Path) -> None:
+    """Writes queued before close() are committed; later writes are refused."""
+    queue = WriteBehindQueue(DurabilityMode.NONE, max_delay=0.05)
+    for i in range(10):
+        queue.submit(tmp_path / f"zk-{i}.md", str(i))
+
+    await queue.close()
+
+    assert len(os.listdir(tmp_path)) == 10
+    with pytest.raises(RuntimeError):
+        await queue.write(tmp_path / "late.md", "too late")
+
+
+def test_invalid_batch_size_rejected() -> None:
+    """max_batch must be positive."""
+    with pytest.raises(ValueError):
+        WriteBehindQueue(max_batch=0)
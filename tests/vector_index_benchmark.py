@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Vector Index Benchmark
+
+Fills crank.search.VectorIndex with random float32 embeddings (CLIP-sized
+by default) and measures exact brute-force top-k latency, both for single
+queries and for query batches that share one pass over the matrix.
+
+Target: 1M x 512-d brute-force top-k completes in bounded time on a
+CPU-only box (memory stays flat thanks to chunked matmul).
+
+Usage:
+    python tests/vector_index_benchmark.py --vectors 1000000 --dimension 512
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from crank.search import VectorIndex
+
+
+def build_index(vectors: int, dimension: int, chunk: int = 50_000) -> VectorIndex:
+    """Add random unit vectors in chunks so generation never holds two copies."""
+    rng = np.random.default_rng(17)
+    index = VectorIndex(dimension=dimension)
+    for start in range(0, vectors, chunk):
+        count = min(chunk, vectors - start)
+        block = rng.standard_normal((count, dimension), dtype=np.float32)
+        index.add([f"v{start + i}" for i in range(count)], block)
+    return index
+
+
+def run_benchmark(vectors: int, dimension: int, queries: int, k: int) -> None:
+    """Build the index and time single and batched queries."""
+    print("🧭 Vector Index Benchmark")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    index = build_index(vectors, dimension)
+    print(f"Vectors:         {len(index):,} x {dimension}")
+    print(f"Matrix size:     {index.stats()['vector_bytes'] / 1_073_741_824:.2f} GiB")
+    print(f"Build time:      {time.perf_counter() - start:.1f}s")
+
+    rng = np.random.default_rng(23)
+    query_matrix = rng.standard_normal((queries, dimension), dtype=np.float32)
+
+    single_ms: list[float] = []
+    for query in query_matrix:
+        start = time.perf_counter()
+        index.search(query, k=k)
+        single_ms.append((time.perf_counter() - start) * 1000)
+
+    print(f"Single queries:  {queries} (k={k})")
+    print(f"  mean:          {statistics.mean(single_ms):.1f} ms")
+    print(f"  max:           {max(single_ms):.1f} ms")
+
+    for batch_size in (8, 32):
+        batch = query_matrix[:batch_size]
+        start = time.perf_counter()
+        index.search(batch, k=k)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(
+            f"Batch of {batch_size:<3}    {elapsed_ms:.1f} ms total, "
+            f"{elapsed_ms / batch_size:.1f} ms per query"
+        )
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=200_000)
+    parser.add_argument("--dimension", type=int, default=512)
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+    run_benchmark(args.vectors, args.dimension, args.queries, args.k)
+
+
+if __name__ == "__main__":
+    main()